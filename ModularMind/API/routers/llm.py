@@ -83,7 +83,7 @@ async def complete_text(request: Request, completion_request: LLMCompletionReque
     
     try:
         # Metin tamamlama
-        response_text = llm_service.generate_text(
+        response_text = await llm_service.agenerate_text(
             completion_request.prompt,
             completion_request.model,
             completion_request.max_tokens,
@@ -142,7 +142,7 @@ async def chat_completion(request: Request, chat_request: LLMChatRequest):
     
     try:
         # Sohbet tamamlama
-        response_message = llm_service.generate_chat(
+        response_message = await llm_service.agenerate_chat(
             messages,
             chat_request.model,
             chat_request.max_tokens,
@@ -2,6 +2,7 @@
 LLM API rotaları.
 """
 
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 from fastapi.responses import StreamingResponse
 from typing import List, Dict, Any, Optional
@@ -83,7 +84,9 @@ async def complete_text(request: CompletionRequest, llm_service=Depends(get_llm_
         )
     
     try:
-        text = llm_service.generate_text(
+        # Servis hız sınırı için bekleyebilir; olay döngüsünü bloklamamak için iş parçacığında çalıştır
+        text = await asyncio.to_thread(
+            llm_service.generate_text,
             prompt=request.prompt,
             model=request.model,
             max_tokens=request.max_tokens,
@@ -143,7 +146,9 @@ async def chat_completion(request: ChatCompletionRequest, llm_service=Depends(ge
         )
     
     try:
-        response = llm_service.chat_completion(
+        # Servis hız sınırı için bekleyebilir; olay döngüsünü bloklamamak için iş parçacığında çalıştır
+        response = await asyncio.to_thread(
+            llm_service.chat_completion,
             messages=request.messages,
             model=request.model,
             max_tokens=request.max_tokens,
@@ -195,7 +200,8 @@ async def template_completion(request: TemplateCompletionRequest, llm_service=De
     Şablondan metin üretir.
     """
     try:
-        text = llm_service.generate_from_template(
+        text = await asyncio.to_thread(
+            llm_service.generate_from_template,
             template_id=request.template_id,
             variables=request.variables,
             model=request.model,
@@ -0,0 +1,344 @@
+"""
+Veri kaynak ajanları için aşamalı aktarım hattı.
+
+Belgeler dört aşamada vektör deposuna aktarılır: tüm belgeler parçalanır
+(manifestoya göre değişmeyenler atlanır), aynı metinli parçalar tekilleştirilir,
+kalan metinler sağlayıcı boyutunda gruplar halinde embedding servisine
+gönderilir (servis önbelleği tekrar hesaplamayı önler) ve parçalar sabit
+boyutlu gruplarla `add_batch` ile depoya yazılır. Embedding'i hesaplanamayan
+(hata veya sıfır vektörü) parçalar depoya ve manifestoya yazılmaz; sonraki
+çalışmada yeniden denenir. Her aşama için işlenen öğe sayısı ve süre tutulur.
+"""
+
+import time
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional, Set, Tuple
+
+from ModularMind.API.services.retrieval.models import Document, Chunk
+from ModularMind.API.services.data.source_manifest import SourceManifest, content_hash
+
+logger = logging.getLogger(__name__)
+
+# Tek embedding çağrısında gönderilen metin sayısı
+DEFAULT_EMBEDDING_BATCH_SIZE = 256
+
+# Tek add_batch çağrısında yazılan parça sayısı
+DEFAULT_STORE_BATCH_SIZE = 512
+
+# Aktarım aşamaları
+STAGES = ("chunk", "embed", "store")
+
+@dataclass
+class StageStats:
+    """Bir aktarım aşamasının sayaçları."""
+    items: int = 0
+    seconds: float = 0.0
+
+    @property
+    def per_second(self) -> float:
+        """Saniye başına işlenen öğe sayısı."""
+        return self.items / self.seconds if self.seconds > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Sayaçları sözlüğe dönüştürür."""
+        return {
+            "items": self.items,
+            "seconds": round(self.seconds, 4),
+            "per_second": round(self.per_second, 2)
+        }
+
+@dataclass
+class IngestionStats:
+    """Aktarım hattının birikimli sayaçları."""
+    documents: int = 0
+    unchanged_documents: int = 0
+    chunks: int = 0
+    unchanged_chunks: int = 0
+    deduplicated_chunks: int = 0
+    failed_chunks: int = 0
+    deleted_chunks: int = 0
+    removed_sources: int = 0
+    stages: Dict[str, StageStats] = field(default_factory=lambda: {stage: StageStats() for stage in STAGES})
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Sayaçları sözlüğe dönüştürür."""
+        return {
+            "documents": self.documents,
+            "unchanged_documents": self.unchanged_documents,
+            "chunks": self.chunks,
+            "unchanged_chunks": self.unchanged_chunks,
+            "deduplicated_chunks": self.deduplicated_chunks,
+            "failed_chunks": self.failed_chunks,
+            "deleted_chunks": self.deleted_chunks,
+            "removed_sources": self.removed_sources,
+            "stages": {stage: stats.to_dict() for stage, stats in self.stages.items()}
+        }
+
+class IngestionPipeline:
+    """
+    Belgeleri aşamalı olarak parçalayıp embedding'leyen ve vektör deposuna
+    yazan aktarım hattı.
+
+    Bir ajan çalışması boyunca aynı nesne kullanılır; akışla gelen her belge
+    grubu `run` ile işlenir ve sayaçlar çalışma boyunca birikir.
+    """
+
+    def __init__(
+        self,
+        vector_store,
+        embedding_service=None,
+        manifest: Optional[SourceManifest] = None,
+        embedding_batch_size: int = DEFAULT_EMBEDDING_BATCH_SIZE,
+        store_batch_size: int = DEFAULT_STORE_BATCH_SIZE,
+        chunk_size: int = 500,
+        chunk_overlap: int = 50
+    ):
+        """
+        Args:
+            vector_store: Vektör deposu
+            embedding_service: Embedding servisi (None ise depo kendi servisini kullanır)
+            manifest: Değişiklik tespiti için ajan manifestosu
+            embedding_batch_size: Embedding çağrısı başına metin sayısı
+            store_batch_size: add_batch çağrısı başına parça sayısı
+            chunk_size: Parça boyutu
+            chunk_overlap: Parça örtüşmesi
+        """
+        self.vector_store = vector_store
+        self.embedding_service = embedding_service
+        self.manifest = manifest
+        self.embedding_batch_size = max(1, embedding_batch_size)
+        self.store_batch_size = max(1, store_batch_size)
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.stats = IngestionStats()
+
+    def run(self, documents: List[Document]) -> None:
+        """
+        Belge grubunu aktarır.
+
+        Args:
+            documents: Belge listesi
+        """
+        if not documents:
+            return
+
+        self.stats.documents += len(documents)
+
+        # 1. Parçalama ve değişiklik tespiti
+        started = time.perf_counter()
+        chunks, stale_chunk_ids, manifest_updates = self._chunk_stage(documents)
+        self._record_stage("chunk", len(chunks), started)
+
+        # 2-3. Tekilleştirme ve toplu embedding
+        started = time.perf_counter()
+        embedded, failed_chunk_ids = self._embed_stage(chunks)
+        self._record_stage("embed", embedded, started)
+
+        # 4. Sabit boyutlu gruplarla depoya yazma (embedding'i olmayanlar hariç)
+        started = time.perf_counter()
+        chunks = [chunk for chunk in chunks if chunk.id not in failed_chunk_ids]
+        for start in range(0, len(chunks), self.store_batch_size):
+            self.vector_store.add_batch(chunks[start:start + self.store_batch_size])
+        self._record_stage("store", len(chunks), started)
+
+        # Artık üretilmeyen parçaları sil
+        for chunk_id in stale_chunk_ids:
+            if self.vector_store.delete(chunk_id):
+                self.stats.deleted_chunks += 1
+
+        # Manifesto yalnızca depo güncellendikten sonra güncellenir
+        if self.manifest is not None:
+            self._apply_manifest_updates(*manifest_updates, failed_chunk_ids=failed_chunk_ids)
+
+    def remove_missing_sources(self) -> None:
+        """
+        Bu çalışmada görülmeyen kaynakların parçalarını vektör deposundan ve
+        manifestodan siler.
+        """
+        if self.manifest is None:
+            return
+
+        missing = self.manifest.missing_sources()
+
+        for _, chunk_ids in missing:
+            for chunk_id in chunk_ids:
+                if self.vector_store.delete(chunk_id):
+                    self.stats.deleted_chunks += 1
+
+        self.manifest.remove_sources(source_key for source_key, _ in missing)
+        self.stats.removed_sources += len(missing)
+
+        if missing:
+            logger.info(f"{len(missing)} kaybolan kaynak silindi")
+
+    def _record_stage(self, stage: str, items: int, started: float) -> None:
+        """Aşama sayaçlarını günceller."""
+        stats = self.stats.stages[stage]
+        stats.items += items
+        stats.seconds += time.perf_counter() - started
+
+    def _chunk_stage(self, documents: List[Document]) -> Tuple[List[Chunk], List[str], Tuple[list, list, list]]:
+        """
+        Belgeleri parçalar, manifestoya göre değişmeyen belge ve parçaları eler.
+
+        Returns:
+            Tuple: (yazılacak parçalar, silinecek parça ID'leri, manifesto güncellemeleri)
+        """
+        # Kaynak anahtarı belirtilmemişse belge ID'si kullanılır
+        source_keys = [document.metadata.get("source_key", document.id) for document in documents]
+        records = self.manifest.get_sources(source_keys) if self.manifest is not None else {}
+
+        chunks = []
+        stale_chunk_ids = []
+        seen = []
+        fingerprint_updates = []
+        source_updates = []
+
+        for document, source_key in zip(documents, source_keys):
+            digest = content_hash(document.text)
+            record = records.get(source_key)
+
+            # İçerik değişmediyse belgeyi atla
+            if (
+                record is not None
+                and record["content_hash"] == digest
+                and record["document_id"] == document.id
+            ):
+                fingerprint = document.metadata.get("source_fingerprint")
+                if fingerprint is not None and fingerprint != record["fingerprint"]:
+                    fingerprint_updates.append((source_key, fingerprint))
+                seen.append(source_key)
+                self.stats.unchanged_documents += 1
+                continue
+
+            previous = self.manifest.get_chunk_hashes(source_key) if record is not None else {}
+
+            # Belge zaten parçalanmış mı?
+            document_chunks = document.chunks if document.chunks else self._chunk_document(document)
+            chunk_hashes = {}
+
+            for chunk in document_chunks:
+                chunk_hash = content_hash(chunk.text)
+                chunk_hashes[chunk.id] = chunk_hash
+
+                # Aynı ID ve içerikle zaten depodaysa yeniden yazma
+                if previous.get(chunk.id) == chunk_hash:
+                    self.stats.unchanged_chunks += 1
+                    continue
+
+                chunks.append(chunk)
+
+            stale_chunk_ids.extend(chunk_id for chunk_id in previous if chunk_id not in chunk_hashes)
+
+            if self.manifest is not None:
+                source_updates.append((
+                    source_key, document.id, digest, chunk_hashes,
+                    document.metadata.get("source_fingerprint")
+                ))
+
+        self.stats.chunks += len(chunks)
+
+        return chunks, stale_chunk_ids, (seen, fingerprint_updates, source_updates)
+
+    def _chunk_document(self, document: Document) -> List[Chunk]:
+        """
+        Belgeyi parçalara ayırır.
+
+        Parça ID'leri belge ID'sinden türetilir; belge ID'si kararlıysa
+        parça ID'leri de çalışmalar arasında aynı kalır.
+        """
+        from ModularMind.API.services.retrieval.chunking import split_text
+
+        texts = split_text(document.text, chunk_size=self.chunk_size, chunk_overlap=self.chunk_overlap)
+
+        for i, chunk_text in enumerate(texts):
+            # Metadata
+            metadata = document.metadata.copy()
+            metadata["chunk_index"] = i
+
+            # Chunk oluştur
+            document.chunks.append(Chunk(
+                id=f"{document.id}_chunk_{i}",
+                text=chunk_text,
+                document_id=document.id,
+                metadata=metadata
+            ))
+
+        return document.chunks
+
+    def _embed_stage(self, chunks: List[Chunk]) -> Tuple[int, Set[str]]:
+        """
+        Embedding'i olmayan parçaları toplu olarak embedding'ler.
+
+        Aynı metne sahip parçalar tek kez gönderilir; önbellekte bulunan
+        metinler embedding servisi tarafından sağlayıcıya gönderilmez.
+        Hata veren gruplardaki ve sıfır vektörü dönen parçaların embedding'i
+        boş bırakılır.
+
+        Returns:
+            Tuple[int, Set[str]]: Gönderilen tekil metin sayısı ve embedding'i hesaplanamayan parça ID'leri
+        """
+        failed_chunk_ids: Set[str] = set()
+
+        if self.embedding_service is None:
+            return 0, failed_chunk_ids
+
+        # Metin -> bu metni bekleyen parçalar
+        pending: Dict[str, List[Chunk]] = {}
+        for chunk in chunks:
+            if chunk.embedding is None:
+                pending.setdefault(chunk.text, []).append(chunk)
+
+        texts = list(pending)
+        self.stats.deduplicated_chunks += sum(len(waiting) for waiting in pending.values()) - len(texts)
+
+        for start in range(0, len(texts), self.embedding_batch_size):
+            batch = texts[start:start + self.embedding_batch_size]
+            try:
+                embeddings = self.embedding_service.get_embeddings(batch)
+            except Exception as e:
+                logger.error(f"Embedding grubu oluşturma hatası: {str(e)}")
+                embeddings = [None] * len(batch)
+
+            for text, embedding in zip(batch, embeddings):
+                # Hata durumunda servisin döndürdüğü sıfır vektörü depoya yazılmaz
+                if embedding is None or not any(embedding):
+                    embedding = None
+                    failed_chunk_ids.update(chunk.id for chunk in pending[text])
+                for chunk in pending[text]:
+                    chunk.embedding = embedding
+
+        if failed_chunk_ids:
+            self.stats.failed_chunks += len(failed_chunk_ids)
+            logger.warning(f"{len(failed_chunk_ids)} parçanın embedding'i hesaplanamadı, sonraki çalışmada yeniden denenecek")
+
+        return len(texts), failed_chunk_ids
+
+    def _apply_manifest_updates(
+        self,
+        seen: list,
+        fingerprint_updates: list,
+        source_updates: list,
+        failed_chunk_ids: Set[str] = frozenset()
+    ) -> None:
+        """
+        Görülen, parmak izi değişen ve güncellenen kaynakları manifestoya yazar.
+
+        Embedding'i hesaplanamayan parçaların ve kaynağın içerik özeti boş
+        yazılır; böylece sonraki çalışmada belge yeniden parçalanır ve yalnızca
+        bu parçalar yeniden embedding'lenir.
+        """
+        self.manifest.mark_seen(seen)
+
+        for source_key, fingerprint in fingerprint_updates:
+            self.manifest.set_fingerprint(source_key, fingerprint)
+
+        for source_key, document_id, digest, chunk_hashes, fingerprint in source_updates:
+            if not failed_chunk_ids.isdisjoint(chunk_hashes):
+                digest = ""
+                chunk_hashes = {
+                    chunk_id: "" if chunk_id in failed_chunk_ids else chunk_hash
+                    for chunk_id, chunk_hash in chunk_hashes.items()
+                }
+            self.manifest.record(source_key, document_id, digest, chunk_hashes, fingerprint)
@@ -12,6 +12,10 @@ import schedule
 from typing import Dict, List, Any, Optional, Set
 
 from ModularMind.API.services.data.source_agent_models import AgentType, AgentStatus, AgentConfig, AgentResult
+from ModularMind.API.services.data.source_manifest import SourceManifest
+from ModularMind.API.services.data.ingestion_pipeline import (
+    IngestionPipeline, DEFAULT_EMBEDDING_BATCH_SIZE, DEFAULT_STORE_BATCH_SIZE
+)
 from ModularMind.API.services.retrieval.models import Document, Chunk
 from ModularMind.API.services.embedding import EmbeddingService
 
@@ -26,6 +30,9 @@ from ModularMind.API.services.data.source_agent_runners.custom_agent import run_
 
 logger = logging.getLogger(__name__)
 
+# Kaybolan kaynakları varsayılan olarak silen ajan türleri (tam tarama yapanlar)
+FULL_SCAN_AGENT_TYPES = {AgentType.FILE_SYSTEM, AgentType.DATABASE}
+
 class SourceAgentManager:
     """
     Veri kaynak ajanlarını yöneten sınıf.
@@ -375,6 +382,16 @@ class SourceAgentManager:
             start_time=time.time()
         )
         
+        # Değişiklik tespiti için içerik manifestosu
+        manifest = self._open_manifest(agent_id) if self.vector_store else None
+        result.manifest = manifest
+        
+        # Aktarım hattı; akış destekleyen ajanlar belgeleri gruplar halinde doğrudan hatta iletir
+        pipeline = None
+        if self.vector_store:
+            pipeline = self._create_pipeline(config, manifest)
+            result.document_sink = self._make_document_sink(config, pipeline)
+        
         try:
             logger.info(f"Ajan çalıştırılıyor: {config.name} ({agent_id}), İş ID: {job_id}")
             
@@ -397,12 +414,18 @@ class SourceAgentManager:
                 raise ValueError(f"Desteklenmeyen ajan tipi: {config.agent_type}")
             
             # Belgeleri vektör deposuna ekle
-            if self.vector_store and result.documents:
-                self._add_documents_to_vector_store(result.documents)
+            if pipeline is not None and result.documents:
+                pipeline.run(result.documents)
             
-            # Başarılı sonuç
+            # Tam taramada görülmeyen kaynakların parçalarını sil
+            if manifest is not None:
+                if self._deletes_missing_sources(config, result):
+                    pipeline.remove_missing_sources()
+                manifest.commit()
+            
+            # Başarılı sonuç (akışla işlenen belgeler item_count'a zaten eklendi)
             result.success = True
-            result.item_count = len(result.documents)
+            result.item_count += len(result.documents)
             
             # Yapılandırmayı güncelle
             with self.lock:
@@ -426,67 +449,107 @@ class SourceAgentManager:
         finally:
             # Sonucu kaydet
             result.end_time = time.time()
+            if pipeline is not None:
+                result.metadata["ingestion"] = pipeline.stats.to_dict()
             self.last_results[agent_id] = result
             
             # Çalışan ajanlar listesinden kaldır
             with self.lock:
                 if agent_id in self.running_agents:
                     del self.running_agents[agent_id]
+            
+            if manifest is not None:
+                manifest.close()
+                result.manifest = None
     
-    def _add_documents_to_vector_store(self, documents: List[Document]) -> None:
+    def _create_pipeline(self, config: AgentConfig, manifest: Optional[SourceManifest] = None) -> IngestionPipeline:
         """
-        Belgeleri vektör deposuna ekler.
+        Ajan için aktarım hattı oluşturur.
         
         Args:
-            documents: Belge listesi
+            config: Ajan yapılandırması
+            manifest: Ajan manifestosu
+            
+        Returns:
+            IngestionPipeline: Aktarım hattı
+        """
+        return IngestionPipeline(
+            self.vector_store,
+            embedding_service=self.embedding_service,
+            manifest=manifest,
+            embedding_batch_size=int(config.options.get("embedding_batch_size", DEFAULT_EMBEDDING_BATCH_SIZE)),
+            store_batch_size=int(config.options.get("store_batch_size", DEFAULT_STORE_BATCH_SIZE)),
+            chunk_size=int(config.options.get("chunk_size", 500)),
+            chunk_overlap=int(config.options.get("chunk_overlap", 50))
+        )
+    
+    def _make_document_sink(self, config: AgentConfig, pipeline: IngestionPipeline):
         """
-        if not self.vector_store:
-            logger.warning("Vektör deposu bulunamadı, belgeler eklenemiyor")
-            return
+        Ajan için belge grubu hedefi oluşturur.
         
-        # Belgeleri parçalara ayır
-        all_chunks = []
+        Her grup vektör deposuna eklendikten ve manifesto kaydedildikten
+        sonra verilen durum ajan yapılandırmasına yazılır, böylece kontrol
+        noktaları yalnızca kalıcı hale gelmiş belgeleri kapsar.
         
-        for document in documents:
-            # Belge zaten parçalanmış mı?
-            if document.chunks:
-                # Embedding'leri hesapla
-                for chunk in document.chunks:
-                    if chunk.embedding is None and self.embedding_service:
-                        chunk.embedding = self.embedding_service.get_embedding(chunk.text)
-                    
-                    all_chunks.append(chunk)
-            else:
-                # Belgeyi parçala
-                from ModularMind.API.services.retrieval.chunking import split_text
-                
-                chunks = split_text(document.text, chunk_size=500, chunk_overlap=50)
-                
-                # Parçaları oluştur
-                for i, chunk_text in enumerate(chunks):
-                    # Metadata
-                    metadata = document.metadata.copy()
-                    metadata["chunk_index"] = i
-                    
-                    # Chunk oluştur
-                    chunk = Chunk(
-                        id=f"{document.id}_chunk_{i}",
-                        text=chunk_text,
-                        document_id=document.id,
-                        metadata=metadata
-                    )
-                    
-                    # Embedding hesapla
-                    if self.embedding_service:
-                        chunk.embedding = self.embedding_service.get_embedding(chunk_text)
-                    
-                    # Listeye ekle
-                    all_chunks.append(chunk)
-                    document.chunks.append(chunk)
+        Args:
+            config: Ajan yapılandırması
+            pipeline: Aktarım hattı
+            
+        Returns:
+            Callable: Belge grubu hedefi
+        """
+        def sink(documents: List[Document], state: Optional[Dict[str, Any]] = None) -> None:
+            pipeline.run(documents)
+            
+            if pipeline.manifest is not None:
+                pipeline.manifest.commit()
+            
+            if state is not None:
+                with self.lock:
+                    config.state.update(state)
+                    self._save_config(config)
+        
+        return sink
+    
+    def _open_manifest(self, agent_id: str) -> Optional[SourceManifest]:
+        """
+        Ajanın içerik manifestosunu açar.
+        
+        Args:
+            agent_id: Ajan ID
+            
+        Returns:
+            Optional[SourceManifest]: Manifesto (açılamazsa None)
+        """
+        path = os.path.join(self.config_path, "manifests", f"{agent_id}.sqlite")
+        
+        try:
+            manifest = SourceManifest(path)
+            manifest.begin_run()
+            return manifest
+        except Exception as e:
+            logger.error(f"Ajan manifestosu açılamadı, tüm içerik işlenecek: {agent_id}: {str(e)}")
+            return None
+    
+    def _deletes_missing_sources(self, config: AgentConfig, result: AgentResult) -> bool:
+        """
+        Çalışmada görülmeyen kaynakların silinip silinmeyeceğini belirler.
+        
+        Yalnızca kaynağın tamamını gören çalışmalar kaybolan kaynakları
+        güvenle silebilir; kontrol noktasından devam eden veya artımlı
+        çalışmalar kısmi kabul edilir.
+        
+        Args:
+            config: Ajan yapılandırması
+            result: Sonuç nesnesi
+            
+        Returns:
+            bool: Silme yapılacaksa True
+        """
+        if result.metadata.get("partial"):
+            return False
         
-        # Vektör deposuna ekle
-        if all_chunks:
-            self.vector_store.add_batch(all_chunks)
+        return bool(config.options.get("delete_missing", config.agent_type in FULL_SCAN_AGENT_TYPES))
     
     def _load_configs(self) -> None:
         """
@@ -6,7 +6,7 @@ import time
 import uuid
 from enum import Enum
 from dataclasses import dataclass, field
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Callable
 
 class AgentType(str, Enum):
     """Ajan türleri."""
@@ -42,6 +42,7 @@ class AgentConfig:
     last_run: Optional[float] = None
     error_count: int = 0
     max_items: int = 100
+    state: Dict[str, Any] = field(default_factory=dict)  # Çalışmalar arası durum (kontrol noktaları vb.)
     
     def to_dict(self) -> Dict[str, Any]:
         """Ayarları sözlüğe dönüştürür."""
@@ -59,7 +60,8 @@ class AgentConfig:
             "enabled": self.enabled,
             "last_run": self.last_run,
             "error_count": self.error_count,
-            "max_items": self.max_items
+            "max_items": self.max_items,
+            "state": self.state
         }
     
     @classmethod
@@ -80,6 +82,28 @@ class AgentResult:
     start_time: float = field(default_factory=time.time)
     end_time: Optional[float] = None
     item_count: int = 0
+    # Belgeleri toplu olarak işleyen hedef (ör. vektör deposu); None ise belgeler bellekte biriktirilir
+    document_sink: Optional[Callable[[List[Any], Optional[Dict[str, Any]]], None]] = field(default=None, repr=False)
+    # Değişiklik tespiti için ajan manifestosu (SourceManifest)
+    manifest: Optional[Any] = field(default=None, repr=False)
+    
+    def emit_documents(self, documents: List[Any], state: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Bir belge grubunu teslim eder.
+        
+        Hedef tanımlıysa grup hemen işlenir ve bellekte tutulmaz; durum
+        (ör. kontrol noktası) yalnızca grup işlendikten sonra kaydedilir.
+        
+        Args:
+            documents: Belge grubu
+            state: Grup işlendikten sonra kalıcı hale getirilecek ajan durumu
+        """
+        if self.document_sink is None:
+            self.documents.extend(documents)
+            return
+        
+        self.document_sink(documents, state)
+        self.item_count += len(documents)
     
     def to_dict(self) -> Dict[str, Any]:
         """Sonuçları sözlüğe dönüştürür."""
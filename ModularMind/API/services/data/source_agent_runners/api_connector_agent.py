@@ -3,12 +3,12 @@ API bağlantı ajan çalıştırıcısı.
 """
 
 import logging
-import uuid
 import time
 import json
 from typing import Dict, Any
 
 from ModularMind.API.services.retrieval.models import Document
+from ModularMind.API.services.data.source_manifest import make_document_id, content_hash
 
 logger = logging.getLogger(__name__)
 
@@ -105,6 +105,7 @@ def run_api_connector(config, result):
             # Metin ve başlık alanlarını bul
             text_field = config.options.get("text_field", "")
             title_field = config.options.get("title_field", "")
+            id_field = config.options.get("id_field", "")
             
             # Metin içeriğini al
             text = ""
@@ -120,9 +121,16 @@ def run_api_connector(config, result):
             if title_field and title_field in item:
                 title = str(item[title_field])
             
+            # Kaynak anahtarı: kimlik alanı verildiyse öğe kimliği, yoksa içerik özeti
+            if id_field and id_field in item:
+                source_key = f"{api_url}:{item[id_field]}"
+            else:
+                source_key = f"{api_url}:{content_hash(text)}"
+            
             # Metadata
             metadata = {
                 "source": api_url,
+                "source_key": source_key,
                 "source_type": "api",
                 "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
                 "api_method": method
@@ -138,7 +146,7 @@ def run_api_connector(config, result):
                 metadata["title"] = title
             
             # Belge oluştur
-            doc_id = f"api_{uuid.uuid4().hex}"
+            doc_id = make_document_id("api", source_key)
             document = Document(
                 id=doc_id,
                 text=text,
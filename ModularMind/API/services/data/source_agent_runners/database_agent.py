@@ -2,15 +2,25 @@
 Veritabanı bağlantı ajan çalıştırıcısı.
 """
 
-import logging
-import uuid
+import json
 import time
-from typing import Dict, Any
+import uuid
+import hashlib
+import logging
+import datetime
+from typing import Dict, Any, List, Optional, Tuple
 
 from ModularMind.API.services.retrieval.models import Document
+from ModularMind.API.services.data.source_manifest import make_document_id, content_hash
 
 logger = logging.getLogger(__name__)
 
+# Sunucu taraflı imleçten tek seferde okunan satır sayısı
+DEFAULT_FETCH_SIZE = 1000
+
+# Ajan durumunda keyset kontrol noktasının anahtarı
+CHECKPOINT_STATE_KEY = "postgres_checkpoint"
+
 def run_database_connector(config, result):
     """
     Veritabanı bağlantı ajanını çalıştırır.
@@ -32,7 +42,16 @@ def run_database_connector(config, result):
         raise ValueError(f"Desteklenmeyen veritabanı tipi: {db_type}")
 
 def _run_postgres_connector(config, result):
-    """PostgreSQL bağlantı ajanını çalıştırır."""
+    """
+    PostgreSQL bağlantı ajanını çalıştırır.
+    
+    Sorgu adlandırılmış (sunucu taraflı) bir imleçle çalıştırılır ve satırlar
+    `fetch_size` büyüklüğündeki gruplar halinde okunur; her grup belgeye
+    dönüştürülüp hemen teslim edilir, böylece bellek kullanımı tablo
+    boyutundan bağımsız kalır. `key_column` verildiğinde satırlar bu anahtara
+    göre sıralanır ve her gruptan sonra son anahtar kontrol noktası olarak
+    kaydedilir; yarıda kalan çalışma bu noktadan devam eder.
+    """
     import psycopg2
     import psycopg2.extras
     
@@ -48,6 +67,21 @@ def _run_postgres_connector(config, result):
     if not query:
         raise ValueError("Veritabanı sorgusu gereklidir")
     
+    # Akış ayarları
+    fetch_size = max(1, int(config.options.get("fetch_size", DEFAULT_FETCH_SIZE)))
+    key_columns = _get_key_columns(config.options.get("key_column"))
+    keep_checkpoint = bool(config.options.get("keep_checkpoint", False))
+    
+    # Önceki çalışmadan kalan kontrol noktası
+    query_hash = _query_hash(query, key_columns)
+    last_key = _load_checkpoint(config, query_hash)
+    sql, params = _build_keyset_query(query, key_columns, last_key)
+    
+    if last_key is not None:
+        logger.info(f"Veritabanı ajanı kontrol noktasından devam ediyor: {dict(zip(key_columns, last_key))}")
+        # Kontrol noktasından devam eden çalışma tablonun tamamını görmez
+        result.metadata["partial"] = True
+    
     # Bağlan
     if connection_string:
         conn = psycopg2.connect(connection_string)
@@ -60,49 +94,44 @@ def _run_postgres_connector(config, result):
             password=password
         )
     
-    # Dict cursor kullan
-    conn.cursor_factory = psycopg2.extras.RealDictCursor
+    row_count = 0
+    # Anahtar sütun yoksa aynı içerikli satırları ayırmak için içerik özeti -> görülme sayısı
+    occurrences: Dict[str, int] = {}
     
     try:
-        with conn.cursor() as cursor:
-            # Sorguyu çalıştır
-            cursor.execute(query)
+        # Adlandırılmış imleç sonuçları sunucuda tutar
+        cursor_name = f"modularmind_{uuid.uuid4().hex}"
+        
+        with conn.cursor(name=cursor_name, cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+            cursor.itersize = fetch_size
+            cursor.execute(sql, params or None)
             
-            # Sonuçları al
-            rows = cursor.fetchall()
-            
-            # Belgeleri oluştur
-            documents = []
-            
-            for row in rows:
-                # Metin dönüşümü
-                text = _format_row_as_text(row)
-                
-                # Belge oluştur
-                doc_id = f"db_{uuid.uuid4().hex}"
-                metadata = {
-                    "source": f"postgres:{dbname}",
-                    "source_type": "database",
-                    "db_type": "postgres",
-                    "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
-                }
+            while True:
+                rows = cursor.fetchmany(fetch_size)
+                if not rows:
+                    break
                 
-                # Özel metadata alanlarını ekle
-                for key, value in row.items():
-                    if key in config.metadata_mapping:
-                        metadata[config.metadata_mapping[key]] = str(value)
+                documents = [
+                    _row_to_document(row, config, f"postgres:{dbname}", "postgres", key_columns, occurrences)
+                    for row in rows
+                ]
+                row_count += len(rows)
                 
-                document = Document(
-                    id=doc_id,
-                    text=text,
-                    metadata=metadata
-                )
+                state = None
+                if key_columns:
+                    last_key = _row_key(rows[-1], key_columns)
+                    state = {CHECKPOINT_STATE_KEY: _checkpoint_state(query_hash, key_columns, last_key)}
                 
-                documents.append(document)
-            
-            # Sonucu güncelle
-            result.documents = documents
-            result.metadata["row_count"] = len(rows)
+                result.emit_documents(documents, state)
+        
+        # Sonucu güncelle
+        result.metadata["row_count"] = row_count
+        
+        # Tamamlanan çalışmanın kontrol noktası yalnızca artımlı modda korunur
+        if key_columns and keep_checkpoint and last_key is not None:
+            config.state[CHECKPOINT_STATE_KEY] = _checkpoint_state(query_hash, key_columns, last_key)
+        else:
+            config.state.pop(CHECKPOINT_STATE_KEY, None)
     
     finally:
         conn.close()
@@ -117,6 +146,140 @@ def _run_sqlite_connector(config, result):
     # Bu implementasyon gerçek uygulamada tamamlanmalıdır
     pass
 
+def _row_to_document(
+    row,
+    config,
+    source: str,
+    db_type: str,
+    key_columns: Optional[List[str]] = None,
+    occurrences: Optional[Dict[str, int]] = None
+) -> Document:
+    """
+    Veritabanı satırından belge oluşturur.
+    
+    Anahtar sütun yoksa kimlik içerikten türetilir; aynı içerikli satırlar
+    `occurrences` sayacındaki görülme sırasıyla ayrılır (ilk satırın anahtarı
+    sırasız kalır, böylece tekil satırların kimlikleri değişmez).
+    """
+    # Metin dönüşümü
+    text = _format_row_as_text(row)
+    
+    # Anahtar sütun varsa satır kimliği anahtardan, yoksa içerikten türetilir
+    if key_columns:
+        source_key = f"{source}:{json.dumps(_row_key(row, key_columns))}"
+    else:
+        digest = content_hash(text)
+        source_key = f"{source}:{digest}"
+        if occurrences is not None:
+            occurrence = occurrences.get(digest, 0)
+            occurrences[digest] = occurrence + 1
+            if occurrence:
+                source_key = f"{source_key}:{occurrence}"
+    
+    # Belge oluştur
+    doc_id = make_document_id("db", source_key)
+    metadata = {
+        "source": source,
+        "source_key": source_key,
+        "source_type": "database",
+        "db_type": db_type,
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
+    }
+    
+    # Özel metadata alanlarını ekle
+    for key, value in row.items():
+        if key in config.metadata_mapping:
+            metadata[config.metadata_mapping[key]] = str(value)
+    
+    return Document(
+        id=doc_id,
+        text=text,
+        metadata=metadata
+    )
+
+def _get_key_columns(key_column) -> List[str]:
+    """Keyset sayfalama için anahtar sütun listesini döndürür."""
+    if not key_column:
+        return []
+    if isinstance(key_column, str):
+        return [key_column]
+    return list(key_column)
+
+def _quote_identifier(name: str) -> str:
+    """SQL tanımlayıcısını çift tırnakla kaçışlar."""
+    return '"' + name.replace('"', '""') + '"'
+
+def _build_keyset_query(query: str, key_columns: List[str], last_key: Optional[List[Any]]) -> Tuple[str, Tuple[Any, ...]]:
+    """
+    Kullanıcı sorgusunu keyset sayfalama için sarar.
+    
+    Args:
+        query: Kullanıcı sorgusu
+        key_columns: Anahtar sütunlar (boşsa sorgu olduğu gibi kullanılır)
+        last_key: Kontrol noktasındaki son anahtar değerleri
+        
+    Returns:
+        Tuple[str, Tuple[Any, ...]]: SQL ve parametreler
+    """
+    query = query.strip().rstrip(";").strip()
+    
+    if not key_columns:
+        return query, ()
+    
+    columns = ", ".join(f"source_rows.{_quote_identifier(column)}" for column in key_columns)
+    sql = f"SELECT * FROM ({query}) AS source_rows"
+    params: Tuple[Any, ...] = ()
+    
+    if last_key is not None:
+        # Satır karşılaştırması bileşik anahtarlarda da sıralamayla tutarlıdır
+        placeholders = ", ".join(["%s"] * len(key_columns))
+        sql += f" WHERE ({columns}) > ({placeholders})"
+        params = tuple(last_key)
+    
+    sql += f" ORDER BY {columns}"
+    
+    return sql, params
+
+def _query_hash(query: str, key_columns: List[str]) -> str:
+    """Sorgu ve anahtar sütunlar için kontrol noktası özeti üretir."""
+    content = json.dumps({"query": query.strip(), "key_columns": key_columns})
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+def _row_key(row, key_columns: List[str]) -> List[Any]:
+    """Satırın anahtar değerlerini JSON'a yazılabilir biçimde döndürür."""
+    values = []
+    for column in key_columns:
+        value = row[column]
+        if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+            value = value.isoformat()
+        elif value is not None and not isinstance(value, (str, int, float, bool)):
+            # Decimal, UUID vb. metin olarak saklanır; PostgreSQL karşılaştırmada türü çıkarır
+            value = str(value)
+        values.append(value)
+    return values
+
+def _checkpoint_state(query_hash: str, key_columns: List[str], last_key: List[Any]) -> Dict[str, Any]:
+    """Kontrol noktası kaydını oluşturur."""
+    return {
+        "query_hash": query_hash,
+        "key_columns": key_columns,
+        "last_key": last_key,
+        "updated_at": time.time()
+    }
+
+def _load_checkpoint(config, query_hash: str) -> Optional[List[Any]]:
+    """Sorgu değişmediyse kontrol noktasındaki son anahtarı döndürür."""
+    checkpoint = config.state.get(CHECKPOINT_STATE_KEY)
+    
+    if not checkpoint or not checkpoint.get("key_columns"):
+        return None
+    
+    if checkpoint.get("query_hash") != query_hash:
+        logger.info("Veritabanı sorgusu değişti, kontrol noktası yok sayılıyor")
+        return None
+    
+    return checkpoint.get("last_key")
+
 def _format_row_as_text(row):
     """Veritabanı satırını metin olarak formatlar."""
     text = ""
@@ -3,13 +3,13 @@ E-posta ajan çalıştırıcısı.
 """
 
 import logging
-import uuid
 import time
 import email
 from typing import Dict, Any
 from email.header import decode_header
 
 from ModularMind.API.services.retrieval.models import Document
+from ModularMind.API.services.data.source_manifest import make_document_id, content_hash
 
 logger = logging.getLogger(__name__)
 
@@ -146,9 +146,14 @@ def _run_imap_reader(config, result):
             # Metin oluştur
             text = f"From: {from_addr}\nSubject: {subject}\nDate: {date_str}\n\n{body}"
             
+            # Kaynak anahtarı: Message-ID başlığı, yoksa içerik özeti
+            message_id = (msg.get("Message-ID") or "").strip() or content_hash(text)
+            source_key = f"email:{username}:{message_id}"
+            
             # Metadata
             metadata = {
                 "source": f"email:{username}",
+                "source_key": source_key,
                 "source_type": "email",
                 "from": from_addr,
                 "subject": subject,
@@ -158,7 +163,7 @@ def _run_imap_reader(config, result):
             }
             
             # Belge oluştur
-            doc_id = f"email_{uuid.uuid4().hex}"
+            doc_id = make_document_id("email", source_key)
             document = Document(
                 id=doc_id,
                 text=text,
@@ -278,9 +283,14 @@ def _run_pop3_reader(config, result):
             # Metin oluştur
             text = f"From: {from_addr}\nSubject: {subject}\nDate: {date_str}\n\n{body}"
             
+            # Kaynak anahtarı: Message-ID başlığı, yoksa içerik özeti
+            message_id = (msg.get("Message-ID") or "").strip() or content_hash(text)
+            source_key = f"email:{username}:{message_id}"
+            
             # Metadata
             metadata = {
                 "source": f"email:{username}",
+                "source_key": source_key,
                 "source_type": "email",
                 "from": from_addr,
                 "subject": subject,
@@ -289,7 +299,7 @@ def _run_pop3_reader(config, result):
             }
             
             # Belge oluştur
-            doc_id = f"email_{uuid.uuid4().hex}"
+            doc_id = make_document_id("email", source_key)
             document = Document(
                 id=doc_id,
                 text=text,
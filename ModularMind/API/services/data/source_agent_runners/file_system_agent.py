@@ -4,18 +4,44 @@ Dosya sistemi ajan çalıştırıcısı.
 
 import logging
 import os
-import uuid
 import time
-from typing import Dict, Any
+import signal
+import asyncio
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, Future, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, List, Iterator, Optional, Set, Tuple
 
 from ModularMind.API.services.retrieval.models import Document
+from ModularMind.API.services.data.source_manifest import make_document_id
 
 logger = logging.getLogger(__name__)
 
+# Doğrudan okunan metin dosyaları (G/Ç ağırlıklı, thread havuzunda okunur)
+TEXT_EXTENSIONS = {".txt", ".md", ".csv"}
+
+# Ayrıştırıcı gerektiren dosyalar (CPU ağırlıklı, süreç havuzunda işlenir)
+PARSED_EXTENSIONS = {".pdf", ".docx", ".html", ".htm"}
+
+# Dosya başına varsayılan sınırlar
+DEFAULT_MAX_FILE_SIZE = 50 * 1024 * 1024
+DEFAULT_PARSE_TIMEOUT = 60.0
+
+# Aktarım hattına tek seferde iletilen belge sayısı
+DEFAULT_BATCH_SIZE = 64
+
+class ParseTimeoutError(Exception):
+    """Dosya ayrıştırma süre sınırını aştığında fırlatılır."""
+
 def run_file_system(config, result):
     """
     Dosya sistemi ajanını çalıştırır.
-    
+
+    Klasör `os.scandir` ile taranır; metin dosyaları bir thread havuzunda,
+    PDF/DOCX/HTML dosyaları bir süreç havuzunda ayrıştırılır. Bekleyen iş
+    sayısı sınırlıdır ve ayrıştırılan belgeler gruplar halinde teslim edilir,
+    böylece çok büyük klasörler sabit bellekle ve tüm çekirdeklerle işlenir.
+
     Args:
         config: Ajan yapılandırması
         result: Sonuç nesnesi
@@ -24,60 +50,298 @@ def run_file_system(config, result):
     folder_path = config.source_url
     if not folder_path or not os.path.isdir(folder_path):
         raise ValueError(f"Geçerli bir klasör yolu değil: {folder_path}")
-    
+
     # Dosya uzantılarını al
-    extensions = config.options.get("extensions", [".txt", ".md", ".pdf", ".docx"])
-    
+    extensions = {ext.lower() for ext in config.options.get("extensions", [".txt", ".md", ".pdf", ".docx"])}
+
     # Son değişiklik zamanını kontrol et
     check_mtime = config.options.get("check_mtime", True)
-    
-    # Dokümanlar
-    documents = []
-    
-    # Dosyaları tara
-    for root, _, files in os.walk(folder_path):
-        for file in files:
-            # Uzantıyı kontrol et
-            _, ext = os.path.splitext(file)
-            if ext.lower() not in extensions:
+
+    # Tarama ve ayrıştırma ayarları
+    recursive = config.options.get("recursive", True)
+    max_file_size = int(config.options.get("max_file_size", DEFAULT_MAX_FILE_SIZE))
+    parse_timeout = float(config.options.get("parse_timeout", DEFAULT_PARSE_TIMEOUT))
+    batch_size = max(1, int(config.options.get("batch_size", DEFAULT_BATCH_SIZE)))
+    workers = int(config.options.get("workers", os.cpu_count() or 1))
+
+    # Manifesto varsa değişmeyen dosyalar boyut ve değişiklik zamanıyla atlanır
+    manifest = getattr(result, "manifest", None)
+
+    counters = {
+        "scanned_files": 0,
+        "unchanged_files": 0,
+        "skipped_files": 0,
+        "failed_files": 0
+    }
+    batch: List[Document] = []
+
+    def handle(job: "_ParseJob", outcome: Tuple[str, Dict[str, Any]]) -> None:
+        batch.append(_create_document(job, *outcome))
+        if len(batch) >= batch_size:
+            result.emit_documents(batch[:])
+            batch.clear()
+
+    def handle_error(job: "_ParseJob", error: Exception) -> None:
+        counters["failed_files"] += 1
+        logger.warning(f"Dosya ayrıştırılamadı: {job.path}: {str(error)}")
+
+        # Önceki içerik korunur; kaybolmuş sayılıp silinmemesi için görüldü işaretlenir
+        if manifest is not None:
+            manifest.mark_seen([job.source_key])
+
+    with _ParserPool(workers, parse_timeout, handle, handle_error) as pool:
+        for path, ext, stat in _scan_files(folder_path, extensions, recursive):
+            counters["scanned_files"] += 1
+
+            # Boyut sınırı
+            if stat.st_size > max_file_size:
+                counters["skipped_files"] += 1
+                logger.info(f"Dosya boyut sınırını aşıyor, atlanıyor: {path} ({stat.st_size} bayt)")
                 continue
-            
-            # Tam dosya yolu
-            file_path = os.path.join(root, file)
-            
-            # Değişiklik zamanını kontrol et
-            if check_mtime and config.last_run:
-                mtime = os.path.getmtime(file_path)
-                if mtime <= config.last_run:
+
+            source_key = os.path.abspath(path)
+            fingerprint = f"{stat.st_size}:{stat.st_mtime_ns}"
+
+            # Değişiklik kontrolü
+            if manifest is not None:
+                if manifest.is_unchanged(source_key, fingerprint):
+                    counters["unchanged_files"] += 1
+                    continue
+            elif check_mtime and config.last_run:
+                if stat.st_mtime <= config.last_run:
                     continue
-            
-            # Belge metni burada yüklenmeli
-            # Gerçek bir uygulamada dosya tipine göre uygun parser kullanılmalı
-            
-            # Basit metin örneği
-            if ext.lower() in [".txt", ".md"]:
-                with open(file_path, "r", encoding="utf-8") as f:
-                    text = f.read()
-                    
-                # Metadata
-                metadata = {
-                    "source": file_path,
-                    "title": os.path.basename(file),
-                    "source_type": "file",
-                    "file_type": ext.lstrip("."),
-                    "modified_time": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(os.path.getmtime(file_path)))
-                }
-                
-                # Belge oluştur
-                doc_id = f"file_{uuid.uuid4().hex}"
-                document = Document(
-                    id=doc_id,
-                    text=text,
-                    metadata=metadata
-                )
-                
-                # Belgeyi listeye ekle
-                documents.append(document)
-    
+
+            pool.submit(_ParseJob(path, ext, source_key, fingerprint, stat.st_mtime))
+
+    # Kalan belgeleri teslim et
+    if batch:
+        result.emit_documents(batch)
+
     # Sonucu güncelle
-    result.documents = documents
\ No newline at end of file
+    result.metadata.update(counters)
+
+class _ParseJob:
+    """Ayrıştırılacak dosya bilgisi."""
+
+    __slots__ = ("path", "ext", "source_key", "fingerprint", "mtime")
+
+    def __init__(self, path: str, ext: str, source_key: str, fingerprint: str, mtime: float):
+        self.path = path
+        self.ext = ext
+        self.source_key = source_key
+        self.fingerprint = fingerprint
+        self.mtime = mtime
+
+class _ParserPool:
+    """
+    Dosya ayrıştırma işlerini thread ve süreç havuzlarına dağıtır.
+
+    Bekleyen iş sayısı işçi sayısının birkaç katıyla sınırlıdır; sınır
+    dolduğunda yeni iş eklemeden önce tamamlanan işler işlenir.
+    """
+
+    def __init__(self, workers: int, parse_timeout: float, on_result, on_error):
+        self.workers = max(0, workers)
+        self.parse_timeout = parse_timeout
+        self.on_result = on_result
+        self.on_error = on_error
+        self.max_pending = max(1, self.workers) * 4
+        self.pending: Dict[Future, _ParseJob] = {}
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._processes: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self) -> "_ParserPool":
+        if self.workers > 0:
+            self._threads = ThreadPoolExecutor(max_workers=min(32, self.workers * 2))
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        try:
+            if exc_type is None:
+                self._drain(until=0)
+        finally:
+            for future in self.pending:
+                future.cancel()
+            self.pending.clear()
+            if self._threads is not None:
+                self._threads.shutdown(wait=True)
+            if self._processes is not None:
+                self._processes.shutdown(wait=True, cancel_futures=True)
+        return False
+
+    def submit(self, job: _ParseJob) -> None:
+        """İşi uygun havuza gönderir (işçi yoksa aynı thread'de çalıştırır)."""
+        if self.workers == 0:
+            try:
+                outcome = _parse_file(job.path, job.ext, 0)
+            except Exception as e:
+                self.on_error(job, e)
+            else:
+                self.on_result(job, outcome)
+            return
+
+        if job.ext in TEXT_EXTENSIONS:
+            future = self._threads.submit(_parse_file, job.path, job.ext, 0)
+        else:
+            future = self._process_pool().submit(_parse_file, job.path, job.ext, self.parse_timeout)
+
+        self.pending[future] = job
+
+        if len(self.pending) >= self.max_pending:
+            self._drain(until=self.max_pending - 1)
+
+    def _process_pool(self) -> ProcessPoolExecutor:
+        """Süreç havuzunu ilk ihtiyaçta oluşturur."""
+        if self._processes is None:
+            # fork, çalışan thread'leri (zamanlayıcı, embedding döngüsü) olan süreçte güvenli değildir
+            self._processes = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._processes
+
+    def _reset_process_pool(self) -> None:
+        """Bozulan süreç havuzunu kapatır."""
+        if self._processes is not None:
+            self._processes.shutdown(wait=False, cancel_futures=True)
+            self._processes = None
+
+    def _drain(self, until: int) -> None:
+        """Bekleyen iş sayısı `until` değerine inene kadar tamamlananları işler."""
+        while len(self.pending) > until:
+            done, _ = wait(list(self.pending), return_when=FIRST_COMPLETED)
+
+            for future in done:
+                job = self.pending.pop(future)
+                try:
+                    outcome = future.result()
+                except BrokenProcessPool as e:
+                    # Çöken işçi havuzu kullanılamaz; sonraki işler için yeniden oluşturulur
+                    self._reset_process_pool()
+                    self.on_error(job, e)
+                except Exception as e:
+                    self.on_error(job, e)
+                else:
+                    self.on_result(job, outcome)
+
+def _scan_files(folder_path: str, extensions: Set[str], recursive: bool = True) -> Iterator[Tuple[str, str, os.stat_result]]:
+    """
+    Klasördeki uygun dosyaları `os.scandir` ile tarar.
+
+    Args:
+        folder_path: Kök klasör
+        extensions: Kabul edilen uzantılar (küçük harf)
+        recursive: Alt klasörler taransın mı
+
+    Yields:
+        Tuple[str, str, os.stat_result]: Dosya yolu, uzantı ve dosya bilgisi
+    """
+    stack = [folder_path]
+
+    while stack:
+        directory = stack.pop()
+
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if recursive:
+                                stack.append(entry.path)
+                            continue
+
+                        if not entry.is_file():
+                            continue
+
+                        # Uzantıyı kontrol et
+                        ext = os.path.splitext(entry.name)[1].lower()
+                        if ext not in extensions:
+                            continue
+
+                        yield entry.path, ext, entry.stat()
+                    except OSError as e:
+                        logger.warning(f"Dosya bilgisi okunamadı: {entry.path}: {str(e)}")
+        except OSError as e:
+            logger.warning(f"Klasör okunamadı: {directory}: {str(e)}")
+
+def _parse_file(path: str, ext: str, timeout: float = 0) -> Tuple[str, Dict[str, Any]]:
+    """
+    Dosyayı uzantısına göre ayrıştırır.
+
+    Süreç havuzunda çalışırken süre sınırı SIGALRM ile uygulanır, böylece
+    takılan bir ayrıştırıcı işçiyi bloke etmez.
+
+    Args:
+        path: Dosya yolu
+        ext: Dosya uzantısı
+        timeout: Saniye cinsinden süre sınırı (0 ise sınırsız)
+
+    Returns:
+        Tuple[str, Dict[str, Any]]: Metin ve ek metadata
+    """
+    use_alarm = (
+        timeout > 0
+        and hasattr(signal, "setitimer")
+        and multiprocessing.parent_process() is not None
+    )
+
+    if use_alarm:
+        def on_timeout(signum, frame):
+            raise ParseTimeoutError(f"Ayrıştırma {timeout} saniyeyi aştı")
+
+        previous = signal.signal(signal.SIGALRM, on_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+
+    try:
+        if ext in TEXT_EXTENSIONS:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                return f.read(), {}
+
+        from ModularMind.API.services.retrieval import document_loader
+
+        filename = os.path.basename(path)
+
+        if ext in (".html", ".htm"):
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                document = document_loader.extract_html_content(f.read(), filename)
+        else:
+            with open(path, "rb") as f:
+                content = f.read()
+
+            if ext == ".pdf":
+                document = asyncio.run(document_loader.extract_pdf_content(content, filename))
+            elif ext == ".docx":
+                document = asyncio.run(document_loader.extract_docx_content(content, filename))
+            else:
+                raise ValueError(f"Desteklenmeyen dosya tipi: {ext}")
+
+        extra_metadata = {}
+        if "page_count" in document.metadata:
+            extra_metadata["page_count"] = document.metadata["page_count"]
+
+        return document.text, extra_metadata
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+
+def _create_document(job: _ParseJob, text: str, extra_metadata: Dict[str, Any]) -> Document:
+    """Ayrıştırılan dosyadan belge oluşturur."""
+    # Metadata
+    metadata = {
+        "source": job.path,
+        "source_key": job.source_key,
+        "source_fingerprint": job.fingerprint,
+        "title": os.path.basename(job.path),
+        "source_type": "file",
+        "file_type": job.ext.lstrip("."),
+        "modified_time": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(job.mtime))
+    }
+    metadata.update(extra_metadata)
+
+    # Belge oluştur
+    return Document(
+        id=make_document_id("file", job.source_key),
+        text=text,
+        metadata=metadata
+    )
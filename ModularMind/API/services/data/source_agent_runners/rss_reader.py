@@ -3,11 +3,11 @@ RSS Okuyucu ajan çalıştırıcısı.
 """
 
 import logging
-import uuid
 import time
 from typing import Dict, Any
 
 from ModularMind.API.services.retrieval.models import Document
+from ModularMind.API.services.data.source_manifest import make_document_id, content_hash
 
 logger = logging.getLogger(__name__)
 
@@ -79,9 +79,13 @@ def run_rss_reader(config, result):
             # Metin oluştur
             text = f"{title}\n\n{content}"
             
+            # Kaynak anahtarı: girdi kimliği, bağlantı veya içerik özeti
+            source_key = entry.get("id") or link or content_hash(text)
+            
             # Metadata
             metadata = {
                 "source": link,
+                "source_key": source_key,
                 "title": title,
                 "source_type": "rss",
                 "publish_date": publish_date,
@@ -91,7 +95,7 @@ def run_rss_reader(config, result):
             }
             
             # Belge oluştur
-            doc_id = f"rss_{uuid.uuid4().hex}"
+            doc_id = make_document_id("rss", source_key)
             document = Document(
                 id=doc_id,
                 text=text,
@@ -3,11 +3,11 @@ Web Crawler ajan çalıştırıcısı.
 """
 
 import logging
-import uuid
 import time
 from typing import Dict, Any
 
 from ModularMind.API.services.retrieval.models import Document
+from ModularMind.API.services.data.source_manifest import make_document_id
 
 logger = logging.getLogger(__name__)
 
@@ -84,6 +84,7 @@ def run_web_crawler(config, result):
                 # Metadata oluştur
                 metadata = {
                     "source": current_url,
+                    "source_key": current_url,
                     "title": title,
                     "source_type": "web",
                     "crawl_depth": depth,
@@ -97,7 +98,7 @@ def run_web_crawler(config, result):
                         metadata[meta_key] = meta_elem.get_text().strip()
                 
                 # Belge oluştur
-                doc_id = f"web_{uuid.uuid4().hex}"
+                doc_id = make_document_id("web", current_url)
                 document = Document(
                     id=doc_id,
                     text=text,
@@ -0,0 +1,296 @@
+"""
+Veri kaynak ajanları için içerik özeti manifestosu.
+
+Her ajan, daha önce işlediği kaynakları (dosya, satır, URL vb.) kararlı bir
+kaynak anahtarıyla, içerik özetiyle ve parça özetleriyle birlikte kaydeder.
+Böylece tekrar eden çalışmalarda yalnızca yeni veya değişen parçalar
+parçalanıp embedding'e gönderilir, kaybolan kaynakların parçaları silinir.
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Dict, List, Any, Optional, Tuple, Iterable
+
+logger = logging.getLogger(__name__)
+
+# sqlite bir ifadede bağlanabilecek parametre sayısını sınırlar
+_SQL_BATCH = 500
+
+def content_hash(text: str) -> str:
+    """
+    Metnin içerik özetini hesaplar.
+
+    Args:
+        text: Metin
+
+    Returns:
+        str: Onaltılık özet
+    """
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+def make_document_id(prefix: str, source_key: str) -> str:
+    """
+    Kaynak anahtarından kararlı belge ID'si üretir.
+
+    Aynı kaynak her çalışmada aynı ID'yi alır, bu sayede parça ID'leri de
+    çalışmalar arasında sabit kalır.
+
+    Args:
+        prefix: ID öneki (ör. "file", "db")
+        source_key: Kaynak anahtarı
+
+    Returns:
+        str: Belge ID'si
+    """
+    return f"{prefix}_{content_hash(source_key)}"
+
+class SourceManifest:
+    """
+    Bir ajanın işlediği kaynakların sqlite tabanlı manifestosu.
+
+    Her çalışma bir çalışma numarası alır; görülen kaynaklar bu numarayla
+    işaretlenir ve çalışma sonunda işaretlenmeyenler kaybolmuş sayılır.
+    Değişiklikler grup halinde `commit` ile kalıcı hale getirilir.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Manifesto veritabanı dosyası
+        """
+        self.path = path
+        self.run_id = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS sources ("
+            "source_key TEXT PRIMARY KEY, document_id TEXT NOT NULL, "
+            "content_hash TEXT NOT NULL, fingerprint TEXT, "
+            "last_seen_run INTEGER NOT NULL, updated_at REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            "chunk_id TEXT PRIMARY KEY, source_key TEXT NOT NULL, chunk_hash TEXT NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS chunks_by_source ON chunks (source_key);"
+            "CREATE TABLE IF NOT EXISTS runs (run_id INTEGER PRIMARY KEY AUTOINCREMENT, started_at REAL NOT NULL);"
+        )
+        self._conn.commit()
+
+    def begin_run(self) -> int:
+        """
+        Yeni bir çalışma başlatır.
+
+        Returns:
+            int: Çalışma numarası
+        """
+        with self._lock:
+            cursor = self._conn.execute("INSERT INTO runs (started_at) VALUES (?)", (time.time(),))
+            self._conn.commit()
+            self.run_id = cursor.lastrowid
+        return self.run_id
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM sources").fetchone()[0]
+
+    def get_source(self, source_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Kaynak kaydını döndürür.
+
+        Args:
+            source_key: Kaynak anahtarı
+
+        Returns:
+            Optional[Dict[str, Any]]: document_id, content_hash ve fingerprint alanları
+        """
+        return self.get_sources([source_key]).get(source_key)
+
+    def get_sources(self, source_keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Birden fazla kaynak kaydını tek seferde döndürür.
+
+        Args:
+            source_keys: Kaynak anahtarları
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Kaynak anahtarı -> kayıt
+        """
+        keys = list(dict.fromkeys(source_keys))
+        found = {}
+
+        with self._lock:
+            for start in range(0, len(keys), _SQL_BATCH):
+                batch = keys[start:start + _SQL_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT source_key, document_id, content_hash, fingerprint FROM sources "
+                    f"WHERE source_key IN ({placeholders})",
+                    batch
+                ).fetchall()
+
+                for source_key, document_id, digest, fingerprint in rows:
+                    found[source_key] = {
+                        "document_id": document_id,
+                        "content_hash": digest,
+                        "fingerprint": fingerprint
+                    }
+
+        return found
+
+    def get_chunk_hashes(self, source_key: str) -> Dict[str, str]:
+        """
+        Kaynağın kayıtlı parça özetlerini döndürür.
+
+        Args:
+            source_key: Kaynak anahtarı
+
+        Returns:
+            Dict[str, str]: Parça ID -> parça özeti
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT chunk_id, chunk_hash FROM chunks WHERE source_key = ?",
+                (source_key,)
+            ).fetchall()
+        return dict(rows)
+
+    def is_unchanged(self, source_key: str, fingerprint: str) -> bool:
+        """
+        Kaynağın parmak izi (ör. boyut ve değişiklik zamanı) değişmediyse
+        kaynağı görüldü olarak işaretler.
+
+        İçeriği okumadan değişmemiş kaynakları atlamak için kullanılır.
+
+        Args:
+            source_key: Kaynak anahtarı
+            fingerprint: Güncel parmak izi
+
+        Returns:
+            bool: Kaynak değişmediyse True
+        """
+        record = self.get_source(source_key)
+        if record is None or record["fingerprint"] != fingerprint:
+            return False
+
+        self.mark_seen([source_key])
+        return True
+
+    def mark_seen(self, source_keys: Iterable[str]) -> None:
+        """
+        Kaynakları bu çalışmada görüldü olarak işaretler.
+
+        Args:
+            source_keys: Kaynak anahtarları
+        """
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE sources SET last_seen_run = ? WHERE source_key = ?",
+                [(self.run_id, source_key) for source_key in source_keys]
+            )
+
+    def set_fingerprint(self, source_key: str, fingerprint: str) -> None:
+        """
+        İçeriği değişmeyen kaynağın parmak izini günceller.
+
+        Args:
+            source_key: Kaynak anahtarı
+            fingerprint: Yeni parmak izi
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE sources SET fingerprint = ?, last_seen_run = ? WHERE source_key = ?",
+                (fingerprint, self.run_id, source_key)
+            )
+
+    def record(
+        self,
+        source_key: str,
+        document_id: str,
+        digest: str,
+        chunk_hashes: Dict[str, str],
+        fingerprint: Optional[str] = None
+    ) -> None:
+        """
+        Kaynağın güncel içerik ve parça özetlerini kaydeder.
+
+        Args:
+            source_key: Kaynak anahtarı
+            document_id: Belge ID'si
+            digest: İçerik özeti
+            chunk_hashes: Parça ID -> parça özeti
+            fingerprint: Kaynak parmak izi
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sources "
+                "(source_key, document_id, content_hash, fingerprint, last_seen_run, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (source_key, document_id, digest, fingerprint, self.run_id, time.time())
+            )
+            self._conn.execute("DELETE FROM chunks WHERE source_key = ?", (source_key,))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO chunks (chunk_id, source_key, chunk_hash) VALUES (?, ?, ?)",
+                [(chunk_id, source_key, chunk_hash) for chunk_id, chunk_hash in chunk_hashes.items()]
+            )
+
+    def missing_sources(self) -> List[Tuple[str, List[str]]]:
+        """
+        Bu çalışmada görülmeyen kaynakları döndürür.
+
+        Returns:
+            List[Tuple[str, List[str]]]: (kaynak anahtarı, parça ID'leri) listesi
+        """
+        with self._lock:
+            keys = [
+                row[0] for row in self._conn.execute(
+                    "SELECT source_key FROM sources WHERE last_seen_run < ?",
+                    (self.run_id,)
+                )
+            ]
+
+            missing = []
+            for source_key in keys:
+                chunk_ids = [
+                    row[0] for row in self._conn.execute(
+                        "SELECT chunk_id FROM chunks WHERE source_key = ?",
+                        (source_key,)
+                    )
+                ]
+                missing.append((source_key, chunk_ids))
+
+        return missing
+
+    def remove_sources(self, source_keys: Iterable[str]) -> None:
+        """
+        Kaynakları ve parçalarını manifestodan siler.
+
+        Args:
+            source_keys: Kaynak anahtarları
+        """
+        keys = [(source_key,) for source_key in source_keys]
+
+        with self._lock:
+            self._conn.executemany("DELETE FROM chunks WHERE source_key = ?", keys)
+            self._conn.executemany("DELETE FROM sources WHERE source_key = ?", keys)
+
+    def commit(self) -> None:
+        """Bekleyen değişiklikleri kalıcı hale getirir."""
+        with self._lock:
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Değişiklikleri kaydeder ve bağlantıyı kapatır."""
+        with self._lock:
+            try:
+                self._conn.commit()
+            finally:
+                self._conn.close()
@@ -12,9 +12,15 @@ import json
 from typing import List, Dict, Any, Optional, Union, Tuple
 from enum import Enum
 from dataclasses import dataclass
+import asyncio
 import threading
 import requests
 
+from ModularMind.API.services.embedding.cache import EmbeddingCache
+from ModularMind.API.services.embedding.batching import (
+    AsyncEmbeddingBatcher, ProviderLimits, run_coroutine_sync
+)
+
 logger = logging.getLogger(__name__)
 
 class EmbeddingModel(str, Enum):
@@ -28,6 +34,29 @@ class EmbeddingModel(str, Enum):
     LOCAL = "local"
     CUSTOM = "custom"
 
+# Asenkron batch işleyici ile çağrılan uzak sağlayıcılar
+REMOTE_MODEL_TYPES = (
+    EmbeddingModel.OPENAI,
+    EmbeddingModel.COHERE,
+    EmbeddingModel.GOOGLE,
+    EmbeddingModel.HUGGINGFACE
+)
+
+class _FallbackVector(list):
+    """Hesaplanamayan metin için döndürülen sıfır vektörü; önbelleğe yazılmaz."""
+
+def _fallback_vector(dimensions: int) -> List[float]:
+    """
+    Hata durumunda kullanılan, işaretli sıfır vektörü oluşturur.
+    
+    Args:
+        dimensions: Vektör boyutu
+        
+    Returns:
+        List[float]: Sıfır vektörü
+    """
+    return _FallbackVector([0.0] * dimensions)
+
 @dataclass
 class EmbeddingModelConfig:
     """Gömme modeli yapılandırması."""
@@ -42,6 +71,10 @@ class EmbeddingModelConfig:
     rate_limit_rpm: Optional[int] = None
     normalize: bool = True
     options: Optional[Dict[str, Any]] = None
+    rate_limit_tpm: Optional[int] = None  # Dakikadaki token bütçesi
+    max_batch_tokens: int = 8000          # İstek başına tahmini maksimum token
+    max_concurrency: int = 4              # Sağlayıcı başına eşzamanlı istek sayısı
+    max_retries: int = 3                  # Başarısız batch için yeniden deneme sayısı
 
 class EmbeddingService:
     """
@@ -68,14 +101,17 @@ class EmbeddingService:
         # İstek sayaçları
         self.request_counters = {}
         
-        # Sık kullanılanlar için önbellek
-        self.cache = {}
-        self.cache_lock = threading.Lock()
+        # Sık kullanılanlar için önbellek (LRU, float32)
         self.max_cache_size = 10000
+        self.cache = EmbeddingCache(max_size=self.max_cache_size, ttl=0)
         
         # Yerel modeller için instance havuzu
         self.local_models = {}
         
+        # Uzak sağlayıcılar için asenkron batch işleyiciler (sağlayıcı başına)
+        self._batchers: Dict[str, AsyncEmbeddingBatcher] = {}
+        self._batchers_lock = threading.Lock()
+        
         logger.info(f"Embedding servisi başlatıldı, {len(self.models)} model yapılandırması yüklendi")
     
     def get_embedding(
@@ -124,13 +160,14 @@ class EmbeddingService:
         
         # Model tipine göre embedding hesapla
         embedding = self._get_embedding_by_model_type(text, model_config)
+        failed = isinstance(embedding, _FallbackVector)
         
         # Normalize et
         if should_normalize:
             embedding = self._normalize_vector(embedding)
         
-        # Önbelleğe ekle
-        if model_config.cache_enabled:
+        # Önbelleğe ekle (hata nedeniyle dönen sıfır vektörleri hariç)
+        if model_config.cache_enabled and not failed:
             cache_key = self._get_cache_key(text, model_id)
             self._add_to_cache(cache_key, embedding)
         
@@ -180,14 +217,13 @@ class EmbeddingService:
         text_indices = []
         
         if model_config.cache_enabled:
-            for i, text in enumerate(texts):
-                cache_key = self._get_cache_key(text, model_id)
-                cached_embedding = self._get_from_cache(cache_key)
-                
+            cache_keys = [self._get_cache_key(text, model_id) for text in texts]
+            
+            for i, cached_embedding in enumerate(self.cache.get_many(cache_keys)):
                 if cached_embedding is not None:
-                    cached_embeddings[i] = cached_embedding
+                    cached_embeddings[i] = cached_embedding.tolist()
                 else:
-                    texts_to_embed.append(text)
+                    texts_to_embed.append(texts[i])
                     text_indices.append(i)
         else:
             texts_to_embed = texts
@@ -211,16 +247,15 @@ class EmbeddingService:
         
         # Toplu embedding hesapla
         new_embeddings = self._get_embeddings_by_model_type(texts_to_embed, model_config)
+        cacheable = [not isinstance(embedding, _FallbackVector) for embedding in new_embeddings]
         
         # Normalize et
         if should_normalize:
             new_embeddings = [self._normalize_vector(embedding) for embedding in new_embeddings]
         
-        # Önbelleğe ekle
+        # Önbelleğe ekle (hata nedeniyle dönen sıfır vektörleri hariç)
         if model_config.cache_enabled:
-            for text, embedding in zip(texts_to_embed, new_embeddings):
-                cache_key = self._get_cache_key(text, model_id)
-                self._add_to_cache(cache_key, embedding)
+            self._cache_embeddings(cache_keys, text_indices, new_embeddings, cacheable)
         
         # Sonuç listesini oluştur
         result = [None] * len(texts)
@@ -235,6 +270,74 @@ class EmbeddingService:
         
         return result
     
+    async def aget_embeddings(
+        self, 
+        texts: List[str], 
+        model: Optional[str] = None,
+        normalize: Optional[bool] = None
+    ) -> List[List[float]]:
+        """
+        Birden fazla metni asenkron olarak gömme vektörlerine dönüştürür.
+        
+        Uzak sağlayıcılarda batch'ler sağlayıcı limitleri dahilinde eşzamanlı
+        gönderilir; yerel modeller iş parçacığında çalıştırılır.
+        
+        Args:
+            texts: Gömülecek metinler
+            model: Kullanılacak model ID (None ise varsayılan model kullanılır)
+            normalize: Vektörleri normalize et (None ise model varsayılanını kullan)
+            
+        Returns:
+            List[List[float]]: Gömme vektörleri (girdi sırasıyla)
+        """
+        if not texts:
+            return []
+        
+        # Model seçimi
+        model_id = model or self.default_model
+        
+        if model_id not in self.models:
+            logger.warning(f"Model bulunamadı: {model_id}, varsayılan model kullanılıyor: {self.default_model}")
+            model_id = self.default_model
+        
+        model_config = self.models[model_id]
+        should_normalize = normalize if normalize is not None else model_config.normalize
+        
+        # Önbellekte olanları ayır
+        result: List[Optional[List[float]]] = [None] * len(texts)
+        text_indices = list(range(len(texts)))
+        
+        if model_config.cache_enabled:
+            cache_keys = [self._get_cache_key(text, model_id) for text in texts]
+            text_indices = []
+            
+            for i, cached_embedding in enumerate(self.cache.get_many(cache_keys)):
+                if cached_embedding is None:
+                    text_indices.append(i)
+                elif should_normalize and not self._is_normalized(cached_embedding):
+                    result[i] = self._normalize_vector(cached_embedding)
+                else:
+                    result[i] = cached_embedding.tolist()
+        
+        if text_indices:
+            self._update_counter(model_id, len(text_indices))
+            
+            new_embeddings = await self._aget_embeddings_by_model_type(
+                [texts[i] for i in text_indices], model_config
+            )
+            cacheable = [not isinstance(embedding, _FallbackVector) for embedding in new_embeddings]
+            
+            if should_normalize:
+                new_embeddings = [self._normalize_vector(embedding) for embedding in new_embeddings]
+            
+            if model_config.cache_enabled:
+                self._cache_embeddings(cache_keys, text_indices, new_embeddings, cacheable)
+            
+            for i, embedding in zip(text_indices, new_embeddings):
+                result[i] = embedding
+        
+        return result
+    
     def similarity(
         self, 
         text1: str, 
@@ -391,7 +494,11 @@ class EmbeddingService:
                         timeout=config.get("timeout", 60),
                         rate_limit_rpm=config.get("rate_limit_rpm"),
                         normalize=config.get("normalize", True),
-                        options=config.get("options")
+                        options=config.get("options"),
+                        rate_limit_tpm=config.get("rate_limit_tpm"),
+                        max_batch_tokens=config.get("max_batch_tokens", 8000),
+                        max_concurrency=config.get("max_concurrency", 4),
+                        max_retries=config.get("max_retries", 3)
                     )
         except Exception as e:
             logger.error(f"Özel embedding model yapılandırması yükleme hatası: {str(e)}")
@@ -461,12 +568,12 @@ class EmbeddingService:
             else:
                 logger.error(f"Desteklenmeyen model tipi: {model_type}")
                 # Varsayılan olarak sıfır vektörü döndür
-                return [0.0] * model_config.dimensions
+                return _fallback_vector(model_config.dimensions)
                 
         except Exception as e:
             logger.error(f"Embedding hesaplama hatası ({model_config.model_id}): {str(e)}", exc_info=True)
             # Varsayılan olarak sıfır vektörü döndür
-            return [0.0] * model_config.dimensions
+            return _fallback_vector(model_config.dimensions)
     
     def _get_embeddings_by_model_type(
         self, 
@@ -510,12 +617,181 @@ class EmbeddingService:
             else:
                 logger.error(f"Desteklenmeyen model tipi: {model_type}")
                 # Varsayılan olarak sıfır vektörü döndür
-                return [[0.0] * model_config.dimensions for _ in range(len(texts))]
+                return [_fallback_vector(model_config.dimensions) for _ in range(len(texts))]
                 
         except Exception as e:
             logger.error(f"Toplu embedding hesaplama hatası ({model_config.model_id}): {str(e)}", exc_info=True)
             # Varsayılan olarak sıfır vektörü döndür
-            return [[0.0] * model_config.dimensions for _ in range(len(texts))]
+            return [_fallback_vector(model_config.dimensions) for _ in range(len(texts))]
+    
+    async def _aget_embeddings_by_model_type(
+        self, 
+        texts: List[str], 
+        model_config: EmbeddingModelConfig
+    ) -> List[List[float]]:
+        """
+        Model tipine göre toplu embedding'i asenkron hesaplar.
+        
+        Args:
+            texts: Gömülecek metinler
+            model_config: Model yapılandırması
+            
+        Returns:
+            List[List[float]]: Gömme vektörleri
+        """
+        if model_config.model_type not in REMOTE_MODEL_TYPES:
+            return await asyncio.to_thread(self._get_embeddings_by_model_type, texts, model_config)
+        
+        try:
+            return await self._embed_remote(texts, model_config)
+        except Exception as e:
+            logger.error(f"Toplu embedding hesaplama hatası ({model_config.model_id}): {str(e)}", exc_info=True)
+            return [_fallback_vector(model_config.dimensions) for _ in range(len(texts))]
+    
+    def _get_batcher(self, model_config: EmbeddingModelConfig) -> AsyncEmbeddingBatcher:
+        """
+        Sağlayıcının paylaşılan batch işleyicisini döndürür.
+        
+        Eşzamanlılık ve hız bütçesi aynı sağlayıcının tüm modelleri için
+        ortaktır; limitler sağlayıcının ilk kullanılan modelinden alınır.
+        
+        Args:
+            model_config: Model yapılandırması
+            
+        Returns:
+            AsyncEmbeddingBatcher: Batch işleyici
+        """
+        provider = model_config.model_type.value
+        
+        with self._batchers_lock:
+            batcher = self._batchers.get(provider)
+            if batcher is None:
+                batcher = AsyncEmbeddingBatcher(
+                    limits=ProviderLimits(
+                        max_batch_size=model_config.batch_size,
+                        max_batch_tokens=model_config.max_batch_tokens,
+                        max_concurrency=model_config.max_concurrency,
+                        requests_per_minute=model_config.rate_limit_rpm,
+                        tokens_per_minute=model_config.rate_limit_tpm,
+                        max_retries=model_config.max_retries
+                    ),
+                    name=provider
+                )
+                self._batchers[provider] = batcher
+        
+        return batcher
+    
+    async def _embed_remote(self, texts: List[str], model_config: EmbeddingModelConfig) -> List[List[float]]:
+        """
+        Uzak sağlayıcıda metinleri eşzamanlı batch'ler halinde gömer.
+        
+        Yeniden denemelere rağmen başarısız olan batch'ler için sıfır vektörü
+        kullanılır; diğer batch'lerin sonuçları korunur.
+        
+        Args:
+            texts: Gömülecek metinler
+            model_config: Model yapılandırması
+            
+        Returns:
+            List[List[float]]: Gömme vektörleri (girdi sırasıyla)
+        """
+        embed_batch, close = self._remote_batch_function(model_config)
+        
+        try:
+            return await self._get_batcher(model_config).embed(
+                texts,
+                embed_batch,
+                fallback=lambda batch: [_fallback_vector(model_config.dimensions) for _ in batch]
+            )
+        finally:
+            await close()
+    
+    def _remote_batch_function(self, model_config: EmbeddingModelConfig):
+        """
+        Sağlayıcı için tek batch gömen asenkron fonksiyonu oluşturur.
+        
+        Args:
+            model_config: Model yapılandırması
+            
+        Returns:
+            Tuple[Callable, Callable]: (batch fonksiyonu, istemciyi kapatan fonksiyon)
+        """
+        model_type = model_config.model_type
+        api_key = self.api_keys.get(model_config.api_key_env, "")
+        
+        async def close() -> None:
+            return None
+        
+        if model_type == EmbeddingModel.OPENAI:
+            import openai
+            
+            if not api_key:
+                raise ValueError(f"OpenAI API anahtarı bulunamadı: {model_config.api_key_env}")
+            
+            client = openai.AsyncOpenAI(api_key=api_key, base_url=model_config.base_url, max_retries=0)
+            
+            async def embed_batch(batch: List[str]) -> List[List[float]]:
+                response = await client.embeddings.create(model=model_config.model_id, input=batch)
+                return [item.embedding for item in sorted(response.data, key=lambda x: x.index)]
+            
+            return embed_batch, client.close
+        
+        if model_type == EmbeddingModel.COHERE:
+            import cohere
+            
+            if not api_key:
+                raise ValueError(f"Cohere API anahtarı bulunamadı: {model_config.api_key_env}")
+            
+            client = cohere.AsyncClient(api_key)
+            
+            async def embed_batch(batch: List[str]) -> List[List[float]]:
+                response = await client.embed(texts=batch, model=model_config.model_id)
+                return response.embeddings
+            
+            return embed_batch, close
+        
+        if model_type == EmbeddingModel.GOOGLE:
+            import google.generativeai as genai
+            
+            if not api_key:
+                raise ValueError(f"Google API anahtarı bulunamadı: {model_config.api_key_env}")
+            
+            genai.configure(api_key=api_key)
+            embedding_model = genai.get_embedding_model(model_config.model_id)
+            
+            # İstemci senkron olduğundan istekler iş parçacığında çalıştırılır
+            async def embed_batch(batch: List[str]) -> List[List[float]]:
+                responses = await asyncio.to_thread(embedding_model.batch_embed_content, batch)
+                return [response.embedding for response in responses]
+            
+            return embed_batch, close
+        
+        if model_type == EmbeddingModel.HUGGINGFACE:
+            import httpx
+            
+            base_url = model_config.base_url or "https://api-inference.huggingface.co/pipeline/feature-extraction"
+            headers = {
+                "Authorization": f"Bearer {api_key}" if api_key else "",
+                "Content-Type": "application/json"
+            }
+            client = httpx.AsyncClient(timeout=model_config.timeout, headers=headers)
+            
+            async def embed_batch(batch: List[str]) -> List[List[float]]:
+                response = await client.post(base_url, json={"inputs": batch, "options": {"use_cache": True}})
+                response.raise_for_status()
+                
+                embeddings = []
+                for embedding in response.json():
+                    # Bazı modeller her token için ayrı embedding döndürebilir
+                    if isinstance(embedding, list) and embedding and isinstance(embedding[0], list):
+                        embeddings.append(np.mean(embedding, axis=0).tolist())
+                    else:
+                        embeddings.append(embedding)
+                return embeddings
+            
+            return embed_batch, client.aclose
+        
+        raise ValueError(f"Asenkron batch desteklenmeyen model tipi: {model_type}")
     
     def _get_openai_embedding(self, text: str, model_config: EmbeddingModelConfig) -> List[float]:
         """
@@ -550,7 +826,7 @@ class EmbeddingService:
             
         except ImportError:
             logger.error("openai kütüphanesi bulunamadı, pip install openai komutuyla yükleyin")
-            return [0.0] * model_config.dimensions
+            return _fallback_vector(model_config.dimensions)
     
     def _get_openai_embeddings(self, texts: List[str], model_config: EmbeddingModelConfig) -> List[List[float]]:
         """
@@ -564,44 +840,11 @@ class EmbeddingService:
             List[List[float]]: Gömme vektörleri
         """
         try:
-            import openai
-            
-            # API anahtarını al
-            api_key = self.api_keys.get(model_config.api_key_env, "")
-            if not api_key:
-                raise ValueError(f"OpenAI API anahtarı bulunamadı: {model_config.api_key_env}")
-            
-            # OpenAI istemci
-            client = openai.OpenAI(api_key=api_key)
-            
-            # Batch size
-            batch_size = model_config.batch_size
-            
-            # Sonuç listesi
-            all_embeddings = []
-            
-            # Batch'ler halinde işle
-            for i in range(0, len(texts), batch_size):
-                batch_texts = texts[i:i+batch_size]
-                
-                # Embedding isteği
-                response = client.embeddings.create(
-                    model=model_config.model_id,
-                    input=batch_texts
-                )
-                
-                # Sırayla embeddinglwri al
-                sorted_embeddings = sorted(response.data, key=lambda x: x.index)
-                batch_embeddings = [item.embedding for item in sorted_embeddings]
-                
-                all_embeddings.extend(batch_embeddings)
-            
-            return all_embeddings
-            
+            return run_coroutine_sync(self._embed_remote(texts, model_config))
         except ImportError:
             logger.error("openai kütüphanesi bulunamadı, pip install openai komutuyla yükleyin")
-            return [[0.0] * model_config.dimensions for _ in range(len(texts))]
-    
+            return [_fallback_vector(model_config.dimensions) for _ in range(len(texts))]
+
     def _get_azure_openai_embedding(self, text: str, model_config: EmbeddingModelConfig) -> List[float]:
         """
         Azure OpenAI modeliyle embedding hesaplar.
@@ -642,7 +885,7 @@ class EmbeddingService:
             
         except ImportError:
             logger.error("openai kütüphanesi bulunamadı, pip install openai komutuyla yükleyin")
-            return [0.0] * model_config.dimensions
+            return _fallback_vector(model_config.dimensions)
     
     def _get_azure_openai_embeddings(self, texts: List[str], model_config: EmbeddingModelConfig) -> List[List[float]]:
         """
@@ -699,7 +942,7 @@ class EmbeddingService:
             
         except ImportError:
             logger.error("openai kütüphanesi bulunamadı, pip install openai komutuyla yükleyin")
-            return [[0.0] * model_config.dimensions for _ in range(len(texts))]
+            return [_fallback_vector(model_config.dimensions) for _ in range(len(texts))]
     
     def _get_sentence_transformers_embedding(self, text: str, model_config: EmbeddingModelConfig) -> List[float]:
         """
@@ -724,7 +967,7 @@ class EmbeddingService:
             
         except ImportError:
             logger.error("sentence_transformers kütüphanesi bulunamadı, pip install sentence-transformers komutuyla yükleyin")
-            return [0.0] * model_config.dimensions
+            return _fallback_vector(model_config.dimensions)
     
     def _get_sentence_transformers_embeddings(self, texts: List[str], model_config: EmbeddingModelConfig) -> List[List[float]]:
         """
@@ -752,7 +995,7 @@ class EmbeddingService:
             
         except ImportError:
             logger.error("sentence_transformers kütüphanesi bulunamadı, pip install sentence-transformers komutuyla yükleyin")
-            return [[0.0] * model_config.dimensions for _ in range(len(texts))]
+            return [_fallback_vector(model_config.dimensions) for _ in range(len(texts))]
     
     def _get_sentence_transformers_model(self, model_id: str):
         """
@@ -832,11 +1075,11 @@ class EmbeddingService:
                 return embeddings
             else:
                 logger.error(f"Hugging Face API hatası: {response.status_code} - {response.text}")
-                return [0.0] * model_config.dimensions
+                return _fallback_vector(model_config.dimensions)
                 
         except Exception as e:
             logger.error(f"Hugging Face embedding hatası: {str(e)}")
-            return [0.0] * model_config.dimensions
+            return _fallback_vector(model_config.dimensions)
     
     def _get_huggingface_embeddings(self, texts: List[str], model_config: EmbeddingModelConfig) -> List[List[float]]:
         """
@@ -849,64 +1092,8 @@ class EmbeddingService:
         Returns:
             List[List[float]]: Gömme vektörleri
         """
-        # Sonuç listesi
-        all_embeddings = []
-        
-        # Batch size
-        batch_size = model_config.batch_size
-        
-        # Batch'ler halinde işle
-        for i in range(0, len(texts), batch_size):
-            batch_texts = texts[i:i+batch_size]
-            
-            # API anahtarını al
-            api_key = self.api_keys.get(model_config.api_key_env, "")
-            
-            # API kullanarak embedding al
-            headers = {
-                "Authorization": f"Bearer {api_key}" if api_key else "",
-                "Content-Type": "application/json"
-            }
-            
-            # Base URL
-            base_url = model_config.base_url or "https://api-inference.huggingface.co/pipeline/feature-extraction"
-            
-            # İstek gönder
-            try:
-                response = requests.post(
-                    base_url,
-                    headers=headers,
-                    json={"inputs": batch_texts, "options": {"use_cache": True}},
-                    timeout=model_config.timeout
-                )
-                
-                # Yanıtı işle
-                if response.status_code == 200:
-                    embeddings = response.json()
-                    
-                    # Her metin için embeddingi işle
-                    for embedding in embeddings:
-                        # Bazı modeller her token için ayrı embedding döndürebilir
-                        if isinstance(embedding, list) and isinstance(embedding[0], list):
-                            # Ortalama al
-                            avg_embedding = np.mean(embedding, axis=0).tolist()
-                            all_embeddings.append(avg_embedding)
-                        else:
-                            all_embeddings.append(embedding)
-                else:
-                    logger.error(f"Hugging Face API hatası: {response.status_code} - {response.text}")
-                    # Hata durumunda sıfır vektörleri ekle
-                    for _ in range(len(batch_texts)):
-                        all_embeddings.append([0.0] * model_config.dimensions)
-                    
-            except Exception as e:
-                logger.error(f"Hugging Face batch embedding hatası: {str(e)}")
-                # Hata durumunda sıfır vektörleri ekle
-                for _ in range(len(batch_texts)):
-                    all_embeddings.append([0.0] * model_config.dimensions)
-        
-        return all_embeddings
-    
+        return run_coroutine_sync(self._embed_remote(texts, model_config))
+
     def _get_cohere_embedding(self, text: str, model_config: EmbeddingModelConfig) -> List[float]:
         """
         Cohere modeliyle embedding hesaplar.
@@ -940,7 +1127,7 @@ class EmbeddingService:
             
         except ImportError:
             logger.error("cohere kütüphanesi bulunamadı, pip install cohere komutuyla yükleyin")
-            return [0.0] * model_config.dimensions
+            return _fallback_vector(model_config.dimensions)
     
     def _get_cohere_embeddings(self, texts: List[str], model_config: EmbeddingModelConfig) -> List[List[float]]:
         """
@@ -954,41 +1141,11 @@ class EmbeddingService:
             List[List[float]]: Gömme vektörleri
         """
         try:
-            import cohere
-            
-            # API anahtarını al
-            api_key = self.api_keys.get(model_config.api_key_env, "")
-            if not api_key:
-                raise ValueError(f"Cohere API anahtarı bulunamadı: {model_config.api_key_env}")
-            
-            # Cohere istemci
-            client = cohere.Client(api_key)
-            
-            # Batch size
-            batch_size = model_config.batch_size
-            
-            # Sonuç listesi
-            all_embeddings = []
-            
-            # Batch'ler halinde işle
-            for i in range(0, len(texts), batch_size):
-                batch_texts = texts[i:i+batch_size]
-                
-                # Embedding isteği
-                response = client.embed(
-                    texts=batch_texts,
-                    model=model_config.model_id
-                )
-                
-                # Embeddinglwri ekle
-                all_embeddings.extend(response.embeddings)
-            
-            return all_embeddings
-            
+            return run_coroutine_sync(self._embed_remote(texts, model_config))
         except ImportError:
             logger.error("cohere kütüphanesi bulunamadı, pip install cohere komutuyla yükleyin")
-            return [[0.0] * model_config.dimensions for _ in range(len(texts))]
-    
+            return [_fallback_vector(model_config.dimensions) for _ in range(len(texts))]
+
     def _get_google_embedding(self, text: str, model_config: EmbeddingModelConfig) -> List[float]:
         """
         Google modeliyle embedding hesaplar.
@@ -1022,7 +1179,7 @@ class EmbeddingService:
             
         except ImportError:
             logger.error("google-generativeai kütüphanesi bulunamadı, pip install google-generativeai komutuyla yükleyin")
-            return [0.0] * model_config.dimensions
+            return _fallback_vector(model_config.dimensions)
     
     def _get_google_embeddings(self, texts: List[str], model_config: EmbeddingModelConfig) -> List[List[float]]:
         """
@@ -1036,42 +1193,11 @@ class EmbeddingService:
             List[List[float]]: Gömme vektörleri
         """
         try:
-            import google.generativeai as genai
-            
-            # API anahtarını al
-            api_key = self.api_keys.get(model_config.api_key_env, "")
-            if not api_key:
-                raise ValueError(f"Google API anahtarı bulunamadı: {model_config.api_key_env}")
-            
-            # Google API yapılandırması
-            genai.configure(api_key=api_key)
-            
-            # Embedding modeli
-            embedding_model = genai.get_embedding_model(model_config.model_id)
-            
-            # Batch size
-            batch_size = model_config.batch_size
-            
-            # Sonuç listesi
-            all_embeddings = []
-            
-            # Batch'ler halinde işle
-            for i in range(0, len(texts), batch_size):
-                batch_texts = texts[i:i+batch_size]
-                
-                # Embedding isteği
-                responses = embedding_model.batch_embed_content(batch_texts)
-                
-                # Embeddinglwri ekle
-                for response in responses:
-                    all_embeddings.append(response.embedding)
-            
-            return all_embeddings
-            
+            return run_coroutine_sync(self._embed_remote(texts, model_config))
         except ImportError:
             logger.error("google-generativeai kütüphanesi bulunamadı, pip install google-generativeai komutuyla yükleyin")
-            return [[0.0] * model_config.dimensions for _ in range(len(texts))]
-    
+            return [_fallback_vector(model_config.dimensions) for _ in range(len(texts))]
+
     def _get_local_embedding(self, text: str, model_config: EmbeddingModelConfig) -> List[float]:
         """
         Yerel bir servis kullanarak embedding hesaplar.
@@ -1116,11 +1242,11 @@ class EmbeddingService:
                     return result
             else:
                 logger.error(f"Yerel embedding servisi hatası: {response.status_code} - {response.text}")
-                return [0.0] * model_config.dimensions
+                return _fallback_vector(model_config.dimensions)
                 
         except Exception as e:
             logger.error(f"Yerel embedding hesaplama hatası: {str(e)}")
-            return [0.0] * model_config.dimensions
+            return _fallback_vector(model_config.dimensions)
     
     def _get_local_embeddings(self, texts: List[str], model_config: EmbeddingModelConfig) -> List[List[float]]:
         """
@@ -1178,13 +1304,13 @@ class EmbeddingService:
                     logger.error(f"Yerel embedding servisi hatası: {response.status_code} - {response.text}")
                     # Hata durumunda sıfır vektörleri ekle
                     for _ in range(len(batch_texts)):
-                        all_embeddings.append([0.0] * model_config.dimensions)
+                        all_embeddings.append(_fallback_vector(model_config.dimensions))
                     
             return all_embeddings
                 
         except Exception as e:
             logger.error(f"Yerel toplu embedding hesaplama hatası: {str(e)}")
-            return [[0.0] * model_config.dimensions for _ in range(len(texts))]
+            return [_fallback_vector(model_config.dimensions) for _ in range(len(texts))]
     
     def _get_cache_key(self, text: str, model_id: str) -> str:
         """
@@ -1197,8 +1323,33 @@ class EmbeddingService:
         Returns:
             str: Önbellek anahtarı
         """
-        # Metin ve model'den hash oluştur
-        return f"{model_id}_{hashlib.md5(text.encode()).hexdigest()}"
+        # Metin ve model'den süreçler arası kararlı hash oluştur
+        return EmbeddingCache.make_key(model_id, text)
+    
+    def _cache_embeddings(
+        self,
+        cache_keys: List[str],
+        text_indices: List[int],
+        embeddings: List[List[float]],
+        cacheable: List[bool]
+    ) -> None:
+        """
+        Yeni hesaplanan embedding'leri önbelleğe toplu yazar.
+        
+        Args:
+            cache_keys: Tüm girdi metinlerinin önbellek anahtarları
+            text_indices: Hesaplanan metinlerin girdi içindeki indeksleri
+            embeddings: Hesaplanan embedding'ler (text_indices sırasıyla)
+            cacheable: Embedding'in önbelleğe yazılıp yazılmayacağı (sıfır vektörü yedekleri False)
+        """
+        entries = [
+            (cache_keys[i], embedding)
+            for i, embedding, ok in zip(text_indices, embeddings, cacheable)
+            if ok
+        ]
+        if entries:
+            keys, values = zip(*entries)
+            self.cache.set_many(list(keys), list(values))
     
     def _get_from_cache(self, cache_key: str) -> Optional[List[float]]:
         """
@@ -1210,8 +1361,8 @@ class EmbeddingService:
         Returns:
             Optional[List[float]]: Önbellekten alınan veri veya None
         """
-        with self.cache_lock:
-            return self.cache.get(cache_key)
+        cached_embedding = self.cache.get(cache_key)
+        return cached_embedding.tolist() if cached_embedding is not None else None
     
     def _add_to_cache(self, cache_key: str, embedding: List[float]) -> None:
         """
@@ -1221,14 +1372,8 @@ class EmbeddingService:
             cache_key: Önbellek anahtarı
             embedding: Gömme vektörü
         """
-        with self.cache_lock:
-            # Önbellek boyutunu kontrol et
-            if len(self.cache) >= self.max_cache_size:
-                # Rastgele bir öğeyi sil (basit LRU yerine)
-                self.cache.pop(next(iter(self.cache)))
-                
-            # Önbelleğe ekle
-            self.cache[cache_key] = embedding
+        # En uzun süredir kullanılmayan öğe otomatik olarak çıkarılır
+        self.cache.set(cache_key, embedding)
     
     def _normalize_vector(self, vector: List[float]) -> List[float]:
         """
@@ -0,0 +1,329 @@
+"""
+Async, concurrency-limited batching for remote embedding providers
+"""
+
+import time
+import random
+import asyncio
+import logging
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import List, Optional, Callable, Awaitable, Tuple, Any, Coroutine
+
+logger = logging.getLogger(__name__)
+
+EmbedBatchFn = Callable[[List[str]], Awaitable[List[List[float]]]]
+
+class EmbeddingBatchError(Exception):
+    """Raised when a batch cannot be embedded after all retries"""
+
+@dataclass
+class ProviderLimits:
+    """Request shaping limits for an embedding provider"""
+
+    max_batch_size: int = 96  # Maximum number of texts per request
+    max_batch_tokens: int = 8000  # Maximum estimated tokens per request
+    max_concurrency: int = 4  # Maximum number of in-flight requests
+    requests_per_minute: Optional[int] = None  # Request rate budget (None for unlimited)
+    tokens_per_minute: Optional[int] = None  # Token rate budget (None for unlimited)
+    max_retries: int = 3  # Retries per batch after the first attempt
+    backoff_base: float = 0.5  # First retry delay in seconds
+    backoff_max: float = 30.0  # Maximum retry delay in seconds
+
+def is_retryable_error(error: Exception) -> bool:
+    """
+    Decide whether a failed provider request is worth retrying
+
+    Errors carrying an HTTP status (provider SDK and httpx errors) are
+    retried only for timeouts, conflicts, rate limits and server errors;
+    errors without a status (network failures) are always retried.
+
+    Args:
+        error: Raised exception
+
+    Returns:
+        bool: True if the request should be retried
+    """
+    if isinstance(error, (ValueError, TypeError)):
+        return False
+
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if not isinstance(status, int):
+        return True
+
+    return status in (408, 409, 429) or status >= 500
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the token count of a text (about four characters per token)
+
+    Args:
+        text: Input text
+
+    Returns:
+        int: Estimated token count
+    """
+    return len(text) // 4 + 1
+
+def split_batches(
+    texts: List[str],
+    max_batch_size: int,
+    max_batch_tokens: int
+) -> List[Tuple[int, List[str], int]]:
+    """
+    Split texts into consecutive batches bounded by size and token budget
+
+    A single text over the token budget gets a batch of its own; truncating
+    it is left to the provider.
+
+    Args:
+        texts: Input texts
+        max_batch_size: Maximum number of texts per batch
+        max_batch_tokens: Maximum estimated tokens per batch
+
+    Returns:
+        List[Tuple[int, List[str], int]]: (start offset, texts, estimated tokens) per batch
+    """
+    batches = []
+    start = 0
+    current: List[str] = []
+    current_tokens = 0
+
+    for i, text in enumerate(texts):
+        tokens = estimate_tokens(text)
+
+        if current and (len(current) >= max_batch_size or current_tokens + tokens > max_batch_tokens):
+            batches.append((start, current, current_tokens))
+            start, current, current_tokens = i, [], 0
+
+        current.append(text)
+        current_tokens += tokens
+
+    if current:
+        batches.append((start, current, current_tokens))
+
+    return batches
+
+class RateBudget:
+    """
+    Token bucket over requests per minute and tokens per minute
+
+    The bucket state is guarded by a thread lock, so one budget can be
+    shared by callers on different event loops.
+    """
+
+    def __init__(self, requests_per_minute: Optional[int] = None, tokens_per_minute: Optional[int] = None):
+        """
+        Initialize rate budget
+
+        Args:
+            requests_per_minute: Request budget (None for unlimited)
+            tokens_per_minute: Token budget (None for unlimited)
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = float(requests_per_minute or 0)
+        self._tokens = float(tokens_per_minute or 0)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens: int) -> float:
+        """Take capacity if available; otherwise return the time to wait (lock held)"""
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+
+        wait = 0.0
+        if self.requests_per_minute:
+            self._requests = min(self.requests_per_minute, self._requests + elapsed * self.requests_per_minute / 60.0)
+            if self._requests < 1:
+                wait = max(wait, (1 - self._requests) * 60.0 / self.requests_per_minute)
+
+        if self.tokens_per_minute:
+            # A request larger than the whole budget waits for a full bucket
+            needed = min(tokens, self.tokens_per_minute)
+            self._tokens = min(self.tokens_per_minute, self._tokens + elapsed * self.tokens_per_minute / 60.0)
+            if self._tokens < needed:
+                wait = max(wait, (needed - self._tokens) * 60.0 / self.tokens_per_minute)
+
+        if wait > 0:
+            return wait
+
+        if self.requests_per_minute:
+            self._requests -= 1
+        if self.tokens_per_minute:
+            self._tokens -= min(tokens, self.tokens_per_minute)
+        return 0.0
+
+    async def acquire(self, tokens: int = 0) -> None:
+        """
+        Wait until one request with the given token count fits the budget
+
+        Args:
+            tokens: Estimated tokens of the request
+        """
+        if not self.requests_per_minute and not self.tokens_per_minute:
+            return
+
+        while True:
+            with self._lock:
+                wait = self._reserve(tokens)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+class AsyncEmbeddingBatcher:
+    """
+    Embeds large inputs through a provider batch function
+
+    Inputs are split into provider-sized batches by count and token budget,
+    sent concurrently under a semaphore and a shared rate budget, retried
+    with exponential backoff, and reassembled in input order.
+    """
+
+    def __init__(
+        self,
+        embed_batch: Optional[EmbedBatchFn] = None,
+        limits: Optional[ProviderLimits] = None,
+        name: str = "provider",
+        is_retryable: Optional[Callable[[Exception], bool]] = None
+    ):
+        """
+        Initialize batcher
+
+        Args:
+            embed_batch: Coroutine function embedding one batch of texts (can also be given per call)
+            limits: Provider limits
+            name: Provider name for logging
+            is_retryable: Decides whether a failed batch is retried (default: is_retryable_error)
+        """
+        self.embed_batch = embed_batch
+        self.limits = limits or ProviderLimits()
+        self.name = name
+        self.is_retryable = is_retryable or is_retryable_error
+        self.rate_budget = RateBudget(self.limits.requests_per_minute, self.limits.tokens_per_minute)
+
+        # asyncio primitives are bound to one event loop
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        """Concurrency limiter for the running event loop"""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.limits.max_concurrency)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+    async def embed(
+        self,
+        texts: List[str],
+        embed_batch: Optional[EmbedBatchFn] = None,
+        fallback: Optional[Callable[[List[str]], List[List[float]]]] = None
+    ) -> List[List[float]]:
+        """
+        Embed texts, preserving input order
+
+        Args:
+            texts: Input texts
+            embed_batch: Batch function for this call (default: the batcher's own)
+            fallback: Produces embeddings for a batch that failed all retries;
+                if not given the failure is raised
+
+        Returns:
+            List[List[float]]: Embeddings in input order
+
+        Raises:
+            EmbeddingBatchError: If a batch fails after all retries and no fallback is given
+        """
+        if not texts:
+            return []
+
+        embed_batch = embed_batch or self.embed_batch
+        batches = split_batches(texts, self.limits.max_batch_size, self.limits.max_batch_tokens)
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        semaphore = self._semaphore()
+
+        async def run(start: int, batch: List[str], tokens: int) -> None:
+            async with semaphore:
+                try:
+                    embeddings = await self._embed_with_retry(embed_batch, batch, tokens)
+                except EmbeddingBatchError as e:
+                    if fallback is None:
+                        raise
+                    logger.error(f"{self.name} batch at offset {start} failed, using fallback: {str(e)}")
+                    embeddings = fallback(batch)
+            results[start:start + len(batch)] = embeddings
+
+        tasks = [asyncio.ensure_future(run(*batch)) for batch in batches]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+        return results
+
+    async def _embed_with_retry(self, embed_batch: EmbedBatchFn, batch: List[str], tokens: int) -> List[List[float]]:
+        """Send one batch, retrying failures with exponential backoff and jitter"""
+        attempt = 0
+
+        while True:
+            await self.rate_budget.acquire(tokens)
+            try:
+                embeddings = await embed_batch(batch)
+                if len(embeddings) != len(batch):
+                    raise EmbeddingBatchError(
+                        f"{self.name} returned {len(embeddings)} embeddings for {len(batch)} texts"
+                    )
+                return embeddings
+            except EmbeddingBatchError:
+                raise
+            except Exception as e:
+                if attempt >= self.limits.max_retries or not self.is_retryable(e):
+                    raise EmbeddingBatchError(f"{self.name} batch failed after {attempt + 1} attempts: {str(e)}") from e
+
+                delay = min(self.limits.backoff_max, self.limits.backoff_base * (2 ** attempt))
+                delay *= 0.5 + random.random() / 2
+                # Honor server-provided retry hints when available; jitter never shortens them
+                retry_after = getattr(e, "retry_after", None)
+                if isinstance(retry_after, (int, float)) and retry_after > 0:
+                    delay = max(delay, float(retry_after))
+
+                logger.warning(f"{self.name} embedding batch failed ({str(e)}), retrying in {delay:.2f}s")
+                attempt += 1
+                await asyncio.sleep(delay)
+
+_background_loop: Optional[asyncio.AbstractEventLoop] = None
+_background_lock = threading.Lock()
+
+def run_coroutine_sync(coroutine: Coroutine[Any, Any, Any]) -> Any:
+    """
+    Run a coroutine from synchronous code on a shared background event loop
+
+    Sharing one loop lets concurrent synchronous callers share the batchers'
+    concurrency limits.
+
+    Args:
+        coroutine: Coroutine to run
+
+    Returns:
+        Any: Coroutine result
+    """
+    global _background_loop
+
+    with _background_lock:
+        if _background_loop is None or _background_loop.is_closed():
+            _background_loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_background_loop.run_forever,
+                name="embedding-batcher-loop",
+                daemon=True
+            ).start()
+        loop = _background_loop
+
+    return asyncio.run_coroutine_threadsafe(coroutine, loop).result()
@@ -4,152 +4,377 @@ Caching system for embeddings
 
 import os
 import time
-import json
-import pickle
+import queue
+import sqlite3
+import hashlib
 import logging
-from typing import Dict, List, Any, Optional, Union, Tuple
+import threading
+import numpy as np
+from typing import Dict, List, Any, Optional, Union, Tuple, Sequence
 from collections import OrderedDict
 
 logger = logging.getLogger(__name__)
 
+DISK_CACHE_FILE = "embedding_cache.sqlite"
+
+EmbeddingLike = Union[Sequence[float], np.ndarray]
+
 class EmbeddingCache:
     """
     Cache for storing embeddings to avoid redundant API calls.
-    Implements a simple LRU (Least Recently Used) cache.
+
+    The memory tier is an LRU of float32 arrays with an optional TTL. When
+    persistent, entries are also written to a sqlite file keyed by
+    model + content hash; writes are queued and committed in batches by a
+    background thread, so the request path never waits on disk writes.
+    Memory misses fall through to the disk tier and are promoted on hit.
     """
-    
+
     def __init__(
-        self, 
-        max_size: int = 10000, 
+        self,
+        max_size: int = 10000,
         ttl: int = 3600,
         persistent: bool = False,
-        persistent_path: Optional[str] = None
+        persistent_path: Optional[str] = None,
+        disk_ttl: int = 0,
+        write_batch_size: int = 256
     ):
         """
         Initialize embedding cache
-        
+
         Args:
-            max_size: Maximum number of cached embeddings
-            ttl: Time to live in seconds (0 for no expiry)
+            max_size: Maximum number of cached embeddings in memory
+            ttl: Time to live in seconds for the memory tier (0 for no expiry)
             persistent: Whether to save cache to disk
-            persistent_path: Path to save cache to
+            persistent_path: Directory to save the cache database to
+            disk_ttl: Time to live in seconds for the disk tier (0 for no expiry)
+            write_batch_size: Maximum number of entries committed per disk write
         """
         self.max_size = max_size
         self.ttl = ttl
-        self.persistent = persistent
+        self.persistent = persistent and bool(persistent_path)
         self.persistent_path = persistent_path
-        
+        self.disk_ttl = disk_ttl
+        self.write_batch_size = write_batch_size
+
         # Cache structure: {key: (embedding, timestamp)}
-        self.cache: OrderedDict[str, Tuple[List[float], float]] = OrderedDict()
-        
-        # Load cache from disk if persistent
-        if self.persistent and self.persistent_path:
-            self._load_cache()
-    
-    def get(self, key: str) -> Optional[List[float]]:
+        self.cache: "OrderedDict[str, Tuple[np.ndarray, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+        # Disk tier: read connection (guarded by _disk_lock) and writer thread
+        self._disk_lock = threading.Lock()
+        self._reader: Optional[sqlite3.Connection] = None
+        self._write_queue: "queue.Queue[Optional[Tuple[str, np.ndarray, float]]]" = queue.Queue()
+        self._pending: Dict[str, Tuple[np.ndarray, float]] = {}
+        self._writer: Optional[threading.Thread] = None
+
+        if self.persistent:
+            self._open_disk()
+
+    @classmethod
+    def from_config(cls, config) -> "EmbeddingCache":
+        """
+        Create cache from an EmbeddingCacheConfig
+
+        Args:
+            config: Cache configuration
+
+        Returns:
+            EmbeddingCache: Cache instance
+        """
+        return cls(
+            max_size=config.max_size if config.enabled else 0,
+            ttl=config.ttl,
+            persistent=config.enabled and config.persistent,
+            persistent_path=config.persistent_path,
+            disk_ttl=config.disk_ttl
+        )
+
+    @staticmethod
+    def make_key(model_id: str, text: str) -> str:
+        """
+        Build a cache key from model ID and text content
+
+        The key is stable across processes (unlike hash()), so the disk tier
+        can be reused between runs.
+
+        Args:
+            model_id: Embedding model ID
+            text: Input text
+
+        Returns:
+            str: Cache key
+        """
+        digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+        return f"{model_id}:{digest}"
+
+    def __len__(self) -> int:
+        return len(self.cache)
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def get(self, key: str) -> Optional[np.ndarray]:
         """
         Get embedding from cache
-        
+
         Args:
             key: Cache key
-            
+
         Returns:
-            Optional[List[float]]: Cached embedding or None if not found or expired
-        """
-        if key not in self.cache:
-            return None
-        
-        # Get embedding and timestamp
-        embedding, timestamp = self.cache[key]
-        
-        # Check if expired
-        if self.ttl > 0 and time.time() - timestamp > self.ttl:
-            # Remove expired item
-            del self.cache[key]
-            return None
-        
-        # Move to end (most recently used)
-        self.cache.move_to_end(key)
-        
-        return embedding
-    
-    def set(self, key: str, embedding: List[float]) -> None:
+            Optional[np.ndarray]: Cached float32 embedding or None if not found or expired
+        """
+        return self.get_many([key])[0]
+
+    def get_many(self, keys: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """
+        Get multiple embeddings from cache
+
+        Memory misses are looked up on disk with a single query.
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            List[Optional[np.ndarray]]: Embeddings in key order (None for misses)
+        """
+        results: List[Optional[np.ndarray]] = [None] * len(keys)
+        missing: Dict[str, List[int]] = {}
+        now = time.time()
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                entry = self.cache.get(key)
+                if entry is not None:
+                    embedding, timestamp = entry
+                    if self.ttl > 0 and now - timestamp > self.ttl:
+                        # Remove expired item
+                        del self.cache[key]
+                    else:
+                        # Move to end (most recently used)
+                        self.cache.move_to_end(key)
+                        results[i] = embedding
+                        continue
+                missing.setdefault(key, []).append(i)
+
+        if missing and self.persistent:
+            found = self._read_disk(list(missing))
+            if found:
+                with self._lock:
+                    for key, embedding in found.items():
+                        self._put(key, embedding, now)
+                        for i in missing.pop(key):
+                            results[i] = embedding
+                    self.disk_hits += len(found)
+
+        misses = sum(len(indices) for indices in missing.values())
+        with self._lock:
+            self.misses += misses
+            self.hits += len(keys) - misses
+
+        return results
+
+    def set(self, key: str, embedding: EmbeddingLike) -> None:
         """
         Set embedding in cache
-        
+
         Args:
             key: Cache key
             embedding: Embedding vector
         """
-        # Remove oldest item if at capacity
-        if len(self.cache) >= self.max_size and key not in self.cache:
+        self.set_many([key], [embedding])
+
+    def set_many(self, keys: Sequence[str], embeddings: Sequence[EmbeddingLike]) -> None:
+        """
+        Set multiple embeddings in cache
+
+        Args:
+            keys: Cache keys
+            embeddings: Embedding vectors (same order as keys)
+        """
+        now = time.time()
+        arrays = [np.array(embedding, dtype=np.float32) for embedding in embeddings]
+
+        with self._lock:
+            for key, embedding in zip(keys, arrays):
+                self._put(key, embedding, now)
+
+        if self.persistent:
+            for key, embedding in zip(keys, arrays):
+                self._pending[key] = (embedding, now)
+                self._write_queue.put((key, embedding, now))
+
+    def _put(self, key: str, embedding: np.ndarray, timestamp: float) -> None:
+        """Insert into the memory tier and evict least recently used items (lock held)"""
+        if self.max_size <= 0:
+            return
+
+        self.cache[key] = (embedding, timestamp)
+        self.cache.move_to_end(key)
+
+        while len(self.cache) > self.max_size:
             self.cache.popitem(last=False)
-        
-        # Add or update item
-        self.cache[key] = (embedding, time.time())
-        
-        # Save to disk if persistent
-        if self.persistent and self.persistent_path:
-            self._save_cache()
-    
+
+    def flush(self) -> None:
+        """Block until all queued disk writes are committed"""
+        if self.persistent:
+            self._write_queue.join()
+
+    def close(self) -> None:
+        """Flush pending writes and stop the disk writer"""
+        if not self.persistent:
+            return
+
+        self.flush()
+        if self._writer is not None and self._writer.is_alive():
+            self._write_queue.put(None)
+            self._writer.join()
+        self._writer = None
+
+        with self._disk_lock:
+            if self._reader is not None:
+                self._reader.close()
+                self._reader = None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+
+        Returns:
+            Dict[str, Any]: Size and hit/miss counters
+        """
+        return {
+            "size": len(self.cache),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "pending_writes": self._write_queue.unfinished_tasks if self.persistent else 0
+        }
+
     def clear(self) -> None:
         """Clear the cache"""
-        self.cache.clear()
-        
-        # Remove persistent cache file if exists
-        if self.persistent and self.persistent_path:
-            cache_file = os.path.join(self.persistent_path, "embedding_cache.pkl")
-            if os.path.exists(cache_file):
+        with self._lock:
+            self.cache.clear()
+
+        if self.persistent:
+            self.flush()
+            with self._disk_lock:
                 try:
-                    os.remove(cache_file)
+                    self._reader.execute("DELETE FROM embeddings")
+                    self._reader.commit()
                 except Exception as e:
-                    logger.error(f"Error removing cache file: {str(e)}")
-    
-    def _save_cache(self) -> None:
-        """Save cache to disk"""
-        if not self.persistent_path:
-            return
-        
+                    logger.error(f"Error clearing disk cache: {str(e)}")
+
+    def _database_path(self) -> str:
+        """Path of the sqlite cache file"""
+        return os.path.join(self.persistent_path, DISK_CACHE_FILE)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection to the cache database"""
+        connection = sqlite3.connect(self._database_path(), check_same_thread=False, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def _open_disk(self) -> None:
+        """Create the cache database and start the background writer"""
         try:
-            # Create directory if it doesn't exist
             os.makedirs(self.persistent_path, exist_ok=True)
-            
-            # Save cache to file
-            cache_file = os.path.join(self.persistent_path, "embedding_cache.pkl")
-            with open(cache_file, "wb") as f:
-                pickle.dump(dict(self.cache), f)
+            self._reader = self._connect()
+            self._reader.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "key TEXT PRIMARY KEY, dimensions INTEGER NOT NULL, "
+                "vector BLOB NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._reader.commit()
         except Exception as e:
-            logger.error(f"Error saving cache to disk: {str(e)}")
-    
-    def _load_cache(self) -> None:
-        """Load cache from disk"""
-        if not self.persistent_path:
+            logger.error(f"Error opening disk cache, continuing in memory only: {str(e)}")
+            self.persistent = False
             return
-        
+
+        self._writer = threading.Thread(target=self._write_loop, name="embedding-cache-writer", daemon=True)
+        self._writer.start()
+
+    def _read_disk(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Look up keys in pending writes and the cache database"""
+        found: Dict[str, np.ndarray] = {}
+        now = time.time()
+
+        # Entries not yet committed by the writer
+        for key in keys:
+            entry = self._pending.get(key)
+            if entry is not None:
+                found[key] = entry[0]
+
+        remaining = [key for key in keys if key not in found]
+        if not remaining:
+            return found
+
         try:
-            # Check if cache file exists
-            cache_file = os.path.join(self.persistent_path, "embedding_cache.pkl")
-            if not os.path.exists(cache_file):
-                return
-            
-            # Load cache from file
-            with open(cache_file, "rb") as f:
-                loaded_cache = pickle.load(f)
-            
-            # Create ordered dict and apply LRU eviction if needed
-            self.cache = OrderedDict()
-            
-            # Sort by timestamp (oldest first)
-            sorted_items = sorted(loaded_cache.items(), key=lambda x: x[1][1])
-            
-            # Add items (up to max_size)
-            for key, (embedding, timestamp) in sorted_items[-self.max_size:]:
-                # Skip expired items
-                if self.ttl > 0 and time.time() - timestamp > self.ttl:
-                    continue
-                
-                self.cache[key] = (embedding, timestamp)
-            
-            logger.info(f"Loaded {len(self.cache)} embeddings from persistent cache")
+            with self._disk_lock:
+                if self._reader is None:
+                    return found
+
+                # sqlite limits the number of bound parameters per statement
+                for start in range(0, len(remaining), 500):
+                    batch = remaining[start:start + 500]
+                    placeholders = ",".join("?" * len(batch))
+                    rows = self._reader.execute(
+                        f"SELECT key, vector, created_at FROM embeddings WHERE key IN ({placeholders})",
+                        batch
+                    ).fetchall()
+
+                    for key, vector, created_at in rows:
+                        if self.disk_ttl > 0 and now - created_at > self.disk_ttl:
+                            continue
+                        found[key] = np.frombuffer(vector, dtype=np.float32).copy()
         except Exception as e:
-            logger.error(f"Error loading cache from disk: {str(e)}")
\ No newline at end of file
+            logger.error(f"Error reading disk cache: {str(e)}")
+
+        return found
+
+    def _write_loop(self) -> None:
+        """Background writer: commit queued entries in batches"""
+        connection = self._connect()
+
+        try:
+            while True:
+                item = self._write_queue.get()
+                if item is None:
+                    self._write_queue.task_done()
+                    break
+
+                batch = [item]
+                while len(batch) < self.write_batch_size:
+                    try:
+                        item = self._write_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        # Re-queue the stop marker after this batch
+                        self._write_queue.task_done()
+                        self._write_queue.put(None)
+                        break
+                    batch.append(item)
+
+                try:
+                    connection.executemany(
+                        "INSERT OR REPLACE INTO embeddings (key, dimensions, vector, created_at) VALUES (?, ?, ?, ?)",
+                        [(key, len(embedding), embedding.tobytes(), created_at) for key, embedding, created_at in batch]
+                    )
+                    connection.commit()
+                except Exception as e:
+                    logger.error(f"Error writing embeddings to disk cache: {str(e)}")
+                finally:
+                    for key, embedding, created_at in batch:
+                        entry = self._pending.get(key)
+                        if entry is not None and entry[1] == created_at:
+                            self._pending.pop(key, None)
+                        self._write_queue.task_done()
+        finally:
+            connection.close()
@@ -82,6 +82,7 @@ class EmbeddingCacheConfig:
     ttl: int = 3600  # Time to live in seconds (1 hour)
     persistent: bool = False  # Whether to save cache to disk
     persistent_path: Optional[str] = None  # Path to save cache to
+    disk_ttl: int = 0  # Time to live for the disk cache in seconds (0 for no expiry)
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'EmbeddingCacheConfig':
@@ -91,7 +92,8 @@ class EmbeddingCacheConfig:
             max_size=data.get("max_size", 10000),
             ttl=data.get("ttl", 3600),
             persistent=data.get("persistent", False),
-            persistent_path=data.get("persistent_path")
+            persistent_path=data.get("persistent_path"),
+            disk_ttl=data.get("disk_ttl", 0)
         )
     
     def to_dict(self) -> Dict[str, Any]:
@@ -106,4 +108,7 @@ class EmbeddingCacheConfig:
         if self.persistent_path:
             result["persistent_path"] = self.persistent_path
             
+        if self.disk_ttl:
+            result["disk_ttl"] = self.disk_ttl
+            
         return result
\ No newline at end of file
@@ -6,6 +6,8 @@ import logging
 from abc import ABC, abstractmethod
 from typing import Dict, List, Any, Optional, Union
 
+from ..batching import AsyncEmbeddingBatcher, run_coroutine_sync
+
 logger = logging.getLogger(__name__)
 
 class EmbeddingError(Exception):
@@ -139,6 +141,8 @@ class APIEmbeddingModelBase(BaseEmbeddingModel):
             options=options
         )
         self.client = None
+        # Shared per provider; set by EmbeddingService
+        self.batcher: Optional[AsyncEmbeddingBatcher] = None
     
     def initialize(self) -> bool:
         """
@@ -161,4 +165,36 @@ class APIEmbeddingModelBase(BaseEmbeddingModel):
     @abstractmethod
     def _init_client(self) -> None:
         """Initialize API client"""
-        pass
\ No newline at end of file
+        pass
+    
+    async def aembed_batch(self, texts: List[str]) -> List[List[float]]:
+        """
+        Send one provider-sized batch
+        
+        Unlike embed_batch, failures are raised so that the batcher can
+        retry the batch.
+        
+        Args:
+            texts: Texts of one batch
+            
+        Returns:
+            List[List[float]]: Embedding vectors in input order
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} does not support async batches")
+    
+    def _embed_with_batcher(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Embed texts through the shared batcher
+        
+        Batches are sent concurrently under the provider's limits and
+        retried; texts of a batch that still fails get None.
+        
+        Args:
+            texts: Texts to embed
+            
+        Returns:
+            List[Optional[List[float]]]: Embedding vectors in input order
+        """
+        return run_coroutine_sync(
+            self.batcher.embed(texts, self.aembed_batch, fallback=lambda batch: [None] * len(batch))
+        )
\ No newline at end of file
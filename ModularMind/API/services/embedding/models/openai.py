@@ -27,6 +27,13 @@ class OpenAIEmbeddingModel(APIEmbeddingModelBase):
                 base_url=self.api_base_url
             )
             
+            # Async client for batched requests (retries are done by the batcher)
+            self.async_client = openai.AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=self.api_base_url,
+                max_retries=0
+            )
+            
             logger.info(f"OpenAI client initialized for model {self.model_id}")
         except ImportError:
             raise EmbeddingError("openai package not installed. Install with: pip install openai")
@@ -118,16 +125,12 @@ class OpenAIEmbeddingModel(APIEmbeddingModelBase):
         if not texts:
             return []
         
+        # Send concurrent, rate-limited batches when a shared batcher is set
+        if self.batcher is not None:
+            return self._embed_with_batcher(texts)
+        
         try:
-            # Handle token limit and filter empty texts
-            processed_texts = []
-            for text in texts:
-                if not text.strip():
-                    processed_texts.append("")
-                elif len(text) > 8191:
-                    processed_texts.append(text[:8191])
-                else:
-                    processed_texts.append(text)
+            processed_texts = self._prepare_batch(texts)
             
             # Call OpenAI API
             response = self.client.embeddings.create(
@@ -184,4 +187,34 @@ class OpenAIEmbeddingModel(APIEmbeddingModelBase):
                     return None
             else:
                 logger.error(f"Error generating batch embeddings: {str(e)}")
-                return None
\ No newline at end of file
+                return None
+    
+    async def aembed_batch(self, texts: List[str]) -> List[List[float]]:
+        """
+        Send one batch to the OpenAI API
+        
+        Args:
+            texts: Texts of one batch
+            
+        Returns:
+            List[List[float]]: Embedding vectors in input order
+        """
+        response = await self.async_client.embeddings.create(
+            model=self.model_id,
+            input=self._prepare_batch(texts),
+            encoding_format=self.options.get("encoding_format", "float")
+        )
+        
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+    
+    def _prepare_batch(self, texts: List[str]) -> List[str]:
+        """Handle token limit and filter empty texts"""
+        processed_texts = []
+        for text in texts:
+            if not text.strip():
+                processed_texts.append("")
+            elif len(text) > 8191:
+                processed_texts.append(text[:8191])
+            else:
+                processed_texts.append(text)
+        return processed_texts
\ No newline at end of file
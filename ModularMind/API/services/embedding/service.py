@@ -5,12 +5,14 @@ Embedding service for generating vector embeddings from text.
 import os
 import json
 import logging
+import threading
 import numpy as np
 from typing import Dict, List, Any, Optional, Union
 
-from .config import EmbeddingModelConfig
+from .config import EmbeddingModelConfig, EmbeddingCacheConfig
 from .cache import EmbeddingCache
-from .models.base import BaseEmbeddingModel
+from .batching import AsyncEmbeddingBatcher, ProviderLimits
+from .models.base import BaseEmbeddingModel, APIEmbeddingModelBase
 from .models import get_embedding_model
 from .processors.text import preprocess_text
 from .utils.batch import batch_processor
@@ -45,6 +47,8 @@ class EmbeddingService:
         self.default_model_id: Optional[str] = None
         self._api_keys: Dict[str, str] = {}
         self._model_instances: Dict[str, BaseEmbeddingModel] = {}
+        self._batchers: Dict[str, AsyncEmbeddingBatcher] = {}
+        self._batchers_lock = threading.Lock()
         self.cache = EmbeddingCache()
         
         # Set as singleton instance
@@ -97,6 +101,11 @@ class EmbeddingService:
                     model_config = EmbeddingModelConfig.from_dict(model_data)
                     self.models[model_config.id] = model_config
             
+            # Configure cache
+            if "cache" in config_data:
+                self.cache.close()
+                self.cache = EmbeddingCache.from_config(EmbeddingCacheConfig.from_dict(config_data["cache"]))
+            
             # Set default model
             if "default_model" in config_data:
                 self.default_model_id = config_data["default_model"]
@@ -278,6 +287,9 @@ class EmbeddingService:
             )
             
             if model_instance:
+                # Remote models share the provider's concurrency and rate limits
+                if isinstance(model_instance, APIEmbeddingModelBase):
+                    model_instance.batcher = self._get_batcher(model_config)
                 self._model_instances[model_id] = model_instance
             else:
                 logger.error(f"Failed to create model instance for {model_id}")
@@ -285,6 +297,41 @@ class EmbeddingService:
         
         return self._model_instances.get(model_id)
     
+    def _get_batcher(self, model_config: EmbeddingModelConfig) -> AsyncEmbeddingBatcher:
+        """
+        Get the shared batcher of the model's provider
+        
+        Limits are read from the options of the first model used with the
+        provider (batch_size, max_batch_tokens, max_concurrency,
+        rate_limit_rpm, rate_limit_tpm, max_retries).
+        
+        Args:
+            model_config: Model configuration
+            
+        Returns:
+            AsyncEmbeddingBatcher: Batcher for the provider
+        """
+        options = model_config.options or {}
+        defaults = ProviderLimits()
+        
+        with self._batchers_lock:
+            batcher = self._batchers.get(model_config.provider)
+            if batcher is None:
+                batcher = AsyncEmbeddingBatcher(
+                    limits=ProviderLimits(
+                        max_batch_size=options.get("batch_size", defaults.max_batch_size),
+                        max_batch_tokens=options.get("max_batch_tokens", defaults.max_batch_tokens),
+                        max_concurrency=options.get("max_concurrency", defaults.max_concurrency),
+                        requests_per_minute=options.get("rate_limit_rpm"),
+                        tokens_per_minute=options.get("rate_limit_tpm"),
+                        max_retries=options.get("max_retries", defaults.max_retries)
+                    ),
+                    name=model_config.provider
+                )
+                self._batchers[model_config.provider] = batcher
+        
+        return batcher
+    
     def create_embedding(self, text: str, model_id: Optional[str] = None) -> Optional[List[float]]:
         """
         Create embedding for text
@@ -303,10 +350,10 @@ class EmbeddingService:
             return None
         
         # Check cache
-        cache_key = f"{model_config.id}:{hash(text)}"
+        cache_key = EmbeddingCache.make_key(model_config.id, text)
         cached_embedding = self.cache.get(cache_key)
         if cached_embedding is not None:
-            return cached_embedding
+            return cached_embedding.tolist()
         
         # Get model instance
         model = self._get_model_instance(model_config.id)
@@ -338,7 +385,8 @@ class EmbeddingService:
             model_id: Model ID to use (or None for default model)
             
         Returns:
-            Optional[List[List[float]]]: List of embedding vectors or None if failed
+            Optional[List[List[float]]]: List of embedding vectors or None if failed;
+                entries are None for texts whose batch failed after retries
         """
         # Get model configuration
         model_config = self.get_model_config(model_id)
@@ -352,20 +400,18 @@ class EmbeddingService:
             return None
         
         try:
-            # Check cache for each text
+            # Check cache for all texts at once
+            cache_keys = [EmbeddingCache.make_key(model_config.id, text) for text in texts]
             embeddings = []
             texts_to_embed = []
             indices_to_embed = []
             
-            for i, text in enumerate(texts):
-                cache_key = f"{model_config.id}:{hash(text)}"
-                cached_embedding = self.cache.get(cache_key)
-                
+            for i, cached_embedding in enumerate(self.cache.get_many(cache_keys)):
                 if cached_embedding is not None:
-                    embeddings.append(cached_embedding)
+                    embeddings.append(cached_embedding.tolist())
                 else:
                     # Add to list of texts to embed
-                    texts_to_embed.append(preprocess_text(text))
+                    texts_to_embed.append(preprocess_text(texts[i]))
                     indices_to_embed.append(i)
                     # Add placeholder
                     embeddings.append(None)
@@ -378,14 +424,15 @@ class EmbeddingService:
                 if batch_embeddings is None:
                     return None
                 
-                # Update embeddings and cache
+                # Update embeddings and cache (failed batches are not cached)
                 for j, embedding in enumerate(batch_embeddings):
-                    i = indices_to_embed[j]
-                    text = texts[i]
-                    cache_key = f"{model_config.id}:{hash(text)}"
-                    
-                    embeddings[i] = embedding
-                    self.cache.set(cache_key, embedding)
+                    embeddings[indices_to_embed[j]] = embedding
+                
+                embedded = [j for j, embedding in enumerate(batch_embeddings) if embedding is not None]
+                self.cache.set_many(
+                    [cache_keys[indices_to_embed[j]] for j in embedded],
+                    [batch_embeddings[j] for j in embedded]
+                )
             
             return embeddings
         except Exception as e:
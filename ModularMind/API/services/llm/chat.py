@@ -8,6 +8,7 @@ from typing import List, Dict, Any, Optional, Callable
 
 from ModularMind.API.services.llm.models import LLMProvider
 from ModularMind.API.services.llm.utils import estimate_tokens
+from ModularMind.API.services.llm.rate_limiter import RateLimitTimeout, split_rate_limit_options
 
 logger = logging.getLogger(__name__)
 
@@ -63,39 +64,42 @@ def process_chat_completion(
     # Başlangıç zamanı
     start_time = time.time()
     
+    # Hız sınırı ayarlarını sağlayıcı seçeneklerinden ayır
+    priority, rate_limit_timeout, provider_options = split_rate_limit_options(options)
+    
     try:
-        # Hız sınırlamasını kontrol et
-        llm_service._check_rate_limit(model_id)
-        
         # Girdi token sayısını tahmin et
         estimated_input_tokens = sum(estimate_tokens(m["content"], model_config) for m in messages)
         
+        # Hız sınırı slotu alınana kadar bekle (öncelik ve süre sınırı sağlayıcıya iletilmez)
+        llm_service._check_rate_limit(model_id, estimated_input_tokens + tokens, priority, rate_limit_timeout)
+        
         # Model sağlayıcısına göre sohbet tamamlama
         provider = model_config.provider
         
         if provider == LLMProvider.OPENAI:
             from ModularMind.API.services.llm.providers import openai_provider
-            result = openai_provider.chat(llm_service, messages, model_config, tokens, temp, p, stop_sequences, is_streaming, streaming_callback, options)
+            result = openai_provider.chat(llm_service, messages, model_config, tokens, temp, p, stop_sequences, is_streaming, streaming_callback, provider_options)
             
         elif provider == LLMProvider.AZURE_OPENAI:
             from ModularMind.API.services.llm.providers import azure_openai_provider
-            result = azure_openai_provider.chat(llm_service, messages, model_config, tokens, temp, p, stop_sequences, is_streaming, streaming_callback, options)
+            result = azure_openai_provider.chat(llm_service, messages, model_config, tokens, temp, p, stop_sequences, is_streaming, streaming_callback, provider_options)
             
         elif provider == LLMProvider.ANTHROPIC:
             from ModularMind.API.services.llm.providers import anthropic_provider
-            result = anthropic_provider.chat(llm_service, messages, model_config, tokens, temp, p, stop_sequences, is_streaming, streaming_callback, options)
+            result = anthropic_provider.chat(llm_service, messages, model_config, tokens, temp, p, stop_sequences, is_streaming, streaming_callback, provider_options)
             
         elif provider == LLMProvider.GOOGLE:
             from ModularMind.API.services.llm.providers import google_provider
-            result = google_provider.chat(llm_service, messages, model_config, tokens, temp, p, stop_sequences, is_streaming, streaming_callback, options)
+            result = google_provider.chat(llm_service, messages, model_config, tokens, temp, p, stop_sequences, is_streaming, streaming_callback, provider_options)
             
         elif provider == LLMProvider.COHERE:
             from ModularMind.API.services.llm.providers import cohere_provider
-            result = cohere_provider.chat(llm_service, messages, model_config, tokens, temp, p, stop_sequences, is_streaming, streaming_callback, options)
+            result = cohere_provider.chat(llm_service, messages, model_config, tokens, temp, p, stop_sequences, is_streaming, streaming_callback, provider_options)
             
         elif provider in [LLMProvider.HUGGINGFACE, LLMProvider.REPLICATE, LLMProvider.OLLAMA, LLMProvider.LOCAL, LLMProvider.CUSTOM]:
             # Sohbet formatlı olmayan modeller için uyarlama
-            result = adapt_messages_to_completion(llm_service, messages, model_config, tokens, temp, p, stop_sequences, is_streaming, streaming_callback, options)
+            result = adapt_messages_to_completion(llm_service, messages, model_config, tokens, temp, p, stop_sequences, is_streaming, streaming_callback, provider_options)
             
         else:
             logger.error(f"Desteklenmeyen LLM sağlayıcısı: {provider}")
@@ -109,8 +113,17 @@ def process_chat_completion(
         estimated_output_tokens = estimate_tokens(result.get("content", ""), model_config)
         llm_service._update_token_usage(model_id, estimated_input_tokens, estimated_output_tokens)
         
+        # Ayrılan token kapasitesini gerçek kullanıma göre düzelt
+        llm_service.rate_limiter.adjust_tokens(model_id, estimated_output_tokens - tokens)
+        
         return result
         
+    except RateLimitTimeout as e:
+        # Süre sınırı dolduysa yeniden denemek beklemeyi uzatmaktan öteye geçmez
+        llm_service._update_error_counter(model_id)
+        logger.warning(str(e))
+        return {"role": "assistant", "content": f"[Sohbet tamamlama hatası: {str(e)}]"}
+        
     except Exception as e:
         # Hata sayacını güncelle
         llm_service._update_error_counter(model_id)
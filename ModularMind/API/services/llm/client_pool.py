@@ -0,0 +1,241 @@
+"""
+LLM sağlayıcıları için uzun ömürlü, havuzlu HTTP istemcileri.
+"""
+
+import asyncio
+import importlib.util
+import logging
+import threading
+import weakref
+from dataclasses import dataclass, replace
+from typing import Dict, Any, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# HTTP/2 için h2 paketi gerekir; yoksa HTTP/1.1 keep-alive kullanılır
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Bağlantı kurma süresi sınırı (saniye); okuma süresi istek başına verilir
+DEFAULT_CONNECT_TIMEOUT = 10.0
+
+@dataclass(frozen=True)
+class ConnectionLimits:
+    """Sağlayıcı başına bağlantı havuzu sınırları."""
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 60.0
+    http2: bool = True
+
+    def to_httpx(self) -> httpx.Limits:
+        """httpx havuz sınırlarına dönüştürür."""
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry
+        )
+
+# Varsayılan sınırlar; yerel sunucular (Ollama) az sayıda eşzamanlı isteği kaldırır
+DEFAULT_LIMITS: Dict[str, ConnectionLimits] = {
+    "openai": ConnectionLimits(max_connections=50, max_keepalive_connections=20),
+    "azure_openai": ConnectionLimits(max_connections=50, max_keepalive_connections=20),
+    "huggingface": ConnectionLimits(max_connections=20, max_keepalive_connections=10),
+    "ollama": ConnectionLimits(max_connections=8, max_keepalive_connections=8, keepalive_expiry=300.0),
+    "custom": ConnectionLimits(max_connections=20, max_keepalive_connections=10)
+}
+
+class ProviderClientRegistry:
+    """
+    Sağlayıcı başına paylaşılan HTTP ve SDK istemcilerini tutar.
+
+    İstemciler ilk kullanımda oluşturulur ve süreç boyunca yeniden
+    kullanılır; böylece TCP/TLS bağlantı kurulumu istek başına gecikmeden
+    çıkar. h2 paketi kuruluysa HTTPS üzerinden HTTP/2 ile tek bağlantıda
+    çoklu istek yapılır.
+
+    Asenkron istemciler bir olay döngüsüne bağlı olduğundan döngü başına
+    ayrı tutulur; döngü kapandığında referansları bırakılır.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, ConnectionLimits]] = None):
+        """
+        Args:
+            limits: Sağlayıcı adı -> bağlantı sınırları (varsayılanların üzerine yazar)
+        """
+        self.limits = {**DEFAULT_LIMITS, **(limits or {})}
+        self._lock = threading.Lock()
+        self._clients: Dict[str, httpx.Client] = {}
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, httpx.AsyncClient]]" = weakref.WeakKeyDictionary()
+        self._sdk_clients: Dict[Tuple, Any] = {}
+        self._async_sdk_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple, Any]]" = weakref.WeakKeyDictionary()
+
+    def get_limits(self, provider: str) -> ConnectionLimits:
+        """
+        Sağlayıcının bağlantı sınırlarını döndürür.
+
+        Args:
+            provider: Sağlayıcı adı
+
+        Returns:
+            ConnectionLimits: Bağlantı sınırları
+        """
+        return self.limits.get(provider, ConnectionLimits())
+
+    def configure(self, provider: str, **limits) -> None:
+        """
+        Sağlayıcının bağlantı sınırlarını değiştirir.
+
+        Mevcut istemciler kapatılmaz; yeni sınırlar sonraki istemcilerde geçerlidir.
+
+        Args:
+            provider: Sağlayıcı adı
+            **limits: ConnectionLimits alanları
+        """
+        with self._lock:
+            self.limits[provider] = replace(self.get_limits(provider), **limits)
+
+    def http_client(self, provider: str) -> httpx.Client:
+        """
+        Sağlayıcının paylaşılan senkron HTTP istemcisini döndürür.
+
+        Args:
+            provider: Sağlayıcı adı
+
+        Returns:
+            httpx.Client: Havuzlu istemci
+        """
+        with self._lock:
+            client = self._clients.get(provider)
+            if client is None or client.is_closed:
+                client = httpx.Client(**self._client_options(provider))
+                self._clients[provider] = client
+                logger.debug(f"HTTP istemcisi oluşturuldu: {provider}")
+            return client
+
+    def async_http_client(self, provider: str) -> httpx.AsyncClient:
+        """
+        Sağlayıcının çalışan olay döngüsüne ait paylaşılan asenkron HTTP istemcisini döndürür.
+
+        Args:
+            provider: Sağlayıcı adı
+
+        Returns:
+            httpx.AsyncClient: Havuzlu istemci
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            clients = self._async_clients.setdefault(loop, {})
+            client = clients.get(provider)
+            if client is None or client.is_closed:
+                client = httpx.AsyncClient(**self._client_options(provider))
+                clients[provider] = client
+                logger.debug(f"Asenkron HTTP istemcisi oluşturuldu: {provider}")
+            return client
+
+    def openai_client(self, api_key: str, base_url: Optional[str] = None, provider: str = "openai", **kwargs):
+        """
+        Paylaşılan HTTP istemcisini kullanan OpenAI SDK istemcisini döndürür.
+
+        Args:
+            api_key: API anahtarı
+            base_url: API adresi (None = varsayılan)
+            provider: Bağlantı sınırlarının alınacağı sağlayıcı adı
+            **kwargs: SDK istemcisine iletilecek ek argümanlar
+
+        Returns:
+            openai.OpenAI: SDK istemcisi
+        """
+        import openai
+
+        key = (provider, api_key, base_url, tuple(sorted(kwargs.items())))
+        http_client = self.http_client(provider)
+        with self._lock:
+            client = self._sdk_clients.get(key)
+            if client is None:
+                client = openai.OpenAI(api_key=api_key, base_url=base_url, http_client=http_client, **kwargs)
+                self._sdk_clients[key] = client
+            return client
+
+    def async_openai_client(self, api_key: str, base_url: Optional[str] = None, provider: str = "openai", **kwargs):
+        """
+        Paylaşılan asenkron HTTP istemcisini kullanan OpenAI SDK istemcisini döndürür.
+
+        Args:
+            api_key: API anahtarı
+            base_url: API adresi (None = varsayılan)
+            provider: Bağlantı sınırlarının alınacağı sağlayıcı adı
+            **kwargs: SDK istemcisine iletilecek ek argümanlar
+
+        Returns:
+            openai.AsyncOpenAI: SDK istemcisi
+        """
+        import openai
+
+        key = (provider, api_key, base_url, tuple(sorted(kwargs.items())))
+        http_client = self.async_http_client(provider)
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            clients = self._async_sdk_clients.setdefault(loop, {})
+            client = clients.get(key)
+            if client is None:
+                client = openai.AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=http_client, **kwargs)
+                clients[key] = client
+            return client
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Açık istemci sayılarını döndürür.
+
+        Returns:
+            Dict[str, Any]: İstemci istatistikleri
+        """
+        with self._lock:
+            return {
+                "http2": HTTP2_AVAILABLE,
+                "sync_clients": sorted(provider for provider, client in self._clients.items() if not client.is_closed),
+                "async_clients": sum(len(clients) for clients in self._async_clients.values()),
+                "sdk_clients": len(self._sdk_clients)
+            }
+
+    def close(self) -> None:
+        """Senkron istemcileri kapatır."""
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+            self._sdk_clients.clear()
+
+        for client in clients:
+            client.close()
+
+    async def aclose(self) -> None:
+        """Çalışan döngünün asenkron istemcilerini ve senkron istemcileri kapatır."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            clients = list(self._async_clients.pop(loop, {}).values())
+            self._async_sdk_clients.pop(loop, None)
+
+        for client in clients:
+            await client.aclose()
+
+        self.close()
+
+    def _client_options(self, provider: str) -> Dict[str, Any]:
+        limits = self.get_limits(provider)
+        return {
+            "limits": limits.to_httpx(),
+            "http2": limits.http2 and HTTP2_AVAILABLE,
+            "timeout": httpx.Timeout(None, connect=DEFAULT_CONNECT_TIMEOUT)
+        }
+
+# Paylaşılan örnek
+_registry: Optional[ProviderClientRegistry] = None
+_registry_lock = threading.Lock()
+
+def get_client_registry() -> ProviderClientRegistry:
+    """Paylaşılan istemci kayıt defterini döndürür."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ProviderClientRegistry()
+        return _registry
@@ -0,0 +1,453 @@
+"""
+LLM tamamlama önbelleği.
+Deterministik (sıcaklık 0) istekler için model, normalize edilmiş mesajlar
+ve parametrelerle anahtarlanan yanıtları saklar.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DISK_CACHE_FILE = "completion_cache.sqlite"
+
+# Sistem mesajı olmayan isteklerin önek özeti
+EMPTY_PREFIX = "-"
+
+class CompletionCache:
+    """
+    LLM yanıtları için iki katmanlı önbellek.
+
+    Bellek katmanı TTL'li bir LRU'dur. `backend` "disk" ise girdiler
+    sqlite dosyasına, "redis" ise Redis'e de yazılır; bellek ıskaları bu
+    katmandan okunup belleğe alınır. Böylece yeniden başlatmalar ve (Redis
+    ile) farklı işçiler aynı yanıtları paylaşır.
+
+    Anahtar `model:önek:özet` biçimindedir. Önek, baştaki sistem
+    mesajlarının (talimat şablonunun) özetidir; `invalidate_prefix` ile
+    bir şablon değiştiğinde ona ait tüm yanıtlar tek seferde silinebilir.
+    Özet ise tüm mesajları ve örnekleme parametrelerini kapsar.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 5000,
+        ttl: int = 86400,
+        backend: str = "memory",
+        path: Optional[str] = None,
+        redis_client: Optional[Any] = None,
+        namespace: str = "mm:llm_cache",
+        enabled: bool = True
+    ):
+        """
+        Args:
+            max_entries: Bellekte tutulacak en fazla yanıt sayısı
+            ttl: Yanıt ömrü (saniye, 0 = süresiz)
+            backend: Kalıcı katman ("memory", "disk" veya "redis")
+            path: Disk katmanı dizini
+            redis_client: Redis katmanı için (senkron) Redis istemcisi
+            namespace: Redis anahtar öneki
+            enabled: False ise önbellek hiçbir şey saklamaz
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.backend = backend
+        self.path = path
+        self.redis = redis_client
+        self.namespace = namespace
+        self.enabled = enabled
+
+        # {anahtar: (JSON değer, son geçerlilik zamanı)}
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+        # İzleme sayaçları
+        self.hits = 0
+        self.backend_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.evictions = 0
+
+        if self.backend == "disk":
+            self._open_disk()
+        elif self.backend == "redis" and self.redis is None:
+            logger.warning("Redis istemcisi verilmedi, LLM önbelleği yalnızca bellekte çalışacak")
+            self.backend = "memory"
+
+    @staticmethod
+    def normalize_content(content: str) -> str:
+        """
+        Mesaj içeriğini anahtar için normalize eder.
+
+        Unicode NFC biçimine getirilir, satır içi boşluk dizileri tek
+        boşluğa indirilir ve baştaki/sondaki boşluklar atılır. Büyük/küçük
+        harf korunur; model çıktısını etkileyebilir.
+
+        Args:
+            content: Mesaj içeriği
+
+        Returns:
+            str: Normalize edilmiş içerik
+        """
+        text = unicodedata.normalize("NFC", content or "").strip()
+        return "\n".join(" ".join(line.split()) for line in text.splitlines())
+
+    @classmethod
+    def make_key(cls, model: str, messages: List[Dict[str, str]], params: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Model, mesajlar ve parametrelerden önbellek anahtarı oluşturur.
+
+        Args:
+            model: Model tanımı (sağlayıcı ve model adı)
+            messages: Sohbet mesajları
+            params: Yanıtı etkileyen parametreler (max_tokens, stop, seçenekler...)
+
+        Returns:
+            str: Önbellek anahtarı
+        """
+        normalized = [
+            [message.get("role", ""), cls.normalize_content(message.get("content", ""))]
+            for message in messages
+        ]
+
+        system = [content for role, content in normalized if role == "system"]
+        payload = json.dumps(
+            {"messages": normalized, "params": params or {}},
+            sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str
+        )
+        digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+        return f"{model}:{cls._prefix_digest(system)}:{digest}"
+
+    @staticmethod
+    def is_cacheable(temperature: Optional[float]) -> bool:
+        """
+        Yanıtın önbelleğe alınıp alınamayacağını döndürür.
+
+        Sıfırdan büyük sıcaklıkta her çağrı farklı yanıt bekler.
+
+        Args:
+            temperature: Örnekleme sıcaklığı
+
+        Returns:
+            bool: Önbelleğe alınabilirse True
+        """
+        return temperature is not None and temperature <= 0
+
+    def record_bypass(self) -> None:
+        """Önbelleği atlayan (deterministik olmayan) bir isteği sayar."""
+        with self._lock:
+            self.bypassed += 1
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Önbellekteki yanıtı döndürür.
+
+        Args:
+            key: Önbellek anahtarı
+
+        Returns:
+            Optional[Any]: Yanıt (yoksa veya süresi dolduysa None)
+        """
+        if not self.enabled:
+            return None
+
+        data = self._get_local(key)
+        if data is None and self.backend != "memory":
+            data = self._get_backend(key)
+            if data is not None:
+                self._set_local(key, data)
+                with self._lock:
+                    self.backend_hits += 1
+
+        return self._count(data)
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """
+        Önbellekteki yanıtı olay döngüsünü bloklamadan döndürür.
+
+        Args:
+            key: Önbellek anahtarı
+
+        Returns:
+            Optional[Any]: Yanıt (yoksa veya süresi dolduysa None)
+        """
+        if not self.enabled:
+            return None
+
+        data = self._get_local(key)
+        if data is None and self.backend != "memory":
+            data = await asyncio.to_thread(self._get_backend, key)
+            if data is not None:
+                self._set_local(key, data)
+                with self._lock:
+                    self.backend_hits += 1
+
+        return self._count(data)
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Yanıtı önbelleğe ekler.
+
+        Args:
+            key: Önbellek anahtarı
+            value: JSON'a dönüştürülebilir yanıt (metin veya sohbet mesajı)
+        """
+        if not self.enabled:
+            return
+
+        data = json.dumps(value, ensure_ascii=False)
+        self._set_local(key, data)
+        if self.backend != "memory":
+            self._set_backend(key, data)
+
+    async def aset(self, key: str, value: Any) -> None:
+        """
+        Yanıtı olay döngüsünü bloklamadan önbelleğe ekler.
+
+        Args:
+            key: Önbellek anahtarı
+            value: JSON'a dönüştürülebilir yanıt (metin veya sohbet mesajı)
+        """
+        if not self.enabled:
+            return
+
+        data = json.dumps(value, ensure_ascii=False)
+        self._set_local(key, data)
+        if self.backend != "memory":
+            await asyncio.to_thread(self._set_backend, key, data)
+
+    def invalidate_prefix(self, model: str, system_messages: Optional[List[str]] = None) -> int:
+        """
+        Aynı model ve sistem mesajlarıyla (talimat şablonuyla) üretilmiş yanıtları siler.
+
+        Args:
+            model: Model tanımı
+            system_messages: Sistem mesajı içerikleri (None = sistem mesajı olmayan istekler)
+
+        Returns:
+            int: Bellekten silinen girdi sayısı
+        """
+        prefix = f"{model}:{self._prefix_digest([self.normalize_content(m) for m in system_messages or []])}:"
+
+        with self._lock:
+            keys = [key for key in self._entries if key.startswith(prefix)]
+            for key in keys:
+                del self._entries[key]
+
+        if self.backend == "disk":
+            self._execute("DELETE FROM completions WHERE substr(key, 1, ?) = ?", (len(prefix), prefix))
+        elif self.backend == "redis":
+            try:
+                redis_keys = list(self.redis.scan_iter(match=f"{self.namespace}:{prefix}*"))
+                if redis_keys:
+                    self.redis.delete(*redis_keys)
+            except Exception as e:
+                logger.warning(f"LLM önbelleği Redis silme hatası: {str(e)}")
+
+        return len(keys)
+
+    def clear(self) -> None:
+        """Önbelleği temizler."""
+        with self._lock:
+            self._entries.clear()
+
+        if self.backend == "disk":
+            self._execute("DELETE FROM completions")
+        elif self.backend == "redis":
+            try:
+                redis_keys = list(self.redis.scan_iter(match=f"{self.namespace}:*"))
+                if redis_keys:
+                    self.redis.delete(*redis_keys)
+            except Exception as e:
+                logger.warning(f"LLM önbelleği Redis temizleme hatası: {str(e)}")
+
+    def close(self) -> None:
+        """Disk bağlantısını kapatır."""
+        with self._disk_lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Önbellek istatistiklerini döndürür.
+
+        Returns:
+            Dict[str, Any]: Boyut ve isabet sayaçları
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "backend": self.backend,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "backend_hits": self.backend_hits,
+                "misses": self.misses,
+                "bypassed": self.bypassed,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+    @staticmethod
+    def _prefix_digest(system_messages: List[str]) -> str:
+        if not system_messages:
+            return EMPTY_PREFIX
+        payload = json.dumps(system_messages, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+    def _count(self, data: Optional[str]) -> Optional[Any]:
+        with self._lock:
+            if data is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        # Her isabette yeni kopya döner; çağıranlar değiştirebilir
+        return json.loads(data)
+
+    def _expires_at(self) -> float:
+        return time.time() + self.ttl if self.ttl > 0 else float("inf")
+
+    def _get_local(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            data, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return data
+
+    def _set_local(self, key: str, data: str) -> None:
+        if self.max_entries <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (data, self._expires_at())
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _get_backend(self, key: str) -> Optional[str]:
+        if self.backend == "disk":
+            with self._disk_lock:
+                if self._connection is None:
+                    return None
+                try:
+                    row = self._connection.execute(
+                        "SELECT value, expires_at FROM completions WHERE key = ?", (key,)
+                    ).fetchone()
+                except Exception as e:
+                    logger.error(f"LLM önbelleği disk okuma hatası: {str(e)}")
+                    return None
+
+            if row is None or (row[1] is not None and row[1] <= time.time()):
+                return None
+            return row[0]
+
+        try:
+            data = self.redis.get(f"{self.namespace}:{key}")
+        except Exception as e:
+            logger.warning(f"LLM önbelleği Redis okuma hatası: {str(e)}")
+            return None
+        return data.decode("utf-8") if isinstance(data, bytes) else data
+
+    def _set_backend(self, key: str, data: str) -> None:
+        if self.backend == "disk":
+            expires_at = time.time() + self.ttl if self.ttl > 0 else None
+            self._execute(
+                "INSERT OR REPLACE INTO completions (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, data, expires_at)
+            )
+            return
+
+        try:
+            if self.ttl > 0:
+                self.redis.setex(f"{self.namespace}:{key}", self.ttl, data)
+            else:
+                self.redis.set(f"{self.namespace}:{key}", data)
+        except Exception as e:
+            logger.warning(f"LLM önbelleği Redis yazma hatası: {str(e)}")
+
+    def _open_disk(self) -> None:
+        """Disk veritabanını açar ve süresi dolmuş girdileri temizler."""
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            self._connection = sqlite3.connect(
+                os.path.join(self.path, DISK_CACHE_FILE), check_same_thread=False, timeout=30
+            )
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS completions ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+            )
+            self._connection.execute("DELETE FROM completions WHERE expires_at <= ?", (time.time(),))
+            self._connection.commit()
+        except Exception as e:
+            logger.error(f"LLM önbelleği diski açılamadı, yalnızca bellek kullanılacak: {str(e)}")
+            self._connection = None
+            self.backend = "memory"
+
+    def _execute(self, sql: str, params: Tuple = ()) -> None:
+        with self._disk_lock:
+            if self._connection is None:
+                return
+            try:
+                self._connection.execute(sql, params)
+                self._connection.commit()
+            except Exception as e:
+                logger.error(f"LLM önbelleği disk yazma hatası: {str(e)}")
+
+# Paylaşılan örnek
+_completion_cache: Optional[CompletionCache] = None
+_completion_cache_lock = threading.Lock()
+
+def get_completion_cache(**kwargs) -> CompletionCache:
+    """
+    Paylaşılan tamamlama önbelleğini döndürür.
+
+    İlk çağrıda verilen argümanlarla oluşturulur; verilmeyen ayarlar
+    LLM_CACHE_* ortam değişkenlerinden okunur. Sonraki çağrıların
+    argümanları yok sayılır.
+
+    Returns:
+        CompletionCache: Paylaşılan önbellek
+    """
+    global _completion_cache
+    with _completion_cache_lock:
+        if _completion_cache is None:
+            kwargs.setdefault("enabled", os.getenv("LLM_CACHE_ENABLED", "True").lower() == "true")
+            kwargs.setdefault("backend", os.getenv("LLM_CACHE_BACKEND", "memory"))
+            kwargs.setdefault("ttl", int(os.getenv("LLM_CACHE_TTL", "86400")))
+            kwargs.setdefault("max_entries", int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000")))
+            kwargs.setdefault("path", os.getenv("LLM_CACHE_PATH", "./data/llm_cache"))
+
+            if kwargs["backend"] == "redis" and kwargs.get("redis_client") is None:
+                try:
+                    from ModularMind.API.core.cache import RedisCache
+                    kwargs["redis_client"] = RedisCache.get_client()
+                except Exception as e:
+                    logger.error(f"LLM önbelleği için Redis başlatılamadı: {str(e)}")
+
+            _completion_cache = CompletionCache(**kwargs)
+        return _completion_cache
@@ -79,6 +79,7 @@ def load_model_configs() -> Dict[str, LLMModelConfig]:
                     context_window=config.get("context_window", 8192),
                     streaming=config.get("streaming", False),
                     rate_limit_rpm=config.get("rate_limit_rpm"),
+                    rate_limit_tpm=config.get("rate_limit_tpm"),
                     options=config.get("options")
                 )
     except Exception as e:
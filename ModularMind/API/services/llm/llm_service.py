@@ -18,6 +18,9 @@ from ModularMind.API.services.llm.providers import (
     replicate_provider, ollama_provider, local_provider, custom_provider
 )
 from ModularMind.API.services.llm.utils import estimate_tokens, extract_keywords
+from ModularMind.API.services.llm.rate_limiter import (
+    RequestPriority, RateLimitTimeout, DEFAULT_RATE_LIMIT_TIMEOUT, get_rate_limiter, split_rate_limit_options
+)
 
 logger = logging.getLogger(__name__)
 
@@ -52,8 +55,8 @@ class LLMService:
         self.error_counters = {}
         self.token_usage = {}
         
-        # Hız sınırlama için zamanlayıcılar
-        self.rate_limiters = {}
+        # Model başına istek/token kovaları (süreçteki tüm servislerle paylaşılır)
+        self.rate_limiter = get_rate_limiter()
         
         # Local modeller için instance havuzu
         self.local_models = {}
@@ -113,45 +116,48 @@ class LLMService:
         # Başlangıç zamanı
         start_time = time.time()
         
+        # Hız sınırı ayarlarını sağlayıcı seçeneklerinden ayır
+        priority, rate_limit_timeout, provider_options = split_rate_limit_options(options)
+        
         try:
-            # Hız sınırlamasını kontrol et
-            self._check_rate_limit(model_id)
-            
             # Girdi token sayısını tahmin et
             estimated_input_tokens = estimate_tokens(prompt, model_config)
             
+            # Hız sınırı slotu alınana kadar bekle (öncelik ve süre sınırı sağlayıcıya iletilmez)
+            self._check_rate_limit(model_id, estimated_input_tokens + tokens, priority, rate_limit_timeout)
+            
             # Model sağlayıcısına göre metin üret
             provider = model_config.provider
             
             if provider == LLMProvider.OPENAI:
-                result = openai_provider.generate(self, prompt, model_config, tokens, temp, p, stop_sequences, is_streaming, streaming_callback, system_message, options, self.api_keys)
+                result = openai_provider.generate(self, prompt, model_config, tokens, temp, p, stop_sequences, is_streaming, streaming_callback, system_message, provider_options, self.api_keys)
                 
             elif provider == LLMProvider.AZURE_OPENAI:
-                result = azure_openai_provider.generate(self, prompt, model_config, tokens, temp, p, stop_sequences, is_streaming, streaming_callback, system_message, options, self.api_keys)
+                result = azure_openai_provider.generate(self, prompt, model_config, tokens, temp, p, stop_sequences, is_streaming, streaming_callback, system_message, provider_options, self.api_keys)
                 
             elif provider == LLMProvider.ANTHROPIC:
-                result = anthropic_provider.generate(self, prompt, model_config, tokens, temp, p, stop_sequences, is_streaming, streaming_callback, system_message, options, self.api_keys)
+                result = anthropic_provider.generate(self, prompt, model_config, tokens, temp, p, stop_sequences, is_streaming, streaming_callback, system_message, provider_options, self.api_keys)
                 
             elif provider == LLMProvider.GOOGLE:
-                result = google_provider.generate(self, prompt, model_config, tokens, temp, p, stop_sequences, is_streaming, streaming_callback, system_message, options, self.api_keys)
+                result = google_provider.generate(self, prompt, model_config, tokens, temp, p, stop_sequences, is_streaming, streaming_callback, system_message, provider_options, self.api_keys)
                 
             elif provider == LLMProvider.COHERE:
-                result = cohere_provider.generate(self, prompt, model_config, tokens, temp, p, stop_sequences, is_streaming, streaming_callback, options, self.api_keys)
+                result = cohere_provider.generate(self, prompt, model_config, tokens, temp, p, stop_sequences, is_streaming, streaming_callback, provider_options, self.api_keys)
                 
             elif provider == LLMProvider.HUGGINGFACE:
-                result = huggingface_provider.generate(self, prompt, model_config, tokens, temp, p, stop_sequences, options, self.api_keys)
+                result = huggingface_provider.generate(self, prompt, model_config, tokens, temp, p, stop_sequences, provider_options, self.api_keys)
                 
             elif provider == LLMProvider.REPLICATE:
-                result = replicate_provider.generate(self, prompt, model_config, tokens, temp, p, stop_sequences, system_message, options, self.api_keys)
+                result = replicate_provider.generate(self, prompt, model_config, tokens, temp, p, stop_sequences, system_message, provider_options, self.api_keys)
                 
             elif provider == LLMProvider.OLLAMA:
-                result = ollama_provider.generate(self, prompt, model_config, tokens, temp, p, stop_sequences, system_message, options)
+                result = ollama_provider.generate(self, prompt, model_config, tokens, temp, p, stop_sequences, system_message, provider_options)
                 
             elif provider == LLMProvider.LOCAL:
-                result = local_provider.generate(self, prompt, model_config, tokens, temp, p, stop_sequences, system_message, options, self.local_models)
+                result = local_provider.generate(self, prompt, model_config, tokens, temp, p, stop_sequences, system_message, provider_options, self.local_models)
                 
             elif provider == LLMProvider.CUSTOM:
-                result = custom_provider.generate(self, prompt, model_config, tokens, temp, p, stop_sequences, is_streaming, streaming_callback, system_message, options, self.api_keys)
+                result = custom_provider.generate(self, prompt, model_config, tokens, temp, p, stop_sequences, is_streaming, streaming_callback, system_message, provider_options, self.api_keys)
                 
             else:
                 logger.error(f"Desteklenmeyen LLM sağlayıcısı: {provider}")
@@ -165,8 +171,17 @@ class LLMService:
             estimated_output_tokens = estimate_tokens(result, model_config)
             self._update_token_usage(model_id, estimated_input_tokens, estimated_output_tokens)
             
+            # Ayrılan token kapasitesini gerçek kullanıma göre düzelt
+            self.rate_limiter.adjust_tokens(model_id, estimated_output_tokens - tokens)
+            
             return result
             
+        except RateLimitTimeout as e:
+            # Süre sınırı dolduysa yeniden denemek beklemeyi uzatmaktan öteye geçmez
+            self._update_error_counter(model_id)
+            logger.warning(str(e))
+            return f"[Metin üretme hatası: {str(e)}]"
+            
         except Exception as e:
             # Hata sayacını güncelle
             self._update_error_counter(model_id)
@@ -390,6 +405,7 @@ class LLMService:
             "response_times": self.response_times,
             "error_counters": self.error_counters,
             "token_usage": self.token_usage,
+            "rate_limits": self.rate_limiter.stats(),
             "available_models": len(self.get_available_models())
         }
     
@@ -495,41 +511,39 @@ class LLMService:
         self.token_usage[model_id]["output_tokens"] += output_tokens
         self.token_usage[model_id]["total_tokens"] += input_tokens + output_tokens
     
-    def _check_rate_limit(self, model_id: str) -> None:
+    def _check_rate_limit(
+        self,
+        model_id: str,
+        tokens: int = 0,
+        priority: int = RequestPriority.NORMAL,
+        timeout: Optional[float] = DEFAULT_RATE_LIMIT_TIMEOUT
+    ) -> float:
         """
-        Hız sınırlamasını kontrol eder.
+        Hız sınırı slotu alınana kadar bekler.
+        
+        Sınır dolduğunda hata vermek yerine istek öncelik sırasıyla
+        kuyruğa alınır ve kapasite açıldığında devam eder. Olay döngüsü
+        iş parçacığından çağrılırsa döngüyü dondurmamak için beklemeden
+        hata verir; asenkron uç noktalar servisi iş parçacığında çağırmalıdır.
         
         Args:
             model_id: Model ID
+            tokens: İsteğin tahmini token maliyeti (girdi + en fazla çıktı)
+            priority: Öncelik sınıfı
+            timeout: En fazla bekleme süresi (None = süresiz)
+            
+        Returns:
+            float: Beklenen süre (saniye)
             
         Raises:
-            Exception: Hız sınırı aşıldığında
+            RateLimitTimeout: Süre dolmadan slot alınamazsa
         """
         model_config = self.models[model_id]
-        rate_limit = model_config.rate_limit_rpm
-        
-        if not rate_limit:
-            return
-            
-        # Zamanlayıcıyı başlat
-        if model_id not in self.rate_limiters:
-            self.rate_limiters[model_id] = {
-                "count": 0,
-                "last_reset": time.time()
-            }
-        
-        # Geçen süreyi kontrol et
-        limiter = self.rate_limiters[model_id]
-        elapsed = time.time() - limiter["last_reset"]
-        
-        # 1 dakika geçtiyse sıfırla
-        if elapsed >= 60:
-            limiter["count"] = 0
-            limiter["last_reset"] = time.time()
-        
-        # Sınırı kontrol et
-        if limiter["count"] >= rate_limit:
-            raise Exception(f"Hız sınırı aşıldı: {rate_limit} istek/dakika. Lütfen {60 - elapsed:.1f} saniye bekleyin.")
-        
-        # Sayacı artır
-        limiter["count"] += 1
\ No newline at end of file
+        return self.rate_limiter.acquire(
+            model_id,
+            getattr(model_config, "rate_limit_rpm", None),
+            getattr(model_config, "rate_limit_tpm", None),
+            tokens=tokens,
+            priority=priority,
+            timeout=timeout
+        )
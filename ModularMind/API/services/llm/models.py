@@ -23,7 +23,9 @@ class LLMModelConfig:
         temperature: float = 0.7,
         top_p: float = 1.0,
         stop_sequences: Optional[List[str]] = None,
-        options: Optional[Dict[str, Any]] = None
+        options: Optional[Dict[str, Any]] = None,
+        rate_limit_rpm: Optional[int] = None,
+        rate_limit_tpm: Optional[int] = None
     ):
         self.id = id
         self.provider = provider
@@ -35,6 +37,8 @@ class LLMModelConfig:
         self.top_p = top_p
         self.stop_sequences = stop_sequences or []
         self.options = options or {}
+        self.rate_limit_rpm = rate_limit_rpm
+        self.rate_limit_tpm = rate_limit_tpm
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'LLMModelConfig':
@@ -49,7 +53,9 @@ class LLMModelConfig:
             temperature=data.get("temperature", 0.7),
             top_p=data.get("top_p", 1.0),
             stop_sequences=data.get("stop_sequences"),
-            options=data.get("options")
+            options=data.get("options"),
+            rate_limit_rpm=data.get("rate_limit_rpm"),
+            rate_limit_tpm=data.get("rate_limit_tpm")
         )
     
     def to_dict(self) -> Dict[str, Any]:
@@ -64,7 +70,9 @@ class LLMModelConfig:
             "temperature": self.temperature,
             "top_p": self.top_p,
             "stop_sequences": self.stop_sequences,
-            "options": self.options
+            "options": self.options,
+            "rate_limit_rpm": self.rate_limit_rpm,
+            "rate_limit_tpm": self.rate_limit_tpm
         }
     
     def __str__(self) -> str:
@@ -3,8 +3,10 @@
 """
 
 import logging
-import requests
-from typing import List, Dict, Any, Optional, Callable
+import json
+from typing import List, Dict, Any, Optional, Callable, Tuple
+
+from ModularMind.API.services.llm.client_pool import get_client_registry
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +30,82 @@ def generate(
     Returns:
         str: Üretilen metin
     """
+    api_url, params, headers = _build_request(
+        model_config, prompt, max_tokens, temperature, top_p,
+        stop_sequences, system_message, options, api_keys
+    )
+    
+    # Streaming modunda
+    if is_streaming and streaming_callback:
+        return _stream_from_custom_api(api_url, params, headers, model_config, streaming_callback)
+    
+    # Normal istek (paylaşılan bağlantı havuzu üzerinden)
+    try:
+        response = get_client_registry().http_client("custom").post(
+            api_url,
+            headers=headers,
+            json=params,
+            timeout=model_config.timeout
+        )
+        return _parse_response(response)
+            
+    except Exception as e:
+        logger.error(f"Özel API metin üretme hatası: {str(e)}")
+        return f"[Özel API metin üretme hatası: {str(e)}]"
+
+async def agenerate(
+    llm_service,
+    prompt: str, 
+    model_config, 
+    max_tokens: int, 
+    temperature: float, 
+    top_p: float, 
+    stop_sequences: Optional[List[str]],
+    system_message: Optional[str],
+    options: Optional[Dict[str, Any]],
+    api_keys: Dict[str, str]
+) -> str:
+    """
+    Özel API ile olay döngüsünü bloklamadan metin üretir.
+    
+    Returns:
+        str: Üretilen metin
+    """
+    api_url, params, headers = _build_request(
+        model_config, prompt, max_tokens, temperature, top_p,
+        stop_sequences, system_message, options, api_keys
+    )
+    
+    try:
+        response = await get_client_registry().async_http_client("custom").post(
+            api_url,
+            headers=headers,
+            json=params,
+            timeout=model_config.timeout
+        )
+        return _parse_response(response)
+            
+    except Exception as e:
+        logger.error(f"Özel API metin üretme hatası: {str(e)}")
+        return f"[Özel API metin üretme hatası: {str(e)}]"
+
+def _build_request(
+    model_config,
+    prompt: str,
+    max_tokens: int,
+    temperature: float,
+    top_p: float,
+    stop_sequences: Optional[List[str]],
+    system_message: Optional[str],
+    options: Optional[Dict[str, Any]],
+    api_keys: Dict[str, str]
+) -> Tuple[str, Dict[str, Any], Dict[str, str]]:
+    """
+    Özel API isteğinin URL, parametre ve başlıklarını oluşturur.
+    
+    Returns:
+        Tuple[str, Dict[str, Any], Dict[str, str]]: (URL, parametreler, başlıklar)
+    """
     # Base URL
     base_url = model_config.base_url
     if not base_url:
@@ -77,43 +155,30 @@ def generate(
     endpoint = model_config.options.get("endpoint", "/generate")
     api_url = f"{base_url}{endpoint}"
     
-    # Streaming modunda
-    if is_streaming and streaming_callback:
-        return _stream_from_custom_api(api_url, params, headers, model_config, streaming_callback)
-    
-    # Normal istek
-    try:
-        response = requests.post(
-            api_url,
-            headers=headers,
-            json=params,
-            timeout=model_config.timeout
-        )
+    return api_url, params, headers
+
+def _parse_response(response) -> str:
+    """Farklı yanıt formatlarındaki metni döndürür."""
+    # Yanıtı işle
+    if response.status_code == 200:
+        result = response.json()
         
-        # Yanıtı işle
-        if response.status_code == 200:
-            result = response.json()
-            
-            # Farklı yanıt formatlarını kontrol et
-            if "text" in result:
-                return result["text"]
-            elif "generated_text" in result:
-                return result["generated_text"]
-            elif "content" in result:
-                return result["content"]
-            elif "completion" in result:
-                return result["completion"]
-            elif "output" in result:
-                return result["output"]
-            else:
-                return str(result)
+        # Farklı yanıt formatlarını kontrol et
+        if "text" in result:
+            return result["text"]
+        elif "generated_text" in result:
+            return result["generated_text"]
+        elif "content" in result:
+            return result["content"]
+        elif "completion" in result:
+            return result["completion"]
+        elif "output" in result:
+            return result["output"]
         else:
-            logger.error(f"Özel API hatası: {response.status_code} - {response.text}")
-            return f"[Özel API hatası: {response.status_code}]"
-            
-    except Exception as e:
-        logger.error(f"Özel API metin üretme hatası: {str(e)}")
-        return f"[Özel API metin üretme hatası: {str(e)}]"
+            return str(result)
+    else:
+        logger.error(f"Özel API hatası: {response.status_code} - {response.text}")
+        return f"[Özel API hatası: {response.status_code}]"
 
 def _stream_from_custom_api(
     api_url: str,
@@ -139,17 +204,18 @@ def _stream_from_custom_api(
     params["stream"] = True
     
     try:
-        # Streaming isteği gönder
-        with requests.post(
+        # Streaming isteği gönder (paylaşılan bağlantı havuzu üzerinden)
+        with get_client_registry().http_client("custom").stream(
+            "POST",
             api_url,
             headers=headers,
             json=params,
-            timeout=model_config.timeout,
-            stream=True
+            timeout=model_config.timeout
         ) as response:
             response_text = ""
             
             if response.status_code != 200:
+                response.read()
                 logger.error(f"Özel API streaming hatası: {response.status_code} - {response.text}")
                 return f"[Özel API streaming hatası: {response.status_code}]"
             
@@ -160,7 +226,7 @@ def _stream_from_custom_api(
                 
                 try:
                     # JSON formatını kontrol et
-                    if line.startswith(b"data: "):
+                    if line.startswith("data: "):
                         line = line[6:]  # "data: " kısmını kaldır
                     
                     # JSON çözümle
@@ -3,8 +3,9 @@ HuggingFace LLM Sağlayıcısı.
 """
 
 import logging
-import requests
-from typing import List, Dict, Any, Optional, Callable
+from typing import List, Dict, Any, Optional, Callable, Tuple
+
+from ModularMind.API.services.llm.client_pool import get_client_registry
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +26,74 @@ def generate(
     Returns:
         str: Üretilen metin
     """
+    model_url, params, headers = _build_request(
+        prompt, model_config, max_tokens, temperature, top_p, stop_sequences, options, api_keys
+    )
+    
+    # İstek gönder (paylaşılan bağlantı havuzu üzerinden)
+    try:
+        response = get_client_registry().http_client("huggingface").post(
+            model_url,
+            headers=headers,
+            json=params,
+            timeout=model_config.timeout
+        )
+        return _parse_response(response)
+            
+    except Exception as e:
+        logger.error(f"Hugging Face metin üretme hatası: {str(e)}")
+        return f"[Hugging Face metin üretme hatası: {str(e)}]"
+
+async def agenerate(
+    llm_service,
+    prompt: str, 
+    model_config, 
+    max_tokens: int, 
+    temperature: float, 
+    top_p: float, 
+    stop_sequences: Optional[List[str]],
+    options: Optional[Dict[str, Any]],
+    api_keys: Dict[str, str]
+) -> str:
+    """
+    Hugging Face modeliyle olay döngüsünü bloklamadan metin üretir.
+    
+    Returns:
+        str: Üretilen metin
+    """
+    model_url, params, headers = _build_request(
+        prompt, model_config, max_tokens, temperature, top_p, stop_sequences, options, api_keys
+    )
+    
+    try:
+        response = await get_client_registry().async_http_client("huggingface").post(
+            model_url,
+            headers=headers,
+            json=params,
+            timeout=model_config.timeout
+        )
+        return _parse_response(response)
+            
+    except Exception as e:
+        logger.error(f"Hugging Face metin üretme hatası: {str(e)}")
+        return f"[Hugging Face metin üretme hatası: {str(e)}]"
+
+def _build_request(
+    prompt: str,
+    model_config,
+    max_tokens: int,
+    temperature: float,
+    top_p: float,
+    stop_sequences: Optional[List[str]],
+    options: Optional[Dict[str, Any]],
+    api_keys: Dict[str, str]
+) -> Tuple[str, Dict[str, Any], Dict[str, str]]:
+    """
+    Inference API isteğinin URL, parametre ve başlıklarını oluşturur.
+    
+    Returns:
+        Tuple[str, Dict[str, Any], Dict[str, str]]: (URL, parametreler, başlıklar)
+    """
     # API anahtarını al
     api_key = api_keys.get(model_config.api_key_env, "")
     
@@ -58,36 +127,27 @@ def generate(
             if key not in params["parameters"]:
                 params["parameters"][key] = value
     
-    # İstek gönder
-    try:
-        response = requests.post(
-            model_url,
-            headers=headers,
-            json=params,
-            timeout=model_config.timeout
-        )
+    return model_url, params, headers
+
+def _parse_response(response) -> str:
+    """Yanıt formatındaki üretilen metni döndürür."""
+    # Yanıtı işle
+    if response.status_code == 200:
+        result = response.json()
         
-        # Yanıtı işle
-        if response.status_code == 200:
-            result = response.json()
-            
-            # Yanıt formatını kontrol et
-            if isinstance(result, list) and len(result) > 0:
-                if "generated_text" in result[0]:
-                    return result[0]["generated_text"]
-                else:
-                    return str(result[0])
-            elif isinstance(result, dict):
-                if "generated_text" in result:
-                    return result["generated_text"]
-                else:
-                    return str(result)
+        # Yanıt formatını kontrol et
+        if isinstance(result, list) and len(result) > 0:
+            if "generated_text" in result[0]:
+                return result[0]["generated_text"]
+            else:
+                return str(result[0])
+        elif isinstance(result, dict):
+            if "generated_text" in result:
+                return result["generated_text"]
             else:
                 return str(result)
         else:
-            logger.error(f"Hugging Face API hatası: {response.status_code} - {response.text}")
-            return f"[Hugging Face API hatası: {response.status_code}]"
-            
-    except Exception as e:
-        logger.error(f"Hugging Face metin üretme hatası: {str(e)}")
-        return f"[Hugging Face metin üretme hatası: {str(e)}]"
\ No newline at end of file
+            return str(result)
+    else:
+        logger.error(f"Hugging Face API hatası: {response.status_code} - {response.text}")
+        return f"[Hugging Face API hatası: {response.status_code}]"
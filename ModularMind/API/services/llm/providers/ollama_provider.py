@@ -4,81 +4,173 @@ Ollama LLM Sağlayıcısı.
 
 import logging
 import json
-import requests
 from typing import List, Dict, Any, Optional, Callable
 
+from ModularMind.API.services.llm.client_pool import get_client_registry
+
 logger = logging.getLogger(__name__)
 
 def generate(
     llm_service,
-    prompt: str, 
-    model_config, 
-    max_tokens: int, 
-    temperature: float, 
-    top_p: float, 
+    prompt: str,
+    model_config,
+    max_tokens: int,
+    temperature: float,
+    top_p: float,
     stop_sequences: Optional[List[str]],
     system_message: Optional[str],
     options: Optional[Dict[str, Any]]
 ) -> str:
     """
     Ollama modeliyle metin üretir.
-    
+
+    Returns:
+        str: Üretilen metin
+    """
+    api_url = _api_url(model_config, "/api/generate")
+    params = _build_params(model_config, max_tokens, temperature, top_p, stop_sequences, options)
+    params["prompt"] = prompt
+
+    if system_message:
+        params["system"] = system_message
+
+    # İstek gönder (paylaşılan bağlantı havuzu üzerinden)
+    try:
+        response = get_client_registry().http_client("ollama").post(
+            api_url,
+            json=params,
+            timeout=model_config.timeout
+        )
+        return _parse_generate_response(response)
+
+    except Exception as e:
+        logger.error(f"Ollama metin üretme hatası: {str(e)}")
+        return f"[Ollama metin üretme hatası: {str(e)}]"
+
+async def agenerate(
+    llm_service,
+    prompt: str,
+    model_config,
+    max_tokens: int,
+    temperature: float,
+    top_p: float,
+    stop_sequences: Optional[List[str]],
+    system_message: Optional[str],
+    options: Optional[Dict[str, Any]]
+) -> str:
+    """
+    Ollama modeliyle olay döngüsünü bloklamadan metin üretir.
+
     Returns:
         str: Üretilen metin
     """
-    # Ollama API URL'sini oluştur
+    api_url = _api_url(model_config, "/api/generate")
+    params = _build_params(model_config, max_tokens, temperature, top_p, stop_sequences, options)
+    params["prompt"] = prompt
+
+    if system_message:
+        params["system"] = system_message
+
+    try:
+        response = await get_client_registry().async_http_client("ollama").post(
+            api_url,
+            json=params,
+            timeout=model_config.timeout
+        )
+        return _parse_generate_response(response)
+
+    except Exception as e:
+        logger.error(f"Ollama metin üretme hatası: {str(e)}")
+        return f"[Ollama metin üretme hatası: {str(e)}]"
+
+async def achat(
+    llm_service,
+    messages: List[Dict[str, str]],
+    model_config,
+    max_tokens: int,
+    temperature: float,
+    top_p: float,
+    stop_sequences: Optional[List[str]],
+    options: Optional[Dict[str, Any]]
+) -> Dict[str, str]:
+    """
+    Ollama modeliyle olay döngüsünü bloklamadan sohbet mesajı üretir.
+
+    Returns:
+        Dict[str, str]: Üretilen sohbet mesajı
+    """
+    api_url = _api_url(model_config, "/api/chat")
+    params = _build_params(model_config, max_tokens, temperature, top_p, stop_sequences, options)
+    params["messages"] = [{"role": message["role"], "content": message["content"]} for message in messages]
+    params["stream"] = False
+
+    try:
+        response = await get_client_registry().async_http_client("ollama").post(
+            api_url,
+            json=params,
+            timeout=model_config.timeout
+        )
+
+        if response.status_code == 200:
+            message = response.json().get("message", {})
+            return {"role": message.get("role", "assistant"), "content": message.get("content", "")}
+
+        logger.error(f"Ollama API hatası: {response.status_code} - {response.text}")
+        return {"role": "assistant", "content": f"[Ollama API hatası: {response.status_code}]"}
+
+    except Exception as e:
+        logger.error(f"Ollama sohbet hatası: {str(e)}")
+        return {"role": "assistant", "content": f"[Ollama sohbet hatası: {str(e)}]"}
+
+def _api_url(model_config, path: str) -> str:
+    """Ollama API URL'sini oluşturur."""
     base_url = model_config.base_url or "http://localhost:11434"
-    api_url = f"{base_url}/api/generate"
-    
-    # İstek parametreleri
+    return f"{base_url}{path}"
+
+def _build_params(
+    model_config,
+    max_tokens: int,
+    temperature: float,
+    top_p: float,
+    stop_sequences: Optional[List[str]],
+    options: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Model ve örnekleme parametrelerini oluşturur."""
     params = {
         "model": model_config.model_id,
-        "prompt": prompt,
         "options": {
             "num_predict": max_tokens,
             "temperature": temperature,
             "top_p": top_p
         }
     }
-    
-    if system_message:
-        params["system"] = system_message
-        
+
     if stop_sequences:
         params["options"]["stop"] = stop_sequences
-        
+
     # Ek parametreler
     if options:
         for key, value in options.items():
             if key not in params["options"]:
                 params["options"][key] = value
-    
-    # İstek gönder
-    try:
-        response = requests.post(
-            api_url,
-            json=params,
-            timeout=model_config.timeout
-        )
-        
-        # Yanıtı işle
-        if response.status_code == 200:
-            # Ollama JSON satırları döndürür
-            lines = response.text.strip().split("\n")
-            result = ""
-            
-            for line in lines:
-                try:
-                    data = json.loads(line)
-                    result += data.get("response", "")
-                except json.JSONDecodeError:
-                    continue
-            
-            return result
-        else:
-            logger.error(f"Ollama API hatası: {response.status_code} - {response.text}")
-            return f"[Ollama API hatası: {response.status_code}]"
-            
-    except Exception as e:
-        logger.error(f"Ollama metin üretme hatası: {str(e)}")
-        return f"[Ollama metin üretme hatası: {str(e)}]"
\ No newline at end of file
+
+    return params
+
+def _parse_generate_response(response) -> str:
+    """/api/generate yanıtını metne dönüştürür."""
+    if response.status_code == 200:
+        # Ollama JSON satırları döndürür
+        lines = response.text.strip().split("\n")
+        result = ""
+
+        for line in lines:
+            try:
+                data = json.loads(line)
+                result += data.get("response", "")
+            except json.JSONDecodeError:
+                continue
+
+        return result
+    else:
+        logger.error(f"Ollama API hatası: {response.status_code} - {response.text}")
+        return f"[Ollama API hatası: {response.status_code}]"
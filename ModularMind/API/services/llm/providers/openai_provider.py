@@ -7,6 +7,7 @@ import json
 from typing import Dict, List, Any, Optional, Union, AsyncGenerator
 
 from ModularMind.API.services.llm.models import LLMModelConfig
+from ModularMind.API.services.llm.client_pool import get_client_registry
 
 logger = logging.getLogger(__name__)
 
@@ -49,8 +50,8 @@ def generate(
         # API base URL (opsiyonel)
         api_base = model_config.api_base_url
         
-        # OpenAI client
-        client = openai.OpenAI(api_key=api_key, base_url=api_base)
+        # Paylaşılan (havuzlu) OpenAI client
+        client = get_client_registry().openai_client(api_key, api_base)
         
         # Tamamlama isteği
         response = client.completions.create(
@@ -113,11 +114,11 @@ async def stream(
         # API base URL (opsiyonel)
         api_base = model_config.api_base_url
         
-        # OpenAI client
-        client = openai.OpenAI(api_key=api_key, base_url=api_base)
+        # Paylaşılan (havuzlu) asenkron OpenAI client
+        client = get_client_registry().async_openai_client(api_key, api_base)
         
         # Tamamlama isteği
-        response = client.completions.create(
+        response = await client.completions.create(
             model=model_config.model_id,
             prompt=prompt,
             max_tokens=max_tokens,
@@ -128,7 +129,7 @@ async def stream(
         )
         
         # Yanıtı stream et
-        for chunk in response:
+        async for chunk in response:
             if chunk.choices and len(chunk.choices) > 0:
                 text = chunk.choices[0].text
                 if text:
@@ -179,8 +180,8 @@ def generate_chat(
         # API base URL (opsiyonel)
         api_base = model_config.api_base_url
         
-        # OpenAI client
-        client = openai.OpenAI(api_key=api_key, base_url=api_base)
+        # Paylaşılan (havuzlu) OpenAI client
+        client = get_client_registry().openai_client(api_key, api_base)
         
         # OpenAI formatına dönüştür
         openai_messages = []
@@ -252,8 +253,8 @@ async def stream_chat(
         # API base URL (opsiyonel)
         api_base = model_config.api_base_url
         
-        # OpenAI client
-        client = openai.OpenAI(api_key=api_key, base_url=api_base)
+        # Paylaşılan (havuzlu) asenkron OpenAI client
+        client = get_client_registry().async_openai_client(api_key, api_base)
         
         # OpenAI formatına dönüştür
         openai_messages = []
@@ -264,7 +265,7 @@ async def stream_chat(
             })
         
         # Chat isteği
-        response = client.chat.completions.create(
+        response = await client.chat.completions.create(
             model=model_config.model_id,
             messages=openai_messages,
             max_tokens=max_tokens,
@@ -275,7 +276,7 @@ async def stream_chat(
         )
         
         # Yanıtı stream et
-        for chunk in response:
+        async for chunk in response:
             if chunk.choices and len(chunk.choices) > 0:
                 content = chunk.choices[0].delta.content
                 if content:
@@ -285,4 +286,123 @@ async def stream_chat(
         yield "ERROR: OpenAI kütüphanesi bulunamadı"
     except Exception as e:
         logger.error(f"OpenAI chat streaming hatası: {str(e)}")
-        yield f"ERROR: {str(e)}"
\ No newline at end of file
+        yield f"ERROR: {str(e)}"
+
+async def agenerate(
+    llm_service,
+    prompt: str, 
+    model_config: LLMModelConfig, 
+    max_tokens: int, 
+    temperature: float, 
+    top_p: float, 
+    stop_sequences: Optional[List[str]],
+    options: Optional[Dict[str, Any]],
+    api_keys: Dict[str, str]
+) -> str:
+    """
+    OpenAI ile olay döngüsünü bloklamadan metin üretir.
+    
+    Args:
+        llm_service: LLM servisi
+        prompt: Giriş metni
+        model_config: Model yapılandırması
+        max_tokens: Maksimum token sayısı
+        temperature: Sıcaklık
+        top_p: Top-p
+        stop_sequences: Durdurma dizileri
+        options: Ek seçenekler
+        api_keys: API anahtarları
+        
+    Returns:
+        str: Üretilen metin
+    """
+    try:
+        # API key kontrolü
+        api_key = api_keys.get("openai")
+        if not api_key:
+            raise ValueError("OpenAI API anahtarı bulunamadı")
+        
+        # Paylaşılan (havuzlu) asenkron OpenAI client
+        client = get_client_registry().async_openai_client(api_key, model_config.api_base_url)
+        
+        # Tamamlama isteği
+        response = await client.completions.create(
+            model=model_config.model_id,
+            prompt=prompt,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            top_p=top_p,
+            stop=stop_sequences if stop_sequences else None
+        )
+        
+        # Yanıtı dönüştür
+        if response.choices and len(response.choices) > 0:
+            return response.choices[0].text.strip()
+        
+        return ""
+    except ImportError:
+        logger.error("openai kütüphanesi bulunamadı")
+        return "ERROR: OpenAI kütüphanesi bulunamadı"
+    except Exception as e:
+        logger.error(f"OpenAI üretim hatası: {str(e)}")
+        return f"ERROR: {str(e)}"
+
+async def achat(
+    llm_service,
+    messages: List[Dict[str, str]], 
+    model_config: LLMModelConfig, 
+    max_tokens: int, 
+    temperature: float, 
+    top_p: float, 
+    stop_sequences: Optional[List[str]],
+    options: Optional[Dict[str, Any]],
+    api_keys: Dict[str, str]
+) -> Dict[str, str]:
+    """
+    OpenAI ile olay döngüsünü bloklamadan sohbet mesajı üretir.
+    
+    Args:
+        llm_service: LLM servisi
+        messages: Sohbet mesajları
+        model_config: Model yapılandırması
+        max_tokens: Maksimum token sayısı
+        temperature: Sıcaklık
+        top_p: Top-p
+        stop_sequences: Durdurma dizileri
+        options: Ek seçenekler
+        api_keys: API anahtarları
+        
+    Returns:
+        Dict[str, str]: Üretilen sohbet mesajı
+    """
+    try:
+        # API key kontrolü
+        api_key = api_keys.get("openai")
+        if not api_key:
+            raise ValueError("OpenAI API anahtarı bulunamadı")
+        
+        # Paylaşılan (havuzlu) asenkron OpenAI client
+        client = get_client_registry().async_openai_client(api_key, model_config.api_base_url)
+        
+        # Chat isteği
+        response = await client.chat.completions.create(
+            model=model_config.model_id,
+            messages=[{"role": message["role"], "content": message["content"]} for message in messages],
+            max_tokens=max_tokens,
+            temperature=temperature,
+            top_p=top_p,
+            stop=stop_sequences if stop_sequences else None
+        )
+        
+        # Yanıtı dönüştür
+        if response.choices and len(response.choices) > 0:
+            message = response.choices[0].message
+            return {"role": message.role, "content": message.content}
+        
+        return {"role": "assistant", "content": ""}
+    except ImportError:
+        logger.error("openai kütüphanesi bulunamadı")
+        return {"role": "assistant", "content": "ERROR: OpenAI kütüphanesi bulunamadı"}
+    except Exception as e:
+        logger.error(f"OpenAI chat hatası: {str(e)}")
+        return {"role": "assistant", "content": f"ERROR: {str(e)}"}
@@ -0,0 +1,548 @@
+"""
+LLM modelleri için token-bucket hız sınırlayıcı.
+Dakikadaki istek ve token sınırlarını model başına uygular; sınır
+dolduğunda hata vermek yerine çağıranı öncelik sırasıyla bekletir.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from enum import IntEnum
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# İstek başına varsayılan en fazla bekleme süresi (saniye); dolunca RateLimitTimeout
+DEFAULT_RATE_LIMIT_TIMEOUT = float(os.getenv("LLM_RATE_LIMIT_TIMEOUT", "30"))
+
+# İki kovayı atomik olarak dolduran ve (yeterliyse) tüketen Redis betiği.
+# KEYS: istek kovası, token kovası
+# ARGV: şimdi, rpm, tpm, istek maliyeti, token maliyeti, zorla (1 = beklemeden uygula)
+# Dönüş: "0" tüketildi, aksi halde gereken bekleme süresi (saniye)
+_REDIS_BUCKET_SCRIPT = """
+local now = tonumber(ARGV[1])
+local force = tonumber(ARGV[6]) == 1
+local buckets = {
+    {KEYS[1], tonumber(ARGV[2]), tonumber(ARGV[4])},
+    {KEYS[2], tonumber(ARGV[3]), tonumber(ARGV[5])}
+}
+local levels = {}
+local wait = 0
+for i, bucket in ipairs(buckets) do
+    local capacity = bucket[2]
+    if capacity > 0 then
+        local data = redis.call('HMGET', bucket[1], 'level', 'updated')
+        local level = tonumber(data[1])
+        if level == nil then
+            level = capacity
+        else
+            level = math.min(capacity, level + math.max(0, now - tonumber(data[2])) * capacity / 60)
+        end
+        levels[i] = level
+        local cost = math.min(bucket[3], capacity)
+        if not force and level < cost then
+            wait = math.max(wait, (cost - level) * 60 / capacity)
+        end
+    end
+end
+if wait > 0 then
+    return tostring(wait)
+end
+for i, bucket in ipairs(buckets) do
+    local capacity = bucket[2]
+    if capacity > 0 then
+        local level = math.min(capacity, levels[i] - math.min(bucket[3], capacity))
+        redis.call('HSET', bucket[1], 'level', tostring(level), 'updated', tostring(now))
+        redis.call('EXPIRE', bucket[1], 120)
+    end
+end
+return "0"
+"""
+
+class RequestPriority(IntEnum):
+    """İstek öncelik sınıfları (küçük değer önce)."""
+    HIGH = 0      # Kullanıcıya dönük, etkileşimli istekler
+    NORMAL = 1
+    LOW = 2       # Arka plan işleri (zenginleştirme, toplu özetleme)
+
+class RateLimitTimeout(Exception):
+    """İstek, süre sınırı dolmadan hız sınırı slotu alamadı."""
+
+class _LocalBuckets:
+    """Süreç içi istek ve token kovaları (dakikalık kapasite, sürekli dolum)."""
+
+    def __init__(self, rpm: Optional[int], tpm: Optional[int]):
+        self.rpm = rpm or 0
+        self.tpm = tpm or 0
+        self.request_level = float(self.rpm)
+        self.token_level = float(self.tpm)
+        self.updated = time.monotonic()
+
+    def configure(self, rpm: Optional[int], tpm: Optional[int]) -> None:
+        """Sınırları günceller; mevcut seviyeler yeni kapasiteyle sınırlanır."""
+        self._refill()
+        self.rpm = rpm or 0
+        self.tpm = tpm or 0
+        self.request_level = min(self.request_level, float(self.rpm))
+        self.token_level = min(self.token_level, float(self.tpm))
+
+    def try_consume(self, requests: int, tokens: int, force: bool = False) -> float:
+        """
+        Yeterli kapasite varsa tüketir.
+
+        Returns:
+            float: 0 ise tüketildi, aksi halde gereken bekleme süresi (saniye)
+        """
+        self._refill()
+        request_cost = min(requests, self.rpm)
+        token_cost = min(tokens, self.tpm)
+
+        if not force:
+            wait = 0.0
+            if self.rpm and self.request_level < request_cost:
+                wait = max(wait, (request_cost - self.request_level) * 60.0 / self.rpm)
+            if self.tpm and self.token_level < token_cost:
+                wait = max(wait, (token_cost - self.token_level) * 60.0 / self.tpm)
+            if wait > 0:
+                return wait
+
+        if self.rpm:
+            self.request_level = min(float(self.rpm), self.request_level - request_cost)
+        if self.tpm:
+            self.token_level = min(float(self.tpm), self.token_level - token_cost)
+        return 0.0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self.updated
+        self.updated = now
+        if self.rpm:
+            self.request_level = min(float(self.rpm), self.request_level + elapsed * self.rpm / 60.0)
+        if self.tpm:
+            self.token_level = min(float(self.tpm), self.token_level + elapsed * self.tpm / 60.0)
+
+class _Waiter:
+    """Kuyrukta slot bekleyen tek bir çağıran."""
+
+    __slots__ = ("tokens", "granted", "cancelled", "_event", "_loop")
+
+    def __init__(self, tokens: int, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.tokens = tokens
+        self.granted = False
+        self.cancelled = False
+        self._loop = loop
+        self._event = asyncio.Event() if loop is not None else threading.Event()
+
+    def notify(self) -> None:
+        """Bekleyeni uyandırır (herhangi bir iş parçacığından çağrılabilir)."""
+        if self._loop is None:
+            self._event.set()
+        elif not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._event.set)
+
+class _ModelLimiter:
+    """
+    Tek bir modelin bekleme kuyruğu ve kovaları.
+
+    Bekleyenler (öncelik, varış sırası) ile sıralanır; yalnızca kuyruk
+    başı kapasite bekler, diğerleri sıraları gelince uyandırılır. Böylece
+    düşük öncelikli istekler yüksek öncelikli olanların önüne geçemez ve
+    aynı sınıfta sıra korunur.
+    """
+
+    def __init__(self, model_id: str, rpm: Optional[int], tpm: Optional[int], redis_script=None, namespace: str = ""):
+        self.model_id = model_id
+        self.rpm = rpm or 0
+        self.tpm = tpm or 0
+        self.buckets = _LocalBuckets(rpm, tpm)
+        self.redis_script = redis_script
+        self.redis_keys = [f"{namespace}:{model_id}:requests", f"{namespace}:{model_id}:tokens"]
+
+        self._lock = threading.Lock()
+        self._queue: List[Tuple[int, int, _Waiter]] = []
+        self._sequence = itertools.count()
+
+        # İzleme sayaçları
+        self.granted = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+
+    def configure(self, rpm: Optional[int], tpm: Optional[int]) -> None:
+        with self._lock:
+            if (rpm or 0, tpm or 0) != (self.rpm, self.tpm):
+                self.rpm, self.tpm = rpm or 0, tpm or 0
+                self.buckets.configure(rpm, tpm)
+
+    def acquire(self, tokens: int, priority: int, timeout: Optional[float]) -> float:
+        """Slot alınana kadar iş parçacığını bekletir; beklenen süreyi döndürür."""
+        start = time.monotonic()
+        deadline = start + timeout if timeout is not None else None
+        waiter = _Waiter(tokens)
+
+        with self._lock:
+            heapq.heappush(self._queue, (priority, next(self._sequence), waiter))
+            head_wait = self._dispatch()
+
+        while not waiter.granted:
+            wait = self._wait_time(waiter, head_wait, deadline)
+            if wait is not None and wait <= 0:
+                if self._give_up(waiter):
+                    raise RateLimitTimeout(f"Hız sınırı slotu {timeout:.1f} saniyede alınamadı: {self.model_id}")
+                break
+
+            waiter._event.wait(wait)
+            waiter._event.clear()
+            with self._lock:
+                head_wait = self._dispatch()
+
+        return self._record_wait(start)
+
+    async def acquire_async(self, tokens: int, priority: int, timeout: Optional[float]) -> float:
+        """Slot alınana kadar olay döngüsünü bloklamadan bekler; beklenen süreyi döndürür."""
+        start = time.monotonic()
+        deadline = start + timeout if timeout is not None else None
+        waiter = _Waiter(tokens, asyncio.get_running_loop())
+
+        with self._lock:
+            heapq.heappush(self._queue, (priority, next(self._sequence), waiter))
+        head_wait = await self._run_off_loop(self._locked_dispatch)
+
+        try:
+            while not waiter.granted:
+                wait = self._wait_time(waiter, head_wait, deadline)
+                if wait is not None and wait <= 0:
+                    if await self._run_off_loop(self._give_up, waiter):
+                        raise RateLimitTimeout(f"Hız sınırı slotu {timeout:.1f} saniyede alınamadı: {self.model_id}")
+                    break
+
+                try:
+                    await asyncio.wait_for(waiter._event.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+                waiter._event.clear()
+                head_wait = await self._run_off_loop(self._locked_dispatch)
+        except asyncio.CancelledError:
+            # İptal edilen görev beklenemez; Redis kullanılıyorsa kuyruktan çıkarma iş parçacığında yapılır
+            if self.redis_script is None:
+                self._give_up(waiter)
+            else:
+                asyncio.get_running_loop().run_in_executor(None, self._give_up, waiter)
+            raise
+
+        return self._record_wait(start)
+
+    def adjust_tokens(self, delta: int) -> None:
+        """Tahmini token maliyetini gerçek kullanıma göre düzeltir (negatif = iade)."""
+        if not self.tpm or not delta:
+            return
+        with self._lock:
+            self._consume(0, delta, force=True)
+            # İade edilen kapasite kuyruk başına yetebilir
+            self._dispatch()
+
+    async def adjust_tokens_async(self, delta: int) -> None:
+        """adjust_tokens'ın olay döngüsünü bloklamayan sürümü."""
+        await self._run_off_loop(self.adjust_tokens, delta)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "rpm": self.rpm,
+                "tpm": self.tpm,
+                "waiting": sum(1 for _, _, waiter in self._queue if not waiter.cancelled),
+                "granted": self.granted,
+                "timeouts": self.timeouts,
+                "average_wait": self.total_wait / self.granted if self.granted else 0.0
+            }
+
+    def _dispatch(self) -> Optional[float]:
+        """
+        Kapasite yettiği sürece kuyruk başına slot verir (lock altında çağrılmalıdır).
+
+        Returns:
+            Optional[float]: Kuyruk başının beklemesi gereken süre (kuyruk boşsa None)
+        """
+        initial_head = self._queue[0][2] if self._queue else None
+        wait = None
+
+        while self._queue:
+            head = self._queue[0][2]
+            if head.cancelled:
+                heapq.heappop(self._queue)
+                continue
+
+            wait = self._consume(1, head.tokens)
+            if wait > 0:
+                break
+
+            heapq.heappop(self._queue)
+            head.granted = True
+            head.notify()
+            wait = None
+
+        # Kuyruk başı değiştiyse yeni baş, bekleme süresini kendisi ölçsün diye uyandırılır
+        if self._queue and self._queue[0][2] is not initial_head:
+            self._queue[0][2].notify()
+
+        return wait
+
+    def _locked_dispatch(self) -> Optional[float]:
+        with self._lock:
+            return self._dispatch()
+
+    async def _run_off_loop(self, func, *args):
+        """
+        Kovalar Redis'teyse fonksiyonu (ağ çağrısı ve lock beklemesi içerir)
+        iş parçacığında çalıştırır; yerel kovalarda doğrudan çağırır.
+        """
+        if self.redis_script is None:
+            return func(*args)
+        return await asyncio.to_thread(func, *args)
+
+    def _consume(self, requests: int, tokens: int, force: bool = False) -> float:
+        if self.redis_script is not None:
+            try:
+                result = self.redis_script(
+                    keys=self.redis_keys,
+                    args=[time.time(), self.rpm, self.tpm, requests, tokens, 1 if force else 0]
+                )
+                return float(result)
+            except Exception as e:
+                logger.warning(f"Redis hız sınırlayıcı hatası, yerel kovalar kullanılıyor: {str(e)}")
+
+        return self.buckets.try_consume(requests, tokens, force)
+
+    def _wait_time(self, waiter: _Waiter, head_wait: Optional[float], deadline: Optional[float]) -> Optional[float]:
+        """Bir sonraki uyanmaya kadar beklenecek süre (None = süresiz, <= 0 = süre doldu)."""
+        with self._lock:
+            is_head = bool(self._queue) and self._queue[0][2] is waiter
+
+        wait = head_wait if is_head else None
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            wait = remaining if wait is None else min(wait, remaining)
+        return wait
+
+    def _give_up(self, waiter: _Waiter) -> bool:
+        """Bekleyeni kuyruktan çıkarır; bu arada slot verildiyse False döner."""
+        with self._lock:
+            if waiter.granted:
+                return False
+            waiter.cancelled = True
+            self.timeouts += 1
+            self._dispatch()
+            return True
+
+    def _record_wait(self, start: float) -> float:
+        waited = time.monotonic() - start
+        with self._lock:
+            self.granted += 1
+            self.total_wait += waited
+        if waited > 1.0:
+            logger.info(f"Hız sınırı nedeniyle {waited:.2f} saniye beklendi: {self.model_id}")
+        return waited
+
+class LLMRateLimiter:
+    """
+    Model başına dakikalık istek (rpm) ve token (tpm) sınırlarını uygulayan sınırlayıcı.
+
+    Her model için iki token kovası tutulur; kapasite dakikalık sınırdır ve
+    sürekli dolar, böylece ani yükler sınırı aşmak yerine zamana yayılır.
+    İstekler senkron (iş parçacığı) veya asenkron olarak aynı kuyrukta
+    bekleyebilir. Redis istemcisi verilirse kovalar Redis'te tutulur ve tüm
+    işçiler aynı sınırı paylaşır; Redis erişilemezse yerel kovalara dönülür.
+    """
+
+    def __init__(self, redis_client: Optional[Any] = None, namespace: str = "mm:llm_ratelimit"):
+        """
+        Args:
+            redis_client: İşçiler arası koordinasyon için (senkron) Redis istemcisi
+            namespace: Redis anahtar öneki
+        """
+        self.namespace = namespace
+        self._redis_script = redis_client.register_script(_REDIS_BUCKET_SCRIPT) if redis_client is not None else None
+        self._limiters: Dict[str, _ModelLimiter] = {}
+        self._lock = threading.Lock()
+
+    def acquire(
+        self,
+        model_id: str,
+        rpm: Optional[int],
+        tpm: Optional[int] = None,
+        tokens: int = 0,
+        priority: int = RequestPriority.NORMAL,
+        timeout: Optional[float] = DEFAULT_RATE_LIMIT_TIMEOUT
+    ) -> float:
+        """
+        Slot alınana kadar bekler (senkron).
+
+        Olay döngüsünü çalıştıran iş parçacığından çağrılırsa döngüyü
+        dondurmamak için beklemez; kapasite yoksa hemen RateLimitTimeout
+        verir. Asenkron kodda `acquire_async` kullanılmalıdır.
+
+        Args:
+            model_id: Model ID
+            rpm: Dakikalık istek sınırı (None/0 = sınırsız)
+            tpm: Dakikalık token sınırı (None/0 = sınırsız)
+            tokens: İsteğin tahmini token maliyeti (girdi + en fazla çıktı)
+            priority: Öncelik sınıfı
+            timeout: En fazla bekleme süresi (None = süresiz)
+
+        Returns:
+            float: Beklenen süre (saniye)
+
+        Raises:
+            RateLimitTimeout: Süre dolmadan slot alınamazsa
+        """
+        limiter = self._get_limiter(model_id, rpm, tpm)
+        if limiter is None:
+            return 0.0
+        if _in_event_loop():
+            timeout = 0.0
+        return limiter.acquire(tokens, int(priority), timeout)
+
+    async def acquire_async(
+        self,
+        model_id: str,
+        rpm: Optional[int],
+        tpm: Optional[int] = None,
+        tokens: int = 0,
+        priority: int = RequestPriority.NORMAL,
+        timeout: Optional[float] = DEFAULT_RATE_LIMIT_TIMEOUT
+    ) -> float:
+        """
+        Slot alınana kadar olay döngüsünü bloklamadan bekler.
+
+        Args:
+            model_id: Model ID
+            rpm: Dakikalık istek sınırı (None/0 = sınırsız)
+            tpm: Dakikalık token sınırı (None/0 = sınırsız)
+            tokens: İsteğin tahmini token maliyeti (girdi + en fazla çıktı)
+            priority: Öncelik sınıfı
+            timeout: En fazla bekleme süresi (None = süresiz)
+
+        Returns:
+            float: Beklenen süre (saniye)
+
+        Raises:
+            RateLimitTimeout: Süre dolmadan slot alınamazsa
+        """
+        limiter = self._get_limiter(model_id, rpm, tpm)
+        if limiter is None:
+            return 0.0
+        return await limiter.acquire_async(tokens, int(priority), timeout)
+
+    def adjust_tokens(self, model_id: str, delta: int) -> None:
+        """
+        Tahmini token maliyetini gerçek kullanıma göre düzeltir.
+
+        Args:
+            model_id: Model ID
+            delta: Gerçek - tahmini token sayısı (negatif değer kapasiteyi iade eder)
+        """
+        limiter = self._limiters.get(model_id)
+        if limiter is not None:
+            limiter.adjust_tokens(delta)
+
+    async def adjust_tokens_async(self, model_id: str, delta: int) -> None:
+        """
+        Tahmini token maliyetini olay döngüsünü bloklamadan düzeltir.
+
+        Args:
+            model_id: Model ID
+            delta: Gerçek - tahmini token sayısı (negatif değer kapasiteyi iade eder)
+        """
+        limiter = self._limiters.get(model_id)
+        if limiter is not None:
+            await limiter.adjust_tokens_async(delta)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Model başına kuyruk ve bekleme istatistiklerini döndürür.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Model ID -> istatistikler
+        """
+        with self._lock:
+            limiters = dict(self._limiters)
+        return {model_id: limiter.stats() for model_id, limiter in limiters.items()}
+
+    def _get_limiter(self, model_id: str, rpm: Optional[int], tpm: Optional[int]) -> Optional[_ModelLimiter]:
+        if not rpm and not tpm:
+            return None
+
+        with self._lock:
+            limiter = self._limiters.get(model_id)
+            if limiter is None:
+                limiter = _ModelLimiter(model_id, rpm, tpm, self._redis_script, self.namespace)
+                self._limiters[model_id] = limiter
+                return limiter
+
+        limiter.configure(rpm, tpm)
+        return limiter
+
+def split_rate_limit_options(options: Optional[Dict[str, Any]]) -> Tuple[int, Optional[float], Optional[Dict[str, Any]]]:
+    """
+    İstek seçeneklerinden hız sınırı ayarlarını ayırır.
+
+    Sağlayıcılar seçenekleri API parametrelerine eklediğinden `priority`
+    ve `rate_limit_timeout` anahtarları sağlayıcıya iletilmez. Bekleme
+    süresi sınırı verilmezse DEFAULT_RATE_LIMIT_TIMEOUT kullanılır.
+
+    Args:
+        options: İstek seçenekleri
+
+    Returns:
+        Tuple[int, Optional[float], Optional[Dict[str, Any]]]: Öncelik, bekleme süresi sınırı, kalan seçenekler
+    """
+    if not options or ("priority" not in options and "rate_limit_timeout" not in options):
+        return RequestPriority.NORMAL, DEFAULT_RATE_LIMIT_TIMEOUT, options
+
+    remaining = dict(options)
+    priority = remaining.pop("priority", RequestPriority.NORMAL)
+    if isinstance(priority, str):
+        priority = RequestPriority[priority.upper()]
+    timeout = remaining.pop("rate_limit_timeout", DEFAULT_RATE_LIMIT_TIMEOUT)
+
+    return int(priority), timeout, remaining
+
+def _in_event_loop() -> bool:
+    """Bu iş parçacığında çalışan bir olay döngüsü varsa True."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+# Paylaşılan örnek
+_rate_limiter: Optional[LLMRateLimiter] = None
+_rate_limiter_lock = threading.Lock()
+
+def get_rate_limiter(**kwargs) -> LLMRateLimiter:
+    """
+    Paylaşılan hız sınırlayıcıyı döndürür.
+
+    İlk çağrıda verilen argümanlarla (LLMRateLimiter parametreleri ve
+    `use_redis`) oluşturulur; sonraki çağrıların argümanları yok sayılır.
+    `use_redis` verilmezse LLM_RATE_LIMIT_USE_REDIS ortam değişkeni kullanılır.
+
+    Returns:
+        LLMRateLimiter: Paylaşılan sınırlayıcı
+    """
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            use_redis = kwargs.pop("use_redis", os.getenv("LLM_RATE_LIMIT_USE_REDIS", "False").lower() == "true")
+            if use_redis and kwargs.get("redis_client") is None:
+                try:
+                    from ModularMind.API.core.cache import RedisCache
+                    kwargs["redis_client"] = RedisCache.get_client()
+                except Exception as e:
+                    logger.error(f"Hız sınırlayıcı için Redis başlatılamadı: {str(e)}")
+
+            _rate_limiter = LLMRateLimiter(**kwargs)
+        return _rate_limiter
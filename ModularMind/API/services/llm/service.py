@@ -4,14 +4,24 @@ LLM servisi.
 
 import os
 import json
+import asyncio
 import logging
 import importlib
-from typing import Dict, List, Any, Optional, Union, AsyncGenerator
+import re
+from typing import Dict, List, Any, Optional, Union, AsyncGenerator, Tuple
 
 from ModularMind.API.services.llm.models import ModelManager, LLMModelConfig
+from ModularMind.API.services.llm.client_pool import get_client_registry
+from ModularMind.API.services.llm.rate_limiter import get_rate_limiter, split_rate_limit_options
+from ModularMind.API.services.llm.completion_cache import CompletionCache, get_completion_cache
+from ModularMind.API.services.llm.utils import estimate_tokens
 
 logger = logging.getLogger(__name__)
 
+# Sağlayıcıların hata durumunda döndürdüğü yanıtlar ("[... hatası: ...]",
+# "[... kütüphanesi bulunamadı]", OpenAI için "ERROR: ..."); önbelleğe alınmaz
+_ERROR_RESPONSE = re.compile(r"^(ERROR: .*|\[.*(hatası: .*|kütüphane(si|leri) bulunamadı)\])$", re.DOTALL)
+
 class LLMService:
     """LLM servisi sınıfı."""
     
@@ -20,6 +30,12 @@ class LLMService:
         self._providers: Dict[str, Any] = {}
         self._api_keys: Dict[str, str] = {}
         
+        # Model başına istek/token kovaları (süreçteki tüm servislerle paylaşılır)
+        self.rate_limiter = get_rate_limiter()
+        
+        # Deterministik istekler için tamamlama önbelleği
+        self.completion_cache = get_completion_cache()
+        
         # API anahtarlarını çevresel değişkenlerden al
         self._load_api_keys()
         
@@ -101,7 +117,8 @@ class LLMService:
         top_p: Optional[float] = None,
         stop_sequences: Optional[List[str]] = None,
         system_message: Optional[str] = None,
-        options: Optional[Dict[str, Any]] = None
+        options: Optional[Dict[str, Any]] = None,
+        use_cache: bool = True
     ) -> str:
         """
         Metin üretir.
@@ -115,72 +132,41 @@ class LLMService:
             stop_sequences: Durdurma dizileri
             system_message: Sistem mesajı
             options: Ek seçenekler
+            use_cache: Sıcaklık 0 ise tamamlama önbelleği kullanılsın mı
             
         Returns:
             str: Üretilen metin
         """
-        # Model yapılandırmasını al
-        model_config = self._get_model_config(model_id)
-        if not model_config:
-            raise ValueError(f"Model bulunamadı: {model_id}")
-        
-        # Provider'ı al
-        provider_module = self.get_provider_module(model_config.provider)
-        if not provider_module:
-            raise ValueError(f"Provider bulunamadı: {model_config.provider}")
-        
-        # API anahtarını al
-        api_key = None
-        if model_config.api_key_env:
-            api_key = os.environ.get(model_config.api_key_env)
-        
-        if not api_key:
-            api_key = self.get_api_key(model_config.provider)
-        
-        if not api_key:
-            raise ValueError(f"API anahtarı bulunamadı: {model_config.provider}")
-        
-        # Parametreleri ayarla
-        actual_max_tokens = max_tokens or model_config.max_tokens
-        actual_temperature = temperature if temperature is not None else model_config.temperature
-        actual_top_p = top_p if top_p is not None else model_config.top_p
-        actual_stop_sequences = stop_sequences or model_config.stop_sequences
+        model_config, provider_module, sampling, api_keys = self._prepare_request(
+            model_id, max_tokens, temperature, top_p, stop_sequences
+        )
         
-        # API anahtarları
-        api_keys = {model_config.provider: api_key}
+        # Önbellekte varsa sağlayıcıya gitme
+        cache_key = self._completion_cache_key(
+            "text", model_config, self._text_messages(prompt, system_message), sampling, options, use_cache
+        )
+        if cache_key:
+            cached = self.completion_cache.get(cache_key)
+            if cached is not None:
+                return cached
         
         # Sistem mesajı varsa chat formatına dönüştür
-        if system_message:
-            if hasattr(provider_module, "generate_chat"):
-                messages = [
-                    {"role": "system", "content": system_message},
-                    {"role": "user", "content": prompt}
-                ]
-                
-                return provider_module.generate_chat(
-                    self,
-                    messages,
-                    model_config,
-                    actual_max_tokens,
-                    actual_temperature,
-                    actual_top_p,
-                    actual_stop_sequences,
-                    options,
-                    api_keys
-                )
+        if system_message and hasattr(provider_module, "generate_chat"):
+            response = self._call_provider_sync(
+                provider_module, "generate_chat",
+                self._text_messages(prompt, system_message), model_config, sampling, options, api_keys
+            )
+            result = response.get("content", "")
+        else:
+            # Metni oluştur
+            result = self._call_provider_sync(
+                provider_module, "generate", prompt, model_config, sampling, options, api_keys
+            )
         
-        # Metni oluştur
-        return provider_module.generate(
-            self,
-            prompt,
-            model_config,
-            actual_max_tokens,
-            actual_temperature,
-            actual_top_p,
-            actual_stop_sequences,
-            options,
-            api_keys
-        )
+        if cache_key and not self._is_error_response(result):
+            self.completion_cache.set(cache_key, result)
+        
+        return result
     
     async def stream_text(
         self,
@@ -222,7 +208,7 @@ class LLMService:
         # Streaming desteği kontrolü
         if not hasattr(provider_module, "stream"):
             # Streaming desteklenmiyor, normal üretimle simüle et
-            text = self.generate_text(
+            text = await self.agenerate_text(
                 prompt, 
                 model_id, 
                 max_tokens, 
@@ -301,7 +287,8 @@ class LLMService:
         temperature: Optional[float] = None,
         top_p: Optional[float] = None,
         stop_sequences: Optional[List[str]] = None,
-        options: Optional[Dict[str, Any]] = None
+        options: Optional[Dict[str, Any]] = None,
+        use_cache: bool = True
     ) -> Dict[str, str]:
         """
         Sohbet mesajı üretir.
@@ -314,6 +301,7 @@ class LLMService:
             top_p: Top-p
             stop_sequences: Durdurma dizileri
             options: Ek seçenekler
+            use_cache: Sıcaklık 0 ise tamamlama önbelleği kullanılsın mı
             
         Returns:
             Dict[str, str]: Üretilen sohbet mesajı
@@ -330,69 +318,42 @@ class LLMService:
         
         # Chat desteği kontrolü
         if not hasattr(provider_module, "generate_chat"):
-            # Chat desteklenmiyor, normal üretimle simüle et
-            # Tüm mesajları birleştir
-            combined_prompt = ""
-            for message in messages:
-                role = message.get("role", "")
-                content = message.get("content", "")
-                
-                if role == "system":
-                    combined_prompt += f"[SİSTEM]: {content}\n\n"
-                elif role == "user":
-                    combined_prompt += f"[KULLANICI]: {content}\n\n"
-                elif role == "assistant":
-                    combined_prompt += f"[ASİSTAN]: {content}\n\n"
-            
-            combined_prompt += "[ASİSTAN]: "
-            
-            # Metin üret
+            # Chat desteklenmiyor, normal üretimle simüle et (önbellek metin yolunda uygulanır)
             response_text = self.generate_text(
-                combined_prompt,
+                self._combine_messages(messages),
                 model_id,
                 max_tokens,
                 temperature,
                 top_p,
                 stop_sequences,
                 None,  # Sistem mesajı zaten prompt'a eklendi
-                options
+                options,
+                use_cache
             )
             
             # Yanıtı sohbet mesajına dönüştür
             return {"role": "assistant", "content": response_text}
         
-        # API anahtarını al
-        api_key = None
-        if model_config.api_key_env:
-            api_key = os.environ.get(model_config.api_key_env)
-        
-        if not api_key:
-            api_key = self.get_api_key(model_config.provider)
-        
-        if not api_key:
-            raise ValueError(f"API anahtarı bulunamadı: {model_config.provider}")
+        model_config, provider_module, sampling, api_keys = self._prepare_request(
+            model_id, max_tokens, temperature, top_p, stop_sequences
+        )
         
-        # Parametreleri ayarla
-        actual_max_tokens = max_tokens or model_config.max_tokens
-        actual_temperature = temperature if temperature is not None else model_config.temperature
-        actual_top_p = top_p if top_p is not None else model_config.top_p
-        actual_stop_sequences = stop_sequences or model_config.stop_sequences
-        
-        # API anahtarları
-        api_keys = {model_config.provider: api_key}
+        # Önbellekte varsa sağlayıcıya gitme
+        cache_key = self._completion_cache_key("chat", model_config, messages, sampling, options, use_cache)
+        if cache_key:
+            cached = self.completion_cache.get(cache_key)
+            if cached is not None:
+                return cached
         
         # Sohbet mesajı üret
-        return provider_module.generate_chat(
-            self,
-            messages,
-            model_config,
-            actual_max_tokens,
-            actual_temperature,
-            actual_top_p,
-            actual_stop_sequences,
-            options,
-            api_keys
+        result = self._call_provider_sync(
+            provider_module, "generate_chat", messages, model_config, sampling, options, api_keys
         )
+        
+        if cache_key and not self._is_error_response(result):
+            self.completion_cache.set(cache_key, result)
+        
+        return result
     
     async def stream_chat(
         self,
@@ -433,7 +394,7 @@ class LLMService:
         if not hasattr(provider_module, "stream_chat"):
             # Chat streaming desteklenmiyor
             # Normal chat ile yanıt alıp tek seferde dön
-            response = self.generate_chat(
+            response = await self.agenerate_chat(
                 messages,
                 model_id,
                 max_tokens,
@@ -480,6 +441,333 @@ class LLMService:
         ):
             yield chunk
     
+    async def agenerate_text(
+        self,
+        prompt: str,
+        model_id: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        top_p: Optional[float] = None,
+        stop_sequences: Optional[List[str]] = None,
+        system_message: Optional[str] = None,
+        options: Optional[Dict[str, Any]] = None,
+        use_cache: bool = True
+    ) -> str:
+        """
+        Olay döngüsünü bloklamadan metin üretir.
+        
+        Sağlayıcının asenkron yolu (agenerate/achat) varsa paylaşılan
+        bağlantı havuzuyla kullanılır; yoksa senkron çağrı bir iş
+        parçacığında çalıştırılır.
+        
+        Args:
+            prompt: Giriş metni
+            model_id: Model ID
+            max_tokens: Maksimum token sayısı
+            temperature: Sıcaklık
+            top_p: Top-p
+            stop_sequences: Durdurma dizileri
+            system_message: Sistem mesajı
+            options: Ek seçenekler
+            use_cache: Sıcaklık 0 ise tamamlama önbelleği kullanılsın mı
+            
+        Returns:
+            str: Üretilen metin
+        """
+        model_config, provider_module, sampling, api_keys = self._prepare_request(
+            model_id, max_tokens, temperature, top_p, stop_sequences
+        )
+        
+        # Önbellekte varsa sağlayıcıya gitme
+        cache_key = self._completion_cache_key(
+            "text", model_config, self._text_messages(prompt, system_message), sampling, options, use_cache
+        )
+        if cache_key:
+            cached = await self.completion_cache.aget(cache_key)
+            if cached is not None:
+                return cached
+        
+        # Sistem mesajı varsa chat formatına dönüştür
+        if system_message and (hasattr(provider_module, "achat") or hasattr(provider_module, "generate_chat")):
+            response = await self._call_provider(
+                provider_module, "achat", "generate_chat",
+                self._text_messages(prompt, system_message), model_config, sampling, options, api_keys
+            )
+            result = response.get("content", "")
+        else:
+            result = await self._call_provider(
+                provider_module, "agenerate", "generate", prompt, model_config, sampling, options, api_keys
+            )
+        
+        if cache_key and not self._is_error_response(result):
+            await self.completion_cache.aset(cache_key, result)
+        
+        return result
+    
+    async def agenerate_chat(
+        self,
+        messages: List[Dict[str, str]],
+        model_id: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        top_p: Optional[float] = None,
+        stop_sequences: Optional[List[str]] = None,
+        options: Optional[Dict[str, Any]] = None,
+        use_cache: bool = True
+    ) -> Dict[str, str]:
+        """
+        Olay döngüsünü bloklamadan sohbet mesajı üretir.
+        
+        Args:
+            messages: Sohbet mesajları
+            model_id: Model ID
+            max_tokens: Maksimum token sayısı
+            temperature: Sıcaklık
+            top_p: Top-p
+            stop_sequences: Durdurma dizileri
+            options: Ek seçenekler
+            use_cache: Sıcaklık 0 ise tamamlama önbelleği kullanılsın mı
+            
+        Returns:
+            Dict[str, str]: Üretilen sohbet mesajı
+        """
+        model_config, provider_module, sampling, api_keys = self._prepare_request(
+            model_id, max_tokens, temperature, top_p, stop_sequences
+        )
+        
+        # Önbellekte varsa sağlayıcıya gitme
+        cache_key = self._completion_cache_key("chat", model_config, messages, sampling, options, use_cache)
+        if cache_key:
+            cached = await self.completion_cache.aget(cache_key)
+            if cached is not None:
+                return cached
+        
+        if not hasattr(provider_module, "achat") and not hasattr(provider_module, "generate_chat"):
+            # Chat desteklenmiyor, normal üretimle simüle et
+            response_text = await self._call_provider(
+                provider_module, "agenerate", "generate",
+                self._combine_messages(messages), model_config, sampling, options, api_keys
+            )
+            result = {"role": "assistant", "content": response_text}
+        else:
+            result = await self._call_provider(
+                provider_module, "achat", "generate_chat", messages, model_config, sampling, options, api_keys
+            )
+        
+        if cache_key and not self._is_error_response(result):
+            await self.completion_cache.aset(cache_key, result)
+        
+        return result
+    
+    async def aclose(self) -> None:
+        """Sağlayıcıların paylaşılan HTTP bağlantılarını kapatır."""
+        await get_client_registry().aclose()
+    
+    def _prepare_request(
+        self,
+        model_id: Optional[str],
+        max_tokens: Optional[int],
+        temperature: Optional[float],
+        top_p: Optional[float],
+        stop_sequences: Optional[List[str]]
+    ) -> Tuple[LLMModelConfig, Any, Tuple[int, float, float, List[str]], Dict[str, str]]:
+        """Model, provider, örnekleme parametreleri ve API anahtarlarını çözer."""
+        # Model yapılandırmasını al
+        model_config = self._get_model_config(model_id)
+        if not model_config:
+            raise ValueError(f"Model bulunamadı: {model_id}")
+        
+        # Provider'ı al
+        provider_module = self.get_provider_module(model_config.provider)
+        if not provider_module:
+            raise ValueError(f"Provider bulunamadı: {model_config.provider}")
+        
+        # API anahtarını al
+        api_key = None
+        if model_config.api_key_env:
+            api_key = os.environ.get(model_config.api_key_env)
+        
+        if not api_key:
+            api_key = self.get_api_key(model_config.provider)
+        
+        if not api_key:
+            raise ValueError(f"API anahtarı bulunamadı: {model_config.provider}")
+        
+        # Parametreleri ayarla
+        sampling = (
+            max_tokens or model_config.max_tokens,
+            temperature if temperature is not None else model_config.temperature,
+            top_p if top_p is not None else model_config.top_p,
+            stop_sequences or model_config.stop_sequences
+        )
+        
+        return model_config, provider_module, sampling, {model_config.provider: api_key}
+    
+    async def _call_provider(
+        self,
+        provider_module: Any,
+        async_name: str,
+        sync_name: str,
+        prompt_or_messages: Any,
+        model_config: LLMModelConfig,
+        sampling: Tuple[int, float, float, List[str]],
+        options: Optional[Dict[str, Any]],
+        api_keys: Dict[str, str]
+    ) -> Any:
+        """
+        Hız sınırı slotunu bekler, ardından provider'ın asenkron fonksiyonunu,
+        yoksa senkron olanını bir iş parçacığında çağırır.
+        """
+        priority, rate_limit_timeout, options, tokens = self._rate_limit_request(
+            prompt_or_messages, model_config, sampling, options
+        )
+        await self.rate_limiter.acquire_async(
+            model_config.id,
+            getattr(model_config, "rate_limit_rpm", None),
+            getattr(model_config, "rate_limit_tpm", None),
+            tokens=tokens,
+            priority=priority,
+            timeout=rate_limit_timeout
+        )
+        
+        args = (self, prompt_or_messages, model_config, *sampling, options, api_keys)
+        
+        async_func = getattr(provider_module, async_name, None)
+        if async_func is not None:
+            result = await async_func(*args)
+        else:
+            result = await asyncio.to_thread(getattr(provider_module, sync_name), *args)
+        
+        # Ayrılan token kapasitesini gerçek kullanıma göre düzelt
+        await self.rate_limiter.adjust_tokens_async(
+            model_config.id, self._output_tokens(result, model_config) - sampling[0]
+        )
+        
+        return result
+    
+    def _call_provider_sync(
+        self,
+        provider_module: Any,
+        func_name: str,
+        prompt_or_messages: Any,
+        model_config: LLMModelConfig,
+        sampling: Tuple[int, float, float, List[str]],
+        options: Optional[Dict[str, Any]],
+        api_keys: Dict[str, str]
+    ) -> Any:
+        """Hız sınırı slotunu bekler, ardından provider'ın senkron fonksiyonunu çağırır."""
+        priority, rate_limit_timeout, options, tokens = self._rate_limit_request(
+            prompt_or_messages, model_config, sampling, options
+        )
+        self.rate_limiter.acquire(
+            model_config.id,
+            getattr(model_config, "rate_limit_rpm", None),
+            getattr(model_config, "rate_limit_tpm", None),
+            tokens=tokens,
+            priority=priority,
+            timeout=rate_limit_timeout
+        )
+        
+        result = getattr(provider_module, func_name)(
+            self, prompt_or_messages, model_config, *sampling, options, api_keys
+        )
+        
+        # Ayrılan token kapasitesini gerçek kullanıma göre düzelt
+        self.rate_limiter.adjust_tokens(model_config.id, self._output_tokens(result, model_config) - sampling[0])
+        
+        return result
+    
+    @staticmethod
+    def _rate_limit_request(
+        prompt_or_messages: Any,
+        model_config: LLMModelConfig,
+        sampling: Tuple[int, float, float, List[str]],
+        options: Optional[Dict[str, Any]]
+    ) -> Tuple[int, Optional[float], Optional[Dict[str, Any]], int]:
+        """
+        Hız sınırı ayarlarını sağlayıcı seçeneklerinden ayırır ve isteğin
+        tahmini token maliyetini (girdi + en fazla çıktı) hesaplar.
+        
+        Returns:
+            Tuple: Öncelik, bekleme süresi sınırı, sağlayıcı seçenekleri, token maliyeti
+        """
+        priority, rate_limit_timeout, options = split_rate_limit_options(options)
+        
+        if isinstance(prompt_or_messages, str):
+            input_tokens = estimate_tokens(prompt_or_messages, model_config)
+        else:
+            input_tokens = sum(estimate_tokens(m.get("content", ""), model_config) for m in prompt_or_messages)
+        
+        return priority, rate_limit_timeout, options, input_tokens + sampling[0]
+    
+    @staticmethod
+    def _output_tokens(result: Any, model_config: LLMModelConfig) -> int:
+        """Sağlayıcı yanıtının tahmini token sayısı."""
+        output = result.get("content", "") if isinstance(result, dict) else result
+        return estimate_tokens(output, model_config)
+    
+    def _completion_cache_key(
+        self,
+        mode: str,
+        model_config: LLMModelConfig,
+        messages: List[Dict[str, str]],
+        sampling: Tuple[int, float, float, List[str]],
+        options: Optional[Dict[str, Any]],
+        use_cache: bool
+    ) -> Optional[str]:
+        """Önbelleğe alınabilecek istekler için anahtar döndürür (sıcaklık > 0 ise None)."""
+        if not use_cache or not self.completion_cache.enabled:
+            return None
+        
+        max_tokens, temperature, top_p, stop_sequences = sampling
+        if not CompletionCache.is_cacheable(temperature):
+            self.completion_cache.record_bypass()
+            return None
+        
+        # Hız sınırı ayarları yanıtı etkilemez
+        _, _, options = split_rate_limit_options(options)
+        
+        return CompletionCache.make_key(
+            f"{model_config.provider}:{model_config.model_id}",
+            messages,
+            {"mode": mode, "max_tokens": max_tokens, "top_p": top_p, "stop": stop_sequences, "options": options}
+        )
+    
+    @staticmethod
+    def _is_error_response(result: Any) -> bool:
+        """Sağlayıcının hata yerine döndürdüğü yanıtları tanır."""
+        text = result.get("content", "") if isinstance(result, dict) else result
+        return not text or bool(_ERROR_RESPONSE.match(text))
+    
+    @staticmethod
+    def _text_messages(prompt: str, system_message: Optional[str]) -> List[Dict[str, str]]:
+        """Metin isteğini sohbet mesajlarına dönüştürür."""
+        messages = [{"role": "system", "content": system_message}] if system_message else []
+        messages.append({"role": "user", "content": prompt})
+        return messages
+    
+    @staticmethod
+    def _combine_messages(messages: List[Dict[str, str]]) -> str:
+        """Sohbet mesajlarını chat desteklemeyen modeller için tek prompt'a birleştirir."""
+        combined_prompt = ""
+        for message in messages:
+            role = message.get("role", "")
+            content = message.get("content", "")
+            
+            if role == "system":
+                combined_prompt += f"[SİSTEM]: {content}\n\n"
+            elif role == "user":
+                combined_prompt += f"[KULLANICI]: {content}\n\n"
+            elif role == "assistant":
+                combined_prompt += f"[ASİSTAN]: {content}\n\n"
+        
+        combined_prompt += "[ASİSTAN]: "
+        return combined_prompt
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Tamamlama önbelleği istatistiklerini döndürür."""
+        return self.completion_cache.stats()
+    
     def get_models(self) -> List[Dict[str, Any]]:
         """Tüm modellerin listesini döndürür."""
         return self.model_manager.get_models()
\ No newline at end of file
@@ -212,4 +212,39 @@ class BaseVectorStore(ABC):
         Returns:
             List[Dict[str, Any]]: Arama sonuçları
         """
-        pass
\ No newline at end of file
+        pass
+    
+    def search_by_vectors(
+        self,
+        query_vectors: List[List[float]],
+        limit: int = 5,
+        filter_metadata: Optional[Dict[str, Any]] = None,
+        include_metadata: bool = True,
+        embedding_model: Optional[str] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Birden fazla vektör sorgusu ile arama yapar
+        
+        Varsayılan implementasyon her vektör için search_by_vector çağırır;
+        toplu indeks araması destekleyen depolar bunu override eder.
+        
+        Args:
+            query_vectors: Sorgu vektörleri
+            limit: Her sorgu için sonuç limiti
+            filter_metadata: Meta veri filtresi
+            include_metadata: Meta verileri dahil et
+            embedding_model: Kullanılacak embedding modeli
+            
+        Returns:
+            List[List[Dict[str, Any]]]: Her sorgu için arama sonuçları
+        """
+        return [
+            self.search_by_vector(
+                query_vector,
+                limit=limit,
+                filter_metadata=filter_metadata,
+                include_metadata=include_metadata,
+                embedding_model=embedding_model
+            )
+            for query_vector in query_vectors
+        ]
@@ -0,0 +1,443 @@
+"""
+Bitmap tabanlı metadata filtre indeksi.
+
+Her metadata alanı için değer -> satır bitmap'i, aralık sorguları için
+alan bazlı sıralı sayısal/tarih sütunları tutulur. Filtreler ($and, $or,
+$not ve alan operatörleri) bitmap işlemleriyle değerlendirilir; sonuç
+bitmap'inin eleman sayısı, aramanın ön filtre (bitmap ile sınırlı tam
+tarama) mi yoksa son filtre (ANN'den fazla aday çekme) mi kullanacağını
+belirlemek için seçicilik tahmini olarak kullanılır.
+
+Satır kimlikleri vector store'daki satır sırasıdır. Eklemeler ve
+güncellemeler indekse artımlı yazılır; silmede satır bitmap'lerden ve
+sıralı sütunlardan çıkarılır ve sonraki satırların kimlikleri birer kaydırılır.
+"""
+
+import re
+import logging
+import numpy as np
+from typing import List, Dict, Any, Optional, Tuple, Iterable
+
+from ModularMind.API.services.retrieval.row_bitmap import RowBitmap
+from ModularMind.API.services.retrieval.search_utils import sortable_value
+
+logger = logging.getLogger(__name__)
+
+# İç içe metadata sözlüklerinin noktalı anahtarlara açılacağı maksimum derinlik
+MAX_NESTED_DEPTH = 3
+
+_RANGE_OPERATORS = ("$gt", "$gte", "$lt", "$lte")
+
+def _is_hashable(value: Any) -> bool:
+    """Değerin sözlük anahtarı olarak kullanılıp kullanılamayacağını döndürür."""
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+def _flatten(metadata: Dict[str, Any], prefix: str = "", depth: int = 0) -> Iterable[Tuple[str, Any]]:
+    """
+    Metadata'yı (alan, değer) çiftlerine açar; iç içe sözlükler hem kendi
+    anahtarıyla hem de noktalı alt anahtarlarla üretilir.
+    """
+    for key, value in metadata.items():
+        if not isinstance(key, str):
+            continue
+        # Noktalı üst düzey anahtarlar filtrede iç içe yol olarak yorumlanır
+        if not prefix and "." in key:
+            continue
+
+        path = f"{prefix}{key}"
+        yield path, value
+
+        if isinstance(value, dict) and depth < MAX_NESTED_DEPTH:
+            yield from _flatten(value, f"{path}.", depth + 1)
+
+class _SortedColumn:
+    """Bir alanın sıralanabilir değerleri için sıralı (değer, satır) sütunu."""
+
+    __slots__ = ("_values", "_rows", "_pending", "_sorted")
+
+    def __init__(self):
+        self._values = np.zeros(0, dtype=np.float64)
+        self._rows = np.zeros(0, dtype=np.int64)
+        self._pending: List[Tuple[float, int]] = []
+        self._sorted = True
+
+    def add(self, value: float, row: int) -> None:
+        self._pending.append((value, row))
+        self._sorted = False
+
+    def remove_row(self, row: int) -> None:
+        self._flush()
+        keep = self._rows != row
+        self._values = self._values[keep]
+        self._rows = self._rows[keep]
+
+    def delete_row(self, row: int) -> None:
+        """Satırı çıkarır ve sonraki satırların kimliklerini birer azaltır."""
+        self.remove_row(row)
+        self._rows[self._rows > row] -= 1
+
+    def _flush(self) -> None:
+        """Bekleyen değerleri sütuna ekler ve yeniden sıralar."""
+        if self._sorted:
+            return
+
+        if self._pending:
+            pending = np.array(self._pending, dtype=np.float64)
+            self._values = np.concatenate([self._values, pending[:, 0]])
+            self._rows = np.concatenate([self._rows, pending[:, 1].astype(np.int64)])
+            self._pending = []
+
+        order = np.argsort(self._values, kind="stable")
+        self._values = self._values[order]
+        self._rows = self._rows[order]
+        self._sorted = True
+
+    def range(self, low: float, low_inclusive: bool, high: float, high_inclusive: bool) -> RowBitmap:
+        """
+        Değeri [low, high] aralığında (sınırların dahil olup olmadığı
+        parametrelere göre) olan satırları döndürür.
+        """
+        self._flush()
+        start = np.searchsorted(self._values, low, side="left" if low_inclusive else "right")
+        end = np.searchsorted(self._values, high, side="right" if high_inclusive else "left")
+        if end <= start:
+            return RowBitmap()
+        return RowBitmap.from_rows(self._rows[start:end])
+
+class MetadataFilterIndex:
+    """
+    Metadata filtrelerini satır bitmap'leri ile değerlendiren indeks.
+
+    Sonuçlar check_metadata_filter ile birebir aynıdır: indekslenemeyen
+    (hashlenemeyen) değerler alan bazında ayrı tutulur ve yalnızca bu satırlar
+    taranır.
+    """
+
+    def __init__(self):
+        self.row_count = 0
+        self.values: Dict[str, Dict[Any, RowBitmap]] = {}   # alan -> değer -> satırlar
+        self.present: Dict[str, RowBitmap] = {}             # alan -> değeri olan satırlar
+        self.unindexed: Dict[str, Dict[int, Any]] = {}      # alan -> {satır: hashlenemeyen değer}
+        self.sorted_columns: Dict[Tuple[str, str], _SortedColumn] = {}  # (alan, tür) -> sütun
+        self.non_empty = RowBitmap()                        # metadata'sı boş olmayan satırlar
+
+    @classmethod
+    def build(cls, metadata_rows: Iterable[Optional[Dict[str, Any]]]) -> "MetadataFilterIndex":
+        """
+        Metadata satırlarından indeks oluşturur.
+
+        Args:
+            metadata_rows: Satır sırasıyla metadata sözlükleri
+
+        Returns:
+            MetadataFilterIndex: İndeks
+        """
+        index = cls()
+
+        # Satırlar önce listelerde toplanır, bitmap'ler tek seferde oluşturulur
+        value_rows: Dict[str, Dict[Any, List[int]]] = {}
+        present_rows: Dict[str, List[int]] = {}
+        non_empty_rows: List[int] = []
+
+        for row, metadata in enumerate(metadata_rows):
+            index.row_count += 1
+            if not metadata:
+                continue
+
+            non_empty_rows.append(row)
+            for field, value in _flatten(metadata):
+                present_rows.setdefault(field, []).append(row)
+
+                if _is_hashable(value):
+                    value_rows.setdefault(field, {}).setdefault(value, []).append(row)
+                else:
+                    index.unindexed.setdefault(field, {})[row] = value
+
+                index._add_sortable(field, value, row)
+
+        index.non_empty = RowBitmap.from_rows(non_empty_rows)
+        index.present = {field: RowBitmap.from_rows(field_rows) for field, field_rows in present_rows.items()}
+        index.values = {
+            field: {value: RowBitmap.from_rows(rows) for value, rows in field_values.items()}
+            for field, field_values in value_rows.items()
+        }
+        return index
+
+    def __len__(self) -> int:
+        return len(self.present)
+
+    def __contains__(self, field: str) -> bool:
+        return field in self.present
+
+    @property
+    def fields(self) -> List[str]:
+        """İndekslenmiş alan adları."""
+        return list(self.present.keys())
+
+    def add_row(self, metadata: Optional[Dict[str, Any]]) -> int:
+        """
+        Sona yeni bir satır ekler.
+
+        Args:
+            metadata: Satırın metadata'sı
+
+        Returns:
+            int: Satır kimliği
+        """
+        row = self.row_count
+        self.row_count += 1
+        self._index_row(row, metadata)
+        return row
+
+    def update_row(
+        self,
+        row: int,
+        old_metadata: Optional[Dict[str, Any]],
+        metadata: Optional[Dict[str, Any]]
+    ) -> None:
+        """
+        Mevcut bir satırın metadata'sını değiştirir.
+
+        Args:
+            row: Satır kimliği
+            old_metadata: Satırın indekslenmiş (önceki) metadata'sı
+            metadata: Yeni metadata
+        """
+        self._unindex_row(row, old_metadata)
+        self._index_row(row, metadata)
+
+    def delete_row(self, row: int, metadata: Optional[Dict[str, Any]]) -> None:
+        """
+        Bir satırı siler; sonraki satırların kimlikleri birer azalır.
+
+        Args:
+            row: Satır kimliği
+            metadata: Satırın indekslenmiş metadata'sı
+        """
+        self._unindex_row(row, metadata)
+
+        self.non_empty = self.non_empty.delete_row(row)
+        self.present = {field: bitmap.delete_row(row) for field, bitmap in self.present.items()}
+        for field_values in self.values.values():
+            for value, bitmap in field_values.items():
+                field_values[value] = bitmap.delete_row(row)
+
+        for field, rows in self.unindexed.items():
+            self.unindexed[field] = {(r - 1 if r > row else r): value for r, value in rows.items()}
+
+        for column in self.sorted_columns.values():
+            column.delete_row(row)
+
+        self.row_count -= 1
+
+    def _index_row(self, row: int, metadata: Optional[Dict[str, Any]]) -> None:
+        """Satırın değerlerini bitmap'lere ve sıralı sütunlara yazar."""
+        if not metadata:
+            return
+
+        self.non_empty.add(row)
+
+        for field, value in _flatten(metadata):
+            present = self.present.get(field)
+            if present is None:
+                present = self.present[field] = RowBitmap()
+            present.add(row)
+
+            if _is_hashable(value):
+                field_values = self.values.setdefault(field, {})
+                bitmap = field_values.get(value)
+                if bitmap is None:
+                    bitmap = field_values[value] = RowBitmap()
+                bitmap.add(row)
+            else:
+                self.unindexed.setdefault(field, {})[row] = value
+
+            self._add_sortable(field, value, row)
+
+    def _add_sortable(self, field: str, value: Any, row: int) -> None:
+        """Sıralanabilir değeri alanın sıralı sütununa ekler."""
+        sortable = sortable_value(value)
+        if sortable is not None:
+            kind, number = sortable
+            column = self.sorted_columns.get((field, kind))
+            if column is None:
+                column = self.sorted_columns[(field, kind)] = _SortedColumn()
+            column.add(number, row)
+
+    def _unindex_row(self, row: int, metadata: Optional[Dict[str, Any]]) -> None:
+        """Satırın değerlerini bitmap'lerden ve sıralı sütunlardan kaldırır."""
+        if not metadata:
+            return
+
+        single = RowBitmap.from_rows([row])
+        self.non_empty = self.non_empty - single
+
+        for field, value in _flatten(metadata):
+            if field in self.present:
+                self.present[field] = self.present[field] - single
+
+            if _is_hashable(value):
+                field_values = self.values.get(field, {})
+                if value in field_values:
+                    remaining = field_values[value] - single
+                    if remaining:
+                        field_values[value] = remaining
+                    else:
+                        del field_values[value]
+            else:
+                self.unindexed.get(field, {}).pop(row, None)
+
+            sortable = sortable_value(value)
+            if sortable is not None and (field, sortable[0]) in self.sorted_columns:
+                self.sorted_columns[(field, sortable[0])].remove_row(row)
+
+    def all_rows(self) -> RowBitmap:
+        """Tüm satırları içeren bitmap."""
+        return RowBitmap.range(self.row_count)
+
+    def evaluate(self, filter_metadata: Dict[str, Any]) -> RowBitmap:
+        """
+        Filtreyi karşılayan satırları döndürür.
+
+        Args:
+            filter_metadata: Metadata filtresi (alan koşulları, $and, $or, $not)
+
+        Returns:
+            RowBitmap: Eşleşen satırlar
+        """
+        if not filter_metadata:
+            return RowBitmap()
+
+        result: Optional[RowBitmap] = None
+        for key, condition in filter_metadata.items():
+            if key == "$and":
+                matches = self.non_empty
+                for sub_filter in condition:
+                    matches = matches & self.evaluate(sub_filter)
+            elif key == "$or":
+                matches = RowBitmap()
+                for sub_filter in condition:
+                    matches = matches | self.evaluate(sub_filter)
+            elif key == "$not":
+                matches = self.non_empty - self.evaluate(condition)
+            else:
+                matches = self._evaluate_field(key, condition)
+
+            result = matches if result is None else result & matches
+            if not result:
+                return RowBitmap()
+
+        return result
+
+    def estimate_selectivity(self, filter_metadata: Dict[str, Any]) -> Tuple[RowBitmap, float]:
+        """
+        Filtrenin eşleşen satırlarını ve seçiciliğini (eşleşme oranı) döndürür.
+
+        Args:
+            filter_metadata: Metadata filtresi
+
+        Returns:
+            Tuple[RowBitmap, float]: Eşleşen satırlar ve 0-1 arası oran
+        """
+        matches = self.evaluate(filter_metadata)
+        if self.row_count == 0:
+            return matches, 0.0
+        return matches, len(matches) / self.row_count
+
+    def _evaluate_field(self, field: str, condition: Any) -> RowBitmap:
+        """Tek bir alan koşulunu değerlendirir."""
+        present = self.present.get(field)
+        if present is None:
+            return RowBitmap()
+
+        if isinstance(condition, dict) and "$" in next(iter(condition), ""):
+            result = present
+            for op, operand in condition.items():
+                result = result & self._evaluate_operator(field, op, operand, present)
+                if not result:
+                    break
+            return result
+
+        if isinstance(condition, list):
+            return self._equal_any(field, condition)
+
+        return self._equal_any(field, [condition])
+
+    def _evaluate_operator(self, field: str, op: str, operand: Any, present: RowBitmap) -> RowBitmap:
+        """Tek bir alan operatörünü değerlendirir."""
+        if op == "$eq":
+            return self._equal_any(field, [operand])
+        if op == "$ne":
+            return present - self._equal_any(field, [operand])
+        if op == "$in":
+            return self._equal_any(field, operand) if isinstance(operand, (list, tuple, set)) else RowBitmap()
+        if op == "$nin":
+            if not isinstance(operand, (list, tuple, set)):
+                return present
+            return present - self._equal_any(field, operand)
+        if op in _RANGE_OPERATORS:
+            return self._range(field, op, operand)
+        if op == "$regex":
+            return self._regex(field, operand)
+        return RowBitmap()
+
+    def _equal_any(self, field: str, candidates: Iterable[Any]) -> RowBitmap:
+        """Değeri adaylardan birine eşit olan satırlar."""
+        candidates = list(candidates)
+        field_values = self.values.get(field, {})
+
+        result = RowBitmap()
+        for candidate in candidates:
+            if _is_hashable(candidate) and candidate in field_values:
+                result = result | field_values[candidate]
+
+        # Hashlenemeyen değerler (liste, sözlük) yalnızca doğrudan karşılaştırılabilir
+        scanned = [
+            row for row, value in self.unindexed.get(field, {}).items()
+            if any(value == candidate for candidate in candidates)
+        ]
+        if scanned:
+            result = result | RowBitmap.from_rows(scanned)
+
+        return result
+
+    def _range(self, field: str, op: str, operand: Any) -> RowBitmap:
+        """Aralık operatörünü sıralı sütun üzerinde değerlendirir."""
+        bound = sortable_value(operand)
+        if bound is None:
+            return RowBitmap()
+
+        kind, number = bound
+        column = self.sorted_columns.get((field, kind))
+        if column is None:
+            return RowBitmap()
+
+        if op == "$gt":
+            return column.range(number, False, np.inf, True)
+        if op == "$gte":
+            return column.range(number, True, np.inf, True)
+        if op == "$lt":
+            return column.range(-np.inf, True, number, False)
+        return column.range(-np.inf, True, number, True)
+
+    def _regex(self, field: str, pattern: str) -> RowBitmap:
+        """Düzenli ifadeyi alanın farklı değerleri üzerinde bir kez değerlendirir."""
+        compiled = re.compile(pattern)
+        result = RowBitmap()
+        for value, bitmap in self.values.get(field, {}).items():
+            if isinstance(value, str) and compiled.search(value):
+                result = result | bitmap
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Alan bazında indekslenmiş satır sayıları.
+
+        Returns:
+            Dict[str, int]: Alan adı -> değeri olan satır sayısı
+        """
+        return {field: len(bitmap) for field, bitmap in self.present.items()}
@@ -0,0 +1,380 @@
+"""
+Anahtar kelime araması için artımlı ters indeks (inverted index).
+
+Her terim için chunk ID -> terim frekansı eşlemesi (posting listesi), chunk
+uzunlukları ve toplam korpus uzunluğu tutulur. Skorlama gerçek IDF ve
+ortalama belge uzunluğu ile BM25'tir; top-k araması MaxScore budaması ile
+yalnızca eşiği geçebilecek adayları değerlendirir.
+"""
+
+import math
+import logging
+import heapq
+from collections import Counter
+from typing import List, Dict, Any, Optional, Tuple, Callable, Iterable
+
+from ModularMind.API.services.retrieval.search_utils import extract_keywords
+
+logger = logging.getLogger(__name__)
+
+# İndekslenen metin alanları (Chunk.text + bu metadata alanları)
+DEFAULT_KEYWORD_FIELDS = ["text", "title", "description", "content"]
+
+def chunk_keyword_text(text: Optional[str], metadata: Optional[Dict[str, Any]]) -> str:
+    """
+    Bir chunk'ın ters indekse yazılacak metnini oluşturur.
+
+    Args:
+        text: Chunk metni
+        metadata: Chunk metadata'sı
+
+    Returns:
+        str: İndekslenecek metin
+    """
+    parts = [text] if text else []
+    metadata = metadata or {}
+
+    for field in DEFAULT_KEYWORD_FIELDS:
+        # Metin zaten chunk'tan alındıysa metadata'daki kopyasını ekleme
+        if field == "text" and text:
+            continue
+        if metadata.get(field):
+            parts.append(str(metadata[field]))
+
+    return " ".join(parts)
+
+class InvertedIndex:
+    """
+    BM25 skorlamalı, artımlı güncellenen ters indeks.
+
+    Ekleme ve silme yalnızca ilgili chunk'ın terimlerine dokunur; arama
+    maliyeti korpus boyutuna değil sorgu terimlerinin posting listelerine bağlıdır.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """
+        Args:
+            k1: Terim frekansı doygunluk parametresi
+            b: Belge uzunluğu normalizasyon parametresi
+        """
+        self.k1 = k1
+        self.b = b
+
+        self.postings: Dict[str, Dict[str, int]] = {}  # terim -> {chunk_id: tf}
+        self.doc_lengths: Dict[str, int] = {}          # chunk_id -> terim sayısı
+        self.doc_terms: Dict[str, Tuple[str, ...]] = {}  # chunk_id -> benzersiz terimler
+        self.total_length = 0
+
+        # MaxScore üst sınırları için; silmelerde güncellenmez (sınır yine geçerlidir)
+        self.max_tf: Dict[str, int] = {}
+        self.min_doc_length: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def __contains__(self, chunk_id: str) -> bool:
+        return chunk_id in self.doc_lengths
+
+    @property
+    def avg_doc_length(self) -> float:
+        """Ortalama chunk uzunluğu (terim cinsinden)."""
+        if not self.doc_lengths:
+            return 0.0
+        return self.total_length / len(self.doc_lengths)
+
+    @staticmethod
+    def analyze(text: str) -> List[str]:
+        """
+        Metni terimlere ayırır (sorgu ile aynı analiz).
+
+        Args:
+            text: Metin
+
+        Returns:
+            List[str]: Terimler
+        """
+        return extract_keywords(text) if text else []
+
+    def add(self, chunk_id: str, text: str) -> None:
+        """
+        Bir chunk'ı indeksler (varsa önceki hâlinin yerine geçer).
+
+        Args:
+            chunk_id: Chunk ID'si
+            text: İndekslenecek metin
+        """
+        self.add_term_counts(chunk_id, Counter(self.analyze(text)))
+
+    def add_term_counts(self, chunk_id: str, term_counts: Dict[str, int]) -> None:
+        """
+        Önceden analiz edilmiş terim frekanslarıyla bir chunk'ı indeksler.
+
+        Diskten yüklemede metin yeniden analiz edilmeden kullanılır.
+
+        Args:
+            chunk_id: Chunk ID'si
+            term_counts: Terim -> frekans
+        """
+        if chunk_id in self.doc_lengths:
+            self.remove(chunk_id)
+
+        length = sum(term_counts.values())
+
+        for term, tf in term_counts.items():
+            self.postings.setdefault(term, {})[chunk_id] = tf
+            if tf > self.max_tf.get(term, 0):
+                self.max_tf[term] = tf
+
+        self.doc_lengths[chunk_id] = length
+        self.doc_terms[chunk_id] = tuple(term_counts)
+        self.total_length += length
+
+        if length > 0 and (self.min_doc_length is None or length < self.min_doc_length):
+            self.min_doc_length = length
+
+    def term_counts(self, chunk_id: str) -> Optional[Dict[str, int]]:
+        """
+        Bir chunk'ın indekslenmiş terim frekanslarını döndürür.
+
+        Args:
+            chunk_id: Chunk ID'si
+
+        Returns:
+            Optional[Dict[str, int]]: Terim -> frekans (chunk indekste yoksa None)
+        """
+        terms = self.doc_terms.get(chunk_id)
+        if terms is None:
+            return None
+        return {term: self.postings[term][chunk_id] for term in terms}
+
+    def add_many(self, items: Iterable[Tuple[str, str]]) -> None:
+        """
+        Birden fazla chunk'ı indeksler.
+
+        Args:
+            items: (chunk_id, metin) çiftleri
+        """
+        for chunk_id, text in items:
+            self.add(chunk_id, text)
+
+    def remove(self, chunk_id: str) -> bool:
+        """
+        Bir chunk'ı indeksten kaldırır.
+
+        Args:
+            chunk_id: Chunk ID'si
+
+        Returns:
+            bool: Chunk indekste var mıydı
+        """
+        if chunk_id not in self.doc_lengths:
+            return False
+
+        for term in self.doc_terms.pop(chunk_id):
+            postings = self.postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(chunk_id, None)
+            if not postings:
+                del self.postings[term]
+                self.max_tf.pop(term, None)
+
+        self.total_length -= self.doc_lengths.pop(chunk_id)
+
+        if not self.doc_lengths:
+            self.min_doc_length = None
+
+        return True
+
+    def clear(self) -> None:
+        """İndeksi boşaltır."""
+        self.postings = {}
+        self.doc_lengths = {}
+        self.doc_terms = {}
+        self.total_length = 0
+        self.max_tf = {}
+        self.min_doc_length = None
+
+    def idf(self, term: str) -> float:
+        """
+        Terimin ters belge frekansı (negatif olmayan BM25 IDF).
+
+        Args:
+            term: Terim
+
+        Returns:
+            float: IDF değeri
+        """
+        df = len(self.postings.get(term, ()))
+        if df == 0:
+            return 0.0
+        return math.log(1.0 + (len(self.doc_lengths) - df + 0.5) / (df + 0.5))
+
+    def max_term_score(self, term: str) -> float:
+        """
+        Terimin tek bir chunk'a katkısının sorgudan bağımsız en yüksek değeri.
+
+        Args:
+            term: Terim
+
+        Returns:
+            float: idf * (k1 + 1)
+        """
+        return self.idf(term) * (self.k1 + 1)
+
+    def _upper_bound(self, term: str, idf: float, avg_doc_length: float) -> float:
+        """Terimin herhangi bir chunk'a katkısı için üst sınır (MaxScore)."""
+        tf = self.max_tf.get(term, 0)
+        min_length = self.min_doc_length or 0
+        norm = self.k1 * (1 - self.b + self.b * min_length / avg_doc_length)
+        return idf * tf * (self.k1 + 1) / (tf + norm)
+
+    def score(self, chunk_id: str, terms: Iterable[str]) -> float:
+        """
+        Bir chunk'ın sorgu terimleri için BM25 skorunu hesaplar.
+
+        Args:
+            chunk_id: Chunk ID'si
+            terms: Sorgu terimleri
+
+        Returns:
+            float: BM25 skoru
+        """
+        if chunk_id not in self.doc_lengths:
+            return 0.0
+
+        avg_doc_length = self.avg_doc_length or 1.0
+        norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[chunk_id] / avg_doc_length)
+
+        score = 0.0
+        for term in set(terms):
+            tf = self.postings.get(term, {}).get(chunk_id, 0)
+            if tf:
+                score += self.idf(term) * tf * (self.k1 + 1) / (tf + norm)
+
+        return score
+
+    def search(
+        self,
+        terms: Iterable[str],
+        limit: int = 10,
+        candidate_filter: Optional[Callable[[str], bool]] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        BM25 ile en yüksek skorlu chunk'ları bulur (MaxScore budamalı).
+
+        Terimler katkı üst sınırına göre azalan sırada işlenir. Kalan
+        terimlerin üst sınırları toplamı mevcut k'ıncı skorun altına düştüğünde
+        yeni aday kabul edilmez; kalan terimler yalnızca mevcut adaylar için
+        sözlükten okunur ve eşiğe ulaşamayacak adaylar elenir.
+
+        Args:
+            terms: Sorgu terimleri
+            limit: Maksimum sonuç sayısı
+            candidate_filter: Chunk ID'si için kabul fonksiyonu (ör. metadata filtresi)
+
+        Returns:
+            List[Tuple[str, float]]: Skora göre azalan (chunk_id, skor) listesi
+        """
+        if limit <= 0 or not self.doc_lengths:
+            return []
+
+        avg_doc_length = self.avg_doc_length or 1.0
+
+        query_terms = []
+        for term in set(terms):
+            if term in self.postings:
+                idf = self.idf(term)
+                query_terms.append((self._upper_bound(term, idf, avg_doc_length), idf, term))
+
+        if not query_terms:
+            return []
+
+        query_terms.sort(reverse=True)
+
+        # remaining[i]: i. ve sonraki terimlerin üst sınırları toplamı
+        remaining = [0.0] * (len(query_terms) + 1)
+        for i in range(len(query_terms) - 1, -1, -1):
+            remaining[i] = remaining[i + 1] + query_terms[i][0]
+
+        scores: Dict[str, float] = {}
+        rejected = set()
+        norms: Dict[str, float] = {}
+        k1, b = self.k1, self.b
+
+        def norm_of(chunk_id: str) -> float:
+            norm = norms.get(chunk_id)
+            if norm is None:
+                norm = k1 * (1 - b + b * self.doc_lengths[chunk_id] / avg_doc_length)
+                norms[chunk_id] = norm
+            return norm
+
+        for i, (_, idf, term) in enumerate(query_terms):
+            postings = self.postings[term]
+
+            threshold = 0.0
+            if len(scores) >= limit:
+                threshold = heapq.nlargest(limit, scores.values())[-1]
+
+            if remaining[i] > threshold or len(scores) < limit:
+                # Esas terim: posting listesindeki tüm chunk'lar aday olabilir
+                for chunk_id, tf in postings.items():
+                    if chunk_id in rejected:
+                        continue
+                    if chunk_id not in scores and candidate_filter is not None and not candidate_filter(chunk_id):
+                        rejected.add(chunk_id)
+                        continue
+                    scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * tf * (k1 + 1) / (tf + norm_of(chunk_id))
+            else:
+                # Esas olmayan terim: yalnızca eşiğe ulaşabilecek adayları güncelle
+                for chunk_id in list(scores):
+                    if scores[chunk_id] + remaining[i] < threshold:
+                        del scores[chunk_id]
+                        continue
+                    tf = postings.get(chunk_id)
+                    if tf:
+                        scores[chunk_id] += idf * tf * (k1 + 1) / (tf + norm_of(chunk_id))
+
+        return heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], item[0]))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        İndeksi serileştirilebilir sözlüğe dönüştürür.
+
+        Returns:
+            Dict[str, Any]: İndeks verisi
+        """
+        return {
+            "k1": self.k1,
+            "b": self.b,
+            "postings": self.postings,
+            "doc_lengths": self.doc_lengths
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "InvertedIndex":
+        """
+        Sözlükten indeks oluşturur.
+
+        Args:
+            data: to_dict() çıktısı
+
+        Returns:
+            InvertedIndex: İndeks
+        """
+        index = cls(k1=data.get("k1", 1.5), b=data.get("b", 0.75))
+        index.postings = {term: dict(postings) for term, postings in data.get("postings", {}).items()}
+        index.doc_lengths = dict(data.get("doc_lengths", {}))
+        index.total_length = sum(index.doc_lengths.values())
+
+        doc_terms: Dict[str, List[str]] = {chunk_id: [] for chunk_id in index.doc_lengths}
+        for term, postings in index.postings.items():
+            index.max_tf[term] = max(postings.values())
+            for chunk_id in postings:
+                doc_terms.setdefault(chunk_id, []).append(term)
+        index.doc_terms = {chunk_id: tuple(terms) for chunk_id, terms in doc_terms.items()}
+
+        lengths = [length for length in index.doc_lengths.values() if length > 0]
+        index.min_doc_length = min(lengths) if lengths else None
+
+        return index
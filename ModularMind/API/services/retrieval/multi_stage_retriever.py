@@ -5,6 +5,7 @@ Multi-stage retrieval pipeline modülü.
 
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional, Union, Callable, Set, Tuple
 from enum import Enum
 from dataclasses import dataclass, field
@@ -13,6 +14,8 @@ import numpy as np
 from ModularMind.API.services.retrieval.models import Document, Chunk
 from ModularMind.API.services.retrieval.query_processing import QueryProcessor
 from ModularMind.API.services.retrieval.reranking import Reranker
+from ModularMind.API.services.retrieval.stage_graph import StageGraph, StageGraphResult, AbandonedStages
+from ModularMind.API.services.retrieval.result_cache import get_result_cache, DEFAULT_COLLECTION
 from ModularMind.API.services.llm_service import LLMService
 from ModularMind.API.services.embedding import EmbeddingService
 
@@ -33,6 +36,7 @@ class RetrievalStageConfig:
     stage_type: RetrievalStage
     enabled: bool = True
     options: Dict[str, Any] = field(default_factory=dict)
+    timeout_seconds: Optional[float] = None  # Aşama süre sınırı (None = yalnızca toplam bütçe)
 
 @dataclass
 class MultiStageRetrieverConfig:
@@ -40,9 +44,18 @@ class MultiStageRetrieverConfig:
     stages: List[RetrievalStageConfig] = field(default_factory=list)
     top_k: int = 10
     reranking_top_k: int = 20
-    timeout_seconds: float = 10.0
+    timeout_seconds: float = 10.0  # Uçtan uca süre bütçesi
     enable_caching: bool = True
     cache_ttl_seconds: int = 3600  # 1 saat
+    cache_max_entries: int = 1000  # Süreç içi önbellek girdi sınırı
+    cache_max_memory_mb: int = 64  # Süreç içi önbellek bellek sınırı
+    cache_use_redis: bool = False  # Sonuçları işçiler arasında Redis ile paylaş
+    cache_collection: str = DEFAULT_COLLECTION  # Yazmalarda geçersiz kılınan koleksiyon
+    semantic_cache_threshold: Optional[float] = None  # Benzer sorgular için kosinüs eşiği (None = kapalı)
+    max_workers: int = 4  # Aşamaları çalıştıran iş parçacığı sayısı
+    max_abandoned_stages: int = 2  # Süresi dolup hâlâ çalışan en fazla aşama; dolunca yeni aşamalar atlanır
+    search_workers: int = 4  # Alt sorgu aramalarını çalıştıran iş parçacığı sayısı
+    early_exit_score: Optional[float] = None  # İlk aramada top_k sonuç bu skoru geçerse kalan aşamalar atlanır
     
     def get_stage_config(self, stage_type: RetrievalStage) -> Optional[RetrievalStageConfig]:
         """Belirli bir aşamanın yapılandırmasını döndürür."""
@@ -62,6 +75,10 @@ class MultiStageRetriever:
     4. Özyinelemeli Arama: İlk sonuçlardan ek sorgular oluşturma
     5. Hibrit Arama: Vektör + anahtar kelime kombinasyonu
     6. Birleştirme: Tüm sonuçları birleştirme ve sıralama
+    
+    1-5. aşamalar bir bağımlılık grafı olarak eşzamanlı çalıştırılır: hibrit
+    arama diğer aşamaları beklemez, alt sorgular paralel aranır. Birleştirme
+    graf tamamlandıktan (veya bütçe dolduktan) sonra yapılır.
     """
     
     def __init__(
@@ -95,8 +112,27 @@ class MultiStageRetriever:
             llm_service=llm_service
         )
         
-        # Sonuç önbelleği
-        self.result_cache = {}
+        # Paylaşılan sonuç önbelleği (koleksiyona yazıldığında geçersiz kılınır)
+        self.result_cache = get_result_cache(
+            max_entries=config.cache_max_entries,
+            max_memory_bytes=config.cache_max_memory_mb * 1024 * 1024,
+            ttl=config.cache_ttl_seconds,
+            use_redis=config.cache_use_redis,
+            semantic_threshold=config.semantic_cache_threshold
+        )
+        
+        # Aşamalar ve alt sorgu aramaları ayrı havuzlarda çalışır; aşamalar
+        # alt aramalarını beklerken havuzun tükenip kilitlenmesi önlenir
+        self.stage_executor = ThreadPoolExecutor(
+            max_workers=config.max_workers,
+            thread_name_prefix="retrieval-stage"
+        )
+        # Süresi dolan aşamalar durdurulamaz; havuzu tüketmemeleri için sayıları sınırlanır
+        self.abandoned_stages = AbandonedStages(config.max_abandoned_stages)
+        self.search_executor = ThreadPoolExecutor(
+            max_workers=config.search_workers,
+            thread_name_prefix="retrieval-search"
+        )
         
         logger.info("MultiStageRetriever başlatıldı")
     
@@ -121,9 +157,19 @@ class MultiStageRetriever:
             top_k = self.config.top_k
             
         # Önbellekten sonuç kontrolü
+        cache_params = {
+            "filters": filters or {},
+            "top_k": top_k,
+            "reranking_top_k": self.config.reranking_top_k,
+            "stages": [(stage.stage_type.value, stage.enabled, stage.options) for stage in self.config.stages]
+        }
+        query_embedding = None
+        cache_version = None
         if self.config.enable_caching:
-            cache_key = f"{query}_{str(filters)}_{top_k}"
-            cached_result = self._get_cached_result(cache_key)
+            # Aşağıda hesaplanan sonuç yalnızca bu arada koleksiyona yazılmazsa saklanır
+            cache_version = self.result_cache.version(self.config.cache_collection)
+            query_embedding = self._get_cache_embedding(query)
+            cached_result = self._get_cached_result(query, cache_params, query_embedding, cache_version)
             
             if cached_result:
                 logger.info(f"Önbellekten sonuç bulundu: {query}")
@@ -132,45 +178,44 @@ class MultiStageRetriever:
         # Arama başlangıç zamanı
         start_time = time.time()
         
-        # 1. Aşama: Sorgu İşleme
-        processed_queries = self._process_query(query)
-        
-        # 2. Aşama: İlk Arama
-        initial_results = self._initial_retrieval(processed_queries, filters, self.config.reranking_top_k)
-        
-        # 3. Aşama: Yeniden Sıralama
-        reranked_results = self._rerank_results(query, initial_results)
+        # 1-5. Aşamalar: bağımlılık grafı üzerinde eşzamanlı çalıştır
+        graph = self._build_stage_graph(query, filters, top_k)
+        outcome = graph.run(
+            self.stage_executor,
+            budget_seconds=self.config.timeout_seconds,
+            early_exit=lambda stage, results: self._is_confident(stage, results, top_k),
+            abandoned=self.abandoned_stages
+        )
         
-        # 4. Aşama: Özyinelemeli Arama (opsiyonel)
-        recursive_stage = self.config.get_stage_config(RetrievalStage.RECURSIVE_RETRIEVAL)
-        recursive_results = []
+        initial_results = outcome.results[RetrievalStage.INITIAL_RETRIEVAL.value]
+        reranked_results = outcome.results[RetrievalStage.RERANKING.value]
         
-        if recursive_stage and recursive_stage.enabled:
-            recursive_results = self._recursive_retrieval(query, reranked_results[:5], filters)
-        
-        # 5. Aşama: Hibrit Arama (opsiyonel)
-        hybrid_stage = self.config.get_stage_config(RetrievalStage.HYBRID_SEARCH)
-        hybrid_results = []
-        
-        if hybrid_stage and hybrid_stage.enabled:
-            hybrid_results = self._hybrid_search(query, filters, top_k)
+        if outcome.early_exit:
+            # İlk arama yeterince güvenilir: skora göre sırala
+            reranked_results = sorted(initial_results, key=lambda chunk: self._result_score(chunk) or 0.0, reverse=True)
+        elif reranked_results is None:
+            # Yeniden sıralama tamamlanamadı, ilk sonuçlarla devam et
+            reranked_results = initial_results
         
         # 6. Aşama: Sonuçları Birleştir
         final_results = self._consolidate_results(
             query=query, 
             reranked_results=reranked_results,
-            recursive_results=recursive_results, 
-            hybrid_results=hybrid_results,
+            recursive_results=outcome.results.get(RetrievalStage.RECURSIVE_RETRIEVAL.value, []), 
+            hybrid_results=outcome.results.get(RetrievalStage.HYBRID_SEARCH.value, []),
             top_k=top_k
         )
         
+        self._log_stage_outcome(outcome)
+        
         # Toplam arama süresini hesapla
         elapsed = time.time() - start_time
         logger.info(f"Çok aşamalı arama tamamlandı: {len(final_results)} sonuç, {elapsed:.2f}s")
         
-        # Sonuçları önbelleğe ekle
-        if self.config.enable_caching:
-            self._cache_result(cache_key, final_results)
+        # Sonuçları önbelleğe ekle (süre aşımıyla eksik kalan sonuçlar hariç)
+        degraded = outcome.timed_out or (outcome.skipped and not outcome.early_exit)
+        if self.config.enable_caching and not degraded:
+            self._cache_result(query, cache_params, final_results, query_embedding, cache_version)
         
         return final_results
     
@@ -232,6 +277,180 @@ class MultiStageRetriever:
         
         return context
     
+    def close(self) -> None:
+        """Aşama ve arama iş parçacıklarını durdurur."""
+        self.stage_executor.shutdown(wait=False)
+        self.search_executor.shutdown(wait=False)
+    
+    def _build_stage_graph(
+        self,
+        query: str,
+        filters: Optional[Dict[str, Any]],
+        top_k: int
+    ) -> StageGraph:
+        """
+        Sorgu için aşama bağımlılık grafını oluşturur.
+        
+        Sorgu İşleme -> İlk Arama -> Yeniden Sıralama -> Özyinelemeli Arama
+        zinciri sıralıdır; Hibrit Arama yalnızca orijinal sorguya bağlı
+        olduğundan zincirle paralel çalışır.
+        
+        Args:
+            query: Kullanıcı sorgusu
+            filters: Filtreleme kriterleri
+            top_k: Getirilecek en fazla sonuç sayısı
+            
+        Returns:
+            StageGraph: Çalıştırılmaya hazır graf
+        """
+        graph = StageGraph()
+        
+        query_processing = RetrievalStage.QUERY_PROCESSING.value
+        initial_retrieval = RetrievalStage.INITIAL_RETRIEVAL.value
+        reranking = RetrievalStage.RERANKING.value
+        
+        graph.add_stage(
+            query_processing,
+            lambda inputs: self._process_query(query),
+            timeout_seconds=self._stage_timeout(RetrievalStage.QUERY_PROCESSING),
+            default=[query]
+        )
+        graph.add_stage(
+            initial_retrieval,
+            lambda inputs: self._initial_retrieval(inputs[query_processing], filters, self.config.reranking_top_k),
+            depends_on=[query_processing],
+            timeout_seconds=self._stage_timeout(RetrievalStage.INITIAL_RETRIEVAL),
+            default=[]
+        )
+        graph.add_stage(
+            reranking,
+            lambda inputs: self._rerank_results(query, inputs[initial_retrieval]),
+            depends_on=[initial_retrieval],
+            timeout_seconds=self._stage_timeout(RetrievalStage.RERANKING),
+            default=None
+        )
+        
+        # 4. Aşama: Özyinelemeli Arama (opsiyonel)
+        recursive_stage = self.config.get_stage_config(RetrievalStage.RECURSIVE_RETRIEVAL)
+        if recursive_stage and recursive_stage.enabled:
+            def recursive_retrieval(inputs):
+                top_results = inputs[reranking]
+                if top_results is None:
+                    top_results = inputs[initial_retrieval]
+                return self._recursive_retrieval(query, top_results[:5], filters)
+            
+            graph.add_stage(
+                RetrievalStage.RECURSIVE_RETRIEVAL.value,
+                recursive_retrieval,
+                depends_on=[initial_retrieval, reranking],
+                timeout_seconds=recursive_stage.timeout_seconds,
+                default=[]
+            )
+        
+        # 5. Aşama: Hibrit Arama (opsiyonel, diğer aşamalardan bağımsız)
+        hybrid_stage = self.config.get_stage_config(RetrievalStage.HYBRID_SEARCH)
+        if hybrid_stage and hybrid_stage.enabled:
+            graph.add_stage(
+                RetrievalStage.HYBRID_SEARCH.value,
+                lambda inputs: self._hybrid_search(query, filters, top_k),
+                timeout_seconds=hybrid_stage.timeout_seconds,
+                default=[]
+            )
+        
+        return graph
+    
+    def _stage_timeout(self, stage_type: RetrievalStage) -> Optional[float]:
+        """Aşamanın süre sınırını döndürür."""
+        stage_config = self.config.get_stage_config(stage_type)
+        return stage_config.timeout_seconds if stage_config else None
+    
+    def _is_confident(self, stage: str, results: Dict[str, Any], top_k: int) -> bool:
+        """
+        İlk aramanın kalan aşamalara gerek bırakmayacak kadar güvenilir olup olmadığını kontrol eder.
+        
+        Args:
+            stage: Tamamlanan aşama
+            results: Şimdiye kadarki aşama sonuçları
+            top_k: İstenen sonuç sayısı
+            
+        Returns:
+            bool: En az top_k sonuç early_exit_score eşiğini geçiyorsa True
+        """
+        if self.config.early_exit_score is None or stage != RetrievalStage.INITIAL_RETRIEVAL.value:
+            return False
+        
+        confident = 0
+        for chunk in results[stage]:
+            score = self._result_score(chunk)
+            if score is not None and score >= self.config.early_exit_score:
+                confident += 1
+        
+        return confident >= top_k
+    
+    @staticmethod
+    def _result_score(chunk: Chunk) -> Optional[float]:
+        """Arama sonucunun skorunu döndürür (yoksa None)."""
+        score = getattr(chunk, "score", None)
+        if score is None and isinstance(getattr(chunk, "metadata", None), dict):
+            score = chunk.metadata.get("score")
+        return score
+    
+    def _log_stage_outcome(self, outcome: StageGraphResult) -> None:
+        """Aşama sürelerini ve atlanan/zaman aşımına uğrayan aşamaları loglar."""
+        timings = ", ".join(f"{stage}={elapsed:.2f}s" for stage, elapsed in outcome.timings.items())
+        logger.debug(f"Aşama süreleri: {timings}")
+        
+        if outcome.early_exit:
+            logger.info(f"İlk arama yeterli güvende, atlanan aşamalar: {sorted(outcome.skipped)}")
+        elif outcome.timed_out or outcome.skipped:
+            logger.warning(
+                f"Zaman aşımına uğrayan aşamalar: {sorted(outcome.timed_out)}, "
+                f"bütçe veya bırakılmış aşama sınırı nedeniyle atlananlar: {sorted(outcome.skipped)}"
+            )
+    
+    def _search_queries(
+        self,
+        queries: List[str],
+        filters: Optional[Dict[str, Any]],
+        limit: int,
+        seen_ids: Set[str]
+    ) -> List[Chunk]:
+        """
+        Sorguları paralel olarak arar ve sonuçları sorgu sırasıyla birleştirir.
+        
+        Args:
+            queries: Aranacak sorgular
+            filters: Filtreleme kriterleri
+            limit: Sorgu başına sonuç sayısı
+            seen_ids: Sonuçlara eklenmeyecek ID'ler (güncellenir)
+            
+        Returns:
+            List[Chunk]: Tekrarsız sonuçlar
+        """
+        def search(query: str) -> List[Chunk]:
+            # Her sorgu için bir vektör taraması yap
+            query_embedding = self.embedding_service.get_embedding(query)
+            return self.search_engine.search(
+                query_embedding=query_embedding,
+                filters=filters,
+                limit=limit
+            )
+        
+        if len(queries) == 1:
+            result_lists = [search(queries[0])]
+        else:
+            result_lists = list(self.search_executor.map(search, queries))
+        
+        # Tekrarları önleyerek sonuçları birleştir
+        all_results = []
+        for search_results in result_lists:
+            for result in search_results:
+                if result.id not in seen_ids:
+                    seen_ids.add(result.id)
+                    all_results.append(result)
+        
+        return all_results
+    
     def _process_query(self, query: str) -> List[str]:
         """
         Sorguyu işler ve genişletir.
@@ -288,27 +507,8 @@ class MultiStageRetriever:
             return []
         
         try:
-            all_results = []
-            seen_ids = set()
-            
-            for query in queries:
-                # Her sorgu için bir vektör taraması yap
-                query_embedding = self.embedding_service.get_embedding(query)
-                
-                # Arama
-                search_results = self.search_engine.search(
-                    query_embedding=query_embedding,
-                    filters=filters,
-                    limit=top_k
-                )
-                
-                # Tekrarları önleyerek sonuçları birleştir
-                for result in search_results:
-                    if result.id not in seen_ids:
-                        seen_ids.add(result.id)
-                        all_results.append(result)
-            
-            return all_results
+            # Alt sorgular birbirinden bağımsızdır, paralel aranır
+            return self._search_queries(queries, filters, top_k, set())
             
         except Exception as e:
             logger.error(f"İlk arama hatası: {str(e)}")
@@ -412,28 +612,11 @@ class MultiStageRetriever:
                 
             logger.info(f"Özyinelemeli sorgular oluşturuldu: {follow_up_queries}")
             
-            # Her takip sorusu için arama yap
-            recursive_results = []
-            seen_ids = set([chunk.id for chunk in top_results])  # İlk sonuçları tekrar getirme
-            
-            for query in follow_up_queries:
-                # Her sorgu için bir vektör taraması yap
-                query_embedding = self.embedding_service.get_embedding(query)
-                
-                # Arama
-                search_results = self.search_engine.search(
-                    query_embedding=query_embedding,
-                    filters=filters,
-                    limit=5  # Her takip sorgusu için daha az sonuç getir
-                )
-                
-                # Tekrarları önleyerek sonuçları birleştir
-                for result in search_results:
-                    if result.id not in seen_ids:
-                        seen_ids.add(result.id)
-                        recursive_results.append(result)
+            # Her takip sorusu için paralel arama yap (ilk sonuçları tekrar getirme)
+            seen_ids = set([chunk.id for chunk in top_results])
             
-            return recursive_results
+            # Her takip sorgusu için daha az sonuç getir
+            return self._search_queries(follow_up_queries, filters, 5, seen_ids)
             
         except Exception as e:
             logger.error(f"Özyinelemeli arama hatası: {str(e)}")
@@ -629,53 +812,47 @@ class MultiStageRetriever:
         
         return top_results
     
-    def _get_cached_result(self, cache_key: str) -> Optional[List[Chunk]]:
-        """Önbellekten sonuç getir."""
-        if cache_key in self.result_cache:
-            entry = self.result_cache[cache_key]
-            cache_time = entry["timestamp"]
-            current_time = time.time()
-            
-            # Önbellek TTL kontrolü
-            if current_time - cache_time <= self.config.cache_ttl_seconds:
-                return entry["results"]
-                
-            # Önbellek süresi dolmuş
-            del self.result_cache[cache_key]
-            
-        return None
-    
-    def _cache_result(self, cache_key: str, results: List[Chunk]) -> None:
-        """Sonuçları önbelleğe ekle."""
-        self.result_cache[cache_key] = {
-            "results": results,
-            "timestamp": time.time()
-        }
+    def _get_cache_embedding(self, query: str) -> Optional[np.ndarray]:
+        """Benzer sorgu eşleştirme için sorgu embedding'i (kapalıysa None)."""
+        if not self.result_cache.semantic_enabled:
+            return None
+        
+        try:
+            embedding = self.embedding_service.get_embedding(query)
+        except Exception as e:
+            logger.warning(f"Önbellek için sorgu embedding'i alınamadı: {str(e)}")
+            return None
         
-        # Önbellek temizliği
-        if len(self.result_cache) > 1000:  # Önbellek boyutu limiti
-            self._clean_cache()
+        return np.asarray(embedding, dtype=np.float32) if embedding is not None else None
     
-    def _clean_cache(self) -> None:
-        """Süresi dolmuş önbellek girdilerini temizle."""
-        current_time = time.time()
-        expired_keys = []
-        
-        for key, entry in self.result_cache.items():
-            if current_time - entry["timestamp"] > self.config.cache_ttl_seconds:
-                expired_keys.append(key)
-        
-        # Süresi dolmuş girdileri kaldır
-        for key in expired_keys:
-            del self.result_cache[key]
-        
-        # Eğer hala çok fazla girdi varsa, en eski girdileri kaldır
-        if len(self.result_cache) > 800:  # Hedef boyut
-            sorted_entries = sorted(
-                [(k, v["timestamp"]) for k, v in self.result_cache.items()],
-                key=lambda x: x[1]
-            )
-            
-            # En eski girdileri sil
-            for key, _ in sorted_entries[:200]:  # En eski 200 girdiyi sil
-                del self.result_cache[key]
\ No newline at end of file
+    def _get_cached_result(
+        self,
+        query: str,
+        cache_params: Dict[str, Any],
+        query_embedding: Optional[np.ndarray] = None,
+        cache_version: Optional[int] = None
+    ) -> Optional[List[Chunk]]:
+        """Önbellekten sonuç getir."""
+        return self.result_cache.get(
+            "multi_stage", query, cache_params,
+            collection=self.config.cache_collection,
+            embedding=query_embedding,
+            version=cache_version
+        )
+    
+    def _cache_result(
+        self,
+        query: str,
+        cache_params: Dict[str, Any],
+        results: List[Chunk],
+        query_embedding: Optional[np.ndarray] = None,
+        cache_version: Optional[int] = None
+    ) -> None:
+        """Sonuçları önbelleğe ekle (koleksiyon `cache_version` sonrası değiştiyse atılır)."""
+        self.result_cache.set(
+            "multi_stage", query, results, cache_params,
+            collection=self.config.cache_collection,
+            embedding=query_embedding,
+            ttl=self.config.cache_ttl_seconds,
+            version=cache_version
+        )
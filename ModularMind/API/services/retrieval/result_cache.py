@@ -0,0 +1,558 @@
+"""
+Retrieval sonuçları için paylaşılan önbellek.
+Süreç içi LRU/TTL katmanı, isteğe bağlı Redis katmanı ve koleksiyon
+sürümüne dayalı geçersiz kılma sağlar.
+"""
+
+import hashlib
+import json
+import logging
+import pickle
+import threading
+import time
+import unicodedata
+import numpy as np
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Koleksiyon belirtilmediğinde kullanılan ad
+DEFAULT_COLLECTION = "default"
+
+# Serileştirilmiş boyuta eklenen girdi başı sabit maliyet (anahtar, nesne, sözlük yuvası)
+ENTRY_OVERHEAD_BYTES = 256
+
+@dataclass
+class _CacheEntry:
+    """Serileştirilmiş önbellek girdisi."""
+    data: bytes
+    expires_at: float
+    collection: str
+    signature: str
+    size: int
+
+class _SemanticBucket:
+    """
+    Aynı imzayı paylaşan girdilerin birim uzunluklu sorgu embedding'leri.
+
+    Silinen girdilerin satırları yeniden kullanılır; kova doluysa yeni
+    girdilere yalnızca tam anahtarla ulaşılır.
+    """
+
+    def __init__(self, dimension: int, capacity: int):
+        self.matrix = np.zeros((capacity, dimension), dtype=np.float32)
+        self.keys: List[Optional[str]] = [None] * capacity
+        self.rows: Dict[str, int] = {}
+        self.free = list(range(capacity - 1, -1, -1))
+
+    def add(self, key: str, embedding: np.ndarray) -> bool:
+        if key in self.rows or not self.free:
+            return False
+        row = self.free.pop()
+        self.matrix[row] = embedding
+        self.keys[row] = key
+        self.rows[key] = row
+        return True
+
+    def remove(self, key: str) -> None:
+        row = self.rows.pop(key, None)
+        if row is not None:
+            self.matrix[row] = 0.0
+            self.keys[row] = None
+            self.free.append(row)
+
+    def nearest(self, embedding: np.ndarray) -> Optional[Tuple[str, float]]:
+        if not self.rows:
+            return None
+        similarities = self.matrix @ embedding
+        row = int(np.argmax(similarities))
+        if self.keys[row] is None:
+            return None
+        return self.keys[row], float(similarities[row])
+
+class ResultCache:
+    """
+    Retrieval sonuçları için iki katmanlı önbellek.
+
+    Süreç içi katman girdi sayısı ve serileştirilmiş boyutla sınırlı bir
+    LRU'dur; her girdinin bir TTL'i vardır. Redis istemcisi verilirse
+    girdiler Redis'e de yazılır ve tüm işçiler tarafından paylaşılır.
+
+    Anahtarlar kanoniktir: sorgu metni Unicode normalize edilir, küçük
+    harfe çevrilir ve boşlukları sadeleştirilir; filtre gibi parametreler
+    sıralı anahtarlarla serileştirilir. Anahtara sonucun hesaplandığı
+    koleksiyonun sürümü de girer; koleksiyona yazma sürümü artırarak o
+    koleksiyonun tüm sonuçlarını Redis taranmadan geçersiz kılar.
+    Çağıranlar sonucu hesaplamadan önce sürümü `version` ile okuyup `get`
+    ve `set` çağrılarına verir; böylece hesaplama sırasında koleksiyona
+    yazılırsa sonuç yeni sürümün altına yazılmaz, atılır.
+
+    `semantic_threshold` ayarlıysa ve sorgu embedding'i verilirse, tam
+    anahtarda bulunamayan sorgu aynı kapsam, parametre ve sürümdeki en
+    benzer önbellekli sorguyla eşleştirilir; kosinüs benzerliği eşiği
+    geçerse sonuç yeniden kullanılır. Anlamsal arama yalnızca süreç içi
+    katmanda yapılır.
+
+    Değerler pickle ile saklandığından her isabet çağıranın
+    değiştirebileceği yeni bir kopya döndürür.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        max_memory_bytes: int = 64 * 1024 * 1024,
+        ttl: int = 3600,
+        redis_client: Optional[Any] = None,
+        namespace: str = "mm:retrieval",
+        semantic_threshold: Optional[float] = None,
+        semantic_max_candidates: int = 1024,
+        version_refresh_interval: float = 1.0
+    ):
+        """
+        Args:
+            max_entries: Süreç içi en fazla girdi sayısı
+            max_memory_bytes: Süreç içi girdilerin en fazla toplam boyutu
+            ttl: Varsayılan girdi ömrü (saniye)
+            redis_client: Paylaşılan katman için (senkron) Redis istemcisi
+            namespace: Redis anahtar öneki
+            semantic_threshold: Benzer sorgu eşleştirme için kosinüs eşiği (None = kapalı)
+            semantic_max_candidates: İmza başına tutulan en fazla embedding
+            version_refresh_interval: Redis'ten okunan koleksiyon sürümüne güvenilen süre (saniye)
+        """
+        self.max_entries = max(1, max_entries)
+        self.max_memory_bytes = max(1, max_memory_bytes)
+        self.ttl = ttl
+        self.redis = redis_client
+        self.namespace = namespace
+        self.semantic_threshold = semantic_threshold
+        self.semantic_max_candidates = max(1, semantic_max_candidates)
+        self.version_refresh_interval = version_refresh_interval
+
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._collection_keys: Dict[str, Set[str]] = {}
+        self._semantic: Dict[str, _SemanticBucket] = {}
+        self._versions: Dict[str, int] = {}
+        self._version_checked: Dict[str, float] = {}
+        self._lock = threading.RLock()
+        self.memory_bytes = 0
+
+        # İzleme sayaçları
+        self.hits = 0
+        self.semantic_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.stale_writes = 0
+
+    @property
+    def semantic_enabled(self) -> bool:
+        """Benzer sorgu eşleştirmenin açık olup olmadığı."""
+        return self.semantic_threshold is not None
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """
+        Önbellek anahtarı için sorgunun kanonik biçimi.
+
+        Args:
+            query: Sorgu metni
+
+        Returns:
+            str: Normalize edilmiş sorgu
+        """
+        return " ".join(unicodedata.normalize("NFKC", query).casefold().split())
+
+    @staticmethod
+    def canonicalize(params: Optional[Dict[str, Any]]) -> str:
+        """
+        Sonucu etkileyen parametrelerin (filtreler, top_k, ...) kanonik serileştirmesi.
+
+        Args:
+            params: Parametreler
+
+        Returns:
+            str: Sıralı anahtarlı JSON
+        """
+        return json.dumps(params or {}, sort_keys=True, separators=(",", ":"), default=str)
+
+    def get(
+        self,
+        scope: str,
+        query: str,
+        params: Optional[Dict[str, Any]] = None,
+        collection: str = DEFAULT_COLLECTION,
+        embedding: Optional[np.ndarray] = None,
+        version: Optional[int] = None
+    ) -> Optional[Any]:
+        """
+        Önbellekten sonuç getirir.
+
+        Args:
+            scope: Sonucu üreten bileşenin adı
+            query: Sorgu metni
+            params: Sonucu etkileyen parametreler
+            collection: Sonucun hesaplandığı koleksiyon
+            embedding: Benzer sorgu eşleştirme için sorgu embedding'i
+            version: `version` ile okunan koleksiyon sürümü (None = güncel sürüm)
+
+        Returns:
+            Optional[Any]: Önbellekteki değerin kopyası veya None
+        """
+        if version is None:
+            version = self._collection_version(collection)
+        signature = self._signature(scope, params, collection, version)
+        key = self._key(signature, query)
+
+        data = self._get_local(key)
+        if data is not None:
+            self.hits += 1
+            return pickle.loads(data)
+
+        if self.redis is not None:
+            try:
+                data = self.redis.get(self._redis_key(key))
+            except Exception as e:
+                logger.warning(f"Önbellek Redis okuma hatası: {str(e)}")
+                data = None
+
+            if data is not None:
+                self.hits += 1
+                self.redis_hits += 1
+                self._set_local(key, data, self._redis_ttl(key), collection, signature, embedding, version)
+                return pickle.loads(data)
+
+        if embedding is not None and self.semantic_enabled:
+            data = self._get_similar(signature, embedding)
+            if data is not None:
+                self.hits += 1
+                self.semantic_hits += 1
+                return pickle.loads(data)
+
+        self.misses += 1
+        return None
+
+    def set(
+        self,
+        scope: str,
+        query: str,
+        value: Any,
+        params: Optional[Dict[str, Any]] = None,
+        collection: str = DEFAULT_COLLECTION,
+        embedding: Optional[np.ndarray] = None,
+        ttl: Optional[int] = None,
+        version: Optional[int] = None
+    ) -> None:
+        """
+        Sonucu önbelleğe ekler.
+
+        Args:
+            scope: Sonucu üreten bileşenin adı
+            query: Sorgu metni
+            value: Saklanacak sonuç (pickle ile serileştirilebilir olmalı)
+            params: Sonucu etkileyen parametreler
+            collection: Sonucun hesaplandığı koleksiyon
+            embedding: Benzer sorgu eşleştirme için sorgu embedding'i
+            ttl: Ömür (saniye, None = varsayılan)
+            version: Sonuç hesaplanmadan önce okunan koleksiyon sürümü;
+                koleksiyona o zamandan beri yazılmışsa sonuç atılır
+        """
+        ttl = ttl if ttl is not None else self.ttl
+        current = self._collection_version(collection)
+        if version is None:
+            version = current
+        elif version != current:
+            self.stale_writes += 1
+            return
+        signature = self._signature(scope, params, collection, version)
+        key = self._key(signature, query)
+
+        try:
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.warning(f"Sonuç önbellek için serileştirilemedi: {str(e)}")
+            return
+
+        if not self._set_local(key, data, ttl, collection, signature, embedding, version):
+            self.stale_writes += 1
+            return
+
+        if self.redis is not None:
+            try:
+                self.redis.set(self._redis_key(key), data, ex=max(1, int(ttl)))
+            except Exception as e:
+                logger.warning(f"Önbellek Redis yazma hatası: {str(e)}")
+
+    def version(self, collection: str = DEFAULT_COLLECTION) -> int:
+        """
+        Koleksiyonun güncel sürümünü döndürür.
+
+        Sonuç hesaplanmadan önce okunup `get` ve `set` çağrılarına verilir.
+
+        Args:
+            collection: Koleksiyon adı
+
+        Returns:
+            int: Koleksiyon sürümü
+        """
+        return self._collection_version(collection)
+
+    def invalidate(self, collection: str = DEFAULT_COLLECTION) -> int:
+        """
+        Koleksiyona yazma sonrası koleksiyonun tüm sonuçlarını geçersiz kılar.
+
+        Süreç içi girdiler hemen silinir. Redis varsa paylaşılan koleksiyon
+        sürümü artırılır; diğer işçiler kendi girdilerini en geç
+        `version_refresh_interval` sonra kullanmayı bırakır.
+
+        Args:
+            collection: Yazılan koleksiyon
+
+        Returns:
+            int: Silinen süreç içi girdi sayısı
+        """
+        with self._lock:
+            version = self._versions.get(collection, 0) + 1
+            self._versions[collection] = version
+            keys = self._collection_keys.pop(collection, set())
+            for key in keys:
+                self._remove(key)
+            self.invalidations += 1
+
+        if self.redis is not None:
+            try:
+                remote = int(self.redis.incr(self._redis_version_key(collection)))
+                with self._lock:
+                    if remote > self._versions.get(collection, 0):
+                        self._versions[collection] = remote
+            except Exception as e:
+                logger.warning(f"Önbellek sürümü güncellenemedi: {str(e)}")
+
+        return len(keys)
+
+    def clear(self) -> None:
+        """Süreç içi tüm girdileri siler."""
+        with self._lock:
+            self._entries.clear()
+            self._collection_keys.clear()
+            self._semantic.clear()
+            self.memory_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Önbellek istatistiklerini döndürür.
+
+        Returns:
+            Dict[str, Any]: Sayaçlar ve boyutlar
+        """
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "memory_bytes": self.memory_bytes,
+            "max_entries": self.max_entries,
+            "max_memory_bytes": self.max_memory_bytes,
+            "hits": self.hits,
+            "semantic_hits": self.semantic_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "stale_writes": self.stale_writes,
+            "redis_enabled": self.redis is not None,
+            "semantic_enabled": self.semantic_enabled
+        }
+
+    def _signature(self, scope: str, params: Optional[Dict[str, Any]], collection: str, version: int) -> str:
+        """Sorgu metni dışındaki her şeyin özeti."""
+        raw = f"{scope}|{collection}|{version}|{self.canonicalize(params)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+    def _key(self, signature: str, query: str) -> str:
+        raw = f"{signature}|{self.normalize_query(query)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self.namespace}:result:{key}"
+
+    def _redis_version_key(self, collection: str) -> str:
+        return f"{self.namespace}:version:{collection}"
+
+    def _collection_version(self, collection: str) -> int:
+        """Koleksiyonun güncel sürümü; Redis'ten en fazla aralık başına bir kez okunur."""
+        version = self._versions.get(collection, 0)
+        if self.redis is None:
+            return version
+
+        now = time.monotonic()
+        if now - self._version_checked.get(collection, 0.0) < self.version_refresh_interval:
+            return version
+
+        try:
+            remote = self.redis.get(self._redis_version_key(collection))
+        except Exception as e:
+            logger.warning(f"Önbellek sürümü okunamadı: {str(e)}")
+            return version
+
+        self._version_checked[collection] = now
+        remote = int(remote) if remote is not None else 0
+        if remote > version:
+            # Başka bir işçi koleksiyona yazmış: süreç içi girdiler eskidi
+            with self._lock:
+                self._versions[collection] = remote
+                for key in self._collection_keys.pop(collection, set()):
+                    self._remove(key)
+            version = remote
+
+        return version
+
+    def _redis_ttl(self, key: str) -> int:
+        """Girdinin Redis'te kalan ömrü (bilinmiyorsa varsayılan TTL)."""
+        try:
+            remaining = self.redis.ttl(self._redis_key(key))
+        except Exception:
+            return self.ttl
+        return remaining if remaining and remaining > 0 else self.ttl
+
+    def _get_local(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            if entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                return None
+
+            self._entries.move_to_end(key)
+            return entry.data
+
+    def _get_similar(self, signature: str, embedding: np.ndarray) -> Optional[bytes]:
+        query = self._unit_vector(embedding)
+        if query is None:
+            return None
+
+        with self._lock:
+            bucket = self._semantic.get(signature)
+            if bucket is None or bucket.matrix.shape[1] != len(query):
+                return None
+
+            nearest = bucket.nearest(query)
+            if nearest is None or nearest[1] < self.semantic_threshold:
+                return None
+
+            return self._get_local(nearest[0])
+
+    def _set_local(
+        self,
+        key: str,
+        data: bytes,
+        ttl: float,
+        collection: str,
+        signature: str,
+        embedding: Optional[np.ndarray],
+        version: int
+    ) -> bool:
+        """Süreç içi girdiyi saklar; koleksiyon sürümü değişmişse False döndürür."""
+        size = len(data) + ENTRY_OVERHEAD_BYTES
+        if size > self.max_memory_bytes:
+            return True
+
+        with self._lock:
+            if self._versions.get(collection, 0) != version:
+                return False
+
+            self._remove(key)
+
+            self._entries[key] = _CacheEntry(data, time.monotonic() + ttl, collection, signature, size)
+            self._collection_keys.setdefault(collection, set()).add(key)
+            self.memory_bytes += size
+
+            if embedding is not None and self.semantic_enabled:
+                query = self._unit_vector(embedding)
+                if query is not None:
+                    bucket = self._semantic.get(signature)
+                    if bucket is None:
+                        bucket = self._semantic[signature] = _SemanticBucket(len(query), self.semantic_max_candidates)
+                    if bucket.matrix.shape[1] == len(query):
+                        bucket.add(key, query)
+
+            # Her iki sınır sağlanana kadar en uzun süredir kullanılmayanları çıkar
+            while len(self._entries) > self.max_entries or self.memory_bytes > self.max_memory_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+        return True
+
+    def _remove(self, key: str) -> None:
+        """Süreç içi girdiyi siler (lock altında çağrılmalıdır)."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+
+        self.memory_bytes -= entry.size
+        keys = self._collection_keys.get(entry.collection)
+        if keys is not None:
+            keys.discard(key)
+
+        bucket = self._semantic.get(entry.signature)
+        if bucket is not None:
+            bucket.remove(key)
+            if not bucket.rows:
+                del self._semantic[entry.signature]
+
+    @staticmethod
+    def _unit_vector(embedding: np.ndarray) -> Optional[np.ndarray]:
+        vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        norm = float(np.linalg.norm(vector))
+        if norm == 0.0:
+            return None
+        return vector / norm
+
+# Paylaşılan örnek
+_result_cache: Optional[ResultCache] = None
+_result_cache_config: Dict[str, Any] = {}
+_result_cache_lock = threading.Lock()
+
+def get_result_cache(**kwargs) -> ResultCache:
+    """
+    Paylaşılan sonuç önbelleğini döndürür.
+
+    İlk çağrıda verilen argümanlarla (ResultCache parametreleri ve
+    `use_redis`) oluşturulur. Sonraki çağrılar aynı örneği döndürür; ilk
+    çağrıdan farklı argüman verilirse yok sayıldıkları uyarı olarak loglanır.
+
+    Returns:
+        ResultCache: Paylaşılan önbellek
+    """
+    global _result_cache, _result_cache_config
+    with _result_cache_lock:
+        if _result_cache is not None:
+            differing = sorted(
+                key for key, value in kwargs.items()
+                if key not in _result_cache_config or _result_cache_config[key] != value
+            )
+            if differing:
+                logger.warning(
+                    f"Paylaşılan sonuç önbelleği zaten farklı ayarlarla oluşturuldu, "
+                    f"yok sayılan argümanlar: {differing}"
+                )
+        else:
+            _result_cache_config = dict(kwargs)
+            if kwargs.pop("use_redis", False) and kwargs.get("redis_client") is None:
+                try:
+                    from ModularMind.API.core.cache import RedisCache
+                    kwargs["redis_client"] = RedisCache.get_client()
+                except Exception as e:
+                    logger.error(f"Önbellek için Redis başlatılamadı: {str(e)}")
+            else:
+                kwargs.pop("use_redis", None)
+
+            _result_cache = ResultCache(**kwargs)
+        return _result_cache
@@ -0,0 +1,270 @@
+"""
+Satır kimlikleri için sıkıştırılmış bitmap.
+
+Roaring bitmap yaklaşımı: 32 bitlik satır kimliği üst 16 bite göre
+kaplara (container) bölünür. Seyrek kaplar sıralı uint16 dizisi, yoğun kaplar
+65536 bitlik (1024 x uint64) bit kümesi olarak tutulur. Küme işlemleri kap
+bazında numpy ile yapılır.
+"""
+
+import numpy as np
+from typing import Dict, Iterable, Optional
+
+# Bu eleman sayısının üzerindeki kaplar bit kümesine dönüştürülür
+ARRAY_CONTAINER_LIMIT = 4096
+
+_CONTAINER_BITS = 1 << 16
+
+def _array_to_bits(values: np.ndarray) -> np.ndarray:
+    """Sıralı uint16 dizisini 1024 x uint64 bit kümesine dönüştürür."""
+    dense = np.zeros(_CONTAINER_BITS, dtype=bool)
+    dense[values] = True
+    return np.packbits(dense, bitorder="little").view(np.uint64)
+
+def _bits_to_array(bits: np.ndarray) -> np.ndarray:
+    """Bit kümesini sıralı uint16 dizisine dönüştürür."""
+    return np.flatnonzero(np.unpackbits(bits.view(np.uint8), bitorder="little")).astype(np.uint16)
+
+def _cardinality(container: np.ndarray) -> int:
+    """Kaptaki eleman sayısı."""
+    if container.dtype == np.uint16:
+        return len(container)
+    return int(np.unpackbits(container.view(np.uint8)).sum())
+
+def _normalize(container: np.ndarray) -> Optional[np.ndarray]:
+    """Kabı boyutuna uygun gösterime çevirir; boşsa None döndürür."""
+    if container.dtype == np.uint16:
+        if len(container) == 0:
+            return None
+        if len(container) > ARRAY_CONTAINER_LIMIT:
+            return _array_to_bits(container)
+        return container
+
+    cardinality = _cardinality(container)
+    if cardinality == 0:
+        return None
+    if cardinality <= ARRAY_CONTAINER_LIMIT:
+        return _bits_to_array(container)
+    return container
+
+class RowBitmap:
+    """
+    Sıkıştırılmış satır kimliği kümesi.
+
+    &, | ve - (fark) işlemlerini, len() ile eleman sayısını ve `in` ile üyelik
+    kontrolünü destekler. Nesneler işlemlerde değiştirilmez; yalnızca add()
+    yerinde günceller.
+    """
+
+    __slots__ = ("containers",)
+
+    def __init__(self, containers: Optional[Dict[int, np.ndarray]] = None):
+        """
+        Args:
+            containers: Üst 16 bit -> kap eşlemesi
+        """
+        self.containers: Dict[int, np.ndarray] = containers or {}
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[int]) -> "RowBitmap":
+        """
+        Satır kimliklerinden bitmap oluşturur.
+
+        Args:
+            rows: Satır kimlikleri (sırasız ve tekrarlı olabilir)
+
+        Returns:
+            RowBitmap: Bitmap
+        """
+        rows = np.unique(np.asarray(rows if isinstance(rows, np.ndarray) else list(rows), dtype=np.int64))
+        if len(rows) == 0:
+            return cls()
+
+        highs = rows >> 16
+        boundaries = np.flatnonzero(np.diff(highs)) + 1
+        containers = {}
+        for chunk in np.split(rows, boundaries):
+            container = _normalize((chunk & 0xFFFF).astype(np.uint16))
+            containers[int(chunk[0] >> 16)] = container
+
+        return cls(containers)
+
+    @classmethod
+    def range(cls, count: int) -> "RowBitmap":
+        """
+        [0, count) aralığındaki tüm satırları içeren bitmap oluşturur.
+
+        Args:
+            count: Satır sayısı
+
+        Returns:
+            RowBitmap: Bitmap
+        """
+        return cls.from_rows(np.arange(count, dtype=np.int64))
+
+    def add(self, row: int) -> None:
+        """
+        Tek bir satır ekler (satırlar çoğunlukla artan sırada eklenir).
+
+        Args:
+            row: Satır kimliği
+        """
+        high, low = row >> 16, row & 0xFFFF
+        container = self.containers.get(high)
+
+        if container is None:
+            self.containers[high] = np.array([low], dtype=np.uint16)
+        elif container.dtype == np.uint16:
+            if container[-1] < low:
+                container = np.append(container, np.uint16(low))
+            else:
+                position = np.searchsorted(container, low)
+                if position < len(container) and container[position] == low:
+                    return
+                container = np.insert(container, position, np.uint16(low))
+            self.containers[high] = _normalize(container)
+        else:
+            container[low >> 6] |= np.uint64(1) << np.uint64(low & 63)
+
+    def delete_row(self, row: int) -> "RowBitmap":
+        """
+        Bir satırı çıkarır ve sonraki satırların kimliklerini birer azaltır.
+
+        Yalnızca silinen satırın kabı ve sonraki kaplar yeniden oluşturulur;
+        bitmap'te bu satırdan büyük kimlik yoksa aynı nesne döndürülür.
+
+        Args:
+            row: Silinen satır kimliği
+
+        Returns:
+            RowBitmap: Kaydırılmış bitmap
+        """
+        pivot = row >> 16
+        tail = sorted(high for high in self.containers if high >= pivot)
+        if not tail:
+            return self
+
+        rows = np.concatenate([
+            (container if container.dtype == np.uint16 else _bits_to_array(container)).astype(np.int64) + (high << 16)
+            for high, container in ((high, self.containers[high]) for high in tail)
+        ])
+        if rows[-1] < row:
+            return self
+
+        rows = rows[rows != row]
+        rows[rows > row] -= 1
+
+        containers = {high: container for high, container in self.containers.items() if high < pivot}
+        containers.update(RowBitmap.from_rows(rows).containers)
+        return RowBitmap(containers)
+
+    def to_rows(self) -> np.ndarray:
+        """
+        Satır kimliklerini artan sırada döndürür.
+
+        Returns:
+            np.ndarray: int64 satır kimlikleri
+        """
+        parts = []
+        for high in sorted(self.containers):
+            container = self.containers[high]
+            values = container if container.dtype == np.uint16 else _bits_to_array(container)
+            parts.append(values.astype(np.int64) + (high << 16))
+
+        if not parts:
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate(parts)
+
+    def contains_many(self, rows: np.ndarray) -> np.ndarray:
+        """
+        Birden fazla satırın üyeliğini kontrol eder.
+
+        Args:
+            rows: Satır kimlikleri
+
+        Returns:
+            np.ndarray: Üyelik maskesi
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        return np.isin(rows, self.to_rows(), assume_unique=False)
+
+    def __contains__(self, row: int) -> bool:
+        container = self.containers.get(row >> 16)
+        if container is None:
+            return False
+
+        low = row & 0xFFFF
+        if container.dtype == np.uint16:
+            position = np.searchsorted(container, low)
+            return bool(position < len(container) and container[position] == low)
+        return bool((container[low >> 6] >> np.uint64(low & 63)) & np.uint64(1))
+
+    def __len__(self) -> int:
+        return sum(_cardinality(container) for container in self.containers.values())
+
+    def __bool__(self) -> bool:
+        return bool(self.containers)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, RowBitmap) and np.array_equal(self.to_rows(), other.to_rows())
+
+    def __and__(self, other: "RowBitmap") -> "RowBitmap":
+        containers = {}
+        for high in self.containers.keys() & other.containers.keys():
+            left, right = self.containers[high], other.containers[high]
+            if left.dtype == np.uint16 and right.dtype == np.uint16:
+                result = np.intersect1d(left, right, assume_unique=True)
+            elif left.dtype == np.uint16:
+                result = left[_contains_in_bits(right, left)]
+            elif right.dtype == np.uint16:
+                result = right[_contains_in_bits(left, right)]
+            else:
+                result = left & right
+
+            result = _normalize(result)
+            if result is not None:
+                containers[high] = result
+        return RowBitmap(containers)
+
+    def __or__(self, other: "RowBitmap") -> "RowBitmap":
+        containers = dict(self.containers)
+        for high, right in other.containers.items():
+            left = containers.get(high)
+            if left is None:
+                containers[high] = right
+            elif left.dtype == np.uint16 and right.dtype == np.uint16:
+                containers[high] = _normalize(np.union1d(left, right).astype(np.uint16))
+            else:
+                left_bits = left if left.dtype == np.uint64 else _array_to_bits(left)
+                right_bits = right if right.dtype == np.uint64 else _array_to_bits(right)
+                containers[high] = left_bits | right_bits
+        return RowBitmap(containers)
+
+    def __sub__(self, other: "RowBitmap") -> "RowBitmap":
+        containers = {}
+        for high, left in self.containers.items():
+            right = other.containers.get(high)
+            if right is None:
+                containers[high] = left
+                continue
+
+            if left.dtype == np.uint16 and right.dtype == np.uint16:
+                result = np.setdiff1d(left, right, assume_unique=True).astype(np.uint16)
+            elif left.dtype == np.uint16:
+                result = left[~_contains_in_bits(right, left)]
+            else:
+                right_bits = right if right.dtype == np.uint64 else _array_to_bits(right)
+                result = left & ~right_bits
+
+            result = _normalize(result)
+            if result is not None:
+                containers[high] = result
+        return RowBitmap(containers)
+
+    def __repr__(self) -> str:
+        return f"RowBitmap(cardinality={len(self)}, containers={len(self.containers)})"
+
+def _contains_in_bits(bits: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """uint16 değerlerinin bit kümesinde olup olmadığını döndürür."""
+    words = bits[values >> 6]
+    return ((words >> (values & 63).astype(np.uint64)) & np.uint64(1)).astype(bool)
@@ -11,6 +11,8 @@ from ModularMind.API.services.retrieval.search_utils import (
     extract_keywords, score_text_for_keywords, combine_search_results, 
     check_metadata_filter
 )
+from ModularMind.API.services.retrieval.inverted_index import DEFAULT_KEYWORD_FIELDS
+from ModularMind.API.services.retrieval.row_bitmap import RowBitmap
 
 logger = logging.getLogger(__name__)
 
@@ -40,7 +42,7 @@ def vector_search(
     """
     with vector_store.lock:
         # Vektör kontrolü
-        if not vector_store.vectors:
+        if len(vector_store.vectors) == 0:
             logger.warning("Boş vektör deposu, arama sonucu bulunamadı")
             return []
         
@@ -55,10 +57,22 @@ def vector_search(
             # Harici indeks araması
             from ModularMind.API.services.retrieval.indices import search_external_index
             index_results = search_external_index(vector_store, query_vector, limit, filter_metadata)
+            matching_rows = None
         else:
-            # Dahili indeks araması
-            from ModularMind.API.services.retrieval.indices import search_internal_index
-            index_results = search_internal_index(vector_store, query_vector, limit, filter_metadata)
+            # Filtre bitmap'i varsa ön/son filtre planı uygulanır; sonuçlar filtreyi kesin karşılar
+            matching_rows = None
+            if filter_metadata:
+                from ModularMind.API.services.retrieval.metadata_index import get_filter_index
+                filter_index = get_filter_index(vector_store)
+                if filter_index is not None:
+                    matching_rows, selectivity = filter_index.estimate_selectivity(filter_metadata)
+            
+            if matching_rows is not None:
+                index_results = _filtered_index_search(vector_store, query_vector, limit, matching_rows, selectivity)
+            else:
+                # Dahili indeks araması
+                from ModularMind.API.services.retrieval.indices import search_internal_index
+                index_results = search_internal_index(vector_store, query_vector, limit, filter_metadata)
         
         # Sonuçların sayısını kontrol et
         if not index_results:
@@ -66,10 +80,11 @@ def vector_search(
         
         # SearchResult nesneleri oluştur
         search_results = []
+        filter_applied = matching_rows is not None
         
         for idx, score in index_results:
-            # Metadata filtresi varsa, sonuçları kontrol et
-            if filter_metadata and not check_metadata_filter(vector_store.metadata[idx], filter_metadata):
+            # Metadata filtresi bitmap ile uygulanmadıysa sonuçları kontrol et
+            if filter_metadata and not filter_applied and not check_metadata_filter(vector_store.metadata[idx], filter_metadata):
                 continue
             
             # Eşik değeri kontrolü
@@ -101,6 +116,117 @@ def vector_search(
         
         return search_results
 
+def _exact_scores(vector_store, query_vector: List[float], rows: np.ndarray) -> np.ndarray:
+    """
+    Verilen satırlar için benzerlik skorlarını tam olarak hesaplar.
+    
+    Skorlar indeks aramasıyla aynı ölçektedir (kosinüs: 1 - mesafe / 2,
+    öklid: e^(-mesafe²), dot: iç çarpım).
+    
+    Args:
+        vector_store: Vector store nesnesi
+        query_vector: Sorgu vektörü
+        rows: Satır indeksleri
+        
+    Returns:
+        np.ndarray: Satır sırasıyla skorlar
+    """
+    vectors = vector_store.vectors.array[rows]
+    query = np.asarray(query_vector, dtype=np.float32)
+    metric = vector_store.config.similarity_function
+    
+    if metric == "cosine":
+        norms = np.linalg.norm(vectors, axis=1) * np.linalg.norm(query)
+        similarities = (vectors @ query) / np.where(norms == 0, 1.0, norms)
+        return 1.0 - (1.0 - similarities) / 2.0
+    
+    if metric == "euclidean":
+        distances = np.sum((vectors - query) ** 2, axis=1)
+        return np.exp(-distances)
+    
+    return vectors @ query
+
+def _prefiltered_search(
+    vector_store,
+    query_vector: List[float],
+    limit: int,
+    matching_rows: RowBitmap
+) -> List[Tuple[int, float]]:
+    """
+    Ön filtre: yalnızca filtreyi karşılayan satırlar üzerinde tam tarama.
+    
+    Args:
+        vector_store: Vector store nesnesi
+        query_vector: Sorgu vektörü
+        limit: Maksimum sonuç sayısı
+        matching_rows: Filtreyi karşılayan satırlar
+        
+    Returns:
+        List[Tuple[int, float]]: Skora göre azalan (satır, skor) listesi
+    """
+    rows = matching_rows.to_rows()
+    if len(rows) == 0:
+        return []
+    
+    scores = _exact_scores(vector_store, query_vector, rows)
+    if len(rows) > limit:
+        top = np.argpartition(-scores, limit - 1)[:limit]
+    else:
+        top = np.arange(len(rows))
+    top = top[np.argsort(-scores[top], kind="stable")]
+    
+    return [(int(rows[i]), float(scores[i])) for i in top]
+
+def _filtered_index_search(
+    vector_store,
+    query_vector: List[float],
+    limit: int,
+    matching_rows: RowBitmap,
+    selectivity: float
+) -> List[Tuple[int, float]]:
+    """
+    Filtreli aramada ön filtre ile son filtre arasında seçim yapar.
+    
+    Seçici filtrelerde (az eşleşme) bitmap ile sınırlı tam tarama yapılır.
+    Geniş filtrelerde ANN indeksinden limit / seçicilik oranında fazla aday
+    çekilip bitmap ile süzülür; yeterli sonuç kalmazsa ön filtreye dönülür.
+    
+    Args:
+        vector_store: Vector store nesnesi
+        query_vector: Sorgu vektörü
+        limit: Maksimum sonuç sayısı
+        matching_rows: Filtreyi karşılayan satırlar
+        selectivity: Eşleşen satır oranı (0-1)
+        
+    Returns:
+        List[Tuple[int, float]]: (satır, skor) listesi
+    """
+    if not matching_rows or limit <= 0:
+        return []
+    
+    from ModularMind.API.services.retrieval.vector_models import IndexType
+    config = vector_store.config
+    total_rows = len(vector_store.ids)
+    
+    fetch = int(np.ceil(limit / selectivity * config.filter_overfetch_factor))
+    if (
+        config.index_type == IndexType.FLAT
+        or selectivity <= config.filter_prefilter_selectivity
+        or fetch >= total_rows
+    ):
+        return _prefiltered_search(vector_store, query_vector, limit, matching_rows)
+    
+    # Son filtre: ANN'den fazla aday çek, bitmap ile süz
+    from ModularMind.API.services.retrieval.indices import search_internal_index
+    index_results = search_internal_index(vector_store, query_vector, fetch, None)
+    filtered = [(idx, score) for idx, score in index_results if idx in matching_rows]
+    
+    if len(filtered) >= limit:
+        return filtered[:limit]
+    
+    logger.debug(f"Son filtre yetersiz ({len(filtered)}/{limit}), ön filtreye dönülüyor")
+    return _prefiltered_search(vector_store, query_vector, limit, matching_rows)
+
 def text_search(
     vector_store,
     query_text: str, 
@@ -246,7 +372,7 @@ def keyword_search(
     """
     # Arama alanları
     if not fields:
-        fields = ["text", "title", "description", "content"]
+        fields = list(DEFAULT_KEYWORD_FIELDS)
     
     with vector_store.lock:
         # Veri kontrolü
@@ -261,6 +387,11 @@ def keyword_search(
             logger.warning("Anahtar kelime bulunamadı")
             return []
         
+        # Ters indeks istenen alanları kapsıyorsa BM25 ile ara
+        keyword_index = getattr(vector_store, "keyword_index", None)
+        if keyword_index is not None and len(keyword_index) > 0 and set(fields) <= set(DEFAULT_KEYWORD_FIELDS):
+            return _indexed_keyword_search(vector_store, keyword_index, keywords, limit, filter_metadata)
+        
         # Chunk'ları puanla
         scores = []
         
@@ -328,6 +459,60 @@ def keyword_search(
         
         return search_results
 
+def _indexed_keyword_search(
+    vector_store,
+    keyword_index,
+    keywords: List[str],
+    limit: int,
+    filter_metadata: Optional[Dict[str, Any]] = None
+) -> List[SearchResult]:
+    """
+    Ters indeks üzerinden BM25 anahtar kelime araması yapar.
+    
+    Skorlar, sorgunun ulaşabileceği en yüksek BM25 değerine bölünerek 0-1
+    aralığına getirilir (sıralama değişmez, hibrit birleştirme için ölçek korunur).
+    
+    Args:
+        vector_store: Vector store nesnesi
+        keyword_index: Ters indeks
+        keywords: Sorgu anahtar kelimeleri
+        limit: Maksimum sonuç sayısı
+        filter_metadata: Metadata filtresi
+        
+    Returns:
+        List[SearchResult]: Arama sonuçları
+    """
+    candidate_filter = None
+    if filter_metadata:
+        def candidate_filter(chunk_id: str) -> bool:
+            idx = vector_store.id_to_index.get(chunk_id)
+            return idx is not None and check_metadata_filter(vector_store.metadata[idx], filter_metadata)
+    
+    hits = keyword_index.search(keywords, limit=limit, candidate_filter=candidate_filter)
+    
+    max_score = sum(keyword_index.max_term_score(term) for term in set(keywords)) or 1.0
+    
+    search_results = []
+    for chunk_id, score in hits:
+        idx = vector_store.id_to_index.get(chunk_id)
+        if idx is None:
+            continue
+        
+        chunk = Chunk(
+            id=chunk_id,
+            text="",  # Metin daha sonra ayrıca yüklenecek
+            metadata=vector_store.metadata[idx] or {},
+            embedding=None,
+        )
+        
+        search_results.append(SearchResult(
+            chunk=chunk,
+            score=min(score / max_score, 1.0),
+            source="keyword_search"
+        ))
+    
+    return search_results
+
 def metadata_search(
     vector_store,
     filter_metadata: Dict[str, Any], 
@@ -350,22 +535,19 @@ def metadata_search(
             logger.warning("Boş veri deposu, arama sonucu bulunamadı")
             return []
         
-        # Metadata indeksi yoksa veya NONE ise tüm chunk'ları kontrol et
-        from ModularMind.API.services.retrieval.vector_models import MetadataIndexType
-        if vector_store.config.metadata_index_type == MetadataIndexType.NONE or not vector_store.metadata_index:
-            # Chunk'ları filtrele
+        # Metadata indeksi varsa filtre bitmap'i ile eşleşen satırları bul
+        from ModularMind.API.services.retrieval.metadata_index import filter_rows
+        matching_rows = filter_rows(vector_store, filter_metadata)
+        
+        if matching_rows is None:
+            # İndeksleme kapalı: tüm chunk'ları kontrol et
             matching_indices = []
             
             for idx, metadata in enumerate(vector_store.metadata):
                 if check_metadata_filter(metadata, filter_metadata):
                     matching_indices.append(idx)
         else:
-            # Metadata indeksini kullan
-            from ModularMind.API.services.retrieval.metadata_index import search_metadata_index
-            matching_ids = search_metadata_index(vector_store, filter_metadata)
-            
-            # ID'leri indekslere dönüştür
-            matching_indices = [vector_store.id_to_index[chunk_id] for chunk_id in matching_ids if chunk_id in vector_store.id_to_index]
+            matching_indices = matching_rows.to_rows().tolist()
         
         # Limit uygula
         matching_indices = matching_indices[:limit]
@@ -4,6 +4,7 @@ Anahtar kelime tabanlı arama işlemleri.
 
 import re
 import logging
+from collections import Counter
 from typing import Dict, List, Any, Optional, Union
 
 from ..base import BaseSearcher, SearchResult
@@ -57,6 +58,11 @@ class KeywordSearcher(BaseSearcher):
                 logger.warning("Anahtar kelimeler çıkarılamadı")
                 return []
             
+            # Ters indeks varsa BM25 ile doğrudan ara
+            keyword_index = getattr(self.vector_store, "keyword_index", None)
+            if keyword_index is not None and len(keyword_index) > 0:
+                return self._search_index(keyword_index, query, limit, filter_metadata, include_metadata)
+            
             # Vektör deposunda metin araması yap
             results = self.vector_store.search_by_text(
                 keywords,
@@ -111,9 +117,67 @@ class KeywordSearcher(BaseSearcher):
         # Anahtar kelimeleri bir araya getir
         return " ".join(keywords)
     
+    def _search_index(
+        self,
+        keyword_index,
+        query: str,
+        limit: int,
+        filter_metadata: Optional[Dict[str, Any]],
+        include_metadata: bool
+    ) -> List[SearchResult]:
+        """
+        Vektör deposunun ters indeksinde BM25 araması yapar
+        
+        Args:
+            keyword_index: Ters indeks
+            query: Arama sorgusu
+            limit: Sonuç limiti
+            filter_metadata: Meta veri filtresi
+            include_metadata: Meta verileri dahil et
+            
+        Returns:
+            List[SearchResult]: Arama sonuçları
+        """
+        from ..search_utils import check_metadata_filter
+        
+        id_to_index = self.vector_store.id_to_index
+        metadata_store = self.vector_store.metadata
+        
+        candidate_filter = None
+        if filter_metadata:
+            def candidate_filter(chunk_id: str) -> bool:
+                idx = id_to_index.get(chunk_id)
+                return idx is not None and check_metadata_filter(metadata_store[idx], filter_metadata)
+        
+        terms = keyword_index.analyze(query)
+        hits = keyword_index.search(terms, limit=limit, candidate_filter=candidate_filter)
+        
+        # Skoru sorgunun ulaşabileceği en yüksek BM25 değerine göre 0-1 aralığına getir
+        max_score = sum(keyword_index.max_term_score(term) for term in set(terms)) or 1.0
+        
+        search_results = []
+        for chunk_id, score in hits:
+            idx = id_to_index.get(chunk_id)
+            metadata = (metadata_store[idx] or {}) if idx is not None else {}
+            
+            search_results.append(SearchResult(
+                chunk_id=chunk_id,
+                document_id=metadata.get("document_id"),
+                text=metadata.get("text", ""),
+                score=min(score / max_score, 1.0),
+                metadata=metadata if include_metadata else None,
+                source="keyword"
+            ))
+        
+        return search_results
+    
     def calculate_bm25_score(self, query_terms: List[str], document: str) -> float:
         """
-        BM25 skor hesaplaması yapar (basitleştirilmiş)
+        BM25 skor hesaplaması yapar
+        
+        Vektör deposunun ters indeksi varsa IDF ve ortalama belge uzunluğu
+        korpus istatistiklerinden alınır; yoksa IDF 1 kabul edilir ve uzunluk
+        normalizasyonu uygulanmaz.
         
         Args:
             query_terms: Sorgu terimleri
@@ -126,31 +190,39 @@ class KeywordSearcher(BaseSearcher):
         k1 = 1.5  # Terim frekansı için ayar parametresi
         b = 0.75  # Belge uzunluğu normalizasyonu için ayar parametresi
         
-        # Belge terimlerini al
+        # Belge terimlerini tek geçişte say
         document_terms = self._extract_keywords(document).split()
+        term_counts = Counter(document_terms)
         
         # Belge uzunluğu
         doc_length = len(document_terms)
         
-        # Ortalama belge uzunluğu (gerçek uygulamada tüm belgelerin ortalaması alınmalı)
-        avg_doc_length = 100
+        keyword_index = getattr(self.vector_store, "keyword_index", None)
+        has_stats = keyword_index is not None and len(keyword_index) > 0
+        
+        if has_stats:
+            k1, b = keyword_index.k1, keyword_index.b
+        
+        # Ortalama belge uzunluğu (korpus istatistiği yoksa normalizasyon yok)
+        avg_doc_length = keyword_index.avg_doc_length if has_stats else doc_length
+        length_ratio = doc_length / avg_doc_length if avg_doc_length else 1.0
         
         # BM25 skoru
         score = 0.0
         
-        for term in query_terms:
+        for term in set(query_terms):
             # Terim frekansı
-            term_freq = document_terms.count(term)
+            term_freq = term_counts.get(term, 0)
             
             if term_freq > 0:
-                # IDF (gerçek uygulamada tüm belgelere göre hesaplanmalı)
-                idf = 1.0
+                # IDF
+                idf = keyword_index.idf(term) if has_stats else 1.0
                 
                 # BM25 formülü
                 numerator = term_freq * (k1 + 1)
-                denominator = term_freq + k1 * (1 - b + b * (doc_length / avg_doc_length))
+                denominator = term_freq + k1 * (1 - b + b * length_ratio)
                 
                 term_score = idf * (numerator / denominator)
                 score += term_score
         
-        return score
\ No newline at end of file
+        return score
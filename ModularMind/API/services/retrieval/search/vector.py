@@ -150,19 +150,18 @@ class VectorSearcher(BaseSearcher):
                 logger.error("Sorgu embedding'leri oluşturulamadı")
                 return [[] for _ in queries]
             
-            # Her sorgu için arama yap
+            # Tüm sorgular için tek bir toplu arama yap
+            batch_results = self.vector_store.search_by_vectors(
+                query_embeddings,
+                limit=limit,
+                filter_metadata=filter_metadata,
+                include_metadata=include_metadata,
+                embedding_model=embedding_model
+            )
+            
+            # Sonuçları SearchResult nesnelerine dönüştür
             all_results = []
-            for i, query_embedding in enumerate(query_embeddings):
-                # Vektör deposunda benzer belgeler ara
-                results = self.vector_store.search_by_vector(
-                    query_embedding,
-                    limit=limit,
-                    filter_metadata=filter_metadata,
-                    include_metadata=include_metadata,
-                    embedding_model=embedding_model
-                )
-                
-                # Sonuçları SearchResult nesnelerine dönüştür
+            for results in batch_results:
                 search_results = []
                 for result in results:
                     search_result = SearchResult(
@@ -3,7 +3,8 @@ Vector Store arama yardımcı fonksiyonları.
 """
 
 import re
-from typing import List, Dict, Any, Optional, Set
+from datetime import date, datetime, timezone
+from typing import List, Dict, Any, Optional, Set, Tuple
 import numpy as np
 
 def extract_keywords(query: str) -> List[str]:
@@ -164,8 +165,19 @@ def check_metadata_filter(
         return False
     
     for key, value in filter_metadata.items():
+        # Mantıksal operatörler
+        if key == "$and":
+            if not all(check_metadata_filter(metadata, sub_filter) for sub_filter in value):
+                return False
+        elif key == "$or":
+            if not any(check_metadata_filter(metadata, sub_filter) for sub_filter in value):
+                return False
+        elif key == "$not":
+            if check_metadata_filter(metadata, value):
+                return False
+        
         # İç içe alanları işle (örn: "metadata.author")
-        if "." in key:
+        elif "." in key:
             parts = key.split(".")
             current = metadata
             
@@ -199,6 +211,9 @@ def _match_filter_value(actual_value: Any, filter_value: Any) -> bool:
     """
     Gerçek değerin filtre değerine uyup uymadığını kontrol eder.
     
+    Operatör sözlüğündeki tüm operatörler sağlanmalıdır (örn.
+    {"$gte": 1, "$lt": 5}).
+    
     Args:
         actual_value: Gerçek değer
         filter_value: Filtre değeri
@@ -211,23 +226,24 @@ def _match_filter_value(actual_value: Any, filter_value: Any) -> bool:
         # Özel operatörler
         for op, val in filter_value.items():
             if op == "$eq":
-                return actual_value == val
+                matched = actual_value == val
             elif op == "$ne":
-                return actual_value != val
-            elif op == "$gt":
-                return _is_numeric(actual_value) and actual_value > val
-            elif op == "$gte":
-                return _is_numeric(actual_value) and actual_value >= val
-            elif op == "$lt":
-                return _is_numeric(actual_value) and actual_value < val
-            elif op == "$lte":
-                return _is_numeric(actual_value) and actual_value <= val
+                matched = actual_value != val
+            elif op in ("$gt", "$gte", "$lt", "$lte"):
+                matched = _compare_sortable(actual_value, op, val)
             elif op == "$in":
-                return actual_value in val if isinstance(val, (list, tuple, set)) else False
+                matched = actual_value in val if isinstance(val, (list, tuple, set)) else False
             elif op == "$nin":
-                return actual_value not in val if isinstance(val, (list, tuple, set)) else True
+                matched = actual_value not in val if isinstance(val, (list, tuple, set)) else True
             elif op == "$regex":
-                return bool(re.search(val, str(actual_value))) if isinstance(actual_value, str) else False
+                matched = bool(re.search(val, actual_value)) if isinstance(actual_value, str) else False
+            else:
+                matched = False
+            
+            if not matched:
+                return False
+        
+        return True
     
     # Liste filtresi (herhangi biri eşleşiyorsa)
     elif isinstance(filter_value, list):
@@ -237,6 +253,69 @@ def _match_filter_value(actual_value: Any, filter_value: Any) -> bool:
     else:
         return actual_value == filter_value
 
+def _compare_sortable(actual_value: Any, op: str, bound: Any) -> bool:
+    """
+    Aralık operatörünü sayısal veya tarih değerleri için uygular.
+    
+    Args:
+        actual_value: Gerçek değer
+        op: $gt, $gte, $lt veya $lte
+        bound: Sınır değeri
+        
+    Returns:
+        bool: Uygunluk durumu (farklı türler karşılaştırılamaz)
+    """
+    actual = sortable_value(actual_value)
+    limit = sortable_value(bound)
+    if actual is None or limit is None or actual[0] != limit[0]:
+        return False
+    
+    if op == "$gt":
+        return actual[1] > limit[1]
+    if op == "$gte":
+        return actual[1] >= limit[1]
+    if op == "$lt":
+        return actual[1] < limit[1]
+    return actual[1] <= limit[1]
+
+_ISO_DATE_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}")
+
+def sortable_value(value: Any) -> Optional[Tuple[str, float]]:
+    """
+    Değeri aralık karşılaştırması için (tür, sayı) çiftine dönüştürür.
+    
+    Sayılar "number", datetime/date nesneleri ve ISO 8601 tarih metinleri
+    "timestamp" (UTC epoch saniyesi) türündedir. Saat dilimi olmayan
+    tarihler UTC kabul edilir.
+    
+    Args:
+        value: Metadata değeri
+        
+    Returns:
+        Optional[Tuple[str, float]]: (tür, sayı) veya karşılaştırılamıyorsa None
+    """
+    if _is_numeric(value):
+        number = float(value)
+        return None if np.isnan(number) else ("number", number)
+    
+    if isinstance(value, str):
+        if not _ISO_DATE_PATTERN.match(value):
+            return None
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return ("timestamp", value.timestamp())
+    
+    if isinstance(value, date):
+        return ("timestamp", datetime(value.year, value.month, value.day, tzinfo=timezone.utc).timestamp())
+    
+    return None
+
 def _is_numeric(value: Any) -> bool:
     """
     Değerin sayısal olup olmadığını kontrol eder.
@@ -15,6 +15,7 @@ from .search.vector import VectorSearcher
 from .search.keyword import KeywordSearcher
 from .ranking.reranker import Reranker
 from .chunking.base import Document, Chunk
+from .result_cache import get_result_cache
 
 logger = logging.getLogger(__name__)
 
@@ -178,6 +179,10 @@ class RetrievalService:
             # Belgeyi ekle
             doc_id = self.vector_store.add_document(doc, options)
             
+            # Önbellekteki arama sonuçları artık koleksiyonu yansıtmıyor
+            if doc_id:
+                get_result_cache().invalidate()
+            
             return doc_id
         except Exception as e:
             logger.error(f"Belge ekleme hatası: {str(e)}")
@@ -242,7 +247,13 @@ class RetrievalService:
             bool: Silme başarılı mı
         """
         try:
-            return self.vector_store.delete_document(document_id)
+            deleted = self.vector_store.delete_document(document_id)
+            
+            # Önbellekteki arama sonuçları artık koleksiyonu yansıtmıyor
+            if deleted:
+                get_result_cache().invalidate()
+            
+            return deleted
         except Exception as e:
             logger.error(f"Belge silme hatası: {str(e)}")
             return False
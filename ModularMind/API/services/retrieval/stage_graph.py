@@ -0,0 +1,220 @@
+"""
+Bağımlılık grafı olarak tanımlanan pipeline aşamalarını eşzamanlı çalıştıran modül.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Executor, Future, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Callable, Set
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class StageNode:
+    """Graf içindeki tek bir aşama."""
+    name: str
+    func: Callable[[Dict[str, Any]], Any]
+    depends_on: List[str] = field(default_factory=list)
+    timeout_seconds: Optional[float] = None
+    default: Any = None
+
+@dataclass
+class StageGraphResult:
+    """Graf çalıştırmasının sonucu."""
+    results: Dict[str, Any] = field(default_factory=dict)
+    timings: Dict[str, float] = field(default_factory=dict)
+    timed_out: Set[str] = field(default_factory=set)
+    failed: Set[str] = field(default_factory=set)
+    skipped: Set[str] = field(default_factory=set)
+    early_exit: bool = False
+    elapsed: float = 0.0
+
+class AbandonedStages:
+    """
+    Süresi dolduğu için beklenmeden bırakılan ama hâlâ çalışan aşamaları izler.
+
+    Python iş parçacıkları dışarıdan durdurulamadığından bırakılan aşama
+    executor'daki iş parçacığını bitene kadar meşgul eder. Aynı executor'ı
+    paylaşan çalıştırmalar bu nesneyi paylaşır; sınır dolduğunda yeni
+    aşamalar başlatılmaz ve havuz takılan aşamalarla tamamen tükenmez.
+    """
+
+    def __init__(self, limit: int):
+        """
+        Args:
+            limit: Aynı anda çalışmasına izin verilen en fazla bırakılmış aşama sayısı
+        """
+        self.limit = limit
+        self._futures: Set[Future] = set()
+        self._lock = threading.Lock()
+
+    def add(self, future: Future) -> None:
+        """Bekleyen aşamayı iptal eder; çoktan başlamışsa bitene kadar izler."""
+        if future.cancel():
+            return
+
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(self._discard)
+
+    def _discard(self, future: Future) -> None:
+        with self._lock:
+            self._futures.discard(future)
+
+    @property
+    def count(self) -> int:
+        """Hâlâ çalışan bırakılmış aşama sayısı."""
+        with self._lock:
+            return len(self._futures)
+
+    @property
+    def saturated(self) -> bool:
+        """Bırakılmış aşama sayısı sınıra ulaştıysa True."""
+        return self.count >= self.limit
+
+class StageGraph:
+    """
+    Aşamaları bağımlılıkları tamamlanır tamamlanmaz bir executor üzerinde çalıştırır.
+
+    Bağımsız aşamalar paralel yürüdüğünden toplam süre aşamaların toplamı
+    yerine kritik yolun süresine yaklaşır. Süresi dolan veya hata veren
+    aşamanın sonucu varsayılan değeri olur ve bağımlı aşamalar bu değerle
+    devam eder. Toplam bütçe dolduğunda veya erken çıkış koşulu sağlandığında
+    henüz bitmemiş aşamalar beklenmez.
+    """
+
+    def __init__(self):
+        self.nodes: Dict[str, StageNode] = {}
+
+    def add_stage(
+        self,
+        name: str,
+        func: Callable[[Dict[str, Any]], Any],
+        depends_on: Optional[List[str]] = None,
+        timeout_seconds: Optional[float] = None,
+        default: Any = None
+    ) -> None:
+        """
+        Grafa aşama ekler.
+
+        Args:
+            name: Aşama adı
+            func: Bağımlılıkların sonuçlarını (ad -> sonuç) alıp aşama sonucunu döndüren fonksiyon
+            depends_on: Önce tamamlanması gereken aşamalar
+            timeout_seconds: Aşama başına süre sınırı (None = yalnızca toplam bütçe)
+            default: Zaman aşımı veya hata durumunda kullanılacak sonuç
+        """
+        depends_on = list(depends_on or [])
+        for dependency in depends_on:
+            if dependency not in self.nodes:
+                raise ValueError(f"Bilinmeyen bağımlılık: {name} -> {dependency}")
+
+        self.nodes[name] = StageNode(name, func, depends_on, timeout_seconds, default)
+
+    def run(
+        self,
+        executor: Executor,
+        budget_seconds: Optional[float] = None,
+        early_exit: Optional[Callable[[str, Dict[str, Any]], bool]] = None,
+        abandoned: Optional[AbandonedStages] = None
+    ) -> StageGraphResult:
+        """
+        Grafı çalıştırır.
+
+        Args:
+            executor: Aşamaların çalışacağı executor
+            budget_seconds: Uçtan uca süre bütçesi (None = sınırsız)
+            early_exit: (biten aşama, sonuçlar) -> True ise kalan aşamalar atlanır
+            abandoned: Executor'ı paylaşan çalıştırmalar arasında bırakılmış
+                aşamaları izleyen nesne; sınır doluysa aşamalar başlatılmadan
+                varsayılan değerle atlanır
+
+        Returns:
+            StageGraphResult: Aşama sonuçları ve süre bilgileri
+        """
+        start_time = time.monotonic()
+        deadline = start_time + budget_seconds if budget_seconds else None
+
+        outcome = StageGraphResult()
+        pending = dict(self.nodes)
+        running: Dict[Future, StageNode] = {}
+        started: Dict[str, float] = {}
+        stage_deadlines: Dict[str, float] = {}
+
+        while pending or running:
+            # Bağımlılıkları tamamlanan aşamaları başlat
+            for name, node in list(pending.items()):
+                if all(dependency in outcome.results for dependency in node.depends_on):
+                    del pending[name]
+                    if abandoned is not None and abandoned.saturated:
+                        logger.warning(f"Bırakılmış aşama sınırı dolu, aşama atlandı: {name}")
+                        outcome.skipped.add(name)
+                        outcome.results[name] = node.default
+                        continue
+                    inputs = {dependency: outcome.results[dependency] for dependency in node.depends_on}
+                    started[name] = time.monotonic()
+                    if node.timeout_seconds:
+                        stage_deadlines[name] = started[name] + node.timeout_seconds
+                    running[executor.submit(node.func, inputs)] = node
+
+            if not running:
+                break
+
+            # En yakın süre sınırına kadar bekle
+            limits = [stage_deadlines[node.name] for node in running.values() if node.name in stage_deadlines]
+            if deadline is not None:
+                limits.append(deadline)
+            timeout = max(0.0, min(limits) - time.monotonic()) if limits else None
+
+            done, _ = wait(list(running), timeout=timeout, return_when=FIRST_COMPLETED)
+            now = time.monotonic()
+            finished = []
+
+            for future in done:
+                node = running.pop(future)
+                finished.append(node.name)
+                outcome.timings[node.name] = now - started[node.name]
+                try:
+                    outcome.results[node.name] = future.result()
+                except Exception as e:
+                    logger.error(f"Aşama hatası ({node.name}): {str(e)}")
+                    outcome.failed.add(node.name)
+                    outcome.results[node.name] = node.default
+
+            # Süresi dolan aşamaları beklemeden varsayılan değerle tamamla
+            budget_exhausted = deadline is not None and now >= deadline
+            for future, node in list(running.items()):
+                if budget_exhausted or now >= stage_deadlines.get(node.name, float("inf")):
+                    self._abandon(future, abandoned)
+                    del running[future]
+                    logger.warning(f"Aşama zaman aşımına uğradı: {node.name}")
+                    outcome.timed_out.add(node.name)
+                    outcome.timings[node.name] = now - started[node.name]
+                    outcome.results[node.name] = node.default
+
+            if budget_exhausted:
+                break
+
+            if early_exit is not None and any(early_exit(name, outcome.results) for name in finished):
+                outcome.early_exit = True
+                break
+
+        # Başlatılmamış veya beklenmeyen aşamalar varsayılan değeri alır
+        for node in list(pending.values()) + list(running.values()):
+            outcome.skipped.add(node.name)
+            outcome.results[node.name] = node.default
+        for future in running:
+            self._abandon(future, abandoned)
+
+        outcome.elapsed = time.monotonic() - start_time
+        return outcome
+
+    @staticmethod
+    def _abandon(future: Future, abandoned: Optional[AbandonedStages]) -> None:
+        """Beklenmeyecek aşamayı iptal eder veya bırakılmış olarak kaydeder."""
+        if abandoned is not None:
+            abandoned.add(future)
+        else:
+            future.cancel()
@@ -11,12 +11,35 @@ import sqlite3
 import numpy as np
 from typing import List, Dict, Any, Optional, Tuple
 
+from ModularMind.API.services.retrieval.vector_columns import (
+    VectorColumn, IdColumn, MetadataColumns
+)
+
 logger = logging.getLogger(__name__)
 
+# Disk segment formatı sürümü
+SEGMENT_FORMAT_VERSION = 2
+
+MANIFEST_FILE = "manifest.json"
+WAL_FILE = "wal.jsonl"
+SEGMENTS_DIR = "segments"
+KEYWORD_INDEX_FILE = "keyword_index.pkl"
+HNSW_INDEX_FILE = "hnsw_index.bin"
+
 def save_to_disk(vector_store) -> bool:
     """
     Vector store'u diske kaydeder.
     
+    Koleksiyon, bellek eşlemeli (mmap) vektör segmentleri, her segmentin
+    ID/metadata dosyası ve ekleme/silmeleri sırasıyla kaydeden yalnızca-ekleme
+    bir log (WAL) olarak saklanır. Normal kayıtta yalnızca son kayıttan bu
+    yana değişen satırlar yeni bir segmente yazılır; segment sayısı veya
+    silinmiş satır oranı eşiği aştığında koleksiyon tek segmente birleştirilir.
+    
+    Anahtar kelime indeksinin terim frekansları segment satırlarıyla birlikte
+    yazılır. HNSW grafiği parça parça yazılamadığından yalnızca birleştirmede
+    kaydedilir; sonraki segmentlerdeki satırlar yüklemede indekse eklenir.
+    
     Args:
         vector_store: Vector store nesnesi
         
@@ -32,42 +55,31 @@ def save_to_disk(vector_store) -> bool:
         
         # Koleksiyon dizini
         collection_dir = os.path.join(storage_path, vector_store.collection_name)
-        os.makedirs(collection_dir, exist_ok=True)
+        os.makedirs(os.path.join(collection_dir, SEGMENTS_DIR), exist_ok=True)
         
-        # Vektörler
-        vectors_path = os.path.join(collection_dir, "vectors.npy")
-        np.save(vectors_path, np.array(vector_store.vectors, dtype=np.float32))
+        manifest = _read_manifest(collection_dir)
         
-        # ID'ler
-        ids_path = os.path.join(collection_dir, "ids.pkl")
-        with open(ids_path, "wb") as f:
-            pickle.dump(vector_store.ids, f)
+        # Eski tam anahtar kelime indeksi dosyası varsa koleksiyon bir kez birleştirilerek taşınır
+        legacy_keyword_index = os.path.exists(os.path.join(collection_dir, KEYWORD_INDEX_FILE))
         
-        # Metadata
-        metadata_path = os.path.join(collection_dir, "metadata.pkl")
-        with open(metadata_path, "wb") as f:
-            pickle.dump(vector_store.metadata, f)
+        if manifest is None or legacy_keyword_index or _needs_compaction(vector_store, manifest):
+            manifest = _write_compacted_segments(vector_store, collection_dir)
+        else:
+            manifest = _append_changed_segment(vector_store, collection_dir, manifest)
         
-        # ID -> indeks eşlemesi
-        id_to_index_path = os.path.join(collection_dir, "id_to_index.pkl")
-        with open(id_to_index_path, "wb") as f:
-            pickle.dump(vector_store.id_to_index, f)
+        keyword_index = getattr(vector_store, "keyword_index", None)
+        if keyword_index is not None:
+            manifest["keyword_index"] = {"k1": keyword_index.k1, "b": keyword_index.b}
         
-        # Metadata indeksi
-        metadata_index_path = os.path.join(collection_dir, "metadata_index.pkl")
-        with open(metadata_index_path, "wb") as f:
-            pickle.dump(vector_store.metadata_index, f)
+        _write_json_atomic(os.path.join(collection_dir, MANIFEST_FILE), manifest)
         
         # Koleksiyon istatistikleri
         stats_path = os.path.join(collection_dir, "stats.json")
-        with open(stats_path, "w") as f:
-            json.dump(vector_store.collection_stats, f, indent=2)
+        _write_json_atomic(stats_path, vector_store.collection_stats)
         
-        # İndeksi kaydet (indeks tipine bağlı)
-        from ModularMind.API.services.retrieval.vector_models import IndexType
-        if vector_store.config.index_type == IndexType.HNSW and vector_store.index:
-            index_path = os.path.join(collection_dir, "hnsw_index.bin")
-            vector_store.index.save_index(index_path)
+        # Değişiklik kümelerini temizle
+        vector_store.pending_upserts = set()
+        vector_store.pending_deletes = set()
         
         # Son kayıt zamanını güncelle
         vector_store.last_saved = time.time()
@@ -86,6 +98,11 @@ def load_from_disk(vector_store) -> bool:
     """
     Vector store'u diskten yükler.
     
+    Segment formatında WAL baştan oynatılır. Koleksiyon tek bir segmentten
+    oluşuyorsa vektör matrisi kopyalanmadan np.memmap olarak kullanılır; böylece
+    açılış neredeyse anlıktır ve aynı koleksiyonu açan işçi süreçleri sayfa
+    önbelleğindeki tek kopyayı paylaşır. Eski (pickle tabanlı) format da okunur.
+    
     Args:
         vector_store: Vector store nesnesi
         
@@ -105,118 +122,527 @@ def load_from_disk(vector_store) -> bool:
             logger.warning(f"Koleksiyon dizini bulunamadı: {collection_dir}")
             return False
         
-        # Vektörler
-        vectors_path = os.path.join(collection_dir, "vectors.npy")
-        if os.path.exists(vectors_path):
-            vector_store.vectors = np.load(vectors_path).tolist()
-        else:
-            logger.warning(f"Vektör dosyası bulunamadı: {vectors_path}")
-            return False
+        manifest = _read_manifest(collection_dir)
+        if manifest is None:
+            # Eski format
+            return _load_legacy_disk(vector_store, collection_dir)
         
-        # ID'ler
-        ids_path = os.path.join(collection_dir, "ids.pkl")
-        if os.path.exists(ids_path):
-            with open(ids_path, "rb") as f:
-                vector_store.ids = pickle.load(f)
-        else:
-            logger.warning(f"ID dosyası bulunamadı: {ids_path}")
+        if manifest.get("format_version") != SEGMENT_FORMAT_VERSION:
+            logger.error(f"Desteklenmeyen segment formatı sürümü: {manifest.get('format_version')}")
             return False
         
-        # Metadata
-        metadata_path = os.path.join(collection_dir, "metadata.pkl")
-        if os.path.exists(metadata_path):
-            with open(metadata_path, "rb") as f:
-                vector_store.metadata = pickle.load(f)
-        else:
-            logger.warning(f"Metadata dosyası bulunamadı: {metadata_path}")
+        replay = _load_segments(vector_store, collection_dir, manifest)
+        if replay is None:
             return False
         
-        # ID -> indeks eşlemesi
-        id_to_index_path = os.path.join(collection_dir, "id_to_index.pkl")
-        if os.path.exists(id_to_index_path):
-            with open(id_to_index_path, "rb") as f:
-                vector_store.id_to_index = pickle.load(f)
-        else:
-            # Yeniden oluştur
-            vector_store.id_to_index = {chunk_id: idx for idx, chunk_id in enumerate(vector_store.ids)}
-        
-        # Metadata indeksi
-        metadata_index_path = os.path.join(collection_dir, "metadata_index.pkl")
-        if os.path.exists(metadata_index_path):
-            with open(metadata_index_path, "rb") as f:
-                vector_store.metadata_index = pickle.load(f)
-        else:
-            # Yeniden oluştur
-            from ModularMind.API.services.retrieval.metadata_index import build_metadata_index
-            build_metadata_index(vector_store)
-        
-        # Koleksiyon istatistikleri
-        stats_path = os.path.join(collection_dir, "stats.json")
-        if os.path.exists(stats_path):
-            with open(stats_path, "r") as f:
-                vector_store.collection_stats = json.load(f)
-        else:
-            # Yeniden hesapla
-            vector_store.collection_stats = {
-                "total_chunks": len(vector_store.ids),
-                "total_documents": len(set(m.get("document_id") for m in vector_store.metadata if m and "document_id" in m)),
-                "dimensions": vector_store.config.dimensions,
-                "size_bytes": 0,
-                "creation_time": time.time(),
-                "last_update": time.time()
-            }
-        
-        # İndeksi yükle (indeks tipine bağlı)
-        from ModularMind.API.services.retrieval.vector_models import IndexType
-        if vector_store.config.index_type == IndexType.HNSW:
-            try:
-                import hnswlib
-                index_path = os.path.join(collection_dir, "hnsw_index.bin")
-                
-                if os.path.exists(index_path):
-                    # İndeksi yeni oluştur
-                    index = hnswlib.Index(space=vector_store.config.similarity_function, dim=vector_store.config.dimensions)
-                    
-                    # Yükleme için maksimum eleman sayısını belirle
-                    index.load_index(index_path, max_elements=len(vector_store.vectors))
-                    
-                    # Arama parametresini ayarla
-                    index.set_ef(vector_store.config.hnsw_ef_search)
-                    
-                    vector_store.index = index
-                else:
-                    # Disk indeksi yoksa bellek indeksi oluştur
-                    from ModularMind.API.services.retrieval.indices import _initialize_hnsw_index, _update_hnsw_index
-                    
-                    # İndeksi başlat
-                    _initialize_hnsw_index(vector_store)
-                    
-                    # Vektörleri ekle
-                    _update_hnsw_index(vector_store, vector_store.vectors, list(range(len(vector_store.vectors))))
-            except Exception as e:
-                logger.error(f"HNSW indeksi yükleme hatası: {str(e)}", exc_info=True)
-                
-                # Düz indekse geri dön
-                vector_store.config.index_type = IndexType.FLAT
-                vector_store.index = None
-        else:
-            # Diğer indeks tipleri için yeniden oluştur
-            from ModularMind.API.services.retrieval.indices import _rebuild_index
-            _rebuild_index(vector_store)
+        vector_store.id_to_index = {chunk_id: idx for idx, chunk_id in enumerate(vector_store.ids)}
         
-        # Son kayıt zamanını güncelle
-        vector_store.last_saved = time.time()
+        # Metadata indeksini sütunlardan yeniden oluştur
+        from ModularMind.API.services.retrieval.metadata_index import build_metadata_index
+        build_metadata_index(vector_store)
         
-        # Değişiklik bayrağını temizle
-        vector_store.is_dirty = False
+        _finish_disk_load(vector_store, collection_dir, replay)
         
-        logger.info(f"Vector store diskten yüklendi: {collection_dir}")
+        logger.info(f"Vector store diskten yüklendi: {collection_dir} ({len(vector_store.ids)} chunk)")
         return True
         
     except Exception as e:
         logger.error(f"Diskten yükleme hatası: {str(e)}", exc_info=True)
         return False
 
+def _read_manifest(collection_dir: str) -> Optional[Dict[str, Any]]:
+    """
+    Koleksiyon manifest dosyasını okur.
+    
+    Args:
+        collection_dir: Koleksiyon dizini
+        
+    Returns:
+        Optional[Dict[str, Any]]: Manifest veya segment formatı yoksa None
+    """
+    manifest_path = os.path.join(collection_dir, MANIFEST_FILE)
+    if not os.path.exists(manifest_path) or not os.path.exists(os.path.join(collection_dir, WAL_FILE)):
+        return None
+    
+    with open(manifest_path, "r") as f:
+        return json.load(f)
+
+def _write_json_atomic(path: str, data: Any) -> None:
+    """JSON dosyasını geçici dosya üzerinden atomik olarak yazar."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2, default=str)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def _needs_compaction(vector_store, manifest: Dict[str, Any]) -> bool:
+    """
+    Segmentlerin tek segmente birleştirilmesi gerekip gerekmediğini belirler.
+    
+    Args:
+        vector_store: Vector store nesnesi
+        manifest: Mevcut manifest
+        
+    Returns:
+        bool: Birleştirme gerekiyorsa True
+    """
+    segment_count = manifest.get("segment_count", 0) + (1 if vector_store.pending_upserts else 0)
+    if segment_count > vector_store.config.max_segments:
+        return True
+    
+    # Güncellenen satırların eski sürümleri de silinmiş satır sayılır
+    dead_rows = manifest.get("dead_rows", 0) + len(vector_store.pending_deletes) + len(vector_store.pending_upserts)
+    stored_rows = manifest.get("stored_rows", 0) + len(vector_store.pending_upserts)
+    
+    return dead_rows > vector_store.config.compaction_deleted_ratio * max(1, stored_rows)
+
+def _next_segment_name(collection_dir: str) -> str:
+    """Segment dizinindeki en büyük numaradan sonraki segment adını döndürür."""
+    numbers = [
+        int(name[4:10])
+        for name in os.listdir(os.path.join(collection_dir, SEGMENTS_DIR))
+        if name.startswith("seg_") and name[4:10].isdigit()
+    ]
+    return f"seg_{max(numbers, default=0) + 1:06d}"
+
+def _write_segment(
+    collection_dir: str,
+    name: str,
+    vectors: np.ndarray,
+    ids: List[str],
+    metadata: List[Dict[str, Any]],
+    keyword_index=None
+) -> None:
+    """
+    Bir segmenti (vektör matrisi + ID/metadata satırları) diske yazar.
+    
+    Args:
+        collection_dir: Koleksiyon dizini
+        name: Segment adı
+        vectors: Vektör matrisi (float32)
+        ids: Chunk ID'leri
+        metadata: Metadata satırları
+        keyword_index: Satırların terim frekanslarının alınacağı ters indeks (isteğe bağlı)
+    """
+    segment_base = os.path.join(collection_dir, SEGMENTS_DIR, name)
+    
+    # Vektörler: np.load(mmap_mode="r") ile açılabilen .npy
+    with open(f"{segment_base}.npy.tmp", "wb") as f:
+        np.save(f, np.ascontiguousarray(vectors, dtype=np.float32))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(f"{segment_base}.npy.tmp", f"{segment_base}.npy")
+    
+    # ID, metadata ve (varsa) terim frekansları: satır başına bir JSON kaydı
+    with open(f"{segment_base}.jsonl.tmp", "w") as f:
+        for chunk_id, row_metadata in zip(ids, metadata):
+            row = [chunk_id, row_metadata or {}]
+            if keyword_index is not None:
+                row.append(keyword_index.term_counts(chunk_id))
+            f.write(json.dumps(row, default=str))
+            f.write("\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(f"{segment_base}.jsonl.tmp", f"{segment_base}.jsonl")
+
+def _append_wal(collection_dir: str, records: List[Dict[str, Any]]) -> None:
+    """WAL dosyasına kayıt ekler ve diske zorlar."""
+    with open(os.path.join(collection_dir, WAL_FILE), "a") as f:
+        for record in records:
+            f.write(json.dumps(record))
+            f.write("\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+def _append_changed_segment(vector_store, collection_dir: str, manifest: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Son kayıttan bu yana değişen satırları yeni bir segmente yazar ve WAL'a ekler.
+    
+    Args:
+        vector_store: Vector store nesnesi
+        collection_dir: Koleksiyon dizini
+        manifest: Mevcut manifest
+        
+    Returns:
+        Dict[str, Any]: Güncellenmiş manifest
+    """
+    records = []
+    
+    # Silmeler segmentten önce yazılır; aynı ID yeniden eklendiyse segment onu geri getirir
+    if vector_store.pending_deletes:
+        records.append({"op": "delete", "ids": sorted(vector_store.pending_deletes)})
+    
+    rows = sorted(
+        vector_store.id_to_index[chunk_id]
+        for chunk_id in vector_store.pending_upserts
+        if chunk_id in vector_store.id_to_index
+    )
+    
+    if rows:
+        name = _next_segment_name(collection_dir)
+        _write_segment(
+            collection_dir,
+            name,
+            vector_store.vectors.array[rows],
+            [vector_store.ids[row] for row in rows],
+            [vector_store.metadata[row] for row in rows],
+            getattr(vector_store, "keyword_index", None)
+        )
+        records.append({"op": "segment", "name": name, "rows": len(rows)})
+    
+    # Segment dosyası diske yazıldıktan sonra WAL'a eklenir (çökme güvenliği)
+    if records:
+        _append_wal(collection_dir, records)
+    
+    manifest = dict(manifest)
+    manifest["segment_count"] = manifest.get("segment_count", 0) + (1 if rows else 0)
+    manifest["stored_rows"] = manifest.get("stored_rows", 0) + len(rows)
+    manifest["dead_rows"] = manifest.get("dead_rows", 0) + len(vector_store.pending_deletes) + len(rows)
+    manifest["live_rows"] = len(vector_store.ids)
+    manifest["updated_at"] = time.time()
+    return manifest
+
+def _write_compacted_segments(vector_store, collection_dir: str) -> Dict[str, Any]:
+    """
+    Tüm koleksiyonu tek bir segment olarak yazar ve WAL'ı atomik olarak değiştirir.
+    
+    Args:
+        vector_store: Vector store nesnesi
+        collection_dir: Koleksiyon dizini
+        
+    Returns:
+        Dict[str, Any]: Yeni manifest
+    """
+    name = _next_segment_name(collection_dir)
+    row_count = len(vector_store.ids)
+    
+    _write_segment(
+        collection_dir,
+        name,
+        vector_store.vectors.array,
+        vector_store.ids.tolist(),
+        vector_store.metadata.tolist(),
+        getattr(vector_store, "keyword_index", None)
+    )
+    
+    # HNSW grafiği bu segmentin satır sırasıyla etiketlidir; yalnızca burada yazılır
+    from ModularMind.API.services.retrieval.vector_models import IndexType
+    hnsw_segment = None
+    if vector_store.config.index_type == IndexType.HNSW and vector_store.index:
+        index_path = os.path.join(collection_dir, HNSW_INDEX_FILE)
+        vector_store.index.save_index(f"{index_path}.tmp")
+        os.replace(f"{index_path}.tmp", index_path)
+        hnsw_segment = name
+    
+    # Yeni WAL yalnızca birleştirilmiş segmenti içerir
+    wal_path = os.path.join(collection_dir, WAL_FILE)
+    with open(f"{wal_path}.tmp", "w") as f:
+        f.write(json.dumps({"op": "segment", "name": name, "rows": row_count}))
+        f.write("\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(f"{wal_path}.tmp", wal_path)
+    
+    # Artık referans verilmeyen segmentleri temizle
+    segments_dir = os.path.join(collection_dir, SEGMENTS_DIR)
+    for file_name in os.listdir(segments_dir):
+        if not file_name.startswith(f"{name}."):
+            try:
+                os.remove(os.path.join(segments_dir, file_name))
+            except OSError as e:
+                # Diğer süreçler eski segmentleri hâlâ eşlemiş olabilir
+                logger.warning(f"Eski segment silinemedi: {file_name}: {str(e)}")
+    
+    # Eski formattan geçişte pickle dosyalarını kaldır
+    for legacy_file in ("vectors.npy", "ids.pkl", "metadata.pkl", "id_to_index.pkl", "metadata_index.pkl", KEYWORD_INDEX_FILE):
+        legacy_path = os.path.join(collection_dir, legacy_file)
+        if os.path.exists(legacy_path):
+            os.remove(legacy_path)
+    
+    logger.info(f"Vector store segmentleri birleştirildi: {name} ({row_count} satır)")
+    
+    return {
+        "format_version": SEGMENT_FORMAT_VERSION,
+        "dimensions": vector_store.config.dimensions,
+        "segment_count": 1,
+        "stored_rows": row_count,
+        "dead_rows": 0,
+        "live_rows": row_count,
+        "hnsw_segment": hnsw_segment,
+        "updated_at": time.time()
+    }
+
+def _read_wal(collection_dir: str) -> List[Dict[str, Any]]:
+    """
+    WAL kayıtlarını okur; yarım yazılmış son satır yok sayılır.
+    
+    Args:
+        collection_dir: Koleksiyon dizini
+        
+    Returns:
+        List[Dict[str, Any]]: WAL kayıtları
+    """
+    records = []
+    with open(os.path.join(collection_dir, WAL_FILE), "r") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                logger.warning(f"WAL satır {line_number} okunamadı, sonraki kayıtlar yok sayılıyor")
+                break
+    return records
+
+def _load_segments(vector_store, collection_dir: str, manifest: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    WAL'ı oynatarak segmentleri sütunlara yükler.
+    
+    Satırlar bellekteki sırayla yüklenir: güncellenen satır yerinde kalır,
+    yeni (veya silinip yeniden eklenen) satırlar sona eklenir. Böylece
+    birleştirmede kaydedilen HNSW etiketleri satır konumlarıyla eşleşir.
+    
+    Args:
+        vector_store: Vector store nesnesi
+        collection_dir: Koleksiyon dizini
+        manifest: Koleksiyon manifesti
+        
+    Returns:
+        Optional[Dict[str, Any]]: İndeks yüklemesi için oynatma bilgisi
+            (`index_rows`: kayıtlı HNSW grafiğine eklenecek/güncellenecek satırlar,
+            grafik kullanılamıyorsa None), hata durumunda None
+    """
+    mmap_mode = "r" if vector_store.config.use_mmap else None
+    
+    segment_names = []     # Segment sırasıyla adlar
+    segment_vectors = []   # Segment sırasıyla vektör matrisleri
+    segment_rows = []      # Segment sırasıyla [chunk_id, metadata, terimler?] satırları
+    live = {}              # chunk_id -> (segment, satır); son yazılan kazanır
+    position = {}          # chunk_id -> ilk yazıldığı (segment, satır); satır sırasını belirler
+    
+    for record in _read_wal(collection_dir):
+        if record.get("op") == "segment":
+            segment_base = os.path.join(collection_dir, SEGMENTS_DIR, record["name"])
+            if not os.path.exists(f"{segment_base}.npy") or not os.path.exists(f"{segment_base}.jsonl"):
+                logger.error(f"Segment dosyası bulunamadı: {record['name']}")
+                return None
+            
+            vectors = np.load(f"{segment_base}.npy", mmap_mode=mmap_mode)
+            with open(f"{segment_base}.jsonl", "r") as f:
+                rows = [json.loads(line) for line in f if line.strip()]
+            
+            segment = len(segment_vectors)
+            segment_names.append(record["name"])
+            segment_vectors.append(vectors)
+            segment_rows.append(rows)
+            for row, entry in enumerate(rows):
+                live[entry[0]] = (segment, row)
+                position.setdefault(entry[0], (segment, row))
+        
+        elif record.get("op") == "delete":
+            for chunk_id in record.get("ids", []):
+                live.pop(chunk_id, None)
+                position.pop(chunk_id, None)
+    
+    order = sorted(live, key=position.__getitem__)
+    sources = [live[chunk_id] for chunk_id in order]
+    
+    ids = []
+    metadata = []
+    for segment, row in sources:
+        chunk_id, row_metadata = segment_rows[segment][row][:2]
+        ids.append(chunk_id)
+        metadata.append(row_metadata)
+    
+    if sources and len(segment_vectors[sources[0][0]]) == len(sources) and all(
+        source == (sources[0][0], row) for row, source in enumerate(sources)
+    ):
+        # Tek, eksiksiz ve sıralı segment: kopyalamadan (mmap) kullan
+        vectors = segment_vectors[sources[0][0]]
+    else:
+        vectors = np.zeros((len(sources), vector_store.config.dimensions), dtype=np.float32)
+        by_segment: Dict[int, Tuple[List[int], List[int]]] = {}
+        for target, (segment, row) in enumerate(sources):
+            targets, rows = by_segment.setdefault(segment, ([], []))
+            targets.append(target)
+            rows.append(row)
+        for segment, (targets, rows) in by_segment.items():
+            vectors[targets] = segment_vectors[segment][rows]
+    
+    vector_store.vectors = VectorColumn.from_array(vectors)
+    vector_store.ids = IdColumn(ids)
+    vector_store.metadata = MetadataColumns(metadata)
+    vector_store.pending_upserts = set()
+    vector_store.pending_deletes = set()
+    
+    # Terim frekansları yazılmışsa anahtar kelime indeksi segmentlerden kurulur
+    keyword_index = None
+    if any(len(segment_rows[segment][row]) > 2 for segment, row in sources):
+        from ModularMind.API.services.retrieval.inverted_index import InvertedIndex
+        params = manifest.get("keyword_index") or {}
+        keyword_index = InvertedIndex(k1=params.get("k1", 1.5), b=params.get("b", 0.75))
+        for chunk_id, (segment, row) in zip(ids, sources):
+            entry = segment_rows[segment][row]
+            if len(entry) > 2 and entry[2] is not None:
+                keyword_index.add_term_counts(chunk_id, entry[2])
+        vector_store.keyword_index = keyword_index
+    
+    # Kayıtlı HNSW grafiği ilk (birleştirilmiş) segmentin satırlarıyla etiketlidir.
+    # O segmentten satır silinmediyse etiketler hâlâ satır konumlarıdır; yalnızca
+    # sonraki segmentlerden gelen satırların eklenmesi/güncellenmesi yeterlidir.
+    index_rows = None
+    if segment_names and manifest.get("hnsw_segment") == segment_names[0]:
+        base_rows = sum(1 for segment, _ in position.values() if segment == 0)
+        if base_rows == len(segment_rows[0]):
+            index_rows = [target for target, (segment, _) in enumerate(sources) if segment != 0]
+    
+    return {"index_rows": index_rows, "keyword_index": keyword_index is not None}
+
+def _load_legacy_disk(vector_store, collection_dir: str) -> bool:
+    """
+    Eski (vectors.npy + pickle) disk formatını yükler.
+    
+    Bir sonraki kayıt koleksiyonu segment formatına dönüştürür.
+    
+    Args:
+        vector_store: Vector store nesnesi
+        collection_dir: Koleksiyon dizini
+        
+    Returns:
+        bool: Başarı durumu
+    """
+    # Vektörler
+    vectors_path = os.path.join(collection_dir, "vectors.npy")
+    if os.path.exists(vectors_path):
+        vector_store.vectors = VectorColumn.from_array(np.load(vectors_path))
+    else:
+        logger.warning(f"Vektör dosyası bulunamadı: {vectors_path}")
+        return False
+    
+    # ID'ler
+    ids_path = os.path.join(collection_dir, "ids.pkl")
+    if os.path.exists(ids_path):
+        with open(ids_path, "rb") as f:
+            vector_store.ids = IdColumn(pickle.load(f))
+    else:
+        logger.warning(f"ID dosyası bulunamadı: {ids_path}")
+        return False
+    
+    # Metadata
+    metadata_path = os.path.join(collection_dir, "metadata.pkl")
+    if os.path.exists(metadata_path):
+        with open(metadata_path, "rb") as f:
+            vector_store.metadata = MetadataColumns(pickle.load(f))
+    else:
+        logger.warning(f"Metadata dosyası bulunamadı: {metadata_path}")
+        return False
+    
+    # ID -> indeks eşlemesi
+    id_to_index_path = os.path.join(collection_dir, "id_to_index.pkl")
+    if os.path.exists(id_to_index_path):
+        with open(id_to_index_path, "rb") as f:
+            vector_store.id_to_index = pickle.load(f)
+    else:
+        # Yeniden oluştur
+        vector_store.id_to_index = {chunk_id: idx for idx, chunk_id in enumerate(vector_store.ids)}
+    
+    # Metadata indeksi (eski pickle biçimi kümeler tuttuğundan her zaman yeniden oluşturulur)
+    from ModularMind.API.services.retrieval.metadata_index import build_metadata_index
+    build_metadata_index(vector_store)
+    
+    vector_store.pending_upserts = set()
+    vector_store.pending_deletes = set()
+    
+    # Eski formatta HNSW grafiği her kayıtta bellekteki etiketlerle yazılırdı
+    _finish_disk_load(vector_store, collection_dir, {"index_rows": [], "keyword_index": False})
+    
+    logger.info(f"Vector store diskten yüklendi (eski format): {collection_dir}")
+    return True
+
+def _finish_disk_load(vector_store, collection_dir: str, replay: Dict[str, Any]) -> None:
+    """
+    Diskten yüklemenin ortak son adımları: istatistikler ve vektör indeksi.
+    
+    Args:
+        vector_store: Vector store nesnesi
+        collection_dir: Koleksiyon dizini
+        replay: Segment oynatma bilgisi (bkz. _load_segments)
+    """
+    # Koleksiyon istatistikleri
+    stats_path = os.path.join(collection_dir, "stats.json")
+    if os.path.exists(stats_path):
+        with open(stats_path, "r") as f:
+            vector_store.collection_stats = json.load(f)
+    else:
+        # Yeniden hesapla
+        vector_store.collection_stats = {
+            "total_chunks": len(vector_store.ids),
+            "total_documents": len(set(d for d in vector_store.metadata.column("document_id") if d is not None)),
+            "dimensions": vector_store.config.dimensions,
+            "size_bytes": 0,
+            "creation_time": time.time(),
+            "last_update": time.time()
+        }
+    
+    # Anahtar kelime ters indeksi (segmentlerden kurulmadıysa eski tam dosyadan)
+    keyword_index_path = os.path.join(collection_dir, KEYWORD_INDEX_FILE)
+    if not replay.get("keyword_index"):
+        if os.path.exists(keyword_index_path):
+            from ModularMind.API.services.retrieval.inverted_index import InvertedIndex
+            with open(keyword_index_path, "rb") as f:
+                vector_store.keyword_index = InvertedIndex.from_dict(pickle.load(f))
+        elif getattr(vector_store, "keyword_index", None) is not None:
+            # Metinler diskte olmadığından yeniden oluşturulamaz; arama metadata taramasına döner
+            vector_store.keyword_index.clear()
+            logger.warning(f"Anahtar kelime indeksi bulunamadı: {keyword_index_path}")
+    
+    # İndeksi yükle (indeks tipine bağlı)
+    from ModularMind.API.services.retrieval.vector_models import IndexType
+    if vector_store.config.index_type == IndexType.HNSW:
+        try:
+            import hnswlib
+            index_path = os.path.join(collection_dir, HNSW_INDEX_FILE)
+            index_rows = replay.get("index_rows")
+            
+            index = hnswlib.Index(space=vector_store.config.similarity_function, dim=vector_store.config.dimensions)
+            if index_rows is not None and os.path.exists(index_path):
+                # Kayıtlı grafiği yükle; birleştirmeden sonra yazılan satırları ekle/güncelle
+                index.load_index(index_path, max_elements=max(1, len(vector_store.vectors)))
+                if index_rows:
+                    index.add_items(vector_store.vectors.array[index_rows], index_rows)
+            else:
+                # Kayıtlı grafik yok veya satır konumları değişti: yüklenen satırlardan yeniden kur
+                index.init_index(
+                    max_elements=max(1, len(vector_store.vectors)),
+                    ef_construction=vector_store.config.hnsw_ef_construction,
+                    M=vector_store.config.hnsw_m
+                )
+                if len(vector_store.vectors):
+                    index.add_items(vector_store.vectors.array, np.arange(len(vector_store.vectors)))
+            
+            # Arama parametresini ayarla
+            index.set_ef(vector_store.config.hnsw_ef_search)
+            
+            vector_store.index = index
+        except Exception as e:
+            logger.error(f"HNSW indeksi yükleme hatası: {str(e)}", exc_info=True)
+            
+            # Düz indekse geri dön
+            vector_store.config.index_type = IndexType.FLAT
+            vector_store.index = None
+    else:
+        # Diğer indeks tipleri için yeniden oluştur
+        from ModularMind.API.services.retrieval.indices_init import _rebuild_index
+        _rebuild_index(vector_store)
+    
+    # Son kayıt zamanını güncelle
+    vector_store.last_saved = time.time()
+    
+    # Değişiklik bayrağını temizle
+    vector_store.is_dirty = False
+
 def save_to_sqlite(vector_store) -> bool:
     """
     Vector store'u SQLite veritabanına kaydeder.
@@ -267,12 +693,11 @@ def save_to_sqlite(vector_store) -> bool:
         # Verileri ekle
         for idx, chunk_id in enumerate(vector_store.ids):
             vector_bytes = pickle.dumps(vector_store.vectors[idx])
-            metadata_json = json.dumps(vector_store.metadata[idx] or {})
+            metadata = vector_store.metadata[idx] or {}
+            metadata_json = json.dumps(metadata)
             
             # Belge ID'sini al
-            document_id = None
-            if vector_store.metadata[idx] and "document_id" in vector_store.metadata[idx]:
-                document_id = vector_store.metadata[idx]["document_id"]
+            document_id = metadata.get("document_id")
             
             # Vektörü ekle
             cursor.execute(
@@ -366,25 +791,13 @@ def load_from_sqlite(vector_store) -> bool:
         cursor.execute("SELECT id, vector, metadata, document_id, chunk_index FROM vectors ORDER BY chunk_index")
         rows = cursor.fetchall()
         
-        # Veri yapılarını temizle
-        vector_store.vectors = []
-        vector_store.ids = []
-        vector_store.metadata = []
-        vector_store.id_to_index = {}
-        
-        # Verileri işle
-        for idx, (chunk_id, vector_bytes, metadata_json, document_id, chunk_index) in enumerate(rows):
-            # Vektörü çöz
-            vector = pickle.loads(vector_bytes)
-            
-            # Metadata'yı çöz
-            metadata = json.loads(metadata_json)
-            
-            # Veri yapılarını güncelle
-            vector_store.vectors.append(vector)
-            vector_store.ids.append(chunk_id)
-            vector_store.metadata.append(metadata)
-            vector_store.id_to_index[chunk_id] = idx
+        # Verileri çöz ve sütunlara toplu yükle
+        chunk_ids = [row[0] for row in rows]
+        vector_store.vectors = VectorColumn(vector_store.config.dimensions, capacity=max(1, len(rows)))
+        vector_store.vectors.extend([pickle.loads(row[1]) for row in rows])
+        vector_store.ids = IdColumn(chunk_ids)
+        vector_store.metadata = MetadataColumns(json.loads(row[2]) for row in rows)
+        vector_store.id_to_index = {chunk_id: idx for idx, chunk_id in enumerate(chunk_ids)}
         
         # Bağlantıyı kapat
         conn.close()
@@ -394,7 +807,7 @@ def load_from_sqlite(vector_store) -> bool:
         build_metadata_index(vector_store)
         
         # İndeksi yeniden oluştur
-        from ModularMind.API.services.retrieval.indices import _rebuild_index
+        from ModularMind.API.services.retrieval.indices_init import _rebuild_index
         _rebuild_index(vector_store)
         
         # Son kayıt zamanını güncelle
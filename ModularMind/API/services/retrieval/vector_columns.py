@@ -0,0 +1,418 @@
+"""
+Vector Store sütunsal veri yapıları.
+
+Vektörler büyüyebilen bir float32 matriste, chunk ID'leri dizi tabanlı bir
+sütunda ve metadata alan bazlı ayrı sütunlarda tutulur. Sınıflar mevcut
+kodun kullandığı liste arayüzünü (append, indeksleme, del, len) korur.
+"""
+
+import logging
+import numpy as np
+from typing import List, Dict, Any, Optional, Iterator, Iterable
+
+logger = logging.getLogger(__name__)
+
+# Metadata sütunlarında değeri olmayan hücreler için işaretçi
+_MISSING = object()
+
+def _grow_capacity(current: int, required: int) -> int:
+    """Gerekli boyutu karşılayan ikinin katı kapasiteyi hesaplar."""
+    capacity = max(1, current)
+    while capacity < required:
+        capacity *= 2
+    return capacity
+
+class VectorColumn:
+    """
+    Büyüyebilen, bitişik float32 vektör matrisi.
+
+    Kapasite ikiye katlanarak büyür; yalnızca ilk len(self) satır geçerlidir.
+    """
+
+    def __init__(self, dimensions: int, capacity: int = 1024):
+        """
+        Args:
+            dimensions: Vektör boyutu
+            capacity: Başlangıç kapasitesi
+        """
+        self.dimensions = dimensions
+        self._data = np.zeros((max(1, capacity), dimensions), dtype=np.float32)
+        self._size = 0
+
+    @classmethod
+    def from_array(cls, array: np.ndarray) -> "VectorColumn":
+        """
+        Mevcut bir matristen sütun oluşturur (kopyalamadan).
+
+        Args:
+            array: (n x dimensions) vektör matrisi
+
+        Returns:
+            VectorColumn: Sütun
+        """
+        array = np.asarray(array, dtype=np.float32)
+        if array.ndim != 2:
+            array = array.reshape(len(array), -1)
+
+        column = cls(array.shape[1], capacity=1)
+        column._data = array
+        column._size = len(array)
+        return column
+
+    @property
+    def array(self) -> np.ndarray:
+        """Geçerli satırların (kopyasız) görünümü."""
+        return self._data[:self._size]
+
+    @property
+    def nbytes(self) -> int:
+        """Geçerli satırların bellek kullanımı."""
+        return self._size * self.dimensions * 4
+
+    def _reserve(self, required: int) -> None:
+        """Kapasiteyi gerekirse büyütür."""
+        if required <= len(self._data) and self._data.flags.writeable:
+            return
+
+        capacity = _grow_capacity(len(self._data), required)
+        data = np.zeros((capacity, self.dimensions), dtype=np.float32)
+        data[:self._size] = self._data[:self._size]
+        self._data = data
+
+    def append(self, vector: Iterable[float]) -> None:
+        """Tek bir vektör ekler."""
+        self._reserve(self._size + 1)
+        self._data[self._size] = vector
+        self._size += 1
+
+    def extend(self, vectors: Iterable[Iterable[float]]) -> None:
+        """Birden fazla vektörü tek kopyalamayla ekler."""
+        block = np.asarray(vectors, dtype=np.float32)
+        if block.size == 0:
+            return
+        block = block.reshape(-1, self.dimensions)
+
+        self._reserve(self._size + len(block))
+        self._data[self._size:self._size + len(block)] = block
+        self._size += len(block)
+
+    def clear(self) -> None:
+        """Tüm vektörleri kaldırır (kapasite korunur)."""
+        self._size = 0
+
+    def tolist(self) -> List[List[float]]:
+        """Vektörleri Python listesine dönüştürür."""
+        return self.array.tolist()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        return iter(self.array)
+
+    def __getitem__(self, index):
+        return self.array[index]
+
+    def __setitem__(self, index, vector) -> None:
+        if not self._data.flags.writeable:
+            self._reserve(self._size)
+        self.array[index] = vector
+
+    def __delitem__(self, index: int) -> None:
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("vektör indeksi aralık dışında")
+        if not self._data.flags.writeable:
+            self._reserve(self._size)
+
+        # Sonraki satırları yerinde kaydır (yeniden ayırma yok)
+        self._data[index:self._size - 1] = self._data[index + 1:self._size]
+        self._size -= 1
+
+    def __array__(self, dtype=None, copy=None):
+        return self.array if dtype is None else self.array.astype(dtype)
+
+class IdColumn:
+    """Büyüyebilen, dizi tabanlı chunk ID sütunu."""
+
+    def __init__(self, ids: Optional[Iterable[str]] = None, capacity: int = 1024):
+        """
+        Args:
+            ids: Başlangıç ID'leri
+            capacity: Başlangıç kapasitesi
+        """
+        self._data = np.empty(max(1, capacity), dtype=object)
+        self._size = 0
+        if ids is not None:
+            self.extend(ids)
+
+    @property
+    def array(self) -> np.ndarray:
+        """Geçerli ID'lerin (kopyasız) görünümü."""
+        return self._data[:self._size]
+
+    def _reserve(self, required: int) -> None:
+        """Kapasiteyi gerekirse büyütür."""
+        if required <= len(self._data):
+            return
+
+        data = np.empty(_grow_capacity(len(self._data), required), dtype=object)
+        data[:self._size] = self._data[:self._size]
+        self._data = data
+
+    def append(self, chunk_id: str) -> None:
+        """Tek bir ID ekler."""
+        self._reserve(self._size + 1)
+        self._data[self._size] = chunk_id
+        self._size += 1
+
+    def extend(self, chunk_ids: Iterable[str]) -> None:
+        """Birden fazla ID ekler."""
+        chunk_ids = list(chunk_ids)
+        self._reserve(self._size + len(chunk_ids))
+        self._data[self._size:self._size + len(chunk_ids)] = chunk_ids
+        self._size += len(chunk_ids)
+
+    def clear(self) -> None:
+        """Tüm ID'leri kaldırır."""
+        self._data[:self._size] = None
+        self._size = 0
+
+    def tolist(self) -> List[str]:
+        """ID'leri Python listesine dönüştürür."""
+        return self.array.tolist()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.array)
+
+    def __getitem__(self, index):
+        result = self.array[index]
+        return result.tolist() if isinstance(result, np.ndarray) else result
+
+    def __setitem__(self, index: int, chunk_id: str) -> None:
+        self.array[index] = chunk_id
+
+    def __delitem__(self, index: int) -> None:
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("ID indeksi aralık dışında")
+
+        self._data[index:self._size - 1] = self._data[index + 1:self._size]
+        self._size -= 1
+        self._data[self._size] = None
+
+class MetadataRow(dict):
+    """
+    Bir metadata satırının sözlük görünümü.
+
+    Okumalar anlık kopya üzerinden yapılır; değişiklikler (atama, silme,
+    update...) satırın sütunlarına da yazılır. Böylece eski liste
+    arayüzündeki `metadata[i]["k"] = v` kullanımı çalışmaya devam eder.
+    Satırlar silme veya satır değiştirme ile yer değiştirdikten sonra eski
+    görünüm üzerinden yazmak hata verir.
+    """
+
+    __slots__ = ("_owner", "_index", "_layout")
+
+    def __init__(self, owner: "MetadataColumns", index: int, values: Dict[str, Any]):
+        super().__init__(values)
+        self._owner = owner
+        self._index = index
+        self._layout = owner._layout
+
+    def _sync(self) -> None:
+        self._owner._write_through(self._index, self._layout, self)
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._sync()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._sync()
+
+    def __ior__(self, other):
+        super().update(other)
+        self._sync()
+        return self
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._sync()
+
+    def setdefault(self, key, default=None):
+        value = super().setdefault(key, default)
+        self._sync()
+        return value
+
+    def pop(self, key, *default):
+        value = super().pop(key, *default)
+        self._sync()
+        return value
+
+    def popitem(self):
+        item = super().popitem()
+        self._sync()
+        return item
+
+    def clear(self):
+        super().clear()
+        self._sync()
+
+    def copy(self) -> Dict[str, Any]:
+        return dict(self)
+
+    def __reduce__(self):
+        # Kopyalama ve serileştirmede düz sözlük olarak davranır
+        return (dict, (dict(self),))
+
+class MetadataColumns:
+    """
+    Alan bazlı metadata sütun deposu.
+
+    Her metadata anahtarı ayrı bir nesne sütununda tutulur; satırlar
+    indeksleme sırasında MetadataRow olarak yeniden oluşturulur ve
+    üzerlerindeki değişiklikler sütunlara geri yazılır. column() ile bir
+    alanın tüm değerlerine vektörel filtreleme için erişilebilir.
+    """
+
+    def __init__(self, rows: Optional[Iterable[Optional[Dict[str, Any]]]] = None, capacity: int = 1024):
+        """
+        Args:
+            rows: Başlangıç metadata satırları
+            capacity: Başlangıç kapasitesi
+        """
+        self._capacity = max(1, capacity)
+        self._columns: Dict[str, np.ndarray] = {}
+        self._size = 0
+        # Satır konumları değiştiğinde (silme, satır değiştirme) artar; eski görünümleri geçersiz kılar
+        self._layout = 0
+        if rows is not None:
+            self.extend(rows)
+
+    @property
+    def fields(self) -> List[str]:
+        """Sütun (alan) adları."""
+        return list(self._columns.keys())
+
+    def column(self, key: str) -> np.ndarray:
+        """
+        Bir alanın tüm satırlardaki değerlerini döndürür.
+
+        Args:
+            key: Alan adı
+
+        Returns:
+            np.ndarray: Değerler (değeri olmayan satırlar için None)
+        """
+        if key not in self._columns:
+            return np.full(self._size, None, dtype=object)
+
+        values = self._columns[key][:self._size].copy()
+        values[[value is _MISSING for value in values]] = None
+        return values
+
+    def _reserve(self, required: int) -> None:
+        """Tüm sütunların kapasitesini gerekirse büyütür."""
+        if required <= self._capacity:
+            return
+
+        capacity = _grow_capacity(self._capacity, required)
+        for key, values in self._columns.items():
+            grown = np.full(capacity, _MISSING, dtype=object)
+            grown[:self._size] = values[:self._size]
+            self._columns[key] = grown
+        self._capacity = capacity
+
+    def _write_row(self, index: int, metadata: Optional[Dict[str, Any]]) -> None:
+        """Bir satırı sütunlara yazar (önceki değerleri siler)."""
+        for values in self._columns.values():
+            values[index] = _MISSING
+
+        for key, value in (metadata or {}).items():
+            if key not in self._columns:
+                self._columns[key] = np.full(self._capacity, _MISSING, dtype=object)
+            self._columns[key][index] = value
+
+    def _read_row(self, index: int) -> Dict[str, Any]:
+        """Bir satırı sözlük olarak yeniden oluşturur."""
+        return {
+            key: values[index]
+            for key, values in self._columns.items()
+            if values[index] is not _MISSING
+        }
+
+    def _row_view(self, index: int) -> MetadataRow:
+        """Bir satırın yazılabilir görünümünü oluşturur."""
+        return MetadataRow(self, index, self._read_row(index))
+
+    def _write_through(self, index: int, layout: int, row: Dict[str, Any]) -> None:
+        """MetadataRow değişikliklerini sütunlara yazar."""
+        if layout != self._layout:
+            raise RuntimeError("Metadata satırı yer değiştirdi; satırı yeniden okuyup öyle değiştirin")
+        self._write_row(index, row)
+
+    def append(self, metadata: Optional[Dict[str, Any]]) -> None:
+        """Tek bir metadata satırı ekler."""
+        self._reserve(self._size + 1)
+        self._write_row(self._size, metadata)
+        self._size += 1
+
+    def extend(self, rows: Iterable[Optional[Dict[str, Any]]]) -> None:
+        """Birden fazla metadata satırı ekler."""
+        rows = list(rows)
+        self._reserve(self._size + len(rows))
+        for offset, metadata in enumerate(rows):
+            self._write_row(self._size + offset, metadata)
+        self._size += len(rows)
+
+    def clear(self) -> None:
+        """Tüm satırları kaldırır."""
+        self._columns = {}
+        self._size = 0
+        self._layout += 1
+
+    def tolist(self) -> List[Dict[str, Any]]:
+        """Satırları sözlük listesine dönüştürür."""
+        return [self._read_row(index) for index in range(self._size)]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for index in range(self._size):
+            yield self._row_view(index)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._row_view(i) for i in range(*index.indices(self._size))]
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("metadata indeksi aralık dışında")
+        return self._row_view(index)
+
+    def __setitem__(self, index: int, metadata: Optional[Dict[str, Any]]) -> None:
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("metadata indeksi aralık dışında")
+        self._write_row(index, metadata)
+        self._layout += 1
+
+    def __delitem__(self, index: int) -> None:
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("metadata indeksi aralık dışında")
+
+        for values in self._columns.values():
+            values[index:self._size - 1] = values[index + 1:self._size]
+            values[self._size - 1] = _MISSING
+        self._size -= 1
+        self._layout += 1
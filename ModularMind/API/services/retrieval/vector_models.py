@@ -59,4 +59,9 @@ class VectorStoreConfig:
     num_workers: int = 2    # Paralel işlem için iş parçacığı sayısı
     hybrid_search_alpha: float = 0.5  # Hibrit aramada vektör ağırlığı (0-1)
     collection_name: str = "default"  # Koleksiyon adı
-    auto_save_interval: int = 60      # Otomatik kaydetme aralığı (saniye)
\ No newline at end of file
+    auto_save_interval: int = 60      # Otomatik kaydetme aralığı (saniye)
+    use_mmap: bool = True             # Disk segmentlerini bellek eşlemeli (np.memmap) yükle
+    max_segments: int = 8             # Birleştirme öncesi maksimum segment sayısı
+    compaction_deleted_ratio: float = 0.2  # Birleştirme için silinmiş satır oranı
+    filter_prefilter_selectivity: float = 0.05  # Bu eşleşme oranının altında filtreli arama tam tarama yapar
+    filter_overfetch_factor: float = 2.0        # Son filtrede ANN'den çekilecek ek aday çarpanı
\ No newline at end of file
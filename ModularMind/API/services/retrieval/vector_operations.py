@@ -51,6 +51,8 @@ def add_chunk(vector_store, chunk: Chunk) -> None:
         
         # ID -> indeks eşlemesini güncelle
         vector_store.id_to_index[chunk.id] = len(vector_store.ids) - 1
+        _track_upserts(vector_store, [chunk.id])
+        _index_keywords(vector_store, [chunk])
         
         # Metadata indeksini güncelle
         if vector_store.config.metadata_index_type != "none":
@@ -125,19 +127,23 @@ def add_batch_chunks(vector_store, chunks: List[Chunk]) -> None:
         # Yeni başlangıç indeksi
         start_index = len(vector_store.ids)
         
-        # Verileri ekle
-        for chunk in valid_chunks:
-            vector_store.vectors.append(chunk.embedding)
-            vector_store.ids.append(chunk.id)
-            vector_store.metadata.append(chunk.metadata)
-            vector_store.id_to_index[chunk.id] = start_index + len(vector_store.id_to_index)
+        # Verileri sütunlara toplu ekle (vektör matrisi tek kopyalamayla büyür)
+        vectors_to_add = [c.embedding for c in valid_chunks]
+        vector_store.vectors.extend(vectors_to_add)
+        vector_store.ids.extend(c.id for c in valid_chunks)
+        vector_store.metadata.extend(c.metadata for c in valid_chunks)
+        
+        _track_upserts(vector_store, [c.id for c in valid_chunks])
+        _index_keywords(vector_store, valid_chunks)
+        
+        for offset, chunk in enumerate(valid_chunks):
+            vector_store.id_to_index[chunk.id] = start_index + offset
             
             # Metadata indeksi güncelle
             if vector_store.config.metadata_index_type != "none":
                 update_metadata_index(vector_store, chunk.id, chunk.metadata)
         
         # İndeksi toplu güncelle
-        vectors_to_add = [c.embedding for c in valid_chunks]
         indices = list(range(start_index, start_index + len(valid_chunks)))
         update_index(vector_store, vectors_to_add, indices)
         
@@ -188,11 +194,17 @@ def update_chunk(vector_store, chunk: Chunk) -> None:
         vector_store.vectors[index] = chunk.embedding
         
         # Metadata'yı güncelle
+        old_metadata = vector_store.metadata[index]
         vector_store.metadata[index] = chunk.metadata
+        _track_upserts(vector_store, [chunk.id])
+        
+        # Metin verilmediyse (yalnızca metadata güncellemesi) ters indeksi koru
+        if chunk.text:
+            _index_keywords(vector_store, [chunk])
         
         # Metadata indeksini güncelle
         if vector_store.config.metadata_index_type != "none":
-            update_metadata_index(vector_store, chunk.id, chunk.metadata)
+            update_metadata_index(vector_store, chunk.id, chunk.metadata, old_metadata)
         
         # İndeksi güncelle
         update_index_at_position(vector_store, chunk.embedding, index)
@@ -221,9 +233,10 @@ def delete_chunk(vector_store, chunk_id: str) -> bool:
         index = vector_store.id_to_index[chunk_id]
         
         # Chunk bilgilerini al
+        row_metadata = vector_store.metadata[index]
         document_id = None
-        if vector_store.metadata[index] and "document_id" in vector_store.metadata[index]:
-            document_id = vector_store.metadata[index]["document_id"]
+        if row_metadata and "document_id" in row_metadata:
+            document_id = row_metadata["document_id"]
         
         # Silme işlemi için indeks tipine göre işlem yap
         from ModularMind.API.services.retrieval.vector_models import IndexType
@@ -249,11 +262,20 @@ def delete_chunk(vector_store, chunk_id: str) -> bool:
             
             # Metadata indeksinden sil
             if vector_store.config.metadata_index_type != "none":
-                remove_from_metadata_index(vector_store, chunk_id)
+                remove_from_metadata_index(vector_store, index, row_metadata)
             
             # İndeksi yeniden oluştur
             _rebuild_index(vector_store)
         
+        # Ters indeksten sil
+        if getattr(vector_store, "keyword_index", None) is not None:
+            vector_store.keyword_index.remove(chunk_id)
+        
+        # Artımlı kayıt için silmeyi işaretle
+        if hasattr(vector_store, "pending_deletes"):
+            vector_store.pending_upserts.discard(chunk_id)
+            vector_store.pending_deletes.add(chunk_id)
+        
         # Koleksiyon istatistiklerini güncelle
         vector_store.collection_stats["total_chunks"] -= 1
         
@@ -266,7 +288,40 @@ def delete_chunk(vector_store, chunk_id: str) -> bool:
         
         return True
 
-def update_metadata_index(vector_store, chunk_id: str, metadata: Dict[str, Any]) -> None:
+def _track_upserts(vector_store, chunk_ids: List[str]) -> None:
+    """
+    Artımlı kayıt için eklenen/güncellenen chunk ID'lerini işaretler.
+    
+    Args:
+        vector_store: Vector store nesnesi
+        chunk_ids: Eklenen veya güncellenen chunk ID'leri
+    """
+    if hasattr(vector_store, "pending_upserts"):
+        vector_store.pending_upserts.update(chunk_ids)
+
+def _index_keywords(vector_store, chunks: List[Chunk]) -> None:
+    """
+    Chunk metinlerini anahtar kelime ters indeksine yazar.
+    
+    Args:
+        vector_store: Vector store nesnesi
+        chunks: Eklenen veya güncellenen parçalar
+    """
+    keyword_index = getattr(vector_store, "keyword_index", None)
+    if keyword_index is None:
+        return
+    
+    from ModularMind.API.services.retrieval.inverted_index import chunk_keyword_text
+    keyword_index.add_many(
+        (chunk.id, chunk_keyword_text(chunk.text, chunk.metadata)) for chunk in chunks
+    )
+
+def update_metadata_index(
+    vector_store,
+    chunk_id: str,
+    metadata: Dict[str, Any],
+    old_metadata: Optional[Dict[str, Any]] = None
+) -> None:
     """
     Metadata indeksini günceller.
     
@@ -274,37 +329,52 @@ def update_metadata_index(vector_store, chunk_id: str, metadata: Dict[str, Any])
         vector_store: Vector store nesnesi
         chunk_id: Chunk ID
         metadata: Güncellenecek metadata
+        old_metadata: Güncellemelerde satırın önceki metadata'sı
     """
-    # Eski indeksi kaldır
-    remove_from_metadata_index(vector_store, chunk_id)
+    from ModularMind.API.services.retrieval.filter_index import MetadataFilterIndex
     
-    # Yeni değerleri indeksle
-    if not metadata:
+    index = vector_store.metadata_index
+    if not isinstance(index, MetadataFilterIndex):
+        # İndeks geçersiz; ilk sorguda yeniden oluşturulacak
         return
     
-    # Düz alanlara göre indeksle
-    for key, value in metadata.items():
-        # Sadece skaler değerleri indeksle
-        if isinstance(value, (str, int, float, bool)):
-            # Değer -> chunk ID haritası
-            if value not in vector_store.metadata_index[key]:
-                vector_store.metadata_index[key][value] = set()
-            
-            vector_store.metadata_index[key][value].add(chunk_id)
+    row = vector_store.id_to_index[chunk_id]
+    if row == index.row_count:
+        # Yeni satır: sona ekle
+        index.add_row(metadata)
+    elif row < index.row_count:
+        # Mevcut satır: eski değerleri bitmap'lerden çıkarıp yenilerini yaz
+        index.update_row(row, old_metadata, metadata)
+    else:
+        # İndeks sütunlarla eşleşmiyor; ilk sorguda yeniden oluşturulacak
+        from ModularMind.API.services.retrieval.metadata_index import invalidate_metadata_index
+        invalidate_metadata_index(vector_store)
 
-def remove_from_metadata_index(vector_store, chunk_id: str) -> None:
+def remove_from_metadata_index(vector_store, row: int, metadata: Optional[Dict[str, Any]]) -> None:
     """
-    Metadata indeksinden chunk ID'sini kaldırır.
+    Silinen satırı metadata indeksinden kaldırır.
+    
+    Satır bitmap'lerden ve sıralı sütunlardan çıkarılır, sonraki satırların
+    kimlikleri sütunlardaki gibi birer kaydırılır.
     
     Args:
         vector_store: Vector store nesnesi
-        chunk_id: Kaldırılacak chunk ID
+        row: Silinen satırın (silmeden önceki) konumu
+        metadata: Silinen satırın metadata'sı
     """
-    # Tüm indekslerde chunk ID'sini ara ve kaldır
-    for field_index in vector_store.metadata_index.values():
-        for value_set in field_index.values():
-            if chunk_id in value_set:
-                value_set.remove(chunk_id)
+    from ModularMind.API.services.retrieval.filter_index import MetadataFilterIndex
+    from ModularMind.API.services.retrieval.metadata_index import invalidate_metadata_index
+    
+    index = vector_store.metadata_index
+    if not isinstance(index, MetadataFilterIndex):
+        return
+    
+    if index.row_count != len(vector_store.ids) + 1 or row >= index.row_count:
+        # İndeks sütunlarla eşleşmiyor; ilk sorguda yeniden oluşturulacak
+        invalidate_metadata_index(vector_store)
+        return
+    
+    index.delete_row(row, metadata)
 
 def update_index(vector_store, vectors: List[List[float]], indices: List[int]) -> None:
     """
@@ -362,15 +432,8 @@ def get_unique_document_ids(vector_store) -> Set[str]:
     Returns:
         Set[str]: Benzersiz belge ID'leri
     """
-    document_ids = set()
-    
-    for metadata in vector_store.metadata:
-        if metadata:
-            doc_id = metadata.get("document_id")
-            if doc_id:
-                document_ids.add(doc_id)
-    
-    return document_ids
+    # Yalnızca document_id sütununu oku
+    return {doc_id for doc_id in vector_store.metadata.column("document_id") if doc_id}
 
 def get_document_ids_except(vector_store, exclude_chunk_id: str) -> Set[str]:
     """
@@ -383,12 +446,7 @@ def get_document_ids_except(vector_store, exclude_chunk_id: str) -> Set[str]:
     Returns:
         Set[str]: Belge ID'leri
     """
-    document_ids = set()
-    
-    for idx, chunk_id in enumerate(vector_store.ids):
-        if chunk_id != exclude_chunk_id:
-            metadata = vector_store.metadata[idx]
-            if metadata and "document_id" in metadata:
-                document_ids.add(metadata["document_id"])
+    document_ids = vector_store.metadata.column("document_id")
+    keep = vector_store.ids.array != exclude_chunk_id
     
-    return document_ids
\ No newline at end of file
+    return {doc_id for doc_id in document_ids[keep] if doc_id}
\ No newline at end of file
@@ -20,6 +20,11 @@ from ModularMind.API.services.retrieval.search_utils import (
     extract_keywords, score_text_for_keywords, combine_search_results, 
     check_metadata_filter
 )
+from ModularMind.API.services.retrieval.vector_columns import (
+    VectorColumn, IdColumn, MetadataColumns
+)
+from ModularMind.API.services.retrieval.inverted_index import InvertedIndex
+from ModularMind.API.services.retrieval.filter_index import MetadataFilterIndex
 from ModularMind.API.services.retrieval.storage import (
     save_to_disk, load_from_disk, save_to_sqlite, load_from_sqlite,
     save_to_postgres, load_from_postgres
@@ -50,19 +55,27 @@ class VectorStore:
         # Thread güvenliği için kilit
         self.lock = threading.RLock()
         
-        # Depolama için veri yapıları
-        self.vectors = []  # Vektörler
-        self.ids = []      # Chunk ID'leri
-        self.metadata = []  # Metadata bilgileri
+        # Depolama için sütunsal veri yapıları
+        self.vectors = VectorColumn(self.config.dimensions)  # float32 vektör matrisi
+        self.ids = IdColumn()            # Chunk ID'leri
+        self.metadata = MetadataColumns()  # Metadata sütunları
         self.id_to_index = {}  # ID -> indeks eşlemesi
         
-        # Metadata indeksi
-        self.metadata_index = defaultdict(dict)
+        # Metadata filtre indeksi (satır bitmap'leri)
+        self.metadata_index = MetadataFilterIndex()
+        
+        # Anahtar kelime araması için ters indeks (BM25)
+        self.keyword_index = InvertedIndex()
         
         # Değişiklik izleme
         self.is_dirty = False
         self.last_saved = time.time()
         
+        # Son kayıttan bu yana eklenen/güncellenen ve silinen chunk ID'leri
+        # (disk depolamada artımlı segment yazımı için)
+        self.pending_upserts = set()
+        self.pending_deletes = set()
+        
         # Indeks bağlantısı
         self.index = None
         
@@ -349,4 +362,11 @@ class VectorStore:
             elif self.config.storage_type == StorageType.SQLITE:
                 return load_from_sqlite(self)
                 
-            elif self.config
\ No newline at end of file
+            elif self.config.storage_type == StorageType.POSTGRES:
+                return load_from_postgres(self)
+                
+            elif self.config.storage_type == StorageType.EXTERNAL:
+                # Harici depolamada veri zaten yüklü durumda
+                return True
+            
+            return False
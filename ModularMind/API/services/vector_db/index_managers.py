@@ -15,6 +15,9 @@ import shutil
 import pickle
 import threading
 
+from ModularMind.API.services.vector_db.raw_vectors import MmapVectorStore
+from ModularMind.API.services.vector_db.write_ahead_log import WriteAheadLog
+
 logger = logging.getLogger(__name__)
 
 class VectorIndexManager(ABC):
@@ -108,6 +111,65 @@ class VectorIndexManager(ABC):
         # Top_k ile sınırla
         return filtered_results[:top_k]
 
+    def query_batch(self, query_matrix: np.ndarray, top_k: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Birden fazla sorgu vektörü için tek seferde arama yapar.
+
+        Varsayılan implementasyon her sorgu için query() çağırır; alt sınıflar
+        tek bir matris işlemiyle çalışan sürümlerle override eder.
+        
+        Args:
+            query_matrix: Sorgu vektörleri (n_queries x dimension)
+            top_k: Her sorgu için getirilecek en fazla sonuç sayısı
+            
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (n_queries x top_k) vector_id dizisi
+            (boş konumlar None) ve mesafe dizisi (boş konumlar inf)
+        """
+        query_matrix = self._prepare_query_matrix(query_matrix)
+        ids, distances = self._empty_batch_result(len(query_matrix), top_k)
+        
+        for row, query_vector in enumerate(query_matrix):
+            for col, result in enumerate(self.query(query_vector, top_k)[:top_k]):
+                ids[row, col] = result["vector_id"]
+                distances[row, col] = result["distance"]
+        
+        return ids, distances
+
+    def _prepare_query_matrix(self, query_matrix: np.ndarray) -> np.ndarray:
+        """Sorgu matrisini (n_queries x dimension) float32 diziye dönüştürür."""
+        return np.ascontiguousarray(query_matrix, dtype=np.float32).reshape(-1, self.dimension)
+
+    def _empty_batch_result(self, num_queries: int, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Boş (doldurulmamış) toplu arama sonuç dizilerini oluşturur."""
+        ids = np.full((num_queries, max(top_k, 0)), None, dtype=object)
+        distances = np.full((num_queries, max(top_k, 0)), np.inf, dtype=np.float32)
+        return ids, distances
+
+    def _pack_batch_results(self, labels: np.ndarray, distances: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Kütüphane etiketlerini (satır indeksleri) vector_id'lere dönüştürür.
+        
+        Args:
+            labels: Sonuç indeksleri (n_queries x k, -1 boş konum)
+            distances: Sonuç mesafeleri (n_queries x k)
+            top_k: İstenen sonuç sayısı (k < top_k ise sağ taraf doldurulur)
+            
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: vector_id ve mesafe dizileri
+        """
+        ids, packed_distances = self._empty_batch_result(len(labels), top_k)
+        width = min(labels.shape[1], top_k) if labels.ndim == 2 else 0
+        
+        for row in range(len(labels)):
+            for col in range(width):
+                vector_id = self.index_to_id.get(int(labels[row, col]))
+                if vector_id is not None:
+                    ids[row, col] = vector_id
+                    packed_distances[row, col] = distances[row, col]
+        
+        return ids, packed_distances
+
     @abstractmethod
     def stats(self) -> Dict[str, Any]:
         """
@@ -143,16 +205,156 @@ class VectorIndexManager(ABC):
             return id_to_idx
 
 
+def _faiss_query_batch(
+    manager: VectorIndexManager,
+    query_matrix: np.ndarray,
+    top_k: int,
+    label: str,
+    oversample: int = 1,
+    rescore: Optional[Callable[[np.ndarray, np.ndarray, int], Tuple[np.ndarray, np.ndarray]]] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Faiss tabanlı indeks yöneticileri için ortak toplu arama.
+
+    `rescore` verilirse indeksten `top_k * oversample` aday alınır ve
+    adaylar bu fonksiyonla yeniden puanlanıp ilk `top_k` tanesi döndürülür.
+    
+    Args:
+        manager: Faiss indeksine sahip yönetici (self.index, self.vector_count)
+        query_matrix: Sorgu vektörleri (n_queries x dimension)
+        top_k: Her sorgu için getirilecek en fazla sonuç sayısı
+        label: Log mesajları için indeks adı
+        oversample: Yeniden puanlama için aday çarpanı
+        rescore: (sorgular, aday etiketleri, k) -> (mesafeler, etiketler) fonksiyonu
+        
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: vector_id ve mesafe dizileri
+    """
+    queries = manager._prepare_query_matrix(query_matrix)
+    
+    with manager.index_lock:
+        actual_k = min(top_k, manager.vector_count)
+        if len(queries) == 0 or actual_k <= 0:
+            return manager._empty_batch_result(len(queries), top_k)
+        
+        # Cosine benzerliği için normalize
+        if manager.metric_type == "cosine":
+            norms = np.linalg.norm(queries, axis=1, keepdims=True)
+            queries = queries / np.where(norms > 0, norms, 1.0)
+        
+        candidate_k = min(actual_k * max(1, oversample), manager.vector_count) if rescore else actual_k
+        
+        try:
+            distances, labels = manager.index.search(queries, candidate_k)
+            if rescore is not None:
+                distances, labels = rescore(queries, labels, actual_k)
+        except Exception as e:
+            logger.error(f"{label} toplu arama hatası: {str(e)}")
+            return manager._empty_batch_result(len(queries), top_k)
+        
+        # Dot product yüksek = düşük mesafe
+        if manager.metric_type == "dot":
+            distances = -distances
+        
+        return manager._pack_batch_results(labels, distances, top_k)
+
+
+def _exact_rescore(
+    queries: np.ndarray,
+    labels: np.ndarray,
+    top_k: int,
+    read_vectors: Callable[[np.ndarray], np.ndarray],
+    metric_type: str
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Aday etiketlerini ham float32 vektörlerle tam doğrulukla yeniden puanlar.
+
+    Mesafeler faiss ile aynı biçimde döndürülür: l2 için kare uzaklık
+    (küçük iyi), cosine/dot için iç çarpım (büyük iyi).
+    
+    Args:
+        queries: Hazırlanmış sorgu vektörleri (n_queries x dimension)
+        labels: Aday etiketleri (n_queries x n_candidates, -1 boş konum)
+        top_k: Sorgu başına döndürülecek sonuç sayısı
+        read_vectors: Etiketlerin ham vektörlerini okuyan fonksiyon
+        metric_type: Metrik türü
+        
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (n_queries x top_k) mesafe ve etiket dizileri
+    """
+    num_queries = len(queries)
+    use_l2 = metric_type == "l2"
+    empty = np.inf if use_l2 else -np.inf
+    
+    out_labels = np.full((num_queries, top_k), -1, dtype=np.int64)
+    out_distances = np.full((num_queries, top_k), empty, dtype=np.float32)
+    
+    valid = labels >= 0
+    if not valid.any():
+        return out_distances, out_labels
+    
+    # Her aday vektörü bir kez oku
+    unique_labels, inverse = np.unique(labels[valid], return_inverse=True)
+    vectors = read_vectors(unique_labels)
+    
+    scores = np.full(labels.shape, empty, dtype=np.float32)
+    rows, cols = np.nonzero(valid)
+    candidates = vectors[inverse]
+    if use_l2:
+        diff = candidates - queries[rows]
+        scores[rows, cols] = np.einsum("ij,ij->i", diff, diff)
+    else:
+        scores[rows, cols] = np.einsum("ij,ij->i", candidates, queries[rows])
+    
+    # En iyi top_k adayı sırala
+    order = np.argsort(scores if use_l2 else -scores, axis=1, kind="stable")[:, :top_k]
+    width = order.shape[1]
+    out_distances[:, :width] = np.take_along_axis(scores, order, axis=1)
+    out_labels[:, :width] = np.where(
+        np.isfinite(out_distances[:, :width]), np.take_along_axis(labels, order, axis=1), -1
+    )
+    
+    return out_distances, out_labels
+
+
 class FlatIndex(VectorIndexManager):
-    """Düz (brute-force) vektör indeksi."""
+    """
+    Düz (brute-force) vektör indeksi.
+
+    Vektörler kapasitesi ikiye katlanarak büyüyen önceden ayrılmış bir float32
+    tamponda tutulur. Silme işlemleri satırları yalnızca tombstone bitmap'inde
+    işaretler; silinen oran eşiği aştığında sıkıştırma arka planda yapılır.
+    """
 
     def initialize(self) -> None:
         """İndeksi başlatır."""
-        # Numpy dizisi olarak düz indeks
-        self.index = np.zeros((0, self.dimension), dtype=np.float32)
+        capacity = max(1, getattr(self.config, "initial_capacity", 1024))
+        self.compaction_threshold = getattr(self.config, "compaction_threshold", 0.25)
+        self.compaction_retry_delay = getattr(self.config, "compaction_retry_delay", 0.1)
+
+        # Önceden ayrılmış vektör tamponu (yalnızca ilk self.size satırı geçerli)
+        self.index = np.zeros((capacity, self.dimension), dtype=np.float32)
+        self.size = 0
+        # Tombstone bitmap'i (True = silinmiş satır)
+        self.deleted = np.zeros(capacity, dtype=bool)
+        self.deleted_count = 0
+        # Satır -> vector_id eşleştirmesi (dizi tabanlı)
+        self.index_to_id = np.empty(capacity, dtype=object)
+        self.id_to_index = {}
+        self.next_index = 0
+
+        # Arka plan sıkıştırma durumu
+        self._mutation_epoch = 0
+        self._compaction_thread = None
+
         self.is_initialized = True
         logger.info("Flat indeks başlatıldı")
 
+    @property
+    def vector_count(self) -> int:
+        """Silinmemiş vektör sayısı."""
+        return self.size - self.deleted_count
+
     def add_vectors(self, vector_ids: List[str], vectors: List[np.ndarray]) -> None:
         """
         Vektörleri indekse ekler.
@@ -164,17 +366,32 @@ class FlatIndex(VectorIndexManager):
         if not vectors:
             return
         
+        # Vektörleri numpy dizisine dönüştür (lock dışında)
+        vectors_array = np.asarray(vectors, dtype=np.float32).reshape(len(vectors), self.dimension)
+        
         with self.index_lock:
-            # Vektörleri numpy dizisine dönüştür
-            vectors_array = np.array([v for v in vectors], dtype=np.float32)
+            # Aynı ID tekrar eklenirse eski satırı tombstone olarak işaretle
+            existing = [vector_id for vector_id in vector_ids if vector_id in self.id_to_index]
+            if existing:
+                self._mark_deleted(existing)
             
-            # Vektörleri indekse ekle
-            self.index = np.vstack((self.index, vectors_array))
+            start = self.size
+            end = start + len(vectors_array)
+            self._ensure_capacity(end)
             
-            # ID'leri kaydet
-            self._register_vectors(vector_ids, self.next_index)
+            # Vektörleri tampona yaz
+            self.index[start:end] = vectors_array
+            self.index_to_id[start:end] = vector_ids
+            for offset, vector_id in enumerate(vector_ids):
+                self.id_to_index[vector_id] = start + offset
+            
+            self.size = end
+            self.next_index = end
             
             logger.info(f"Flat indekse {len(vectors)} vektör eklendi")
+            
+            if existing and self._needs_compaction():
+                self._schedule_compaction()
 
     def update_vectors(self, vector_ids: List[str], vectors: List[np.ndarray]) -> None:
         """
@@ -194,11 +411,15 @@ class FlatIndex(VectorIndexManager):
                     idx = self.id_to_index[vector_id]
                     self.index[idx] = vector
             
+            self._mutation_epoch += 1
             logger.info(f"Flat indekste {len(vectors)} vektör güncellendi")
 
     def delete_vectors(self, vector_ids: List[str]) -> None:
         """
         Vektörleri indeksten siler.
+
+        Satırlar yalnızca tombstone olarak işaretlenir; fiziksel sıkıştırma
+        silinen oran eşiği aştığında arka planda yapılır.
         
         Args:
             vector_ids: Silinecek vektör ID'leri
@@ -207,28 +428,13 @@ class FlatIndex(VectorIndexManager):
             return
         
         with self.index_lock:
-            # Silinecek indeksleri topla
-            indices_to_delete = []
-            for vector_id in vector_ids:
-                if vector_id in self.id_to_index:
-                    indices_to_delete.append(self.id_to_index[vector_id])
-                    # Mapping'lerden kaldır
-                    idx = self.id_to_index[vector_id]
-                    del self.id_to_index[vector_id]
-                    del self.index_to_id[idx]
+            deleted = self._mark_deleted(vector_ids)
             
-            if indices_to_delete:
-                # Maske oluştur (silinecek olmayan indeksler True olacak)
-                mask = np.ones(len(self.index), dtype=bool)
-                mask[indices_to_delete] = False
-                
-                # Maske ile filtreleme yaparak silme işlemi
-                self.index = self.index[mask]
+            if deleted:
+                logger.info(f"Flat indeksten {deleted} vektör silindi")
                 
-                logger.info(f"Flat indeksten {len(indices_to_delete)} vektör silindi")
-                
-                # Mapping'leri yeniden oluştur
-                self._rebuild_mappings()
+                if self._needs_compaction():
+                    self._schedule_compaction()
 
     def query(self, query_vector: np.ndarray, top_k: int = 10) -> List[Dict[str, Any]]:
         """
@@ -241,10 +447,12 @@ class FlatIndex(VectorIndexManager):
         Returns:
             List[Dict[str, Any]]: Arama sonuçları (vector_id ve distance içerir)
         """
-        if len(self.index) == 0:
+        if self.vector_count == 0:
             return []
         
         with self.index_lock:
+            vectors = self.index[:self.size]
+            
             # Mesafeleri hesapla
             if self.metric_type == "cosine":
                 # Vektörleri normalize et
@@ -254,22 +462,29 @@ class FlatIndex(VectorIndexManager):
                 
                 # Normalize edilmiş indeks vektörleri ile dot product
                 # (Cosine benzerliği, 1 - benzerlik = mesafe)
-                similarities = np.dot(self.index, query_vector)
+                similarities = np.dot(vectors, query_vector)
                 distances = 1.0 - similarities
             
             elif self.metric_type == "l2":
                 # L2 (Euclidean) mesafesi
-                distances = np.linalg.norm(self.index - query_vector, axis=1)
+                distances = np.linalg.norm(vectors - query_vector, axis=1)
             
             elif self.metric_type == "dot":
                 # Negatif dot product (maksimum dot product = minimum mesafe)
-                similarities = np.dot(self.index, query_vector)
+                similarities = np.dot(vectors, query_vector)
                 distances = -similarities
             
             else:
                 raise ValueError(f"Desteklenmeyen metrik türü: {self.metric_type}")
             
+            # Silinmiş satırları sonuçlardan çıkar
+            if self.deleted_count:
+                distances[self.deleted[:self.size]] = np.inf
+            
             # Top-k indekslerini al
+            top_k = min(top_k, self.vector_count)
+            if top_k <= 0:
+                return []
             if len(distances) <= top_k:
                 top_indices = np.argsort(distances)
             else:
@@ -279,15 +494,85 @@ class FlatIndex(VectorIndexManager):
             # Sonuçları oluştur
             results = []
             for idx in top_indices:
-                if idx in self.index_to_id:
-                    vector_id = self.index_to_id[idx]
+                if not self.deleted[idx]:
                     results.append({
-                        "vector_id": vector_id,
+                        "vector_id": self.index_to_id[idx],
                         "distance": float(distances[idx])
                     })
             
             return results
 
+    def query_batch(self, query_matrix: np.ndarray, top_k: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Birden fazla sorgu için tek bir matris çarpımıyla (GEMM) arama yapar.
+        
+        Args:
+            query_matrix: Sorgu vektörleri (n_queries x dimension)
+            top_k: Her sorgu için getirilecek en fazla sonuç sayısı
+            
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: vector_id ve mesafe dizileri
+        """
+        queries = self._prepare_query_matrix(query_matrix)
+        ids, packed_distances = self._empty_batch_result(len(queries), top_k)
+        
+        if len(queries) == 0 or self.vector_count == 0 or top_k <= 0:
+            return ids, packed_distances
+        
+        with self.index_lock:
+            vectors = self.index[:self.size]
+            
+            if self.metric_type == "cosine":
+                norms = np.linalg.norm(queries, axis=1, keepdims=True)
+                queries = queries / np.where(norms > 0, norms, 1.0)
+                distances = 1.0 - queries @ vectors.T
+            
+            elif self.metric_type == "l2":
+                # ||q - v||^2 = ||q||^2 - 2 q.v + ||v||^2
+                squared = (
+                    np.einsum("ij,ij->i", queries, queries)[:, None]
+                    - 2.0 * (queries @ vectors.T)
+                    + np.einsum("ij,ij->i", vectors, vectors)[None, :]
+                )
+                distances = np.sqrt(np.maximum(squared, 0.0))
+            
+            elif self.metric_type == "dot":
+                distances = -(queries @ vectors.T)
+            
+            else:
+                raise ValueError(f"Desteklenmeyen metrik türü: {self.metric_type}")
+            
+            # Silinmiş satırları sonuçlardan çıkar
+            if self.deleted_count:
+                distances[:, self.deleted[:self.size]] = np.inf
+            
+            k = min(top_k, self.vector_count)
+            
+            # L2 açılımı float32'de yuvarlama hatası taşır; adaylar geniş seçilip
+            # query() ile aynı tam mesafeyle (||q - v||) yeniden sıralanır
+            pool = min(distances.shape[1], 2 * k) if self.metric_type == "l2" else k
+            if pool < distances.shape[1]:
+                top_indices = np.argpartition(distances, pool, axis=1)[:, :pool]
+            else:
+                top_indices = np.broadcast_to(np.arange(distances.shape[1]), distances.shape)
+            
+            top_distances = np.take_along_axis(distances, top_indices, axis=1)
+            if self.metric_type == "l2":
+                exact = np.linalg.norm(vectors[top_indices] - queries[:, None, :], axis=2)
+                top_distances = np.where(np.isfinite(top_distances), exact, np.inf)
+            
+            order = np.argsort(top_distances, axis=1)[:, :k]
+            top_indices = np.take_along_axis(top_indices, order, axis=1)
+            top_distances = np.take_along_axis(top_distances, order, axis=1)
+            
+            ids[:, :k] = self.index_to_id[top_indices]
+            packed_distances[:, :k] = top_distances
+            
+            # Tombstone satırlara denk gelen konumları boşalt
+            ids[~np.isfinite(packed_distances)] = None
+            
+            return ids, packed_distances
+
     def stats(self) -> Dict[str, Any]:
         """
         İndeks istatistiklerini döndürür.
@@ -298,36 +583,187 @@ class FlatIndex(VectorIndexManager):
         with self.index_lock:
             return {
                 "type": "flat",
-                "vector_count": len(self.index),
+                "vector_count": self.vector_count,
                 "dimension": self.dimension,
                 "metric_type": self.metric_type,
+                "capacity": len(self.index),
+                "deleted_count": self.deleted_count,
+                "compaction_running": self._compaction_thread is not None,
                 "memory_usage_mb": self.index.nbytes / 1024 / 1024
             }
 
-    def _rebuild_mappings(self) -> None:
-        """ID ve indeks eşleştirmelerini yeniden oluşturur."""
-        # Yeni mapping'ler
-        new_id_to_index = {}
-        new_index_to_id = {}
+    def compact(self) -> int:
+        """
+        Tombstone olarak işaretlenmiş satırları fiziksel olarak kaldırır.
+
+        Yeni tampon lock dışında hazırlanır; lock yalnızca son satırların
+        kopyalanması ve referansların değiştirilmesi sırasında tutulur. Bu
+        sırada güncelleme veya silme yapılmışsa sıkıştırma iptal edilir.
+        
+        Returns:
+            int: Kaldırılan satır sayısı (iptal edildiyse 0)
+        """
+        with self.index_lock:
+            if self.deleted_count == 0:
+                return 0
+            snapshot_size = self.size
+            snapshot_epoch = self._mutation_epoch
+            buffer = self.index
+            keep = ~self.deleted[:snapshot_size]
+            row_ids = self.index_to_id[:snapshot_size].copy()
+        
+        # Sıkıştırılmış kopyayı lock dışında hazırla
+        kept_vectors = buffer[:snapshot_size][keep]
+        kept_ids = row_ids[keep]
+        new_id_to_index = {vector_id: idx for idx, vector_id in enumerate(kept_ids)}
+        
+        with self.index_lock:
+            if self._mutation_epoch != snapshot_epoch:
+                logger.debug("Flat indeks sıkıştırması eşzamanlı değişiklik nedeniyle iptal edildi")
+                return 0
+            
+            # Sıkıştırma sırasında eklenen satırları kopyala
+            tail = self.size - snapshot_size
+            new_size = len(kept_vectors) + tail
+            capacity = self._grown_capacity(max(1, new_size), max(1, len(kept_vectors)))
+            
+            new_index = np.zeros((capacity, self.dimension), dtype=np.float32)
+            new_index[:len(kept_vectors)] = kept_vectors
+            new_row_ids = np.empty(capacity, dtype=object)
+            new_row_ids[:len(kept_ids)] = kept_ids
+            new_deleted = np.zeros(capacity, dtype=bool)
+            
+            if tail:
+                new_index[len(kept_vectors):new_size] = self.index[snapshot_size:self.size]
+                new_row_ids[len(kept_ids):new_size] = self.index_to_id[snapshot_size:self.size]
+                for offset in range(tail):
+                    new_id_to_index[new_row_ids[len(kept_ids) + offset]] = len(kept_ids) + offset
+            
+            removed = self.deleted_count
+            self.index = new_index
+            self.index_to_id = new_row_ids
+            self.id_to_index = new_id_to_index
+            self.deleted = new_deleted
+            self.deleted_count = 0
+            self.size = new_size
+            self.next_index = new_size
+            self._mutation_epoch += 1
+            
+            logger.info(f"Flat indeks sıkıştırıldı: {removed} satır kaldırıldı")
+            return removed
+
+    def _mark_deleted(self, vector_ids: List[str]) -> int:
+        """
+        Vektörleri tombstone olarak işaretler (lock altında çağrılmalıdır).
+        
+        Args:
+            vector_ids: Silinecek vektör ID'leri
+            
+        Returns:
+            int: İşaretlenen satır sayısı
+        """
+        deleted = 0
+        for vector_id in vector_ids:
+            idx = self.id_to_index.pop(vector_id, None)
+            if idx is not None:
+                self.deleted[idx] = True
+                self.index_to_id[idx] = None
+                deleted += 1
+        
+        if deleted:
+            self.deleted_count += deleted
+            self._mutation_epoch += 1
+        
+        return deleted
+
+    def _grown_capacity(self, required: int, current: int) -> int:
+        """Gerekli satır sayısını karşılayan ikinin katı kapasiteyi hesaplar."""
+        capacity = max(1, current)
+        while capacity < required:
+            capacity *= 2
+        return capacity
+
+    def _ensure_capacity(self, required: int) -> None:
+        """
+        Tampon kapasitesini gerekirse ikiye katlayarak büyütür
+        (lock altında çağrılmalıdır).
         
-        # Kalan ID'ler için yeni indeksler ata
-        for new_idx, old_idx in enumerate(range(len(self.index))):
-            if old_idx in self.index_to_id:
-                vector_id = self.index_to_id[old_idx]
-                new_id_to_index[vector_id] = new_idx
-                new_index_to_id[new_idx] = vector_id
+        Args:
+            required: Gereken satır sayısı
+        """
+        capacity = len(self.index)
+        if required <= capacity:
+            return
+        
+        new_capacity = self._grown_capacity(required, capacity)
+        
+        new_index = np.zeros((new_capacity, self.dimension), dtype=np.float32)
+        new_index[:self.size] = self.index[:self.size]
+        new_deleted = np.zeros(new_capacity, dtype=bool)
+        new_deleted[:self.size] = self.deleted[:self.size]
+        new_row_ids = np.empty(new_capacity, dtype=object)
+        new_row_ids[:self.size] = self.index_to_id[:self.size]
+        
+        self.index = new_index
+        self.deleted = new_deleted
+        self.index_to_id = new_row_ids
+        
+        logger.debug(f"Flat indeks kapasitesi artırıldı: {new_capacity}")
+
+    def _needs_compaction(self) -> bool:
+        """Silinen satır oranı eşiği aştıysa True (lock altında çağrılmalıdır)."""
+        return bool(self.size) and self.deleted_count / self.size >= self.compaction_threshold
+
+    def _schedule_compaction(self) -> None:
+        """
+        Arka planda sıkıştırma başlatır (zaten çalışıyorsa bir şey yapmaz).
+
+        Eşzamanlı değişiklik nedeniyle iptal edilen sıkıştırma, silinen oran
+        eşiğin üzerinde kaldıkça `compaction_retry_delay` saniye sonra
+        yeniden denenir.
+        """
+        if self._compaction_thread is not None:
+            return
         
-        # Mapping'leri güncelle
-        self.id_to_index = new_id_to_index
-        self.index_to_id = new_index_to_id
-        self.next_index = len(self.index)
+        def _run():
+            while True:
+                try:
+                    self.compact()
+                except Exception as e:
+                    logger.error(f"Flat indeks sıkıştırma hatası: {str(e)}")
+                    with self.index_lock:
+                        self._compaction_thread = None
+                    return
+                
+                with self.index_lock:
+                    if not self._needs_compaction():
+                        self._compaction_thread = None
+                        return
+                time.sleep(self.compaction_retry_delay)
+        
+        self._compaction_thread = threading.Thread(target=_run, name="flat-index-compaction", daemon=True)
+        self._compaction_thread.start()
 
 
 class HNSWIndex(VectorIndexManager):
-    """HNSW (Hierarchical Navigable Small World) vektör indeksi."""
+    """
+    HNSW (Hierarchical Navigable Small World) vektör indeksi.
+
+    `index_path` verilirse graf ve ID eşleştirmeleri atomik anlık görüntüler
+    halinde diske yazılır; son anlık görüntüden sonraki eklemeler, güncellemeler
+    ve silmeler WAL dosyalarına kaydedilir. Yeniden başlatmada son anlık görüntü
+    yüklenir ve WAL yeniden oynatılır. Silinmiş oranı `compaction_threshold`
+    değerini aşınca graf arka planda canlı vektörlerle yeniden inşa edilir.
+    """
+
+    snapshot_file = "hnsw_index.bin"
+    state_file = "hnsw_state.pkl"
+    current_file = "CURRENT"
+    state_version = 1
+    compaction_chunk_size = 10000
 
     def initialize(self) -> None:
-        """İndeksi başlatır."""
+        """İndeksi başlatır, kalıcı durum varsa yükler."""
         try:
             import hnswlib
             self.hnswlib = hnswlib
@@ -337,27 +773,61 @@ class HNSWIndex(VectorIndexManager):
         
         # Metrik türünü HNSW formatına dönüştür
         if self.metric_type == "cosine":
-            space = "cosine"
+            self.space = "cosine"
         elif self.metric_type == "l2":
-            space = "l2"
+            self.space = "l2"
         elif self.metric_type == "dot":
-            space = "ip"  # Inner product (hnswlib'de dot product için)
+            self.space = "ip"  # Inner product (hnswlib'de dot product için)
         else:
             raise ValueError(f"HNSW için desteklenmeyen metrik türü: {self.metric_type}")
         
-        # HNSW indeksini oluştur
-        self.index = self.hnswlib.Index(space=space, dim=self.dimension)
+        self.index_path = getattr(self.config, "index_path", None)
+        self.snapshot_interval = getattr(self.config, "snapshot_interval", 300.0)
+        self.compaction_threshold = getattr(self.config, "compaction_threshold", 0.25)
         
-        # Başlangıç kapasitesi (otomatik olarak büyüyecektir)
-        initial_capacity = 1000
-        self.index.init_index(max_elements=initial_capacity, ef_construction=self.config.ef_construction, M=self.config.m_parameter)
+        self.deleted_count = 0
+        self.last_snapshot_time = None
+        self._wal = None
+        self._wal_segment = 0
+        self._compaction_journal = None
+        self._compaction_thread = None
+        self._snapshot_thread = None
+        self._snapshot_lock = threading.Lock()
+        self._stop_event = threading.Event()
         
-        # Arama parametresi
-        self.index.set_ef(self.config.ef_search)
+        with self.index_lock:
+            if self.index_path and os.path.exists(os.path.join(self.index_path, self.current_file)):
+                self._load_snapshot()
+            else:
+                # Başlangıç kapasitesi (otomatik olarak büyüyecektir)
+                self.index = self._new_graph(1000)
+            
+            if self.index_path:
+                os.makedirs(self.index_path, exist_ok=True)
+                # İlk anlık görüntüden önce çökülmüşse tüm WAL dosyaları oynatılır
+                self._replay_wal()
+                self._open_wal(self._last_wal_segment() + 1)
         
         self.is_initialized = True
-        self.current_capacity = initial_capacity
         logger.info(f"HNSW indeks başlatıldı: dim={self.dimension}, M={self.config.m_parameter}, ef_construction={self.config.ef_construction}")
+        
+        if self.index_path and self.snapshot_interval > 0:
+            self._snapshot_thread = threading.Thread(target=self._snapshot_loop, name="hnsw-index-snapshot", daemon=True)
+            self._snapshot_thread.start()
+        
+        with self.index_lock:
+            if self._needs_compaction():
+                self._schedule_compaction()
+
+    @property
+    def current_capacity(self) -> int:
+        """Grafın mevcut eleman kapasitesi."""
+        return self.index.get_max_elements()
+
+    @property
+    def vector_count(self) -> int:
+        """Silinmemiş vektör sayısı."""
+        return len(self.id_to_index)
 
     def add_vectors(self, vector_ids: List[str], vectors: List[np.ndarray]) -> None:
         """
@@ -370,25 +840,12 @@ class HNSWIndex(VectorIndexManager):
         if not vectors:
             return
         
+        # Vektörleri numpy dizisine dönüştür
+        vectors_array = np.array([v for v in vectors], dtype=np.float32)
+        
         with self.index_lock:
-            # Mevcut kapasite kontrolü
-            required_capacity = self.next_index + len(vectors)
-            if required_capacity > self.current_capacity:
-                # Kapasiteyi artır (2 kat veya ihtiyaç duyulan miktarın 1.5 katı, hangisi büyükse)
-                new_capacity = max(self.current_capacity * 2, int(required_capacity * 1.5))
-                self.index.resize_index(new_capacity)
-                self.current_capacity = new_capacity
-                logger.info(f"HNSW indeks kapasitesi artırıldı: {self.current_capacity}")
-            
-            # Vektörleri numpy dizisine dönüştür
-            vectors_array = np.array([v for v in vectors], dtype=np.float32)
-            
-            # ID'leri kaydet ve indeks konumlarını al
-            id_to_idx = self._register_vectors(vector_ids, self.next_index)
-            
-            # Vektörleri indekse ekle
-            indices = list(id_to_idx.values())
-            self.index.add_items(vectors_array, indices)
+            self._log("add", (list(vector_ids), vectors_array))
+            self._apply_add(list(vector_ids), vectors_array)
             
             logger.info(f"HNSW indekse {len(vectors)} vektör eklendi")
 
@@ -404,15 +861,16 @@ class HNSWIndex(VectorIndexManager):
             return
         
         with self.index_lock:
-            # Her vektörü güncelle
-            for vector_id, vector in zip(vector_ids, vectors):
-                if vector_id in self.id_to_index:
-                    idx = self.id_to_index[vector_id]
-                    # HNSW güncellemesi
-                    self.index.mark_deleted(idx)  # Eski vektörü sil
-                    self.index.add_items(np.array([vector]), np.array([idx]))  # Yeni vektörü ekle
+            pairs = [(vector_id, vector) for vector_id, vector in zip(vector_ids, vectors) if vector_id in self.id_to_index]
+            if not pairs:
+                return
+            
+            update_ids = [vector_id for vector_id, _ in pairs]
+            vectors_array = np.array([vector for _, vector in pairs], dtype=np.float32)
+            self._log("update", (update_ids, vectors_array))
+            self._apply_update(update_ids, vectors_array)
             
-            logger.info(f"HNSW indekste {len(vectors)} vektör güncellendi")
+            logger.info(f"HNSW indekste {len(pairs)} vektör güncellendi")
 
     def delete_vectors(self, vector_ids: List[str]) -> None:
         """
@@ -425,20 +883,16 @@ class HNSWIndex(VectorIndexManager):
             return
         
         with self.index_lock:
-            # Silinecek indeksleri topla
-            deleted_count = 0
-            for vector_id in vector_ids:
-                if vector_id in self.id_to_index:
-                    idx = self.id_to_index[vector_id]
-                    # HNSW'den sil
-                    self.index.mark_deleted(idx)
-                    # Mapping'lerden kaldır
-                    del self.id_to_index[vector_id]
-                    del self.index_to_id[idx]
-                    deleted_count += 1
+            delete_ids = [vector_id for vector_id in vector_ids if vector_id in self.id_to_index]
+            if not delete_ids:
+                return
             
-            if deleted_count > 0:
-                logger.info(f"HNSW indeksten {deleted_count} vektör silindi")
+            self._log("delete", delete_ids)
+            deleted_count = self._apply_delete(delete_ids)
+            logger.info(f"HNSW indeksten {deleted_count} vektör silindi")
+            
+            if self._needs_compaction():
+                self._schedule_compaction()
 
     def query(self, query_vector: np.ndarray, top_k: int = 10) -> List[Dict[str, Any]]:
         """
@@ -451,12 +905,9 @@ class HNSWIndex(VectorIndexManager):
         Returns:
             List[Dict[str, Any]]: Arama sonuçları (vector_id ve distance içerir)
         """
-        if self.next_index == 0:
-            return []
-        
         with self.index_lock:
-            # K değerini mevcut vektör sayısına göre sınırla
-            actual_k = min(top_k, self.next_index)
+            # K değerini silinmemiş vektör sayısına göre sınırla
+            actual_k = min(top_k, self.vector_count)
             if actual_k == 0:
                 return []
             
@@ -470,8 +921,8 @@ class HNSWIndex(VectorIndexManager):
             # Sonuçları oluştur
             results = []
             for idx, distance in zip(labels[0], distances[0]):
-                if idx in self.index_to_id:
-                    vector_id = self.index_to_id[idx]
+                vector_id = self.index_to_id.get(int(idx))
+                if vector_id is not None:
                     results.append({
                         "vector_id": vector_id,
                         "distance": float(distance)
@@ -479,6 +930,157 @@ class HNSWIndex(VectorIndexManager):
             
             return results
 
+    def query_batch(self, query_matrix: np.ndarray, top_k: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Birden fazla sorgu için tek bir toplu knn_query çağrısı yapar.
+        
+        Args:
+            query_matrix: Sorgu vektörleri (n_queries x dimension)
+            top_k: Her sorgu için getirilecek en fazla sonuç sayısı
+            
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: vector_id ve mesafe dizileri
+        """
+        queries = self._prepare_query_matrix(query_matrix)
+        
+        with self.index_lock:
+            # K değerini silinmemiş vektör sayısına göre sınırla
+            actual_k = min(top_k, self.vector_count)
+            if len(queries) == 0 or actual_k <= 0:
+                return self._empty_batch_result(len(queries), top_k)
+            
+            try:
+                labels, distances = self.index.knn_query(queries, k=actual_k)
+            except Exception as e:
+                logger.error(f"HNSW toplu arama hatası: {str(e)}")
+                return self._empty_batch_result(len(queries), top_k)
+            
+            return self._pack_batch_results(labels.astype(np.int64), distances, top_k)
+
+    def save(self) -> Optional[str]:
+        """
+        Graf ve ID eşleştirmelerinin anlık görüntüsünü atomik olarak yazar.
+
+        Graf lock altında geçici bir dizine kaydedilir ve aynı anda yeni bir
+        WAL dosyasına geçilir. Dizin yeniden adlandırılıp CURRENT dosyası
+        güncellendikten sonra eski anlık görüntüler ve WAL dosyaları silinir;
+        bu adımlardan önce çökülürse önceki anlık görüntü ve WAL geçerli kalır.
+        
+        Returns:
+            Optional[str]: Anlık görüntü dizini (kalıcılık kapalıysa None)
+        """
+        if not self.index_path:
+            return None
+        
+        with self._snapshot_lock:
+            with self.index_lock:
+                segment = self._wal_segment + 1
+                snapshot_dir = os.path.join(self.index_path, f"snapshot-{segment:08d}")
+                tmp_dir = snapshot_dir + ".tmp"
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                os.makedirs(tmp_dir)
+                
+                self.index.save_index(os.path.join(tmp_dir, self.snapshot_file))
+                state = {
+                    "version": self.state_version,
+                    "dimension": self.dimension,
+                    "metric_type": self.metric_type,
+                    "id_to_index": self.id_to_index,
+                    "next_index": self.next_index,
+                    "deleted_count": self.deleted_count,
+                    "wal_segment": segment
+                }
+                with open(os.path.join(tmp_dir, self.state_file), "wb") as f:
+                    pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+                
+                # Bu noktadan sonraki değişiklikler yeni WAL dosyasına yazılır
+                self._open_wal(segment)
+            
+            for name in (self.snapshot_file, self.state_file):
+                _fsync_path(os.path.join(tmp_dir, name))
+            os.replace(tmp_dir, snapshot_dir)
+            _fsync_path(self.index_path)
+            
+            current_path = os.path.join(self.index_path, self.current_file)
+            with open(current_path + ".tmp", "w") as f:
+                f.write(os.path.basename(snapshot_dir))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(current_path + ".tmp", current_path)
+            _fsync_path(self.index_path)
+            
+            self._remove_stale_files(segment)
+            self.last_snapshot_time = time.time()
+            
+            logger.info(f"HNSW indeks anlık görüntüsü kaydedildi: {snapshot_dir}")
+            return snapshot_dir
+
+    def compact(self) -> int:
+        """
+        Silinmiş vektörleri içermeyen yeni bir graf inşa eder.
+
+        Canlı vektörler bloklar halinde okunup yeni grafa lock dışında eklenir;
+        bu sırada yapılan değişiklikler günlüğe alınır ve değiştirme anında yeni
+        grafa uygulanır. Etiketler korunduğundan ID eşleştirmeleri değişmez.
+        
+        Returns:
+            int: Kaldırılan silinmiş eleman sayısı
+        """
+        with self.index_lock:
+            if self.deleted_count == 0 or self._compaction_journal is not None:
+                return 0
+            labels = np.fromiter(self.index_to_id.keys(), dtype=np.int64, count=len(self.index_to_id))
+            removed = self.deleted_count
+            self._compaction_journal = []
+        
+        try:
+            graph = self._new_graph(max(1000, len(labels)))
+            
+            for start in range(0, len(labels), self.compaction_chunk_size):
+                with self.index_lock:
+                    # Okumadan önce silinenler atlanır (günlükte zaten yer alırlar)
+                    chunk = [int(label) for label in labels[start:start + self.compaction_chunk_size] if int(label) in self.index_to_id]
+                    vectors = self.index.get_items(chunk) if chunk else None
+                if chunk:
+                    graph.add_items(np.asarray(vectors, dtype=np.float32), chunk)
+            
+            with self.index_lock:
+                deleted_count = 0
+                for operation, chunk, vectors in self._compaction_journal:
+                    if operation == "add":
+                        self._ensure_graph_capacity(graph, len(chunk))
+                        graph.add_items(vectors, chunk)
+                    else:
+                        for label in chunk:
+                            try:
+                                graph.mark_deleted(label)
+                                deleted_count += 1
+                            except RuntimeError:
+                                # Kopyalanmadan önce silinen etiket yeni grafta yok
+                                pass
+                
+                self.index = graph
+                self.deleted_count = deleted_count
+                logger.info(f"HNSW indeks sıkıştırıldı: {removed} silinmiş eleman kaldırıldı")
+        finally:
+            with self.index_lock:
+                self._compaction_journal = None
+        
+        return removed
+
+    def close(self) -> None:
+        """Arka plan işlerini durdurur, son anlık görüntüyü yazar ve WAL'ı kapatır."""
+        self._stop_event.set()
+        for thread in (self._snapshot_thread, self._compaction_thread):
+            if thread is not None:
+                thread.join()
+        
+        if self._wal is not None:
+            if self._wal.records:
+                self.save()
+            self._wal.close()
+            self._wal = None
+
     def stats(self) -> Dict[str, Any]:
         """
         İndeks istatistiklerini döndürür.
@@ -490,18 +1092,242 @@ class HNSWIndex(VectorIndexManager):
             # HNSW'ye özgü istatistikler
             return {
                 "type": "hnsw",
-                "vector_count": self.next_index,
+                "vector_count": self.vector_count,
                 "dimension": self.dimension,
                 "metric_type": self.metric_type,
                 "capacity": self.current_capacity,
+                "deleted_count": self.deleted_count,
                 "m_parameter": self.config.m_parameter,
                 "ef_construction": self.config.ef_construction,
-                "ef_search": self.config.ef_search
+                "ef_search": self.config.ef_search,
+                "index_path": self.index_path,
+                "wal_records": self._wal.records if self._wal is not None else 0,
+                "last_snapshot_time": self.last_snapshot_time,
+                "compaction_running": self._compaction_thread is not None
             }
 
+    def _new_graph(self, capacity: int):
+        """Yapılandırmaya göre boş bir HNSW grafı oluşturur."""
+        graph = self.hnswlib.Index(space=self.space, dim=self.dimension)
+        graph.init_index(max_elements=capacity, ef_construction=self.config.ef_construction, M=self.config.m_parameter)
+        
+        # Arama parametresi
+        graph.set_ef(self.config.ef_search)
+        return graph
 
-class IVFIndex(VectorIndexManager):
-    """IVF (Inverted File Index) vektör indeksi."""
+    def _ensure_graph_capacity(self, graph, count: int) -> None:
+        """Graf kapasitesini gerekirse artırır (2 kat veya ihtiyacın 1.5 katı)."""
+        required_capacity = graph.element_count + count
+        if required_capacity > graph.get_max_elements():
+            new_capacity = max(graph.get_max_elements() * 2, int(required_capacity * 1.5))
+            graph.resize_index(new_capacity)
+            logger.info(f"HNSW indeks kapasitesi artırıldı: {new_capacity}")
+
+    def _apply_add(self, vector_ids: List[str], vectors_array: np.ndarray) -> None:
+        """Eklemeyi grafa uygular (lock altında çağrılmalıdır)."""
+        # Aynı ID tekrar eklenirse eski etiket silinmiş sayılır
+        self._apply_delete([vector_id for vector_id in vector_ids if vector_id in self.id_to_index])
+        
+        self._ensure_graph_capacity(self.index, len(vector_ids))
+        
+        # ID'leri kaydet ve indeks konumlarını al
+        id_to_idx = self._register_vectors(vector_ids, self.next_index)
+        
+        # Vektörleri indekse ekle
+        indices = list(id_to_idx.values())
+        self.index.add_items(vectors_array, indices)
+        self._journal("add", indices, vectors_array)
+
+    def _apply_update(self, vector_ids: List[str], vectors_array: np.ndarray) -> None:
+        """Güncellemeyi grafa uygular (lock altında çağrılmalıdır)."""
+        indices = [self.id_to_index[vector_id] for vector_id in vector_ids]
+        
+        # Mevcut etiketle eklemek grafta vektörü yerinde günceller
+        self.index.add_items(vectors_array, indices)
+        self._journal("add", indices, vectors_array)
+
+    def _apply_delete(self, vector_ids: List[str]) -> int:
+        """
+        Silmeyi grafa uygular (lock altında çağrılmalıdır).
+        
+        Returns:
+            int: Silinen vektör sayısı
+        """
+        indices = []
+        for vector_id in vector_ids:
+            idx = self.id_to_index.pop(vector_id, None)
+            if idx is not None:
+                # HNSW'den sil ve mapping'lerden kaldır
+                self.index.mark_deleted(idx)
+                del self.index_to_id[idx]
+                indices.append(idx)
+        
+        self.deleted_count += len(indices)
+        if indices:
+            self._journal("delete", indices, None)
+        return len(indices)
+
+    def _journal(self, operation: str, indices: List[int], vectors: Optional[np.ndarray]) -> None:
+        """Sıkıştırma sürerken yapılan değişikliği kaydeder."""
+        if self._compaction_journal is not None:
+            self._compaction_journal.append((operation, list(indices), vectors))
+
+    def _log(self, operation: str, payload: Any) -> None:
+        """Değişikliği uygulanmadan önce WAL'a yazar (lock altında çağrılmalıdır)."""
+        if self._wal is not None:
+            self._wal.append(operation, payload)
+
+    def _load_snapshot(self) -> None:
+        """CURRENT dosyasının gösterdiği anlık görüntüyü yükler."""
+        with open(os.path.join(self.index_path, self.current_file)) as f:
+            snapshot_dir = os.path.join(self.index_path, f.read().strip())
+        
+        with open(os.path.join(snapshot_dir, self.state_file), "rb") as f:
+            state = pickle.load(f)
+        
+        if state["dimension"] != self.dimension or state["metric_type"] != self.metric_type:
+            raise ValueError(
+                f"HNSW anlık görüntüsü yapılandırmayla uyumsuz: dim={state['dimension']}, metric={state['metric_type']}"
+            )
+        
+        self.index = self.hnswlib.Index(space=self.space, dim=self.dimension)
+        self.index.load_index(os.path.join(snapshot_dir, self.snapshot_file))
+        self.index.set_ef(self.config.ef_search)
+        
+        self.id_to_index = state["id_to_index"]
+        self.index_to_id = {idx: vector_id for vector_id, idx in self.id_to_index.items()}
+        self.next_index = state["next_index"]
+        self.deleted_count = state["deleted_count"]
+        self._wal_segment = state["wal_segment"]
+        self.last_snapshot_time = os.path.getmtime(os.path.join(snapshot_dir, self.state_file))
+        
+        logger.info(f"HNSW indeks anlık görüntüsü yüklendi: {snapshot_dir}, {self.vector_count} vektör")
+
+    def _replay_wal(self) -> None:
+        """Anlık görüntüden sonraki WAL kayıtlarını sırayla uygular."""
+        replayed = 0
+        for segment in self._wal_segments():
+            if segment < self._wal_segment:
+                continue
+            
+            for operation, payload in WriteAheadLog.read(self._wal_path(segment)):
+                if operation == "add":
+                    self._apply_add(*payload)
+                elif operation == "update":
+                    self._apply_update(*payload)
+                elif operation == "delete":
+                    self._apply_delete(payload)
+                replayed += 1
+        
+        if replayed:
+            logger.info(f"HNSW indekse WAL'dan {replayed} kayıt yeniden uygulandı")
+
+    def _open_wal(self, segment: int) -> None:
+        """Yeni bir WAL dosyasına geçer (lock altında çağrılmalıdır)."""
+        if self._wal is not None:
+            self._wal.close()
+        
+        self._wal = WriteAheadLog(self._wal_path(segment), fsync=getattr(self.config, "wal_fsync", False))
+        self._wal_segment = segment
+
+    def _wal_path(self, segment: int) -> str:
+        return os.path.join(self.index_path, f"wal-{segment:08d}.log")
+
+    def _wal_segments(self) -> List[int]:
+        """Dizindeki WAL dosyalarının sıralı segment numaraları."""
+        segments = []
+        for name in os.listdir(self.index_path):
+            if name.startswith("wal-") and name.endswith(".log"):
+                segments.append(int(name[4:-4]))
+        return sorted(segments)
+
+    def _last_wal_segment(self) -> int:
+        segments = self._wal_segments()
+        return max(segments[-1] if segments else 0, self._wal_segment)
+
+    def _remove_stale_files(self, segment: int) -> None:
+        """Geçerli anlık görüntüden eski anlık görüntüleri ve WAL dosyalarını siler."""
+        current = f"snapshot-{segment:08d}"
+        for name in os.listdir(self.index_path):
+            path = os.path.join(self.index_path, name)
+            if name.startswith("snapshot-") and name != current:
+                shutil.rmtree(path, ignore_errors=True)
+            elif name.startswith("wal-") and name.endswith(".log") and int(name[4:-4]) < segment:
+                os.remove(path)
+
+    def _needs_compaction(self) -> bool:
+        """Silinmiş eleman oranı eşiği aştıysa True."""
+        total = self.index.element_count
+        return bool(self.compaction_threshold) and total > 0 and self.deleted_count / total > self.compaction_threshold
+
+    def _schedule_compaction(self) -> None:
+        """Arka planda sıkıştırma başlatır (zaten çalışıyorsa bir şey yapmaz)."""
+        if self._compaction_thread is not None:
+            return
+        
+        def _run():
+            try:
+                if self.compact() and self.index_path:
+                    self.save()
+            except Exception as e:
+                logger.error(f"HNSW indeks sıkıştırma hatası: {str(e)}")
+            finally:
+                with self.index_lock:
+                    self._compaction_thread = None
+        
+        self._compaction_thread = threading.Thread(target=_run, name="hnsw-index-compaction", daemon=True)
+        self._compaction_thread.start()
+
+    def _snapshot_loop(self) -> None:
+        """Değişiklik varsa belirli aralıklarla anlık görüntü alır."""
+        while not self._stop_event.wait(self.snapshot_interval):
+            if self._wal is None or not self._wal.records:
+                continue
+            try:
+                self.save()
+            except Exception as e:
+                logger.error(f"HNSW anlık görüntü hatası: {str(e)}")
+
+
+def _fsync_path(path: str) -> None:
+    """Dosya veya dizini diske yazar (dizin fsync'i desteklenmiyorsa atlanır)."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class TrainedFaissIndex(VectorIndexManager):
+    """
+    Eğitim gerektiren faiss indeksleri (IVF, PQ, IVFPQ) için ortak yaşam döngüsü.
+
+    Eğitim için yeterli vektör birikene kadar vektörler düz bir indekste
+    tamponlanır ve arama tam doğrulukla yapılır. Eşik aşıldığında eklenen
+    tüm vektörlerden rezervuar örneklemesiyle seçilmiş gerçek vektörlerle
+    arka planda eğitim yapılır, vektörler toplu olarak eğitilmiş indekse
+    taşınır ve tampon bırakılır. Ham vektörler istenirse mmap dosyasında
+    tutulur.
+
+    Eğitimden sonra eklenen vektörlerin nicemleme hatası izlenir; hata
+    eğitim örneğindeki değerin `drift_threshold` katını aşarsa indeks aynı
+    şekilde arka planda yeniden eğitilir. Eğitim sürerken gelen ekleme ve
+    silmeler günlüğe yazılır ve yeni indekse geçmeden önce uygulanır.
+
+    Vektörler faiss'e kalıcı tamsayı etiketlerle eklenir; silme ve
+    güncelleme indeksi yeniden eğitmez.
+
+    `rescore_oversample` > 1 ise arama iki aşamalıdır: sıkıştırılmış
+    indeksten `top_k * rescore_oversample` aday alınır ve adaylar mmap
+    deposundaki float32 vektörlerle tam doğrulukla yeniden puanlanır.
+    """
+
+    index_label = "faiss"
 
     def initialize(self) -> None:
         """İndeksi başlatır."""
@@ -514,33 +1340,52 @@ class IVFIndex(VectorIndexManager):
         
         # Metrik türünü faiss formatına dönüştür
         if self.metric_type == "l2":
-            metric = self.faiss.METRIC_L2
+            self.metric = self.faiss.METRIC_L2
         elif self.metric_type == "cosine" or self.metric_type == "dot":
-            metric = self.faiss.METRIC_INNER_PRODUCT
+            self.metric = self.faiss.METRIC_INNER_PRODUCT
         else:
-            raise ValueError(f"IVF için desteklenmeyen metrik türü: {self.metric_type}")
+            raise ValueError(f"{self.index_label} için desteklenmeyen metrik türü: {self.metric_type}")
         
-        # Bölüm sayısı
-        nlist = self.config.num_partitions
+        self._configure()
         
-        # IVF indeksini oluştur
-        self.quantizer = self.faiss.IndexFlatL2(self.dimension)
-        self.index = self.faiss.IndexIVFFlat(self.quantizer, self.dimension, nlist, metric)
+        # Eğitim parametreleri
+        self.training_threshold = getattr(self.config, "training_threshold", 0) or self._default_training_threshold()
+        self.training_sample_size = max(getattr(self.config, "training_sample_size", 50000), self.training_threshold)
+        self.drift_threshold = getattr(self.config, "drift_threshold", 1.5)
+        self.drift_window = max(256, self.training_threshold // 10)
         
-        # Eğitim için boş vektörler
-        # Not: Gerçek veri ile eğitim daha sonra yapılacak
-        empty_vectors = np.zeros((max(nlist, 100), self.dimension), dtype=np.float32)
-        self.index.train(empty_vectors)
+        # Rezervuar örneği (yalnızca ilk self._sample_count satırı geçerli)
+        self._rng = np.random.default_rng()
+        self._sample = np.zeros((0, self.dimension), dtype=np.float32)
+        self._sample_count = 0
+        self._sample_seen = 0
         
-        # Arama parametresi
-        self.index.nprobe = min(nlist, 10)  # Aramalarda incelenecek bölüm sayısı
+        # İki aşamalı arama için aday çarpanı (yeniden puanlama ham vektör gerektirir)
+        self.rescore_oversample = getattr(self.config, "rescore_oversample", 0)
         
-        self.is_initialized = True
+        # Ham vektörler (isteğe bağlı mmap deposu)
+        self.raw_vectors = None
+        if getattr(self.config, "keep_raw_vectors", False) or self.rescore_oversample > 1:
+            self.raw_vectors = MmapVectorStore(self.dimension, getattr(self.config, "raw_vector_path", None))
+        
+        # Eğitim öncesi tampon indeks
+        self.index = self.faiss.IndexIDMap2(self.faiss.IndexFlat(self.dimension, self.metric))
         self.is_trained_with_real_data = False
-        logger.info(f"IVF indeks başlatıldı: dim={self.dimension}, nlist={nlist}")
+        self.training_count = 0
+        self.training_error = None
+        self.drift_error = None
         
-        # Vektör verilerini saklamak için numpy dizisi
-        self.vectors = np.zeros((0, self.dimension), dtype=np.float32)
+        # Arka plan eğitimi
+        self._training_thread = None
+        self._journal = None
+        
+        self.is_initialized = True
+        logger.info(f"{self.index_label} indeks başlatıldı: dim={self.dimension}, eğitim eşiği={self.training_threshold}")
+
+    @property
+    def vector_count(self) -> int:
+        """İndeksteki vektör sayısı."""
+        return len(self.id_to_index)
 
     def add_vectors(self, vector_ids: List[str], vectors: List[np.ndarray]) -> None:
         """
@@ -553,36 +1398,31 @@ class IVFIndex(VectorIndexManager):
         if not vectors:
             return
         
+        # Vektörleri numpy dizisine dönüştür (lock dışında)
+        vectors_array = self._prepare_vectors(vectors)
+        
         with self.index_lock:
-            # Vektörleri numpy dizisine dönüştür
-            vectors_array = np.array([v for v in vectors], dtype=np.float32)
+            # Aynı ID tekrar eklenirse eski vektör kaldırılır
+            self._remove_ids([vector_id for vector_id in vector_ids if vector_id in self.id_to_index])
             
-            # ID'leri kaydet
-            self._register_vectors(vector_ids, self.next_index)
-            
-            # Cosine benzerliği için normalizasyon
-            if self.metric_type == "cosine":
-                # Vektörleri normalize et
-                norms = np.linalg.norm(vectors_array, axis=1, keepdims=True)
-                vectors_array = vectors_array / np.maximum(norms, 1e-10)
+            start = self.next_index
+            self._register_vectors(vector_ids, start)
+            labels = np.arange(start, start + len(vector_ids), dtype=np.int64)
             
-            # Vektörleri sakla
-            self.vectors = np.vstack((self.vectors, vectors_array))
+            self.index.add_with_ids(vectors_array, labels)
+            if self.raw_vectors is not None:
+                self.raw_vectors.write(labels, vectors_array)
+            if self._journal is not None:
+                self._journal.append(("add", labels, vectors_array))
             
-            # Vektörleri indekse ekle
-            self.index.add(vectors_array)
+            self._update_sample(vectors_array)
+            if self.is_trained_with_real_data:
+                self._track_drift(vectors_array)
             
-            # Eğer indeks henüz gerçek verilerle eğitilmediyse ve yeterli veri varsa
-            if not self.is_trained_with_real_data and len(self.vectors) >= self.config.num_partitions:
-                # İndeksi gerçek verilerle yeniden eğit
-                self.index.reset()
-                self.index.train(self.vectors)
-                # Tüm vektörleri tekrar ekle
-                self.index.add(self.vectors)
-                self.is_trained_with_real_data = True
-                logger.info(f"IVF indeks gerçek verilerle eğitildi: {len(self.vectors)} vektör")
+            if self._needs_training():
+                self._schedule_training()
             
-            logger.info(f"IVF indekse {len(vectors)} vektör eklendi")
+            logger.info(f"{self.index_label} indekse {len(vectors)} vektör eklendi")
 
     def update_vectors(self, vector_ids: List[str], vectors: List[np.ndarray]) -> None:
         """
@@ -596,31 +1436,11 @@ class IVFIndex(VectorIndexManager):
             return
         
         with self.index_lock:
-            # Faiss IVF indeksinde doğrudan güncelleme yok
-            # İndeksi yeniden oluşturmamız gerekiyor
-            
-            # Her vektörü güncelle
-            updated_indices = []
-            for vector_id, vector in zip(vector_ids, vectors):
-                if vector_id in self.id_to_index:
-                    idx = self.id_to_index[vector_id]
-                    updated_indices.append(idx)
-                    
-                    # Vektörü numpy dizisinde güncelle
-                    if self.metric_type == "cosine":
-                        # Cosine benzerliği için normalize et
-                        norm = np.linalg.norm(vector)
-                        if norm > 0:
-                            self.vectors[idx] = vector / norm
-                    else:
-                        self.vectors[idx] = vector
-            
-            if updated_indices:
-                # İndeksi yeniden oluştur
-                self.index.reset()
-                self.index.train(self.vectors)
-                self.index.add(self.vectors)
-                logger.info(f"IVF indekste {len(updated_indices)} vektör güncellendi (indeks yeniden oluşturuldu)")
+            pairs = [(vector_id, vector) for vector_id, vector in zip(vector_ids, vectors) if vector_id in self.id_to_index]
+            if pairs:
+                # Eski vektör kaldırılıp yeni etiketle eklenir
+                self.add_vectors([vector_id for vector_id, _ in pairs], [vector for _, vector in pairs])
+                logger.info(f"{self.index_label} indekste {len(pairs)} vektör güncellendi")
 
     def delete_vectors(self, vector_ids: List[str]) -> None:
         """
@@ -633,34 +1453,9 @@ class IVFIndex(VectorIndexManager):
             return
         
         with self.index_lock:
-            # Silinecek indeksleri topla
-            deleted_indices = []
-            for vector_id in vector_ids:
-                if vector_id in self.id_to_index:
-                    idx = self.id_to_index[vector_id]
-                    deleted_indices.append(idx)
-                    # Mapping'lerden kaldır
-                    del self.id_to_index[vector_id]
-                    del self.index_to_id[idx]
-            
-            if deleted_indices:
-                # Silinecek olmayan vektörleri seç
-                mask = np.ones(len(self.vectors), dtype=bool)
-                mask[deleted_indices] = False
-                
-                # Maskeyi uygula
-                self.vectors = self.vectors[mask]
-                
-                # Mapping'leri güncelle
-                self._rebuild_mappings()
-                
-                # İndeksi yeniden oluştur
-                self.index.reset()
-                if len(self.vectors) > 0:
-                    self.index.train(self.vectors)
-                    self.index.add(self.vectors)
-                
-                logger.info(f"IVF indeksten {len(deleted_indices)} vektör silindi (indeks yeniden oluşturuldu)")
+            deleted = self._remove_ids(vector_ids)
+            if deleted:
+                logger.info(f"{self.index_label} indeksten {deleted} vektör silindi")
 
     def query(self, query_vector: np.ndarray, top_k: int = 10) -> List[Dict[str, Any]]:
         """
@@ -673,48 +1468,95 @@ class IVFIndex(VectorIndexManager):
         Returns:
             List[Dict[str, Any]]: Arama sonuçları (vector_id ve distance içerir)
         """
-        if len(self.vectors) == 0:
+        ids, distances = self.query_batch(query_vector, top_k)
+        if len(ids) == 0:
             return []
         
+        return [
+            {"vector_id": vector_id, "distance": float(distance)}
+            for vector_id, distance in zip(ids[0], distances[0])
+            if vector_id is not None
+        ]
+
+    def query_batch(self, query_matrix: np.ndarray, top_k: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Birden fazla sorgu için tek bir toplu faiss araması yapar.
+        
+        Args:
+            query_matrix: Sorgu vektörleri (n_queries x dimension)
+            top_k: Her sorgu için getirilecek en fazla sonuç sayısı
+            
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: vector_id ve mesafe dizileri
+        """
+        if self._uses_rescoring():
+            return _faiss_query_batch(
+                self, query_matrix, top_k, self.index_label,
+                oversample=self.rescore_oversample, rescore=self._rescore
+            )
+        return _faiss_query_batch(self, query_matrix, top_k, self.index_label)
+
+    def train(self) -> bool:
+        """
+        İndeksi rezervuar örneğiyle eğitir ve vektörleri yeni indekse taşır.
+
+        Ağır iş (eğitim ve toplu ekleme) lock dışında yapılır; bu sırada
+        gelen değişiklikler günlükten yeni indekse uygulanır.
+        
+        Returns:
+            bool: Eğitim yapıldıysa True
+        """
         with self.index_lock:
-            # Sorgu vektörünü hazırla
-            query = query_vector.reshape(1, -1).astype(np.float32)
+            if self._sample_count == 0 or self._journal is not None:
+                return False
             
-            # Cosine benzerliği için normalize
-            if self.metric_type == "cosine":
-                query_norm = np.linalg.norm(query)
-                if query_norm > 0:
-                    query = query / query_norm
-            
-            # K değerini mevcut vektör sayısına göre sınırla
-            actual_k = min(top_k, len(self.vectors))
-            if actual_k == 0:
-                return []
-            
-            # Faiss araması yap
-            try:
-                distances, indices = self.index.search(query, actual_k)
-            except Exception as e:
-                logger.error(f"IVF arama hatası: {str(e)}")
-                return []
-            
-            # Sonuçları oluştur
-            results = []
-            for idx, distance in zip(indices[0], distances[0]):
-                if idx != -1 and idx in self.index_to_id:  # -1, bulunamayan sonuçlar için
-                    vector_id = self.index_to_id[idx]
-                    
-                    # Dot ürünü benzerliği mesafeye dönüştür
-                    if self.metric_type == "dot":
-                        # Dot product yüksek = düşük mesafe
-                        distance = -distance
-                    
-                    results.append({
-                        "vector_id": vector_id,
-                        "distance": float(distance)
-                    })
-            
-            return results
+            sample = self._sample[:self._sample_count].copy()
+            labels = np.fromiter(self.index_to_id.keys(), dtype=np.int64, count=len(self.index_to_id))
+            vectors = self._read_vectors(labels)
+            self._journal = []
+        
+        try:
+            new_index = self._create_index()
+            new_index.train(sample)
+            if len(labels):
+                new_index.add_with_ids(vectors, labels)
+            training_error = self._quantization_error(new_index, sample)
+        except Exception:
+            with self.index_lock:
+                self._journal = None
+            raise
+        
+        with self.index_lock:
+            # Eğitim sırasında yapılan değişiklikleri uygula
+            for operation, journal_labels, journal_vectors in self._journal:
+                if operation == "add":
+                    new_index.add_with_ids(journal_vectors, journal_labels)
+                else:
+                    new_index.remove_ids(journal_labels)
+            
+            self.index = new_index
+            self._journal = None
+            self.is_trained_with_real_data = True
+            self.training_count += 1
+            self.training_error = training_error
+            self.drift_error = None
+            
+            logger.info(
+                f"{self.index_label} indeks {len(sample)} örnek vektörle eğitildi "
+                f"({self.vector_count} vektör taşındı)"
+            )
+            return True
+
+    def wait_for_training(self, timeout: Optional[float] = None) -> None:
+        """
+        Çalışan arka plan eğitiminin bitmesini bekler.
+        
+        Args:
+            timeout: En fazla bekleme süresi (saniye)
+        """
+        thread = self._training_thread
+        if thread is not None:
+            thread.join(timeout=timeout)
 
     def stats(self) -> Dict[str, Any]:
         """
@@ -724,89 +1566,375 @@ class IVFIndex(VectorIndexManager):
             Dict[str, Any]: İstatistikler
         """
         with self.index_lock:
+            code_size = self._codec(self.index).code_size
             return {
-                "type": "ivf",
-                "vector_count": len(self.vectors),
+                "type": self.index_label.lower(),
+                "vector_count": self.vector_count,
                 "dimension": self.dimension,
                 "metric_type": self.metric_type,
-                "num_partitions": self.config.num_partitions,
-                "nprobe": self.index.nprobe,
                 "is_trained_with_real_data": self.is_trained_with_real_data,
-                "memory_usage_mb": self.vectors.nbytes / 1024 / 1024
+                "training_threshold": self.training_threshold,
+                "training_count": self.training_count,
+                "training_running": self._training_thread is not None,
+                "training_error": self.training_error,
+                "drift_error": self.drift_error,
+                "sample_size": self._sample_count,
+                "raw_vectors_path": self.raw_vectors.path if self.raw_vectors is not None else None,
+                "rescore_oversample": self.rescore_oversample if self._uses_rescoring() else 0,
+                "memory_usage_mb": self.index.ntotal * code_size / 1024 / 1024
             }
 
-    def _rebuild_mappings(self) -> None:
-        """ID ve indeks eşleştirmelerini yeniden oluşturur."""
-        # Yeni mapping'ler
-        new_id_to_index = {}
-        new_index_to_id = {}
+    def _configure(self) -> None:
+        """Alt sınıfa özgü parametreleri hazırlar."""
+        pass
+
+    @abstractmethod
+    def _default_training_threshold(self) -> int:
+        """Eğitim için gereken varsayılan vektör sayısı."""
+        pass
+
+    @abstractmethod
+    def _create_index(self):
+        """Eğitilmemiş, etiketle ekleme destekleyen faiss indeksi oluşturur."""
+        pass
+
+    def _codec(self, index):
+        """Etiket sarmalayıcısının altındaki kodlayıcı indeksi döndürür."""
+        if isinstance(index, self.faiss.IndexIDMap2):
+            return self.faiss.downcast_index(index.index)
+        return index
+
+    def _quantization_error(self, index, vectors: np.ndarray) -> float:
+        """Vektörlerin kodlanıp çözülmesiyle oluşan ortalama kare hata."""
+        codec = self._codec(index)
+        decoded = codec.sa_decode(codec.sa_encode(vectors))
+        return float(np.mean(np.sum((vectors - decoded) ** 2, axis=1)))
+
+    def _prepare_vectors(self, vectors: List[np.ndarray]) -> np.ndarray:
+        """Vektörleri float32 matrise dönüştürür, cosine için normalize eder."""
+        vectors_array = np.asarray(vectors, dtype=np.float32).reshape(len(vectors), self.dimension)
+        
+        if self.metric_type == "cosine":
+            norms = np.linalg.norm(vectors_array, axis=1, keepdims=True)
+            vectors_array = vectors_array / np.maximum(norms, 1e-10)
+        
+        return np.ascontiguousarray(vectors_array, dtype=np.float32)
+
+    def _uses_rescoring(self) -> bool:
+        """İki aşamalı aramanın kullanılıp kullanılmayacağı."""
+        # Eğitim öncesi tampon zaten tam doğrulukta arar
+        return (
+            self.rescore_oversample > 1
+            and self.raw_vectors is not None
+            and self.is_trained_with_real_data
+        )
+
+    def _rescore(self, queries: np.ndarray, labels: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Adayları mmap deposundaki ham vektörlerle yeniden puanlar (lock altında)."""
+        return _exact_rescore(queries, labels, top_k, self.raw_vectors.read, self.metric_type)
+
+    def _read_vectors(self, labels: np.ndarray) -> np.ndarray:
+        """
+        Etiketlerin vektörlerini okur (lock altında çağrılmalıdır).
+
+        Ham vektör deposu yoksa vektörler indeksten geri oluşturulur;
+        sıkıştırılmış indekslerde bu değerler yaklaşıktır.
+        """
+        if len(labels) == 0:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        if self.raw_vectors is not None:
+            return self.raw_vectors.read(labels)
+        return self.index.reconstruct_batch(labels)
+
+    def _remove_ids(self, vector_ids: List[str]) -> int:
+        """
+        Vektörleri indeksten ve eşleştirmelerden kaldırır (lock altında çağrılmalıdır).
+        
+        Returns:
+            int: Kaldırılan vektör sayısı
+        """
+        labels = []
+        for vector_id in vector_ids:
+            label = self.id_to_index.pop(vector_id, None)
+            if label is not None:
+                self.index_to_id.pop(label, None)
+                labels.append(label)
+        
+        if labels:
+            labels = np.asarray(labels, dtype=np.int64)
+            self.index.remove_ids(labels)
+            if self._journal is not None:
+                self._journal.append(("delete", labels, None))
+        
+        return len(labels)
+
+    def _update_sample(self, vectors: np.ndarray) -> None:
+        """
+        Rezervuar örneğini günceller (lock altında çağrılmalıdır).
+
+        Örnek, o ana kadar eklenen tüm vektörlerden eşit olasılıkla seçilmiş
+        en fazla `training_sample_size` vektör içerir.
+        """
+        capacity = self.training_sample_size
+        
+        # Örnek dolana kadar doğrudan ekle
+        fill = min(capacity - self._sample_count, len(vectors))
+        if fill > 0:
+            required = self._sample_count + fill
+            if required > len(self._sample):
+                grown = max(1, len(self._sample))
+                while grown < required:
+                    grown *= 2
+                sample = np.zeros((min(grown, capacity), self.dimension), dtype=np.float32)
+                sample[:self._sample_count] = self._sample[:self._sample_count]
+                self._sample = sample
+            self._sample[self._sample_count:required] = vectors[:fill]
+            self._sample_count = required
+        
+        # Kalan vektörler için rezervuar değişimi (Algorithm R)
+        rest = vectors[max(fill, 0):]
+        if len(rest):
+            seen = self._sample_seen + max(fill, 0) + np.arange(len(rest))
+            slots = (self._rng.random(len(rest)) * (seen + 1)).astype(np.int64)
+            chosen = slots < capacity
+            self._sample[slots[chosen]] = rest[chosen]
+        
+        self._sample_seen += len(vectors)
+
+    def _track_drift(self, vectors: np.ndarray) -> None:
+        """Yeni vektörlerin nicemleme hatasının hareketli ortalamasını günceller."""
+        error = self._quantization_error(self.index, vectors)
+        weight = min(1.0, len(vectors) / self.drift_window)
+        
+        if self.drift_error is None:
+            self.drift_error = error
+        else:
+            self.drift_error = (1.0 - weight) * self.drift_error + weight * error
+
+    def _needs_training(self) -> bool:
+        """İlk eğitimin veya kayma nedeniyle yeniden eğitimin gerekip gerekmediği."""
+        if not self.is_trained_with_real_data:
+            return self.vector_count >= self.training_threshold
+        
+        if not self.drift_threshold or self.drift_error is None or not self.training_error:
+            return False
+        
+        return self.drift_error > self.training_error * self.drift_threshold
+
+    def _schedule_training(self) -> None:
+        """Arka planda eğitim başlatır (zaten çalışıyorsa bir şey yapmaz)."""
+        if self._training_thread is not None:
+            return
         
-        # Mevcut ID'leri al
-        current_ids = set(self.id_to_index.keys())
+        if self.is_trained_with_real_data:
+            logger.info(
+                f"{self.index_label} indekste dağılım kayması tespit edildi "
+                f"(hata {self.drift_error:.4f} > {self.training_error:.4f} x {self.drift_threshold}), yeniden eğitiliyor"
+            )
         
-        # Her ID için yeni indeks ata
-        for new_idx, vector_id in enumerate(current_ids):
-            new_id_to_index[vector_id] = new_idx
-            new_index_to_id[new_idx] = vector_id
+        def _run():
+            try:
+                self.train()
+            except Exception as e:
+                logger.error(f"{self.index_label} indeks eğitim hatası: {str(e)}")
+            finally:
+                with self.index_lock:
+                    self._training_thread = None
+        
+        self._training_thread = threading.Thread(
+            target=_run, name=f"{self.index_label.lower()}-index-training", daemon=True
+        )
+        self._training_thread.start()
+
+
+class IVFIndex(TrainedFaissIndex):
+    """IVF (Inverted File Index) vektör indeksi."""
+
+    index_label = "IVF"
+
+    def _default_training_threshold(self) -> int:
+        # faiss, k-means için küme başına en az 39 örnek önerir
+        return 39 * self.config.num_partitions
+
+    def _create_index(self):
+        nlist = self.config.num_partitions
+        quantizer = self.faiss.IndexFlatL2(self.dimension)
+        index = self.faiss.IndexIVFFlat(quantizer, self.dimension, nlist, self.metric)
+        # Etiketle silme ve geri oluşturma için
+        index.set_direct_map_type(self.faiss.DirectMap.Hashtable)
         
-        # Mapping'leri güncelle
-        self.id_to_index = new_id_to_index
-        self.index_to_id = new_index_to_id
-        self.next_index = len(self.vectors)
+        # Arama parametresi
+        index.nprobe = min(nlist, 10)  # Aramalarda incelenecek bölüm sayısı
+        return index
 
+    def _quantization_error(self, index, vectors: np.ndarray) -> float:
+        # IVFFlat vektörleri sıkıştırmaz; kayma kaba merkezlere uzaklıkla ölçülür
+        distances, _ = index.quantizer.search(vectors, 1)
+        return float(np.mean(distances))
 
-class PQIndex(VectorIndexManager):
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats.update({
+            "num_partitions": self.config.num_partitions,
+            "nprobe": getattr(self.index, "nprobe", None)
+        })
+        return stats
+
+
+class PQIndex(TrainedFaissIndex):
     """PQ (Product Quantization) vektör indeksi."""
 
+    index_label = "PQ"
+
+    def _configure(self) -> None:
+        self.num_subvectors = _pq_subvector_count(self.dimension, self.config.num_subvectors)
+
+    def _default_training_threshold(self) -> int:
+        return 39 * (2 ** self.config.bits_per_subvector)
+
+    def _create_index(self):
+        pq = self.faiss.IndexPQ(self.dimension, self.num_subvectors, self.config.bits_per_subvector, self.metric)
+        index = self.faiss.IndexIDMap2(pq)
+        return index
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats.update({
+            "num_subvectors": self.num_subvectors,
+            "bits_per_subvector": self.config.bits_per_subvector,
+            "compression_ratio": (self.dimension * 4) / self._codec(self.index).code_size
+        })
+        return stats
+
+
+class IVFPQIndex(TrainedFaissIndex):
+    """IVFPQ (Inverted File Index + Product Quantization) vektör indeksi."""
+
+    index_label = "IVFPQ"
+
+    def _configure(self) -> None:
+        self.num_subvectors = _pq_subvector_count(self.dimension, self.config.num_subvectors)
+
+    def _default_training_threshold(self) -> int:
+        return 39 * max(self.config.num_partitions, 2 ** self.config.bits_per_subvector)
+
+    def _create_index(self):
+        nlist = self.config.num_partitions
+        quantizer = self.faiss.IndexFlatL2(self.dimension)
+        index = self.faiss.IndexIVFPQ(
+            quantizer, self.dimension, nlist, self.num_subvectors, self.config.bits_per_subvector, self.metric
+        )
+        # Etiketle silme ve geri oluşturma için
+        index.set_direct_map_type(self.faiss.DirectMap.Hashtable)
+        
+        # Arama parametresi
+        index.nprobe = min(nlist, 10)  # Aramalarda incelenecek bölüm sayısı
+        return index
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats.update({
+            "num_partitions": self.config.num_partitions,
+            "nprobe": getattr(self.index, "nprobe", None),
+            "num_subvectors": self.num_subvectors,
+            "bits_per_subvector": self.config.bits_per_subvector
+        })
+        return stats
+
+
+def _pq_subvector_count(dimension: int, num_subvectors: int) -> int:
+    """
+    PQ alt vektör sayısını boyutun bir böleni olacak şekilde ayarlar.
+    
+    Args:
+        dimension: Vektör boyutu
+        num_subvectors: İstenen alt vektör sayısı
+        
+    Returns:
+        int: Kullanılacak alt vektör sayısı
+    """
+    if dimension % num_subvectors == 0:
+        return num_subvectors
+    
+    for i in range(num_subvectors, 0, -1):
+        if dimension % i == 0:
+            logger.warning(f"PQ alt vektör sayısı {num_subvectors}, boyutun ({dimension}) böleni değil. {i} değeri kullanılacak.")
+            return i
+    return 1
+
+
+# Bayt başına bit sayısı tablosu (np.bitwise_count olmayan numpy sürümleri için)
+_POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+def _popcount_rows(words: np.ndarray) -> np.ndarray:
+    """
+    Her satırdaki 1 bitlerini sayar.
+    
+    Args:
+        words: uint64 kelime matrisi (n x kelime sayısı)
+        
+    Returns:
+        np.ndarray: Satır başına bit sayısı
+    """
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words).sum(axis=1, dtype=np.int32)
+    return _POPCOUNT_TABLE[words.view(np.uint8)].sum(axis=1, dtype=np.int32)
+
+
+class QuantizedIndex(VectorIndexManager):
+    """
+    Skaler nicemlenmiş vektör indeksleri için ortak depolama ve arama.
+
+    Bellekte yalnızca kodlar tutulur; float32 vektörler mmap deposunda
+    durur. Arama kodlar üzerinde satır blokları halinde numpy kernelleriyle
+    yapılır, en iyi `top_k * rescore_oversample` aday ham vektörlerle tam
+    doğrulukla yeniden puanlanır. Silmeler tombstone olarak işaretlenir;
+    silinen oran eşiği aşınca satırlar arka planda sıkıştırılır. Yeni
+    vektörler mevcut nicemleme parametreleriyle kodlanır; parametrelerin
+    güncellenmesi gerekiyorsa yeniden kalibrasyon ve tüm satırların yeniden
+    kodlanması da aynı arka plan işinde yapılır.
+    """
+
+    index_label = "quantized"
+    default_oversample = 1
+    search_chunk_rows = 65536
+
     def initialize(self) -> None:
         """İndeksi başlatır."""
-        try:
-            import faiss
-            self.faiss = faiss
-        except ImportError:
-            logger.error("faiss kütüphanesi bulunamadı, lütfen yükleyin: pip install faiss-cpu veya faiss-gpu")
-            raise ImportError("faiss kütüphanesi bulunamadı, lütfen yükleyin: pip install faiss-cpu veya faiss-gpu")
+        if self.metric_type not in ("l2", "cosine", "dot"):
+            raise ValueError(f"{self.index_label} için desteklenmeyen metrik türü: {self.metric_type}")
         
-        # Metrik türünü faiss formatına dönüştür
-        if self.metric_type == "l2":
-            metric = self.faiss.METRIC_L2
-        elif self.metric_type == "cosine" or self.metric_type == "dot":
-            metric = self.faiss.METRIC_INNER_PRODUCT
-        else:
-            raise ValueError(f"PQ için desteklenmeyen metrik türü: {self.metric_type}")
-        
-        # PQ parametreleri
-        M = self.config.num_subvectors  # Alt vektör sayısı
-        nbits = self.config.bits_per_subvector  # Alt vektör başına bit sayısı
-        
-        # M değeri, boyutun bir böleni olmalı
-        if self.dimension % M != 0:
-            original_M = M
-            # Boyuta uygun bir bölen bul
-            for i in range(M, 0, -1):
-                if self.dimension % i == 0:
-                    M = i
-                    break
-            logger.warning(f"PQ alt vektör sayısı {original_M}, boyutun ({self.dimension}) böleni değil. {M} değeri kullanılacak.")
-        
-        # PQ indeksini oluştur
-        if self.metric_type == "cosine":
-            # Cosine benzerliği için normalize edilmiş vektörler kullanılacak
-            self.index = self.faiss.IndexPQ(self.dimension, M, nbits, metric)
-        else:
-            self.index = self.faiss.IndexPQ(self.dimension, M, nbits, metric)
+        capacity = max(1, getattr(self.config, "initial_capacity", 1024))
+        self.compaction_threshold = getattr(self.config, "compaction_threshold", 0.25)
+        self.compaction_retry_delay = getattr(self.config, "compaction_retry_delay", 0.1)
+        self.rescore_oversample = getattr(self.config, "rescore_oversample", 0) or self.default_oversample
         
-        # Eğitim için boş vektörler
-        # Not: Gerçek veri ile eğitim daha sonra yapılacak
-        empty_vectors = np.zeros((max(256, M * 10), self.dimension), dtype=np.float32)
-        self.index.train(empty_vectors)
+        self._configure()
         
-        self.is_initialized = True
-        self.is_trained_with_real_data = False
-        logger.info(f"PQ indeks başlatıldı: dim={self.dimension}, M={M}, nbits={nbits}")
+        # Önceden ayrılmış kod tamponu (yalnızca ilk self.size satırı geçerli)
+        self.index = np.zeros((capacity, self.code_size), dtype=np.uint8)
+        self.size = 0
+        # Tombstone bitmap'i (True = silinmiş satır)
+        self.deleted = np.zeros(capacity, dtype=bool)
+        self.deleted_count = 0
+        self.is_calibrated = False
+        # Parametreler yeni vektörleri kapsamıyorsa arka planda yeniden kalibre edilir
+        self._recalibration_pending = False
+        
+        # Yeniden puanlama ve yeniden kalibrasyon için ham vektörler
+        self.raw_vectors = MmapVectorStore(self.dimension, getattr(self.config, "raw_vector_path", None), capacity)
         
-        # Vektör verilerini saklamak için numpy dizisi (original vektörler)
-        self.vectors = np.zeros((0, self.dimension), dtype=np.float32)
+        # Arka plan sıkıştırma durumu
+        self._mutation_epoch = 0
+        self._compaction_thread = None
+        
+        self.is_initialized = True
+        logger.info(f"{self.index_label} indeks başlatıldı: dim={self.dimension}, kod boyutu={self.code_size} bayt")
+
+    @property
+    def vector_count(self) -> int:
+        """Silinmemiş vektör sayısı."""
+        return self.size - self.deleted_count
 
     def add_vectors(self, vector_ids: List[str], vectors: List[np.ndarray]) -> None:
         """
@@ -819,49 +1947,38 @@ class PQIndex(VectorIndexManager):
         if not vectors:
             return
         
+        # Vektörleri numpy dizisine dönüştür (lock dışında)
+        vectors_array = self._prepare_vectors(vectors)
+        
         with self.index_lock:
-            # Vektörleri numpy dizisine dönüştür
-            vectors_array = np.array([v for v in vectors], dtype=np.float32)
-            
-            # ID'leri kaydet
-            self._register_vectors(vector_ids, self.next_index)
-            
-            # Orijinal vektörleri sakla
-            self.vectors = np.vstack((self.vectors, vectors_array.copy()))
-            
-            # Cosine benzerliği için normalizasyon
-            if self.metric_type == "cosine":
-                # Vektörleri normalize et
-                norms = np.linalg.norm(vectors_array, axis=1, keepdims=True)
-                vectors_array = vectors_array / np.maximum(norms, 1e-10)
+            # Aynı ID tekrar eklenirse eski satırı tombstone olarak işaretle
+            self._mark_deleted([vector_id for vector_id in vector_ids if vector_id in self.id_to_index])
+            
+            start = self.size
+            end = start + len(vectors_array)
+            self._ensure_capacity(end)
+            
+            rows = np.arange(start, end, dtype=np.int64)
+            self.raw_vectors.write(rows, vectors_array)
+            self._register_vectors(vector_ids, start)
+            self.size = end
+            self._observe(vectors_array)
+            
+            if not self.is_calibrated:
+                # İlk ekleme: parametreler bu vektörlerle belirlenir
+                self._apply_params(self._fit_params(rows, end))
+                self._recode(0, end)
+            else:
+                # Mevcut parametrelerle kodla (aralık dışı değerler kırpılır);
+                # gerekiyorsa yeniden kalibrasyon arka planda yapılır
+                self._store_codes(start, vectors_array)
+                if self._needs_calibration(vectors_array):
+                    self._recalibration_pending = True
             
-            # Vektörleri indekse ekle
-            self.index.add(vectors_array)
+            logger.info(f"{self.index_label} indekse {len(vectors)} vektör eklendi")
             
-            # Eğer indeks henüz gerçek verilerle eğitilmediyse ve yeterli veri varsa
-            if not self.is_trained_with_real_data and len(self.vectors) >= 1000:
-                # Gerçek verilerle eğitilecek vektörleri hazırla
-                train_vectors = self.vectors.copy()
-                
-                if self.metric_type == "cosine":
-                    # Vektörleri normalize et
-                    norms = np.linalg.norm(train_vectors, axis=1, keepdims=True)
-                    train_vectors = train_vectors / np.maximum(norms, 1e-10)
-                
-                # İndeksi gerçek verilerle yeniden eğit
-                self.index.reset()
-                self.index.train(train_vectors)
-                
-                # Tüm vektörleri tekrar ekle
-                if self.metric_type == "cosine":
-                    self.index.add(train_vectors)
-                else:
-                    self.index.add(self.vectors)
-                
-                self.is_trained_with_real_data = True
-                logger.info(f"PQ indeks gerçek verilerle eğitildi: {len(self.vectors)} vektör")
-            
-            logger.info(f"PQ indekse {len(vectors)} vektör eklendi")
+            if self._needs_compaction():
+                self._schedule_compaction()
 
     def update_vectors(self, vector_ids: List[str], vectors: List[np.ndarray]) -> None:
         """
@@ -875,31 +1992,10 @@ class PQIndex(VectorIndexManager):
             return
         
         with self.index_lock:
-            # PQ indeksinde doğrudan güncelleme yok
-            # İndeksi yeniden oluşturmamız gerekiyor
-            
-            # Her vektörü güncelle
-            updated_indices = []
-            for vector_id, vector in zip(vector_ids, vectors):
-                if vector_id in self.id_to_index:
-                    idx = self.id_to_index[vector_id]
-                    updated_indices.append(idx)
-                    
-                    # Vektörü numpy dizisinde güncelle
-                    self.vectors[idx] = vector
-            
-            if updated_indices:
-                # Normalize edilmiş vektörleri hazırla
-                normalized_vectors = self.vectors.copy()
-                if self.metric_type == "cosine":
-                    norms = np.linalg.norm(normalized_vectors, axis=1, keepdims=True)
-                    normalized_vectors = normalized_vectors / np.maximum(norms, 1e-10)
-                
-                # İndeksi yeniden oluştur
-                self.index.reset()
-                self.index.train(normalized_vectors)
-                self.index.add(normalized_vectors)
-                logger.info(f"PQ indekste {len(updated_indices)} vektör güncellendi (indeks yeniden oluşturuldu)")
+            pairs = [(vector_id, vector) for vector_id, vector in zip(vector_ids, vectors) if vector_id in self.id_to_index]
+            if pairs:
+                # Eski satır tombstone olur, yeni satır eklenir
+                self.add_vectors([vector_id for vector_id, _ in pairs], [vector for _, vector in pairs])
 
     def delete_vectors(self, vector_ids: List[str]) -> None:
         """
@@ -912,39 +2008,9 @@ class PQIndex(VectorIndexManager):
             return
         
         with self.index_lock:
-            # Silinecek indeksleri topla
-            deleted_indices = []
-            for vector_id in vector_ids:
-                if vector_id in self.id_to_index:
-                    idx = self.id_to_index[vector_id]
-                    deleted_indices.append(idx)
-                    # Mapping'lerden kaldır
-                    del self.id_to_index[vector_id]
-                    del self.index_to_id[idx]
-            
-            if deleted_indices:
-                # Silinecek olmayan vektörleri seç
-                mask = np.ones(len(self.vectors), dtype=bool)
-                mask[deleted_indices] = False
-                
-                # Maskeyi uygula
-                self.vectors = self.vectors[mask]
-                
-                # Mapping'leri güncelle
-                self._rebuild_mappings()
-                
-                # İndeksi yeniden oluştur
-                normalized_vectors = self.vectors.copy()
-                if self.metric_type == "cosine":
-                    norms = np.linalg.norm(normalized_vectors, axis=1, keepdims=True)
-                    normalized_vectors = normalized_vectors / np.maximum(norms, 1e-10)
-                
-                self.index.reset()
-                if len(self.vectors) > 0:
-                    self.index.train(normalized_vectors)
-                    self.index.add(normalized_vectors)
-                
-                logger.info(f"PQ indeksten {len(deleted_indices)} vektör silindi (indeks yeniden oluşturuldu)")
+            deleted = self._mark_deleted(vector_ids)
+            if deleted and self._needs_compaction():
+                self._schedule_compaction()
 
     def query(self, query_vector: np.ndarray, top_k: int = 10) -> List[Dict[str, Any]]:
         """
@@ -957,48 +2023,153 @@ class PQIndex(VectorIndexManager):
         Returns:
             List[Dict[str, Any]]: Arama sonuçları (vector_id ve distance içerir)
         """
-        if len(self.vectors) == 0:
+        ids, distances = self.query_batch(query_vector, top_k)
+        if len(ids) == 0:
             return []
         
+        return [
+            {"vector_id": vector_id, "distance": float(distance)}
+            for vector_id, distance in zip(ids[0], distances[0])
+            if vector_id is not None
+        ]
+
+    def query_batch(self, query_matrix: np.ndarray, top_k: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Kodlar üzerinde tarama yapar, adayları ham vektörlerle yeniden puanlar.
+        
+        Args:
+            query_matrix: Sorgu vektörleri (n_queries x dimension)
+            top_k: Her sorgu için getirilecek en fazla sonuç sayısı
+            
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: vector_id ve mesafe dizileri
+        """
+        queries = self._prepare_query_matrix(query_matrix)
+        
         with self.index_lock:
-            # Sorgu vektörünü hazırla
-            query = query_vector.reshape(1, -1).astype(np.float32)
+            actual_k = min(top_k, self.vector_count)
+            if len(queries) == 0 or actual_k <= 0:
+                return self._empty_batch_result(len(queries), top_k)
             
             # Cosine benzerliği için normalize
             if self.metric_type == "cosine":
-                query_norm = np.linalg.norm(query)
-                if query_norm > 0:
-                    query = query / query_norm
-            
-            # K değerini mevcut vektör sayısına göre sınırla
-            actual_k = min(top_k, len(self.vectors))
-            if actual_k == 0:
-                return []
-            
-            # PQ araması yap
-            try:
-                distances, indices = self.index.search(query, actual_k)
-            except Exception as e:
-                logger.error(f"PQ arama hatası: {str(e)}")
-                return []
-            
-            # Sonuçları oluştur
-            results = []
-            for idx, distance in zip(indices[0], distances[0]):
-                if idx != -1 and idx in self.index_to_id:  # -1, bulunamayan sonuçlar için
-                    vector_id = self.index_to_id[idx]
-                    
-                    # Dot ürünü benzerliği mesafeye dönüştür
-                    if self.metric_type == "dot":
-                        # Dot product yüksek = düşük mesafe
-                        distance = -distance
-                    
-                    results.append({
-                        "vector_id": vector_id,
-                        "distance": float(distance)
-                    })
+                norms = np.linalg.norm(queries, axis=1, keepdims=True)
+                queries = queries / np.where(norms > 0, norms, 1.0)
+            
+            oversample = max(1, self.rescore_oversample)
+            candidate_k = min(actual_k * oversample, self.vector_count)
+            scores, rows = self._scan(queries, candidate_k)
+            
+            if oversample > 1:
+                distances, rows = _exact_rescore(queries, rows, actual_k, self.raw_vectors.read, self.metric_type)
+                # Dot product yüksek = düşük mesafe
+                if self.metric_type == "dot":
+                    distances = -distances
+            else:
+                distances = self._approximate_distances(scores)
             
-            return results
+            return self._pack_batch_results(rows, distances, top_k)
+
+    def compact(self) -> int:
+        """
+        Tombstone olarak işaretlenmiş satırları kodlardan ve ham vektörlerden
+        kaldırır; yeniden kalibrasyon bekliyorsa parametreleri günceller ve
+        satırları yeni parametrelerle yeniden kodlar.
+
+        Ham vektörler yeni bir dosyaya, kodlar yeni dizilere lock dışında
+        yazılır; lock yalnızca bu sırada eklenen satırların kopyalanması ve
+        referansların değiştirilmesi sırasında tutulur. Bu sırada silme,
+        güncelleme veya yeniden kodlama yapılmışsa işlem iptal edilir.
+        
+        Returns:
+            int: Kaldırılan satır sayısı (iptal edildiyse 0)
+        """
+        with self.index_lock:
+            recalibrate = self._recalibration_pending
+            if self.deleted_count == 0 and not recalibrate:
+                return 0
+            snapshot_size = self.size
+            snapshot_epoch = self._mutation_epoch
+            row_arrays = self._row_arrays()
+            keep = np.flatnonzero(~self.deleted[:snapshot_size])
+            index_to_id = dict(self.index_to_id)
+        
+        # Sıkıştırılmış (ve gerekirse yeniden kodlanmış) kopyayı lock dışında hazırla
+        params = self._fit_params(keep, len(keep)) if recalibrate else None
+        raw_vectors = MmapVectorStore(self.dimension, f"{self.raw_vectors.path}.compact", max(1, len(keep)))
+        try:
+            if recalibrate:
+                kept_rows = {
+                    name: np.empty((len(keep),) + array.shape[1:], dtype=array.dtype)
+                    for name, array in row_arrays.items()
+                }
+            else:
+                kept_rows = {name: array[keep] for name, array in row_arrays.items()}
+            
+            for start in range(0, len(keep), self.search_chunk_rows):
+                source = keep[start:start + self.search_chunk_rows]
+                vectors = self.raw_vectors.read(source)
+                raw_vectors.write(np.arange(start, start + len(source), dtype=np.int64), vectors)
+                if recalibrate:
+                    for name, values in self._row_values(vectors, params).items():
+                        kept_rows[name][start:start + len(source)] = values
+            
+            kept_ids = [index_to_id[row] for row in keep.tolist()]
+            
+            with self.index_lock:
+                if self._mutation_epoch != snapshot_epoch:
+                    logger.debug(f"{self.index_label} indeks sıkıştırması eşzamanlı değişiklik nedeniyle iptal edildi")
+                    raw_vectors.close()
+                    os.remove(raw_vectors.path)
+                    return 0
+                
+                # Bu sırada eklenen satırları kopyala (yeniden kalibrasyonda yeniden kodla)
+                kept = len(keep)
+                tail = np.arange(snapshot_size, self.size, dtype=np.int64)
+                new_size = kept + len(tail)
+                capacity = max(1, new_size)
+                
+                tail_vectors = self.raw_vectors.read(tail)
+                raw_vectors.write(np.arange(kept, new_size, dtype=np.int64), tail_vectors)
+                if recalibrate:
+                    tail_rows = self._row_values(tail_vectors, params)
+                else:
+                    tail_rows = {name: getattr(self, name)[snapshot_size:self.size] for name in kept_rows}
+                
+                for name, rows in kept_rows.items():
+                    array = np.zeros((capacity,) + rows.shape[1:], dtype=rows.dtype)
+                    array[:kept] = rows
+                    array[kept:new_size] = tail_rows[name]
+                    setattr(self, name, array)
+                
+                self.raw_vectors.replace(raw_vectors)
+                
+                new_ids = kept_ids + [self.index_to_id[row] for row in tail.tolist()]
+                self.index_to_id = dict(enumerate(new_ids))
+                self.id_to_index = {vector_id: row for row, vector_id in self.index_to_id.items()}
+                
+                removed = self.deleted_count
+                self.deleted = np.zeros(capacity, dtype=bool)
+                self.deleted_count = 0
+                self.size = new_size
+                self.next_index = new_size
+                self._mutation_epoch += 1
+                
+                if recalibrate:
+                    self._apply_params(params)
+                    # Bu sırada eklenen vektörler yeni parametrelerin de dışında kalabilir
+                    self._recalibration_pending = self._needs_calibration(tail_vectors)
+        except Exception:
+            raw_vectors.close()
+            if os.path.exists(raw_vectors.path):
+                os.remove(raw_vectors.path)
+            raise
+        
+        if recalibrate:
+            logger.info(f"{self.index_label} indeks yeniden kalibre edildi ve sıkıştırıldı: {removed} satır kaldırıldı")
+        else:
+            logger.info(f"{self.index_label} indeks sıkıştırıldı: {removed} satır kaldırıldı")
+        return removed
 
     def stats(self) -> Dict[str, Any]:
         """
@@ -1009,321 +2180,361 @@ class PQIndex(VectorIndexManager):
         """
         with self.index_lock:
             return {
-                "type": "pq",
-                "vector_count": len(self.vectors),
+                "type": self.index_label.lower(),
+                "vector_count": self.vector_count,
                 "dimension": self.dimension,
                 "metric_type": self.metric_type,
-                "num_subvectors": self.config.num_subvectors,
-                "bits_per_subvector": self.config.bits_per_subvector,
-                "is_trained_with_real_data": self.is_trained_with_real_data,
-                "memory_usage_mb": self.vectors.nbytes / 1024 / 1024,
-                "compression_ratio": (self.vectors.nbytes / (self.config.num_subvectors * (2**self.config.bits_per_subvector) * 4))
+                "code_size": self.code_size,
+                "compression_ratio": (self.dimension * 4) / self.code_size,
+                "rescore_oversample": self.rescore_oversample,
+                "deleted_count": self.deleted_count,
+                "recalibration_pending": self._recalibration_pending,
+                "compaction_running": self._compaction_thread is not None,
+                "raw_vectors_path": self.raw_vectors.path,
+                "memory_usage_mb": self.index.nbytes / 1024 / 1024
             }
 
-    def _rebuild_mappings(self) -> None:
-        """ID ve indeks eşleştirmelerini yeniden oluşturur."""
-        # Yeni mapping'ler
-        new_id_to_index = {}
-        new_index_to_id = {}
-        
-        # Mevcut ID'leri al
-        current_ids = list(self.id_to_index.keys())
-        
-        # Her ID için yeni indeks ata
-        for new_idx, vector_id in enumerate(current_ids):
-            new_id_to_index[vector_id] = new_idx
-            new_index_to_id[new_idx] = vector_id
-        
-        # Mapping'leri güncelle
-        self.id_to_index = new_id_to_index
-        self.index_to_id = new_index_to_id
-        self.next_index = len(self.vectors)
+    @abstractmethod
+    def _configure(self) -> None:
+        """Kod boyutunu (self.code_size) ve kalibrasyon durumunu hazırlar."""
+        pass
 
+    @abstractmethod
+    def _params(self) -> Dict[str, Any]:
+        """Güncel nicemleme parametreleri (öznitelik adı -> değer)."""
+        pass
 
-class IVFPQIndex(VectorIndexManager):
-    """IVFPQ (Inverted File Index + Product Quantization) vektör indeksi."""
+    @abstractmethod
+    def _fit_params(self, rows: np.ndarray, count: int) -> Dict[str, Any]:
+        """
+        Verilen satırlar için yeni nicemleme parametrelerini hesaplar.
 
-    def initialize(self) -> None:
-        """İndeksi başlatır."""
-        try:
-            import faiss
-            self.faiss = faiss
-        except ImportError:
-            logger.error("faiss kütüphanesi bulunamadı, lütfen yükleyin: pip install faiss-cpu veya faiss-gpu")
-            raise ImportError("faiss kütüphanesi bulunamadı, lütfen yükleyin: pip install faiss-cpu veya faiss-gpu")
-        
-        # Metrik türünü faiss formatına dönüştür
-        if self.metric_type == "l2":
-            metric = self.faiss.METRIC_L2
-        elif self.metric_type == "cosine" or self.metric_type == "dot":
-            metric = self.faiss.METRIC_INNER_PRODUCT
-        else:
-            raise ValueError(f"IVFPQ için desteklenmeyen metrik türü: {self.metric_type}")
-        
-        # IVF parametreleri
-        nlist = self.config.num_partitions
-        
-        # PQ parametreleri
-        M = self.config.num_subvectors
-        nbits = self.config.bits_per_subvector
-        
-        # M değeri, boyutun bir böleni olmalı
-        if self.dimension % M != 0:
-            original_M = M
-            # Boyuta uygun bir bölen bul
-            for i in range(M, 0, -1):
-                if self.dimension % i == 0:
-                    M = i
-                    break
-            logger.warning(f"PQ alt vektör sayısı {original_M}, boyutun ({self.dimension}) böleni değil. {M} değeri kullanılacak.")
-        
-        # IVFPQ indeksini oluştur
-        self.quantizer = self.faiss.IndexFlatL2(self.dimension)
-        self.index = self.faiss.IndexIVFPQ(self.quantizer, self.dimension, nlist, M, nbits, metric)
-        
-        # Eğitim için boş vektörler
-        # Not: Gerçek veri ile eğitim daha sonra yapılacak
-        empty_vectors = np.zeros((max(nlist * 10, 1000), self.dimension), dtype=np.float32)
-        self.index.train(empty_vectors)
-        
-        # Arama parametresi
-        self.index.nprobe = min(nlist, 10)  # Aramalarda incelenecek bölüm sayısı
-        
-        self.is_initialized = True
-        self.is_trained_with_real_data = False
-        logger.info(f"IVFPQ indeks başlatıldı: dim={self.dimension}, nlist={nlist}, M={M}, nbits={nbits}")
-        
-        # Vektör verilerini saklamak için numpy dizisi
-        self.vectors = np.zeros((0, self.dimension), dtype=np.float32)
+        İndeksi değiştirmez; sıkıştırma sırasında lock dışında çağrılır.
 
-    def add_vectors(self, vector_ids: List[str], vectors: List[np.ndarray]) -> None:
+        Args:
+            rows: Kalibrasyonda kullanılacak canlı satırlar
+            count: Parametrelerin hesaplandığı vektör sayısı
         """
-        Vektörleri indekse ekler.
+        pass
+
+    @abstractmethod
+    def _needs_calibration(self, vectors: np.ndarray) -> bool:
+        """Yeni vektörler mevcut parametrelerle kodlanamıyorsa True."""
+        pass
+
+    @abstractmethod
+    def _encode(self, vectors: np.ndarray, params: Optional[Dict[str, Any]] = None) -> np.ndarray:
+        """Vektörleri kodlara dönüştürür (params None ise güncel parametrelerle)."""
+        pass
+
+    def _observe(self, vectors: np.ndarray) -> None:
+        """Eklenen vektörleri kalibrasyon istatistiklerine katar (lock altında)."""
+        pass
+
+    def _apply_params(self, params: Dict[str, Any]) -> None:
+        """Nicemleme parametrelerini değiştirir (lock altında)."""
+        for name, value in params.items():
+            setattr(self, name, value)
+
+    @abstractmethod
+    def _chunk_scores(self, queries: np.ndarray, start: int, end: int) -> np.ndarray:
+        """Satır bloğu için yaklaşık skorlar (n_queries x satır, küçük iyi)."""
+        pass
+
+    def _approximate_distances(self, scores: np.ndarray) -> np.ndarray:
+        """Yeniden puanlama yapılmadığında döndürülecek mesafeler."""
+        return scores
+
+    def _row_values(self, vectors: np.ndarray, params: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        """Vektörlerin satır dizilerindeki değerleri (öznitelik adı -> değerler)."""
+        return {"index": self._encode(vectors, params)}
+
+    def _store_codes(self, start: int, vectors: np.ndarray) -> None:
+        """Vektörlerin kodlarını start satırından itibaren yazar."""
+        for name, values in self._row_values(vectors, self._params()).items():
+            getattr(self, name)[start:start + len(vectors)] = values
+
+    def _recode(self, start: int, end: int) -> None:
+        """Satırları ham vektörlerden yeniden kodlar."""
+        self._mutation_epoch += 1
+        for chunk_start in range(start, end, self.search_chunk_rows):
+            chunk_end = min(end, chunk_start + self.search_chunk_rows)
+            rows = np.arange(chunk_start, chunk_end, dtype=np.int64)
+            self._store_codes(chunk_start, self.raw_vectors.read(rows))
+        self.is_calibrated = True
+
+    def _row_arrays(self) -> Dict[str, np.ndarray]:
+        """Sıkıştırmada satır satır taşınan diziler (öznitelik adı -> dizi)."""
+        return {"index": self.index}
+
+    def _scan(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Tüm satırları bloklar halinde tarayıp sorgu başına en iyi k satırı bulur.
         
-        Args:
-            vector_ids: Eklenecek vektör ID'leri
-            vectors: Eklenecek vektörler
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (n_queries x k) skorlar (küçük iyi) ve satırlar (-1 boş)
         """
-        if not vectors:
-            return
+        num_queries = len(queries)
+        best_scores = np.full((num_queries, 0), np.inf, dtype=np.float32)
+        best_rows = np.full((num_queries, 0), -1, dtype=np.int64)
         
-        with self.index_lock:
-            # Vektörleri numpy dizisine dönüştür
-            vectors_array = np.array([v for v in vectors], dtype=np.float32)
+        for start in range(0, self.size, self.search_chunk_rows):
+            end = min(self.size, start + self.search_chunk_rows)
+            scores = self._chunk_scores(queries, start, end).astype(np.float32, copy=False)
             
-            # ID'leri kaydet
-            self._register_vectors(vector_ids, self.next_index)
+            deleted = self.deleted[start:end]
+            if deleted.any():
+                scores[:, deleted] = np.inf
             
-            # Orijinal vektörleri sakla
-            self.vectors = np.vstack((self.vectors, vectors_array.copy()))
+            # Blok içi en iyi k, sonra önceki en iyilerle birleştir
+            chunk_k = min(k, end - start)
+            part = np.argpartition(scores, chunk_k - 1, axis=1)[:, :chunk_k]
+            scores = np.hstack((best_scores, np.take_along_axis(scores, part, axis=1)))
+            rows = np.hstack((best_rows, part + start))
             
-            # Cosine benzerliği için normalizasyon
-            if self.metric_type == "cosine":
-                # Vektörleri normalize et
-                norms = np.linalg.norm(vectors_array, axis=1, keepdims=True)
-                vectors_array = vectors_array / np.maximum(norms, 1e-10)
-            
-            # Vektörleri indekse ekle
-            self.index.add(vectors_array)
-            
-            # Eğer indeks henüz gerçek verilerle eğitilmediyse ve yeterli veri varsa
-            if not self.is_trained_with_real_data and len(self.vectors) >= self.config.num_partitions:
-                # Gerçek verilerle eğitilecek vektörleri hazırla
-                train_vectors = self.vectors.copy()
-                
-                if self.metric_type == "cosine":
-                    # Vektörleri normalize et
-                    norms = np.linalg.norm(train_vectors, axis=1, keepdims=True)
-                    train_vectors = train_vectors / np.maximum(norms, 1e-10)
-                
-                # İndeksi gerçek verilerle yeniden eğit
-                self.index.reset()
-                self.index.train(train_vectors)
-                
-                # Tüm vektörleri tekrar ekle
-                if self.metric_type == "cosine":
-                    self.index.add(train_vectors)
-                else:
-                    self.index.add(self.vectors)
-                
-                self.is_trained_with_real_data = True
-                logger.info(f"IVFPQ indeks gerçek verilerle eğitildi: {len(self.vectors)} vektör")
+            if scores.shape[1] > k:
+                part = np.argpartition(scores, k - 1, axis=1)[:, :k]
+                scores = np.take_along_axis(scores, part, axis=1)
+                rows = np.take_along_axis(rows, part, axis=1)
             
-            logger.info(f"IVFPQ indekse {len(vectors)} vektör eklendi")
+            best_scores, best_rows = scores, rows
+        
+        order = np.argsort(best_scores, axis=1, kind="stable")
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        best_rows = np.where(np.isfinite(best_scores), np.take_along_axis(best_rows, order, axis=1), -1)
+        return best_scores, best_rows
 
-    def update_vectors(self, vector_ids: List[str], vectors: List[np.ndarray]) -> None:
-        """
-        Vektörleri indekste günceller.
+    def _prepare_vectors(self, vectors: List[np.ndarray]) -> np.ndarray:
+        """Vektörleri float32 matrise dönüştürür, cosine için normalize eder."""
+        vectors_array = np.asarray(vectors, dtype=np.float32).reshape(len(vectors), self.dimension)
         
-        Args:
-            vector_ids: Güncellenecek vektör ID'leri
-            vectors: Yeni vektörler
-        """
-        if not vectors:
-            return
+        if self.metric_type == "cosine":
+            norms = np.linalg.norm(vectors_array, axis=1, keepdims=True)
+            vectors_array = vectors_array / np.maximum(norms, 1e-10)
         
-        with self.index_lock:
-            # IVFPQ indeksinde doğrudan güncelleme yok
-            # İndeksi yeniden oluşturmamız gerekiyor
-            
-            # Her vektörü güncelle
-            updated_indices = []
-            for vector_id, vector in zip(vector_ids, vectors):
-                if vector_id in self.id_to_index:
-                    idx = self.id_to_index[vector_id]
-                    updated_indices.append(idx)
-                    
-                    # Vektörü numpy dizisinde güncelle
-                    self.vectors[idx] = vector
-            
-            if updated_indices:
-                # Normalize edilmiş vektörleri hazırla
-                normalized_vectors = self.vectors.copy()
-                if self.metric_type == "cosine":
-                    norms = np.linalg.norm(normalized_vectors, axis=1, keepdims=True)
-                    normalized_vectors = normalized_vectors / np.maximum(norms, 1e-10)
-                
-                # İndeksi yeniden oluştur
-                self.index.reset()
-                self.index.train(normalized_vectors)
-                self.index.add(normalized_vectors)
-                logger.info(f"IVFPQ indekste {len(updated_indices)} vektör güncellendi (indeks yeniden oluşturuldu)")
+        return np.ascontiguousarray(vectors_array, dtype=np.float32)
 
-    def delete_vectors(self, vector_ids: List[str]) -> None:
+    def _mark_deleted(self, vector_ids: List[str]) -> int:
         """
-        Vektörleri indeksten siler.
+        Vektörleri tombstone olarak işaretler (lock altında çağrılmalıdır).
         
-        Args:
-            vector_ids: Silinecek vektör ID'leri
+        Returns:
+            int: İşaretlenen satır sayısı
         """
-        if not vector_ids:
-            return
+        deleted = 0
+        for vector_id in vector_ids:
+            row = self.id_to_index.pop(vector_id, None)
+            if row is not None:
+                self.index_to_id.pop(row, None)
+                self.deleted[row] = True
+                deleted += 1
         
-        with self.index_lock:
-            # Silinecek indeksleri topla
-            deleted_indices = []
-            for vector_id in vector_ids:
-                if vector_id in self.id_to_index:
-                    idx = self.id_to_index[vector_id]
-                    deleted_indices.append(idx)
-                    # Mapping'lerden kaldır
-                    del self.id_to_index[vector_id]
-                    del self.index_to_id[idx]
-            
-            if deleted_indices:
-                # Silinecek olmayan vektörleri seç
-                mask = np.ones(len(self.vectors), dtype=bool)
-                mask[deleted_indices] = False
-                
-                # Maskeyi uygula
-                self.vectors = self.vectors[mask]
-                
-                # Mapping'leri güncelle
-                self._rebuild_mappings()
-                
-                # İndeksi yeniden oluştur
-                normalized_vectors = self.vectors.copy()
-                if self.metric_type == "cosine":
-                    norms = np.linalg.norm(normalized_vectors, axis=1, keepdims=True)
-                    normalized_vectors = normalized_vectors / np.maximum(norms, 1e-10)
-                
-                self.index.reset()
-                if len(self.vectors) > 0:
-                    self.index.train(normalized_vectors)
-                    self.index.add(normalized_vectors)
-                
-                logger.info(f"IVFPQ indeksten {len(deleted_indices)} vektör silindi (indeks yeniden oluşturuldu)")
+        if deleted:
+            self.deleted_count += deleted
+            self._mutation_epoch += 1
+        
+        return deleted
 
-    def query(self, query_vector: np.ndarray, top_k: int = 10) -> List[Dict[str, Any]]:
-        """
-        Vektör araması yapar.
+    def _ensure_capacity(self, required: int) -> None:
+        """Kod tamponunu gerekirse ikiye katlayarak büyütür (lock altında)."""
+        capacity = len(self.index)
+        if required <= capacity:
+            return
         
-        Args:
-            query_vector: Sorgu vektörü
-            top_k: Getirilecek en fazla sonuç sayısı
-            
-        Returns:
-            List[Dict[str, Any]]: Arama sonuçları (vector_id ve distance içerir)
-        """
-        if len(self.vectors) == 0:
-            return []
+        while capacity < required:
+            capacity *= 2
         
-        with self.index_lock:
-            # Sorgu vektörünü hazırla
-            query = query_vector.reshape(1, -1).astype(np.float32)
-            
-            # Cosine benzerliği için normalize
-            if self.metric_type == "cosine":
-                query_norm = np.linalg.norm(query)
-                if query_norm > 0:
-                    query = query / query_norm
-            
-            # K değerini mevcut vektör sayısına göre sınırla
-            actual_k = min(top_k, len(self.vectors))
-            if actual_k == 0:
-                return []
-            
-            # IVFPQ araması yap
-            try:
-                distances, indices = self.index.search(query, actual_k)
-            except Exception as e:
-                logger.error(f"IVFPQ arama hatası: {str(e)}")
-                return []
-            
-            # Sonuçları oluştur
-            results = []
-            for idx, distance in zip(indices[0], distances[0]):
-                if idx != -1 and idx in self.index_to_id:  # -1, bulunamayan sonuçlar için
-                    vector_id = self.index_to_id[idx]
-                    
-                    # Dot ürünü benzerliği mesafeye dönüştür
-                    if self.metric_type == "dot":
-                        # Dot product yüksek = düşük mesafe
-                        distance = -distance
-                    
-                    results.append({
-                        "vector_id": vector_id,
-                        "distance": float(distance)
-                    })
-            
-            return results
+        new_index = np.zeros((capacity, self.code_size), dtype=np.uint8)
+        new_index[:self.size] = self.index[:self.size]
+        new_deleted = np.zeros(capacity, dtype=bool)
+        new_deleted[:self.size] = self.deleted[:self.size]
+        
+        self.index = new_index
+        self.deleted = new_deleted
+        self._grow_rows(capacity)
 
-    def stats(self) -> Dict[str, Any]:
+    def _grow_rows(self, capacity: int) -> None:
+        """Koda eşlik eden satır dizilerini büyütür."""
+        pass
+
+    def _needs_compaction(self) -> bool:
+        """Yeniden kalibrasyon bekliyorsa veya silinen oran eşiği aştıysa True (lock altında)."""
+        return self._recalibration_pending or (bool(self.size) and self.deleted_count > self.size * self.compaction_threshold)
+
+    def _schedule_compaction(self) -> None:
         """
-        İndeks istatistiklerini döndürür.
-        
-        Returns:
-            Dict[str, Any]: İstatistikler
+        Arka planda sıkıştırma başlatır (zaten çalışıyorsa bir şey yapmaz).
+
+        Eşzamanlı değişiklik nedeniyle iptal edilen sıkıştırma, gerekli
+        olduğu sürece `compaction_retry_delay` saniye sonra yeniden denenir.
         """
-        with self.index_lock:
-            return {
-                "type": "ivfpq",
-                "vector_count": len(self.vectors),
-                "dimension": self.dimension,
-                "metric_type": self.metric_type,
-                "num_partitions": self.config.num_partitions,
-                "nprobe": self.index.nprobe,
-                "num_subvectors": self.config.num_subvectors,
-                "bits_per_subvector": self.config.bits_per_subvector,
-                "is_trained_with_real_data": self.is_trained_with_real_data,
-                "memory_usage_mb": self.vectors.nbytes / 1024 / 1024
-            }
+        if self._compaction_thread is not None:
+            return
+        
+        def _run():
+            while True:
+                try:
+                    self.compact()
+                except Exception as e:
+                    logger.error(f"{self.index_label} indeks sıkıştırma hatası: {str(e)}")
+                    with self.index_lock:
+                        self._compaction_thread = None
+                    return
+                
+                with self.index_lock:
+                    if not self._needs_compaction():
+                        self._compaction_thread = None
+                        return
+                time.sleep(self.compaction_retry_delay)
+        
+        self._compaction_thread = threading.Thread(
+            target=_run, name=f"{self.index_label.lower()}-index-compaction", daemon=True
+        )
+        self._compaction_thread.start()
+
+
+class ScalarQuantizedIndex(QuantizedIndex):
+    """
+    int8 skaler nicemlenmiş vektör indeksi (vektör başına dimension bayt).
+
+    Her boyut, kalibrasyonla belirlenen [min, max] aralığında 256 seviyeye
+    nicemlenir. Aralık dışında kalan yeni değerler önce aralığa kırpılır;
+    aralık arka planda pay bırakılarak genişletilir ve kodlar ham
+    vektörlerden yeniden üretilir. Sorgu, kod matrisine tek bir BLAS
+    çarpımıyla uygulanır.
+    """
+
+    index_label = "SQ8"
+    default_oversample = 2
 
-    def _rebuild_mappings(self) -> None:
-        """ID ve indeks eşleştirmelerini yeniden oluşturur."""
-        # Yeni mapping'ler
-        new_id_to_index = {}
-        new_index_to_id = {}
+    # Aralık genişletilirken her iki yana bırakılan pay (genişlik oranı)
+    calibration_margin = 0.05
+
+    def _configure(self) -> None:
+        self.code_size = self.dimension
+        self.minimums = np.zeros(self.dimension, dtype=np.float32)
+        self.scales = np.ones(self.dimension, dtype=np.float32)
+        # Çözülmüş vektörlerin kare normları (l2 için)
+        self.code_norms = np.zeros(max(1, getattr(self.config, "initial_capacity", 1024)), dtype=np.float32)
+        # Eklenen tüm vektörlerin boyut başına en küçük ve en büyük değerleri
+        self._observed_low = None
+        self._observed_high = None
+
+    def _params(self) -> Dict[str, Any]:
+        return {"minimums": self.minimums, "scales": self.scales}
+
+    def _observe(self, vectors: np.ndarray) -> None:
+        low = vectors.min(axis=0)
+        high = vectors.max(axis=0)
+        if self._observed_low is not None:
+            low = np.minimum(low, self._observed_low)
+            high = np.maximum(high, self._observed_high)
+        self._observed_low, self._observed_high = low, high
+
+    def _fit_params(self, rows: np.ndarray, count: int) -> Dict[str, Any]:
+        low, high = self._observed_low, self._observed_high
+        
+        if self.is_calibrated:
+            low = np.minimum(low, self.minimums)
+            high = np.maximum(high, self.minimums + self.scales * 255.0)
+        
+        width = high - low
+        margin = np.maximum(width, np.abs(high) + np.abs(low) + 1e-6) * self.calibration_margin
+        return {
+            "minimums": (low - margin).astype(np.float32),
+            "scales": ((width + 2 * margin) / 255.0).astype(np.float32)
+        }
+
+    def _needs_calibration(self, vectors: np.ndarray) -> bool:
+        maximums = self.minimums + self.scales * 255.0
+        return bool((vectors < self.minimums).any() or (vectors > maximums).any())
+
+    def _encode(self, vectors: np.ndarray, params: Optional[Dict[str, Any]] = None) -> np.ndarray:
+        params = params or self._params()
+        codes = np.rint((vectors - params["minimums"]) / params["scales"])
+        return np.clip(codes, 0, 255).astype(np.uint8)
+
+    def _row_values(self, vectors: np.ndarray, params: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        codes = self._encode(vectors, params)
+        decoded = params["minimums"] + params["scales"] * codes.astype(np.float32)
+        return {"index": codes, "code_norms": np.einsum("ij,ij->i", decoded, decoded)}
+
+    def _chunk_scores(self, queries: np.ndarray, start: int, end: int) -> np.ndarray:
+        # x̂ = min + scale * c  =>  q·x̂ = q·min + (q * scale)·c
+        products = (queries * self.scales) @ self.index[start:end].astype(np.float32).T
+        products += (queries @ self.minimums)[:, None]
         
-        # Mevcut ID'leri al
-        current_ids = list(self.id_to_index.keys())
+        if self.metric_type == "l2":
+            query_norms = np.einsum("ij,ij->i", queries, queries)
+            return self.code_norms[start:end][None, :] - 2 * products + query_norms[:, None]
+        return -products
+
+    def _approximate_distances(self, scores: np.ndarray) -> np.ndarray:
+        if self.metric_type == "l2":
+            return np.maximum(scores, 0.0)
+        # cosine için iç çarpım, dot için negatif iç çarpım (faiss yöneticileriyle aynı)
+        return scores if self.metric_type == "dot" else -scores
+
+    def _row_arrays(self) -> Dict[str, np.ndarray]:
+        return {"index": self.index, "code_norms": self.code_norms}
+
+    def _grow_rows(self, capacity: int) -> None:
+        code_norms = np.zeros(capacity, dtype=np.float32)
+        code_norms[:self.size] = self.code_norms[:self.size]
+        self.code_norms = code_norms
+
+
+class BinaryQuantizedIndex(QuantizedIndex):
+    """
+    1-bit ikili nicemlenmiş vektör indeksi (vektör başına dimension / 8 bayt).
+
+    Her boyut, boyut ortalamasına göre tek bite indirgenir; adaylar Hamming
+    uzaklığıyla (uint64 kelimeler üzerinde XOR + popcount) seçilip ham
+    vektörlerle yeniden puanlanır. Boyut ortalamaları ilk
+    `training_sample_size` vektör boyunca, vektör sayısı her ikiye
+    katlandığında arka planda yeniden hesaplanır ve kodlar yeniden üretilir.
+    """
+
+    index_label = "Binary"
+    default_oversample = 8
+
+    def _configure(self) -> None:
+        # Kodlar uint64 kelimelere bölünebilecek şekilde 8 bayta yuvarlanır
+        self.code_size = ((self.dimension + 63) // 64) * 8
+        self.thresholds = np.zeros(self.dimension, dtype=np.float32)
+        self.calibration_limit = getattr(self.config, "training_sample_size", 50000)
+        self._calibrated_size = 0
+
+    def _params(self) -> Dict[str, Any]:
+        return {"thresholds": self.thresholds, "_calibrated_size": self._calibrated_size}
+
+    def _fit_params(self, rows: np.ndarray, count: int) -> Dict[str, Any]:
+        # Kalibrasyon canlı satırların ilk calibration_limit tanesinin ortalamasıyla yapılır
+        rows = rows[:self.calibration_limit]
+        total = np.zeros(self.dimension, dtype=np.float64)
         
-        # Her ID için yeni indeks ata
-        for new_idx, vector_id in enumerate(current_ids):
-            new_id_to_index[vector_id] = new_idx
-            new_index_to_id[new_idx] = vector_id
+        for start in range(0, len(rows), self.search_chunk_rows):
+            total += self.raw_vectors.read(rows[start:start + self.search_chunk_rows]).sum(axis=0, dtype=np.float64)
         
-        # Mapping'leri güncelle
-        self.id_to_index = new_id_to_index
-        self.index_to_id = new_index_to_id
-        self.next_index = len(self.vectors)
\ No newline at end of file
+        thresholds = (total / len(rows)).astype(np.float32) if len(rows) else self.thresholds
+        logger.debug(f"{self.index_label} indeks eşikleri {len(rows)} vektörle hesaplandı")
+        return {"thresholds": thresholds, "_calibrated_size": count}
+
+    def _needs_calibration(self, vectors: np.ndarray) -> bool:
+        return self._calibrated_size < self.calibration_limit and self.size >= 2 * self._calibrated_size
+
+    def _encode(self, vectors: np.ndarray, params: Optional[Dict[str, Any]] = None) -> np.ndarray:
+        thresholds = params["thresholds"] if params else self.thresholds
+        bits = np.packbits(vectors > thresholds, axis=1, bitorder="little")
+        codes = np.zeros((len(vectors), self.code_size), dtype=np.uint8)
+        codes[:, :bits.shape[1]] = bits
+        return codes
+
+    def _chunk_scores(self, queries: np.ndarray, start: int, end: int) -> np.ndarray:
+        words = self.index[start:end].view(np.uint64)
+        query_words = self._encode(queries).view(np.uint64)
+        
+        scores = np.empty((len(queries), end - start), dtype=np.float32)
+        for i, query in enumerate(query_words):
+            scores[i] = _popcount_rows(np.bitwise_xor(words, query))
+        return scores
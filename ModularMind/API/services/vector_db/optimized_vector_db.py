@@ -14,6 +14,10 @@ from dataclasses import dataclass
 
 from ModularMind.API.services.retrieval.models import Document, Chunk
 from ModularMind.API.db.base import DatabaseManager
+from ModularMind.API.services.vector_db.index_managers import (
+    FlatIndex, HNSWIndex, IVFIndex, PQIndex, IVFPQIndex,
+    ScalarQuantizedIndex, BinaryQuantizedIndex
+)
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +29,8 @@ class IndexType(str, Enum):
     PQ = "pq"             # Product Quantization (sıkıştırma)
     IVFPQ = "ivfpq"       # IVF + PQ kombinasyonu
     IVFHNSW = "ivfhnsw"   # IVF + HNSW kombinasyonu
+    SQ8 = "sq8"           # int8 skaler nicemleme (4x sıkıştırma)
+    BINARY = "binary"     # 1-bit ikili nicemleme, Hamming araması (32x sıkıştırma)
     CUSTOM = "custom"     # Özel indeks tipi
 
 @dataclass
@@ -43,6 +49,18 @@ class VectorDBConfig:
     shard_count: int = 1
     cache_vectors: bool = True
     max_cache_size: int = 10000  # Maksimum önbellek boyutu
+    initial_capacity: int = 1024        # Flat indeks için başlangıç tampon kapasitesi
+    compaction_threshold: float = 0.25  # Arka plan sıkıştırması için silinmiş satır oranı
+    compaction_retry_delay: float = 0.1  # Eşzamanlı yazma nedeniyle iptal edilen sıkıştırmanın yeniden denenme aralığı (saniye)
+    training_threshold: int = 0         # IVF/PQ eğitimi için gereken vektör sayısı (0 = indeks türüne göre)
+    training_sample_size: int = 50000   # Eğitim rezervuar örneğinin en fazla boyutu
+    drift_threshold: float = 1.5        # Yeniden eğitimi tetikleyen nicemleme hatası artış oranı (0 = kapalı)
+    keep_raw_vectors: bool = False      # Eğitilmiş indekslerde ham vektörleri mmap dosyasında tut
+    raw_vector_path: Optional[str] = None  # Ham vektör dosyası (None ise geçici dosya)
+    rescore_oversample: int = 0         # >1 ise sıkıştırılmış aramadan top_k * değer aday alınıp ham vektörlerle yeniden puanlanır (0 = indeks türüne göre)
+    index_path: Optional[str] = None    # HNSW anlık görüntü ve WAL dizini (None = kalıcılık kapalı)
+    snapshot_interval: float = 300.0    # Arka plan anlık görüntüleri arası saniye (0 = kapalı)
+    wal_fsync: bool = False             # Her WAL kaydından sonra fsync yap
 
 class OptimizedVectorDB:
     """
@@ -108,6 +126,10 @@ class OptimizedVectorDB:
             self.index_manager = PQIndex(self.config)
         elif self.config.index_type == IndexType.IVFPQ:
             self.index_manager = IVFPQIndex(self.config)
+        elif self.config.index_type == IndexType.SQ8:
+            self.index_manager = ScalarQuantizedIndex(self.config)
+        elif self.config.index_type == IndexType.BINARY:
+            self.index_manager = BinaryQuantizedIndex(self.config)
         else:
             # Varsayılan olarak HNSW kullan
             logger.warning(f"Desteklenmeyen indeks türü: {self.config.index_type.value}, varsayılan HNSW kullanılıyor")
@@ -310,6 +332,144 @@ class OptimizedVectorDB:
         
         return enriched_results
     
+    def query_batch(self, query_vectors: List[np.ndarray], top_k: int = 10) -> List[List[Dict[str, Any]]]:
+        """
+        Birden fazla sorgu vektörü için tek seferde arama yapar.
+        
+        Args:
+            query_vectors: Sorgu vektörleri
+            top_k: Her sorgu için getirilecek en fazla sonuç sayısı
+            
+        Returns:
+            List[List[Dict[str, Any]]]: Her sorgu için arama sonuçları
+        """
+        if len(query_vectors) == 0:
+            return []
+        
+        search_start_time = time.time()
+        
+        query_matrix = np.asarray(query_vectors, dtype=np.float32)
+        if query_matrix.ndim != 2 or query_matrix.shape[1] != self.config.dimension:
+            raise ValueError(f"Sorgu matrisi boyutu ({query_matrix.shape}) beklenen boyut ({self.config.dimension}) ile eşleşmiyor")
+        
+        ids, distances = self.index_manager.query_batch(query_matrix, top_k)
+        
+        # Tüm sorguların sonuçlarını tek bir metadata sorgusuyla zenginleştir
+        raw_results = [
+            [
+                {"vector_id": vector_id, "distance": float(distance)}
+                for vector_id, distance in zip(row_ids, row_distances)
+                if vector_id is not None
+            ]
+            for row_ids, row_distances in zip(ids, distances)
+        ]
+        enriched = self._enrich_results([result for results in raw_results for result in results])
+        enriched_by_id = {result["vector_id"]: result for result in enriched}
+        
+        batch_results = []
+        for results in raw_results:
+            batch_results.append([
+                {**enriched_by_id[result["vector_id"]], "distance": result["distance"], "similarity": 1.0 - min(1.0, result["distance"])}
+                for result in results
+                if result["vector_id"] in enriched_by_id
+            ])
+        
+        search_time = time.time() - search_start_time
+        logger.info(f"Toplu vektör araması tamamlandı: {len(query_vectors)} sorgu, {search_time:.4f} saniye")
+        
+        return batch_results
+
+    def search_by_vector(
+        self,
+        query_vector: List[float],
+        limit: int = 5,
+        filter_metadata: Optional[Dict[str, Any]] = None,
+        include_metadata: bool = True,
+        embedding_model: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Vektör deposu arayüzüyle tek vektör araması yapar.
+
+        Args:
+            query_vector: Sorgu vektörü
+            limit: Sonuç limiti
+            filter_metadata: Meta veri filtresi
+            include_metadata: Meta verileri dahil et
+            embedding_model: Kullanılacak embedding modeli (tek indeksli depoda yok sayılır)
+
+        Returns:
+            List[Dict[str, Any]]: Arama sonuçları
+        """
+        results = self.query(np.asarray(query_vector, dtype=np.float32), top_k=limit, filter=filter_metadata)
+        return [self._to_store_result(result, include_metadata) for result in results]
+
+    def search_by_vectors(
+        self,
+        query_vectors: List[List[float]],
+        limit: int = 5,
+        filter_metadata: Optional[Dict[str, Any]] = None,
+        include_metadata: bool = True,
+        embedding_model: Optional[str] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Vektör deposu arayüzüyle toplu arama yapar.
+
+        Filtresiz sorgularda tüm sorgu matrisi tek bir index_manager.query_batch
+        çağrısıyla aranır; metadata filtresi her sorgu için ayrı aday kümesi
+        gerektirdiğinden filtreli sorgular tek tek çalıştırılır.
+
+        Args:
+            query_vectors: Sorgu vektörleri
+            limit: Her sorgu için sonuç limiti
+            filter_metadata: Meta veri filtresi
+            include_metadata: Meta verileri dahil et
+            embedding_model: Kullanılacak embedding modeli (tek indeksli depoda yok sayılır)
+
+        Returns:
+            List[List[Dict[str, Any]]]: Her sorgu için arama sonuçları
+        """
+        if len(query_vectors) == 0:
+            return []
+
+        if filter_metadata:
+            return [
+                self.search_by_vector(
+                    query_vector,
+                    limit=limit,
+                    filter_metadata=filter_metadata,
+                    include_metadata=include_metadata
+                )
+                for query_vector in query_vectors
+            ]
+
+        batch_results = self.query_batch(query_vectors, top_k=limit)
+        return [
+            [self._to_store_result(result, include_metadata) for result in results]
+            for results in batch_results
+        ]
+
+    def _to_store_result(self, result: Dict[str, Any], include_metadata: bool) -> Dict[str, Any]:
+        """
+        Zenginleştirilmiş indeks sonucunu vektör deposu sonuç biçimine dönüştürür.
+
+        Args:
+            result: _enrich_results çıktısındaki sonuç
+            include_metadata: Meta verileri dahil et
+
+        Returns:
+            Dict[str, Any]: id, document_id, text, score ve metadata alanlarını içeren sonuç
+        """
+        metadata = result.get("metadata") or {}
+        store_result = {
+            "id": metadata.get("chunk_id", result["vector_id"]),
+            "document_id": result.get("doc_id") or metadata.get("document_id", ""),
+            "text": metadata.get("text", ""),
+            "score": result["similarity"]
+        }
+        if include_metadata:
+            store_result["metadata"] = metadata
+        return store_result
+
     def _filter_metadata(self, filter: Dict[str, Any], limit: int = 100) -> Tuple[List[str], List[Dict[str, Any]]]:
         """
         Metadata'ya göre filtreleme yapar.
@@ -508,4 +668,9 @@ class OptimizedVectorDB:
                 "dimension": self.config.dimension,
                 "metric_type": self.config.metric_type,
             }
-        }
\ No newline at end of file
+        }
+    
+    def close(self) -> None:
+        """İndeks yöneticisinin arka plan işlerini durdurur ve kalıcı durumunu yazar."""
+        if self.index_manager is not None and hasattr(self.index_manager, "close"):
+            self.index_manager.close()
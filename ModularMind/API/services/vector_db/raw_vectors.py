@@ -0,0 +1,141 @@
+"""
+Bellek eşlemeli (mmap) ham vektör deposu.
+Sıkıştırılmış indekslerin yanında float32 vektörleri disk üzerinde tutar.
+"""
+
+import logging
+import os
+import tempfile
+import threading
+import numpy as np
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+class MmapVectorStore:
+    """
+    Tamsayı etiketle adreslenen float32 vektörleri mmap dosyasında saklar.
+
+    Etiket doğrudan satır numarasıdır; dosya kapasitesi ikiye katlanarak
+    büyür. Vektörler RAM yerine sayfa önbelleğinden okunduğu için
+    sıkıştırılmış indekslerin yeniden eğitimi ve aday listelerinin tam
+    doğrulukla yeniden puanlanması için kullanılır.
+    """
+
+    def __init__(self, dimension: int, path: Optional[str] = None, initial_capacity: int = 1024):
+        """
+        Args:
+            dimension: Vektör boyutu
+            path: Dosya yolu (None ise geçici dosya oluşturulur ve kapatılınca silinir)
+            initial_capacity: Başlangıç satır kapasitesi
+        """
+        self.dimension = dimension
+        self._owns_file = path is None
+
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix="modularmind_raw_", suffix=".f32")
+            os.close(fd)
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self.path = path
+        self._lock = threading.RLock()
+        self._row_bytes = dimension * np.dtype(np.float32).itemsize
+
+        # Mevcut dosya varsa içeriği korunur
+        existing_rows = os.path.getsize(path) // self._row_bytes if os.path.exists(path) else 0
+        self.capacity = 0
+        self.array = None
+        self._resize(max(1, initial_capacity, existing_rows))
+
+    def __len__(self) -> int:
+        return self.capacity
+
+    def write(self, labels: np.ndarray, vectors: np.ndarray) -> None:
+        """
+        Vektörleri etiketlerinin satırlarına yazar.
+
+        Args:
+            labels: Satır etiketleri
+            vectors: Vektörler (len(labels) x dimension)
+        """
+        labels = np.asarray(labels, dtype=np.int64)
+        if labels.size == 0:
+            return
+
+        with self._lock:
+            required = int(labels.max()) + 1
+            if required > self.capacity:
+                capacity = self.capacity
+                while capacity < required:
+                    capacity *= 2
+                self._resize(capacity)
+
+            self.array[labels] = np.asarray(vectors, dtype=np.float32).reshape(len(labels), self.dimension)
+
+    def read(self, labels: np.ndarray) -> np.ndarray:
+        """
+        Etiketlerin vektörlerini kopya olarak okur.
+
+        Args:
+            labels: Satır etiketleri
+
+        Returns:
+            np.ndarray: Vektörler (len(labels) x dimension)
+        """
+        labels = np.asarray(labels, dtype=np.int64)
+        with self._lock:
+            return np.array(self.array[labels], dtype=np.float32)
+
+    def flush(self) -> None:
+        """Değişiklikleri diske yazar."""
+        with self._lock:
+            if self.array is not None:
+                self.array.flush()
+
+    def replace(self, other: "MmapVectorStore") -> None:
+        """
+        Bu deponun içeriğini başka bir deponun dosyasıyla değiştirir.
+
+        Diğer deponun dosyası bu deponun yoluna taşınır ve yeniden eşlenir;
+        diğer depo bundan sonra kullanılmamalıdır.
+
+        Args:
+            other: İçeriği alınacak depo (dosyası bu deponunkiyle aynı dizinde olmalı)
+        """
+        with self._lock, other._lock:
+            other.array.flush()
+            other.array = None
+            self.array.flush()
+            self.array = None
+
+            os.replace(other.path, self.path)
+            self.capacity = 0
+            self._resize(other.capacity)
+
+    def close(self) -> None:
+        """Eşlemeyi kapatır; geçici dosyayı siler."""
+        with self._lock:
+            if self.array is None:
+                return
+            self.array.flush()
+            self.array = None
+
+            if self._owns_file:
+                try:
+                    os.remove(self.path)
+                except OSError:
+                    pass
+
+    def _resize(self, capacity: int) -> None:
+        """Dosyayı büyütüp yeniden eşler (lock altında çağrılmalıdır)."""
+        if self.array is not None:
+            self.array.flush()
+            self.array = None
+
+        with open(self.path, "ab") as f:
+            f.truncate(capacity * self._row_bytes)
+
+        self.array = np.memmap(self.path, dtype=np.float32, mode="r+", shape=(capacity, self.dimension))
+        self.capacity = capacity
+        logger.debug(f"Ham vektör deposu kapasitesi: {capacity}")
@@ -0,0 +1,185 @@
+"""
+Sıkıştırılmış vektör indeksleri için recall@k ölçümü.
+
+Aynı sorgular sıkıştırılmış arama ve farklı aday çarpanlarıyla iki aşamalı
+(yeniden puanlamalı) arama ile çalıştırılır; sonuçlar tam (brute-force)
+aramayla karşılaştırılarak recall@k ve sorgu başına süre raporlanır.
+
+Komut satırından sentetik veriyle çalıştırılabilir:
+
+    python -m ModularMind.API.services.vector_db.recall_benchmark --index-type pq
+"""
+
+import argparse
+import logging
+import time
+import numpy as np
+from typing import List, Dict, Any, Sequence
+
+logger = logging.getLogger(__name__)
+
+def exact_neighbors(base: np.ndarray, queries: np.ndarray, top_k: int, metric_type: str = "l2", chunk_size: int = 1024) -> np.ndarray:
+    """
+    Tam (brute-force) en yakın komşuları bulur.
+
+    Args:
+        base: Veri vektörleri (n x dimension)
+        queries: Sorgu vektörleri (n_queries x dimension)
+        top_k: Sorgu başına komşu sayısı
+        metric_type: Metrik türü (l2, cosine, dot)
+        chunk_size: Tek seferde işlenen sorgu sayısı
+
+    Returns:
+        np.ndarray: base satır indeksleri (n_queries x top_k)
+    """
+    base = np.asarray(base, dtype=np.float32)
+    queries = np.asarray(queries, dtype=np.float32)
+
+    if metric_type == "cosine":
+        base = base / np.maximum(np.linalg.norm(base, axis=1, keepdims=True), 1e-10)
+        queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-10)
+
+    top_k = min(top_k, len(base))
+    base_norms = np.einsum("ij,ij->i", base, base)
+    neighbors = np.empty((len(queries), top_k), dtype=np.int64)
+
+    for start in range(0, len(queries), chunk_size):
+        chunk = queries[start:start + chunk_size]
+        products = chunk @ base.T
+        # l2 için ||q||^2 sabit olduğundan sıralamaya etkisi yoktur
+        scores = base_norms[None, :] - 2 * products if metric_type == "l2" else -products
+
+        candidates = np.argpartition(scores, top_k - 1, axis=1)[:, :top_k]
+        order = np.argsort(np.take_along_axis(scores, candidates, axis=1), axis=1)
+        neighbors[start:start + len(chunk)] = np.take_along_axis(candidates, order, axis=1)
+
+    return neighbors
+
+def recall_at_k(found_ids: np.ndarray, true_ids: np.ndarray) -> float:
+    """
+    Ortalama recall@k değerini hesaplar.
+
+    Args:
+        found_ids: Bulunan vector_id'ler (n_queries x k, boş konumlar None)
+        true_ids: Gerçek komşu vector_id'leri (n_queries x k)
+
+    Returns:
+        float: Bulunan gerçek komşuların oranı
+    """
+    if len(true_ids) == 0:
+        return 0.0
+
+    hits = 0
+    total = 0
+    for found, truth in zip(found_ids, true_ids):
+        truth = set(truth)
+        hits += len(truth.intersection(vector_id for vector_id in found if vector_id is not None))
+        total += len(truth)
+
+    return hits / total if total else 0.0
+
+def benchmark_recall(
+    manager,
+    base_ids: Sequence[str],
+    base_vectors: np.ndarray,
+    queries: np.ndarray,
+    top_k: int = 10,
+    oversample_values: Sequence[int] = (0, 2, 4, 8)
+) -> List[Dict[str, Any]]:
+    """
+    Bir indeks yöneticisinin recall@k ve gecikmesini ölçer.
+
+    Args:
+        manager: Vektörleri eklenmiş indeks yöneticisi
+        base_ids: Eklenen vektörlerin ID'leri
+        base_vectors: Eklenen vektörler (aynı sırada)
+        queries: Sorgu vektörleri
+        top_k: Sorgu başına sonuç sayısı
+        oversample_values: Denenecek aday çarpanları (0 = yalnızca sıkıştırılmış arama)
+
+    Returns:
+        List[Dict[str, Any]]: Her çarpan için recall ve süre
+    """
+    truth = np.asarray(base_ids, dtype=object)[exact_neighbors(base_vectors, queries, top_k, manager.metric_type)]
+    original = getattr(manager, "rescore_oversample", 0)
+    results = []
+
+    try:
+        for oversample in oversample_values:
+            if oversample > 1 and getattr(manager, "raw_vectors", None) is None:
+                logger.warning("Yeniden puanlama için ham vektör deposu gerekli, çarpan atlandı: %s", oversample)
+                continue
+
+            manager.rescore_oversample = oversample
+            started = time.perf_counter()
+            found, _ = manager.query_batch(queries, top_k)
+            elapsed = time.perf_counter() - started
+
+            results.append({
+                "oversample": oversample,
+                "recall": recall_at_k(found, truth),
+                "ms_per_query": elapsed * 1000 / max(1, len(queries))
+            })
+    finally:
+        manager.rescore_oversample = original
+
+    return results
+
+def main():
+    """Sentetik veriyle recall ölçümü yapar."""
+    from ModularMind.API.services.vector_db.optimized_vector_db import VectorDBConfig, IndexType
+    from ModularMind.API.services.vector_db.index_managers import (
+        PQIndex, IVFPQIndex, ScalarQuantizedIndex, BinaryQuantizedIndex
+    )
+    index_classes = {
+        "pq": PQIndex,
+        "ivfpq": IVFPQIndex,
+        "sq8": ScalarQuantizedIndex,
+        "binary": BinaryQuantizedIndex
+    }
+
+    parser = argparse.ArgumentParser(description="Sıkıştırılmış indeks recall@k ölçümü")
+    parser.add_argument("--index-type", choices=sorted(index_classes), default="pq")
+    parser.add_argument("--vectors", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--dimension", type=int, default=128)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--metric", choices=["l2", "cosine", "dot"], default="l2")
+    parser.add_argument("--oversample", type=int, nargs="+", default=[0, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    config = VectorDBConfig(
+        index_type=IndexType(args.index_type),
+        dimension=args.dimension,
+        metric_type=args.metric,
+        num_subvectors=16,
+        keep_raw_vectors=True
+    )
+    manager = index_classes[args.index_type](config)
+    manager.initialize()
+
+    # Embedding'lere benzer düşük iç boyutlu sentetik veri
+    rng = np.random.default_rng(0)
+    latent = rng.standard_normal((args.vectors + args.queries, 24)).astype(np.float32)
+    projection = rng.standard_normal((24, args.dimension)).astype(np.float32)
+    data = latent @ projection + 0.1 * rng.standard_normal((len(latent), args.dimension)).astype(np.float32)
+    base, queries = data[:args.vectors], data[args.vectors:]
+    base_ids = [f"v{i}" for i in range(len(base))]
+
+    for start in range(0, len(base), 10000):
+        manager.add_vectors(base_ids[start:start + 10000], list(base[start:start + 10000]))
+    if hasattr(manager, "wait_for_training"):
+        manager.wait_for_training()
+        if not manager.is_trained_with_real_data:
+            manager.train()
+
+    print(f"{args.index_type} {args.vectors} x {args.dimension}, {args.queries} sorgu, top_k={args.top_k}")
+    print(f"{'oversample':>10} {f'recall@{args.top_k}':>10} {'ms/sorgu':>10}")
+    for row in benchmark_recall(manager, base_ids, base, queries, args.top_k, args.oversample):
+        print(f"{row['oversample']:>10} {row['recall']:>10.4f} {row['ms_per_query']:>10.3f}")
+
+    manager.raw_vectors.close()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    main()
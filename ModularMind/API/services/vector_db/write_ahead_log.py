@@ -0,0 +1,93 @@
+"""
+İndeks değişiklikleri için write-ahead log (WAL).
+Son anlık görüntüden sonraki eklemeleri ve silmeleri yeniden oynatılabilir
+biçimde diske yazar.
+"""
+
+import logging
+import os
+import pickle
+import struct
+import threading
+import zlib
+from typing import Any, Iterator, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Kayıt başlığı: yük uzunluğu ve yükün crc32 değeri
+_HEADER = struct.Struct("<II")
+
+class WriteAheadLog:
+    """
+    Sadece sona eklenen, kayıt başına sağlama toplamı tutan log dosyası.
+
+    Her kayıt `(işlem, veri)` çiftinin pickle hâlidir. Çökme sırasında
+    yarım kalan son kayıt okuma sırasında sağlama toplamından tanınır ve
+    yok sayılır; ondan önceki tüm kayıtlar geçerlidir.
+    """
+
+    def __init__(self, path: str, fsync: bool = False):
+        """
+        Args:
+            path: Log dosyası yolu (varsa sonuna eklenir)
+            fsync: Her kayıttan sonra fsync yapılıp yapılmayacağı
+        """
+        self.path = path
+        self.fsync = fsync
+        self.records = 0
+        self._lock = threading.Lock()
+        self._file = open(path, "ab")
+
+    def append(self, operation: str, payload: Any) -> None:
+        """
+        Kaydı log sonuna yazar.
+
+        Args:
+            operation: İşlem adı
+            payload: İşlem verisi (pickle ile serileştirilebilir)
+        """
+        data = pickle.dumps((operation, payload), protocol=pickle.HIGHEST_PROTOCOL)
+        record = _HEADER.pack(len(data), zlib.crc32(data)) + data
+
+        with self._lock:
+            self._file.write(record)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self.records += 1
+
+    def close(self) -> None:
+        """Log dosyasını diske yazıp kapatır."""
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+
+    @staticmethod
+    def read(path: str) -> Iterator[Tuple[str, Any]]:
+        """
+        Log kayıtlarını sırayla okur; bozuk veya yarım kalan ilk kayıtta durur.
+
+        Args:
+            path: Log dosyası yolu
+
+        Returns:
+            Iterator[Tuple[str, Any]]: (işlem, veri) çiftleri
+        """
+        with open(path, "rb") as f:
+            while True:
+                header = f.read(_HEADER.size)
+                if len(header) < _HEADER.size:
+                    if header:
+                        logger.warning(f"WAL sonunda yarım kayıt yok sayıldı: {path}")
+                    return
+
+                length, checksum = _HEADER.unpack(header)
+                data = f.read(length)
+                if len(data) < length or zlib.crc32(data) != checksum:
+                    logger.warning(f"WAL sonunda bozuk kayıt yok sayıldı: {path}")
+                    return
+
+                yield pickle.loads(data)
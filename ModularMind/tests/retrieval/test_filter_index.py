@@ -0,0 +1,148 @@
+"""
+Bitmap tabanlı metadata filtre indeksi için test dosyası.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from ModularMind.API.services.retrieval.row_bitmap import RowBitmap
+from ModularMind.API.services.retrieval.filter_index import MetadataFilterIndex
+from ModularMind.API.services.retrieval.search_utils import check_metadata_filter
+
+
+def _random_metadata(rng, row):
+    """Karışık türde alanlar içeren rastgele metadata."""
+    metadata = {
+        "category": rng.choice(["news", "blog", "paper", "wiki"]),
+        "year": rng.randint(2015, 2024),
+        "created_at": (datetime(2024, 1, 1) + timedelta(days=rng.randint(0, 365))).isoformat(),
+        "author": {"name": rng.choice(["ada", "bora", "cem"]), "rank": rng.random()},
+    }
+    if rng.random() < 0.3:
+        metadata["tags"] = rng.sample(["ai", "db", "ml", "web"], 2)
+    if rng.random() < 0.5:
+        metadata["score"] = rng.choice([rng.random() * 10, rng.randint(0, 10)])
+    if row % 17 == 0:
+        return {}
+    return metadata
+
+
+FILTERS = [
+    {"category": "news"},
+    {"category": ["news", "wiki"]},
+    {"category": {"$ne": "blog"}},
+    {"category": {"$nin": ["blog", "paper"]}},
+    {"year": {"$gte": 2018, "$lt": 2021}},
+    {"year": {"$gt": 2022}},
+    {"score": {"$lte": 3}},
+    {"created_at": {"$gte": "2024-06-01", "$lt": "2024-07-01"}},
+    {"created_at": {"$gt": datetime(2024, 11, 1)}},
+    {"author.name": "ada", "year": {"$in": [2016, 2020]}},
+    {"author.rank": {"$gt": 0.5}},
+    {"category": {"$regex": "^(ne|wi)"}},
+    {"tags": ["ai", "db"]},
+    {"$or": [{"category": "paper"}, {"year": {"$lt": 2017}}]},
+    {"$not": {"category": "news"}},
+    {"$and": [{"year": {"$gte": 2020}}, {"$not": {"author.name": "cem"}}]},
+    {"missing": 1},
+]
+
+
+@pytest.fixture
+def rows():
+    """Tekrarlanabilir metadata satırları."""
+    rng = random.Random(11)
+    return [_random_metadata(rng, row) for row in range(3000)]
+
+
+class TestRowBitmap:
+    """RowBitmap test sınıfı."""
+
+    @pytest.mark.parametrize("size", [50, 20000])
+    def test_set_operations_match_python_sets(self, size):
+        """Seyrek ve yoğun kaplarda küme işlemleri Python kümeleriyle aynı olmalı."""
+        rng = np.random.default_rng(size)
+        left = set(rng.integers(0, 200000, size).tolist())
+        right = set(rng.integers(0, 200000, size).tolist())
+        a, b = RowBitmap.from_rows(left), RowBitmap.from_rows(right)
+
+        assert (a & b).to_rows().tolist() == sorted(left & right)
+        assert (a | b).to_rows().tolist() == sorted(left | right)
+        assert (a - b).to_rows().tolist() == sorted(left - right)
+        assert len(a) == len(left)
+
+    def test_incremental_add_and_membership(self):
+        """add() ile eklenen satırlar sorgulanabilmeli; yoğun kaba geçiş korunmalı."""
+        bitmap = RowBitmap()
+        rows = list(range(0, 12000, 2)) + [70000, 5]
+        for row in rows:
+            bitmap.add(row)
+
+        assert len(bitmap) == len(set(rows))
+        assert 5 in bitmap and 70000 in bitmap
+        assert 7 not in bitmap
+        assert bitmap.containers[0].dtype == np.uint64
+
+    @pytest.mark.parametrize("row", [0, 65535, 65536, 70001, 199999])
+    def test_delete_row_shifts_later_rows(self, row):
+        """Silinen satır çıkarılmalı, sonraki satırlar kap sınırları boyunca birer kaymalı."""
+        rng = np.random.default_rng(row)
+        rows = set(rng.integers(0, 200000, 20000).tolist()) | {row, 65536}
+        expected = sorted(r - 1 if r > row else r for r in rows if r != row)
+
+        assert RowBitmap.from_rows(rows).delete_row(row).to_rows().tolist() == expected
+
+
+class TestMetadataFilterIndex:
+    """MetadataFilterIndex test sınıfı."""
+
+    @pytest.mark.parametrize("filter_metadata", FILTERS)
+    def test_matches_check_metadata_filter(self, rows, filter_metadata):
+        """Bitmap sonuçları satır satır filtre kontrolüyle birebir aynı olmalı."""
+        index = MetadataFilterIndex.build(rows)
+
+        expected = [row for row, metadata in enumerate(rows) if check_metadata_filter(metadata, filter_metadata)]
+        assert index.evaluate(filter_metadata).to_rows().tolist() == expected
+
+    def test_update_row_replaces_values(self, rows):
+        """Güncellenen satır eski değerlerle eşleşmemeli, yenileriyle eşleşmeli."""
+        index = MetadataFilterIndex.build(rows)
+        new_metadata = {"category": "archive", "year": 1999}
+        index.update_row(3, rows[3], new_metadata)
+        rows[3] = new_metadata
+
+        for filter_metadata in FILTERS + [{"category": "archive"}, {"year": {"$lt": 2000}}]:
+            expected = [row for row, metadata in enumerate(rows) if check_metadata_filter(metadata, filter_metadata)]
+            assert index.evaluate(filter_metadata).to_rows().tolist() == expected
+
+    def test_delete_row_matches_rebuild(self, rows):
+        """Satır silindikten sonra sonuçlar kalan satırlardan kurulan indeksle aynı olmalı."""
+        index = MetadataFilterIndex.build(rows)
+        for row in (0, 17, 1500, 2996, 42):
+            index.delete_row(row, rows[row])
+            del rows[row]
+
+        rebuilt = MetadataFilterIndex.build(rows)
+        assert index.row_count == rebuilt.row_count == len(rows)
+        for filter_metadata in FILTERS:
+            assert index.evaluate(filter_metadata) == rebuilt.evaluate(filter_metadata)
+
+    def test_selectivity(self, rows):
+        """Seçicilik eşleşen satır oranı olmalı."""
+        index = MetadataFilterIndex.build(rows)
+        matches, selectivity = index.estimate_selectivity({"category": "news"})
+
+        assert selectivity == pytest.approx(len(matches) / len(rows))
+        assert 0 < selectivity < 1
+
+    def test_combined_range_operators(self):
+        """Aynı alandaki tüm operatörler birlikte uygulanmalı."""
+        rows = [{"year": year} for year in range(2010, 2025)]
+        index = MetadataFilterIndex.build(rows)
+
+        result = index.evaluate({"year": {"$gte": 2015, "$lt": 2018}})
+        assert [rows[row]["year"] for row in result.to_rows()] == [2015, 2016, 2017]
+        assert check_metadata_filter({"year": 2019}, {"year": {"$gte": 2015, "$lt": 2018}}) is False
@@ -0,0 +1,93 @@
+"""
+Anahtar kelime ters indeksi için test dosyası.
+"""
+
+import math
+import random
+import pytest
+
+from ModularMind.API.services.retrieval.inverted_index import InvertedIndex, chunk_keyword_text
+
+
+@pytest.fixture
+def corpus():
+    """Rastgele ama tekrarlanabilir küçük bir korpus."""
+    rng = random.Random(7)
+    vocabulary = [f"term{i}" for i in range(40)]
+    return {
+        f"c{i}": " ".join(rng.choice(vocabulary[:rng.randint(5, 40)]) for _ in range(rng.randint(3, 60)))
+        for i in range(200)
+    }
+
+
+def _exhaustive_search(index, terms, limit):
+    """Budamasız referans arama."""
+    scores = [(chunk_id, index.score(chunk_id, terms)) for chunk_id in index.doc_lengths]
+    scores = [item for item in scores if item[1] > 0]
+    return sorted(scores, key=lambda item: (item[1], item[0]), reverse=True)[:limit]
+
+
+class TestInvertedIndex:
+    """InvertedIndex test sınıfı."""
+
+    def test_corpus_statistics(self):
+        """IDF ve ortalama uzunluk gerçek korpustan hesaplanmalı."""
+        index = InvertedIndex()
+        index.add("a", "python vector search")
+        index.add("b", "python keyword search search")
+
+        assert index.avg_doc_length == pytest.approx(3.5)
+        assert index.postings["search"] == {"a": 1, "b": 2}
+        assert index.idf("vector") == pytest.approx(math.log(1 + 1.5 / 1.5))
+        assert index.idf("python") < index.idf("vector")
+
+    def test_maxscore_matches_exhaustive(self, corpus):
+        """MaxScore budaması tam taramayla aynı top-k sonucunu vermeli."""
+        index = InvertedIndex()
+        index.add_many(corpus.items())
+
+        for query in (["term1", "term7", "term30"], ["term0"], ["term3", "term39", "term12", "term5"]):
+            expected = _exhaustive_search(index, query, 10)
+            actual = index.search(query, limit=10)
+            assert [chunk_id for chunk_id, _ in actual] == [chunk_id for chunk_id, _ in expected]
+            assert [score for _, score in actual] == pytest.approx([score for _, score in expected])
+
+    def test_remove_and_update(self, corpus):
+        """Silme ve yeniden ekleme istatistikleri tutarlı bırakmalı."""
+        index = InvertedIndex()
+        index.add_many(corpus.items())
+        index.add("c0", "unique words only")
+        assert index.remove("c1")
+        assert not index.remove("missing")
+
+        rebuilt = InvertedIndex()
+        rebuilt.add_many((chunk_id, text) for chunk_id, text in corpus.items() if chunk_id not in ("c0", "c1"))
+        rebuilt.add("c0", "unique words only")
+
+        assert index.postings == rebuilt.postings
+        assert index.total_length == rebuilt.total_length
+        assert index.search(["unique"], limit=1)[0][0] == "c0"
+
+    def test_candidate_filter(self, corpus):
+        """Filtre dışı chunk'lar sonuçlara girmemeli."""
+        index = InvertedIndex()
+        index.add_many(corpus.items())
+
+        allowed = lambda chunk_id: int(chunk_id[1:]) % 2 == 0
+        results = index.search(["term1", "term2"], limit=5, candidate_filter=allowed)
+
+        expected = [item for item in _exhaustive_search(index, ["term1", "term2"], 200) if allowed(item[0])][:5]
+        assert [chunk_id for chunk_id, _ in results] == [chunk_id for chunk_id, _ in expected]
+
+    def test_serialization_roundtrip(self, corpus):
+        """to_dict/from_dict sonrası arama sonuçları aynı olmalı."""
+        index = InvertedIndex()
+        index.add_many(corpus.items())
+        restored = InvertedIndex.from_dict(index.to_dict())
+
+        assert restored.search(["term4", "term8"], limit=5) == index.search(["term4", "term8"], limit=5)
+
+    def test_chunk_keyword_text(self):
+        """Chunk metni ve metadata metin alanları birleştirilmeli."""
+        text = chunk_keyword_text("body", {"title": "Başlık", "text": "body", "page": 3})
+        assert text == "body Başlık"
@@ -0,0 +1,102 @@
+"""
+Paylaşılan retrieval sonuç önbelleği için test dosyası.
+"""
+
+import logging
+import time
+
+import numpy as np
+import pytest
+
+from ModularMind.API.services.retrieval import result_cache
+from ModularMind.API.services.retrieval.result_cache import ResultCache, get_result_cache
+
+
+class TestResultCache:
+    """ResultCache test sınıfı."""
+
+    def test_canonical_keys(self):
+        """Eşdeğer sorgular ve farklı sıradaki filtreler aynı girdiyi kullanmalı."""
+        cache = ResultCache()
+        cache.set("multi_stage", "Ankara  Nüfusu", ["sonuç"], {"top_k": 5, "filters": {"a": 1, "b": 2}})
+
+        assert cache.get("multi_stage", " ankara nüfusu ", {"filters": {"b": 2, "a": 1}, "top_k": 5}) == ["sonuç"]
+        assert cache.get("multi_stage", "ankara nüfusu", {"filters": {"a": 1, "b": 2}, "top_k": 10}) is None
+
+    def test_hits_are_copies(self):
+        """İsabetler önbelleği etkilemeden değiştirilebilmeli."""
+        cache = ResultCache()
+        cache.set("multi_stage", "sorgu", [{"score": 1.0}])
+
+        cache.get("multi_stage", "sorgu")[0]["score"] = 0.0
+
+        assert cache.get("multi_stage", "sorgu")[0]["score"] == 1.0
+
+    def test_ttl_and_lru_limits(self):
+        """Süresi dolan girdiler ve bellek sınırını aşan en eski girdiler çıkarılmalı."""
+        cache = ResultCache(max_entries=100, max_memory_bytes=20000)
+        cache.set("multi_stage", "kısa", [1], ttl=0.05)
+        time.sleep(0.1)
+        assert cache.get("multi_stage", "kısa") is None
+
+        for i in range(10):
+            cache.set("multi_stage", f"sorgu {i}", "x" * 4000)
+
+        stats = cache.stats()
+        assert stats["memory_bytes"] <= 20000
+        assert stats["evictions"] > 0
+        assert cache.get("multi_stage", "sorgu 0") is None
+        assert cache.get("multi_stage", "sorgu 9") is not None
+
+    def test_collection_invalidation(self):
+        """Koleksiyona yazma yalnızca o koleksiyonun sonuçlarını geçersiz kılmalı."""
+        cache = ResultCache()
+        cache.set("multi_stage", "sorgu", [1], collection="belgeler")
+        cache.set("multi_stage", "sorgu", [2], collection="diğer")
+
+        assert cache.invalidate("belgeler") == 1
+        assert cache.get("multi_stage", "sorgu", collection="belgeler") is None
+        assert cache.get("multi_stage", "sorgu", collection="diğer") == [2]
+
+    def test_result_computed_before_invalidation_is_not_stored(self):
+        """Bir sürümde okunup koleksiyona yazıldıktan sonra saklanan sonuç atılmalı."""
+        cache = ResultCache()
+        version = cache.version("belgeler")
+        assert cache.get("multi_stage", "sorgu", collection="belgeler", version=version) is None
+
+        # Sonuç hesaplanırken koleksiyona yazılır
+        cache.invalidate("belgeler")
+        cache.set("multi_stage", "sorgu", ["eski"], collection="belgeler", version=version)
+
+        assert cache.get("multi_stage", "sorgu", collection="belgeler") is None
+        assert cache.stats()["stale_writes"] == 1
+
+        version = cache.version("belgeler")
+        cache.set("multi_stage", "sorgu", ["yeni"], collection="belgeler", version=version)
+        assert cache.get("multi_stage", "sorgu", collection="belgeler", version=version) == ["yeni"]
+
+    def test_semantic_lookup(self):
+        """Eşiği geçen benzer sorgular önbellekteki sonucu kullanmalı."""
+        cache = ResultCache(semantic_threshold=0.95)
+        cache.set("multi_stage", "şifremi nasıl sıfırlarım", [1], embedding=np.array([1.0, 0.0, 0.0]))
+
+        assert cache.get("multi_stage", "şifre sıfırlama", embedding=np.array([0.99, 0.05, 0.0])) == [1]
+        assert cache.get("multi_stage", "fatura adresi", embedding=np.array([0.0, 1.0, 0.0])) is None
+        assert cache.stats()["semantic_hits"] == 1
+
+    def test_shared_cache_warns_on_different_config(self, monkeypatch, caplog):
+        """Paylaşılan önbellek farklı ayarlarla tekrar istenirse uyarı loglanmalı."""
+        monkeypatch.setattr(result_cache, "_result_cache", None)
+        monkeypatch.setattr(result_cache, "_result_cache_config", {})
+
+        cache = get_result_cache(max_entries=10, ttl=60)
+        with caplog.at_level(logging.WARNING, logger=result_cache.__name__):
+            assert get_result_cache(max_entries=10, ttl=60) is cache
+            assert get_result_cache() is cache
+            assert not caplog.records
+
+            assert get_result_cache(max_entries=20, ttl=60) is cache
+
+        assert len(caplog.records) == 1
+        assert "max_entries" in caplog.records[0].getMessage()
+        assert cache.max_entries == 10
@@ -0,0 +1,169 @@
+"""
+Aşama bağımlılık grafı için test dosyası.
+"""
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from ModularMind.API.services.retrieval.stage_graph import StageGraph, AbandonedStages
+
+
+class TestStageGraph:
+    """StageGraph test sınıfı."""
+
+    @pytest.fixture
+    def executor(self):
+        """Aşamaları çalıştıran iş parçacığı havuzu."""
+        executor = ThreadPoolExecutor(max_workers=4)
+        yield executor
+        executor.shutdown(wait=False)
+
+    def sleeper(self, seconds, value):
+        """Belirli süre bekleyip değer döndüren aşama."""
+        def stage(inputs):
+            time.sleep(seconds)
+            return value
+        return stage
+
+    def test_dependencies_receive_results(self, executor):
+        """Bağımlı aşama yalnızca bağımlılıklarının sonuçlarını almalı."""
+        graph = StageGraph()
+        graph.add_stage("a", lambda inputs: 2)
+        graph.add_stage("b", lambda inputs: 3)
+        graph.add_stage("c", lambda inputs: sorted(inputs.items()), depends_on=["a", "b"])
+
+        outcome = graph.run(executor)
+
+        assert outcome.results["c"] == [("a", 2), ("b", 3)]
+        assert not outcome.timed_out and not outcome.skipped and not outcome.failed
+
+    def test_independent_stages_run_concurrently(self, executor):
+        """Toplam süre aşamaların toplamına değil kritik yola yaklaşmalı."""
+        graph = StageGraph()
+        graph.add_stage("chain1", self.sleeper(0.2, 1))
+        graph.add_stage("chain2", self.sleeper(0.2, 2), depends_on=["chain1"])
+        graph.add_stage("side1", self.sleeper(0.2, 3))
+        graph.add_stage("side2", self.sleeper(0.2, 4))
+
+        outcome = graph.run(executor)
+
+        assert outcome.results == {"chain1": 1, "chain2": 2, "side1": 3, "side2": 4}
+        assert outcome.elapsed < 0.6
+
+    def test_stage_timeout_uses_default(self, executor):
+        """Süresi dolan aşama varsayılan değeri almalı, bağımlıları bu değerle çalışmalı."""
+        release = threading.Event()
+        graph = StageGraph()
+        graph.add_stage("slow", lambda inputs: release.wait(5) and ["late"], timeout_seconds=0.05, default=[])
+        graph.add_stage("next", lambda inputs: inputs["slow"] + ["next"], depends_on=["slow"])
+
+        outcome = graph.run(executor)
+        release.set()
+
+        assert outcome.timed_out == {"slow"}
+        assert outcome.results["next"] == ["next"]
+        assert outcome.elapsed < 1
+
+    def test_budget_skips_remaining_stages(self, executor):
+        """Toplam bütçe dolunca bitmeyen ve başlamayan aşamalar beklenmemeli."""
+        release = threading.Event()
+        graph = StageGraph()
+        graph.add_stage("fast", lambda inputs: "ok")
+        graph.add_stage("slow", lambda inputs: release.wait(5), default="slow-default")
+        graph.add_stage("after", lambda inputs: "after", depends_on=["slow"], default="after-default")
+
+        outcome = graph.run(executor, budget_seconds=0.1)
+        release.set()
+
+        assert outcome.results == {"fast": "ok", "slow": "slow-default", "after": "after-default"}
+        assert outcome.timed_out == {"slow"}
+        assert outcome.skipped == {"after"}
+        assert outcome.elapsed < 1
+
+    def test_abandoned_stages_are_limited(self, executor):
+        """Bırakılmış aşamalar sınıra ulaşınca yeni aşamalar havuzu meşgul etmemeli."""
+        release = threading.Event()
+        abandoned = AbandonedStages(limit=2)
+
+        for _ in range(2):
+            graph = StageGraph()
+            graph.add_stage("stuck", lambda inputs: release.wait(5), timeout_seconds=0.05, default=False)
+            outcome = graph.run(executor, abandoned=abandoned)
+            assert outcome.timed_out == {"stuck"}
+
+        assert abandoned.count == 2 and abandoned.saturated
+
+        calls = []
+        graph = StageGraph()
+        graph.add_stage("search", lambda inputs: calls.append("search"), default=[])
+        graph.add_stage("count", lambda inputs: len(inputs["search"]), depends_on=["search"], default=0)
+        outcome = graph.run(executor, abandoned=abandoned)
+
+        assert outcome.skipped == {"search", "count"}
+        assert outcome.results == {"search": [], "count": 0}
+        assert calls == []
+
+        # Takılan aşamalar bitince sınır serbest kalmalı
+        release.set()
+        deadline = time.monotonic() + 2
+        while abandoned.count and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert abandoned.count == 0
+
+        outcome = graph.run(executor, abandoned=abandoned)
+        assert not outcome.skipped
+        assert calls == ["search"]
+
+    def test_queued_stage_is_cancelled_not_abandoned(self):
+        """Henüz başlamamış aşama iptal edilmeli, bırakılmış sayılmamalı."""
+        release = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=1)
+        abandoned = AbandonedStages(limit=5)
+        try:
+            graph = StageGraph()
+            graph.add_stage("running", lambda inputs: release.wait(5))
+            graph.add_stage("queued", lambda inputs: "queued", default="default")
+            outcome = graph.run(executor, budget_seconds=0.05, abandoned=abandoned)
+
+            assert outcome.results["queued"] == "default"
+            assert abandoned.count == 1
+        finally:
+            release.set()
+            executor.shutdown(wait=False)
+
+    def test_early_exit_skips_pending_stages(self, executor):
+        """Erken çıkış koşulu sağlanınca kalan aşamalar çalıştırılmamalı."""
+        calls = []
+        graph = StageGraph()
+        graph.add_stage("first", lambda inputs: [0.95, 0.9])
+        graph.add_stage("rerank", lambda inputs: calls.append("rerank"), depends_on=["first"], default=None)
+
+        outcome = graph.run(executor, early_exit=lambda stage, results: stage == "first" and min(results["first"]) > 0.8)
+
+        assert outcome.early_exit
+        assert outcome.skipped == {"rerank"}
+        assert outcome.results["rerank"] is None
+        assert calls == []
+
+    def test_failed_stage_uses_default(self, executor):
+        """Hata veren aşama varsayılan değeri almalı."""
+        def failing(inputs):
+            raise RuntimeError("arama hatası")
+
+        graph = StageGraph()
+        graph.add_stage("search", failing, default=[])
+        graph.add_stage("count", lambda inputs: len(inputs["search"]), depends_on=["search"])
+
+        outcome = graph.run(executor)
+
+        assert outcome.failed == {"search"}
+        assert outcome.results["count"] == 0
+
+    def test_unknown_dependency_is_rejected(self):
+        """Tanımlanmamış aşamaya bağımlılık reddedilmeli."""
+        graph = StageGraph()
+        with pytest.raises(ValueError):
+            graph.add_stage("b", lambda inputs: None, depends_on=["a"])
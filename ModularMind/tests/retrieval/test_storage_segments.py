@@ -0,0 +1,235 @@
+"""
+Vector Store segment/WAL disk formatı için test dosyası.
+"""
+
+import os
+import json
+import threading
+import pytest
+import numpy as np
+from types import SimpleNamespace
+
+from ModularMind.API.services.retrieval.vector_columns import (
+    VectorColumn, IdColumn, MetadataColumns
+)
+from ModularMind.API.services.retrieval.vector_models import VectorStoreConfig, IndexType
+from ModularMind.API.services.retrieval.inverted_index import InvertedIndex
+from ModularMind.API.services.retrieval.storage import (
+    save_to_disk, load_from_disk, WAL_FILE, SEGMENTS_DIR, HNSW_INDEX_FILE, KEYWORD_INDEX_FILE
+)
+
+
+def _make_store(storage_path, **config_overrides):
+    """Disk işlemleri için asgari vector store nesnesi oluşturur."""
+    config_overrides.setdefault("index_type", IndexType.FLAT)
+    config = VectorStoreConfig(
+        dimensions=3,
+        storage_path=str(storage_path),
+        **config_overrides
+    )
+    return SimpleNamespace(
+        config=config,
+        collection_name="test",
+        vectors=VectorColumn(3),
+        ids=IdColumn(),
+        metadata=MetadataColumns(),
+        id_to_index={},
+        metadata_index={},
+        collection_stats={"total_chunks": 0},
+        index=None,
+        lock=threading.RLock(),
+        pending_upserts=set(),
+        pending_deletes=set(),
+        is_dirty=False,
+        last_saved=0
+    )
+
+
+def _add(store, chunk_id, vector, metadata):
+    """Sütunlara bir chunk ekler ve değişikliği işaretler."""
+    store.id_to_index[chunk_id] = len(store.ids)
+    store.vectors.append(vector)
+    store.ids.append(chunk_id)
+    store.metadata.append(metadata)
+    store.pending_upserts.add(chunk_id)
+
+
+def _update(store, chunk_id, vector, metadata):
+    """Bir chunk'ı yerinde günceller ve değişikliği işaretler."""
+    index = store.id_to_index[chunk_id]
+    store.vectors[index] = vector
+    store.metadata[index] = metadata
+    store.pending_upserts.add(chunk_id)
+
+
+def _delete(store, chunk_id):
+    """Sütunlardan bir chunk siler ve değişikliği işaretler."""
+    index = store.id_to_index.pop(chunk_id)
+    del store.vectors[index]
+    del store.ids[index]
+    del store.metadata[index]
+    store.id_to_index = {cid: i for i, cid in enumerate(store.ids)}
+    store.pending_upserts.discard(chunk_id)
+    store.pending_deletes.add(chunk_id)
+
+
+class TestSegmentStorage:
+    """Segment tabanlı disk depolama test sınıfı."""
+
+    def test_roundtrip_uses_memory_map(self, tmp_path):
+        """Tek segmentli koleksiyon kopyalanmadan mmap ile açılmalı."""
+        store = _make_store(tmp_path)
+        _add(store, "a", [1, 0, 0], {"document_id": "d1"})
+        _add(store, "b", [0, 1, 0], {"document_id": "d2"})
+        assert save_to_disk(store)
+
+        loaded = _make_store(tmp_path)
+        assert load_from_disk(loaded)
+
+        assert loaded.ids.tolist() == ["a", "b"]
+        assert loaded.metadata[1] == {"document_id": "d2"}
+        # Salt okunur mmap görünümü: veri kopyalanmamış olmalı
+        assert not loaded.vectors._data.flags.writeable
+        assert not loaded.vectors._data.flags.owndata
+        np.testing.assert_array_equal(loaded.vectors.array, store.vectors.array)
+
+    def test_incremental_save_appends_segment(self, tmp_path):
+        """Sonraki kayıtlar yalnızca değişen satırları yeni segmente yazmalı."""
+        store = _make_store(tmp_path, max_segments=8, compaction_deleted_ratio=0.9)
+        _add(store, "a", [1, 0, 0], {"n": 1})
+        _add(store, "b", [0, 1, 0], {"n": 2})
+        save_to_disk(store)
+
+        _delete(store, "a")
+        _add(store, "c", [0, 0, 1], {"n": 3})
+        save_to_disk(store)
+
+        with open(os.path.join(tmp_path, "test", WAL_FILE)) as f:
+            ops = [json.loads(line)["op"] for line in f]
+        assert ops == ["segment", "delete", "segment"]
+
+        loaded = _make_store(tmp_path)
+        assert load_from_disk(loaded)
+        assert loaded.ids.tolist() == ["b", "c"]
+        assert loaded.id_to_index == {"b": 0, "c": 1}
+        np.testing.assert_array_equal(loaded.vectors.array, [[0, 1, 0], [0, 0, 1]])
+
+        # mmap'li sütuna yazma kopyalayarak yapılmalı
+        loaded.vectors.append([1, 1, 1])
+        assert len(loaded.vectors) == 3
+
+    def test_compaction_rewrites_single_segment(self, tmp_path):
+        """Silme oranı eşiği aşınca tek segmente birleştirilmeli."""
+        store = _make_store(tmp_path, compaction_deleted_ratio=0.2)
+        for i in range(4):
+            _add(store, f"c{i}", [i, 0, 0], {"i": i})
+        save_to_disk(store)
+
+        _delete(store, "c0")
+        _delete(store, "c1")
+        save_to_disk(store)
+
+        segment_files = os.listdir(os.path.join(tmp_path, "test", SEGMENTS_DIR))
+        assert len(segment_files) == 2  # tek segment: .npy + .jsonl
+
+        loaded = _make_store(tmp_path)
+        assert load_from_disk(loaded)
+        assert loaded.ids.tolist() == ["c2", "c3"]
+
+    def test_truncated_wal_tail_is_ignored(self, tmp_path):
+        """Yarım yazılmış son WAL satırı yüklemeyi bozmamalı."""
+        store = _make_store(tmp_path)
+        _add(store, "a", [1, 0, 0], {})
+        save_to_disk(store)
+
+        with open(os.path.join(tmp_path, "test", WAL_FILE), "a") as f:
+            f.write('{"op": "segm')
+
+        loaded = _make_store(tmp_path)
+        assert load_from_disk(loaded)
+        assert loaded.ids.tolist() == ["a"]
+
+    def test_update_keeps_row_order(self, tmp_path):
+        """Güncellenen satır yüklemeden sonra da bellekteki konumunda kalmalı."""
+        store = _make_store(tmp_path, max_segments=8, compaction_deleted_ratio=0.9)
+        for i in range(4):
+            _add(store, f"c{i}", [i, 0, 0], {"i": i})
+        save_to_disk(store)
+
+        _update(store, "c0", [9, 9, 9], {"i": 9})
+        _add(store, "c4", [4, 0, 0], {"i": 4})
+        save_to_disk(store)
+
+        loaded = _make_store(tmp_path)
+        assert load_from_disk(loaded)
+        assert loaded.ids.tolist() == store.ids.tolist() == ["c0", "c1", "c2", "c3", "c4"]
+        assert loaded.metadata[0] == {"i": 9}
+        np.testing.assert_array_equal(loaded.vectors.array, store.vectors.array)
+
+    def test_hnsw_labels_match_rows_after_reload(self, tmp_path):
+        """HNSW etiketleri güncelleme, ekleme ve silmeden sonra yüklenen satırlara karşılık gelmeli."""
+        hnswlib = pytest.importorskip("hnswlib")
+
+        store = _make_store(tmp_path, index_type=IndexType.HNSW, similarity_function="l2",
+                            max_segments=8, compaction_deleted_ratio=0.9)
+        store.index = hnswlib.Index(space="l2", dim=3)
+        store.index.init_index(max_elements=16)
+        for i in range(4):
+            _add(store, f"c{i}", [i, i, 1], {})
+            store.index.add_items(np.array([[i, i, 1]], dtype=np.float32), [i])
+        save_to_disk(store)
+
+        index_path = os.path.join(tmp_path, "test", HNSW_INDEX_FILE)
+        saved_at = os.stat(index_path).st_mtime_ns
+
+        _update(store, "c0", [5, 5, 5], {})
+        _add(store, "c4", [7, 7, 1], {})
+        save_to_disk(store)
+
+        # Artımlı kayıt grafiği yeniden yazmamalı
+        assert os.stat(index_path).st_mtime_ns == saved_at
+
+        def nearest_id(loaded, vector):
+            labels, _ = loaded.index.knn_query(np.array([vector], dtype=np.float32), k=1)
+            return loaded.ids[int(labels[0][0])]
+
+        loaded = _make_store(tmp_path, index_type=IndexType.HNSW, similarity_function="l2",
+                             max_segments=8, compaction_deleted_ratio=0.9)
+        assert load_from_disk(loaded)
+        assert nearest_id(loaded, [5, 5, 5]) == "c0"
+        assert nearest_id(loaded, [7, 7, 1]) == "c4"
+        assert nearest_id(loaded, [2, 2, 1]) == "c2"
+
+        # Birleştirilmiş segmentten silme satırları kaydırır; grafik yüklemede yeniden kurulmalı
+        _delete(loaded, "c1")
+        save_to_disk(loaded)
+        assert os.stat(index_path).st_mtime_ns == saved_at
+
+        reloaded = _make_store(tmp_path, index_type=IndexType.HNSW, similarity_function="l2")
+        assert load_from_disk(reloaded)
+        assert reloaded.ids.tolist() == ["c0", "c2", "c3", "c4"]
+        assert nearest_id(reloaded, [3, 3, 1]) == "c3"
+        assert nearest_id(reloaded, [7, 7, 1]) == "c4"
+
+    def test_keyword_terms_are_stored_with_segments(self, tmp_path):
+        """Anahtar kelime indeksi tam dosya yerine değişen segmentlerle birlikte yazılmalı."""
+        store = _make_store(tmp_path, max_segments=8, compaction_deleted_ratio=0.9)
+        store.keyword_index = InvertedIndex(k1=1.2)
+        _add(store, "a", [1, 0, 0], {})
+        store.keyword_index.add("a", "elma armut elma")
+        save_to_disk(store)
+
+        _add(store, "b", [0, 1, 0], {})
+        store.keyword_index.add("b", "armut kiraz")
+        save_to_disk(store)
+
+        assert not os.path.exists(os.path.join(tmp_path, "test", KEYWORD_INDEX_FILE))
+        with open(os.path.join(tmp_path, "test", SEGMENTS_DIR, "seg_000002.jsonl")) as f:
+            assert [json.loads(line)[0] for line in f] == ["b"]
+
+        loaded = _make_store(tmp_path)
+        assert load_from_disk(loaded)
+        assert loaded.keyword_index.k1 == 1.2
+        for chunk_id in ("a", "b"):
+            assert loaded.keyword_index.term_counts(chunk_id) == store.keyword_index.term_counts(chunk_id)
+        assert loaded.keyword_index.search(["armut"], limit=5) == store.keyword_index.search(["armut"], limit=5)
@@ -0,0 +1,92 @@
+"""
+Vector Store sütunsal veri yapıları için test dosyası.
+"""
+
+import pytest
+import numpy as np
+
+from ModularMind.API.services.retrieval.vector_columns import (
+    VectorColumn, IdColumn, MetadataColumns
+)
+
+
+class TestVectorColumn:
+    """VectorColumn test sınıfı."""
+
+    def test_append_and_extend_grow_capacity(self):
+        """Vektörler bitişik float32 matriste tutulmalı."""
+        column = VectorColumn(3, capacity=1)
+        column.append([1, 1, 1])
+        column.extend([[2, 2, 2], [3, 3, 3]])
+
+        assert len(column) == 3
+        assert column.array.dtype == np.float32
+        assert column.array.shape == (3, 3)
+        assert column.nbytes == 3 * 3 * 4
+
+    def test_delete_shifts_rows(self):
+        """Silme sonrası satırlar kaydırılmalı."""
+        column = VectorColumn(2)
+        column.extend([[0, 0], [1, 1], [2, 2]])
+
+        del column[1]
+
+        assert column.array.tolist() == [[0, 0], [2, 2]]
+
+    def test_from_array_is_copy_on_write(self):
+        """Salt okunur diziden oluşturulan sütun yazmada kopyalanmalı."""
+        source = np.ones((2, 2), dtype=np.float32)
+        source.flags.writeable = False
+
+        column = VectorColumn.from_array(source)
+        column[0] = [5, 5]
+
+        assert column.array.tolist() == [[5, 5], [1, 1]]
+        assert source.tolist() == [[1, 1], [1, 1]]
+
+
+class TestIdAndMetadataColumns:
+    """IdColumn ve MetadataColumns test sınıfı."""
+
+    def test_id_column_list_interface(self):
+        """IdColumn liste arayüzünü korumalı."""
+        ids = IdColumn(["a", "b", "c"])
+        del ids[0]
+        ids.append("d")
+
+        assert ids.tolist() == ["b", "c", "d"]
+        assert ids[0] == "b"
+
+    def test_metadata_rows_round_trip(self):
+        """Metadata satırları sütunlardan yeniden oluşturulabilmeli."""
+        metadata = MetadataColumns([{"document_id": "d1", "page": 1}, None])
+        metadata.append({"document_id": "d2"})
+
+        assert metadata[0] == {"document_id": "d1", "page": 1}
+        assert metadata[1] == {}
+        assert metadata.column("document_id").tolist() == ["d1", None, "d2"]
+
+        del metadata[0]
+        assert metadata.tolist() == [{}, {"document_id": "d2"}]
+
+    def test_metadata_row_writes_through(self):
+        """Satır görünümündeki değişiklikler sütunlara yazılmalı; eski görünüm yazamamalı."""
+        metadata = MetadataColumns([{"document_id": "d1"}, {"document_id": "d2"}])
+
+        metadata[0]["page"] = 3
+        metadata[1].update(page=4)
+        del metadata[0]["document_id"]
+
+        assert metadata.tolist() == [{"page": 3}, {"document_id": "d2", "page": 4}]
+        assert metadata.column("page").tolist() == [3, 4]
+
+        snapshot = metadata[0]
+        copied = snapshot.copy()
+        copied["page"] = 9
+        assert metadata[0] == {"page": 3}
+
+        stale = metadata[1]
+        del metadata[0]
+        with pytest.raises(RuntimeError):
+            stale["page"] = 5
+        assert metadata.tolist() == [{"document_id": "d2", "page": 4}]
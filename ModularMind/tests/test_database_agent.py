@@ -0,0 +1,181 @@
+"""
+Unit tests for the streaming database source agent
+"""
+import sys
+import types
+import unittest
+from unittest.mock import patch
+
+from ModularMind.API.services.data.source_agent_models import AgentConfig, AgentResult, AgentType
+from ModularMind.API.services.data.source_agent_runners.database_agent import (
+    run_database_connector, _build_keyset_query, CHECKPOINT_STATE_KEY
+)
+
+class FakeServerCursor:
+    """Named cursor serving rows from a table in fetch-sized pages"""
+
+    def __init__(self, connection, name):
+        self.connection = connection
+        self.name = name
+        self.itersize = 2000
+        self.rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def execute(self, sql, params=None):
+        self.connection.executed.append((sql, params))
+        rows = self.connection.table
+        if params is not None:
+            rows = [row for row in rows if (row["id"],) > tuple(params)]
+        self.rows = list(rows)
+
+    def fetchmany(self, size):
+        self.connection.fetch_sizes.append(size)
+        page, self.rows = self.rows[:size], self.rows[size:]
+        return page
+
+class FakeConnection:
+    """Connection returning named cursors over an in-memory table"""
+
+    def __init__(self, table):
+        self.table = table
+        self.executed = []
+        self.fetch_sizes = []
+        self.cursor_names = []
+        self.closed = False
+
+    def cursor(self, name=None, cursor_factory=None):
+        self.cursor_names.append(name)
+        return FakeServerCursor(self, name)
+
+    def close(self):
+        self.closed = True
+
+class TestDatabaseAgent(unittest.TestCase):
+    """Test streaming ingestion from PostgreSQL"""
+
+    def setUp(self):
+        self.table = [{"id": i, "title": f"row {i}"} for i in range(1, 26)]
+        self.connections = []
+
+        def connect(*args, **kwargs):
+            connection = FakeConnection(self.table)
+            self.connections.append(connection)
+            return connection
+
+        psycopg2 = types.ModuleType("psycopg2")
+        psycopg2.connect = connect
+        extras = types.ModuleType("psycopg2.extras")
+        extras.RealDictCursor = object
+        psycopg2.extras = extras
+
+        patcher = patch.dict(sys.modules, {"psycopg2": psycopg2, "psycopg2.extras": extras})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def make_config(self, **options):
+        return AgentConfig(
+            agent_id="db-agent",
+            agent_type=AgentType.DATABASE,
+            name="Database",
+            options={"db_type": "postgres", "database": "app", "query": "SELECT id, title FROM items;", **options}
+        )
+
+    def test_build_keyset_query(self):
+        """Test wrapping a query for keyset pagination"""
+        sql, params = _build_keyset_query("SELECT * FROM items;", ["tenant", "id"], [3, 10])
+
+        self.assertEqual(
+            sql,
+            'SELECT * FROM (SELECT * FROM items) AS source_rows '
+            'WHERE (source_rows."tenant", source_rows."id") > (%s, %s) '
+            'ORDER BY source_rows."tenant", source_rows."id"'
+        )
+        self.assertEqual(params, (3, 10))
+        self.assertEqual(_build_keyset_query("SELECT 1", [], None), ("SELECT 1", ()))
+
+    def test_streams_documents_in_batches(self):
+        """Test that rows are fetched from a named cursor and emitted per batch"""
+        batches = []
+        result = AgentResult(agent_id="db-agent", success=False, documents=[])
+        result.document_sink = lambda documents, state: batches.append((len(documents), state))
+
+        run_database_connector(self.make_config(fetch_size=10), result)
+
+        connection = self.connections[0]
+        self.assertIsNotNone(connection.cursor_names[0])
+        self.assertEqual(set(connection.fetch_sizes), {10})
+        self.assertEqual([size for size, _ in batches], [10, 10, 5])
+        self.assertEqual(result.documents, [])
+        self.assertEqual(result.item_count, 25)
+        self.assertEqual(result.metadata["row_count"], 25)
+        self.assertTrue(connection.closed)
+
+    def test_identical_rows_without_key_get_distinct_ids(self):
+        """Test that duplicate rows are not collapsed into one document id"""
+        self.table[:] = [{"id": 1, "title": "same"}, {"id": 1, "title": "same"}, {"id": 2, "title": "other"}]
+        documents = []
+        result = AgentResult(agent_id="db-agent", success=False, documents=[])
+        result.document_sink = lambda batch, state: documents.extend(batch)
+
+        run_database_connector(self.make_config(fetch_size=2), result)
+
+        self.assertEqual(len({document.id for document in documents}), 3)
+        self.assertEqual(documents[1].metadata["source_key"], documents[0].metadata["source_key"] + ":1")
+
+    def test_resumes_from_checkpoint_after_failure(self):
+        """Test that a crashed run resumes after the last persisted key"""
+        config = self.make_config(fetch_size=10, key_column="id")
+        ingested = []
+
+        def failing_sink(documents, state):
+            if len(ingested) >= 10:
+                raise RuntimeError("worker crashed")
+            ingested.extend(documents)
+            config.state.update(state)
+
+        result = AgentResult(agent_id="db-agent", success=False, documents=[], document_sink=failing_sink)
+        with self.assertRaises(RuntimeError):
+            run_database_connector(config, result)
+
+        self.assertEqual(config.state[CHECKPOINT_STATE_KEY]["last_key"], [10])
+
+        def sink(documents, state):
+            ingested.extend(documents)
+            config.state.update(state)
+
+        result = AgentResult(agent_id="db-agent", success=False, documents=[], document_sink=sink)
+        run_database_connector(config, result)
+
+        sql, params = self.connections[1].executed[0]
+        self.assertIn('WHERE (source_rows."id") > (%s)', sql)
+        self.assertEqual(params, (10,))
+        self.assertEqual(result.metadata["row_count"], 15)
+        self.assertEqual(len(ingested), 25)
+        self.assertEqual(len({document.text for document in ingested}), 25)
+
+        # A completed run clears the checkpoint so the next run starts over
+        self.assertNotIn(CHECKPOINT_STATE_KEY, config.state)
+
+    def test_changed_query_ignores_checkpoint(self):
+        """Test that a checkpoint recorded for another query is not used"""
+        config = self.make_config(key_column="id", keep_checkpoint=True)
+        result = AgentResult(agent_id="db-agent", success=False, documents=[])
+        run_database_connector(config, result)
+
+        self.assertEqual(len(result.documents), 25)
+        self.assertEqual(config.state[CHECKPOINT_STATE_KEY]["last_key"], [25])
+
+        config.options["query"] = "SELECT id, title FROM items WHERE id > 0"
+        result = AgentResult(agent_id="db-agent", success=False, documents=[])
+        run_database_connector(config, result)
+
+        self.assertIsNone(self.connections[1].executed[0][1])
+        self.assertEqual(len(result.documents), 25)
+
+if __name__ == '__main__':
+    unittest.main()
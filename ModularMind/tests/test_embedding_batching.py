@@ -0,0 +1,161 @@
+"""
+Unit tests for async embedding batching
+"""
+import asyncio
+import hashlib
+import time
+import unittest
+from typing import List
+from unittest.mock import patch
+
+from ModularMind.API.services.embedding.batching import (
+    AsyncEmbeddingBatcher, ProviderLimits, RateBudget, EmbeddingBatchError,
+    split_batches, estimate_tokens, run_coroutine_sync
+)
+
+class ProviderError(Exception):
+    """Provider error carrying an HTTP status code"""
+
+    def __init__(self, status_code: int, retry_after: float = None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+class FakeEmbeddingProvider:
+    """Local provider returning deterministic embeddings with simulated latency"""
+
+    def __init__(self, dimensions: int = 8, latency: float = 0.01, fail_first: int = 0, status_code: int = 429,
+                 retry_after: float = None):
+        self.dimensions = dimensions
+        self.latency = latency
+        self.fail_first = fail_first
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.batch_sizes: List[int] = []
+
+    def vector(self, text: str) -> List[float]:
+        digest = hashlib.sha256(text.encode()).digest()
+        return [byte / 255.0 for byte in digest[:self.dimensions]]
+
+    async def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+            if self.calls <= self.fail_first:
+                raise ProviderError(self.status_code, self.retry_after)
+            self.batch_sizes.append(len(texts))
+            return [self.vector(text) for text in texts]
+        finally:
+            self.in_flight -= 1
+
+class TestEmbeddingBatching(unittest.IsolatedAsyncioTestCase):
+    """Test async embedding batching"""
+
+    def test_split_batches_respects_size_and_token_budget(self):
+        """Test that batches stay within count and token limits"""
+        texts = ["x" * 40] * 10 + ["y" * 400] + ["z"] * 5
+        batches = split_batches(texts, max_batch_size=4, max_batch_tokens=50)
+
+        self.assertEqual([text for _, batch, _ in batches for text in batch], texts)
+        for start, batch, tokens in batches:
+            self.assertLessEqual(len(batch), 4)
+            self.assertEqual(texts[start:start + len(batch)], batch)
+            self.assertEqual(tokens, sum(estimate_tokens(text) for text in batch))
+            if len(batch) > 1:
+                self.assertLessEqual(tokens, 50)
+
+    async def test_concurrent_batches_preserve_order(self):
+        """Test that results come back in input order under bounded concurrency"""
+        provider = FakeEmbeddingProvider(latency=0.02)
+        batcher = AsyncEmbeddingBatcher(
+            provider.embed_batch,
+            ProviderLimits(max_batch_size=10, max_concurrency=3),
+            name="fake"
+        )
+        texts = [f"chunk {i}" for i in range(95)]
+
+        started = time.perf_counter()
+        embeddings = await batcher.embed(texts)
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(embeddings, [provider.vector(text) for text in texts])
+        self.assertEqual(provider.calls, 10)
+        self.assertEqual(provider.max_in_flight, 3)
+        # 10 batches at 3 in flight take 4 round trips instead of 10
+        self.assertLess(elapsed, 10 * 0.02)
+
+    async def test_retries_with_backoff(self):
+        """Test that rate-limited batches are retried"""
+        provider = FakeEmbeddingProvider(fail_first=2)
+        batcher = AsyncEmbeddingBatcher(
+            provider.embed_batch,
+            ProviderLimits(max_batch_size=100, max_retries=3, backoff_base=0.001),
+            name="fake"
+        )
+
+        embeddings = await batcher.embed(["a", "b"])
+
+        self.assertEqual(embeddings, [provider.vector("a"), provider.vector("b")])
+        self.assertEqual(provider.calls, 3)
+
+    async def test_jitter_does_not_shorten_retry_after(self):
+        """Test that the server retry hint is a lower bound on the jittered delay"""
+        provider = FakeEmbeddingProvider(latency=0, fail_first=1, retry_after=0.05)
+        batcher = AsyncEmbeddingBatcher(
+            provider.embed_batch,
+            ProviderLimits(max_batch_size=100, backoff_base=0.001),
+            name="fake"
+        )
+
+        with patch("ModularMind.API.services.embedding.batching.random.random", return_value=0.0):
+            started = time.perf_counter()
+            await batcher.embed(["a"])
+
+        self.assertGreaterEqual(time.perf_counter() - started, 0.05)
+        self.assertEqual(provider.calls, 2)
+
+    async def test_non_retryable_error_uses_fallback(self):
+        """Test that client errors are not retried and the fallback fills the batch"""
+        provider = FakeEmbeddingProvider(fail_first=1, status_code=400)
+        batcher = AsyncEmbeddingBatcher(
+            provider.embed_batch,
+            ProviderLimits(max_batch_size=2, max_concurrency=1, backoff_base=0.001),
+            name="fake"
+        )
+
+        with self.assertRaises(EmbeddingBatchError):
+            await batcher.embed(["a", "b"])
+        self.assertEqual(provider.calls, 1)
+
+        provider.calls, provider.fail_first = 0, 1
+        embeddings = await batcher.embed(["a", "b", "c"], fallback=lambda batch: [[0.0] * 8 for _ in batch])
+
+        self.assertEqual(embeddings, [[0.0] * 8, [0.0] * 8, provider.vector("c")])
+
+    async def test_rate_budget_limits_requests(self):
+        """Test that the request budget delays requests beyond the bucket"""
+        budget = RateBudget(requests_per_minute=600)  # 10 requests per second
+        budget._requests = 1
+
+        started = time.perf_counter()
+        await budget.acquire()
+        await budget.acquire()
+
+        self.assertGreaterEqual(time.perf_counter() - started, 0.09)
+
+    def test_run_coroutine_sync(self):
+        """Test running the batcher from synchronous code"""
+        provider = FakeEmbeddingProvider(latency=0)
+        batcher = AsyncEmbeddingBatcher(provider.embed_batch, ProviderLimits(max_batch_size=2), name="fake")
+
+        embeddings = run_coroutine_sync(batcher.embed(["a", "b", "c"]))
+
+        self.assertEqual(embeddings, [provider.vector(text) for text in ["a", "b", "c"]])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+"""
+Unit tests for embedding cache
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from ModularMind.API.services.embedding.cache import EmbeddingCache
+
+class TestEmbeddingCache(unittest.TestCase):
+    """Test embedding cache functionality"""
+    
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+    
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted"""
+        cache = EmbeddingCache(max_size=2, ttl=0)
+        cache.set("a", [1.0, 0.0])
+        cache.set("b", [0.0, 1.0])
+        
+        # Touch "a" so that "b" becomes least recently used
+        self.assertIsNotNone(cache.get("a"))
+        cache.set("c", [1.0, 1.0])
+        
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("c"))
+    
+    def test_ttl_expiry(self):
+        """Test that expired entries are not returned"""
+        cache = EmbeddingCache(max_size=10, ttl=60)
+        
+        with patch("ModularMind.API.services.embedding.cache.time.time", return_value=1000.0):
+            cache.set("a", [1.0, 2.0])
+        with patch("ModularMind.API.services.embedding.cache.time.time", return_value=1030.0):
+            self.assertIsNotNone(cache.get("a"))
+        with patch("ModularMind.API.services.embedding.cache.time.time", return_value=1100.0):
+            self.assertIsNone(cache.get("a"))
+    
+    def test_batch_lookup_float32(self):
+        """Test get_many/set_many with float32 storage"""
+        cache = EmbeddingCache(max_size=10, ttl=0)
+        cache.set_many(["a", "b"], np.array([[1.0, 2.0], [3.0, 4.0]], dtype=np.float64))
+        
+        results = cache.get_many(["b", "missing", "a"])
+        
+        self.assertEqual(results[0].dtype, np.float32)
+        np.testing.assert_array_equal(results[0], [3.0, 4.0])
+        self.assertIsNone(results[1])
+        np.testing.assert_array_equal(results[2], [1.0, 2.0])
+        self.assertEqual(cache.stats()["misses"], 1)
+    
+    def test_persistent_tier_survives_restart(self):
+        """Test that embeddings written to disk are reused by a new cache"""
+        key = EmbeddingCache.make_key("test-model", "same text")
+        cache = EmbeddingCache(max_size=10, persistent=True, persistent_path=self.cache_dir)
+        cache.set(key, [0.5, 0.25])
+        cache.close()
+        
+        self.assertTrue(os.path.exists(os.path.join(self.cache_dir, "embedding_cache.sqlite")))
+        
+        reopened = EmbeddingCache(max_size=10, persistent=True, persistent_path=self.cache_dir)
+        try:
+            np.testing.assert_array_equal(reopened.get_many([key])[0], [0.5, 0.25])
+            self.assertEqual(reopened.stats()["disk_hits"], 1)
+        finally:
+            reopened.close()
+    
+    def test_make_key_is_content_based(self):
+        """Test that cache keys depend on model and text content only"""
+        self.assertEqual(EmbeddingCache.make_key("m", "text"), EmbeddingCache.make_key("m", "text"))
+        self.assertNotEqual(EmbeddingCache.make_key("m", "text"), EmbeddingCache.make_key("n", "text"))
+
+if __name__ == '__main__':
+    unittest.main()
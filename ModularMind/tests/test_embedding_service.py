@@ -4,6 +4,7 @@ Unit tests for embedding service
 import unittest
 import json
 import os
+import tempfile
 from unittest.mock import patch, MagicMock
 import numpy as np
 
@@ -15,8 +16,10 @@ class TestEmbeddingService(unittest.TestCase):
     """Test embedding service functionality"""
     
     def setUp(self):
-        # Create a temp config file
-        self.config_path = "temp_embedding_test_config.json"
+        # Create a temp config file in a directory removed after the test
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.config_path = os.path.join(temp_dir.name, "embedding_test_config.json")
         self.test_config = {
             "models": [
                 {
@@ -45,11 +48,6 @@ class TestEmbeddingService(unittest.TestCase):
             
         # Create the service with mocked components
         self.service = EmbeddingService(self.config_path)
-        
-    def tearDown(self):
-        # Clean up temp config file
-        if os.path.exists(self.config_path):
-            os.remove(self.config_path)
     
     @patch('ModularMind.API.services.embedding.models.LocalModel.generate_embedding')
     def test_create_embedding(self, mock_generate):
@@ -83,12 +81,13 @@ class TestEmbeddingService(unittest.TestCase):
         mock_generate.assert_called_once()
         mock_cache_set.assert_called_once()
         
-        # Set up for second call, returns from cache
-        mock_cache_get.return_value = test_embedding
+        # Set up for second call, returns from cache (stored as float32)
+        cached_embedding = np.asarray(test_embedding, dtype=np.float32)
+        mock_cache_get.return_value = cached_embedding
         
         # Second call with same text should use cache
         embedding2 = self.service.create_embedding(test_text)
-        self.assertEqual(embedding2, test_embedding)
+        self.assertEqual(embedding2, cached_embedding.tolist())
         # generate_embedding should still have only been called once
         mock_generate.assert_called_once()
         
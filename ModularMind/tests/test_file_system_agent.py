@@ -0,0 +1,87 @@
+"""
+Unit tests for the parallel file system source agent
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from ModularMind.API.services.data.source_agent_models import AgentConfig, AgentResult, AgentType
+from ModularMind.API.services.data.source_agent_runners.file_system_agent import (
+    run_file_system, _scan_files, _parse_file
+)
+
+class TestFileSystemAgent(unittest.TestCase):
+    """Test crawling and parsing a folder tree"""
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.write("a.txt", "plain text")
+        self.write("notes/b.md", "# heading")
+        self.write("notes/deep/c.html", "<html><head><title>Page</title></head><body><p>Hello</p></body></html>")
+        self.write("notes/deep/ignored.bin", "binary")
+        self.write("big.txt", "x" * 2048)
+        self.write("broken.docx", "not a zip archive")
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def write(self, relative_path, content):
+        path = os.path.join(self.folder, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+
+    def make_config(self, **options):
+        options.setdefault("extensions", [".txt", ".md", ".html", ".docx"])
+        return AgentConfig(
+            agent_id="fs",
+            agent_type=AgentType.FILE_SYSTEM,
+            name="Files",
+            source_url=self.folder,
+            options=options
+        )
+
+    def test_scan_files(self):
+        """Test that scanning filters extensions and honours recursion"""
+        found = {os.path.relpath(path, self.folder) for path, _, _ in _scan_files(self.folder, {".txt", ".md"})}
+        self.assertEqual(found, {"a.txt", "big.txt", os.path.join("notes", "b.md")})
+
+        shallow = {os.path.basename(path) for path, _, _ in _scan_files(self.folder, {".txt", ".md"}, recursive=False)}
+        self.assertEqual(shallow, {"a.txt", "big.txt"})
+
+    def test_parse_html(self):
+        """Test that HTML files are parsed through the document loader"""
+        text, _ = _parse_file(os.path.join(self.folder, "notes", "deep", "c.html"), ".html")
+        self.assertIn("Hello", text)
+
+    def test_parallel_crawl(self):
+        """Test crawling with worker pools, size limits and batched delivery"""
+        batches = []
+        result = AgentResult(agent_id="fs", success=False, documents=[])
+        result.document_sink = lambda documents, state: batches.append(documents)
+
+        run_file_system(self.make_config(workers=2, batch_size=2, max_file_size=1024), result)
+
+        titles = sorted(document.metadata["title"] for batch in batches for document in batch)
+        self.assertEqual(titles, ["a.txt", "b.md", "c.html"])
+        self.assertTrue(all(len(batch) <= 2 for batch in batches))
+        self.assertEqual(result.item_count, 3)
+        self.assertEqual(result.metadata["scanned_files"], 5)
+        self.assertEqual(result.metadata["skipped_files"], 1)
+        self.assertEqual(result.metadata["failed_files"], 1)
+
+    def test_inline_crawl_matches_parallel(self):
+        """Test that running without workers produces the same documents"""
+        inline = AgentResult(agent_id="fs", success=False, documents=[])
+        run_file_system(self.make_config(workers=0), inline)
+
+        parallel = AgentResult(agent_id="fs", success=False, documents=[])
+        run_file_system(self.make_config(workers=2), parallel)
+
+        by_id = lambda result: {document.id: document.text for document in result.documents}
+        self.assertEqual(by_id(inline), by_id(parallel))
+        self.assertEqual(len(inline.documents), 4)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+"""
+Unit tests for the source agent ingestion pipeline
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from ModularMind.API.services.retrieval.models import Document
+from ModularMind.API.services.data.ingestion_pipeline import IngestionPipeline
+from ModularMind.API.services.data.source_manifest import SourceManifest, make_document_id
+
+def split_text(text, chunk_size, chunk_overlap):
+    """Split text into fixed-size pieces"""
+    return [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+
+class FakeVectorStore:
+    """In-memory vector store recording add_batch calls"""
+
+    def __init__(self):
+        self.chunks = {}
+        self.batch_sizes = []
+
+    def add_batch(self, chunks):
+        self.batch_sizes.append(len(chunks))
+        self.chunks.update({chunk.id: chunk for chunk in chunks})
+
+    def delete(self, chunk_id):
+        return self.chunks.pop(chunk_id, None) is not None
+
+class FakeEmbeddingService:
+    """Embedding service recording batched calls"""
+
+    def __init__(self):
+        self.calls = []
+
+    def get_embedding(self, text):
+        raise AssertionError("chunks must be embedded in batches")
+
+    def get_embeddings(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text))] for text in texts]
+
+class TestIngestionPipeline(unittest.TestCase):
+    """Test staged chunking, embedding and storing"""
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        patcher = patch("ModularMind.API.services.retrieval.chunking.split_text", split_text, create=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.vector_store = FakeVectorStore()
+        self.embedding_service = FakeEmbeddingService()
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def make_document(self, source_key, text):
+        return Document(id=make_document_id("test", source_key), text=text, metadata={"source_key": source_key})
+
+    def test_batches_embedding_and_store_calls(self):
+        """Test that chunks are embedded and stored in fixed-size groups"""
+        pipeline = IngestionPipeline(
+            self.vector_store, self.embedding_service,
+            embedding_batch_size=4, store_batch_size=3, chunk_size=10
+        )
+        documents = [self.make_document(f"doc{i}", f"a{i}" * 5 + f"b{i}" * 5 + f"c{i}" * 5) for i in range(3)]
+
+        pipeline.run(documents)
+
+        self.assertEqual(len(self.vector_store.chunks), 9)
+        self.assertEqual(self.vector_store.batch_sizes, [3, 3, 3])
+        self.assertEqual([len(call) for call in self.embedding_service.calls], [4, 4, 1])
+        self.assertTrue(all(chunk.embedding is not None for chunk in self.vector_store.chunks.values()))
+
+        stats = pipeline.stats.to_dict()
+        self.assertEqual(stats["chunks"], 9)
+        self.assertEqual(stats["stages"]["embed"]["items"], 9)
+        self.assertEqual(stats["stages"]["store"]["items"], 9)
+
+    def test_duplicate_chunk_texts_are_embedded_once(self):
+        """Test that identical chunk texts share one embedding request"""
+        pipeline = IngestionPipeline(self.vector_store, self.embedding_service, chunk_size=10)
+
+        pipeline.run([self.make_document("a", "same text!" * 3), self.make_document("b", "same text!")])
+
+        self.assertEqual(self.embedding_service.calls, [["same text!"]])
+        self.assertEqual(len(self.vector_store.chunks), 4)
+        self.assertEqual(pipeline.stats.deduplicated_chunks, 3)
+
+    def test_only_changed_chunks_are_embedded(self):
+        """Test that a re-run embeds changed chunks and deletes vanished sources"""
+        manifest = SourceManifest(os.path.join(self.work_dir, "agent.sqlite"))
+        self.addCleanup(manifest.close)
+
+        manifest.begin_run()
+        pipeline = IngestionPipeline(self.vector_store, self.embedding_service, manifest=manifest, chunk_size=10)
+        pipeline.run([self.make_document("a", "a" * 30), self.make_document("b", "b" * 10)])
+        self.assertEqual(len(self.vector_store.chunks), 4)
+
+        manifest.begin_run()
+        self.embedding_service.calls.clear()
+        pipeline = IngestionPipeline(self.vector_store, self.embedding_service, manifest=manifest, chunk_size=10)
+        pipeline.run([self.make_document("a", "a" * 20 + "c" * 5)])
+        pipeline.remove_missing_sources()
+
+        self.assertEqual(self.embedding_service.calls, [["ccccc"]])
+        self.assertEqual(pipeline.stats.unchanged_chunks, 2)
+        self.assertEqual(pipeline.stats.removed_sources, 1)
+        self.assertEqual(len(self.vector_store.chunks), 3)
+
+        # Unchanged content is skipped without chunking
+        pipeline.run([self.make_document("a", "a" * 20 + "c" * 5)])
+        self.assertEqual(pipeline.stats.unchanged_documents, 1)
+        self.assertEqual(len(self.embedding_service.calls), 1)
+
+    def test_failed_embeddings_are_retried_on_next_run(self):
+        """Test that chunks whose batch failed are neither stored nor recorded"""
+        manifest = SourceManifest(os.path.join(self.work_dir, "agent.sqlite"))
+        self.addCleanup(manifest.close)
+
+        manifest.begin_run()
+        pipeline = IngestionPipeline(
+            self.vector_store, self.embedding_service, manifest=manifest,
+            embedding_batch_size=2, chunk_size=10
+        )
+        get_embeddings = self.embedding_service.get_embeddings
+
+        def failing_batches(texts):
+            # The second batch falls back to zero vectors, the third one raises
+            if "cccccccccc" in texts:
+                return [[0.0] for _ in texts]
+            if "eeeeeeeeee" in texts:
+                raise RuntimeError("provider unavailable")
+            return get_embeddings(texts)
+
+        with patch.object(self.embedding_service, "get_embeddings", side_effect=failing_batches):
+            pipeline.run([self.make_document("a", "a" * 10 + "b" * 10 + "c" * 10 + "d" * 10 + "e" * 10)])
+
+        self.assertEqual(sorted(chunk.text for chunk in self.vector_store.chunks.values()), ["aaaaaaaaaa", "bbbbbbbbbb"])
+        self.assertEqual(pipeline.stats.failed_chunks, 3)
+
+        manifest.begin_run()
+        self.embedding_service.calls.clear()
+        pipeline = IngestionPipeline(self.vector_store, self.embedding_service, manifest=manifest, chunk_size=10)
+        pipeline.run([self.make_document("a", "a" * 10 + "b" * 10 + "c" * 10 + "d" * 10 + "e" * 10)])
+
+        self.assertEqual(self.embedding_service.calls, [["cccccccccc", "dddddddddd", "eeeeeeeeee"]])
+        self.assertEqual(pipeline.stats.unchanged_chunks, 2)
+        self.assertEqual(len(self.vector_store.chunks), 5)
+        self.assertTrue(all(any(chunk.embedding) for chunk in self.vector_store.chunks.values()))
+
+        # Once every chunk is stored the document is skipped again
+        pipeline.run([self.make_document("a", "a" * 10 + "b" * 10 + "c" * 10 + "d" * 10 + "e" * 10)])
+        self.assertEqual(pipeline.stats.unchanged_documents, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,167 @@
+"""
+LLM sağlayıcı istemci havuzu ve asenkron üretim yolları için test dosyası.
+"""
+
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from ModularMind.API.services.llm.client_pool import ProviderClientRegistry
+from ModularMind.API.services.llm.providers import (
+    ollama_provider, huggingface_provider, custom_provider
+)
+from ModularMind.API.services.llm.service import LLMService
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    """Ollama, Hugging Face ve özel API yanıtlarını taklit eden sunucu."""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append((self.path, body))
+
+        if self.path == "/api/generate":
+            payload = "\n".join(json.dumps({"response": part}) for part in ("mer", "haba"))
+        elif self.path == "/api/chat":
+            payload = json.dumps({"message": {"role": "assistant", "content": "selam"}})
+        elif self.path.startswith("/models/"):
+            payload = json.dumps([{"generated_text": "hf yanıtı"}])
+        else:
+            payload = json.dumps({"text": "özel yanıt"})
+
+        data = payload.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestProviderClientPool:
+    """Havuzlu istemci ve asenkron sağlayıcı test sınıfı."""
+
+    @pytest.fixture
+    def server(self):
+        """Yerel sahte LLM sunucusu."""
+        server = ThreadingHTTPServer(("127.0.0.1", 0), MockLLMHandler)
+        server.connections = 0
+        server.requests = []
+        server.lock = threading.Lock()
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield server
+        server.shutdown()
+        server.server_close()
+
+    @pytest.fixture
+    def registry(self, monkeypatch):
+        """Sağlayıcıların kullandığı yalıtılmış istemci kayıt defteri."""
+        registry = ProviderClientRegistry()
+        for module in (ollama_provider, huggingface_provider, custom_provider):
+            monkeypatch.setattr(module, "get_client_registry", lambda: registry)
+        yield registry
+        registry.close()
+
+    def model_config(self, server, **kwargs):
+        """Sahte sunucuyu gösteren model yapılandırması."""
+        options = {
+            "id": "test",
+            "provider": "ollama",
+            "model_id": "test-model",
+            "base_url": f"http://127.0.0.1:{server.server_port}",
+            "api_key_env": None,
+            "timeout": 5,
+            "options": {}
+        }
+        options.update(kwargs)
+        return SimpleNamespace(**options)
+
+    def test_clients_are_shared_per_provider(self, registry):
+        """Aynı sağlayıcı için aynı istemci, farklı sağlayıcılar için ayrı istemci dönmeli."""
+        assert registry.http_client("ollama") is registry.http_client("ollama")
+        assert registry.http_client("ollama") is not registry.http_client("custom")
+
+        registry.configure("custom", max_connections=3)
+        assert registry.get_limits("custom").max_connections == 3
+        assert registry.get_limits("ollama").max_connections == 8
+
+    def test_sync_requests_reuse_connection(self, server, registry):
+        """Ardışık senkron istekler tek bağlantı üzerinden gitmeli."""
+        config = self.model_config(server)
+
+        for _ in range(3):
+            result = ollama_provider.generate(None, "merhaba", config, 16, 0.0, 1.0, None, "sistem", None)
+            assert result == "merhaba"
+
+        assert len(server.requests) == 3
+        assert server.requests[0][1]["system"] == "sistem"
+        assert server.connections == 1
+
+    def test_async_requests_reuse_connection(self, server, registry):
+        """Asenkron istekler tüm sağlayıcılarda havuzdaki bağlantıyı kullanmalı."""
+        ollama_config = self.model_config(server)
+        hf_config = self.model_config(server, base_url=f"http://127.0.0.1:{server.server_port}/models")
+        custom_config = self.model_config(server, options={"endpoint": "/generate"})
+
+        async def run():
+            results = []
+            for _ in range(2):
+                results.append(await ollama_provider.agenerate(None, "x", ollama_config, 16, 0.0, 1.0, None, None, None))
+                results.append(await huggingface_provider.agenerate(None, "x", hf_config, 16, 0.0, 1.0, None, None, {}))
+                results.append(await custom_provider.agenerate(None, "x", custom_config, 16, 0.0, 1.0, None, None, None, {}))
+            chat = await ollama_provider.achat(
+                None, [{"role": "user", "content": "x"}], ollama_config, 16, 0.0, 1.0, None, None
+            )
+            await registry.aclose()
+            return results, chat
+
+        results, chat = asyncio.run(run())
+
+        assert results == ["merhaba", "hf yanıtı", "özel yanıt"] * 2
+        assert chat == {"role": "assistant", "content": "selam"}
+        # ollama, huggingface ve custom istemcileri birer bağlantı açar
+        assert server.connections == 3
+
+    def test_service_async_falls_back_to_thread(self):
+        """Asenkron yolu olmayan sağlayıcılar olay döngüsü dışında çalıştırılmalı."""
+        model_manager = MagicMock()
+        model_manager.get_model_ids.return_value = ["model"]
+        model_manager.get_model_config.return_value = SimpleNamespace(
+            id="model", provider="fake", api_key_env=None, max_tokens=32, temperature=0.1, top_p=1.0, stop_sequences=[]
+        )
+        service = LLMService(model_manager)
+        service._api_keys["fake"] = "anahtar"
+
+        calling_threads = []
+
+        def generate(llm_service, prompt, model_config, max_tokens, temperature, top_p, stop, options, api_keys):
+            calling_threads.append(threading.current_thread())
+            return f"{prompt}:{max_tokens}:{api_keys['fake']}"
+
+        service._providers["fake"] = SimpleNamespace(generate=generate)
+
+        async def run():
+            text = await service.agenerate_text("soru")
+            chat = await service.agenerate_chat([{"role": "user", "content": "soru"}], max_tokens=8)
+            return text, chat
+
+        text, chat = asyncio.run(run())
+
+        assert text == "soru:32:anahtar"
+        assert chat["content"] == "[KULLANICI]: soru\n\n[ASİSTAN]: :8:anahtar"
+        assert all(thread is not threading.main_thread() for thread in calling_threads)
@@ -0,0 +1,166 @@
+"""
+LLM tamamlama önbelleği için test dosyası.
+"""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from ModularMind.API.services.llm.completion_cache import CompletionCache
+from ModularMind.API.services.llm.rate_limiter import LLMRateLimiter
+from ModularMind.API.services.llm.service import LLMService
+
+
+MESSAGES = [
+    {"role": "system", "content": "Sorgu genişletme uzmanısın."},
+    {"role": "user", "content": "ankara   hava durumu"}
+]
+
+
+class TestCompletionCache:
+    """Tamamlama önbelleği test sınıfı."""
+
+    @pytest.fixture
+    def service(self):
+        """Sahte sağlayıcılı ve yalıtılmış önbellekli LLM servisi."""
+        model_manager = MagicMock()
+        model_manager.get_model_ids.return_value = ["model"]
+        model_manager.get_model_config.return_value = SimpleNamespace(
+            id="model", provider="fake", model_id="fake-1", api_key_env=None,
+            max_tokens=32, temperature=0.0, top_p=1.0, stop_sequences=[]
+        )
+        service = LLMService(model_manager)
+        service._api_keys["fake"] = "anahtar"
+        service.completion_cache = CompletionCache()
+
+        calls = []
+        provider_options = []
+
+        def generate(llm_service, prompt, model_config, max_tokens, temperature, top_p, stop, options, api_keys):
+            calls.append(prompt)
+            provider_options.append(options)
+            if prompt == "hata":
+                return "[Sahte API hatası: 500]"
+            if prompt == "openai hata":
+                return "ERROR: Rate limit reached"
+            return f"yanıt {len(calls)}"
+
+        def generate_chat(llm_service, messages, model_config, max_tokens, temperature, top_p, stop, options, api_keys):
+            calls.append(messages)
+            provider_options.append(options)
+            if messages[-1]["content"] == "hata":
+                return {"role": "assistant", "content": "ERROR: Connection error."}
+            return {"role": "assistant", "content": f"sohbet {len(calls)}"}
+
+        service._providers["fake"] = SimpleNamespace(generate=generate, generate_chat=generate_chat)
+        service.calls = calls
+        service.provider_options = provider_options
+        return service
+
+    def test_key_normalization(self):
+        """Boşluk farkları aynı anahtarı, içerik ve parametre farkları farklı anahtarı vermeli."""
+        key = CompletionCache.make_key("openai:gpt-4", MESSAGES, {"max_tokens": 64})
+        spaced = [MESSAGES[0], {"role": "user", "content": " ankara hava\tdurumu "}]
+
+        assert CompletionCache.make_key("openai:gpt-4", spaced, {"max_tokens": 64}) == key
+        assert CompletionCache.make_key("openai:gpt-4", MESSAGES, {"max_tokens": 128}) != key
+        assert CompletionCache.make_key("openai:gpt-4", MESSAGES[1:], {"max_tokens": 64}) != key
+
+    def test_deterministic_requests_are_cached(self, service):
+        """Sıcaklık 0 ile tekrarlanan istekler sağlayıcıya yalnızca bir kez gitmeli."""
+        first = service.generate_text("soru", system_message="sistem")
+        second = service.generate_text("soru", system_message="sistem")
+        chat = [service.generate_chat(MESSAGES) for _ in range(2)]
+
+        assert first == second
+        assert chat[0] == chat[1]
+        assert len(service.calls) == 2
+        assert service.get_cache_stats()["hits"] == 2
+
+    def test_non_zero_temperature_and_errors_bypass_cache(self, service):
+        """Sıfırdan büyük sıcaklık ve hata yanıtları önbelleğe alınmamalı."""
+        service.generate_text("soru", temperature=0.7)
+        service.generate_text("soru", temperature=0.7)
+        service.generate_text("hata")
+        service.generate_text("hata")
+        service.generate_text("soru", use_cache=False)
+
+        assert len(service.calls) == 5
+        stats = service.get_cache_stats()
+        assert stats["bypassed"] == 2
+        assert stats["size"] == 0
+
+    def test_openai_style_errors_bypass_cache(self, service):
+        """"ERROR: ..." ile dönen metin ve sohbet yanıtları önbelleğe alınmamalı."""
+        failing_chat = [{"role": "user", "content": "hata"}]
+
+        for _ in range(2):
+            assert service.generate_text("openai hata") == "ERROR: Rate limit reached"
+            assert service.generate_chat(failing_chat)["content"] == "ERROR: Connection error."
+
+        async def run():
+            return await service.agenerate_text("openai hata"), await service.agenerate_chat(failing_chat)
+
+        asyncio.run(run())
+
+        assert len(service.calls) == 6
+        assert service.get_cache_stats()["size"] == 0
+
+    def test_async_paths_share_cache(self, service):
+        """Asenkron yollar senkron yolların yanıtlarını kullanabilmeli."""
+        service.generate_chat(MESSAGES)
+
+        async def run():
+            chat = await service.agenerate_chat(MESSAGES)
+            text = await service.agenerate_text("yeni soru")
+            again = await service.agenerate_text("yeni soru")
+            return chat, text, again
+
+        chat, text, again = asyncio.run(run())
+
+        assert chat == {"role": "assistant", "content": "sohbet 1"}
+        assert text == again
+        assert len(service.calls) == 2
+
+    def test_sync_paths_are_rate_limited(self, service):
+        """Senkron yollar hız sınırlayıcıdan geçmeli; hız sınırı seçenekleri sağlayıcıya iletilmemeli."""
+        service.rate_limiter = LLMRateLimiter()
+        service.model_manager.get_model_config.return_value.rate_limit_rpm = 60
+        options = {"priority": "high", "rate_limit_timeout": 5, "seed": 1}
+
+        service.generate_text("soru", options=options)
+        service.generate_text("soru", system_message="sistem", options=options)
+        service.generate_chat(MESSAGES, options=options)
+
+        assert service.provider_options == [{"seed": 1}] * 3
+        assert service.rate_limiter.stats()["model"]["granted"] == 3
+
+    def test_disk_backend_survives_restart(self, tmp_path):
+        """Disk katmanındaki yanıtlar yeni önbellek örneğinden okunabilmeli."""
+        key = CompletionCache.make_key("openai:gpt-4", MESSAGES)
+        cache = CompletionCache(backend="disk", path=str(tmp_path))
+        cache.set(key, {"role": "assistant", "content": "kalıcı"})
+        cache.close()
+
+        reopened = CompletionCache(backend="disk", path=str(tmp_path))
+
+        assert reopened.get(key) == {"role": "assistant", "content": "kalıcı"}
+        assert reopened.stats()["backend_hits"] == 1
+
+        assert reopened.invalidate_prefix("openai:gpt-4", [MESSAGES[0]["content"]]) == 1
+        reopened.close()
+        assert CompletionCache(backend="disk", path=str(tmp_path)).get(key) is None
+
+    def test_lru_eviction(self):
+        """Kapasite aşıldığında en uzun süre kullanılmayan yanıt çıkarılmalı."""
+        cache = CompletionCache(max_entries=2)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")
+        cache.set("c", "3")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "1"
+        assert cache.stats()["evictions"] == 1
@@ -0,0 +1,167 @@
+"""
+LLM hız sınırlayıcı için test dosyası.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from ModularMind.API.services.llm.rate_limiter import (
+    LLMRateLimiter, RequestPriority, RateLimitTimeout, split_rate_limit_options, DEFAULT_RATE_LIMIT_TIMEOUT
+)
+
+
+class FailingRedis:
+    """Betik çağrıları hata veren Redis istemcisi."""
+
+    def register_script(self, script):
+        def run(keys, args):
+            raise ConnectionError("redis kapalı")
+        return run
+
+
+class RecordingRedis:
+    """Betiği çalıştıran iş parçacıklarını kaydeden, her zaman kapasite veren Redis istemcisi."""
+
+    def __init__(self):
+        self.threads = []
+
+    def register_script(self, script):
+        def run(keys, args):
+            self.threads.append(threading.current_thread())
+            return "0"
+        return run
+
+
+class TestLLMRateLimiter:
+    """Token-bucket hız sınırlayıcı test sınıfı."""
+
+    @pytest.fixture
+    def limiter(self):
+        """Yerel kovalı sınırlayıcı."""
+        return LLMRateLimiter()
+
+    def drain(self, limiter, model_id="model", tpm=600):
+        """Token kovasını boşaltır (dakikada 600 token = saniyede 10 token dolum)."""
+        limiter.acquire(model_id, None, tpm, tokens=tpm)
+
+    def test_unlimited_model_does_not_wait(self, limiter):
+        """Sınır tanımlanmamış modeller beklememeli ve kayıt oluşturmamalı."""
+        assert limiter.acquire("model", None, None, tokens=10_000) == 0.0
+        assert limiter.stats() == {}
+
+    def test_waits_instead_of_failing(self, limiter):
+        """Kapasite dolduğunda istek hata yerine dolum süresi kadar beklemeli."""
+        self.drain(limiter)
+
+        waited = limiter.acquire("model", None, 600, tokens=3)
+
+        assert 0.2 <= waited < 1.0
+        assert limiter.stats()["model"]["granted"] == 2
+
+    def test_higher_priority_is_served_first(self, limiter):
+        """Bekleyen yüksek öncelikli istek, önce gelen düşük öncelikliden önce slot almalı."""
+        self.drain(limiter)
+        order = []
+
+        def request(priority):
+            limiter.acquire("model", None, 600, tokens=3, priority=priority)
+            order.append(priority)
+
+        low = threading.Thread(target=request, args=(RequestPriority.LOW,))
+        low.start()
+        time.sleep(0.05)
+        high = threading.Thread(target=request, args=(RequestPriority.HIGH,))
+        high.start()
+        low.join(2)
+        high.join(2)
+
+        assert order == [RequestPriority.HIGH, RequestPriority.LOW]
+
+    def test_timeout_raises_and_leaves_queue(self, limiter):
+        """Süre sınırı dolan istek RateLimitTimeout vermeli ve kuyruktan çıkmalı."""
+        self.drain(limiter)
+
+        with pytest.raises(RateLimitTimeout):
+            limiter.acquire("model", None, 600, tokens=300, timeout=0.1)
+
+        stats = limiter.stats()["model"]
+        assert stats["waiting"] == 0
+        assert stats["timeouts"] == 1
+
+    def test_async_waiters_and_token_refund(self, limiter):
+        """Asenkron bekleyenler döngüyü bloklamamalı; iade edilen tokenlar hemen kullanılabilmeli."""
+        async def run():
+            self.drain(limiter)
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            ticker_task = asyncio.create_task(ticker())
+            waited = await limiter.acquire_async("model", None, 600, tokens=3)
+            ticker_task.cancel()
+
+            # Ayrılandan az token kullanıldı: fark iade edilince bekleme gerekmez
+            limiter.adjust_tokens("model", -300)
+            refunded_wait = await limiter.acquire_async("model", None, 600, tokens=100)
+            return waited, ticks, refunded_wait
+
+        waited, ticks, refunded_wait = asyncio.run(run())
+
+        assert waited >= 0.2
+        assert ticks >= 10
+        assert refunded_wait < 0.1
+
+    def test_redis_failure_falls_back_to_local_buckets(self):
+        """Redis hatasında yerel kovalarla sınırlamaya devam edilmeli."""
+        limiter = LLMRateLimiter(redis_client=FailingRedis())
+        self.drain(limiter)
+
+        assert limiter.acquire("model", None, 600, tokens=3) >= 0.2
+
+    def test_sync_acquire_on_event_loop_does_not_block(self, limiter):
+        """Olay döngüsünden yapılan senkron çağrı beklemek yerine hemen hata vermeli."""
+        async def run():
+            self.drain(limiter)
+            started = time.monotonic()
+            with pytest.raises(RateLimitTimeout):
+                limiter.acquire("model", None, 600, tokens=3, timeout=5)
+            return time.monotonic() - started
+
+        assert asyncio.run(run()) < 0.1
+        assert limiter.stats()["model"]["waiting"] == 0
+
+    def test_async_redis_calls_run_off_loop(self):
+        """Asenkron yolda Redis betiği olay döngüsü iş parçacığında çalışmamalı."""
+        redis = RecordingRedis()
+        limiter = LLMRateLimiter(redis_client=redis)
+
+        async def run():
+            await limiter.acquire_async("model", None, 600, tokens=3)
+            await limiter.adjust_tokens_async("model", -3)
+            return threading.current_thread()
+
+        loop_thread = asyncio.run(run())
+
+        assert len(redis.threads) == 2
+        assert loop_thread not in redis.threads
+
+    def test_split_rate_limit_options(self):
+        """Öncelik ve süre sınırı sağlayıcı seçeneklerinden ayrılmalı."""
+        options = {"priority": "high", "rate_limit_timeout": 5, "seed": 1}
+
+        priority, timeout, remaining = split_rate_limit_options(options)
+
+        assert priority == RequestPriority.HIGH
+        assert timeout == 5
+        assert remaining == {"seed": 1}
+        assert "priority" in options
+
+        # Süre sınırı verilmezse sonsuza kadar beklenmez
+        assert split_rate_limit_options({"seed": 1})[1] == DEFAULT_RATE_LIMIT_TIMEOUT
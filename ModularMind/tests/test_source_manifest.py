@@ -0,0 +1,107 @@
+"""
+Unit tests for the source agent content manifest
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from ModularMind.API.services.data.source_manifest import SourceManifest, make_document_id, content_hash
+from ModularMind.API.services.data.source_agent_models import AgentConfig, AgentResult, AgentType
+from ModularMind.API.services.data.source_agent_runners.file_system_agent import run_file_system
+
+class TestSourceManifest(unittest.TestCase):
+    """Test change detection with the source manifest"""
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.manifest = SourceManifest(os.path.join(self.work_dir, "manifests", "agent.sqlite"))
+
+    def tearDown(self):
+        self.manifest.close()
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def test_stable_document_ids(self):
+        """Test that document IDs depend only on the source key"""
+        self.assertEqual(make_document_id("file", "/data/a.txt"), make_document_id("file", "/data/a.txt"))
+        self.assertNotEqual(make_document_id("file", "/data/a.txt"), make_document_id("file", "/data/b.txt"))
+        self.assertTrue(make_document_id("db", "postgres:app:[1]").startswith("db_"))
+
+    def test_record_and_lookup(self):
+        """Test that recorded sources and chunk hashes are returned"""
+        self.manifest.begin_run()
+        self.manifest.record("a", "doc_a", content_hash("text a"), {"doc_a_chunk_0": "h0"}, fingerprint="10:1")
+        self.manifest.commit()
+
+        self.assertEqual(
+            self.manifest.get_source("a"),
+            {"document_id": "doc_a", "content_hash": content_hash("text a"), "fingerprint": "10:1"}
+        )
+        self.assertEqual(self.manifest.get_chunk_hashes("a"), {"doc_a_chunk_0": "h0"})
+        self.assertTrue(self.manifest.is_unchanged("a", "10:1"))
+        self.assertFalse(self.manifest.is_unchanged("a", "11:2"))
+        self.assertFalse(self.manifest.is_unchanged("b", "10:1"))
+
+    def test_missing_sources(self):
+        """Test that sources not seen in the current run are reported and removed"""
+        self.manifest.begin_run()
+        self.manifest.record("a", "doc_a", "ha", {"doc_a_chunk_0": "h0"})
+        self.manifest.record("b", "doc_b", "hb", {"doc_b_chunk_0": "h1", "doc_b_chunk_1": "h2"})
+
+        self.manifest.begin_run()
+        self.manifest.mark_seen(["a"])
+
+        missing = self.manifest.missing_sources()
+        self.assertEqual([(key, sorted(chunk_ids)) for key, chunk_ids in missing], [("b", ["doc_b_chunk_0", "doc_b_chunk_1"])])
+
+        self.manifest.remove_sources(["b"])
+        self.assertEqual(self.manifest.missing_sources(), [])
+        self.assertEqual(len(self.manifest), 1)
+
+    def test_manifest_persists_across_instances(self):
+        """Test that committed entries survive reopening"""
+        self.manifest.begin_run()
+        self.manifest.record("a", "doc_a", "ha", {})
+        self.manifest.close()
+
+        self.manifest = SourceManifest(os.path.join(self.work_dir, "manifests", "agent.sqlite"))
+        self.assertEqual(self.manifest.get_source("a")["content_hash"], "ha")
+        self.assertGreater(self.manifest.begin_run(), 1)
+
+    def test_file_system_skips_unchanged_files(self):
+        """Test that the file system agent skips files with an unchanged fingerprint"""
+        folder = os.path.join(self.work_dir, "docs")
+        os.makedirs(folder)
+        for name in ("a.txt", "b.md"):
+            with open(os.path.join(folder, name), "w", encoding="utf-8") as f:
+                f.write(f"content of {name}")
+
+        config = AgentConfig(agent_id="fs", agent_type=AgentType.FILE_SYSTEM, name="Files", source_url=folder)
+
+        self.manifest.begin_run()
+        result = AgentResult(agent_id="fs", success=False, documents=[], manifest=self.manifest)
+        run_file_system(config, result)
+        self.assertEqual(len(result.documents), 2)
+
+        first_ids = {document.id for document in result.documents}
+        for document in result.documents:
+            self.manifest.record(
+                document.metadata["source_key"], document.id, content_hash(document.text), {},
+                fingerprint=document.metadata["source_fingerprint"]
+            )
+
+        # Only the modified file is read again, under the same document ID
+        with open(os.path.join(folder, "a.txt"), "a", encoding="utf-8") as f:
+            f.write(" (edited)")
+
+        self.manifest.begin_run()
+        result = AgentResult(agent_id="fs", success=False, documents=[], manifest=self.manifest)
+        run_file_system(config, result)
+
+        self.assertEqual([document.metadata["title"] for document in result.documents], ["a.txt"])
+        self.assertIn(result.documents[0].id, first_ids)
+        self.assertEqual(result.metadata["unchanged_files"], 1)
+        self.assertEqual([key for key, _ in self.manifest.missing_sources()], [result.documents[0].metadata["source_key"]])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,660 @@
+"""
+Vektör indeks yöneticileri için test dosyası.
+"""
+
+import os
+import pytest
+import numpy as np
+
+from ModularMind.API.services.vector_db.optimized_vector_db import VectorDBConfig, IndexType
+from ModularMind.API.services.vector_db.index_managers import (
+    FlatIndex, HNSWIndex, IVFIndex, PQIndex, IVFPQIndex, ScalarQuantizedIndex, BinaryQuantizedIndex
+)
+from ModularMind.API.services.vector_db.recall_benchmark import exact_neighbors, recall_at_k, benchmark_recall
+
+
+class TestFlatIndex:
+    """FlatIndex test sınıfı."""
+
+    @pytest.fixture
+    def config(self):
+        """Küçük boyutlu flat indeks yapılandırması."""
+        return VectorDBConfig(
+            index_type=IndexType.FLAT,
+            dimension=4,
+            metric_type="l2",
+            initial_capacity=2,
+            compaction_threshold=0.5
+        )
+
+    @pytest.fixture
+    def flat_index(self, config):
+        """Başlatılmış FlatIndex nesnesi."""
+        index = FlatIndex(config)
+        index.initialize()
+        return index
+
+    def test_add_grows_capacity_by_doubling(self, flat_index):
+        """Kapasite ikiye katlanarak büyümeli."""
+        for batch in range(5):
+            vectors = [np.full(4, batch * 2 + i, dtype=np.float32) for i in range(2)]
+            flat_index.add_vectors([f"v{batch}_{i}" for i in range(2)], vectors)
+
+        assert flat_index.vector_count == 10
+        assert len(flat_index.index) == 16
+
+        results = flat_index.query(np.full(4, 3.0, dtype=np.float32), top_k=1)
+        assert results[0]["vector_id"] == "v1_1"
+        assert results[0]["distance"] == pytest.approx(0.0)
+
+    def test_delete_marks_tombstones(self, flat_index):
+        """Silinen vektörler sorgu sonuçlarında görünmemeli."""
+        vectors = [np.full(4, i, dtype=np.float32) for i in range(4)]
+        flat_index.add_vectors(["a", "b", "c", "d"], vectors)
+
+        flat_index._schedule_compaction = lambda: None
+        flat_index.delete_vectors(["b"])
+
+        assert flat_index.vector_count == 3
+        assert flat_index.deleted_count == 1
+
+        results = flat_index.query(np.full(4, 1.0, dtype=np.float32), top_k=4)
+        assert [r["vector_id"] for r in results] == ["a", "c", "d"]
+
+    def test_compact_removes_deleted_rows(self, flat_index):
+        """Sıkıştırma silinen satırları kaldırmalı ve eşleştirmeleri korumalı."""
+        vectors = [np.full(4, i, dtype=np.float32) for i in range(4)]
+        flat_index.add_vectors(["a", "b", "c", "d"], vectors)
+
+        flat_index._schedule_compaction = lambda: None
+        flat_index.delete_vectors(["a", "c"])
+
+        assert flat_index.compact() == 2
+        assert flat_index.size == 2
+        assert flat_index.deleted_count == 0
+        assert flat_index.id_to_index == {"b": 0, "d": 1}
+
+        results = flat_index.query(np.full(4, 3.0, dtype=np.float32), top_k=1)
+        assert results[0]["vector_id"] == "d"
+
+    def test_background_compaction(self, flat_index):
+        """Eşik aşıldığında sıkıştırma arka planda çalışmalı."""
+        vectors = [np.full(4, i, dtype=np.float32) for i in range(4)]
+        flat_index.add_vectors(["a", "b", "c", "d"], vectors)
+
+        flat_index.delete_vectors(["a", "b"])
+        thread = flat_index._compaction_thread
+        if thread is not None:
+            thread.join(timeout=5)
+
+        assert flat_index.deleted_count == 0
+        assert flat_index.vector_count == 2
+
+    def test_readding_ids_triggers_compaction(self, flat_index):
+        """Aynı ID'lerin yeniden eklenmesiyle oluşan tombstone'lar da sıkıştırılmalı."""
+        vectors = [np.full(4, i, dtype=np.float32) for i in range(4)]
+        flat_index.add_vectors(["a", "b", "c", "d"], vectors)
+        flat_index.add_vectors(["a", "b", "c", "d"], [vector + 10 for vector in vectors])
+
+        thread = flat_index._compaction_thread
+        if thread is not None:
+            thread.join(timeout=5)
+
+        assert flat_index.deleted_count == 0
+        assert flat_index.size == 4
+        assert flat_index.query(np.full(4, 13.0, dtype=np.float32), top_k=1)[0]["vector_id"] == "d"
+
+    def test_cancelled_compaction_is_retried(self, flat_index):
+        """Eşzamanlı değişiklikle iptal edilen sıkıştırma yeniden denenmeli."""
+        vectors = [np.full(4, i, dtype=np.float32) for i in range(4)]
+        flat_index.add_vectors(["a", "b", "c", "d"], vectors)
+        flat_index.compaction_retry_delay = 0.01
+
+        compact = flat_index.compact
+        attempts = []
+        def cancelled_once():
+            attempts.append(1)
+            # İlk deneme eşzamanlı bir yazma nedeniyle iptal edilmiş gibi davranır
+            return 0 if len(attempts) == 1 else compact()
+
+        flat_index.compact = cancelled_once
+        flat_index.delete_vectors(["a", "b"])
+        thread = flat_index._compaction_thread
+        if thread is not None:
+            thread.join(timeout=5)
+
+        assert len(attempts) == 2
+        assert flat_index.deleted_count == 0
+        assert flat_index.vector_count == 2
+
+    def test_query_batch_matches_single_queries(self, flat_index):
+        """Toplu arama, tekil aramalarla aynı sonuçları döndürmeli."""
+        rng = np.random.default_rng(0)
+        vectors = rng.standard_normal((20, 4)).astype(np.float32)
+        flat_index.add_vectors([f"v{i}" for i in range(20)], list(vectors))
+
+        flat_index._schedule_compaction = lambda: None
+        flat_index.delete_vectors(["v3"])
+
+        queries = vectors[:4] + 0.01
+        ids, distances = flat_index.query_batch(queries, top_k=3)
+
+        assert ids.shape == (4, 3)
+        assert distances.shape == (4, 3)
+        for row, query in enumerate(queries):
+            single = flat_index.query(query, top_k=3)
+            assert list(ids[row]) == [r["vector_id"] for r in single]
+            assert distances[row] == pytest.approx([r["distance"] for r in single], rel=1e-4)
+
+    def test_query_batch_pads_missing_results(self, flat_index):
+        """Yeterli vektör yoksa boş konumlar None/inf ile doldurulmalı."""
+        flat_index.add_vectors(["a"], [np.ones(4, dtype=np.float32)])
+
+        ids, distances = flat_index.query_batch(np.ones((2, 4), dtype=np.float32), top_k=3)
+
+        assert list(ids[0]) == ["a", None, None]
+        assert np.isinf(distances[0, 1:]).all()
+
+
+class TestTrainedIndexes:
+    """IVF/PQ/IVFPQ eğitim yaşam döngüsü test sınıfı."""
+
+    def make_index(self, index_class, **options):
+        """Küçük eğitim eşiğiyle başlatılmış indeks."""
+        options.setdefault("training_threshold", 200)
+        config = VectorDBConfig(
+            dimension=8,
+            metric_type="l2",
+            num_partitions=4,
+            num_subvectors=4,
+            bits_per_subvector=4,
+            **options
+        )
+        index = index_class(config)
+        index.initialize()
+        return index
+
+    def add_random(self, index, count, offset=0, loc=0.0, seed=0):
+        """Rastgele vektörler ekler ve döndürür."""
+        vectors = np.random.default_rng(seed).normal(loc, 1.0, (count, 8)).astype(np.float32)
+        index.add_vectors([f"v{offset + i}" for i in range(count)], list(vectors))
+        return vectors
+
+    @pytest.mark.parametrize("index_class", [IVFIndex, PQIndex, IVFPQIndex])
+    def test_buffers_until_threshold_then_trains(self, index_class):
+        """Eşiğe kadar tam arama yapılmalı, sonra gerçek vektörlerle eğitilmeli."""
+        index = self.make_index(index_class)
+        vectors = self.add_random(index, 150)
+
+        assert not index.is_trained_with_real_data
+        results = index.query(vectors[7], top_k=1)
+        assert results[0]["vector_id"] == "v7"
+        assert results[0]["distance"] == pytest.approx(0.0, abs=1e-5)
+
+        self.add_random(index, 100, offset=150, seed=1)
+        index.wait_for_training(timeout=30)
+
+        assert index.is_trained_with_real_data
+        assert index.training_count == 1
+        assert index.index.ntotal == 250
+        assert not hasattr(index, "vectors")
+        assert index.query(vectors[7], top_k=5)
+
+    def test_delete_and_update_do_not_retrain(self):
+        """Silme ve güncelleme indeksi yeniden eğitmemeli."""
+        index = self.make_index(PQIndex)
+        vectors = self.add_random(index, 250)
+        index.wait_for_training(timeout=30)
+
+        index.delete_vectors(["v0", "v1"])
+        index.update_vectors(["v2", "missing"], [vectors[3]])
+
+        assert index.training_count == 1
+        assert index.vector_count == 248
+        assert index.index.ntotal == 248
+        ids = [r["vector_id"] for r in index.query(vectors[0], top_k=248)]
+        assert "v0" not in ids and "v1" not in ids
+        assert "v2" in ids
+
+    def test_changes_during_training_are_replayed(self):
+        """Eğitim sırasında eklenen ve silinen vektörler yeni indekste olmalı."""
+        index = self.make_index(IVFIndex, training_threshold=10**6)
+        vectors = self.add_random(index, 300)
+        create_index = index._create_index
+
+        def create_index_with_changes():
+            index.add_vectors(["late"], [vectors[0] + 100.0])
+            index.delete_vectors(["v5"])
+            return create_index()
+
+        index._create_index = create_index_with_changes
+        assert index.train()
+
+        assert index.index.ntotal == 300
+        assert index.query(vectors[0] + 100.0, top_k=1)[0]["vector_id"] == "late"
+        assert "v5" not in index.id_to_index
+
+    def test_raw_vectors_are_kept_on_mmap(self, tmp_path):
+        """Ham vektörler mmap dosyasından aynen okunabilmeli."""
+        path = str(tmp_path / "raw.f32")
+        index = self.make_index(PQIndex, keep_raw_vectors=True, raw_vector_path=path)
+        vectors = self.add_random(index, 250)
+        index.wait_for_training(timeout=30)
+
+        labels = np.array([index.id_to_index["v0"], index.id_to_index["v249"]])
+        np.testing.assert_array_equal(index.raw_vectors.read(labels), vectors[[0, 249]])
+        assert index.stats()["raw_vectors_path"] == path
+
+    def test_drift_triggers_retraining(self):
+        """Dağılım kayması arka planda yeniden eğitimi tetiklemeli."""
+        index = self.make_index(IVFIndex, drift_threshold=2.0)
+        self.add_random(index, 250)
+        index.wait_for_training(timeout=30)
+        assert index.training_count == 1
+
+        self.add_random(index, 300, offset=250, loc=50.0, seed=2)
+        index.wait_for_training(timeout=30)
+
+        assert index.training_count == 2
+        assert index.drift_error is None or index.drift_error <= index.training_error * 2.0
+
+
+class TestRescoring:
+    """Sıkıştırılmış arama + tam yeniden puanlama test sınıfı."""
+
+    @pytest.fixture
+    def data(self):
+        """Düşük iç boyutlu rastgele veri ve sorgular."""
+        rng = np.random.default_rng(0)
+        latent = rng.standard_normal((1040, 4)).astype(np.float32)
+        data = latent @ rng.standard_normal((4, 16)).astype(np.float32)
+        return data[:1000], data[1000:]
+
+    def make_index(self, metric_type, oversample, **options):
+        """Ham vektörleri tutan küçük PQ indeksi."""
+        config = VectorDBConfig(
+            dimension=16,
+            metric_type=metric_type,
+            num_subvectors=4,
+            bits_per_subvector=4,
+            training_threshold=500,
+            rescore_oversample=oversample,
+            **options
+        )
+        index = PQIndex(config)
+        index.initialize()
+        return index
+
+    @pytest.mark.parametrize("metric_type", ["l2", "cosine", "dot"])
+    def test_full_oversample_matches_exact_search(self, data, metric_type):
+        """Tüm vektörler aday olduğunda sonuçlar tam aramayla aynı olmalı."""
+        base, queries = data
+        index = self.make_index(metric_type, oversample=1000)
+        ids = [f"v{i}" for i in range(len(base))]
+        index.add_vectors(ids, list(base))
+        index.wait_for_training(timeout=30)
+        assert index.is_trained_with_real_data
+        assert index.raw_vectors is not None
+
+        found, distances = index.query_batch(queries, top_k=5)
+        truth = np.asarray(ids, dtype=object)[exact_neighbors(base, queries, 5, metric_type)]
+
+        assert recall_at_k(found, truth) == pytest.approx(1.0)
+        if metric_type == "l2":
+            assert np.all(np.diff(distances, axis=1) >= 0)
+
+    def test_rescoring_improves_recall(self, data):
+        """Aday çarpanı arttıkça recall düşmemeli ve tam aramaya yaklaşmalı."""
+        base, queries = data
+        index = self.make_index("l2", oversample=0, keep_raw_vectors=True)
+        ids = [f"v{i}" for i in range(len(base))]
+        index.add_vectors(ids, list(base))
+        index.wait_for_training(timeout=30)
+
+        results = benchmark_recall(index, ids, base, queries, top_k=10, oversample_values=(0, 4, 32))
+
+        recalls = [row["recall"] for row in results]
+        assert [row["oversample"] for row in results] == [0, 4, 32]
+        assert recalls[0] <= recalls[1] <= recalls[2]
+        assert recalls[2] >= 0.95
+        assert index.rescore_oversample == 0
+
+
+class TestQuantizedIndexes:
+    """int8 ve ikili nicemlenmiş indeks test sınıfı."""
+
+    @pytest.fixture
+    def data(self):
+        """Düşük iç boyutlu sentetik veri ve sorgular."""
+        rng = np.random.default_rng(3)
+        latent = rng.standard_normal((1050, 8)).astype(np.float32)
+        data = latent @ rng.standard_normal((8, 64)).astype(np.float32)
+        return data[:1000], data[1000:]
+
+    def make_index(self, index_class, metric_type="l2", **options):
+        """Küçük nicemlenmiş indeks."""
+        config = VectorDBConfig(dimension=64, metric_type=metric_type, initial_capacity=16, **options)
+        index = index_class(config)
+        index.initialize()
+        return index
+
+    def test_sq8_codes_decode_close_to_vectors(self, data):
+        """int8 kodları kalibre edilen aralıkta vektörlere yakın çözülmeli."""
+        base, _ = data
+        index = self.make_index(ScalarQuantizedIndex)
+        index.add_vectors([f"v{i}" for i in range(len(base))], list(base))
+
+        decoded = index.minimums + index.scales * index.index[:len(base)].astype(np.float32)
+        assert index.index.dtype == np.uint8
+        assert np.max(np.abs(decoded - base)) <= np.max(index.scales)
+
+    def wait_for_compaction(self, index):
+        """Arka plan sıkıştırmasının bitmesini bekler."""
+        thread = index._compaction_thread
+        if thread is not None:
+            thread.join(timeout=5)
+
+    def test_sq8_recalibrates_out_of_range_vectors(self, data):
+        """Aralık dışındaki vektörler gelince aralık arka planda genişlemeli ve kodlar yenilenmeli."""
+        base, _ = data
+        index = self.make_index(ScalarQuantizedIndex)
+        index.add_vectors([f"v{i}" for i in range(100)], list(base[:100] * 0.1))
+        index.add_vectors([f"w{i}" for i in range(100)], list(base[100:200] * 10))
+        self.wait_for_compaction(index)
+
+        assert not index.stats()["recalibration_pending"]
+        decoded = index.minimums + index.scales * index.index[:200].astype(np.float32)
+        expected = np.vstack((base[:100] * 0.1, base[100:200] * 10))
+        assert np.max(np.abs(decoded - expected)) <= np.max(index.scales)
+
+    def test_sq8_out_of_range_add_does_not_recode_under_lock(self, data):
+        """Aralık dışı ekleme mevcut kodları yeniden üretmemeli; değerler aralığa kırpılmalı."""
+        base, _ = data
+        index = self.make_index(ScalarQuantizedIndex)
+        index._schedule_compaction = lambda: None
+        index.add_vectors([f"v{i}" for i in range(100)], list(base[:100] * 0.1))
+        codes = index.index[:100].copy()
+        minimums, scales = index.minimums, index.scales
+
+        index.add_vectors([f"w{i}" for i in range(100)], list(base[100:200] * 10))
+
+        assert index.stats()["recalibration_pending"]
+        np.testing.assert_array_equal(index.index[:100], codes)
+        assert index.minimums is minimums and index.scales is scales
+        decoded = minimums + scales * index.index[100:200].astype(np.float32)
+        clipped = np.clip(base[100:200] * 10, minimums, minimums + scales * 255.0)
+        assert np.max(np.abs(decoded - clipped)) <= np.max(scales)
+
+        assert index.compact() == 0
+        assert not index.stats()["recalibration_pending"]
+        decoded = index.minimums + index.scales * index.index[:200].astype(np.float32)
+        expected = np.vstack((base[:100] * 0.1, base[100:200] * 10))
+        assert np.max(np.abs(decoded - expected)) <= np.max(index.scales)
+
+    def test_binary_codes_are_packed_bits(self, data):
+        """İkili kodlar boyut başına bir bit kullanmalı."""
+        base, _ = data
+        index = self.make_index(BinaryQuantizedIndex)
+        index.add_vectors([f"v{i}" for i in range(len(base))], list(base))
+
+        assert index.code_size == 8
+        bits = np.unpackbits(index.index[:len(base)], axis=1, bitorder="little")[:, :64]
+        np.testing.assert_array_equal(bits, base > index.thresholds)
+
+    @pytest.mark.parametrize("index_class", [ScalarQuantizedIndex, BinaryQuantizedIndex])
+    @pytest.mark.parametrize("metric_type", ["l2", "cosine", "dot"])
+    def test_rescored_search_recall(self, data, index_class, metric_type):
+        """Yeniden puanlamalı arama tam aramaya yakın sonuç vermeli."""
+        base, queries = data
+        index = self.make_index(index_class, metric_type, rescore_oversample=20)
+        ids = [f"v{i}" for i in range(len(base))]
+        for start in range(0, len(base), 250):
+            index.add_vectors(ids[start:start + 250], list(base[start:start + 250]))
+
+        found, distances = index.query_batch(queries, top_k=10)
+        truth = np.asarray(ids, dtype=object)[exact_neighbors(base, queries, 10, metric_type)]
+
+        assert recall_at_k(found, truth) >= 0.9
+        # cosine için benzerlik (büyük iyi), l2/dot için mesafe (küçük iyi) döner
+        order = np.diff(distances, axis=1)
+        assert np.all(order <= 0) if metric_type == "cosine" else np.all(order >= 0)
+
+    def test_sq8_without_rescoring(self, data):
+        """Yeniden puanlama kapalıyken de int8 araması isabetli olmalı."""
+        base, queries = data
+        index = self.make_index(ScalarQuantizedIndex, rescore_oversample=1)
+        ids = [f"v{i}" for i in range(len(base))]
+        index.add_vectors(ids, list(base))
+
+        found, distances = index.query_batch(queries, top_k=10)
+        truth = np.asarray(ids, dtype=object)[exact_neighbors(base, queries, 10)]
+
+        assert recall_at_k(found, truth) >= 0.8
+        assert np.all(distances >= 0)
+
+    @pytest.mark.parametrize("index_class", [ScalarQuantizedIndex, BinaryQuantizedIndex])
+    def test_delete_update_and_compaction(self, data, index_class):
+        """Silinen vektörler dönmemeli, eşik aşılınca satırlar sıkıştırılmalı."""
+        base, _ = data
+        index = self.make_index(index_class, compaction_threshold=0.3)
+        index.add_vectors([f"v{i}" for i in range(100)], list(base[:100]))
+
+        index.delete_vectors([f"v{i}" for i in range(20)])
+        assert index.deleted_count == 20
+        assert index.query(base[5], top_k=1)[0]["vector_id"] != "v5"
+
+        index.update_vectors(["v50"], [base[500]])
+        assert index.query(base[500], top_k=1)[0]["vector_id"] == "v50"
+
+        index.delete_vectors([f"v{i}" for i in range(20, 40)])
+        thread = index._compaction_thread
+        if thread is not None:
+            thread.join(timeout=5)
+
+        assert index.deleted_count == 0
+        assert index.size == index.vector_count == 60
+        assert index.query(base[60], top_k=1)[0] == {"vector_id": "v60", "distance": pytest.approx(0.0, abs=1e-3)}
+        assert index.query(base[500], top_k=1)[0]["vector_id"] == "v50"
+
+    @pytest.mark.parametrize("index_class", [ScalarQuantizedIndex, BinaryQuantizedIndex])
+    def test_delete_does_not_compact_under_lock(self, data, index_class):
+        """Silme sıkıştırmayı beklememeli; sıkıştırma sırasında eklenen satırlar korunmalı."""
+        base, _ = data
+        index = self.make_index(index_class, compaction_threshold=0.3)
+        index.add_vectors([f"v{i}" for i in range(100)], list(base[:100]))
+
+        # Ham vektör kopyası sırasında kalibrasyon aralığındaki bir vektör eklenir
+        added = (base[60] + base[61]) / 2
+        read = index.raw_vectors.read
+        def read_and_add(rows):
+            if index.raw_vectors.read is read_and_add:
+                index.raw_vectors.read = read
+                index.add_vectors(["yeni"], [added])
+            return read(rows)
+
+        index._schedule_compaction = lambda: None
+        index.delete_vectors([f"v{i}" for i in range(40)])
+        assert index.deleted_count == 40
+
+        index.raw_vectors.read = read_and_add
+        assert index.compact() == 40
+
+        assert index.size == index.vector_count == 61
+        assert index.id_to_index["yeni"] == 60
+        assert index.query(added, top_k=1)[0]["vector_id"] == "yeni"
+        assert index.query(base[70], top_k=1)[0] == {"vector_id": "v70", "distance": pytest.approx(0.0, abs=1e-3)}
+
+    def test_compaction_is_cancelled_by_concurrent_delete(self, data):
+        """Sıkıştırma sırasında silme yapılırsa sıkıştırma iptal edilmeli."""
+        base, _ = data
+        index = self.make_index(ScalarQuantizedIndex, compaction_threshold=0.3)
+        index.add_vectors([f"v{i}" for i in range(100)], list(base[:100]))
+        index._schedule_compaction = lambda: None
+        index.delete_vectors([f"v{i}" for i in range(40)])
+
+        read = index.raw_vectors.read
+        def read_and_delete(rows):
+            if index.raw_vectors.read is read_and_delete:
+                index.raw_vectors.read = read
+                index.delete_vectors(["v50"])
+            return read(rows)
+
+        index.raw_vectors.read = read_and_delete
+        assert index.compact() == 0
+        assert index.deleted_count == 41
+        assert index.compact() == 41
+        assert index.vector_count == 59
+        assert index.query(base[50], top_k=1)[0]["vector_id"] != "v50"
+
+    def test_binary_recalibrates_as_index_grows(self, data):
+        """İkili eşikler vektör sayısı ikiye katlandıkça yeniden hesaplanmalı."""
+        base, _ = data
+        index = self.make_index(BinaryQuantizedIndex, training_sample_size=400)
+        shifted = base + 5.0
+        index.add_vectors([f"v{i}" for i in range(100)], list(base[:100]))
+        index.add_vectors([f"w{i}" for i in range(300)], list(shifted[:300]))
+        self.wait_for_compaction(index)
+
+        expected = np.vstack((base[:100], shifted[:300])).mean(axis=0)
+        np.testing.assert_allclose(index.thresholds, expected, rtol=1e-4, atol=1e-4)
+        bits = np.unpackbits(index.index[:400], axis=1, bitorder="little")[:, :64]
+        np.testing.assert_array_equal(bits[:100], base[:100] > index.thresholds)
+
+
+class TestHNSWPersistence:
+    """HNSWIndex anlık görüntü, WAL ve sıkıştırma test sınıfı."""
+
+    def make_index(self, path, **options):
+        """Kalıcı dizini olan küçük HNSW indeksi."""
+        config = VectorDBConfig(
+            index_type=IndexType.HNSW,
+            dimension=8,
+            metric_type="l2",
+            index_path=str(path),
+            snapshot_interval=0,
+            **options
+        )
+        index = HNSWIndex(config)
+        index.initialize()
+        return index
+
+    def vectors(self, count, seed=0):
+        """Rastgele test vektörleri."""
+        return list(np.random.default_rng(seed).random((count, 8), dtype=np.float32))
+
+    def assert_same_results(self, first, second, queries):
+        """İki indeks aynı sorgulara aynı sonuçları vermeli."""
+        first_ids, first_distances = first.query_batch(queries, top_k=5)
+        second_ids, second_distances = second.query_batch(queries, top_k=5)
+        np.testing.assert_array_equal(first_ids, second_ids)
+        np.testing.assert_allclose(first_distances, second_distances, rtol=1e-5)
+
+    def test_snapshot_round_trip(self, tmp_path):
+        """Kaydedilen graf ve ID eşleştirmeleri aynen yüklenmeli."""
+        index = self.make_index(tmp_path)
+        index.add_vectors([f"v{i}" for i in range(200)], self.vectors(200))
+        index.delete_vectors(["v3", "v4"])
+        snapshot_dir = index.save()
+
+        assert os.path.basename(snapshot_dir) == open(tmp_path / "CURRENT").read()
+        assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+        restored = self.make_index(tmp_path)
+        assert restored.vector_count == 198
+        assert restored.id_to_index == index.id_to_index
+        assert restored.deleted_count == 2
+        self.assert_same_results(index, restored, np.asarray(self.vectors(10, seed=1)))
+
+    def test_wal_is_replayed_after_crash(self, tmp_path):
+        """Anlık görüntüden sonraki değişiklikler WAL'dan geri yüklenmeli."""
+        index = self.make_index(tmp_path)
+        index.add_vectors([f"v{i}" for i in range(100)], self.vectors(100))
+        index.save()
+
+        index.add_vectors([f"w{i}" for i in range(50)], self.vectors(50, seed=2))
+        index.update_vectors(["v0"], [np.full(8, 5.0, dtype=np.float32)])
+        index.delete_vectors(["v1", "w1"])
+        # close() çağrılmadan yeni örnek açmak çökmeyi taklit eder
+        restored = self.make_index(tmp_path)
+
+        assert restored.vector_count == 148
+        assert "v1" not in restored.id_to_index and "w1" not in restored.id_to_index
+        assert restored.query(np.full(8, 5.0, dtype=np.float32), top_k=1)[0]["vector_id"] == "v0"
+        self.assert_same_results(index, restored, np.asarray(self.vectors(10, seed=1)))
+
+    def test_wal_without_snapshot_and_torn_record(self, tmp_path):
+        """İlk anlık görüntüden önceki WAL oynatılmalı, yarım kalan kayıt yok sayılmalı."""
+        index = self.make_index(tmp_path)
+        index.add_vectors([f"v{i}" for i in range(20)], self.vectors(20))
+        index.add_vectors([f"w{i}" for i in range(20)], self.vectors(20, seed=2))
+
+        # Son kaydı yarıda kes
+        wal_path = index._wal.path
+        with open(wal_path, "r+b") as f:
+            f.truncate(os.path.getsize(wal_path) - 10)
+
+        restored = self.make_index(tmp_path)
+        assert sorted(restored.id_to_index) == sorted(f"v{i}" for i in range(20))
+
+    def test_close_writes_final_snapshot(self, tmp_path):
+        """close() bekleyen değişiklikleri anlık görüntüye yazmalı ve eski dosyaları silmeli."""
+        index = self.make_index(tmp_path)
+        index.add_vectors([f"v{i}" for i in range(30)], self.vectors(30))
+        index.save()
+        index.add_vectors(["x"], self.vectors(1, seed=3))
+        index.close()
+
+        snapshots = [name for name in os.listdir(tmp_path) if name.startswith("snapshot-")]
+        assert len(snapshots) == 1
+        restored = self.make_index(tmp_path)
+        assert restored.vector_count == 31
+        assert restored.stats()["wal_records"] == 0
+
+    def test_compaction_rebuilds_graph_without_deleted(self, tmp_path):
+        """Silinmiş oranı eşiği aşınca graf yeniden inşa edilmeli ve kaydedilmeli."""
+        index = self.make_index(tmp_path, compaction_threshold=0.3)
+        vectors = self.vectors(300)
+        index.add_vectors([f"v{i}" for i in range(300)], vectors)
+
+        index.delete_vectors([f"v{i}" for i in range(100)])
+        thread = index._compaction_thread
+        assert thread is not None
+        thread.join(timeout=30)
+
+        assert index.deleted_count == 0
+        assert index.index.element_count == 200
+        assert index.query(vectors[150], top_k=1)[0]["vector_id"] == "v150"
+
+        restored = self.make_index(tmp_path)
+        assert restored.index.element_count == 200
+        self.assert_same_results(index, restored, np.asarray(self.vectors(10, seed=1)))
+
+    def test_changes_during_compaction_are_kept(self, tmp_path):
+        """Sıkıştırma sırasında yapılan değişiklikler yeni grafta korunmalı."""
+        index = self.make_index(tmp_path, compaction_threshold=0)
+        index.add_vectors([f"v{i}" for i in range(100)], self.vectors(100))
+        index.delete_vectors([f"v{i}" for i in range(10)])
+
+        # Canlı vektörler yeni grafa kopyalandıktan sonra değişiklik yapılır
+        new_graph = index._new_graph
+
+        class GraphWithChanges:
+            def __init__(self, graph):
+                self.graph = graph
+
+            def __getattr__(self, name):
+                return getattr(self.graph, name)
+
+            def add_items(self, vectors, labels):
+                self.graph.add_items(vectors, labels)
+                if "late" not in index.id_to_index:
+                    index.add_vectors(["late"], [np.full(8, 3.0, dtype=np.float32)])
+                    index.delete_vectors(["v50"])
+
+        index._new_graph = lambda capacity: GraphWithChanges(new_graph(capacity))
+        assert index.compact() == 10
+
+        assert index.deleted_count == 1
+        assert "v50" not in index.id_to_index
+        assert index.query(np.full(8, 3.0, dtype=np.float32), top_k=1)[0]["vector_id"] == "late"
+        assert index.vector_count == 90
@@ -0,0 +1,119 @@
+"""
+OptimizedVectorDB vektör deposu arayüzü için test dosyası.
+"""
+
+import numpy as np
+
+from ModularMind.API.services.vector_db.optimized_vector_db import OptimizedVectorDB, VectorDBConfig, IndexType
+from ModularMind.API.services.vector_db.index_managers import FlatIndex
+
+
+class InMemoryCursor(list):
+    """limit() destekleyen basit imleç."""
+
+    def limit(self, count):
+        return InMemoryCursor(self[:count])
+
+
+class InMemoryCollection:
+    """Testlerde kullanılan bellek içi metadata koleksiyonu."""
+
+    def __init__(self, docs):
+        self.docs = docs
+
+    def find(self, query):
+        def matches(doc):
+            for key, value in query.items():
+                if isinstance(value, dict) and "$in" in value:
+                    if doc.get(key) not in value["$in"]:
+                        return False
+                    continue
+                current = doc
+                for part in key.split("."):
+                    current = current.get(part) if isinstance(current, dict) else None
+                if current != value:
+                    return False
+            return True
+
+        return InMemoryCursor(dict(doc) for doc in self.docs if matches(doc))
+
+
+class CountingFlatIndex(FlatIndex):
+    """Sorgu çağrılarını sayan FlatIndex."""
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.calls = {"query": 0, "query_batch": 0}
+
+    def query(self, query_vector, top_k=10):
+        self.calls["query"] += 1
+        return super().query(query_vector, top_k)
+
+    def query_batch(self, query_matrix, top_k=10):
+        self.calls["query_batch"] += 1
+        return super().query_batch(query_matrix, top_k)
+
+
+def make_db(count=6):
+    """Veritabanı bağlantısı olmadan küçük bir OptimizedVectorDB kurar."""
+    config = VectorDBConfig(index_type=IndexType.FLAT, dimension=4, metric_type="l2")
+    db = OptimizedVectorDB.__new__(OptimizedVectorDB)
+    db.config = config
+    db.vector_cache = {}
+    db.index_manager = CountingFlatIndex(config)
+    db.index_manager.initialize()
+
+    vector_ids = [f"v{i}" for i in range(count)]
+    db.index_manager.add_vectors(vector_ids, [np.full(4, i, dtype=np.float32) for i in range(count)])
+    db.metadata_collection = InMemoryCollection([
+        {
+            "vector_id": vector_id,
+            "doc_id": f"doc{i % 2}",
+            "chunk_index": i,
+            "metadata": {"chunk_id": f"chunk{i}", "text": f"metin {i}", "source": f"s{i % 2}"}
+        }
+        for i, vector_id in enumerate(vector_ids)
+    ])
+    return db
+
+
+def test_search_by_vectors_uses_single_batch_query():
+    """Filtresiz toplu arama tek bir query_batch çağrısıyla yapılmalı."""
+    db = make_db()
+    queries = [[0.0] * 4, [5.0] * 4, [2.0] * 4]
+
+    batch_results = db.search_by_vectors(queries, limit=2)
+
+    assert db.index_manager.calls == {"query": 0, "query_batch": 1}
+    assert [[result["id"] for result in results] for results in batch_results] == [
+        ["chunk0", "chunk1"], ["chunk5", "chunk4"], ["chunk2", "chunk1"]
+    ]
+    first = batch_results[0][0]
+    assert first["document_id"] == "doc0"
+    assert first["text"] == "metin 0"
+    assert first["metadata"]["source"] == "s0"
+
+
+def test_search_by_vectors_matches_single_searches():
+    """Toplu arama tekil aramalarla aynı sonuçları vermeli."""
+    db = make_db()
+    queries = [[1.2] * 4, [3.9] * 4]
+
+    batch_results = db.search_by_vectors(queries, limit=3, include_metadata=False)
+    single_results = [db.search_by_vector(query, limit=3, include_metadata=False) for query in queries]
+
+    assert batch_results == single_results
+    assert "metadata" not in batch_results[0][0]
+
+
+def test_search_by_vectors_applies_metadata_filter():
+    """Metadata filtresi verildiğinde her sorgu filtreli aday kümesinde aranmalı."""
+    db = make_db()
+    queries = [[0.0] * 4, [5.0] * 4]
+
+    batch_results = db.search_by_vectors(queries, limit=2, filter_metadata={"source": "s1"})
+
+    assert db.index_manager.calls["query_batch"] == 0
+    assert batch_results == [db.search_by_vector(query, limit=2, filter_metadata={"source": "s1"}) for query in queries]
+    assert all(result["metadata"]["source"] == "s1" for results in batch_results for result in results)
+    assert batch_results[1][0]["id"] == "chunk5"
@@ -55,6 +55,9 @@ class Settings(BaseSettings):
     
     # Vector store
     vector_store_path: str = Field("./data/vector_indexes", env="VECTOR_STORE_PATH")
+    vector_store_workers: int = Field(4, env="VECTOR_STORE_WORKERS")
+    vector_store_max_batch_size: int = Field(64, env="VECTOR_STORE_MAX_BATCH_SIZE")
+    vector_store_batch_window_ms: float = Field(1.0, env="VECTOR_STORE_BATCH_WINDOW_MS")
     
     # Fine-tuning
     fine_tuning_min_examples: int = Field(50, env="FINE_TUNING_MIN_EXAMPLES")
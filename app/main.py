@@ -9,6 +9,7 @@ from app.api.error_handler import setup_error_handlers
 from app.api.rate_limit_middleware import setup_rate_limiting
 from app.utils.monitoring import setup_monitoring
 from app.services.fine_tuning_scheduler import get_fine_tuning_scheduler
+from app.services.vector_store import get_vector_store
 from app.db.mongodb import connect_to_mongo, close_mongo_connection
 
 # Configure logging
@@ -82,6 +83,10 @@ async def stop_background_services():
     fine_tuning_scheduler = get_fine_tuning_scheduler()
     await fine_tuning_scheduler.stop()
     logger.info("Stopped fine-tuning scheduler")
+    
+    # Finish pending vector store saves and stop its worker threads
+    await get_vector_store().close()
+    logger.info("Closed vector store")
 
 
 # Simple root endpoint
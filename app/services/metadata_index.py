@@ -0,0 +1,279 @@
+from typing import Dict, Optional, Any, Tuple, Iterable
+import math
+import numpy as np
+
+# Filter key suffixes understood by VectorStore._apply_filters
+RANGE_OPERATORS = {
+    "__gte": "gte",
+    "__lte": "lte",
+    "__gt": "gt",
+    "__lt": "lt",
+}
+
+EMPTY_ROWS = np.empty(0, dtype=np.int64)
+
+
+def parse_filter_key(key: str) -> Tuple[str, str]:
+    """
+    Split a filter key into field name and operator.
+
+    Args:
+        key: Filter key such as ``year__gte`` or ``category``
+
+    Returns:
+        Tuple of (field, operator) where operator is one of
+        ``eq``, ``in``, ``gt``, ``gte``, ``lt``, ``lte``
+    """
+    # Check the longer suffixes first so "__gte" is not read as "__gt"
+    for suffix, operator in RANGE_OPERATORS.items():
+        if key.endswith(suffix):
+            return key[:-len(suffix)], operator
+    if key.endswith("__in"):
+        return key[:-4], "in"
+    return key, "eq"
+
+
+def _sort_kind(value: Any) -> Optional[str]:
+    """Return the sorted column a value belongs to, or None if it has none."""
+    if isinstance(value, (int, float)):
+        if isinstance(value, float) and math.isnan(value):
+            return None
+        return "number"
+    if isinstance(value, str):
+        return "string"
+    return None
+
+
+class MetadataIndex:
+    """
+    Inverted index over document metadata keyed by FAISS row position.
+
+    Equality and membership filters are answered from per-field postings,
+    range filters from lazily sorted per-field columns, so evaluating a
+    filter costs about the number of matching rows rather than a scan over
+    every document. Values that cannot be hashed or sorted are kept aside
+    and checked directly, which keeps results identical to a full scan.
+    """
+
+    def __init__(self, excluded_fields: Iterable[str] = ("text",)):
+        """
+        Initialize an empty index.
+
+        Args:
+            excluded_fields: Metadata fields that are never indexed
+        """
+        self.excluded_fields = set(excluded_fields)
+        self.row_count = 0
+
+        # field -> {row: value}
+        self._columns: Dict[str, Dict[int, Any]] = {}
+        # field -> {value: set(rows)} for hashable values
+        self._postings: Dict[str, Dict[Any, set]] = {}
+        # field -> {row: value} for unhashable values (lists, dicts)
+        self._unhashable: Dict[str, Dict[int, Any]] = {}
+        # (field, kind) -> (sorted values, rows), rebuilt after changes
+        self._sorted: Dict[Tuple[str, str], Tuple[np.ndarray, np.ndarray]] = {}
+
+    def __len__(self) -> int:
+        return self.row_count
+
+    def build(self, rows: Iterable[Tuple[int, Dict[str, Any]]]) -> None:
+        """
+        Rebuild the index from (row, metadata) pairs.
+
+        Args:
+            rows: Row positions with their metadata
+        """
+        self._columns.clear()
+        self._postings.clear()
+        self._unhashable.clear()
+        self._sorted.clear()
+        self.row_count = 0
+
+        for row, metadata in rows:
+            self.add(row, metadata)
+
+    def add(self, row: int, metadata: Dict[str, Any]) -> None:
+        """
+        Index the metadata of one row.
+
+        Args:
+            row: FAISS row position
+            metadata: Document metadata
+        """
+        for field, value in metadata.items():
+            if field in self.excluded_fields:
+                continue
+
+            self._columns.setdefault(field, {})[row] = value
+            self._invalidate(field)
+
+            try:
+                self._postings.setdefault(field, {}).setdefault(value, set()).add(row)
+            except TypeError:
+                self._unhashable.setdefault(field, {})[row] = value
+
+        self.row_count += 1
+
+    def remove(self, row: int) -> None:
+        """
+        Remove one row from the index.
+
+        Args:
+            row: FAISS row position
+        """
+        removed = False
+
+        for field, column in self._columns.items():
+            if row not in column:
+                continue
+
+            value = column.pop(row)
+            removed = True
+            self._invalidate(field)
+
+            try:
+                postings = self._postings[field].get(value)
+            except TypeError:
+                self._unhashable[field].pop(row, None)
+                continue
+            if postings is not None:
+                postings.discard(row)
+                if not postings:
+                    del self._postings[field][value]
+
+        if removed:
+            self.row_count -= 1
+
+    def evaluate(self, filters: Dict[str, Any]) -> np.ndarray:
+        """
+        Evaluate filters against the index.
+
+        All conditions must hold (logical AND), and a condition on a field
+        never matches rows that do not have that field.
+
+        Args:
+            filters: Filters in ``_apply_filters`` syntax
+
+        Returns:
+            Sorted array of matching row positions
+        """
+        result: Optional[np.ndarray] = None
+
+        for key, value in filters.items():
+            field, operator = parse_filter_key(key)
+            rows = self._match(field, operator, value)
+
+            result = rows if result is None else np.intersect1d(result, rows, assume_unique=True)
+            if result.size == 0:
+                return EMPTY_ROWS
+
+        if result is None:
+            rows = set()
+            for column in self._columns.values():
+                rows.update(column)
+            return self._to_array(rows)
+
+        return result
+
+    def _match(self, field: str, operator: str, value: Any) -> np.ndarray:
+        """Rows where a single condition holds."""
+        column = self._columns.get(field)
+        if not column:
+            return EMPTY_ROWS
+
+        if operator == "eq":
+            return self._match_values(field, column, [value])
+        if operator == "in":
+            return self._match_values(field, column, value)
+        return self._match_range(field, column, operator, value)
+
+    def _match_values(self, field: str, column: Dict[int, Any], values: Iterable[Any]) -> np.ndarray:
+        """Rows whose value equals any of the given values."""
+        postings = self._postings.get(field, {})
+        rows = set()
+
+        for value in values:
+            try:
+                rows.update(postings.get(value, ()))
+            except TypeError:
+                # Unhashable filter values can only equal unhashable stored values
+                rows.update(
+                    row for row, stored in self._unhashable.get(field, {}).items()
+                    if self._equals(stored, value)
+                )
+
+        return self._to_array(rows)
+
+    def _match_range(self, field: str, column: Dict[int, Any], operator: str, value: Any) -> np.ndarray:
+        """Rows whose value compares to the given value with a range operator."""
+        kind = _sort_kind(value)
+        if kind is None:
+            # No sorted column for this type, compare directly
+            return self._to_array(
+                row for row, stored in column.items() if self._compare(stored, operator, value)
+            )
+
+        values, rows = self._sorted_column(field, kind, column)
+        target = float(value) if kind == "number" else value
+
+        if operator == "gt":
+            matching = rows[np.searchsorted(values, target, side="right"):]
+        elif operator == "gte":
+            matching = rows[np.searchsorted(values, target, side="left"):]
+        elif operator == "lt":
+            matching = rows[:np.searchsorted(values, target, side="left")]
+        else:
+            matching = rows[:np.searchsorted(values, target, side="right")]
+
+        return np.sort(matching)
+
+    def _sorted_column(self, field: str, kind: str, column: Dict[int, Any]) -> Tuple[np.ndarray, np.ndarray]:
+        """Sorted (values, rows) for the values of one type in a field."""
+        key = (field, kind)
+        cached = self._sorted.get(key)
+        if cached is not None:
+            return cached
+
+        items = [(stored, row) for row, stored in column.items() if _sort_kind(stored) == kind]
+        items.sort(key=lambda item: item[0])
+
+        if kind == "number":
+            values = np.array([float(stored) for stored, _ in items], dtype=np.float64)
+        else:
+            values = np.array([stored for stored, _ in items], dtype=str)
+        rows = np.array([row for _, row in items], dtype=np.int64)
+
+        self._sorted[key] = (values, rows)
+        return values, rows
+
+    def _invalidate(self, field: str) -> None:
+        """Drop sorted columns of a field after a change."""
+        self._sorted.pop((field, "number"), None)
+        self._sorted.pop((field, "string"), None)
+
+    @staticmethod
+    def _equals(stored: Any, value: Any) -> bool:
+        try:
+            return bool(stored == value)
+        except Exception:
+            return False
+
+    @staticmethod
+    def _compare(stored: Any, operator: str, value: Any) -> bool:
+        try:
+            if operator == "gt":
+                return stored > value
+            if operator == "gte":
+                return stored >= value
+            if operator == "lt":
+                return stored < value
+            return stored <= value
+        except TypeError:
+            return False
+
+    @staticmethod
+    def _to_array(rows: Iterable[int]) -> np.ndarray:
+        array = np.fromiter(rows, dtype=np.int64)
+        array.sort()
+        return array
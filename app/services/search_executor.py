@@ -0,0 +1,234 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+import asyncio
+import functools
+import logging
+import os
+import threading
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Largest number of queries sent to FAISS in one coalesced search call
+DEFAULT_MAX_BATCH_SIZE = 64
+
+# Seconds a search waits for other concurrent searches before it is sent
+DEFAULT_BATCH_WINDOW = 0.001
+
+
+class ReadWriteLock:
+    """
+    Lock held by many readers at once or by a single writer.
+
+    Writers are preferred: once a writer is waiting, new readers queue
+    behind it, so a steady stream of searches cannot starve index updates.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    @contextmanager
+    def read(self):
+        """Hold the lock shared with other readers."""
+        with self._condition:
+            while self._writer or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if self._readers == 0:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def write(self):
+        """Hold the lock exclusively."""
+        with self._condition:
+            self._waiting_writers += 1
+            try:
+                while self._writer or self._readers:
+                    self._condition.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writer = False
+                self._condition.notify_all()
+
+
+@dataclass
+class _PendingSearch:
+    """A query waiting to be sent as part of a coalesced search."""
+    index: Any
+    query: np.ndarray
+    k: int
+    future: asyncio.Future
+
+
+class SearchExecutor:
+    """
+    Runs blocking FAISS work off the event loop.
+
+    FAISS releases the GIL while searching, so a small thread pool lets
+    searches, index rebuilds and index writes proceed without stalling
+    other requests. Concurrent searches against the same index are
+    coalesced into a single batched ``index.search`` call, which FAISS
+    answers with one pass over the vectors instead of one pass per query.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        batch_window: float = DEFAULT_BATCH_WINDOW,
+        index_lock: Optional[ReadWriteLock] = None
+    ):
+        """
+        Initialize the executor.
+
+        Args:
+            max_workers: Number of worker threads (defaults to the CPU count, at most 8)
+            max_batch_size: Largest number of queries in one coalesced search
+            batch_window: Seconds to wait for concurrent searches before sending a batch
+            index_lock: Lock whose read side is held around each coalesced search,
+                for indexes that writers modify in place
+        """
+        self.max_workers = max_workers or min(8, os.cpu_count() or 1)
+        self.max_batch_size = max(1, max_batch_size)
+        self.batch_window = max(0.0, batch_window)
+        self.index_lock = index_lock
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="vector-store"
+        )
+        self._pending: List[_PendingSearch] = []
+        self._flush_handle: Optional[asyncio.Handle] = None
+
+        # Counters for monitoring how well searches are coalesced
+        self.search_calls = 0
+        self.batched_queries = 0
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Run a blocking function on the worker threads.
+
+        Args:
+            func: Function to run
+            *args: Positional arguments
+            **kwargs: Keyword arguments
+
+        Returns:
+            The function's return value
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    async def search(self, index: Any, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Search an index, coalescing with other concurrent searches.
+
+        Args:
+            index: FAISS index to search; writers modifying it in place must hold
+                the write side of ``index_lock``
+            query: Query vector of shape (1, dimension)
+            k: Number of results to return
+
+        Returns:
+            Tuple of (scores, indices) arrays of shape (1, k)
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append(_PendingSearch(index, np.asarray(query, dtype=np.float32).reshape(1, -1), k, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            if self.batch_window > 0:
+                self._flush_handle = loop.call_later(self.batch_window, self._flush)
+            else:
+                self._flush_handle = loop.call_soon(self._flush)
+
+        return await future
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop the worker threads.
+
+        Args:
+            wait: Whether to wait for running work to finish
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        for pending in self._pending:
+            if not pending.future.done():
+                pending.future.cancel()
+        self._pending = []
+
+        self._executor.shutdown(wait=wait)
+
+    def _flush(self) -> None:
+        """Send all pending searches, one batch per index."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        pending, self._pending = self._pending, []
+
+        # Searches captured before an index swap must stay on their own index
+        groups: Dict[int, List[_PendingSearch]] = {}
+        for search in pending:
+            if not search.future.cancelled():
+                groups.setdefault(id(search.index), []).append(search)
+
+        loop = asyncio.get_running_loop()
+        for searches in groups.values():
+            queries = np.vstack([search.query for search in searches])
+            k = max(search.k for search in searches)
+
+            self.search_calls += 1
+            self.batched_queries += len(searches)
+
+            future = loop.run_in_executor(self._executor, self._search, searches[0].index, queries, k)
+            future.add_done_callback(functools.partial(self._distribute, searches))
+
+    def _search(self, index: Any, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Run one batched search, under the read lock if one is set. Runs on a worker thread."""
+        if self.index_lock is None:
+            return index.search(queries, k)
+
+        with self.index_lock.read():
+            return index.search(queries, k)
+
+    @staticmethod
+    def _distribute(searches: List[_PendingSearch], future: asyncio.Future) -> None:
+        """Hand each caller its own rows of a batched search result."""
+        if future.cancelled():
+            for search in searches:
+                if not search.future.done():
+                    search.future.cancel()
+            return
+
+        error = future.exception()
+        if error is not None:
+            for search in searches:
+                if not search.future.done():
+                    search.future.set_exception(error)
+            return
+
+        scores, indices = future.result()
+        for i, search in enumerate(searches):
+            if not search.future.done():
+                search.future.set_result((scores[i:i + 1, :search.k], indices[i:i + 1, :search.k]))
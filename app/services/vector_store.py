@@ -12,10 +12,16 @@ from pydantic import BaseModel
 from app.core.config import settings
 from app.models.model_manager import get_model_manager
 from app.utils.metrics import get_retrieval_metrics
+from app.services.metadata_index import MetadataIndex
+from app.services.search_executor import SearchExecutor, ReadWriteLock
 
 logger = logging.getLogger(__name__)
 retrieval_metrics = get_retrieval_metrics()
 
+# Filtered searches selecting fewer rows than this use a sorted ID list,
+# larger selections use a bitmap over all rows
+BATCH_SELECTOR_MAX_ROWS = 4096
+
 class SearchResult(BaseModel):
     """Class representing a search result."""
     id: str
@@ -47,11 +53,32 @@ class VectorStore:
         self.index_to_id: Dict[int, str] = {}
         self.initialized = False
         
+        # Inverted index over metadata, keyed by FAISS row
+        self.metadata_index = MetadataIndex()
+        
         # Default embedding dimension
         self.dimension = 384  # Default, will be determined by the model
         
         # Lock for thread safety during updates
         self._lock = asyncio.Lock()
+        
+        # Worker threads for FAISS calls and coalesced searches. New rows
+        # are added to the index in place under the write side of
+        # _index_lock; searches, row reads and snapshot writes hold the read
+        # side. Deletes still build a new index and swap it in.
+        self._index_lock = ReadWriteLock()
+        self._executor = SearchExecutor(
+            max_workers=settings.vector_store_workers,
+            max_batch_size=settings.vector_store_max_batch_size,
+            batch_window=settings.vector_store_batch_window_ms / 1000.0,
+            index_lock=self._index_lock
+        )
+        
+        # Index rows whose ID mappings have been published; rows beyond this
+        # belong to an add that is still in progress
+        self._published_rows = 0
+        self._save_task: Optional[asyncio.Task] = None
+        self._save_requested = False
     
     async def initialize(self) -> None:
         """
@@ -70,16 +97,12 @@ class VectorStore:
             # Try loading existing index and metadata
             try:
                 if os.path.exists(self.index_path) and os.path.exists(self.metadata_path):
-                    # Load index
-                    self.index = faiss.read_index(self.index_path)
-                    
-                    # Load metadata
-                    with open(self.metadata_path, 'rb') as f:
-                        loaded_data = pickle.load(f)
-                        self.metadata = loaded_data.get('metadata', {})
-                        self.id_to_index = loaded_data.get('id_to_index', {})
-                        self.index_to_id = loaded_data.get('index_to_id', {})
-                        self.dimension = loaded_data.get('dimension', 384)
+                    # Load index and metadata
+                    self.index, loaded_data = await self._executor.run(self._read_snapshot)
+                    self.metadata = loaded_data.get('metadata', {})
+                    self.id_to_index = loaded_data.get('id_to_index', {})
+                    self.index_to_id = loaded_data.get('index_to_id', {})
+                    self.dimension = loaded_data.get('dimension', 384)
                     
                     logger.info(f"Loaded existing index with {self.index.ntotal} vectors")
                 else:
@@ -99,6 +122,9 @@ class VectorStore:
                 self.index = faiss.IndexFlatL2(self.dimension)
                 logger.info(f"Created fallback index with dimension {self.dimension}")
             
+            self._rebuild_metadata_index()
+            self._published_rows = self.index.ntotal
+            
             self.initialized = True
             logger.info(f"Vector store initialized in {time.time() - start_time:.2f}s")
     
@@ -137,16 +163,23 @@ class VectorStore:
             # Current index size
             start_index = self.index.ntotal
             
-            # Add to index
-            faiss.normalize_L2(embeddings)  # Normalize for cosine similarity
-            self.index.add(embeddings)
+            # Append in place; searches wait on the index lock while rows are added
+            await self._executor.run(self._extend_index, self.index, embeddings)
             
-            # Add metadata and mapping
+            # Publish the mappings of the new rows; nothing below awaits, so
+            # no search sees a half-updated store. Rows found by a search
+            # before this point have no mapping yet and are skipped.
             document_ids = []
             for i, doc in enumerate(documents):
                 doc_id = doc['id']
                 index_id = start_index + i
                 
+                # A re-added document replaces its previous row
+                previous_index = self.id_to_index.get(doc_id)
+                if previous_index is not None:
+                    self.index_to_id.pop(previous_index, None)
+                    self.metadata_index.remove(previous_index)
+                
                 # Store ID mappings
                 self.id_to_index[doc_id] = index_id
                 self.index_to_id[index_id] = doc_id
@@ -162,10 +195,14 @@ class VectorStore:
                 if 'metadata' in doc:
                     self.metadata[doc_id].update(doc['metadata'])
                 
+                self.metadata_index.add(index_id, self.metadata[doc_id])
+                
                 document_ids.append(doc_id)
             
-            # Save updated index and metadata
-            await self._save_index()
+            self._published_rows = start_index + len(documents)
+            
+            # Save updated index and metadata in the background
+            self._schedule_save()
             
             logger.info(f"Added {len(documents)} documents to vector store")
             
@@ -211,31 +248,25 @@ class VectorStore:
             query_embedding = await self.embed_query(query, model_name=embedding_model)
             
             # Normalize for cosine similarity
+            query_embedding = np.ascontiguousarray(query_embedding, dtype=np.float32)
             faiss.normalize_L2(query_embedding)
             
-            # Filter document IDs if filters provided
-            filtered_indices = None
+            # Search the index published at this point; deletes swap in a new
+            # index, adds append to this one under the index lock
+            index = self.index
+            index_to_id = self.index_to_id
+            
+            # Perform search, restricted to rows matching the filters
             if filters:
-                filtered_ids = self._apply_filters(filters)
-                if not filtered_ids:
+                rows = self.metadata_index.evaluate(filters)
+                if rows.size == 0:
                     return []  # No documents match filters
                 
-                # Map IDs to indices
-                filtered_indices = [self.id_to_index[doc_id] for doc_id in filtered_ids]
-            
-            # Create subset index if filtering
-            search_index = self.index
-            if filtered_indices:
-                search_index = faiss.IndexFlatL2(self.dimension)
-                vecs = np.zeros((len(filtered_indices), self.dimension), dtype=np.float32)
-                
-                for i, idx in enumerate(filtered_indices):
-                    faiss.index_search_index_by_id(self.index, idx, vecs, i)
-                
-                search_index.add(vecs)
-            
-            # Perform search
-            scores, indices = search_index.search(query_embedding, k)
+                scores, indices = await self._executor.run(
+                    self._filtered_search, index, query_embedding, k, rows
+                )
+            else:
+                scores, indices = await self._executor.search(index, query_embedding, k)
             
             # Map search results to document IDs
             results = []
@@ -244,15 +275,11 @@ class VectorStore:
                 score = float(scores[0][i])
                 
                 # Skip if score is too low (no good matches)
-                if score < 0:
+                if score < 0 or idx < 0:
                     continue
                 
                 # Get document ID from index
-                if filtered_indices:
-                    # If using subset index, we need to map back to original indices
-                    doc_id = self.index_to_id.get(filtered_indices[idx])
-                else:
-                    doc_id = self.index_to_id.get(idx)
+                doc_id = index_to_id.get(int(idx))
                 
                 if not doc_id or doc_id not in self.metadata:
                     continue
@@ -312,20 +339,11 @@ class VectorStore:
                 return 0
             
             # Collect vectors to keep
-            keep_ids = existing_ids - ids_to_delete
+            keep_ids = [doc_id for doc_id in self.id_to_index if doc_id not in ids_to_delete]
             keep_indices = [self.id_to_index[doc_id] for doc_id in keep_ids]
             
-            # Create a new index
-            new_index = faiss.IndexFlatL2(self.dimension)
-            
-            if keep_indices:
-                # Extract vectors to keep
-                vecs = np.zeros((len(keep_indices), self.dimension), dtype=np.float32)
-                for i, idx in enumerate(keep_indices):
-                    faiss.index_get_vector(self.index, idx, vecs[i])
-                
-                # Add vectors to new index
-                new_index.add(vecs)
+            # Create a new index from the vectors to keep
+            new_index = await self._executor.run(self._rebuild_index, self.index, keep_indices)
             
             # Update id mappings
             new_id_to_index = {}
@@ -344,9 +362,11 @@ class VectorStore:
             self.index = new_index
             self.id_to_index = new_id_to_index
             self.index_to_id = new_index_to_id
+            self._published_rows = new_index.ntotal
+            self._rebuild_metadata_index()
             
-            # Save updated index and metadata
-            await self._save_index()
+            # Save updated index and metadata in the background
+            self._schedule_save()
             
             deleted_count = len(ids_to_delete)
             logger.info(f"Deleted {deleted_count} documents from vector store")
@@ -393,68 +413,173 @@ class VectorStore:
         if not filters:
             return list(self.metadata.keys())
         
-        matching_ids = []
-        
-        for doc_id, metadata in self.metadata.items():
-            matches = True
-            
-            for key, value in filters.items():
-                # Handle special operators in key
-                if key.endswith('__gt'):
-                    field = key[:-4]
-                    if field not in metadata or metadata[field] <= value:
-                        matches = False
-                        break
-                elif key.endswith('__lt'):
-                    field = key[:-4]
-                    if field not in metadata or metadata[field] >= value:
-                        matches = False
-                        break
-                elif key.endswith('__gte'):
-                    field = key[:-5]
-                    if field not in metadata or metadata[field] < value:
-                        matches = False
-                        break
-                elif key.endswith('__lte'):
-                    field = key[:-5]
-                    if field not in metadata or metadata[field] > value:
-                        matches = False
-                        break
-                elif key.endswith('__in'):
-                    field = key[:-4]
-                    if field not in metadata or metadata[field] not in value:
-                        matches = False
-                        break
-                else:
-                    # Exact match
-                    if key not in metadata or metadata[key] != value:
-                        matches = False
-                        break
+        return [
+            self.index_to_id[row]
+            for row in self.metadata_index.evaluate(filters).tolist()
+            if row in self.index_to_id
+        ]
+    
+    def _filtered_search(self, index, query_embedding: np.ndarray, k: int, rows: np.ndarray):
+        """
+        Search only the given rows of an index.
+        
+        The rows are passed to FAISS as an ID selector, so the filtered
+        search runs against the existing index without copying vectors.
+        Runs on a worker thread.
+        
+        Args:
+            index: FAISS index to search
+            query_embedding: Normalized query embedding
+            k: Number of results to return
+            rows: Sorted row positions allowed in the results
             
-            if matches:
-                matching_ids.append(doc_id)
+        Returns:
+            Tuple of (scores, indices) as returned by FAISS
+        """
+        with self._index_lock.read():
+            return self._search_rows(index, query_embedding, min(k, int(rows.size)), rows)
+    
+    def _search_rows(self, index, query_embedding: np.ndarray, k: int, rows: np.ndarray):
+        """Filtered search body; the caller holds the read side of the index lock."""
+        if rows.size <= BATCH_SELECTOR_MAX_ROWS:
+            selector = faiss.IDSelectorBatch(rows)
+        else:
+            mask = np.zeros(index.ntotal, dtype=bool)
+            mask[rows] = True
+            bitmap = np.packbits(mask, bitorder='little')
+            selector = faiss.IDSelectorBitmap(index.ntotal, faiss.swig_ptr(bitmap))
         
-        return matching_ids
+        try:
+            # The bitmap array must stay alive until the search returns
+            return index.search(query_embedding, k, params=faiss.SearchParameters(sel=selector))
+        except (RuntimeError, TypeError) as e:
+            # Index type without selector support, search a copy of the rows
+            logger.debug(f"ID selector not supported, searching subset index: {str(e)}")
+            subset = faiss.IndexFlatL2(self.dimension)
+            subset.add(index.reconstruct_batch(rows))
+            scores, positions = subset.search(query_embedding, k)
+            indices = np.where(positions >= 0, rows[np.clip(positions, 0, None)], -1)
+            return scores, indices
+    
+    def _extend_index(self, index, embeddings: np.ndarray) -> None:
+        """
+        Append normalized embeddings to an index in place.
+        
+        Runs on a worker thread. Normalization happens before the write
+        lock is taken, so searches only wait for the append itself.
+        """
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        faiss.normalize_L2(embeddings)  # Normalize for cosine similarity
+        
+        with self._index_lock.write():
+            index.add(embeddings)
+    
+    def _rebuild_index(self, index, keep_indices: List[int]):
+        """Build a new index holding only the given rows. Runs on a worker thread."""
+        new_index = faiss.IndexFlatL2(self.dimension)
+        
+        if keep_indices:
+            with self._index_lock.read():
+                vectors = index.reconstruct_batch(np.asarray(keep_indices, dtype=np.int64))
+            new_index.add(vectors)
+        
+        return new_index
+    
+    def _rebuild_metadata_index(self) -> None:
+        """Rebuild the metadata index from the current metadata and row mapping."""
+        self.metadata_index.build(
+            (index_id, self.metadata[doc_id])
+            for doc_id, index_id in self.id_to_index.items()
+            if doc_id in self.metadata
+        )
+    
+    def _read_snapshot(self):
+        """Read index and metadata from disk. Runs on a worker thread."""
+        index = faiss.read_index(self.index_path)
+        
+        with open(self.metadata_path, 'rb') as f:
+            loaded_data = pickle.load(f)
+        
+        return index, loaded_data
+    
+    def _write_snapshot(self, index, data: Dict[str, Any], rows: int) -> None:
+        """
+        Write index and metadata to disk. Runs on a worker thread.
+        
+        Files are written next to their targets and renamed into place, so
+        a crash during a save never leaves a truncated index behind. Only
+        the first ``rows`` rows, whose mappings are in ``data``, are written;
+        the index lock is held only while they are copied to memory.
+        """
+        index_tmp = f"{self.index_path}.tmp"
+        metadata_tmp = f"{self.metadata_path}.tmp"
+        
+        # Copy the published rows under a short read lock; the disk write
+        # below runs without the lock so adds and searches are not held up
+        with self._index_lock.read():
+            if index.ntotal > rows:
+                # An add appended rows after the mappings were copied
+                snapshot = faiss.IndexFlatL2(self.dimension)
+                if rows:
+                    snapshot.add(index.reconstruct_n(0, rows))
+                index = snapshot
+            serialized = faiss.serialize_index(index)
+        
+        with open(index_tmp, 'wb') as f:
+            serialized.tofile(f)
+        with open(metadata_tmp, 'wb') as f:
+            pickle.dump(data, f)
+        
+        os.replace(index_tmp, self.index_path)
+        os.replace(metadata_tmp, self.metadata_path)
+    
+    def _schedule_save(self) -> None:
+        """
+        Save the store in the background.
+        
+        Saves requested while one is running are folded into a single
+        follow-up save of the latest state.
+        """
+        self._save_requested = True
+        
+        if self._save_task is None or self._save_task.done():
+            self._save_task = asyncio.create_task(self._save_loop())
+    
+    async def _save_loop(self) -> None:
+        """Save until no new save has been requested."""
+        while self._save_requested:
+            self._save_requested = False
+            await self._save_index()
     
     async def _save_index(self) -> None:
         """Save index and metadata to disk."""
+        # Snapshot the mappings on the event loop; the index may still grow,
+        # so only the rows published with these mappings are written
+        index = self.index
+        rows = self._published_rows
+        data = {
+            'metadata': dict(self.metadata),
+            'id_to_index': dict(self.id_to_index),
+            'index_to_id': dict(self.index_to_id),
+            'dimension': self.dimension
+        }
+        
         try:
-            # Save index
-            faiss.write_index(self.index, self.index_path)
-            
-            # Save metadata
-            with open(self.metadata_path, 'wb') as f:
-                pickle.dump({
-                    'metadata': self.metadata,
-                    'id_to_index': self.id_to_index,
-                    'index_to_id': self.index_to_id,
-                    'dimension': self.dimension
-                }, f)
-            
+            await self._executor.run(self._write_snapshot, index, data, rows)
             logger.debug("Vector store saved to disk")
         except Exception as e:
             logger.error(f"Error saving vector store: {str(e)}")
     
+    async def flush(self) -> None:
+        """Wait until pending background saves have finished."""
+        while self._save_task is not None and not self._save_task.done():
+            await asyncio.shield(self._save_task)
+    
+    async def close(self) -> None:
+        """Finish pending saves and stop the worker threads."""
+        await self.flush()
+        self._executor.shutdown(wait=True)
+    
     async def get_stats(self) -> Dict[str, Any]:
         """Get statistics about the vector store."""
         await self.initialize()
@@ -463,7 +588,10 @@ class VectorStore:
             "total_vectors": self.index.ntotal,
             "dimension": self.dimension,
             "total_documents": len(self.metadata),
-            "index_type": type(self.index).__name__
+            "index_type": type(self.index).__name__,
+            "executor_workers": self._executor.max_workers,
+            "coalesced_search_calls": self._executor.search_calls,
+            "coalesced_queries": self._executor.batched_queries
         }
 
 
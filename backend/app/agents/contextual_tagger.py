@@ -166,7 +166,7 @@ class ContextualTaggerAgent(BaseAgent):
         try:
             result = await self.llm_service.generate_json(
                 prompt=prompt,
-                temperature=0.2  # Low temperature for consistent results
+                temperature=settings.agents.tagging_temperature
             )
             
             if not isinstance(result, dict):
@@ -198,7 +198,7 @@ class ContextualTaggerAgent(BaseAgent):
         try:
             result = await self.llm_service.generate_json(
                 prompt=prompt,
-                temperature=0.1  # Lower temperature for more deterministic results
+                temperature=settings.agents.sector_tagging_temperature
             )
             
             if not isinstance(result, dict):
@@ -230,7 +230,7 @@ class ContextualTaggerAgent(BaseAgent):
         try:
             result = await self.llm_service.generate_json(
                 prompt=prompt,
-                temperature=0.2
+                temperature=settings.agents.tagging_temperature
             )
             
             if not isinstance(result, dict):
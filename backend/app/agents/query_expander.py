@@ -137,7 +137,7 @@ class QueryExpanderAgent(BaseAgent):
             
             analysis = await self.llm_service.generate_json(
                 prompt=prompt,
-                temperature=0.1  # Low temperature for consistent results
+                temperature=settings.agents.query_analysis_temperature
             )
             
             if not isinstance(analysis, dict):
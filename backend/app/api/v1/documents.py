@@ -14,6 +14,7 @@ from app.models.document import (
 )
 from app.services.document_service import DocumentService, get_document_service
 from app.services.enrichment_service import EnrichmentService, get_enrichment_service
+from app.services.retrievers.bm25_retriever import notify_document_deleted
 from app.api.deps import get_current_user
 from app.models.user import User
 from app.core.settings import get_settings
@@ -206,6 +207,9 @@ async def delete_document(
     if not deleted:
         raise HTTPException(status_code=500, detail="Failed to delete document")
     
+    # Drop the document's chunks from the in-memory keyword indexes
+    await notify_document_deleted(document_id)
+    
     return {"status": "success", "message": f"Document {document_id} deleted"}
 
 
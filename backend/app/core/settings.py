@@ -55,6 +55,10 @@ class LLMSettings(BaseModel):
     temperature: float = 0.0
     max_tokens: int = 2048
     timeout: int = 30
+    cache_enabled: bool = True  # Cache deterministic (temperature 0) completions
+    cache_max_entries: int = 5000
+    cache_ttl: int = 86400  # 1 day
+    cache_use_redis: bool = False  # Share cached completions across workers
 
 
 class EmbeddingsSettings(BaseModel):
@@ -77,6 +81,10 @@ class AgentSettings(BaseModel):
     timeout_seconds: int = 30
     retry_attempts: int = 3
     concurrency: int = 2
+    # Sampling temperatures of agent LLM calls; 0 makes them cacheable by the completion cache
+    query_analysis_temperature: float = 0.1
+    tagging_temperature: float = 0.2
+    sector_tagging_temperature: float = 0.1
 
 
 class EnrichmentSettings(BaseModel):
@@ -100,6 +108,12 @@ class RetrievalSettings(BaseModel):
     reranking_enabled: bool = False
     similarity_threshold: float = 0.7
     include_metadata: bool = True
+    bm25_snapshot_path: Optional[str] = "data/bm25_index.npz"  # None disables the snapshot
+    cache_max_entries: int = 10000
+    cache_max_memory_mb: int = 64
+    cache_ttl: int = 3600
+    cache_use_redis: bool = False  # Share cached results across workers
+    cache_semantic_threshold: Optional[float] = None  # None disables near-duplicate lookup
 
 
 class MemorySettings(BaseModel):
@@ -187,6 +201,10 @@ def load_config_from_env() -> Dict[str, Any]:
         "LLM__TEMPERATURE": ("llm", "temperature", float),
         "LLM__MAX_TOKENS": ("llm", "max_tokens", int),
         "LLM__TIMEOUT": ("llm", "timeout", int),
+        "LLM__CACHE_ENABLED": ("llm", "cache_enabled", lambda x: x.lower() == "true"),
+        "LLM__CACHE_MAX_ENTRIES": ("llm", "cache_max_entries", int),
+        "LLM__CACHE_TTL": ("llm", "cache_ttl", int),
+        "LLM__CACHE_USE_REDIS": ("llm", "cache_use_redis", lambda x: x.lower() == "true"),
         
         "EMBEDDINGS__EMBEDDING_MODEL": ("embeddings", "embedding_model"),
         "EMBEDDINGS__EMBEDDING_DIMENSION": ("embeddings", "embedding_dimension", int),
@@ -198,6 +216,9 @@ def load_config_from_env() -> Dict[str, Any]:
         "AGENTS__TIMEOUT_SECONDS": ("agents", "timeout_seconds", int),
         "AGENTS__RETRY_ATTEMPTS": ("agents", "retry_attempts", int),
         "AGENTS__CONCURRENCY": ("agents", "concurrency", int),
+        "AGENTS__QUERY_ANALYSIS_TEMPERATURE": ("agents", "query_analysis_temperature", float),
+        "AGENTS__TAGGING_TEMPERATURE": ("agents", "tagging_temperature", float),
+        "AGENTS__SECTOR_TAGGING_TEMPERATURE": ("agents", "sector_tagging_temperature", float),
         
         "ENRICHMENT__ENABLED": ("enrichment", "enrichment_enabled", lambda x: x.lower() == "true"),
         "ENRICHMENT__SYNTHETIC_QA__ENABLED": ("enrichment", "synthetic_qa_enabled", lambda x: x.lower() == "true"),
@@ -215,6 +236,12 @@ def load_config_from_env() -> Dict[str, Any]:
         "RETRIEVAL__RERANKING_ENABLED": ("retrieval", "reranking_enabled", lambda x: x.lower() == "true"),
         "RETRIEVAL__SIMILARITY_THRESHOLD": ("retrieval", "similarity_threshold", float),
         "RETRIEVAL__INCLUDE_METADATA": ("retrieval", "include_metadata", lambda x: x.lower() == "true"),
+        "RETRIEVAL__BM25_SNAPSHOT_PATH": ("retrieval", "bm25_snapshot_path"),
+        "RETRIEVAL__CACHE_MAX_ENTRIES": ("retrieval", "cache_max_entries", int),
+        "RETRIEVAL__CACHE_MAX_MEMORY_MB": ("retrieval", "cache_max_memory_mb", int),
+        "RETRIEVAL__CACHE_TTL": ("retrieval", "cache_ttl", int),
+        "RETRIEVAL__CACHE_USE_REDIS": ("retrieval", "cache_use_redis", lambda x: x.lower() == "true"),
+        "RETRIEVAL__CACHE_SEMANTIC_THRESHOLD": ("retrieval", "cache_semantic_threshold", float),
         
         "MEMORY__ENABLED": ("memory", "memory_enabled", lambda x: x.lower() == "true"),
         "MEMORY__MAX_HISTORY_ITEMS": ("memory", "memory_max_history_items", int),
@@ -240,5 +240,12 @@ async def process_document(
         # Update document status
         document.is_processed = True
         db.commit()
+    
+    # Make the new chunks searchable by keyword without a full index rebuild
+    try:
+        from app.services.retrievers.bm25_retriever import notify_document_processed
+        await notify_document_processed(document_id)
+    except Exception as e:
+        logger.warning(f"Failed to update BM25 index for document {document_id}: {str(e)}")
         
     return result
\ No newline at end of file
@@ -0,0 +1,316 @@
+from typing import Dict, Any, List, Optional, Tuple
+from collections import OrderedDict
+import hashlib
+import json
+import logging
+import threading
+import time
+import unicodedata
+
+logger = logging.getLogger(__name__)
+
+# Prefix digest of requests without system messages
+EMPTY_PREFIX = "-"
+
+
+class CompletionCache:
+    """
+    Cache for deterministic LLM completions.
+
+    Entries live in an in-process LRU tier with a TTL. When a Redis client
+    is given, entries are also written to Redis so that all workers share
+    them, and local misses are filled from Redis.
+
+    Keys have the form `model:prefix:digest`. The prefix is a digest of
+    the leading system messages (the instruction template), so
+    `invalidate_prefix` can drop every completion produced with a template
+    after it changes. The digest covers all normalized messages and the
+    sampling parameters.
+
+    Only temperature 0 requests are cacheable; callers check
+    `is_cacheable` and record bypasses for the hit-rate metrics.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 5000,
+        ttl: int = 86400,
+        redis_client: Optional[Any] = None,
+        namespace: str = "llm_cache",
+        enabled: bool = True
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of in-process entries
+            ttl: Entry lifetime in seconds (0 for no expiry)
+            redis_client: Optional redis.asyncio client for the shared tier
+            namespace: Prefix of Redis keys
+            enabled: When False nothing is stored or returned
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.redis = redis_client
+        self.namespace = namespace
+        self.enabled = enabled
+
+        # {key: (serialized value, expiry time)}
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Counters for monitoring
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.evictions = 0
+        self.saved_tokens = 0
+
+    @staticmethod
+    def normalize_content(content: str) -> str:
+        """
+        Canonical form of a message for cache keys.
+
+        Text is NFC-normalized, runs of whitespace within a line are
+        collapsed and surrounding whitespace is stripped. Case is kept
+        since it can change the model output.
+
+        Args:
+            content: Message content
+
+        Returns:
+            Normalized content
+        """
+        text = unicodedata.normalize("NFC", content or "").strip()
+        return "\n".join(" ".join(line.split()) for line in text.splitlines())
+
+    @classmethod
+    def make_key(cls, model: str, messages: List[Dict[str, str]], params: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Build a cache key from model, messages and parameters.
+
+        Args:
+            model: Model name
+            messages: Chat messages with 'role' and 'content'
+            params: Parameters affecting the completion (max_tokens, stop, ...)
+
+        Returns:
+            Cache key
+        """
+        normalized = [
+            [message.get("role", ""), cls.normalize_content(message.get("content", ""))]
+            for message in messages
+        ]
+
+        system = [content for role, content in normalized if role == "system"]
+        payload = json.dumps(
+            {"messages": normalized, "params": params or {}},
+            sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str
+        )
+        digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+        return f"{model}:{cls._prefix_digest(system)}:{digest}"
+
+    @staticmethod
+    def is_cacheable(temperature: Optional[float]) -> bool:
+        """
+        Whether a completion with this temperature may be cached.
+
+        Args:
+            temperature: Sampling temperature
+
+        Returns:
+            True for deterministic (temperature 0) requests
+        """
+        return temperature is not None and temperature <= 0
+
+    def record_bypass(self) -> None:
+        """Count a request that skipped the cache (non-zero temperature)."""
+        with self._lock:
+            self.bypassed += 1
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached completion.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached completion or None
+        """
+        if not self.enabled:
+            return None
+
+        data = self._get_local(key)
+        if data is None and self.redis is not None:
+            try:
+                data = await self.redis.get(self._redis_key(key))
+            except Exception as e:
+                logger.warning(f"Completion cache Redis read failed: {str(e)}")
+                data = None
+
+            if data is not None:
+                data = data.decode("utf-8") if isinstance(data, bytes) else data
+                self._set_local(key, data)
+                with self._lock:
+                    self.redis_hits += 1
+
+        with self._lock:
+            if data is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        # Every hit returns a fresh copy that callers may modify
+        value = json.loads(data)
+        with self._lock:
+            self.saved_tokens += (value.get("total_tokens") or 0) if isinstance(value, dict) else 0
+        return value
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        """
+        Store a completion.
+
+        Args:
+            key: Cache key
+            value: JSON-serializable completion
+        """
+        if not self.enabled:
+            return
+
+        data = json.dumps(value, ensure_ascii=False, default=str)
+        self._set_local(key, data)
+
+        if self.redis is not None:
+            try:
+                await self.redis.set(self._redis_key(key), data, ex=self.ttl or None)
+            except Exception as e:
+                logger.warning(f"Completion cache Redis write failed: {str(e)}")
+
+    async def invalidate_prefix(self, model: str, system_messages: Optional[List[str]] = None) -> int:
+        """
+        Drop completions produced by a model with the given system messages.
+
+        Args:
+            model: Model name
+            system_messages: System message contents (None for requests without one)
+
+        Returns:
+            Number of in-process entries removed
+        """
+        prefix = f"{model}:{self._prefix_digest([self.normalize_content(m) for m in system_messages or []])}:"
+
+        with self._lock:
+            keys = [key for key in self._entries if key.startswith(prefix)]
+            for key in keys:
+                del self._entries[key]
+
+        if self.redis is not None:
+            try:
+                redis_keys = [key async for key in self.redis.scan_iter(match=f"{self._redis_key(prefix)}*")]
+                if redis_keys:
+                    await self.redis.delete(*redis_keys)
+            except Exception as e:
+                logger.warning(f"Completion cache Redis invalidation failed: {str(e)}")
+
+        return len(keys)
+
+    def clear(self) -> None:
+        """Clear the in-process tier."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Size, hit/miss counters and tokens saved by hits
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "redis_hits": self.redis_hits,
+                "misses": self.misses,
+                "bypassed": self.bypassed,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "saved_tokens": self.saved_tokens,
+                "shared": self.redis is not None
+            }
+
+    @staticmethod
+    def _prefix_digest(system_messages: List[str]) -> str:
+        if not system_messages:
+            return EMPTY_PREFIX
+        payload = json.dumps(system_messages, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def _get_local(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            data, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return data
+
+    def _set_local(self, key: str, data: str) -> None:
+        if self.max_entries <= 0:
+            return
+
+        expires_at = time.monotonic() + self.ttl if self.ttl > 0 else float("inf")
+        with self._lock:
+            self._entries[key] = (data, expires_at)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+
+# Singleton instance
+_completion_cache = None
+
+def get_completion_cache() -> CompletionCache:
+    """Get the shared completion cache configured from settings."""
+    global _completion_cache
+    if _completion_cache is None:
+        from app.core.settings import get_settings
+        settings = get_settings()
+        llm = settings.llm
+
+        redis_client = None
+        if llm.cache_enabled and llm.cache_use_redis:
+            try:
+                import redis.asyncio as redis
+                redis_client = redis.Redis(
+                    host=settings.redis.redis_host,
+                    port=settings.redis.redis_port,
+                    password=settings.redis.redis_password,
+                    db=settings.redis.redis_db
+                )
+            except Exception as e:
+                logger.error(f"Failed to initialize Redis for completion cache: {str(e)}")
+
+        _completion_cache = CompletionCache(
+            max_entries=llm.cache_max_entries,
+            ttl=llm.cache_ttl,
+            redis_client=redis_client,
+            enabled=llm.cache_enabled
+        )
+    return _completion_cache
@@ -16,6 +16,7 @@ from tenacity import (
 from pydantic import BaseModel, Field, validator
 
 from app.core.settings import get_settings
+from app.services.completion_cache import CompletionCache, get_completion_cache
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
@@ -74,6 +75,7 @@ class LLMCallMetrics(BaseModel):
     tokens: TokenCount = Field(default_factory=TokenCount)
     duration_ms: float = 0.0
     errors: int = 0
+    cache_hits: int = 0
     last_called: Optional[float] = None
     
     def record_call(self, 
@@ -97,6 +99,11 @@ class LLMCallMetrics(BaseModel):
         """Record an error in LLM call."""
         self.errors += 1
         self.last_called = time.time()
+    
+    def record_cache_hit(self):
+        """Record a call answered from the completion cache."""
+        self.cache_hits += 1
+        self.last_called = time.time()
 
 
 class LLMService:
@@ -127,6 +134,9 @@ class LLMService:
         
         # Metrics
         self.metrics = LLMCallMetrics()
+        
+        # Cache for deterministic completions
+        self.cache = get_completion_cache()
     
     def _initialize_client(self):
         """Initialize the appropriate client based on the provider."""
@@ -401,12 +411,56 @@ class LLMService:
             logger.error(f"Error in local LLM call: {str(e)}")
             raise
     
+    async def _complete(self, request: CompletionRequest, use_cache: bool = True) -> CompletionResponse:
+        """
+        Run a completion request, serving deterministic requests from the cache.
+        
+        Args:
+            request: Completion request
+            use_cache: Whether a temperature 0 request may use the cache
+            
+        Returns:
+            Completion response
+        """
+        cache_key = None
+        if use_cache and self.cache.enabled and not request.stream:
+            if CompletionCache.is_cacheable(request.temperature):
+                cache_key = CompletionCache.make_key(
+                    f"{self.provider.value}:{request.model}",
+                    [{"role": m.role, "content": m.content} for m in request.messages],
+                    request.dict(exclude={"model", "messages", "stream", "temperature"})
+                )
+                cached = await self.cache.get(cache_key)
+                if cached is not None:
+                    self.metrics.record_cache_hit()
+                    return CompletionResponse(**cached)
+            else:
+                self.cache.record_bypass()
+        
+        # Generate based on provider
+        if self.provider == LLMProvider.OPENAI:
+            response = await self._generate_openai(request)
+        elif self.provider == LLMProvider.MISTRAL:
+            response = await self._generate_mistral(request)
+        elif self.provider == LLMProvider.ANTHROPIC:
+            response = await self._generate_anthropic(request)
+        elif self.provider == LLMProvider.LOCAL:
+            response = await self._generate_local(request)
+        else:
+            raise ValueError(f"Unsupported LLM provider: {self.provider}")
+        
+        if cache_key is not None:
+            await self.cache.set(cache_key, response.dict(exclude={"raw_response"}))
+        
+        return response
+    
     async def generate(self, 
                       prompt: str, 
                       model: Optional[str] = None,
                       system_prompt: Optional[str] = None,
                       temperature: float = 0.0,
-                      max_tokens: Optional[int] = None) -> str:
+                      max_tokens: Optional[int] = None,
+                      use_cache: bool = True) -> str:
         """
         Generate text from a prompt using the configured LLM.
         
@@ -416,6 +470,7 @@ class LLMService:
             system_prompt: Optional system prompt
             temperature: Temperature for generation
             max_tokens: Maximum tokens to generate
+            use_cache: Serve temperature 0 requests from the completion cache
             
         Returns:
             Generated text
@@ -437,25 +492,15 @@ class LLMService:
             max_tokens=max_tokens,
         )
         
-        # Generate based on provider
-        if self.provider == LLMProvider.OPENAI:
-            response = await self._generate_openai(request)
-        elif self.provider == LLMProvider.MISTRAL:
-            response = await self._generate_mistral(request)
-        elif self.provider == LLMProvider.ANTHROPIC:
-            response = await self._generate_anthropic(request)
-        elif self.provider == LLMProvider.LOCAL:
-            response = await self._generate_local(request)
-        else:
-            raise ValueError(f"Unsupported LLM provider: {self.provider}")
-        
+        response = await self._complete(request, use_cache)
         return response.text
     
     async def generate_with_history(self,
                                   messages: List[Dict[str, str]],
                                   model: Optional[str] = None,
                                   temperature: float = 0.0,
-                                  max_tokens: Optional[int] = None) -> str:
+                                  max_tokens: Optional[int] = None,
+                                  use_cache: bool = True) -> str:
         """
         Generate text with a chat history.
         
@@ -464,6 +509,7 @@ class LLMService:
             model: Optional model override
             temperature: Temperature for generation
             max_tokens: Maximum tokens to generate
+            use_cache: Serve temperature 0 requests from the completion cache
             
         Returns:
             Generated text
@@ -482,18 +528,7 @@ class LLMService:
             max_tokens=max_tokens,
         )
         
-        # Generate based on provider
-        if self.provider == LLMProvider.OPENAI:
-            response = await self._generate_openai(request)
-        elif self.provider == LLMProvider.MISTRAL:
-            response = await self._generate_mistral(request)
-        elif self.provider == LLMProvider.ANTHROPIC:
-            response = await self._generate_anthropic(request)
-        elif self.provider == LLMProvider.LOCAL:
-            response = await self._generate_local(request)
-        else:
-            raise ValueError(f"Unsupported LLM provider: {self.provider}")
-        
+        response = await self._complete(request, use_cache)
         return response.text
     
     async def generate_json(self,
@@ -501,7 +536,8 @@ class LLMService:
                            model: Optional[str] = None,
                            system_prompt: Optional[str] = "You are a helpful assistant that always responds in valid JSON format.",
                            temperature: float = 0.0,
-                           max_tokens: Optional[int] = None) -> Dict[str, Any]:
+                           max_tokens: Optional[int] = None,
+                           use_cache: bool = True) -> Dict[str, Any]:
         """
         Generate JSON response from a prompt.
         
@@ -511,6 +547,7 @@ class LLMService:
             system_prompt: Optional system prompt
             temperature: Temperature for generation
             max_tokens: Maximum tokens to generate
+            use_cache: Serve temperature 0 requests from the completion cache
             
         Returns:
             Generated JSON as dict
@@ -524,7 +561,8 @@ class LLMService:
             model=model,
             system_prompt=system_prompt,
             temperature=temperature,
-            max_tokens=max_tokens
+            max_tokens=max_tokens,
+            use_cache=use_cache
         )
         
         # Extract JSON from response if needed
@@ -548,6 +586,10 @@ class LLMService:
     def get_metrics(self) -> LLMCallMetrics:
         """Get current metrics for LLM calls."""
         return self.metrics
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get completion cache statistics."""
+        return self.cache.stats()
 
 
 # Create a singleton instance
@@ -0,0 +1,560 @@
+from typing import Dict, Any, List, Optional, Set
+from collections import OrderedDict
+from dataclasses import dataclass
+import asyncio
+import hashlib
+import json
+import logging
+import pickle
+import threading
+import time
+import unicodedata
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Collection name used when callers do not scope results to a collection
+DEFAULT_COLLECTION = "default"
+
+# Fixed per-entry overhead added to the serialized size (key, entry object, dict slot)
+ENTRY_OVERHEAD_BYTES = 256
+
+
+@dataclass
+class _CacheEntry:
+    """A serialized cached value."""
+    data: bytes
+    expires_at: float
+    collection: str
+    signature: str
+    size: int
+
+
+class _SemanticBucket:
+    """
+    Unit-normalized query embeddings of cached entries that share a signature.
+
+    Rows of freed entries are reused; when the bucket is full new entries are
+    only reachable through their exact key.
+    """
+
+    def __init__(self, dimension: int, capacity: int):
+        self.matrix = np.zeros((capacity, dimension), dtype=np.float32)
+        self.keys: List[Optional[str]] = [None] * capacity
+        self.rows: Dict[str, int] = {}
+        self.free = list(range(capacity - 1, -1, -1))
+
+    def add(self, key: str, embedding: np.ndarray) -> bool:
+        if key in self.rows or not self.free:
+            return False
+        row = self.free.pop()
+        self.matrix[row] = embedding
+        self.keys[row] = key
+        self.rows[key] = row
+        return True
+
+    def remove(self, key: str) -> None:
+        row = self.rows.pop(key, None)
+        if row is not None:
+            self.matrix[row] = 0.0
+            self.keys[row] = None
+            self.free.append(row)
+
+    def nearest(self, embedding: np.ndarray) -> Optional[tuple]:
+        if not self.rows:
+            return None
+        similarities = self.matrix @ embedding
+        row = int(np.argmax(similarities))
+        if self.keys[row] is None:
+            return None
+        return self.keys[row], float(similarities[row])
+
+
+class RetrievalCache:
+    """
+    Shared cache for retrieval results.
+
+    Entries live in an in-process LRU tier bounded by entry count and by
+    serialized size. Every entry has a TTL. When a Redis client is given,
+    entries are also written to Redis so that all workers share them.
+
+    Keys are canonical: query text is Unicode-normalized, case-folded and
+    whitespace-collapsed, and parameters such as filters are serialized
+    with sorted keys. Each key also includes the version of the collection
+    it was computed from. Writing to a collection bumps that version, which
+    invalidates every cached result for it without scanning Redis. Callers
+    read the version with `version` before computing a result and pass it
+    to `get` and `set`, so a result computed while the collection was
+    written is dropped instead of being stored under the new version.
+
+    If a query embedding is passed and `semantic_threshold` is set, a miss
+    on the exact key falls back to the most similar cached query with the
+    same scope, parameters and collection version. The result is reused if
+    the cosine similarity reaches the threshold. Semantic lookup uses the
+    in-process tier only.
+
+    Values are stored pickled, so every hit returns a fresh copy that
+    callers may modify.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        max_memory_bytes: int = 64 * 1024 * 1024,
+        ttl: int = 3600,
+        redis_client: Optional[Any] = None,
+        namespace: str = "retrieval",
+        semantic_threshold: Optional[float] = None,
+        semantic_max_candidates: int = 1024,
+        version_refresh_interval: float = 1.0
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of in-process entries
+            max_memory_bytes: Maximum serialized size of in-process entries
+            ttl: Default entry lifetime in seconds
+            redis_client: Optional redis.asyncio client for the shared tier
+            namespace: Prefix of Redis keys
+            semantic_threshold: Cosine similarity for reusing near-duplicate queries (None disables)
+            semantic_max_candidates: Maximum embeddings kept per scope/parameter signature
+            version_refresh_interval: Seconds a collection version read from Redis is trusted
+        """
+        self.max_entries = max(1, max_entries)
+        self.max_memory_bytes = max(1, max_memory_bytes)
+        self.ttl = ttl
+        self.redis = redis_client
+        self.namespace = namespace
+        self.semantic_threshold = semantic_threshold
+        self.semantic_max_candidates = max(1, semantic_max_candidates)
+        self.version_refresh_interval = version_refresh_interval
+
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._collection_keys: Dict[str, Set[str]] = {}
+        self._semantic: Dict[str, _SemanticBucket] = {}
+        self._versions: Dict[str, int] = {}
+        self._version_checked: Dict[str, float] = {}
+        self._lock = threading.RLock()
+        self.memory_bytes = 0
+
+        # Counters for monitoring
+        self.hits = 0
+        self.semantic_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.stale_writes = 0
+
+    @property
+    def semantic_enabled(self) -> bool:
+        """Whether near-duplicate lookup is enabled."""
+        return self.semantic_threshold is not None
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """
+        Canonical form of a query for cache keys.
+
+        Args:
+            query: Query text
+
+        Returns:
+            Normalized query text
+        """
+        return " ".join(unicodedata.normalize("NFKC", query).casefold().split())
+
+    @staticmethod
+    def canonicalize(params: Optional[Dict[str, Any]]) -> str:
+        """
+        Canonical serialization of request parameters (filters, k, ...).
+
+        Args:
+            params: Parameters affecting the result
+
+        Returns:
+            JSON string with sorted keys
+        """
+        return json.dumps(params or {}, sort_keys=True, separators=(",", ":"), default=str)
+
+    async def get(
+        self,
+        scope: str,
+        query: str,
+        params: Optional[Dict[str, Any]] = None,
+        collection: str = DEFAULT_COLLECTION,
+        embedding: Optional[np.ndarray] = None,
+        version: Optional[int] = None
+    ) -> Optional[Any]:
+        """
+        Look up a cached result.
+
+        Args:
+            scope: Name of the component that produced the result
+            query: Query text
+            params: Parameters affecting the result
+            collection: Collection the result was computed from
+            embedding: Query embedding for near-duplicate lookup
+            version: Collection version from `version` (defaults to the current one)
+
+        Returns:
+            Copy of the cached value, or None on a miss
+        """
+        if version is None:
+            version = await self._collection_version(collection)
+        signature = self._signature(scope, params, collection, version)
+        key = self._key(signature, query)
+
+        data = self._get_local(key)
+        if data is not None:
+            self.hits += 1
+            return pickle.loads(data)
+
+        if self.redis is not None:
+            try:
+                data = await self.redis.get(self._redis_key(key))
+            except Exception as e:
+                logger.warning(f"Retrieval cache Redis read failed: {str(e)}")
+                data = None
+
+            if data is not None:
+                self.hits += 1
+                self.redis_hits += 1
+                ttl = await self._redis_ttl(key)
+                self._set_local(key, data, ttl, collection, signature, embedding, version)
+                return pickle.loads(data)
+
+        if embedding is not None and self.semantic_enabled:
+            data = self._get_similar(signature, embedding)
+            if data is not None:
+                self.hits += 1
+                self.semantic_hits += 1
+                return pickle.loads(data)
+
+        self.misses += 1
+        return None
+
+    async def set(
+        self,
+        scope: str,
+        query: str,
+        value: Any,
+        params: Optional[Dict[str, Any]] = None,
+        collection: str = DEFAULT_COLLECTION,
+        embedding: Optional[np.ndarray] = None,
+        ttl: Optional[int] = None,
+        version: Optional[int] = None
+    ) -> None:
+        """
+        Cache a result.
+
+        Args:
+            scope: Name of the component that produced the result
+            query: Query text
+            value: Result to cache (must be picklable)
+            params: Parameters affecting the result
+            collection: Collection the result was computed from
+            embedding: Query embedding for near-duplicate lookup
+            ttl: Lifetime in seconds (defaults to the cache TTL)
+            version: Collection version read before the result was computed;
+                the result is dropped if the collection was written since
+        """
+        ttl = ttl if ttl is not None else self.ttl
+        current = await self._collection_version(collection)
+        if version is None:
+            version = current
+        elif version != current:
+            self.stale_writes += 1
+            return
+        signature = self._signature(scope, params, collection, version)
+        key = self._key(signature, query)
+
+        try:
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.warning(f"Retrieval cache could not serialize result: {str(e)}")
+            return
+
+        if not self._set_local(key, data, ttl, collection, signature, embedding, version):
+            self.stale_writes += 1
+            return
+
+        if self.redis is not None:
+            try:
+                await self.redis.set(self._redis_key(key), data, ex=max(1, int(ttl)))
+            except Exception as e:
+                logger.warning(f"Retrieval cache Redis write failed: {str(e)}")
+
+    async def version(self, collection: str = DEFAULT_COLLECTION) -> int:
+        """
+        Current version of a collection.
+
+        Read it before computing a result and pass it to `get` and `set`.
+
+        Args:
+            collection: Collection name
+
+        Returns:
+            Collection version
+        """
+        return await self._collection_version(collection)
+
+    def invalidate(self, collection: str = DEFAULT_COLLECTION) -> int:
+        """
+        Invalidate all cached results of a collection after a write.
+
+        The in-process entries are dropped immediately. With Redis, the shared
+        collection version is incremented in the background so other workers
+        stop using their entries within `version_refresh_interval`.
+
+        Args:
+            collection: Written collection
+
+        Returns:
+            Number of dropped in-process entries
+        """
+        with self._lock:
+            self._versions[collection] = self._versions.get(collection, 0) + 1
+            keys = self._collection_keys.pop(collection, set())
+            for key in keys:
+                self._remove(key)
+            self.invalidations += 1
+
+        if self.redis is not None:
+            try:
+                asyncio.get_running_loop().create_task(self._bump_redis_version(collection))
+            except RuntimeError:
+                # No event loop (synchronous caller): other workers keep their
+                # entries until the next async invalidation or their TTL
+                logger.debug("Retrieval cache invalidation not propagated to Redis: no event loop")
+
+        return len(keys)
+
+    def clear(self) -> None:
+        """Drop all in-process entries."""
+        with self._lock:
+            self._entries.clear()
+            self._collection_keys.clear()
+            self._semantic.clear()
+            self.memory_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary of counters and sizes
+        """
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "memory_bytes": self.memory_bytes,
+            "max_entries": self.max_entries,
+            "max_memory_bytes": self.max_memory_bytes,
+            "hits": self.hits,
+            "semantic_hits": self.semantic_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "stale_writes": self.stale_writes,
+            "redis_enabled": self.redis is not None,
+            "semantic_enabled": self.semantic_enabled
+        }
+
+    def _signature(self, scope: str, params: Optional[Dict[str, Any]], collection: str, version: int) -> str:
+        """Hash of everything but the query text."""
+        raw = f"{scope}|{collection}|{version}|{self.canonicalize(params)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+    def _key(self, signature: str, query: str) -> str:
+        raw = f"{signature}|{self.normalize_query(query)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self.namespace}:result:{key}"
+
+    def _redis_version_key(self, collection: str) -> str:
+        return f"{self.namespace}:version:{collection}"
+
+    async def _collection_version(self, collection: str) -> int:
+        """Current collection version, refreshed from Redis at most once per interval."""
+        version = self._versions.get(collection, 0)
+        if self.redis is None:
+            return version
+
+        now = time.monotonic()
+        if now - self._version_checked.get(collection, 0.0) < self.version_refresh_interval:
+            return version
+
+        try:
+            remote = await self.redis.get(self._redis_version_key(collection))
+        except Exception as e:
+            logger.warning(f"Retrieval cache version read failed: {str(e)}")
+            return version
+
+        self._version_checked[collection] = now
+        remote = int(remote) if remote is not None else 0
+        if remote > version:
+            # Another worker wrote to the collection: local entries are stale
+            with self._lock:
+                self._versions[collection] = remote
+                for key in self._collection_keys.pop(collection, set()):
+                    self._remove(key)
+            version = remote
+
+        return version
+
+    async def _bump_redis_version(self, collection: str) -> None:
+        try:
+            remote = await self.redis.incr(self._redis_version_key(collection))
+        except Exception as e:
+            logger.warning(f"Retrieval cache version update failed: {str(e)}")
+            return
+
+        with self._lock:
+            if int(remote) > self._versions.get(collection, 0):
+                self._versions[collection] = int(remote)
+
+    async def _redis_ttl(self, key: str) -> int:
+        """Remaining Redis TTL of an entry (the default TTL if unknown)."""
+        try:
+            remaining = await self.redis.ttl(self._redis_key(key))
+        except Exception:
+            return self.ttl
+        return remaining if remaining and remaining > 0 else self.ttl
+
+    def _get_local(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            if entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                return None
+
+            self._entries.move_to_end(key)
+            return entry.data
+
+    def _get_similar(self, signature: str, embedding: np.ndarray) -> Optional[bytes]:
+        query = self._unit_vector(embedding)
+        if query is None:
+            return None
+
+        with self._lock:
+            bucket = self._semantic.get(signature)
+            if bucket is None or bucket.matrix.shape[1] != len(query):
+                return None
+
+            nearest = bucket.nearest(query)
+            if nearest is None or nearest[1] < self.semantic_threshold:
+                return None
+
+            return self._get_local(nearest[0])
+
+    def _set_local(
+        self,
+        key: str,
+        data: bytes,
+        ttl: float,
+        collection: str,
+        signature: str,
+        embedding: Optional[np.ndarray],
+        version: int
+    ) -> bool:
+        """Store an in-process entry; False if the collection version has moved on."""
+        size = len(data) + ENTRY_OVERHEAD_BYTES
+        if size > self.max_memory_bytes:
+            return True
+
+        with self._lock:
+            if self._versions.get(collection, 0) != version:
+                return False
+
+            self._remove(key)
+
+            self._entries[key] = _CacheEntry(data, time.monotonic() + ttl, collection, signature, size)
+            self._collection_keys.setdefault(collection, set()).add(key)
+            self.memory_bytes += size
+
+            if embedding is not None and self.semantic_enabled:
+                query = self._unit_vector(embedding)
+                if query is not None:
+                    bucket = self._semantic.get(signature)
+                    if bucket is None:
+                        bucket = self._semantic[signature] = _SemanticBucket(len(query), self.semantic_max_candidates)
+                    if bucket.matrix.shape[1] == len(query):
+                        bucket.add(key, query)
+
+            # Evict least recently used entries until both limits hold
+            while len(self._entries) > self.max_entries or self.memory_bytes > self.max_memory_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+        return True
+
+    def _remove(self, key: str) -> None:
+        """Remove an in-process entry (caller holds the lock)."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+
+        self.memory_bytes -= entry.size
+        keys = self._collection_keys.get(entry.collection)
+        if keys is not None:
+            keys.discard(key)
+
+        bucket = self._semantic.get(entry.signature)
+        if bucket is not None:
+            bucket.remove(key)
+            if not bucket.rows:
+                del self._semantic[entry.signature]
+
+    @staticmethod
+    def _unit_vector(embedding: np.ndarray) -> Optional[np.ndarray]:
+        vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        norm = float(np.linalg.norm(vector))
+        if norm == 0.0:
+            return None
+        return vector / norm
+
+
+# Singleton instance
+_retrieval_cache = None
+
+def get_retrieval_cache() -> RetrievalCache:
+    """Get the shared retrieval cache configured from settings."""
+    global _retrieval_cache
+    if _retrieval_cache is None:
+        from app.core.settings import get_settings
+        settings = get_settings()
+        retrieval = settings.retrieval
+
+        redis_client = None
+        if retrieval.cache_use_redis:
+            try:
+                import redis.asyncio as redis
+                redis_client = redis.Redis(
+                    host=settings.redis.redis_host,
+                    port=settings.redis.redis_port,
+                    password=settings.redis.redis_password,
+                    db=settings.redis.redis_db
+                )
+            except Exception as e:
+                logger.error(f"Failed to initialize Redis for retrieval cache: {str(e)}")
+
+        _retrieval_cache = RetrievalCache(
+            max_entries=retrieval.cache_max_entries,
+            max_memory_bytes=retrieval.cache_max_memory_mb * 1024 * 1024,
+            ttl=retrieval.cache_ttl,
+            redis_client=redis_client,
+            semantic_threshold=retrieval.cache_semantic_threshold
+        )
+    return _retrieval_cache
@@ -6,6 +6,7 @@ import asyncio
 from app.core.settings import get_settings
 from app.services.retrievers.base import SearchResult
 from app.services.retrievers.hybrid_retriever import HybridRetriever
+from app.services.retrieval_cache import get_retrieval_cache
 from app.services.rerankers.cross_encoder_reranker import CrossEncoderReranker
 from app.agents.query_expander import QueryExpanderAgent
 from app.agents.orchestrator import get_orchestrator
@@ -63,8 +64,9 @@ class RetrievalPipeline:
         self.reranker = CrossEncoderReranker() if use_reranking else None
         self.orchestrator = get_orchestrator() if use_query_expansion else None
         
-        # Cache for query results
-        self.query_cache = {}  # {query_hash: (timestamp, results)}
+        # Shared result cache, invalidated per collection on vector store writes
+        self.cache = get_retrieval_cache()
+        self.cache_collection = get_settings().vector_store.collection_name
         
         logger.info(
             f"Initialized RetrievalPipeline with use_query_expansion={use_query_expansion}, "
@@ -109,9 +111,14 @@ class RetrievalPipeline:
         final_k = k if k is not None else self.final_k
         
         # Check cache first
+        cache_params = self._get_cache_params(final_k, filters, language)
+        query_embedding = None
+        cache_version = None
         if self.cache_results:
-            cache_key = self._get_cache_key(query, final_k, filters, language)
-            cached_results = self._get_from_cache(cache_key)
+            # Results computed below are only cached if the collection is not written meanwhile
+            cache_version = await self.cache.version(self.cache_collection)
+            query_embedding = await self._get_query_embedding(query)
+            cached_results = await self._get_from_cache(query, cache_params, query_embedding, cache_version)
             if cached_results:
                 logger.debug(f"Using cached results for query: {query}")
                 return cached_results
@@ -212,8 +219,7 @@ class RetrievalPipeline:
         
         # Cache results
         if self.cache_results:
-            cache_key = self._get_cache_key(query, final_k, filters, language)
-            self._add_to_cache(cache_key, final_results)
+            await self._add_to_cache(query, cache_params, final_results, query_embedding, cache_version)
         
         processing_time = time.time() - start_time
         logger.info(
@@ -222,67 +228,68 @@ class RetrievalPipeline:
         
         return final_results
     
-    def _get_cache_key(
+    def _get_cache_params(
         self,
-        query: str,
         k: int,
         filters: Optional[Dict[str, Any]],
         language: str
-    ) -> str:
-        """Create a cache key for a query."""
-        import hashlib
-        import json
-        
-        # Normalize query
-        normalized_query = query.lower().strip()
-        
-        # Create a string representation of filters
-        filters_str = ""
-        if filters:
-            filters_str = json.dumps(filters, sort_keys=True)
-        
-        # Create a hash of the key components
-        key_str = f"{normalized_query}|{k}|{filters_str}|{language}"
-        key_hash = hashlib.md5(key_str.encode()).hexdigest()
-        
-        return key_hash
+    ) -> Dict[str, Any]:
+        """Parameters that, together with the query, identify a cached result."""
+        return {
+            "k": k,
+            "filters": filters or {},
+            "language": language,
+            "query_expansion": self.use_query_expansion,
+            "reranking": self.use_reranking,
+            "alpha": self.hybrid_retriever_alpha,
+            "first_stage_k": self.first_stage_k
+        }
     
-    def _get_from_cache(self, cache_key: str) -> Optional[List[SearchResult]]:
-        """Get results from cache if available and not expired."""
-        if not self.cache_results:
+    async def _get_query_embedding(self, query: str) -> Optional[Any]:
+        """Embed the query for near-duplicate cache lookup (None if disabled)."""
+        if not self.cache.semantic_enabled:
             return None
         
-        cached_data = self.query_cache.get(cache_key)
-        if not cached_data:
+        try:
+            return await self.hybrid_retriever.vector_store._generate_embeddings(query)
+        except Exception as e:
+            logger.warning(f"Failed to embed query for cache lookup: {str(e)}")
             return None
-        
-        timestamp, results = cached_data
-        
-        # Check if expired
-        if time.time() - timestamp > self.cache_ttl:
-            # Remove from cache
-            del self.query_cache[cache_key]
+    
+    async def _get_from_cache(
+        self,
+        query: str,
+        cache_params: Dict[str, Any],
+        query_embedding: Optional[Any] = None,
+        cache_version: Optional[int] = None
+    ) -> Optional[List[SearchResult]]:
+        """Get results from the shared cache if available and not expired."""
+        if not self.cache_results:
             return None
         
-        return results
+        return await self.cache.get(
+            "pipeline", query, cache_params,
+            collection=self.cache_collection,
+            embedding=query_embedding,
+            version=cache_version
+        )
     
-    def _add_to_cache(self, cache_key: str, results: List[SearchResult]) -> None:
-        """Add results to cache."""
+    async def _add_to_cache(
+        self,
+        query: str,
+        cache_params: Dict[str, Any],
+        results: List[SearchResult],
+        query_embedding: Optional[Any] = None,
+        cache_version: Optional[int] = None
+    ) -> None:
+        """Add results to the shared cache unless the collection changed since `cache_version`."""
         if not self.cache_results:
             return
         
-        self.query_cache[cache_key] = (time.time(), results)
-        
-        # Clean up old cache entries
-        self._cleanup_cache()
-    
-    def _cleanup_cache(self) -> None:
-        """Remove expired cache entries."""
-        current_time = time.time()
-        expired_keys = [
-            key for key, (timestamp, _) in self.query_cache.items()
-            if current_time - timestamp > self.cache_ttl
-        ]
-        
-        for key in expired_keys:
-            del self.query_cache[key]
\ No newline at end of file
+        await self.cache.set(
+            "pipeline", query, results, cache_params,
+            collection=self.cache_collection,
+            embedding=query_embedding,
+            ttl=self.cache_ttl,
+            version=cache_version
+        )
@@ -0,0 +1,865 @@
+from typing import Dict, Any, List, Optional, Tuple, Iterable, Callable
+import logging
+import json
+import os
+import threading
+from collections import Counter
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the on-disk snapshot layout changes
+SNAPSHOT_VERSION = 1
+
+# Term frequencies are stored as uint16 and saturate at this value
+MAX_TERM_FREQUENCY = np.iinfo(np.uint16).max
+
+
+class CompactBM25Index:
+    """
+    Array-backed BM25 inverted index.
+
+    Chunk ids are mapped to dense integer doc ids. Postings are stored in CSR
+    layout: for term id ``t`` the slice ``offsets[t]:offsets[t + 1]`` of
+    ``posting_docs`` (sorted int32 doc ids) and ``posting_tfs`` (uint16 term
+    frequencies) holds its posting list. Per-document length norms and per-term
+    IDF are precomputed so a query is a handful of vectorized gathers followed
+    by a single scatter-add into a dense score array.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """
+        Initialize an empty index.
+
+        Args:
+            k1: Term frequency saturation parameter
+            b: Document length normalization parameter
+        """
+        self.k1 = k1
+        self.b = b
+
+        self.doc_ids: List[str] = []
+        self.doc_index: Dict[str, int] = {}
+        self.doc_lengths = np.zeros(0, dtype=np.int32)
+
+        self.vocabulary: Dict[str, int] = {}
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.posting_docs = np.zeros(0, dtype=np.int32)
+        self.posting_tfs = np.zeros(0, dtype=np.uint16)
+
+        self.norms = np.zeros(0, dtype=np.float32)
+        self.idf = np.zeros(0, dtype=np.float32)
+        self._terms: Optional[List[str]] = None
+
+    @property
+    def document_count(self) -> int:
+        """Number of indexed documents."""
+        return len(self.doc_ids)
+
+    @property
+    def term_count(self) -> int:
+        """Number of unique terms."""
+        return len(self.vocabulary)
+
+    @property
+    def avg_doc_length(self) -> float:
+        """Average document length in tokens."""
+        if not self.doc_ids:
+            return 0.0
+        return float(self.doc_lengths.mean())
+
+    def terms(self) -> List[str]:
+        """
+        Get the terms ordered by term id (cached; segments are immutable).
+
+        Returns:
+            List of terms
+        """
+        if self._terms is None or len(self._terms) != len(self.vocabulary):
+            terms = [None] * len(self.vocabulary)
+            for term, term_id in self.vocabulary.items():
+                terms[term_id] = term
+            self._terms = terms
+        return self._terms
+
+    def postings(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the posting list of a term.
+
+        Args:
+            term: The term
+
+        Returns:
+            Tuple of (sorted doc ids, term frequencies); empty if the term is unknown
+        """
+        term_id = self.vocabulary.get(term)
+        if term_id is None:
+            return self.posting_docs[:0], self.posting_tfs[:0]
+
+        start, end = self.offsets[term_id], self.offsets[term_id + 1]
+        return self.posting_docs[start:end], self.posting_tfs[start:end]
+
+    @classmethod
+    def build(
+        cls,
+        documents: Iterable[Tuple[str, List[str]]],
+        k1: float = 1.5,
+        b: float = 0.75
+    ) -> "CompactBM25Index":
+        """
+        Build an index from tokenized documents.
+
+        Args:
+            documents: Iterable of (chunk_id, tokens) pairs
+            k1: Term frequency saturation parameter
+            b: Document length normalization parameter
+
+        Returns:
+            The built index
+        """
+        index = cls(k1=k1, b=b)
+
+        vocabulary: Dict[str, int] = {}
+        doc_ids: List[str] = []
+        doc_lengths: List[int] = []
+        term_ids: List[int] = []
+        docs: List[int] = []
+        tfs: List[int] = []
+
+        for chunk_id, tokens in documents:
+            doc = len(doc_ids)
+            doc_ids.append(chunk_id)
+            doc_lengths.append(len(tokens))
+
+            for term, count in Counter(tokens).items():
+                term_id = vocabulary.setdefault(term, len(vocabulary))
+                term_ids.append(term_id)
+                docs.append(doc)
+                tfs.append(count)
+
+        index.doc_ids = doc_ids
+        index.doc_index = {chunk_id: doc for doc, chunk_id in enumerate(doc_ids)}
+        index.doc_lengths = np.asarray(doc_lengths, dtype=np.int32)
+        index.vocabulary = vocabulary
+
+        # Group entries by term; a stable sort keeps doc ids ascending within a term
+        term_array = np.asarray(term_ids, dtype=np.int64)
+        order = np.argsort(term_array, kind="stable")
+        index.posting_docs = np.asarray(docs, dtype=np.int32)[order]
+        index.posting_tfs = np.minimum(
+            np.asarray(tfs, dtype=np.int64)[order], MAX_TERM_FREQUENCY
+        ).astype(np.uint16)
+
+        index.offsets = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(term_array, minlength=len(vocabulary)), out=index.offsets[1:])
+
+        index._compute_statistics()
+        return index
+
+    def _compute_statistics(self) -> None:
+        """Precompute per-document length norms and per-term IDF."""
+        document_count = len(self.doc_ids)
+
+        if document_count:
+            avg_doc_length = float(self.doc_lengths.mean()) or 1.0
+            self.norms = (
+                self.k1 * (1 - self.b + self.b * self.doc_lengths / avg_doc_length)
+            ).astype(np.float32)
+        else:
+            self.norms = np.zeros(0, dtype=np.float32)
+
+        doc_freqs = np.diff(self.offsets).astype(np.float64)
+        self.idf = np.log(
+            (document_count - doc_freqs + 0.5) / (doc_freqs + 0.5) + 1.0
+        ).astype(np.float32)
+
+    def score(self, query_terms: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score all documents that contain at least one query term.
+
+        Repeated query terms contribute once per occurrence.
+
+        Args:
+            query_terms: Tokenized query
+
+        Returns:
+            Tuple of (doc ids, scores) for the matching documents
+        """
+        term_weights = [
+            (self.vocabulary[term], count)
+            for term, count in Counter(query_terms).items()
+            if term in self.vocabulary
+        ]
+
+        if not term_weights or not self.doc_ids:
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+
+        doc_slices = []
+        contribution_slices = []
+
+        for term_id, count in term_weights:
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            docs = self.posting_docs[start:end]
+            tfs = self.posting_tfs[start:end].astype(np.float32)
+
+            doc_slices.append(docs)
+            contribution_slices.append(
+                (count * self.idf[term_id] * (self.k1 + 1)) * tfs / (tfs + self.norms[docs])
+            )
+
+        docs = np.concatenate(doc_slices)
+        contributions = np.concatenate(contribution_slices)
+
+        # Scatter-add over the union of postings
+        scores = np.bincount(docs, weights=contributions, minlength=len(self.doc_ids))
+        matched = np.unique(docs)
+
+        return matched, scores[matched].astype(np.float32)
+
+    def top_k(
+        self,
+        query_terms: List[str],
+        k: int,
+        accept: Optional[Callable[[str], bool]] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Return the k highest scoring documents.
+
+        Args:
+            query_terms: Tokenized query
+            k: Number of results to return
+            accept: Optional predicate on chunk ids (e.g. a metadata filter),
+                evaluated lazily in score order
+
+        Returns:
+            List of (chunk_id, score) sorted by descending score
+        """
+        if k <= 0:
+            return []
+
+        docs, scores = self.score(query_terms)
+        if len(docs) == 0:
+            return []
+
+        if accept is None and len(docs) > k:
+            # Partial selection, then sort only the top k
+            top = np.argpartition(-scores, k - 1)[:k]
+            order = top[np.argsort(-scores[top], kind="stable")]
+        else:
+            order = np.argsort(-scores, kind="stable")
+
+        results = []
+        for position in order:
+            chunk_id = self.doc_ids[docs[position]]
+            if accept is not None and not accept(chunk_id):
+                continue
+            results.append((chunk_id, float(scores[position])))
+            if len(results) >= k:
+                break
+
+        return results
+
+    def save(self, path: str, extra: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Persist the index as a single uncompressed .npz snapshot.
+
+        The file is written to a temporary path and atomically renamed.
+
+        Args:
+            path: Snapshot file path
+            extra: Additional JSON-serializable data stored with the snapshot
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        meta = {
+            "version": SNAPSHOT_VERSION,
+            "k1": self.k1,
+            "b": self.b,
+            "terms": self.terms(),
+            "doc_ids": self.doc_ids,
+            "extra": extra or {}
+        }
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                meta=np.array(json.dumps(meta, default=str)),
+                doc_lengths=self.doc_lengths,
+                offsets=self.offsets,
+                posting_docs=self.posting_docs,
+                posting_tfs=self.posting_tfs
+            )
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> Tuple[Optional["CompactBM25Index"], Dict[str, Any]]:
+        """
+        Load a snapshot written by save().
+
+        Args:
+            path: Snapshot file path
+
+        Returns:
+            Tuple of (index, extra data); index is None if the snapshot is
+            missing or incompatible
+        """
+        if not os.path.exists(path):
+            return None, {}
+
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+
+            if meta.get("version") != SNAPSHOT_VERSION:
+                logger.warning(f"Ignoring BM25 snapshot with version {meta.get('version')}")
+                return None, {}
+
+            index = cls(k1=meta["k1"], b=meta["b"])
+            index.doc_lengths = data["doc_lengths"]
+            index.offsets = data["offsets"]
+            index.posting_docs = data["posting_docs"]
+            index.posting_tfs = data["posting_tfs"]
+
+        index.doc_ids = meta["doc_ids"]
+        index.doc_index = {chunk_id: doc for doc, chunk_id in enumerate(index.doc_ids)}
+        index.vocabulary = {term: term_id for term_id, term in enumerate(meta["terms"])}
+        index._compute_statistics()
+
+        return index, meta.get("extra", {})
+
+
+def _merge_compact_segments(
+    segments: List[Tuple[CompactBM25Index, np.ndarray]],
+    k1: float,
+    b: float
+) -> Tuple[CompactBM25Index, List[np.ndarray]]:
+    """
+    Merge segments into one, dropping deleted documents.
+
+    Postings are remapped and re-sorted with numpy; documents are not
+    re-tokenized.
+
+    Args:
+        segments: List of (segment, live mask) pairs
+        k1: Term frequency saturation parameter
+        b: Document length normalization parameter
+
+    Returns:
+        Tuple of (merged segment, per-segment old doc id -> new doc id
+        mappings with -1 for dropped documents)
+    """
+    vocabulary: Dict[str, int] = {}
+    doc_ids: List[str] = []
+    length_parts = []
+    term_parts = []
+    doc_parts = []
+    tf_parts = []
+    mappings = []
+
+    for segment, live in segments:
+        live_docs = np.flatnonzero(live)
+
+        mapping = np.full(segment.document_count, -1, dtype=np.int64)
+        mapping[live_docs] = len(doc_ids) + np.arange(len(live_docs))
+        mappings.append(mapping)
+
+        doc_ids.extend(segment.doc_ids[doc] for doc in live_docs)
+        length_parts.append(segment.doc_lengths[live_docs])
+
+        # Segment-local term id -> merged term id
+        remap = np.empty(segment.term_count, dtype=np.int64)
+        for term, term_id in segment.vocabulary.items():
+            remap[term_id] = vocabulary.setdefault(term, len(vocabulary))
+
+        entry_terms = np.repeat(np.arange(segment.term_count), np.diff(segment.offsets))
+        keep = live[segment.posting_docs]
+
+        term_parts.append(remap[entry_terms[keep]])
+        doc_parts.append(mapping[segment.posting_docs[keep]])
+        tf_parts.append(segment.posting_tfs[keep])
+
+    terms = np.concatenate(term_parts) if term_parts else np.zeros(0, dtype=np.int64)
+    docs = np.concatenate(doc_parts) if doc_parts else np.zeros(0, dtype=np.int64)
+    tfs = np.concatenate(tf_parts) if tf_parts else np.zeros(0, dtype=np.uint16)
+
+    # Drop terms whose postings were all deleted and renumber the rest densely
+    used_terms, terms = np.unique(terms, return_inverse=True)
+    terms_by_id = list(vocabulary)
+
+    order = np.lexsort((docs, terms))
+
+    merged = CompactBM25Index(k1=k1, b=b)
+    merged.doc_ids = doc_ids
+    merged.doc_index = {chunk_id: doc for doc, chunk_id in enumerate(doc_ids)}
+    merged.doc_lengths = (
+        np.concatenate(length_parts).astype(np.int32) if length_parts else np.zeros(0, dtype=np.int32)
+    )
+    merged.vocabulary = {terms_by_id[term_id]: new_id for new_id, term_id in enumerate(used_terms)}
+    merged.posting_docs = docs[order].astype(np.int32)
+    merged.posting_tfs = tfs[order].astype(np.uint16)
+    merged.offsets = np.zeros(len(used_terms) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(terms, minlength=len(used_terms)), out=merged.offsets[1:])
+    merged._compute_statistics()
+
+    return merged, mappings
+
+
+class SegmentedBM25Index:
+    """
+    Incrementally updatable BM25 index built from immutable compact segments.
+
+    New documents go to a small in-memory buffer that is frozen into a
+    CompactBM25Index segment once it reaches ``buffer_limit`` documents.
+    Deletions clear a bit in the owning segment's live mask. Document
+    frequencies, live document count and total length are kept up to date on
+    every change, so scores always use current corpus statistics. Segments are
+    periodically merged (see ``needs_merge`` and ``merge``) to bound their
+    number and to reclaim space held by deleted documents.
+
+    All public methods are thread-safe; ``merge`` does its heavy work outside
+    the lock so searches and updates are not blocked while it runs.
+    """
+
+    def __init__(
+        self,
+        k1: float = 1.5,
+        b: float = 0.75,
+        buffer_limit: int = 5000,
+        max_segments: int = 8,
+        max_deleted_ratio: float = 0.3
+    ):
+        """
+        Initialize an empty index.
+
+        Args:
+            k1: Term frequency saturation parameter
+            b: Document length normalization parameter
+            buffer_limit: Buffered documents before they are frozen into a segment
+            max_segments: Segment count above which segments are merged
+            max_deleted_ratio: Deleted document ratio above which a segment is rewritten
+        """
+        self.k1 = k1
+        self.b = b
+        self.buffer_limit = buffer_limit
+        self.max_segments = max_segments
+        self.max_deleted_ratio = max_deleted_ratio
+
+        self.segments: List[CompactBM25Index] = []
+        self.live: List[np.ndarray] = []
+
+        # In-memory buffer: chunk_id -> term counts, plus its postings
+        self.buffer: Dict[str, Counter] = {}
+        self.buffer_postings: Dict[str, Dict[str, int]] = {}
+
+        # Corpus statistics over live documents
+        self.doc_freqs: Dict[str, int] = {}
+        self.live_count = 0
+        self.total_length = 0
+
+        self.lock = threading.RLock()
+        self._merging = False
+
+    @classmethod
+    def from_compact(
+        cls,
+        index: CompactBM25Index,
+        **kwargs
+    ) -> "SegmentedBM25Index":
+        """
+        Wrap a compact index (e.g. a full build or a loaded snapshot) as the first segment.
+
+        Args:
+            index: Compact index
+            **kwargs: Arguments passed to the constructor
+
+        Returns:
+            The segmented index
+        """
+        segmented = cls(k1=index.k1, b=index.b, **kwargs)
+
+        if index.document_count:
+            segmented.segments.append(index)
+            segmented.live.append(np.ones(index.document_count, dtype=bool))
+
+            doc_freqs = np.diff(index.offsets)
+            segmented.doc_freqs = {
+                term: int(doc_freqs[term_id]) for term, term_id in index.vocabulary.items()
+            }
+            segmented.live_count = index.document_count
+            segmented.total_length = int(index.doc_lengths.sum())
+
+        return segmented
+
+    @property
+    def document_count(self) -> int:
+        """Number of live documents."""
+        return self.live_count
+
+    @property
+    def term_count(self) -> int:
+        """Number of terms occurring in live documents."""
+        return len(self.doc_freqs)
+
+    @property
+    def avg_doc_length(self) -> float:
+        """Average live document length in tokens."""
+        if not self.live_count:
+            return 0.0
+        return self.total_length / self.live_count
+
+    def __contains__(self, chunk_id: str) -> bool:
+        with self.lock:
+            return chunk_id in self.buffer or self._locate(chunk_id) is not None
+
+    def _locate(self, chunk_id: str) -> Optional[Tuple[int, int]]:
+        """Find the live (segment number, doc id) of a chunk in the frozen segments."""
+        for segment_no, segment in enumerate(self.segments):
+            doc = segment.doc_index.get(chunk_id)
+            if doc is not None and self.live[segment_no][doc]:
+                return segment_no, doc
+        return None
+
+    def add(self, chunk_id: str, tokens: List[str]) -> None:
+        """
+        Add or replace a document.
+
+        Args:
+            chunk_id: Chunk id
+            tokens: Tokenized document content
+        """
+        with self.lock:
+            self.remove(chunk_id)
+
+            term_counts = Counter(tokens)
+            self.buffer[chunk_id] = term_counts
+            for term, count in term_counts.items():
+                self.buffer_postings.setdefault(term, {})[chunk_id] = count
+                self.doc_freqs[term] = self.doc_freqs.get(term, 0) + 1
+
+            self.live_count += 1
+            self.total_length += len(tokens)
+
+            if len(self.buffer) >= self.buffer_limit:
+                self.flush()
+
+    def remove(self, chunk_id: str) -> bool:
+        """
+        Remove a document.
+
+        Args:
+            chunk_id: Chunk id
+
+        Returns:
+            True if the document was indexed
+        """
+        return self.remove_many([chunk_id]) > 0
+
+    def remove_many(self, chunk_ids: Iterable[str]) -> int:
+        """
+        Remove documents, updating corpus statistics.
+
+        Args:
+            chunk_ids: Chunk ids
+
+        Returns:
+            Number of removed documents
+        """
+        removed = 0
+
+        with self.lock:
+            segment_docs: Dict[int, List[int]] = {}
+
+            for chunk_id in chunk_ids:
+                term_counts = self.buffer.pop(chunk_id, None)
+                if term_counts is not None:
+                    for term in term_counts:
+                        postings = self.buffer_postings[term]
+                        del postings[chunk_id]
+                        if not postings:
+                            del self.buffer_postings[term]
+                        self._decrement_doc_freq(term, 1)
+                    self.total_length -= sum(term_counts.values())
+                    self.live_count -= 1
+                    removed += 1
+                    continue
+
+                location = self._locate(chunk_id)
+                if location is not None:
+                    segment_no, doc = location
+                    self.live[segment_no][doc] = False
+                    segment_docs.setdefault(segment_no, []).append(doc)
+
+            for segment_no, docs in segment_docs.items():
+                segment = self.segments[segment_no]
+                docs = np.asarray(docs, dtype=np.int64)
+
+                # Document frequencies of the removed documents' terms, in one pass
+                hit = np.flatnonzero(np.isin(segment.posting_docs, docs))
+                term_ids = np.searchsorted(segment.offsets, hit, side="right") - 1
+                counts = np.bincount(term_ids, minlength=segment.term_count)
+
+                terms = segment.terms()
+                for term_id in np.flatnonzero(counts):
+                    self._decrement_doc_freq(terms[term_id], int(counts[term_id]))
+
+                self.total_length -= int(segment.doc_lengths[docs].sum())
+                self.live_count -= len(docs)
+                removed += len(docs)
+
+        return removed
+
+    def _decrement_doc_freq(self, term: str, count: int) -> None:
+        """Decrease the document frequency of a term."""
+        remaining = self.doc_freqs.get(term, 0) - count
+        if remaining > 0:
+            self.doc_freqs[term] = remaining
+        else:
+            self.doc_freqs.pop(term, None)
+
+    def flush(self) -> None:
+        """Freeze the buffer into a new compact segment."""
+        with self.lock:
+            if not self.buffer:
+                return
+
+            segment = CompactBM25Index.build(
+                ((chunk_id, list(term_counts.elements())) for chunk_id, term_counts in self.buffer.items()),
+                k1=self.k1,
+                b=self.b
+            )
+            self.segments.append(segment)
+            self.live.append(np.ones(segment.document_count, dtype=bool))
+
+            self.buffer = {}
+            self.buffer_postings = {}
+
+    def top_k(
+        self,
+        query_terms: List[str],
+        k: int,
+        accept: Optional[Callable[[str], bool]] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Return the k highest scoring live documents.
+
+        Args:
+            query_terms: Tokenized query
+            k: Number of results to return
+            accept: Optional predicate on chunk ids, evaluated lazily in score order
+
+        Returns:
+            List of (chunk_id, score) sorted by descending score
+        """
+        if k <= 0:
+            return []
+
+        with self.lock:
+            if not self.live_count:
+                return []
+
+            avg_doc_length = self.avg_doc_length or 1.0
+            k1, b = self.k1, self.b
+
+            # Global IDF weights (repeated query terms count once per occurrence)
+            weights = []
+            for term, count in Counter(query_terms).items():
+                doc_freq = self.doc_freqs.get(term, 0)
+                if doc_freq:
+                    idf = np.log((self.live_count - doc_freq + 0.5) / (doc_freq + 0.5) + 1.0)
+                    weights.append((term, count * idf * (k1 + 1)))
+
+            if not weights:
+                return []
+
+            chunk_refs: List[Any] = []
+            score_parts = []
+
+            for segment_no, segment in enumerate(self.segments):
+                live = self.live[segment_no]
+                doc_slices = []
+                contribution_slices = []
+
+                for term, weight in weights:
+                    docs, tfs = segment.postings(term)
+                    if len(docs) == 0:
+                        continue
+                    keep = live[docs]
+                    docs = docs[keep]
+                    tfs = tfs[keep].astype(np.float32)
+                    norms = k1 * (1 - b + b * segment.doc_lengths[docs] / avg_doc_length)
+
+                    doc_slices.append(docs)
+                    contribution_slices.append(weight * tfs / (tfs + norms))
+
+                if not doc_slices:
+                    continue
+
+                docs = np.concatenate(doc_slices)
+                scores = np.bincount(
+                    docs, weights=np.concatenate(contribution_slices), minlength=segment.document_count
+                )
+                matched = np.unique(docs)
+
+                chunk_refs.append((segment, matched))
+                score_parts.append(scores[matched])
+
+            # Buffered documents
+            buffer_scores: Dict[str, float] = {}
+            for term, weight in weights:
+                for chunk_id, tf in self.buffer_postings.get(term, {}).items():
+                    norm = k1 * (1 - b + b * sum(self.buffer[chunk_id].values()) / avg_doc_length)
+                    buffer_scores[chunk_id] = buffer_scores.get(chunk_id, 0.0) + weight * tf / (tf + norm)
+
+            if buffer_scores:
+                chunk_refs.append((None, list(buffer_scores)))
+                score_parts.append(np.fromiter(buffer_scores.values(), dtype=np.float64, count=len(buffer_scores)))
+
+            if not score_parts:
+                return []
+
+            scores = np.concatenate(score_parts)
+            part_ends = np.cumsum([len(part) for part in score_parts])
+
+            if accept is None and len(scores) > k:
+                top = np.argpartition(-scores, k - 1)[:k]
+                order = top[np.argsort(-scores[top], kind="stable")]
+            else:
+                order = np.argsort(-scores, kind="stable")
+
+            results = []
+            for position in order:
+                part = int(np.searchsorted(part_ends, position, side="right"))
+                offset = position - (part_ends[part - 1] if part else 0)
+                segment, refs = chunk_refs[part]
+                chunk_id = refs[offset] if segment is None else segment.doc_ids[refs[offset]]
+
+                if accept is not None and not accept(chunk_id):
+                    continue
+                results.append((chunk_id, float(scores[position])))
+                if len(results) >= k:
+                    break
+
+            return results
+
+    def _segment_deleted_ratio(self, segment_no: int) -> float:
+        """Fraction of deleted documents in a segment."""
+        live = self.live[segment_no]
+        return 1.0 - live.sum() / len(live) if len(live) else 0.0
+
+    def needs_merge(self) -> bool:
+        """
+        Check the merge policy.
+
+        Returns:
+            True if there are too many segments or a segment has too many deletions
+        """
+        with self.lock:
+            if self._merging:
+                return False
+            if len(self.segments) > self.max_segments:
+                return True
+            return any(
+                self._segment_deleted_ratio(segment_no) > self.max_deleted_ratio
+                for segment_no in range(len(self.segments))
+            )
+
+    def _select_merge(self) -> List[int]:
+        """
+        Choose segments to merge.
+
+        Segments with too many deletions are always rewritten. When there are
+        more than ``max_segments`` segments, the smallest ones (by live
+        documents) are merged together so that similar-sized segments combine
+        and each document is rewritten a logarithmic number of times.
+        """
+        selected = {
+            segment_no for segment_no in range(len(self.segments))
+            if self._segment_deleted_ratio(segment_no) > self.max_deleted_ratio
+        }
+
+        excess = len(self.segments) - self.max_segments
+        if excess > 0:
+            by_size = sorted(range(len(self.segments)), key=lambda segment_no: int(self.live[segment_no].sum()))
+            selected.update(by_size[:excess + 1])
+
+        return sorted(selected)
+
+    def merge(self) -> bool:
+        """
+        Merge segments according to the merge policy.
+
+        The selected segments and their live masks are captured under the
+        lock, merged outside it, and swapped in under the lock again.
+        Deletions that happened during the merge are carried over to the
+        merged segment.
+
+        Returns:
+            True if a merge was performed
+        """
+        with self.lock:
+            if self._merging:
+                return False
+
+            selected = self._select_merge()
+            if not selected:
+                return False
+
+            captured = [(self.segments[segment_no], self.live[segment_no].copy()) for segment_no in selected]
+            self._merging = True
+
+        try:
+            merged, mappings = _merge_compact_segments(captured, self.k1, self.b)
+            merged_live = np.ones(merged.document_count, dtype=bool)
+
+            with self.lock:
+                positions = []
+                for (segment, captured_live), mapping in zip(captured, mappings):
+                    segment_no = next(i for i, current in enumerate(self.segments) if current is segment)
+                    positions.append(segment_no)
+
+                    # Carry over deletions that happened while merging
+                    newly_deleted = captured_live & ~self.live[segment_no]
+                    merged_live[mapping[newly_deleted]] = False
+
+                for segment_no in sorted(positions, reverse=True):
+                    del self.segments[segment_no]
+                    del self.live[segment_no]
+
+                if merged.document_count:
+                    insert_at = min(positions)
+                    self.segments.insert(insert_at, merged)
+                    self.live.insert(insert_at, merged_live)
+
+            logger.info(
+                f"Merged {len(captured)} BM25 segments into one with {merged.document_count} documents "
+                f"({len(self.segments)} segments remaining)"
+            )
+            return True
+        finally:
+            with self.lock:
+                self._merging = False
+
+    def to_compact(self) -> CompactBM25Index:
+        """
+        Build a single compact index of all live documents (e.g. for a snapshot).
+
+        Returns:
+            The compact index
+        """
+        with self.lock:
+            parts = [(segment, live.copy()) for segment, live in zip(self.segments, self.live)]
+            if self.buffer:
+                buffered = CompactBM25Index.build(
+                    ((chunk_id, list(term_counts.elements())) for chunk_id, term_counts in self.buffer.items()),
+                    k1=self.k1,
+                    b=self.b
+                )
+                parts.append((buffered, np.ones(buffered.document_count, dtype=bool)))
+
+        merged, _ = _merge_compact_segments(parts, self.k1, self.b)
+        return merged
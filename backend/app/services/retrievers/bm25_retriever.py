@@ -3,17 +3,63 @@ import logging
 import time
 import math
 import re
-from collections import Counter, defaultdict
 import json
 import asyncio
+import weakref
 
 from app.core.settings import get_settings
 from app.services.retrievers.base import BaseRetriever, SearchResult
+from app.services.retrievers.bm25_index import CompactBM25Index, SegmentedBM25Index
+from app.services.retrieval_cache import get_retrieval_cache
 from app.db.session import get_db
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+# Initialized retrievers that receive document ingestion events
+_active_retrievers: "weakref.WeakSet[BM25Retriever]" = weakref.WeakSet()
+
+
+async def notify_document_processed(document_id: str) -> None:
+    """
+    Apply a newly processed (or reprocessed) document to all live BM25 indexes.
+    
+    The document's chunks are read once and replace any previously indexed
+    chunks of the same document.
+    
+    Args:
+        document_id: ID of the processed document
+    """
+    retrievers = list(_active_retrievers)
+    if not retrievers:
+        return
+    
+    async with get_db() as db:
+        query = """
+        SELECT 
+            id, document_id, content, metadata
+        FROM 
+            document_chunks
+        WHERE 
+            document_id = $1
+        """
+        
+        chunks = await db.fetch_all(query, document_id)
+    
+    for retriever in retrievers:
+        retriever.update_document(document_id, chunks)
+
+
+async def notify_document_deleted(document_id: str) -> None:
+    """
+    Remove a deleted document from all live BM25 indexes.
+    
+    Args:
+        document_id: ID of the deleted document
+    """
+    for retriever in list(_active_retrievers):
+        retriever.remove_document(document_id)
+
 
 class BM25Retriever(BaseRetriever):
     """
@@ -28,7 +74,11 @@ class BM25Retriever(BaseRetriever):
         k1: float = 1.5,
         b: float = 0.75,
         use_cache: bool = True,
-        cache_ttl: int = 3600  # 1 hour
+        cache_ttl: int = 3600,  # 1 hour
+        snapshot_path: Optional[str] = None,
+        buffer_limit: int = 5000,
+        max_segments: int = 8,
+        max_deleted_ratio: float = 0.3
     ):
         """
         Initialize the BM25 retriever.
@@ -38,22 +88,35 @@ class BM25Retriever(BaseRetriever):
             b: Document length normalization parameter
             use_cache: Whether to cache results
             cache_ttl: Cache TTL in seconds
+            snapshot_path: Path of the persisted index snapshot (None disables it)
+            buffer_limit: Incrementally added chunks buffered before a new segment is frozen
+            max_segments: Segment count above which a background merge runs
+            max_deleted_ratio: Deleted chunk ratio above which a segment is rewritten
         """
         self.k1 = k1
         self.b = b
         self.use_cache = use_cache
         self.cache_ttl = cache_ttl
+        self.snapshot_path = snapshot_path if snapshot_path is not None else settings.retrieval.bm25_snapshot_path
         
         # Index data structures
-        self.doc_lengths = {}  # {doc_id: length}
+        self.segment_options = {
+            "buffer_limit": buffer_limit,
+            "max_segments": max_segments,
+            "max_deleted_ratio": max_deleted_ratio
+        }
+        self.index = SegmentedBM25Index(k1=self.k1, b=self.b, **self.segment_options)
         self.avg_doc_length = 0.0
-        self.term_frequencies = defaultdict(dict)  # {term: {doc_id: freq}}
-        self.doc_frequencies = defaultdict(int)  # {term: num_docs_with_term}
         self.document_count = 0
         self.document_metadata = {}  # {doc_id: metadata}
+        self.document_chunks = {}  # {document_id: set of chunk ids}
+        
+        # Background merge/snapshot task
+        self._maintenance_task: Optional[asyncio.Task] = None
         
-        # Cache for queries
-        self.query_cache = {}  # {query_hash: (timestamp, results)}
+        # Shared result cache, invalidated per collection on index updates
+        self.cache = get_retrieval_cache()
+        self.cache_collection = settings.vector_store.collection_name
         
         # Tokenization and stopwords
         self.stopwords = self._load_stopwords()
@@ -70,17 +133,22 @@ class BM25Retriever(BaseRetriever):
         logger.info("Initializing BM25 retriever and building index")
         start_time = time.time()
         
-        # Build the index
-        await self._build_index()
+        # Load the persisted snapshot if it still matches the table, otherwise rebuild
+        fingerprint = await self._get_corpus_fingerprint()
         
-        # Calculate average document length
-        if self.document_count > 0:
-            self.avg_doc_length = sum(self.doc_lengths.values()) / self.document_count
+        if not self._load_snapshot(fingerprint):
+            await self._build_index()
+            self._save_snapshot(fingerprint)
+        
+        self._refresh_statistics()
+        
+        # Receive incremental updates from document ingestion
+        _active_retrievers.add(self)
         
         init_time = time.time() - start_time
         logger.info(
-            f"BM25 index built in {init_time:.2f}s with {self.document_count} documents and "
-            f"{len(self.term_frequencies)} unique terms"
+            f"BM25 index ready in {init_time:.2f}s with {self.document_count} documents and "
+            f"{self.index.term_count} unique terms"
         )
     
     async def search(
@@ -105,8 +173,10 @@ class BM25Retriever(BaseRetriever):
         start_time = time.time()
         
         # Check cache first
-        cache_key = self._get_cache_key(query, k, filters)
-        cached_results = self._get_from_cache(cache_key)
+        cache_params = self._get_cache_params(k, filters)
+        # Results computed below are only cached if the index is not updated meanwhile
+        cache_version = await self.cache.version(self.cache_collection)
+        cached_results = await self._get_from_cache(query, cache_params, cache_version)
         if cached_results:
             logger.debug(f"Returning cached results for query: {query}")
             return cached_results
@@ -114,21 +184,12 @@ class BM25Retriever(BaseRetriever):
         # Tokenize query
         query_terms = self._tokenize(query)
         
-        # Get relevant documents (those containing at least one query term)
-        relevant_docs = self._get_relevant_docs(query_terms)
-        
-        # Calculate BM25 scores
-        doc_scores = {}
-        for doc_id in relevant_docs:
-            # Skip if doesn't match filters
-            if filters and not self._matches_filters(doc_id, filters):
-                continue
-                
-            score = self._calculate_bm25_score(query_terms, doc_id)
-            doc_scores[doc_id] = score
+        # Score the union of postings and keep the top k matching the filters
+        accept = None
+        if filters:
+            accept = lambda doc_id: self._matches_filters(doc_id, filters)
         
-        # Sort by score and get top k results
-        sorted_docs = sorted(doc_scores.items(), key=lambda x: x[1], reverse=True)[:k]
+        sorted_docs = self.index.top_k(query_terms, k, accept=accept)
         
         # Fetch document content for results
         results = []
@@ -150,7 +211,7 @@ class BM25Retriever(BaseRetriever):
         
         # Cache results
         if self.use_cache:
-            self._add_to_cache(cache_key, results)
+            await self._add_to_cache(query, cache_params, results, cache_version)
         
         processing_time = time.time() - start_time
         logger.info(f"BM25 search completed in {processing_time:.3f}s with {len(results)} results")
@@ -170,55 +231,10 @@ class BM25Retriever(BaseRetriever):
         
         return tokens
     
-    def _get_relevant_docs(self, query_terms: List[str]) -> Set[str]:
-        """Get documents that contain at least one query term."""
-        relevant_docs = set()
-        
-        for term in query_terms:
-            if term in self.term_frequencies:
-                relevant_docs.update(self.term_frequencies[term].keys())
-        
-        return relevant_docs
-    
-    def _calculate_bm25_score(self, query_terms: List[str], doc_id: str) -> float:
-        """Calculate BM25 score for a document."""
-        score = 0.0
-        doc_length = self.doc_lengths.get(doc_id, 0)
-        
-        for term in query_terms:
-            # Skip terms not in the index
-            if term not in self.term_frequencies:
-                continue
-            
-            # Get term frequency in document
-            term_freq = self.term_frequencies[term].get(doc_id, 0)
-            if term_freq == 0:
-                continue
-            
-            # Get document frequency
-            doc_freq = self.doc_frequencies.get(term, 0)
-            if doc_freq == 0:
-                continue
-            
-            # Calculate IDF component
-            idf = math.log((self.document_count - doc_freq + 0.5) / (doc_freq + 0.5) + 1.0)
-            
-            # Calculate TF component with saturation and document length normalization
-            tf = term_freq * (self.k1 + 1) / (term_freq + self.k1 * (1 - self.b + self.b * doc_length / self.avg_doc_length))
-            
-            # Add to score
-            score += idf * tf
-        
-        return score
-    
     async def _build_index(self) -> None:
         """Build the BM25 index from documents in the database."""
-        # Clear existing index data
-        self.doc_lengths = {}
-        self.term_frequencies = defaultdict(dict)
-        self.doc_frequencies = defaultdict(int)
-        self.document_count = 0
         self.document_metadata = {}
+        self.document_chunks = {}
         
         # Fetch document chunks from database
         async with get_db() as db:
@@ -231,45 +247,221 @@ class BM25Retriever(BaseRetriever):
             
             chunks = await db.fetch_all(query)
         
-        # Process each chunk
+        # Tokenize each chunk; postings are assembled in one pass afterwards
+        documents = []
         for chunk in chunks:
-            doc_id = chunk['id']
-            content = chunk['content']
-            
-            # Process metadata
-            try:
-                if isinstance(chunk['metadata'], str):
-                    metadata = json.loads(chunk['metadata'])
-                else:
-                    metadata = chunk['metadata'] or {}
-            except:
-                metadata = {}
-            
-            # Store metadata
-            self.document_metadata[doc_id] = {
-                **metadata,
-                "document_id": chunk['document_id']
-            }
+            self._register_chunk(chunk)
+            documents.append((chunk['id'], self._tokenize(chunk['content'])))
+        
+        self.index = SegmentedBM25Index.from_compact(
+            CompactBM25Index.build(documents, k1=self.k1, b=self.b),
+            **self.segment_options
+        )
+    
+    def _register_chunk(self, chunk: Dict[str, Any]) -> None:
+        """Store the metadata of a chunk row and map it to its document."""
+        doc_id = chunk['id']
+        
+        # A re-added chunk may have moved to another document
+        previous = self.document_metadata.get(doc_id)
+        if previous is not None and previous.get("document_id") != chunk['document_id']:
+            self.document_chunks.get(previous.get("document_id"), set()).discard(doc_id)
+        
+        # Process metadata
+        try:
+            if isinstance(chunk['metadata'], str):
+                metadata = json.loads(chunk['metadata'])
+            else:
+                metadata = chunk['metadata'] or {}
+        except:
+            metadata = {}
+        
+        # Store metadata
+        self.document_metadata[doc_id] = {
+            **metadata,
+            "document_id": chunk['document_id']
+        }
+        self.document_chunks.setdefault(chunk['document_id'], set()).add(doc_id)
+    
+    def _refresh_statistics(self) -> None:
+        """Update the exposed corpus statistics from the index."""
+        self.document_count = self.index.document_count
+        self.avg_doc_length = self.index.avg_doc_length
+    
+    def add_chunks(self, chunks: List[Dict[str, Any]]) -> None:
+        """
+        Index chunk rows incrementally (replacing chunks with the same id).
+        
+        Args:
+            chunks: Rows with id, document_id, content and metadata
+        """
+        for chunk in chunks:
+            self._register_chunk(chunk)
+            self.index.add(chunk['id'], self._tokenize(chunk['content'] or ""))
+        
+        self._after_update()
+    
+    def remove_chunks(self, chunk_ids: List[str]) -> int:
+        """
+        Remove chunks from the index incrementally.
+        
+        Args:
+            chunk_ids: Chunk IDs to remove
             
-            # Tokenize content
-            tokens = self._tokenize(content)
+        Returns:
+            Number of removed chunks
+        """
+        removed = self.index.remove_many(chunk_ids)
+        
+        for chunk_id in chunk_ids:
+            metadata = self.document_metadata.pop(chunk_id, None)
+            if metadata is not None:
+                document_chunks = self.document_chunks.get(metadata.get("document_id"))
+                if document_chunks is not None:
+                    document_chunks.discard(chunk_id)
+                    if not document_chunks:
+                        del self.document_chunks[metadata.get("document_id")]
+        
+        self._after_update()
+        return removed
+    
+    def update_document(self, document_id: str, chunks: List[Dict[str, Any]]) -> None:
+        """
+        Replace all indexed chunks of a document.
+        
+        Args:
+            document_id: Document ID
+            chunks: Current chunk rows of the document
+        """
+        current_ids = {chunk['id'] for chunk in chunks}
+        stale_ids = [
+            chunk_id for chunk_id in self.document_chunks.get(document_id, ())
+            if chunk_id not in current_ids
+        ]
+        
+        if stale_ids:
+            self.remove_chunks(stale_ids)
+        self.add_chunks(chunks)
+        
+        logger.debug(
+            f"BM25 index updated for document {document_id}: "
+            f"{len(chunks)} chunks indexed, {len(stale_ids)} removed"
+        )
+    
+    def remove_document(self, document_id: str) -> int:
+        """
+        Remove all indexed chunks of a document.
+        
+        Args:
+            document_id: Document ID
             
-            # Update document length
-            self.doc_lengths[doc_id] = len(tokens)
+        Returns:
+            Number of removed chunks
+        """
+        return self.remove_chunks(list(self.document_chunks.get(document_id, ())))
+    
+    def _after_update(self) -> None:
+        """Refresh statistics, drop stale cached results and schedule maintenance."""
+        self._refresh_statistics()
+        self.cache.invalidate(self.cache_collection)
+        self._schedule_maintenance()
+    
+    def _schedule_maintenance(self) -> None:
+        """Start a background merge (and snapshot) if the merge policy asks for one."""
+        if self._maintenance_task is not None and not self._maintenance_task.done():
+            return
+        if not self.index.needs_merge():
+            return
+        
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (e.g. synchronous callers): merge inline
+            self.index.merge()
+            return
+        
+        self._maintenance_task = loop.create_task(self._run_maintenance())
+    
+    async def _run_maintenance(self) -> None:
+        """Merge segments off the event loop and persist a fresh snapshot."""
+        try:
+            # Fingerprint first: a snapshot must not claim chunks it does not contain
+            fingerprint = await self._get_corpus_fingerprint() if self.snapshot_path else None
             
-            # Count term frequencies
-            term_counts = Counter(tokens)
+            loop = asyncio.get_running_loop()
+            while await loop.run_in_executor(None, self.index.merge):
+                pass
             
-            # Update index structures
-            for term, count in term_counts.items():
-                # Update term frequency
-                self.term_frequencies[term][doc_id] = count
-                
-                # Update document frequency (once per document)
-                self.doc_frequencies[term] += 1
+            if fingerprint is not None:
+                document_metadata = dict(self.document_metadata)
+                await loop.run_in_executor(None, self._save_snapshot, fingerprint, document_metadata)
+        except Exception as e:
+            logger.warning(f"BM25 index maintenance failed: {str(e)}")
+    
+    async def _get_corpus_fingerprint(self) -> str:
+        """Get a cheap fingerprint of the chunk table used to validate snapshots."""
+        async with get_db() as db:
+            query = """
+            SELECT 
+                COUNT(*) AS chunk_count,
+                MD5(COALESCE(STRING_AGG(id, ',' ORDER BY id), '')) AS id_hash
+            FROM 
+                document_chunks
+            """
             
-            # Increment document count
-            self.document_count += 1
+            result = await db.fetch_one(query)
+        
+        return f"{result['chunk_count']}:{result['id_hash']}"
+    
+    def _load_snapshot(self, fingerprint: str) -> bool:
+        """Load the persisted index if it was built from the same corpus."""
+        if not self.snapshot_path:
+            return False
+        
+        try:
+            index, extra = CompactBM25Index.load(self.snapshot_path)
+        except Exception as e:
+            logger.warning(f"Failed to load BM25 snapshot {self.snapshot_path}: {str(e)}")
+            return False
+        
+        if index is None or extra.get("fingerprint") != fingerprint:
+            return False
+        
+        # Postings do not depend on k1/b; only the precomputed norms do
+        if (index.k1, index.b) != (self.k1, self.b):
+            index.k1, index.b = self.k1, self.b
+            index._compute_statistics()
+        
+        self.index = SegmentedBM25Index.from_compact(index, **self.segment_options)
+        self.document_metadata = extra.get("document_metadata", {})
+        self.document_chunks = {}
+        for chunk_id, metadata in self.document_metadata.items():
+            self.document_chunks.setdefault(metadata.get("document_id"), set()).add(chunk_id)
+        
+        logger.info(f"Loaded BM25 snapshot from {self.snapshot_path}")
+        return True
+    
+    def _save_snapshot(
+        self,
+        fingerprint: str,
+        document_metadata: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Persist the index so the next start does not re-tokenize the table."""
+        if not self.snapshot_path:
+            return
+        
+        try:
+            self.index.to_compact().save(
+                self.snapshot_path,
+                extra={
+                    "fingerprint": fingerprint,
+                    "document_metadata": (
+                        document_metadata if document_metadata is not None else self.document_metadata
+                    )
+                }
+            )
+        except Exception as e:
+            logger.warning(f"Failed to save BM25 snapshot {self.snapshot_path}: {str(e)}")
     
     def _matches_filters(self, doc_id: str, filters: Dict[str, Any]) -> bool:
         """Check if a document matches the provided filters."""
@@ -306,60 +498,39 @@ class BM25Retriever(BaseRetriever):
             
             return ""
     
-    def _get_cache_key(self, query: str, k: int, filters: Optional[Dict[str, Any]]) -> str:
-        """Create a cache key for a query."""
-        # Normalize query
-        normalized_query = query.lower().strip()
-        
-        # Create a string representation of filters
-        filters_str = ""
-        if filters:
-            filters_str = json.dumps(filters, sort_keys=True)
-        
-        # Combine into a key
-        key = f"{normalized_query}|{k}|{filters_str}"
-        
-        return key
+    def _get_cache_params(self, k: int, filters: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Parameters that, together with the query, identify a cached result."""
+        return {"k": k, "filters": filters or {}}
     
-    def _get_from_cache(self, cache_key: str) -> Optional[List[SearchResult]]:
-        """Get results from cache if available and not expired."""
+    async def _get_from_cache(
+        self,
+        query: str,
+        cache_params: Dict[str, Any],
+        cache_version: Optional[int] = None
+    ) -> Optional[List[SearchResult]]:
+        """Get results from the shared cache if available and not expired."""
         if not self.use_cache:
             return None
         
-        cached_data = self.query_cache.get(cache_key)
-        if not cached_data:
-            return None
-        
-        timestamp, results = cached_data
-        
-        # Check if expired
-        if time.time() - timestamp > self.cache_ttl:
-            # Remove from cache
-            del self.query_cache[cache_key]
-            return None
-        
-        return results
+        return await self.cache.get("bm25", query, cache_params, collection=self.cache_collection, version=cache_version)
     
-    def _add_to_cache(self, cache_key: str, results: List[SearchResult]) -> None:
-        """Add results to cache."""
+    async def _add_to_cache(
+        self,
+        query: str,
+        cache_params: Dict[str, Any],
+        results: List[SearchResult],
+        cache_version: Optional[int] = None
+    ) -> None:
+        """Add results to the shared cache unless the index changed since `cache_version`."""
         if not self.use_cache:
             return
         
-        self.query_cache[cache_key] = (time.time(), results)
-        
-        # Clean up old cache entries
-        self._cleanup_cache()
-    
-    def _cleanup_cache(self) -> None:
-        """Remove expired cache entries."""
-        current_time = time.time()
-        expired_keys = [
-            key for key, (timestamp, _) in self.query_cache.items()
-            if current_time - timestamp > self.cache_ttl
-        ]
-        
-        for key in expired_keys:
-            del self.query_cache[key]
+        await self.cache.set(
+            "bm25", query, results, cache_params,
+            collection=self.cache_collection,
+            ttl=self.cache_ttl,
+            version=cache_version
+        )
     
     def _load_stopwords(self) -> Set[str]:
         """Load stopwords for filtering."""
@@ -9,6 +9,7 @@ from pydantic import BaseModel, Field
 
 from app.core.settings import get_settings
 from app.services.llm_service import get_llm_service
+from app.services.retrieval_cache import get_retrieval_cache
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
@@ -276,6 +277,9 @@ class VectorStoreService:
         self.metrics.total_vectors += 1
         self.metrics.last_updated = time.time()
         
+        # Cached retrieval results no longer reflect the collection
+        get_retrieval_cache().invalidate(self.collection_name)
+        
         return vector_id
     
     async def add_texts(self, texts: List[str], metadatas: List[Dict[str, Any]] = None) -> List[str]:
@@ -351,6 +355,9 @@ class VectorStoreService:
         self.metrics.total_vectors += len(texts)
         self.metrics.last_updated = time.time()
         
+        # Cached retrieval results no longer reflect the collection
+        get_retrieval_cache().invalidate(self.collection_name)
+        
         return vector_ids
     
     async def similarity_search(
@@ -707,6 +714,9 @@ class VectorStoreService:
         self.metrics.total_vectors -= len(ids)
         self.metrics.last_updated = time.time()
         
+        # Cached retrieval results no longer reflect the collection
+        get_retrieval_cache().invalidate(self.collection_name)
+        
         return True
     
     async def get_by_id(self, id: str) -> Optional[Dict[str, Any]]:
@@ -0,0 +1,149 @@
+import math
+import random
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from app.services.retrievers.bm25_index import CompactBM25Index, SegmentedBM25Index
+
+
+@pytest.fixture
+def documents():
+    """Generate a small reproducible tokenized corpus."""
+    rng = random.Random(3)
+    vocabulary = [f"term{i}" for i in range(50)]
+    return [
+        (f"chunk{i}", [rng.choice(vocabulary) for _ in range(rng.randint(1, 40))])
+        for i in range(300)
+    ]
+
+
+def reference_scores(documents, query_terms, k1=1.5, b=0.75):
+    """Dict-of-dicts BM25 reference implementation."""
+    doc_lengths = {doc_id: len(tokens) for doc_id, tokens in documents}
+    avg_doc_length = sum(doc_lengths.values()) / len(documents)
+    term_frequencies = {}
+    for doc_id, tokens in documents:
+        for term, count in Counter(tokens).items():
+            term_frequencies.setdefault(term, {})[doc_id] = count
+
+    scores = {}
+    for term in query_terms:
+        postings = term_frequencies.get(term, {})
+        idf = math.log((len(documents) - len(postings) + 0.5) / (len(postings) + 0.5) + 1.0)
+        for doc_id, tf in postings.items():
+            norm = k1 * (1 - b + b * doc_lengths[doc_id] / avg_doc_length)
+            scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (k1 + 1) / (tf + norm)
+    return scores
+
+
+def test_build_layout(documents):
+    """Postings are CSR arrays with sorted int32 doc ids and uint16 tfs."""
+    index = CompactBM25Index.build(documents)
+
+    assert index.document_count == len(documents)
+    assert index.posting_docs.dtype == np.int32
+    assert index.posting_tfs.dtype == np.uint16
+    for term_id in range(index.term_count):
+        docs = index.posting_docs[index.offsets[term_id]:index.offsets[term_id + 1]]
+        assert np.all(np.diff(docs) > 0)
+
+
+def test_scores_match_reference(documents):
+    """Vectorized scoring matches the per-document formula."""
+    index = CompactBM25Index.build(documents)
+    query = ["term1", "term7", "term7", "missing"]
+
+    expected = reference_scores(documents, query)
+    results = index.top_k(query, k=len(documents))
+
+    assert {doc_id for doc_id, _ in results} == set(expected)
+    for doc_id, score in results:
+        assert score == pytest.approx(expected[doc_id], rel=1e-5)
+    assert [score for _, score in results] == sorted((score for _, score in results), reverse=True)
+
+
+def test_top_k_with_filter(documents):
+    """Filters are applied in score order until k results are accepted."""
+    index = CompactBM25Index.build(documents)
+    accept = lambda doc_id: int(doc_id[5:]) % 3 == 0
+
+    results = index.top_k(["term2", "term3"], k=5, accept=accept)
+    expected = sorted(
+        ((doc_id, score) for doc_id, score in reference_scores(documents, ["term2", "term3"]).items() if accept(doc_id)),
+        key=lambda item: item[1],
+        reverse=True
+    )[:5]
+
+    assert [doc_id for doc_id, _ in results] == [doc_id for doc_id, _ in expected]
+
+
+def test_snapshot_roundtrip(documents, tmp_path):
+    """A saved snapshot loads back with identical results and extra data."""
+    index = CompactBM25Index.build(documents)
+    path = str(tmp_path / "bm25.npz")
+    index.save(path, extra={"fingerprint": "300:abc"})
+
+    loaded, extra = CompactBM25Index.load(path)
+
+    assert extra == {"fingerprint": "300:abc"}
+    assert loaded.top_k(["term4", "term9"], k=10) == index.top_k(["term4", "term9"], k=10)
+    assert CompactBM25Index.load(str(tmp_path / "missing.npz")) == (None, {})
+
+
+def test_segmented_updates_match_rebuild(documents):
+    """Incremental adds, removals and merges score like a fresh build."""
+    index = SegmentedBM25Index.from_compact(
+        CompactBM25Index.build(documents[:100]),
+        buffer_limit=16,
+        max_segments=3,
+        max_deleted_ratio=0.2
+    )
+    current = dict(documents[:100])
+
+    for doc_id, tokens in documents[100:]:
+        index.add(doc_id, tokens)
+        current[doc_id] = tokens
+    for doc_id, _ in documents[::4]:
+        assert index.remove(doc_id)
+        del current[doc_id]
+    index.add("chunk1", ["term1", "term1"])
+    current["chunk1"] = ["term1", "term1"]
+
+    while index.needs_merge():
+        assert index.merge()
+    assert len(index.segments) <= 3
+
+    rebuilt = CompactBM25Index.build(current.items())
+    query = ["term1", "term5", "term6"]
+
+    assert index.document_count == rebuilt.document_count
+    assert index.avg_doc_length == pytest.approx(rebuilt.avg_doc_length)
+    expected = dict(rebuilt.top_k(query, k=len(current)))
+    results = index.top_k(query, k=len(current))
+    assert {doc_id for doc_id, _ in results} == set(expected)
+    for doc_id, score in results:
+        assert score == pytest.approx(expected[doc_id], rel=1e-5)
+
+
+def test_merge_keeps_concurrent_deletes(documents, monkeypatch):
+    """Deletions made while a merge runs are applied to the merged segment."""
+    import app.services.retrievers.bm25_index as bm25_index
+
+    index = SegmentedBM25Index(buffer_limit=10, max_segments=1)
+    for doc_id, tokens in documents[:40]:
+        index.add(doc_id, tokens)
+
+    merge_segments = bm25_index._merge_compact_segments
+
+    def merge_with_delete(*args, **kwargs):
+        index.remove("chunk0")
+        return merge_segments(*args, **kwargs)
+
+    monkeypatch.setattr(bm25_index, "_merge_compact_segments", merge_with_delete)
+
+    assert index.merge()
+    assert len(index.segments) == 1
+    assert "chunk0" not in index
+    assert index.document_count == 39
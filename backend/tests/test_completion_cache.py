@@ -0,0 +1,133 @@
+import pytest
+import asyncio
+import fnmatch
+
+from app.services.completion_cache import CompletionCache
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for the redis.asyncio commands the cache uses."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value.encode("utf-8")
+
+    async def scan_iter(self, match=None):
+        for key in list(self.data):
+            if match is None or fnmatch.fnmatchcase(key, match):
+                yield key
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+
+MESSAGES = [
+    {"role": "system", "content": "Extract metadata as JSON."},
+    {"role": "user", "content": "Quarterly report  for\tACME"},
+]
+
+
+def test_key_normalizes_whitespace_and_keeps_case():
+    """Whitespace differences share a key; case and parameters do not."""
+    key = CompletionCache.make_key("openai:gpt-4", MESSAGES, {"max_tokens": 100})
+    spaced = [
+        {"role": "system", "content": "  Extract metadata as JSON.\n"},
+        {"role": "user", "content": "Quarterly report for ACME"},
+    ]
+    upper = [MESSAGES[0], {"role": "user", "content": "QUARTERLY REPORT FOR ACME"}]
+
+    assert CompletionCache.make_key("openai:gpt-4", spaced, {"max_tokens": 100}) == key
+    assert CompletionCache.make_key("openai:gpt-4", upper, {"max_tokens": 100}) != key
+    assert CompletionCache.make_key("openai:gpt-4", MESSAGES, {"max_tokens": 200}) != key
+    assert CompletionCache.make_key("openai:gpt-3.5", MESSAGES, {"max_tokens": 100}) != key
+
+
+def test_only_zero_temperature_is_cacheable():
+    assert CompletionCache.is_cacheable(0.0)
+    assert not CompletionCache.is_cacheable(0.2)
+    assert not CompletionCache.is_cacheable(None)
+
+
+@pytest.mark.asyncio
+async def test_hit_returns_copy_and_counts_saved_tokens():
+    cache = CompletionCache()
+    key = CompletionCache.make_key("openai:gpt-4", MESSAGES)
+
+    assert await cache.get(key) is None
+    await cache.set(key, {"text": "{}", "model": "gpt-4", "total_tokens": 42})
+
+    first = await cache.get(key)
+    first["text"] = "changed"
+    second = await cache.get(key)
+
+    assert second["text"] == "{}"
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["saved_tokens"] == 84
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction_and_ttl():
+    cache = CompletionCache(max_entries=2)
+    for name in ("a", "b"):
+        await cache.set(name, {"text": name})
+
+    # Touch "a" so that "b" is the least recently used entry
+    await cache.get("a")
+    await cache.set("c", {"text": "c"})
+
+    assert await cache.get("b") is None
+    assert await cache.get("a") is not None
+    assert cache.stats()["evictions"] == 1
+
+    expiring = CompletionCache(ttl=1)
+    await expiring.set("a", {"text": "a"})
+    await asyncio.sleep(1.05)
+    assert await expiring.get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_redis_tier_is_shared_between_workers():
+    redis = FakeRedis()
+    writer = CompletionCache(redis_client=redis)
+    reader = CompletionCache(redis_client=redis)
+    key = CompletionCache.make_key("openai:gpt-4", MESSAGES)
+
+    await writer.set(key, {"text": "shared"})
+
+    assert (await reader.get(key))["text"] == "shared"
+    assert reader.stats()["redis_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_invalidate_prefix_drops_template_completions():
+    redis = FakeRedis()
+    cache = CompletionCache(redis_client=redis)
+    other_template = [{"role": "system", "content": "Summarize."}, MESSAGES[1]]
+
+    extract_key = CompletionCache.make_key("openai:gpt-4", MESSAGES)
+    summary_key = CompletionCache.make_key("openai:gpt-4", other_template)
+    await cache.set(extract_key, {"text": "a"})
+    await cache.set(summary_key, {"text": "b"})
+
+    removed = await cache.invalidate_prefix("openai:gpt-4", ["Extract metadata as JSON."])
+
+    assert removed == 1
+    assert await cache.get(extract_key) is None
+    assert await cache.get(summary_key) is not None
+
+
+@pytest.mark.asyncio
+async def test_disabled_cache_stores_nothing():
+    cache = CompletionCache(enabled=False)
+    await cache.set("a", {"text": "a"})
+
+    assert await cache.get("a") is None
+    assert cache.stats()["entries"] == 0
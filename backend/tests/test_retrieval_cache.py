@@ -0,0 +1,177 @@
+import pytest
+import asyncio
+import time
+import numpy as np
+
+from app.services.retrieval_cache import RetrievalCache
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for the redis.asyncio commands the cache uses."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        value = self.data.get(key)
+        if value is None:
+            return None
+        payload, expires_at = value
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.data[key]
+            return None
+        return payload
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = (value, time.monotonic() + ex if ex else None)
+
+    async def ttl(self, key):
+        value = self.data.get(key)
+        if value is None or value[1] is None:
+            return -1
+        return int(value[1] - time.monotonic())
+
+    async def incr(self, key):
+        current = int((await self.get(key)) or 0) + 1
+        self.data[key] = (str(current).encode(), None)
+        return current
+
+
+@pytest.mark.asyncio
+async def test_query_normalization_and_param_order():
+    """Equivalent queries and reordered filters share one entry."""
+    cache = RetrievalCache()
+    await cache.set("pipeline", "What is  RAG?", ["result"], {"k": 5, "filters": {"a": 1, "b": 2}})
+
+    cached = await cache.get("pipeline", "  what is rag? ", {"filters": {"b": 2, "a": 1}, "k": 5})
+    assert cached == ["result"]
+    assert await cache.get("pipeline", "what is rag?", {"k": 6, "filters": {"a": 1, "b": 2}}) is None
+    assert await cache.get("bm25", "what is rag?", {"k": 5, "filters": {"a": 1, "b": 2}}) is None
+
+
+@pytest.mark.asyncio
+async def test_hits_return_copies():
+    """Callers can modify cached results without affecting the cache."""
+    cache = RetrievalCache()
+    await cache.set("pipeline", "query", [{"score": 1.0}])
+
+    first = await cache.get("pipeline", "query")
+    first[0]["score"] = 0.0
+
+    assert (await cache.get("pipeline", "query"))[0]["score"] == 1.0
+
+
+@pytest.mark.asyncio
+async def test_ttl_expiry():
+    """Expired entries are misses."""
+    cache = RetrievalCache(ttl=3600)
+    await cache.set("pipeline", "query", [1], ttl=0.05)
+    assert await cache.get("pipeline", "query") == [1]
+
+    await asyncio.sleep(0.1)
+
+    assert await cache.get("pipeline", "query") is None
+    assert cache.stats()["expirations"] == 1
+    assert cache.stats()["entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction_by_entries():
+    """The least recently used entry is evicted first."""
+    cache = RetrievalCache(max_entries=2)
+    await cache.set("pipeline", "a", 1)
+    await cache.set("pipeline", "b", 2)
+    await cache.get("pipeline", "a")
+    await cache.set("pipeline", "c", 3)
+
+    assert await cache.get("pipeline", "a") == 1
+    assert await cache.get("pipeline", "b") is None
+    assert await cache.get("pipeline", "c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_eviction_by_memory():
+    """Entries are evicted to stay within the memory budget."""
+    cache = RetrievalCache(max_entries=1000, max_memory_bytes=20000)
+    for i in range(10):
+        await cache.set("pipeline", f"query {i}", "x" * 4000)
+
+    stats = cache.stats()
+    assert stats["memory_bytes"] <= 20000
+    assert stats["entries"] < 10
+    assert await cache.get("pipeline", "query 9") is not None
+
+    cache.clear()
+    assert cache.stats()["memory_bytes"] == 0
+
+
+@pytest.mark.asyncio
+async def test_collection_invalidation():
+    """A write to a collection drops only that collection's results."""
+    cache = RetrievalCache()
+    await cache.set("pipeline", "query", [1], collection="docs")
+    await cache.set("bm25", "query", [2], collection="docs")
+    await cache.set("pipeline", "query", [3], collection="other")
+
+    assert cache.invalidate("docs") == 2
+
+    assert await cache.get("pipeline", "query", collection="docs") is None
+    assert await cache.get("bm25", "query", collection="docs") is None
+    assert await cache.get("pipeline", "query", collection="other") == [3]
+
+
+@pytest.mark.asyncio
+async def test_result_computed_before_invalidation_is_not_stored():
+    """A result read at one version and stored after a write is dropped."""
+    cache = RetrievalCache()
+    version = await cache.version("docs")
+    assert await cache.get("pipeline", "query", collection="docs", version=version) is None
+
+    # The collection is written while the stale result is being computed
+    cache.invalidate("docs")
+    await cache.set("pipeline", "query", ["stale"], collection="docs", version=version)
+
+    assert await cache.get("pipeline", "query", collection="docs") is None
+    assert cache.stats()["stale_writes"] == 1
+
+    version = await cache.version("docs")
+    await cache.set("pipeline", "query", ["fresh"], collection="docs", version=version)
+    assert await cache.get("pipeline", "query", collection="docs", version=version) == ["fresh"]
+
+
+@pytest.mark.asyncio
+async def test_semantic_lookup():
+    """Near-duplicate queries reuse a cached result above the threshold."""
+    cache = RetrievalCache(semantic_threshold=0.95)
+    embedding = np.array([1.0, 0.0, 0.0], dtype=np.float32)
+    await cache.set("pipeline", "how do I reset my password", [1], {"k": 5}, embedding=embedding)
+
+    similar = np.array([0.99, 0.05, 0.0], dtype=np.float32)
+    different = np.array([0.0, 1.0, 0.0], dtype=np.float32)
+
+    assert await cache.get("pipeline", "password reset steps", {"k": 5}, embedding=similar) == [1]
+    assert await cache.get("pipeline", "password reset steps", {"k": 10}, embedding=similar) is None
+    assert await cache.get("pipeline", "billing address", {"k": 5}, embedding=different) is None
+    assert cache.stats()["semantic_hits"] == 1
+
+    cache.invalidate()
+    assert await cache.get("pipeline", "password reset steps", {"k": 5}, embedding=similar) is None
+
+
+@pytest.mark.asyncio
+async def test_redis_tier_shared_between_workers():
+    """Results and invalidations propagate between caches sharing Redis."""
+    redis = FakeRedis()
+    worker_a = RetrievalCache(redis_client=redis, version_refresh_interval=0)
+    worker_b = RetrievalCache(redis_client=redis, version_refresh_interval=0)
+
+    await worker_a.set("pipeline", "query", [1], collection="docs")
+    assert await worker_b.get("pipeline", "query", collection="docs") == [1]
+    assert worker_b.stats()["redis_hits"] == 1
+
+    worker_a.invalidate("docs")
+    await asyncio.sleep(0)
+
+    assert await worker_b.get("pipeline", "query", collection="docs") is None
+    assert await worker_a.get("pipeline", "query", collection="docs") is None
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Vector store search latency benchmark.
+
+Sends searches against a FAISS flat index at a fixed arrival rate (open
+loop) and measures each request's latency from its scheduled arrival time,
+so time spent waiting for a blocked event loop is included. Three modes
+are compared:
+
+- inline:    FAISS search runs directly on the event loop (previous behaviour)
+- executor:  each search runs on the worker threads
+- coalesced: concurrent searches are batched into one FAISS call
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import numpy as np
+import faiss
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.search_executor import SearchExecutor
+
+MODES = ("inline", "executor", "coalesced")
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark concurrent vector store searches")
+    parser.add_argument("--vectors", type=int, default=200_000, help="Number of indexed vectors")
+    parser.add_argument("--dimension", type=int, default=384, help="Vector dimension")
+    parser.add_argument("--rate", type=float, default=400.0, help="Search arrivals per second")
+    parser.add_argument("--requests", type=int, default=2000, help="Total searches per mode")
+    parser.add_argument("--k", type=int, default=10, help="Results per search")
+    parser.add_argument("--workers", type=int, default=4, help="Executor worker threads")
+    parser.add_argument("--batch-window-ms", type=float, default=1.0, help="Coalescing window")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES), help="Modes to run")
+    return parser.parse_args()
+
+
+def build_index(vectors: int, dimension: int):
+    """Create a normalized random flat index."""
+    rng = np.random.default_rng(42)
+    data = rng.standard_normal((vectors, dimension), dtype=np.float32)
+    faiss.normalize_L2(data)
+
+    index = faiss.IndexFlatL2(dimension)
+    index.add(data)
+    return index
+
+
+def percentile(values, q):
+    """Percentile in milliseconds."""
+    return float(np.percentile(np.asarray(values) * 1000.0, q))
+
+
+async def run_mode(mode, index, queries, args):
+    """Run the load for one mode and return latency statistics."""
+    executor = SearchExecutor(
+        max_workers=args.workers,
+        batch_window=args.batch_window_ms / 1000.0 if mode == "coalesced" else 0.0
+    )
+
+    async def search(query):
+        if mode == "inline":
+            return index.search(query, args.k)
+        if mode == "executor":
+            return await executor.run(index.search, query, args.k)
+        return await executor.search(index, query, args.k)
+
+    latencies = []
+
+    async def request(i, arrival):
+        await search(queries[i % len(queries)][None, :])
+        latencies.append(time.perf_counter() - arrival)
+
+    # Poisson arrivals at the requested rate
+    rng = np.random.default_rng(0)
+    arrivals = np.cumsum(rng.exponential(1.0 / args.rate, args.requests))
+
+    started = time.perf_counter()
+    tasks = []
+    for i, offset in enumerate(arrivals):
+        delay = started + offset - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(request(i, started + offset)))
+
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+    executor.shutdown()
+
+    return {
+        "mode": mode,
+        "qps": len(latencies) / elapsed,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "search_calls": executor.search_calls if mode == "coalesced" else args.requests,
+    }
+
+
+def main():
+    args = parse_args()
+
+    print(f"Building index: {args.vectors} x {args.dimension}")
+    index = build_index(args.vectors, args.dimension)
+
+    rng = np.random.default_rng(7)
+    queries = rng.standard_normal((1024, args.dimension), dtype=np.float32)
+    faiss.normalize_L2(queries)
+
+    print(f"{'mode':<10} {'qps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'faiss calls':>12}")
+    for mode in args.modes:
+        result = asyncio.run(run_mode(mode, index, queries, args))
+        print(
+            f"{result['mode']:<10} {result['qps']:>9.1f} {result['p50']:>9.2f} {result['p95']:>9.2f} "
+            f"{result['p99']:>9.2f} {result['search_calls']:>12}"
+        )
+
+
+if __name__ == "__main__":
+    main()
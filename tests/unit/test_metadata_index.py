@@ -0,0 +1,68 @@
+import pytest
+import os
+import sys
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.services.metadata_index import MetadataIndex, parse_filter_key
+
+
+@pytest.mark.unit
+class TestMetadataIndex:
+    """Test suite for the MetadataIndex class."""
+
+    @pytest.fixture
+    def index(self):
+        """Create an index over a small set of rows."""
+        index = MetadataIndex()
+        index.build([
+            (0, {"text": "a", "category": "news", "year": 2020, "tags": ["x"]}),
+            (1, {"text": "b", "category": "blog", "year": 2021}),
+            (2, {"text": "c", "category": "news", "year": 2022.5, "tags": ["y"]}),
+            (3, {"text": "d", "category": "paper"}),
+        ])
+        return index
+
+    def test_parse_filter_key(self):
+        """Test splitting filter keys into field and operator."""
+        assert parse_filter_key("year__gte") == ("year", "gte")
+        assert parse_filter_key("year__gt") == ("year", "gt")
+        assert parse_filter_key("category__in") == ("category", "in")
+        assert parse_filter_key("category") == ("category", "eq")
+
+    def test_equality_and_membership(self, index):
+        """Test exact match and __in filters."""
+        assert index.evaluate({"category": "news"}).tolist() == [0, 2]
+        assert index.evaluate({"category__in": ["blog", "paper"]}).tolist() == [1, 3]
+        assert index.evaluate({"category": "missing"}).tolist() == []
+        assert index.evaluate({"text": "a"}).tolist() == []
+
+    def test_range_filters(self, index):
+        """Test range filters and rows without the field."""
+        assert index.evaluate({"year__gt": 2020}).tolist() == [1, 2]
+        assert index.evaluate({"year__gte": 2020}).tolist() == [0, 1, 2]
+        assert index.evaluate({"year__lt": 2022}).tolist() == [0, 1]
+        assert index.evaluate({"year__lte": 2022.5}).tolist() == [0, 1, 2]
+
+    def test_combined_filters(self, index):
+        """Test that all conditions must hold."""
+        assert index.evaluate({"category": "news", "year__gt": 2021}).tolist() == [2]
+        assert index.evaluate({"category": "blog", "year__gt": 2021}).tolist() == []
+
+    def test_unhashable_values(self, index):
+        """Test matching list-valued metadata."""
+        assert index.evaluate({"tags": ["y"]}).tolist() == [2]
+        assert index.evaluate({"tags__in": [["x"], ["z"]]}).tolist() == [0]
+
+    def test_add_and_remove(self, index):
+        """Test that updates are reflected in postings and sorted columns."""
+        assert index.evaluate({"year__gt": 2021}).tolist() == [2]
+
+        index.add(4, {"category": "news", "year": 2030})
+        index.remove(2)
+
+        assert len(index) == 4
+        assert index.evaluate({"category": "news"}).tolist() == [0, 4]
+        assert index.evaluate({"year__gt": 2021}).tolist() == [4]
+        assert index.evaluate({"tags": ["y"]}).tolist() == []
@@ -0,0 +1,172 @@
+import pytest
+import os
+import sys
+import asyncio
+import numpy as np
+import faiss
+import threading
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.services.search_executor import SearchExecutor, ReadWriteLock
+
+
+@pytest.mark.unit
+class TestSearchExecutor:
+    """Test suite for the SearchExecutor class."""
+
+    @pytest.fixture
+    def index(self):
+        """Create a small flat index."""
+        rng = np.random.default_rng(0)
+        vectors = rng.random((200, 8), dtype=np.float32)
+        index = faiss.IndexFlatL2(8)
+        index.add(vectors)
+        return index
+
+    @pytest.fixture
+    def executor(self):
+        """Create an executor and stop it after the test."""
+        executor = SearchExecutor(max_workers=2, max_batch_size=16, batch_window=0.01)
+        yield executor
+        executor.shutdown()
+
+    def test_concurrent_searches_are_coalesced(self, index, executor):
+        """Test that concurrent searches share one FAISS call with per-caller results."""
+        queries = np.random.default_rng(1).random((10, 8), dtype=np.float32)
+        ks = [1 + i % 4 for i in range(10)]
+
+        async def run():
+            return await asyncio.gather(*[
+                executor.search(index, queries[i:i + 1], ks[i]) for i in range(10)
+            ])
+
+        results = asyncio.run(run())
+
+        assert executor.search_calls == 1
+        assert executor.batched_queries == 10
+        for i, (scores, indices) in enumerate(results):
+            expected_scores, expected_indices = index.search(queries[i:i + 1], ks[i])
+            assert indices.shape == (1, ks[i])
+            np.testing.assert_array_equal(indices, expected_indices)
+            np.testing.assert_allclose(scores, expected_scores, rtol=1e-5)
+
+    def test_batches_are_split_by_size_and_index(self, index, executor):
+        """Test that batches respect the size limit and never mix indexes."""
+        other = faiss.clone_index(index)
+        query = np.zeros((1, 8), dtype=np.float32)
+
+        async def run():
+            searches = [executor.search(index, query, 1) for _ in range(20)]
+            searches.append(executor.search(other, query, 1))
+            return await asyncio.gather(*searches)
+
+        results = asyncio.run(run())
+
+        assert len(results) == 21
+        assert executor.batched_queries == 21
+        assert executor.search_calls == 3
+
+    def test_errors_reach_every_caller(self, executor):
+        """Test that a failing batched search fails each waiting search."""
+        index = faiss.IndexFlatL2(8)
+        query = np.zeros((1, 4), dtype=np.float32)
+
+        async def run():
+            return await asyncio.gather(
+                executor.search(index, query, 1),
+                executor.search(index, query, 1),
+                return_exceptions=True
+            )
+
+        results = asyncio.run(run())
+
+        assert all(isinstance(result, Exception) for result in results)
+
+    def test_run_offloads_blocking_calls(self, executor):
+        """Test that run returns the worker's result."""
+        async def run():
+            return await executor.run(sum, [1, 2, 3])
+
+        assert asyncio.run(run()) == 6
+
+    def test_searches_wait_for_in_place_add(self, index):
+        """Test that a search holding the index lock sees the index before or after an add, never during."""
+        lock = ReadWriteLock()
+        executor = SearchExecutor(max_workers=2, max_batch_size=16, batch_window=0.0, index_lock=lock)
+        query = np.asarray(index.reconstruct(5)).reshape(1, -1)
+        added = threading.Event()
+
+        def add():
+            with lock.write():
+                added.set()
+                time.sleep(0.05)
+                index.add(query)
+
+        async def run():
+            writer = threading.Thread(target=add)
+            writer.start()
+            added.wait()
+            result = await executor.search(index, query[0], 2)
+            writer.join()
+            return result
+
+        try:
+            scores, indices = asyncio.run(run())
+        finally:
+            executor.shutdown()
+
+        # The search was queued behind the writer, so it finds the new row
+        assert sorted(indices[0].tolist()) == [5, 200]
+
+
+@pytest.mark.unit
+class TestReadWriteLock:
+    """Test suite for the ReadWriteLock class."""
+
+    def test_readers_share_and_writer_excludes(self):
+        """Test that readers overlap while a writer waits for all of them."""
+        lock = ReadWriteLock()
+        events = []
+
+        def write():
+            with lock.write():
+                events.append("write")
+
+        with lock.read():
+            with lock.read():
+                writer = threading.Thread(target=write)
+                writer.start()
+                time.sleep(0.02)
+                events.append("read")
+
+        writer.join()
+        assert events == ["read", "write"]
+
+    def test_waiting_writer_blocks_new_readers(self):
+        """Test that readers arriving after a waiting writer run after it."""
+        lock = ReadWriteLock()
+        events = []
+
+        def write():
+            with lock.write():
+                events.append("write")
+
+        def read():
+            with lock.read():
+                events.append("late read")
+
+        with lock.read():
+            writer = threading.Thread(target=write)
+            writer.start()
+            time.sleep(0.02)
+            reader = threading.Thread(target=read)
+            reader.start()
+            time.sleep(0.02)
+            events.append("read")
+
+        writer.join()
+        reader.join()
+        assert events == ["read", "write", "late read"]